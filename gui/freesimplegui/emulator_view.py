@@ -7,6 +7,7 @@ from gui.freesimplegui.disassembler_view import DisassemblerWindow
 from gui.freesimplegui.nes_file_view import NesFileWindow
 
 from threading import Thread, Event, Lock
+import queue
 import pygame
 import numpy as np
 import os
@@ -14,7 +15,6 @@ import cv2
 from PIL import Image
 import time
 import sys
-import json
 import ctypes
 
 from pathlib import Path
@@ -46,14 +46,42 @@ class EmulatorWindow(BaseView):
     __RESIZABLE = True
 
     __FINALIZE = True
+
+    # NTSC NES frame rate
+    __FRAME_RATE = 60.0988
+
+    # complete frames waiting to be presented, the oldest one is dropped when presentation lags behind
+    __QUEUE_SIZE = 2
+
+    # frames in a row left unpresented while emulation is behind the clock
+    __MAX_FRAME_SKIP = 4
+
+    # seconds behind the clock after which emulation gives up catching up and restarts pacing from now
+    __MAX_LAG = 0.25
+
+    # milliseconds the GUI thread waits for window events before pumping pygame, sampling keys and presenting
+    __TIMEOUT = 5
+
+    # order of Console.control
+    __BUTTONS = ['SELECT', 'START', 'B', 'A', 'UP', 'DOWN', 'LEFT', 'RIGHT']
      
     def __init__(self):
         super().__init__(title = self.__TITLE,
                          size = self.__SIZE,
                          resizable = self.__RESIZABLE,
-                         finalize = self.__FINALIZE)
-        self.__lock = Lock()
+                         finalize = self.__FINALIZE,
+                         timeout = self.__TIMEOUT)
+        self.__console_lock = Lock()
         self.__stop = Event()
+        self.__frames = queue.Queue(maxsize = self.__QUEUE_SIZE)
+        self.__threads = []
+        # buttons held, in the order of __BUTTONS: sampled by the GUI thread, read by the emulation thread
+        self.__pressed = [False] * len(self.__BUTTONS)
+        # last frame handed to presentation
+        self.__last_frame = None
+
+        # pygame has to be pumped and drawn to from the GUI thread
+        self._events[sg.TIMEOUT_KEY] = self.__present
 
         # File Tab
         self._events["Open"] = self.__run
@@ -105,6 +133,7 @@ class EmulatorWindow(BaseView):
 
         # init pygame settings
         self.__game_screen = pygame.display.set_mode((256, 240), pygame.RESIZABLE)
+        self.cur_w, self.cur_h = 256, 240
         # self.__game_clock = pygame.time.Clock()
         # self.__fps = 60
 
@@ -121,9 +150,12 @@ class EmulatorWindow(BaseView):
             sg.popup("Invalid .nes file path!")
             return False
         
-        # run .nes file
-        self.__console = Console(file_path)
-        self.__console.power_up()
+        # run .nes file, the running one keeps going until this one is loaded
+        console = Console(file_path)
+        console.power_up()
+        self.__stop_threads()
+        self.__console = console
+        self.__last_frame = None
 
         # update emulator window title
         filename_with_extension = os.path.basename(file_path)
@@ -145,55 +177,106 @@ class EmulatorWindow(BaseView):
         if not os.path.exists("./saves"):
             os.mkdir("./saves")
         archive_name = "./saves/{filename}-{id}.sav".format(filename = self.filename, id = int(time.time()))
-        self.__console.save_state(archive_name)
+        with self.__console_lock:
+            self.__console.save_state(archive_name)
 
     def __load(self, values):
         archive_path = sg.popup_get_file('File to open', file_types = (("NES Archives", "*.sav"),), no_window = True)
         if archive_path is None or archive_path == '':
             sg.popup("Invalid .sav file path!")
             return
-        self.__console.load_state(archive_path)
+        with self.__console_lock:
+            self.__console.load_state(archive_path)
 
     def __resize(self, original_image: np.ndarray) -> np.ndarray:
-        with self.__lock:
-            for event in pygame.event.get():
-                if event.type == pygame.VIDEORESIZE:
-                    self.cur_w, self.cur_h = event.w, event.h
-                    self.__game_screen = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
-            resized_image = cv2.resize(original_image, (self.cur_h, self.cur_w))
-        return resized_image   
+        return cv2.resize(original_image, (self.cur_h, self.cur_w))
     
-    def __run_file(self) -> None:
-        while not self.__stop.is_set():              
-            pressed = pygame.key.get_pressed()
-            with open(KeyboardSettingWindow.keyboard_setting_path) as keyboard_setting:
-                keyboard = json.load(keyboard_setting)
-            self.__console.control([
-                pressed[keyboard['SELECT']],
-                pressed[keyboard['START']],
-                pressed[keyboard['B']],
-                pressed[keyboard['A']],
-                pressed[keyboard['UP']],
-                pressed[keyboard['DOWN']],
-                pressed[keyboard['LEFT']],
-                pressed[keyboard['RIGHT']]
-            ]) 
-            self.__console.run()
-            original_image = np.swapaxes(self.__console.bus.ppu.screen(), 0, 1)
-            resized_image = self.__resize(original_image)
-            surf = pygame.surfarray.make_surface(resized_image)
-            self.__game_screen.blit(surf, (0, 0))
-            pygame.display.flip()
+    def __publish(self, frame: np.ndarray) -> None:
+        self.__last_frame = frame
+        try:
+            self.__frames.put_nowait(frame)
+        except queue.Full:
+            try:
+                self.__frames.get_nowait()
+            except queue.Empty:
+                pass
+            self.__frames.put_nowait(frame)
+
+    def __emulate(self) -> None:
+        '''
+        Runs the console at the NES frame rate, independent of how fast frames are presented
+        '''
+        frame_time = 1.0 / self.__FRAME_RATE
+        deadline = time.perf_counter()
+        skip, skipped = False, 0
+        while not self.__stop.is_set():
+            with self.__console_lock:
+                self.__console.control(list(self.__pressed))
+                self.__console.frame(not skip)
+                frame = None if skip else np.array(self.__console.bus.ppu.screen())
+            if frame is not None:
+                self.__publish(frame)
+
+            deadline += frame_time
+            lag = time.perf_counter() - deadline
+            if lag > self.__MAX_LAG:
+                deadline = time.perf_counter()
+            elif lag < 0:
+                time.sleep(-lag)
+            # behind the clock: run the next frame without drawing it, so it takes less time
+            skip = lag > 0 and skipped < self.__MAX_FRAME_SKIP
+            skipped = skipped + 1 if skip else 0
+
+    def __present(self, values = None) -> None:
+        '''
+        On the GUI thread: pumps pygame events, samples the keys for the emulation thread and draws the latest frame
+        '''
+        for event in pygame.event.get():
+            if event.type == pygame.VIDEORESIZE:
+                self.cur_w, self.cur_h = event.w, event.h
+                self.__game_screen = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
+        keymap = KeyboardSettingWindow.keymap()
+        pressed = pygame.key.get_pressed()
+        self.__pressed = [pressed[keymap[button]] for button in self.__BUTTONS]
+
+        frame = None
+        # only the latest frame is worth drawing
+        while True:
+            try:
+                frame = self.__frames.get_nowait()
+            except queue.Empty:
+                break
+        if frame is None:
+            return
+        original_image = np.swapaxes(frame, 0, 1)
+        resized_image = self.__resize(original_image)
+        surf = pygame.surfarray.make_surface(resized_image)
+        self.__game_screen.blit(surf, (0, 0))
+        pygame.display.flip()
+
+    def __stop_threads(self) -> None:
+        self.__stop.set()
+        for thread in self.__threads:
+            thread.join()
+        self.__threads = []
+        self.__stop.clear()
+        self.__frames = queue.Queue(maxsize = self.__QUEUE_SIZE)
 
     def __run(self, values) -> None:
+        # stops the threads of the running game only once another one is loaded
         success = self.__open_file()
         if not success:
             return
-        async_runnable = Thread(target = self.__run_file)
-        async_runnable.start()
+        self.__threads = [Thread(target = self.__emulate)]
+        for thread in self.__threads:
+            thread.start()
 
     def __capture_screenshot(self, values) -> None:
-        image_data = np.array(self.__console.bus.ppu.screen())
+        # the last frame handed to presentation, the screen itself is being written by the emulation thread
+        image_data = self.__last_frame
+        if image_data is None:
+            self.__open_nes_file_hint(values)
+            return
 
         if not os.path.exists("./screenshots"):
             os.mkdir("./screenshots")
@@ -203,7 +286,8 @@ class EmulatorWindow(BaseView):
         image.save(screenshot_path)
 
     def __reset(self, values) -> None:
-        self.__console.reset()
+        with self.__console_lock:
+            self.__console.reset()
     
     def __show_about(self, values) -> None:
         sg.popup(f'Nes Emulator\nVersion: {VERSION}\nAuthor: {AUTHOR}\n')
@@ -27,6 +27,9 @@ class KeyboardSettingWindow(BaseView):
 
     keyboard_setting_path = "keyboard.json"
 
+    # keymap in use, read from keyboard_setting_path once and replaced when a new one is applied
+    __keymap = None
+
     __TITLE = "KEYMAP"
 
     KEYMAP_EVENT_KEYS = ["-UP-", "-DOWN-", "-LEFT-", "-RIGHT-", "-SELECT-", "-START-", "-B-", "-A-"]
@@ -137,13 +140,23 @@ class KeyboardSettingWindow(BaseView):
         }
         with open(self.keyboard_setting_path, 'w') as keyboard:
             json.dump(self.__keyboard, keyboard)
+        KeyboardSettingWindow.__keymap = dict(self.__keyboard)
 
     def __load(self) -> dict:
-        if not os.path.exists(self.keyboard_setting_path):
-            with open(self.keyboard_setting_path, 'w') as keyboard:
-                json.dump(self.__DEFAULT_KEYMAP, keyboard)
-        with open(self.keyboard_setting_path, 'r') as keyboard:
-            self.__keyboard = json.load(keyboard)
+        self.__keyboard = dict(self.keymap())
+
+    @classmethod
+    def keymap(cls) -> dict:
+        '''
+        Button name -> pygame key code, the file is only read the first time
+        '''
+        if KeyboardSettingWindow.__keymap is None:
+            if not os.path.exists(cls.keyboard_setting_path):
+                with open(cls.keyboard_setting_path, 'w') as keyboard:
+                    json.dump(cls.__DEFAULT_KEYMAP, keyboard)
+            with open(cls.keyboard_setting_path, 'r') as keyboard:
+                KeyboardSettingWindow.__keymap = json.load(keyboard)
+        return KeyboardSettingWindow.__keymap
 
     def _after_open(self) -> None:
         for event_key in self.KEYMAP_EVENT_KEYS:
@@ -24,11 +24,17 @@ class PPUDebugWindow(BaseView):
             [ 
                 sg.Image(key = "-PALETTE-", size = ( 4 * 10, 16 * 10 )) 
             ],
+            [
+                sg.Image(key = "-NAMETABLES-", size = ( 512, 480 )),
+                sg.Image(key = "-SPRITES-", size = ( 64 * 2, 128 * 2 ))
+            ],
         ]
 
     def __update_PPU_debugger(self, values) -> None:
         self.__update_pattern_tables()
         self.__update_palette(ratio = 10)
+        self.__update_nametables()
+        self.__update_sprites(ratio = 2)
 
     def __update_pattern_tables(self) -> None:
         # numpy array to image
@@ -52,3 +58,17 @@ class PPUDebugWindow(BaseView):
         # update window by photo
         palette = ImageTk.PhotoImage(image = resized_palette_image)
         self._window['-PALETTE-'].Update(data = palette)
+
+    def __update_nametables(self) -> None:
+        nametables_image = Image.fromarray(np.asarray(self.__console.ppu_debugger.nametables()))
+        nametables = ImageTk.PhotoImage(image = nametables_image)
+        self._window['-NAMETABLES-'].Update(data = nametables)
+
+    def __update_sprites(self, ratio: int = 1) -> None:
+        sprites_image = Image.fromarray(np.asarray(self.__console.ppu_debugger.sprite_sheet()))
+
+        # resize image
+        resized_sprites_image = sprites_image.resize(( sprites_image.width * ratio, sprites_image.height * ratio ), Image.NEAREST)
+
+        sprites = ImageTk.PhotoImage(image = resized_sprites_image)
+        self._window['-SPRITES-'].Update(data = sprites)
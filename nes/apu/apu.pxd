@@ -0,0 +1,188 @@
+from libc.stdint cimport uint8_t, uint16_t, uint32_t, uint64_t, int16_t
+
+from nes.bus.bus cimport CPUBus
+
+
+cdef uint8_t[32] LENGTH_TABLE
+cdef uint8_t[4][8] DUTY_TABLE
+cdef uint8_t[32] TRIANGLE_TABLE
+cdef uint16_t[16] NOISE_PERIOD
+cdef uint16_t[16] DMC_RATE
+# CPU cycles from one frame counter step to the next, 4-step and 5-step sequence
+cdef uint16_t[2][5] FRAME_STEP_CYCLES
+cdef double[31] PULSE_MIX
+cdef double[203] TND_MIX
+
+cdef class Envelope:
+    cdef bint start
+    cdef bint loop
+    cdef bint constant
+    # envelope divider period, also the volume in constant mode
+    cdef uint8_t period
+    cdef uint8_t divider
+    cdef uint8_t decay
+
+    cdef void clock(self)
+    cdef uint8_t volume(self)
+
+cdef class Pulse:
+    # pulse 1 negates its sweep with one's complement, pulse 2 with two's complement
+    cdef uint8_t channel
+    cdef bint enabled
+    cdef uint8_t duty
+    cdef uint8_t step
+    cdef uint16_t period
+    # CPU cycles until the sequencer moves on
+    cdef uint32_t timer
+    cdef uint8_t length
+    cdef bint halt
+    cdef Envelope envelope
+
+    cdef bint sweep_enabled
+    cdef bint sweep_negate
+    cdef bint sweep_reload
+    cdef uint8_t sweep_period
+    cdef uint8_t sweep_shift
+    cdef uint8_t sweep_divider
+
+    cdef void write(self, uint8_t, uint8_t)
+    cdef uint16_t sweep_target(self)
+    cdef bint audible(self)
+    cdef uint8_t output(self)
+    cdef void clock_timer(self)
+    cdef void clock_length(self)
+    cdef void clock_sweep(self)
+
+    cdef bytes save(self)
+    cdef void load(self, bytes)
+
+cdef class Triangle:
+    cdef bint enabled
+    cdef uint8_t step
+    cdef uint16_t period
+    cdef uint32_t timer
+    cdef uint8_t length
+    # length counter halt and linear counter control share one bit
+    cdef bint halt
+    cdef uint8_t linear
+    cdef uint8_t linear_period
+    cdef bint linear_reload
+
+    cdef void write(self, uint8_t, uint8_t)
+    cdef bint ticking(self)
+    cdef uint8_t output(self)
+    cdef void clock_timer(self)
+    cdef void clock_length(self)
+    cdef void clock_linear(self)
+
+    cdef bytes save(self)
+    cdef void load(self, bytes)
+
+cdef class Noise:
+    cdef bint enabled
+    cdef bint mode
+    cdef uint8_t period
+    cdef uint32_t timer
+    cdef uint8_t length
+    cdef bint halt
+    cdef uint16_t shift
+    cdef Envelope envelope
+
+    cdef void write(self, uint8_t, uint8_t)
+    cdef uint8_t output(self)
+    cdef void clock_timer(self)
+    cdef void clock_length(self)
+
+    cdef bytes save(self)
+    cdef void load(self, bytes)
+
+cdef class DMC:
+    cdef CPUBus bus
+
+    cdef bint IRQ_enable
+    cdef bint IRQ_flag
+    cdef bint loop
+    cdef uint8_t rate
+    cdef uint32_t timer
+    cdef uint8_t level
+
+    cdef uint16_t sample_address
+    cdef uint16_t sample_length
+    cdef uint16_t address
+    cdef uint16_t bytes_remaining
+
+    cdef uint8_t buffer
+    cdef bint buffer_empty
+    cdef uint8_t shift
+    cdef uint8_t bits_remaining
+    cdef bint silence
+
+    cdef void write(self, uint8_t, uint8_t)
+    cdef void restart(self)
+    cdef void fill(self) except *
+    cdef bint active(self)
+    cdef void clock_timer(self) except *
+
+    cdef bytes save(self)
+    cdef void load(self, bytes)
+
+cdef class APU2A03:
+    cdef public Pulse pulse1
+    cdef public Pulse pulse2
+    cdef public Triangle triangle
+    cdef public Noise noise
+    cdef public DMC dmc
+
+    cdef bint five_step
+    cdef bint IRQ_inhibit
+    cdef bint frame_IRQ
+    cdef uint8_t frame_step
+    # CPU cycles until the next frame counter step
+    cdef uint32_t frame_timer
+
+    # frame or DMC interrupt pending
+    cdef bint IRQ
+
+    # bus system clock the APU has been run up to, leftover PPU ticks of a CPU cycle
+    cdef uint32_t system_clock
+    cdef uint8_t pending_ticks
+    # system clocks after system_clock at which the bus has to catch up, so an IRQ is seen in time
+    cdef uint32_t sync_ticks
+
+    cdef public bint output_enabled
+    cdef public uint32_t sample_rate
+    cdef uint64_t cycles_per_sample
+    cdef uint64_t sample_fraction
+    cdef uint32_t sample_timer
+    cdef uint32_t sample_cycles
+    cdef double sample_sum
+    cdef double filter_alpha
+    cdef double filter_in
+    cdef double filter_out
+
+    # ring buffer of signed 16 bit mono samples
+    cdef public object samples
+    cdef int16_t[:] _samples
+    cdef public uint64_t samples_written
+    cdef public uint64_t samples_read
+
+    cpdef void set_output(self, uint32_t sample_rate, uint32_t buffer_size)
+    cpdef uint32_t available(self)
+    cpdef object read_samples(self, int count = *)
+
+    cdef void catch_up(self, uint32_t) except *
+    cdef void run(self, uint32_t) except *
+    cdef void schedule(self)
+    cdef void clock_quarter_frame(self)
+    cdef void clock_half_frame(self)
+    cdef void clock_frame_counter(self)
+    cdef double mix(self)
+    cdef void emit_sample(self)
+
+    cdef uint8_t readByCPU(self, uint16_t, bint)
+    cdef void writeByCPU(self, uint16_t, uint8_t) except *
+    cpdef void reset(self)
+    cpdef void power_up(self)
+
+    cdef bytes save_registers(self)
+    cdef void load_registers(self, bytes)
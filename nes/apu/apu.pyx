@@ -0,0 +1,690 @@
+import math
+import struct
+
+import numpy as np
+
+
+# NTSC CPU clock in Hz
+CPU_CLOCK = 1789773
+
+LENGTH_TABLE[:] = [
+    10, 254, 20,  2, 40,  4, 80,  6, 160,  8, 60, 10, 14, 12, 26, 14,
+    12,  16, 24, 18, 48, 20, 96, 22, 192, 24, 72, 26, 16, 28, 32, 30
+]
+DUTY_TABLE[0][:] = [0, 1, 0, 0, 0, 0, 0, 0]
+DUTY_TABLE[1][:] = [0, 1, 1, 0, 0, 0, 0, 0]
+DUTY_TABLE[2][:] = [0, 1, 1, 1, 1, 0, 0, 0]
+DUTY_TABLE[3][:] = [1, 0, 0, 1, 1, 1, 1, 1]
+TRIANGLE_TABLE[:] = [
+    15, 14, 13, 12, 11, 10,  9,  8,  7,  6,  5,  4,  3,  2,  1,  0,
+     0,  1,  2,  3,  4,  5,  6,  7,  8,  9, 10, 11, 12, 13, 14, 15
+]
+NOISE_PERIOD[:] = [4, 8, 16, 32, 64, 96, 128, 160, 202, 254, 380, 508, 762, 1016, 2034, 4068]
+DMC_RATE[:] = [428, 380, 340, 320, 286, 254, 226, 214, 190, 160, 142, 128, 106, 84, 72, 54]
+# steps fall on CPU cycle 7457, 14913, 22371, 29829 (and 37281), the sequence restarts 1 cycle later
+FRAME_STEP_CYCLES[0][:] = [7456, 7458, 7458, 7458, 0]
+FRAME_STEP_CYCLES[1][:] = [7456, 7458, 7458, 7452, 7458]
+
+PULSE_MIX[0] = 0.0
+for n in range(1, 31):
+    PULSE_MIX[n] = 95.52 / (8128.0 / n + 100.0)
+TND_MIX[0] = 0.0
+for n in range(1, 203):
+    TND_MIX[n] = 163.67 / (24329.0 / n + 100.0)
+
+# start, loop, constant volume, period, divider, decay
+ENVELOPE = struct.Struct("<6B")
+# enabled, duty, step, period, timer, length, halt, sweep enabled / negate / reload / period / shift / divider
+PULSE = struct.Struct("<3BHI8B")
+# enabled, step, period, timer, length, halt, linear counter / period / reload
+TRIANGLE = struct.Struct("<2BHI5B")
+# enabled, mode, period, timer, length, halt, shift register
+NOISE = struct.Struct("<3BI2BH")
+# IRQ enable / flag, loop, rate, timer, level, sample address / length, address, bytes remaining,
+# buffer, buffer empty, shift register, bits remaining, silence
+DMC_REGISTERS = struct.Struct("<4BIB4H5B")
+# 5-step mode, IRQ inhibit, frame IRQ, frame step, frame timer, system clock, pending ticks
+FRAME_COUNTER = struct.Struct("<4BIIB")
+
+
+cdef class Envelope:
+    def __init__(self) -> None:
+        self.start = False
+        self.loop = False
+        self.constant = False
+        self.period = 0
+        self.divider = 0
+        self.decay = 0
+
+    cdef void clock(self):
+        if self.start:
+            self.start = False
+            self.decay = 15
+            self.divider = self.period
+        elif self.divider == 0:
+            self.divider = self.period
+            if self.decay > 0:
+                self.decay -= 1
+            elif self.loop:
+                self.decay = 15
+        else:
+            self.divider -= 1
+
+    cdef uint8_t volume(self):
+        return self.period if self.constant else self.decay
+
+
+cdef class Pulse:
+    def __init__(self, uint8_t channel) -> None:
+        self.channel = channel
+        self.enabled = False
+        self.duty = 0
+        self.step = 0
+        self.period = 0
+        self.timer = 2
+        self.length = 0
+        self.halt = False
+        self.envelope = Envelope()
+        self.sweep_enabled = False
+        self.sweep_negate = False
+        self.sweep_reload = False
+        self.sweep_period = 0
+        self.sweep_shift = 0
+        self.sweep_divider = 0
+
+    cdef void write(self, uint8_t reg, uint8_t data):
+        if reg == 0:
+            self.duty = data >> 6
+            self.halt = (data >> 5) & 0x01
+            self.envelope.loop = self.halt
+            self.envelope.constant = (data >> 4) & 0x01
+            self.envelope.period = data & 0x0F
+        elif reg == 1:
+            self.sweep_enabled = data >> 7
+            self.sweep_period = (data >> 4) & 0x07
+            self.sweep_negate = (data >> 3) & 0x01
+            self.sweep_shift = data & 0x07
+            self.sweep_reload = True
+        elif reg == 2:
+            self.period = (self.period & 0x0700) | data
+        else:
+            self.period = (self.period & 0x00FF) | ((data & 0x07) << 8)
+            if self.enabled:
+                self.length = LENGTH_TABLE[data >> 3]
+            self.step = 0
+            self.envelope.start = True
+
+    cdef uint16_t sweep_target(self):
+        cdef int change = self.period >> self.sweep_shift
+        cdef int target
+        if self.sweep_negate:
+            target = self.period - change - (1 if self.channel == 1 else 0)
+            return target if target > 0 else 0
+        return self.period + change
+
+    cdef bint audible(self):
+        return self.length > 0 and self.period >= 8 and self.sweep_target() <= 0x07FF
+
+    cdef uint8_t output(self):
+        if not self.audible():
+            return 0
+        return DUTY_TABLE[self.duty][self.step] * self.envelope.volume()
+
+    cdef void clock_timer(self):
+        self.step = (self.step + 1) & 0x07
+        self.timer = (self.period + 1) * 2
+
+    cdef void clock_length(self):
+        if self.length > 0 and not self.halt:
+            self.length -= 1
+
+    cdef void clock_sweep(self):
+        cdef uint16_t target = self.sweep_target()
+        if self.sweep_divider == 0 and self.sweep_enabled and self.sweep_shift > 0 and self.period >= 8 and target <= 0x07FF:
+            self.period = target
+        if self.sweep_divider == 0 or self.sweep_reload:
+            self.sweep_divider = self.sweep_period
+            self.sweep_reload = False
+        else:
+            self.sweep_divider -= 1
+
+    cdef bytes save(self):
+        cdef Envelope envelope = self.envelope
+        return PULSE.pack(
+            self.enabled, self.duty, self.step, self.period, self.timer, self.length, self.halt,
+            self.sweep_enabled, self.sweep_negate, self.sweep_reload, self.sweep_period, self.sweep_shift, self.sweep_divider
+        ) + ENVELOPE.pack(envelope.start, envelope.loop, envelope.constant, envelope.period, envelope.divider, envelope.decay)
+
+    cdef void load(self, bytes data):
+        cdef Envelope envelope = self.envelope
+        self.enabled, self.duty, self.step, self.period, self.timer, self.length, self.halt, \
+            self.sweep_enabled, self.sweep_negate, self.sweep_reload, self.sweep_period, self.sweep_shift, self.sweep_divider = PULSE.unpack_from(data)
+        envelope.start, envelope.loop, envelope.constant, envelope.period, envelope.divider, envelope.decay = ENVELOPE.unpack_from(data, PULSE.size)
+
+
+cdef class Triangle:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.step = 0
+        self.period = 0
+        self.timer = 1
+        self.length = 0
+        self.halt = False
+        self.linear = 0
+        self.linear_period = 0
+        self.linear_reload = False
+
+    cdef void write(self, uint8_t reg, uint8_t data):
+        if reg == 0:
+            self.halt = data >> 7
+            self.linear_period = data & 0x7F
+        elif reg == 2:
+            self.period = (self.period & 0x0700) | data
+        elif reg == 3:
+            self.period = (self.period & 0x00FF) | ((data & 0x07) << 8)
+            if self.enabled:
+                self.length = LENGTH_TABLE[data >> 3]
+            self.linear_reload = True
+
+    cdef bint ticking(self):
+        # periods below 2 are ultrasonic, the sequencer is held instead of popping
+        return self.length > 0 and self.linear > 0 and self.period >= 2
+
+    cdef uint8_t output(self):
+        return TRIANGLE_TABLE[self.step]
+
+    cdef void clock_timer(self):
+        self.step = (self.step + 1) & 0x1F
+        self.timer = self.period + 1
+
+    cdef void clock_length(self):
+        if self.length > 0 and not self.halt:
+            self.length -= 1
+
+    cdef void clock_linear(self):
+        if self.linear_reload:
+            self.linear = self.linear_period
+        elif self.linear > 0:
+            self.linear -= 1
+        if not self.halt:
+            self.linear_reload = False
+
+    cdef bytes save(self):
+        return TRIANGLE.pack(
+            self.enabled, self.step, self.period, self.timer, self.length, self.halt,
+            self.linear, self.linear_period, self.linear_reload
+        )
+
+    cdef void load(self, bytes data):
+        self.enabled, self.step, self.period, self.timer, self.length, self.halt, \
+            self.linear, self.linear_period, self.linear_reload = TRIANGLE.unpack_from(data)
+
+
+cdef class Noise:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.mode = False
+        self.period = 0
+        self.timer = NOISE_PERIOD[0]
+        self.length = 0
+        self.halt = False
+        self.shift = 0x0001
+        self.envelope = Envelope()
+
+    cdef void write(self, uint8_t reg, uint8_t data):
+        if reg == 0:
+            self.halt = (data >> 5) & 0x01
+            self.envelope.loop = self.halt
+            self.envelope.constant = (data >> 4) & 0x01
+            self.envelope.period = data & 0x0F
+        elif reg == 2:
+            self.mode = data >> 7
+            self.period = data & 0x0F
+        elif reg == 3:
+            if self.enabled:
+                self.length = LENGTH_TABLE[data >> 3]
+            self.envelope.start = True
+
+    cdef uint8_t output(self):
+        if self.length == 0 or self.shift & 0x0001:
+            return 0
+        return self.envelope.volume()
+
+    cdef void clock_timer(self):
+        cdef uint16_t feedback = (self.shift ^ (self.shift >> (6 if self.mode else 1))) & 0x0001
+        self.shift = (self.shift >> 1) | (feedback << 14)
+        self.timer = NOISE_PERIOD[self.period]
+
+    cdef void clock_length(self):
+        if self.length > 0 and not self.halt:
+            self.length -= 1
+
+    cdef bytes save(self):
+        cdef Envelope envelope = self.envelope
+        return NOISE.pack(
+            self.enabled, self.mode, self.period, self.timer, self.length, self.halt, self.shift
+        ) + ENVELOPE.pack(envelope.start, envelope.loop, envelope.constant, envelope.period, envelope.divider, envelope.decay)
+
+    cdef void load(self, bytes data):
+        cdef Envelope envelope = self.envelope
+        self.enabled, self.mode, self.period, self.timer, self.length, self.halt, self.shift = NOISE.unpack_from(data)
+        envelope.start, envelope.loop, envelope.constant, envelope.period, envelope.divider, envelope.decay = ENVELOPE.unpack_from(data, NOISE.size)
+
+
+cdef class DMC:
+    def __init__(self, CPUBus bus) -> None:
+        self.bus = bus
+        self.IRQ_enable = False
+        self.IRQ_flag = False
+        self.loop = False
+        self.rate = 0
+        self.timer = DMC_RATE[0]
+        self.level = 0
+        self.sample_address = 0xC000
+        self.sample_length = 1
+        self.address = 0xC000
+        self.bytes_remaining = 0
+        self.buffer = 0
+        self.buffer_empty = True
+        self.shift = 0
+        self.bits_remaining = 8
+        self.silence = True
+
+    cdef void write(self, uint8_t reg, uint8_t data):
+        if reg == 0:
+            self.IRQ_enable = data >> 7
+            self.loop = (data >> 6) & 0x01
+            self.rate = data & 0x0F
+            if not self.IRQ_enable:
+                self.IRQ_flag = False
+        elif reg == 1:
+            self.level = data & 0x7F
+        elif reg == 2:
+            self.sample_address = 0xC000 | (data << 6)
+        else:
+            self.sample_length = (data << 4) | 0x0001
+
+    cdef void restart(self):
+        self.address = self.sample_address
+        self.bytes_remaining = self.sample_length
+
+    cdef void fill(self) except *:
+        '''
+        Memory reader: refill the sample buffer from $8000–$FFFF
+        '''
+        if not self.buffer_empty or self.bytes_remaining == 0:
+            return
+        self.buffer = self.bus.read(self.address, False)
+        self.buffer_empty = False
+        self.address = 0x8000 if self.address == 0xFFFF else self.address + 1
+        self.bytes_remaining -= 1
+        if self.bytes_remaining == 0:
+            if self.loop:
+                self.restart()
+            elif self.IRQ_enable:
+                self.IRQ_flag = True
+
+    cdef bint active(self):
+        return self.bytes_remaining > 0 or not self.buffer_empty or not self.silence
+
+    cdef void clock_timer(self) except *:
+        if not self.silence:
+            if self.shift & 0x01:
+                if self.level <= 125:
+                    self.level += 2
+            elif self.level >= 2:
+                self.level -= 2
+        self.shift >>= 1
+        self.bits_remaining -= 1
+        if self.bits_remaining == 0:
+            self.bits_remaining = 8
+            if self.buffer_empty:
+                self.silence = True
+            else:
+                self.silence = False
+                self.shift = self.buffer
+                self.buffer_empty = True
+                self.fill()
+        self.timer = DMC_RATE[self.rate]
+
+    cdef bytes save(self):
+        return DMC_REGISTERS.pack(
+            self.IRQ_enable, self.IRQ_flag, self.loop, self.rate, self.timer, self.level,
+            self.sample_address, self.sample_length, self.address, self.bytes_remaining,
+            self.buffer, self.buffer_empty, self.shift, self.bits_remaining, self.silence
+        )
+
+    cdef void load(self, bytes data):
+        self.IRQ_enable, self.IRQ_flag, self.loop, self.rate, self.timer, self.level, \
+            self.sample_address, self.sample_length, self.address, self.bytes_remaining, \
+            self.buffer, self.buffer_empty, self.shift, self.bits_remaining, self.silence = DMC_REGISTERS.unpack_from(data)
+
+
+cdef class APU2A03:
+    '''
+    Runs lazily: the channels are only advanced when the CPU touches an APU register,
+    when an IRQ may be due (sync_ticks) and at the end of a frame. Between those points
+    they are stepped from one timer event to the next and the mixed output is
+    box-filtered into samples.
+    '''
+    def __init__(self, CPUBus bus, uint32_t sample_rate = 44100, uint32_t buffer_size = 16384) -> None:
+        self.pulse1 = Pulse(1)
+        self.pulse2 = Pulse(2)
+        self.triangle = Triangle()
+        self.noise = Noise()
+        self.dmc = DMC(bus)
+        self.output_enabled = True
+        self.set_output(sample_rate, buffer_size)
+        self.power_up()
+
+    cpdef void set_output(self, uint32_t sample_rate, uint32_t buffer_size):
+        '''
+        sample_rate: output samples per second
+        buffer_size: capacity of the ring buffer in samples, unread samples are overwritten once it is full
+        '''
+        cdef double rc = 1.0 / (2.0 * math.pi * 90.0)
+
+        self.sample_rate = sample_rate
+        # 16.16 fixed point
+        self.cycles_per_sample = (<uint64_t> CPU_CLOCK << 16) // sample_rate
+        self.sample_fraction = 0
+        self.sample_timer = self.cycles_per_sample >> 16
+        self.sample_cycles = self.sample_timer
+        self.sample_sum = 0.0
+        # 90 Hz high-pass of the console's output stage, removes the DC offset of the mixer
+        self.filter_alpha = rc / (rc + 1.0 / sample_rate)
+        self.filter_in = 0.0
+        self.filter_out = 0.0
+
+        self.samples = np.zeros(buffer_size, dtype = np.int16)
+        self._samples = self.samples
+        self.samples_written = 0
+        self.samples_read = 0
+
+    cpdef uint32_t available(self):
+        return self.samples_written - self.samples_read
+
+    cpdef object read_samples(self, int count = -1):
+        '''
+        Takes up to count (all if negative) unread samples out of the ring buffer as an int16 array
+        '''
+        cdef uint32_t size = self._samples.shape[0]
+        cdef uint32_t start
+
+        if count < 0 or count > self.available():
+            count = self.available()
+        start = self.samples_read % size
+        self.samples_read += count
+        if start + count <= size:
+            return self.samples[start:start + count].copy()
+        return np.concatenate((self.samples[start:], self.samples[:start + count - size]))
+
+    cdef void catch_up(self, uint32_t system_clock) except *:
+        '''
+        Runs the channels up to system_clock of the bus (3 system clocks per CPU cycle)
+        '''
+        cdef uint32_t ticks = system_clock - self.system_clock
+
+        self.system_clock = system_clock
+        ticks += self.pending_ticks
+        self.pending_ticks = ticks % 3
+        if ticks >= 3:
+            self.run(ticks // 3)
+        self.IRQ = self.frame_IRQ or self.dmc.IRQ_flag
+        self.schedule()
+
+    cdef void run(self, uint32_t cycles) except *:
+        cdef uint32_t step
+        cdef bint pulse1, pulse2, triangle, noise, dmc
+
+        while cycles > 0:
+            pulse1 = self.pulse1.audible()
+            pulse2 = self.pulse2.audible()
+            triangle = self.triangle.ticking()
+            noise = self.noise.length > 0
+            dmc = self.dmc.active()
+
+            # run up to the next event, silent channels do not stop the batch
+            step = cycles
+            if self.frame_timer < step:
+                step = self.frame_timer
+            if self.output_enabled and self.sample_timer < step:
+                step = self.sample_timer
+            if pulse1 and self.pulse1.timer < step:
+                step = self.pulse1.timer
+            if pulse2 and self.pulse2.timer < step:
+                step = self.pulse2.timer
+            if triangle and self.triangle.timer < step:
+                step = self.triangle.timer
+            if noise and self.noise.timer < step:
+                step = self.noise.timer
+            if dmc and self.dmc.timer < step:
+                step = self.dmc.timer
+
+            if self.output_enabled:
+                self.sample_sum += self.mix() * step
+                self.sample_timer -= step
+            cycles -= step
+            self.frame_timer -= step
+
+            if pulse1:
+                self.pulse1.timer -= step
+                if self.pulse1.timer == 0:
+                    self.pulse1.clock_timer()
+            if pulse2:
+                self.pulse2.timer -= step
+                if self.pulse2.timer == 0:
+                    self.pulse2.clock_timer()
+            if triangle:
+                self.triangle.timer -= step
+                if self.triangle.timer == 0:
+                    self.triangle.clock_timer()
+            if noise:
+                self.noise.timer -= step
+                if self.noise.timer == 0:
+                    self.noise.clock_timer()
+            if dmc:
+                self.dmc.timer -= step
+                if self.dmc.timer == 0:
+                    self.dmc.clock_timer()
+
+            if self.frame_timer == 0:
+                self.clock_frame_counter()
+            if self.output_enabled and self.sample_timer == 0:
+                self.emit_sample()
+
+    cdef void schedule(self):
+        '''
+        Tells the bus how long it may run before an IRQ could be raised
+        '''
+        cdef uint32_t cycles = 0x3FFFFFFF
+        cdef uint32_t rate
+
+        # a pending IRQ stays raised until the CPU acknowledges it through $4015 / $4017 / $4010
+        if not self.IRQ:
+            if not self.five_step and not self.IRQ_inhibit:
+                cycles = self.frame_timer
+            if self.dmc.IRQ_enable and not self.dmc.loop and self.dmc.bytes_remaining > 0:
+                # the last byte can not be fetched before the ones in between were played
+                rate = DMC_RATE[self.dmc.rate]
+                if self.dmc.bytes_remaining > 2 and 8 * rate * (self.dmc.bytes_remaining - 2) < cycles:
+                    cycles = 8 * rate * (self.dmc.bytes_remaining - 2)
+                elif self.dmc.bytes_remaining <= 2 and self.dmc.timer < cycles:
+                    cycles = self.dmc.timer
+        self.sync_ticks = 3 * cycles - self.pending_ticks if cycles > 0 else 0
+
+    cdef void clock_quarter_frame(self):
+        self.pulse1.envelope.clock()
+        self.pulse2.envelope.clock()
+        self.noise.envelope.clock()
+        self.triangle.clock_linear()
+
+    cdef void clock_half_frame(self):
+        self.pulse1.clock_length()
+        self.pulse1.clock_sweep()
+        self.pulse2.clock_length()
+        self.pulse2.clock_sweep()
+        self.triangle.clock_length()
+        self.noise.clock_length()
+
+    cdef void clock_frame_counter(self):
+        cdef uint8_t step = self.frame_step
+
+        if self.five_step:
+            if step != 3:
+                self.clock_quarter_frame()
+            if step == 1 or step == 4:
+                self.clock_half_frame()
+            self.frame_step = (step + 1) % 5
+            self.frame_timer = FRAME_STEP_CYCLES[1][step]
+        else:
+            self.clock_quarter_frame()
+            if step == 1 or step == 3:
+                self.clock_half_frame()
+            if step == 3 and not self.IRQ_inhibit:
+                self.frame_IRQ = True
+            self.frame_step = (step + 1) % 4
+            self.frame_timer = FRAME_STEP_CYCLES[0][step]
+
+    cdef double mix(self):
+        return PULSE_MIX[self.pulse1.output() + self.pulse2.output()] \
+            + TND_MIX[3 * self.triangle.output() + 2 * self.noise.output() + self.dmc.level]
+
+    cdef void emit_sample(self):
+        cdef double value = self.sample_sum / self.sample_cycles
+        cdef double sample
+        cdef uint32_t size = self._samples.shape[0]
+
+        self.filter_out = self.filter_alpha * (self.filter_out + value - self.filter_in)
+        self.filter_in = value
+        sample = self.filter_out * 32767.0
+        if sample > 32767.0:
+            sample = 32767.0
+        elif sample < -32768.0:
+            sample = -32768.0
+        self._samples[self.samples_written % size] = <int16_t> sample
+        self.samples_written += 1
+        if self.samples_written - self.samples_read > size:
+            self.samples_read = self.samples_written - size
+
+        self.sample_sum = 0.0
+        self.sample_fraction += self.cycles_per_sample
+        self.sample_timer = self.sample_fraction >> 16
+        self.sample_fraction &= 0xFFFF
+        self.sample_cycles = self.sample_timer
+
+    cdef uint8_t readByCPU(self, uint16_t addr, bint readonly):
+        cdef uint8_t data = 0x00
+
+        if addr == 0x4015:
+            data = (self.pulse1.length > 0) \
+                | (self.pulse2.length > 0) << 1 \
+                | (self.triangle.length > 0) << 2 \
+                | (self.noise.length > 0) << 3 \
+                | (self.dmc.bytes_remaining > 0) << 4 \
+                | self.frame_IRQ << 6 \
+                | self.dmc.IRQ_flag << 7
+            if not readonly:
+                self.frame_IRQ = False
+                self.IRQ = self.dmc.IRQ_flag
+                self.schedule()
+        return data
+
+    cdef void writeByCPU(self, uint16_t addr, uint8_t data) except *:
+        if addr <= 0x4003:
+            # $4000–$4003: Pulse 1
+            self.pulse1.write(addr & 0x0003, data)
+        elif addr <= 0x4007:
+            # $4004–$4007: Pulse 2
+            self.pulse2.write(addr & 0x0003, data)
+        elif addr <= 0x400B:
+            # $4008–$400B: Triangle
+            self.triangle.write(addr & 0x0003, data)
+        elif addr <= 0x400F:
+            # $400C–$400F: Noise
+            self.noise.write(addr & 0x0003, data)
+        elif addr <= 0x4013:
+            # $4010–$4013: DMC
+            self.dmc.write(addr & 0x0003, data)
+        elif addr == 0x4015:
+            # $4015: Status, channel enables
+            self.pulse1.enabled = data & 0x01
+            self.pulse2.enabled = (data >> 1) & 0x01
+            self.triangle.enabled = (data >> 2) & 0x01
+            self.noise.enabled = (data >> 3) & 0x01
+            if not self.pulse1.enabled:
+                self.pulse1.length = 0
+            if not self.pulse2.enabled:
+                self.pulse2.length = 0
+            if not self.triangle.enabled:
+                self.triangle.length = 0
+            if not self.noise.enabled:
+                self.noise.length = 0
+            self.dmc.IRQ_flag = False
+            if data & 0x10:
+                if self.dmc.bytes_remaining == 0:
+                    self.dmc.restart()
+                self.dmc.fill()
+            else:
+                self.dmc.bytes_remaining = 0
+        elif addr == 0x4017:
+            # $4017: Frame Counter
+            self.five_step = data >> 7
+            self.IRQ_inhibit = (data >> 6) & 0x01
+            if self.IRQ_inhibit:
+                self.frame_IRQ = False
+            self.frame_step = 0
+            self.frame_timer = 7457
+            if self.five_step:
+                self.clock_quarter_frame()
+                self.clock_half_frame()
+        self.IRQ = self.frame_IRQ or self.dmc.IRQ_flag
+        self.schedule()
+
+    cpdef void reset(self):
+        '''
+        Silences all channels like a write of $00 to $4015, the frame counter keeps its mode
+        '''
+        self.writeByCPU(0x4015, 0x00)
+        self.frame_IRQ = False
+        self.frame_step = 0
+        self.frame_timer = 7457
+        self.system_clock = 0
+        self.pending_ticks = 0
+        self.IRQ = self.dmc.IRQ_flag
+        self.schedule()
+
+    cpdef void power_up(self):
+        self.pulse1 = Pulse(1)
+        self.pulse2 = Pulse(2)
+        self.triangle = Triangle()
+        self.noise = Noise()
+        self.dmc = DMC(self.dmc.bus)
+        self.five_step = False
+        self.IRQ_inhibit = False
+        self.reset()
+
+    cdef bytes save_registers(self):
+        return b"".join([
+            self.pulse1.save(), self.pulse2.save(), self.triangle.save(), self.noise.save(), self.dmc.save(),
+            FRAME_COUNTER.pack(self.five_step, self.IRQ_inhibit, self.frame_IRQ, self.frame_step, self.frame_timer,
+                               self.system_clock, self.pending_ticks)
+        ])
+
+    cdef void load_registers(self, bytes data):
+        cdef int offset = 0
+
+        self.pulse1.load(data[offset:])
+        offset += PULSE.size + ENVELOPE.size
+        self.pulse2.load(data[offset:])
+        offset += PULSE.size + ENVELOPE.size
+        self.triangle.load(data[offset:])
+        offset += TRIANGLE.size
+        self.noise.load(data[offset:])
+        offset += NOISE.size + ENVELOPE.size
+        self.dmc.load(data[offset:])
+        offset += DMC_REGISTERS.size
+        self.five_step, self.IRQ_inhibit, self.frame_IRQ, self.frame_step, self.frame_timer, \
+            self.system_clock, self.pending_ticks = FRAME_COUNTER.unpack_from(data, offset)
+        self.IRQ = self.frame_IRQ or self.dmc.IRQ_flag
+        self.schedule()
@@ -0,0 +1,241 @@
+import multiprocessing
+import os
+import traceback
+
+import numpy as np
+
+from nes.console import Console
+from nes.file_loader import FileLoader
+from nes.framebuffer import SCREEN_HEIGHT, SCREEN_WIDTH
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python 3.7
+    shared_memory = None
+
+
+RAM_SIZE = 2048
+
+
+def _layout(count: int, ram: bool) -> tuple:
+    '''
+    (name, dtype, shape, offset) of the arrays of a batch of count consoles, and the total size in bytes
+    '''
+    fields = [
+        ("sequence", np.uint32, (count, 1)),
+        ("controllers", np.uint8, (count, 2)),
+        ("frames", np.uint8, (count, SCREEN_HEIGHT, SCREEN_WIDTH, 3)),
+        ("frame_index", np.uint8, (count, SCREEN_HEIGHT, SCREEN_WIDTH)),
+    ]
+    if ram:
+        fields.append(("ram", np.uint8, (count, RAM_SIZE)))
+    layout, offset = [], 0
+    for name, dtype, shape in fields:
+        layout.append((name, dtype, shape, offset))
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+        # keep every array 8 byte aligned
+        offset = (offset + 7) & ~7
+    return layout, max(offset, 1)
+
+
+def _arrays(layout: list, buffer) -> dict:
+    return {name: np.ndarray(shape, dtype = dtype, buffer = buffer, offset = offset) for name, dtype, shape, offset in layout}
+
+
+class _Shard:
+    '''
+    Consoles first..last - 1 of a batch, publishing into the rows of the batch arrays
+    '''
+    def __init__(self, roms: list, first: int, arrays: dict, idle_skip: bool, blocks: bool) -> None:
+        cartridges = {}
+        self.first = first
+        self.arrays = arrays
+        self.consoles = []
+        for index, rom in enumerate(roms, first):
+            if isinstance(rom, str):
+                if rom not in cartridges:
+                    cartridges[rom] = FileLoader.load(rom)
+                rom = cartridges[rom]
+            console = Console(rom.clone())
+            console.bus.idle_loop.enabled = idle_skip
+            console.bus.blocks.enabled = blocks
+            console.bus.ppu.set_frame_buffers(arrays["frames"][index], arrays["frame_index"][index], arrays["sequence"][index])
+            self.consoles.append(console)
+
+    def power_up(self) -> None:
+        for console in self.consoles:
+            console.power_up()
+        self.observe()
+
+    def step(self, frames: int) -> None:
+        controllers = self.arrays["controllers"]
+        for index, console in enumerate(self.consoles, self.first):
+            console.set_controllers(controllers[index, 0], controllers[index, 1])
+            # only the last frame is observed
+            console.fast_forward(frames)
+        self.observe()
+
+    def observe(self) -> None:
+        ram = self.arrays.get("ram")
+        if ram is not None:
+            for index, console in enumerate(self.consoles, self.first):
+                console.bus.copy_ram(ram[index])
+
+    def close(self) -> None:
+        '''
+        Moves the PPUs back to frame buffers of their own
+        '''
+        for console in self.consoles:
+            console.bus.ppu.set_frame_buffers(None, None, None)
+        self.arrays = None
+
+
+def _worker(connection, name: str, count: int, ram: bool, roms: list, first: int, idle_skip: bool, blocks: bool) -> None:
+    memory = shared_memory.SharedMemory(name = name)
+    try:
+        layout, _ = _layout(count, ram)
+        shard = _Shard(roms, first, _arrays(layout, memory.buf), idle_skip, blocks)
+        connection.send(None)
+        while True:
+            command = connection.recv()
+            if command is None:
+                break
+            try:
+                if command == "power_up":
+                    shard.power_up()
+                else:
+                    shard.step(command)
+                connection.send(None)
+            except Exception:
+                connection.send(traceback.format_exc())
+        # the views must be gone before the block can be closed
+        shard.close()
+        shard = None
+    except Exception:
+        connection.send(traceback.format_exc())
+    finally:
+        memory.close()
+
+
+class ConsoleBatch:
+    '''
+    Steps K consoles in parallel worker processes by one or more frames in a single call and returns their
+    observations stacked into arrays allocated once: frames (K, 240, 256, 3) and, with ram set, ram (K, 2048).
+    All arrays live in one shared memory block (Python 3.8+) the PPU of every console publishes straight
+    into, nothing is copied or pickled per step.
+
+    processes = 0 steps the consoles one after the other in the calling process instead, e.g. to reach
+    them through consoles: the core holds the GIL while it runs, so this is never parallel. It is also
+    what the default falls back to without shared memory or for Cartridge objects.
+    '''
+    def __init__(self, roms: list, ram: bool = False, processes: int = None, idle_skip: bool = True, blocks: bool = True) -> None:
+        '''
+        roms:      per console, path of a .nes file or a Cartridge (cloned, paths only with worker processes)
+        processes: worker processes the consoles are split over, None for one per CPU core
+        '''
+        self.count = len(roms)
+        if self.count == 0:
+            raise ValueError("a batch needs at least one console")
+        if processes is None:
+            in_process = shared_memory is None or not all(isinstance(rom, str) for rom in roms)
+            processes = 0 if in_process else os.cpu_count() or 1
+        self.processes = min(processes, self.count)
+        layout, size = _layout(self.count, ram)
+        self.__memory = None
+        self.__shard = None
+        self.__workers = []
+
+        if self.processes <= 0:
+            arrays = _arrays(layout, bytearray(size))
+            self.__shard = _Shard(roms, 0, arrays, idle_skip, blocks)
+        else:
+            if shared_memory is None:
+                raise RuntimeError("worker processes need multiprocessing.shared_memory (Python 3.8+)")
+            if not all(isinstance(rom, str) for rom in roms):
+                raise ValueError("worker processes load their ROMs from paths")
+            self.__memory = shared_memory.SharedMemory(create = True, size = size)
+            arrays = _arrays(layout, self.__memory.buf)
+            bounds = np.linspace(0, self.count, self.processes + 1).astype(int)
+            for first, last in zip(bounds[:-1], bounds[1:]):
+                connection, worker_connection = multiprocessing.Pipe()
+                process = multiprocessing.Process(target = _worker, daemon = True,
+                    args = (worker_connection, self.__memory.name, self.count, ram, roms[first:last], int(first), idle_skip, blocks))
+                process.start()
+                self.__workers.append((process, connection))
+            try:
+                self.__wait()
+            except Exception:
+                arrays = None
+                self.close()
+                raise
+
+        self.controllers = arrays["controllers"]
+        self.frames = arrays["frames"]
+        self.frame_index = arrays["frame_index"]
+        self.ram = arrays.get("ram")
+        self.power_up()
+
+    @property
+    def consoles(self) -> list:
+        '''
+        The Console objects, only in the calling process (processes == 0)
+        '''
+        return self.__shard.consoles if self.__shard is not None else []
+
+    def __send(self, command) -> None:
+        if self.__shard is not None:
+            if command == "power_up":
+                self.__shard.power_up()
+            else:
+                self.__shard.step(command)
+            return
+        for _, connection in self.__workers:
+            connection.send(command)
+        self.__wait()
+
+    def __wait(self) -> None:
+        errors = [error for error in (connection.recv() for _, connection in self.__workers) if error is not None]
+        if errors:
+            raise RuntimeError("console batch worker failed:\n" + errors[0])
+
+    def power_up(self) -> tuple:
+        self.controllers[:] = 0
+        self.__send("power_up")
+        return self.frames, self.ram
+
+    def step(self, controllers = None, frames: int = 1) -> tuple:
+        '''
+        Runs frames frames on every console and returns (frames, ram), the batch arrays themselves (ram is None
+        unless observed): they are overwritten by the next step.
+        controllers: uint8 (K, 2) button bytes of both ports per console (bit 7..0: A B SELECT START UP DOWN LEFT RIGHT),
+                     None keeps the buttons of the last step held
+        '''
+        if controllers is not None:
+            controllers = np.asarray(controllers, dtype = np.uint8)
+            if controllers.shape != self.controllers.shape:
+                raise ValueError("controllers must have the shape ({}, 2)".format(self.count))
+            self.controllers[:] = controllers
+        self.__send(int(frames))
+        return self.frames, self.ram
+
+    def close(self) -> None:
+        for process, connection in self.__workers:
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+            process.join()
+            connection.close()
+        self.__workers = []
+        if self.__memory is not None:
+            self.controllers = self.frames = self.frame_index = self.ram = None
+            self.__memory.close()
+            self.__memory.unlink()
+            self.__memory = None
+
+    def __enter__(self) -> "ConsoleBatch":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
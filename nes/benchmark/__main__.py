@@ -0,0 +1,6 @@
+import sys
+
+from nes.benchmark.suite import main
+
+
+sys.exit(main())
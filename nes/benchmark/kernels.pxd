@@ -0,0 +1,9 @@
+from libc.stdint cimport uint8_t, uint16_t, uint64_t
+
+from nes.bus.bus cimport CPUBus
+from nes.ppu.ppu cimport PPU2C02
+
+
+cpdef tuple run_cpu(CPUBus bus, uint64_t instructions)
+cpdef tuple run_ppu(PPU2C02 ppu, uint64_t dots)
+cpdef tuple run_bus(CPUBus bus, uint64_t ops)
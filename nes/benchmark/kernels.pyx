@@ -0,0 +1,51 @@
+from time import perf_counter
+
+from nes.cpu.cpu cimport CPU6502
+
+
+cpdef tuple run_cpu(CPUBus bus, uint64_t instructions):
+    '''
+    Clocks the CPU alone until it has started the given number of instructions.
+    Returns (instructions, cycles, seconds)
+    '''
+    cdef CPU6502 cpu = bus.cpu
+    cdef uint64_t executed = 0
+    cdef uint64_t cycles = 0
+
+    start = perf_counter()
+    while True:
+        if cpu.remaining_cycles == 0:
+            if executed == instructions:
+                break
+            executed += 1
+        cpu.clock()
+        cycles += 1
+    return executed, cycles, perf_counter() - start
+
+cpdef tuple run_ppu(PPU2C02 ppu, uint64_t dots):
+    '''
+    Clocks the PPU alone, NMIs are left pending. Returns (dots, seconds)
+    '''
+    cdef uint64_t dot
+
+    start = perf_counter()
+    for dot in range(dots):
+        ppu.clock()
+    ppu.flush()
+    return dots, perf_counter() - start
+
+cpdef tuple run_bus(CPUBus bus, uint64_t ops):
+    '''
+    Mix of CPU bus accesses: RAM reads / writes, PRG ROM reads and PPUSTATUS reads,
+    one quarter each. Returns (ops, seconds), ops rounded down to a multiple of 4
+    '''
+    cdef uint64_t i
+    cdef uint8_t data = 0
+
+    start = perf_counter()
+    for i in range(ops // 4):
+        data ^= bus.read(i & 0x07FF, False)
+        bus.write(0x0800 | (i & 0x07FF), data)
+        data ^= bus.read(0x8000 | (i & 0x7FFF), False)
+        data ^= bus.read(0x2002, False)
+    return ops - ops % 4, perf_counter() - start
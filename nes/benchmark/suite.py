@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+# roms/ of the source tree, the default for --roms
+project_dir = Path(__file__).resolve().parent.parent.parent
+
+from nes.console import Console
+from nes.file_loader import FileLoader
+from nes.benchmark.kernels import run_cpu, run_ppu, run_bus
+
+
+RESULT_VERSION = 1
+
+# synthetic 6502 programs, assembled at $C000 and looping forever
+PROGRAMS = {
+    # register arithmetic and a counted branch
+    "alu": bytes([
+        0xA2, 0x00,             # C000  LDX #$00
+        0xA0, 0x10,             # C002  LDY #$10
+        0xA9, 0x01,             # C004  LDA #$01
+        0x69, 0x03,             # C006  ADC #$03
+        0xE9, 0x01,             # C008  SBC #$01
+        0x29, 0x7F,             # C00A  AND #$7F
+        0x49, 0x55,             # C00C  EOR #$55
+        0x09, 0x02,             # C00E  ORA #$02
+        0x0A,                   # C010  ASL A
+        0x4A,                   # C011  LSR A
+        0xE8,                   # C012  INX
+        0x88,                   # C013  DEY
+        0xD0, 0xF0,             # C014  BNE $C006
+        0x4C, 0x00, 0xC0,       # C016  JMP $C000
+    ]),
+    # indexed / indirect RAM and ROM accesses
+    "memory": bytes([
+        0xA2, 0x00,             # C000  LDX #$00
+        0xBD, 0x00, 0x02,       # C002  LDA $0200,X
+        0x9D, 0x00, 0x03,       # C005  STA $0300,X
+        0xB5, 0x10,             # C008  LDA $10,X
+        0x95, 0x20,             # C00A  STA $20,X
+        0xE6, 0x40,             # C00C  INC $40
+        0xAD, 0x00, 0xC0,       # C00E  LDA $C000
+        0xB1, 0x50,             # C011  LDA ($50),Y
+        0xE8,                   # C013  INX
+        0xD0, 0xEC,             # C014  BNE $C002
+        0x4C, 0x00, 0xC0,       # C016  JMP $C000
+    ]),
+    # subroutine calls and stack traffic
+    "stack": bytes([
+        0x20, 0x0A, 0xC0,       # C000  JSR $C00A
+        0x48,                   # C003  PHA
+        0x68,                   # C004  PLA
+        0x08,                   # C005  PHP
+        0x28,                   # C006  PLP
+        0x4C, 0x00, 0xC0,       # C007  JMP $C000
+        0xE8,                   # C00A  INX
+        0xC8,                   # C00B  INY
+        0x60,                   # C00C  RTS
+    ]),
+}
+
+
+def program_console(program: bytes) -> Console:
+    '''
+    Console running program from an NROM cartridge, reset / NMI / IRQ vectors all point to $C000
+    '''
+    PRG_ROM = bytearray(16384)
+    PRG_ROM[:len(program)] = program
+    PRG_ROM[0x3FFA:0x4000] = bytes([0x00, 0xC0] * 3)
+    with tempfile.NamedTemporaryFile(suffix = ".nes", delete = False) as rom_file:
+        rom_file.write(b"NES\x1a\x01\x01\x00\x00" + bytes(8) + bytes(PRG_ROM) + bytes(8192))
+    try:
+        # a copy of the cartridge does not keep the file mapped, so it can be deleted
+        console = Console(FileLoader.load(rom_file.name).clone())
+    finally:
+        os.remove(rom_file.name)
+    console.power_up()
+    return console
+
+
+def best(runs: list) -> tuple:
+    '''
+    (count, seconds) of the fastest run, the others are noise from the machine
+    '''
+    return min(runs, key = lambda run: run[1] / run[0])
+
+
+def result(count: int, seconds: float, unit: str) -> dict:
+    return {"value": count / seconds, "unit": unit, "count": count, "seconds": seconds}
+
+
+class BenchmarkSuite:
+    '''
+    Throughput of the CPU, PPU and bus on their own and of whole frames on the bundled ROMs.
+    Every benchmark runs repeat times, the best run is kept.
+    '''
+    def __init__(self, roms: list, repeat: int = 3, instructions: int = 2000000, dots: int = 262 * 341 * 60,
+                 bus_ops: int = 2000000, warm_up: int = 120, frames: int = 300) -> None:
+        self.roms = roms
+        self.repeat = repeat
+        self.instructions = instructions
+        self.dots = dots
+        self.bus_ops = bus_ops
+        self.warm_up = warm_up
+        self.frames = frames
+
+    def config(self) -> dict:
+        return {
+            "roms": [os.path.basename(rom) for rom in self.roms],
+            "repeat": self.repeat,
+            "instructions": self.instructions,
+            "dots": self.dots,
+            "bus_ops": self.bus_ops,
+            "warm_up": self.warm_up,
+            "frames": self.frames,
+        }
+
+    def warmed_up(self, rom: str) -> Console:
+        console = Console(rom)
+        console.power_up()
+        for _ in range(self.warm_up):
+            console.frame()
+        return console
+
+    def cpu(self) -> dict:
+        results = {}
+        for name, program in PROGRAMS.items():
+            runs = []
+            for _ in range(self.repeat):
+                console = program_console(program)
+                run_cpu(console.bus, 10000)
+                executed, cycles, seconds = run_cpu(console.bus, self.instructions)
+                runs.append((executed, seconds))
+            results["cpu." + name] = result(*best(runs), "instructions/s")
+        return results
+
+    def ppu(self) -> dict:
+        results = {}
+        for rom in self.roms:
+            runs = []
+            for _ in range(self.repeat):
+                console = self.warmed_up(rom)
+                runs.append(run_ppu(console.bus.ppu, self.dots))
+            results["ppu." + Path(rom).stem] = result(*best(runs), "dots/s")
+        return results
+
+    def bus(self) -> dict:
+        runs = []
+        for _ in range(self.repeat):
+            console = program_console(PROGRAMS["alu"])
+            runs.append(run_bus(console.bus, self.bus_ops))
+        return {"bus.mixed": result(*best(runs), "ops/s")}
+
+    def frame(self) -> dict:
+        results = {}
+        for rom in self.roms:
+            runs = []
+            for _ in range(self.repeat):
+                console = self.warmed_up(rom)
+                start = time.perf_counter()
+                for _ in range(self.frames):
+                    console.frame()
+                runs.append((self.frames, time.perf_counter() - start))
+            results["frame." + Path(rom).stem] = result(*best(runs), "frames/s")
+        return results
+
+    def run(self, groups: list) -> dict:
+        results = {}
+        for group in groups:
+            results.update(getattr(self, group)())
+        return {
+            "version": RESULT_VERSION,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": self.config(),
+            "results": results,
+        }
+
+
+def compare(current: dict, baseline: dict) -> list:
+    '''
+    Rows (name, baseline, current, change) for results present in both,
+    change is the relative difference of the throughput
+    '''
+    rows = []
+    for name, entry in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name]["value"]
+        rows.append((name, before, entry["value"], entry["value"] / before - 1.0))
+    return rows
+
+
+def main(argv: list = None) -> int:
+    groups = ["cpu", "ppu", "bus", "frame"]
+
+    parser = argparse.ArgumentParser(description = "Measure CPU / PPU / bus / frame throughput")
+    parser.add_argument("--roms", default = str(project_dir / "roms"), help = "directory of .nes files for the PPU and frame benchmarks")
+    parser.add_argument("-g", "--groups", nargs = "+", choices = groups, default = groups, help = "benchmarks to run")
+    parser.add_argument("-r", "--repeat", type = int, default = 3, help = "runs per benchmark, the best one counts")
+    parser.add_argument("--quick", action = "store_true", help = "a tenth of the default work, for smoke tests")
+    parser.add_argument("-o", "--output", help = "write the results to this JSON file")
+    parser.add_argument("-c", "--compare", help = "baseline JSON file to compare against")
+    parser.add_argument("-t", "--threshold", type = float, default = 0.05, help = "relative slowdown reported as regression")
+    args = parser.parse_args(argv)
+
+    roms = sorted(str(rom) for rom in Path(args.roms).glob("*.nes"))
+    suite = BenchmarkSuite(roms, args.repeat)
+    if args.quick:
+        suite.instructions //= 10
+        suite.dots //= 10
+        suite.bus_ops //= 10
+        suite.warm_up //= 10
+        suite.frames //= 10
+    report = suite.run(args.groups)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent = 2)
+    else:
+        print(json.dumps(report, indent = 2))
+
+    if not args.compare:
+        return 0
+    with open(args.compare) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = 0
+    for name, before, after, change in compare(report, baseline):
+        regressed = change < -args.threshold
+        regressions += regressed
+        print("{:<40} {:>14.1f} {:>14.1f} {:>+8.1%}{}".format(name, before, after, change, "  REGRESSION" if regressed else ""),
+              file = sys.stderr)
+    return 1 if regressions > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+from libc.stdint cimport uint8_t, uint16_t, uint32_t, uint64_t
+
+from nes.bus.bus cimport CPUBus
+
+
+# longest block, in instructions
+cdef int MAX_BLOCK_INSTRUCTIONS
+
+cdef enum DecodedFlags:
+    # reads / writes memory at the address the operands resolve to
+    ACCESS_READ = 1
+    ACCESS_WRITE = 2
+    # branches, jumps and returns: the last instruction of a block
+    BLOCK_END = 4
+    # never run from a block
+    BLOCK_EXCLUDED = 8
+
+cdef struct DecodedInstruction:
+    uint8_t opcode
+    uint8_t lo
+    uint8_t hi
+    uint8_t length
+    uint8_t flags
+
+cdef class DecodedPage:
+    # page the instructions were decoded from and its 256 bytes at the time
+    cdef uint8_t* source
+    cdef uint8_t[256] content
+    # instruction starting at every offset of the page
+    cdef DecodedInstruction[256] instructions
+    # instructions / bytes of the block starting at every offset, 0 instructions until looked for
+    cdef uint8_t[256] block_count
+    cdef uint16_t[256] block_bytes
+
+cdef class BlockCache:
+    cdef CPUBus bus
+
+    cdef public bint enabled
+    # instructions run from blocks, and how many blocks they were run in
+    cdef public uint64_t instructions
+    cdef public uint64_t blocks
+
+    # page pointer -> DecodedPage
+    cdef dict pages
+    # DecodedPage of what is mapped into every CPU page right now, None until needed
+    cdef list current
+
+    cpdef void clear(self)
+    cdef DecodedPage page(self, uint8_t)
+    cdef void decode(self, DecodedPage)
+    cdef uint8_t find_block(self, DecodedPage, uint8_t)
+    cdef bint direct(self, DecodedInstruction*, uint8_t*)
+    cdef bint run(self) except *
+    cdef void advance(self, uint32_t) except *
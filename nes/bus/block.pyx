@@ -0,0 +1,240 @@
+from libc.stdint cimport uintptr_t
+from libc.string cimport memcmp, memcpy
+
+from nes.cpu.cpu cimport CPU6502
+from nes.ppu.ppu cimport PPU2C02
+from nes.bus.idle cimport IdleLoop, IDLE_CONFIRMED
+from nes.cpu.cpu_op cimport AddressingMode, Instruction, OP_ADDRMODE, OP_INSTRUCTION, ADDRMODE_LENGTH
+
+
+MAX_BLOCK_INSTRUCTIONS = 32
+
+cdef uint8_t[256] OP_FLAGS
+
+cdef uint8_t flags(uint8_t opcode):
+    cdef uint8_t mode = OP_ADDRMODE[opcode]
+    cdef uint8_t instruction = OP_INSTRUCTION[opcode]
+
+    if instruction == Instruction.BRK:
+        return BLOCK_EXCLUDED
+    if mode == AddressingMode.REL or instruction == Instruction.JSR or instruction == Instruction.RTS or instruction == Instruction.RTI:
+        return BLOCK_END
+    if instruction == Instruction.JMP:
+        # JMP ($xxxx) reads its target from memory
+        return BLOCK_END | (ACCESS_READ if mode == AddressingMode.IND else 0)
+    if instruction == Instruction.STA or instruction == Instruction.STX or instruction == Instruction.STY:
+        return ACCESS_WRITE
+    if instruction == Instruction.ASL or instruction == Instruction.LSR or instruction == Instruction.ROL or instruction == Instruction.ROR \
+        or instruction == Instruction.INC or instruction == Instruction.DEC:
+        return 0 if mode == AddressingMode.IMP else ACCESS_READ | ACCESS_WRITE
+    if instruction == Instruction.ADC or instruction == Instruction.SBC or instruction == Instruction.AND or instruction == Instruction.ORA \
+        or instruction == Instruction.EOR or instruction == Instruction.BIT or instruction == Instruction.CMP or instruction == Instruction.CPX \
+        or instruction == Instruction.CPY or instruction == Instruction.LDA or instruction == Instruction.LDX or instruction == Instruction.LDY:
+        return ACCESS_READ
+    return 0
+
+for opcode in range(256):
+    OP_FLAGS[opcode] = flags(opcode)
+
+cdef class DecodedPage:
+    pass
+
+cdef class BlockCache:
+    '''
+    Runs of instructions up to the next branch, jump or return, decoded once per 256 byte page of whatever
+    the mapper has switched in and run back to back while nothing but the CPU can act: the PPU is clocked
+    through the cycles they took afterwards, stopping short of the next clock that raises NMI, reaches the
+    cycle mappers count scanlines on, completes the frame or lets the APU catch up. Instructions reaching
+    anything but RAM / ROM end a block before them and run through the bus as usual, so results are identical.
+    Decoded pages are kept per bank, a block is checked against the bytes it was decoded from before it runs
+    and its page decoded again if code was written over.
+    '''
+    def __init__(self, CPUBus bus) -> None:
+        self.bus = bus
+        self.enabled = True
+        self.instructions = 0
+        self.blocks = 0
+        self.clear()
+
+    cpdef void clear(self):
+        self.pages = {}
+        self.current = [None] * 256
+
+    cdef DecodedPage page(self, uint8_t number):
+        '''
+        Decoded instructions of CPU page number, None if it is not directly readable
+        '''
+        cdef uint8_t* source = self.bus.read_pages[number]
+        cdef DecodedPage page = self.current[number]
+
+        if page is not None and page.source == source:
+            return page
+        # code running from the stack page would be written over by every push
+        if source == NULL or source == self.bus.read_pages[0x01]:
+            return None
+        page = self.pages.get(<uintptr_t> source)
+        if page is None:
+            page = DecodedPage()
+            page.source = source
+            self.decode(page)
+            self.pages[<uintptr_t> source] = page
+        self.current[number] = page
+        return page
+
+    cdef void decode(self, DecodedPage page):
+        cdef int offset
+        cdef uint8_t opcode
+        cdef DecodedInstruction* instruction
+
+        memcpy(page.content, page.source, 256)
+        for offset in range(256):
+            opcode = page.content[offset]
+            instruction = &page.instructions[offset]
+            instruction.opcode = opcode
+            instruction.length = ADDRMODE_LENGTH[OP_ADDRMODE[opcode]]
+            instruction.flags = OP_FLAGS[opcode]
+            # instructions reaching into the next page never go into a block
+            instruction.lo = page.content[offset + 1] if offset < 255 else 0
+            instruction.hi = page.content[offset + 2] if offset < 254 else 0
+            page.block_count[offset] = 0
+
+    cdef uint8_t find_block(self, DecodedPage page, uint8_t start):
+        cdef int offset = start
+        cdef uint8_t count = 0
+        cdef DecodedInstruction* instruction
+
+        while count < MAX_BLOCK_INSTRUCTIONS and offset < 256:
+            instruction = &page.instructions[offset]
+            if instruction.flags & BLOCK_EXCLUDED or offset + instruction.length > 256:
+                break
+            count += 1
+            offset += instruction.length
+            if instruction.flags & BLOCK_END:
+                break
+        page.block_count[start] = count
+        page.block_bytes[start] = offset - start
+        return count
+
+    cdef bint direct(self, DecodedInstruction* instruction, uint8_t* code):
+        '''
+        The memory an instruction with ACCESS_READ / ACCESS_WRITE reads / writes at its operand address is
+        RAM / ROM accessed without the bus, and it writes nothing over the page it runs from
+        '''
+        cdef CPUBus bus = self.bus
+        cdef uint8_t mode = OP_ADDRMODE[instruction.opcode]
+        cdef uint8_t* zero_page = bus.read_pages[0x00]
+        cdef uint8_t X = bus.cpu.registers.X
+        cdef uint8_t Y = bus.cpu.registers.Y
+        cdef uint16_t addr
+
+        if mode == AddressingMode.IMM:
+            return True
+        if zero_page == NULL and (mode == AddressingMode.IZX or mode == AddressingMode.IZY):
+            # the zero page is watched, see Breakpoints
+            return False
+        if mode == AddressingMode.ZP0:
+            addr = instruction.lo
+        elif mode == AddressingMode.ZPX:
+            addr = <uint8_t> (instruction.lo + X)
+        elif mode == AddressingMode.ZPY:
+            addr = <uint8_t> (instruction.lo + Y)
+        elif mode == AddressingMode.ABX:
+            addr = <uint16_t> (((instruction.hi << 8) | instruction.lo) + X)
+        elif mode == AddressingMode.ABY:
+            addr = <uint16_t> (((instruction.hi << 8) | instruction.lo) + Y)
+        elif mode == AddressingMode.IZX:
+            addr = zero_page[<uint8_t> (instruction.lo + X)] | (zero_page[<uint8_t> (instruction.lo + X + 1)] << 8)
+        elif mode == AddressingMode.IZY:
+            addr = <uint16_t> ((zero_page[instruction.lo] | (zero_page[<uint8_t> (instruction.lo + 1)] << 8)) + Y)
+        else:
+            # ABS and the pointer of IND, which is read from one page
+            addr = (instruction.hi << 8) | instruction.lo
+        if instruction.flags & ACCESS_READ and bus.read_pages[addr >> 8] == NULL:
+            return False
+        if instruction.flags & ACCESS_WRITE and (bus.write_pages[addr >> 8] == NULL or bus.write_pages[addr >> 8] == code):
+            return False
+        return True
+
+    cdef bint run(self) except *:
+        '''
+        In place of bus.clock() on the clock the CPU fetches an instruction: runs the block starting at PC.
+        False if not even its first instruction could be run this way.
+        '''
+        cdef CPUBus bus = self.bus
+        cdef CPU6502 cpu = bus.cpu
+        cdef IdleLoop idle_loop = bus.idle_loop
+        cdef uint16_t PC = cpu.registers.PC
+        cdef uint8_t offset = PC & 0xFF
+        cdef DecodedPage page
+        cdef DecodedInstruction* instruction
+        cdef uint8_t count, executed
+        cdef uint8_t SP
+        # clocks from now until the first one anything but the CPU acts on, to the instruction fetched last
+        cdef uint32_t horizon, clocks, last = 0
+
+        # bus.clock() lets the APU catch up or delivers an IRQ on this clock
+        if bus.nSystemClockCounter - bus.apu.system_clock >= bus.apu.sync_ticks or bus.cartridge.mapper.IRQ_state() \
+            or (bus.apu.IRQ and not cpu.registers.status.bits.I):
+            return False
+        if idle_loop.enabled and idle_loop.state == IDLE_CONFIRMED and PC == idle_loop.start:
+            return False
+        page = self.page(PC >> 8)
+        if page is None:
+            return False
+        count = page.block_count[offset]
+        if count == 0:
+            count = self.find_block(page, offset)
+        if count < 2:
+            return False
+        if memcmp(&page.content[offset], &page.source[offset], page.block_bytes[offset]) != 0:
+            self.decode(page)
+            count = self.find_block(page, offset)
+            if count < 2:
+                return False
+
+        horizon = min(bus.ppu.quiet_dots(), bus.apu.sync_ticks - (bus.nSystemClockCounter - bus.apu.system_clock))
+        # the second instruction is fetched 6 clocks after the first one at the earliest
+        if horizon <= 6:
+            return False
+        instruction = &page.instructions[offset]
+        if instruction.flags & (ACCESS_READ | ACCESS_WRITE) and not self.direct(instruction, page.source):
+            return False
+
+        for executed in range(count):
+            instruction = &page.instructions[offset]
+            if executed > 0:
+                clocks = last + 3 * (cpu.remaining_cycles + 1)
+                if clocks >= horizon or (bus.apu.IRQ and not cpu.registers.status.bits.I) \
+                    or (instruction.flags & (ACCESS_READ | ACCESS_WRITE) and not self.direct(instruction, page.source)):
+                    break
+                # the instruction before runs to its end
+                cpu.clock_count += cpu.remaining_cycles
+                cpu.remaining_cycles = 0
+                last = clocks
+                self.instructions += 1
+            SP = cpu.registers.SP
+            cpu.execute(instruction.opcode, instruction.lo, instruction.hi)
+            if idle_loop.enabled:
+                idle_loop.observe(PC, SP)
+            PC += instruction.length
+            offset += instruction.length
+
+        self.instructions += 1
+        self.blocks += 1
+        self.advance(last + 1)
+        return True
+
+    cdef void advance(self, uint32_t clocks) except *:
+        '''
+        Clocks the PPU through clocks the CPU has run ahead, none of them one anything else acts on
+        '''
+        cdef PPU2C02 ppu = self.bus.ppu
+        cdef uint32_t dots
+
+        self.bus.nSystemClockCounter += clocks
+        while clocks > 0:
+            dots = ppu.skip(clocks)
+            if dots == 0:
+                ppu.clock()
+                dots = 1
+            clocks -= dots
@@ -0,0 +1,69 @@
+from libc.stdint cimport uint8_t, uint16_t, uint32_t, int32_t
+
+# register conditions checked at once
+cdef int MAX_CONDITIONS
+
+cdef enum WatchFlags:
+    WATCH_READ = 1
+    WATCH_WRITE = 2
+    # execution breakpoint, CPU addresses only
+    WATCH_EXECUTE = 4
+
+cdef enum ConditionRegister:
+    REGISTER_A
+    REGISTER_X
+    REGISTER_Y
+    REGISTER_SP
+    REGISTER_P
+
+cdef struct RegisterCondition:
+    uint8_t target
+    uint8_t mask
+    uint8_t value
+    # only checked at this PC, -1 at every instruction
+    int32_t PC
+
+# below the enums, which bus.pxd cimports back
+from nes.bus.bus cimport CPUBus
+
+
+cdef class Breakpoints:
+    cdef CPUBus bus
+
+    # WatchFlags of every CPU address ($0000-$FFFF) and PPU address ($0000-$3FFF)
+    cdef uint8_t[0x10000] CPU_flags
+    cdef uint8_t[0x4000] PPU_flags
+    # addresses of every CPU page watched for reads / writes, a page is unmapped while they are not 0
+    cdef uint16_t[256] CPU_reads
+    cdef uint16_t[256] CPU_writes
+    # CPU addresses watched for reads or writes, executed CPU addresses, watched PPU addresses
+    cdef uint32_t CPU_watched, CPU_executed, PPU_watched
+
+    cdef RegisterCondition[16] conditions
+    cdef int condition_count
+
+    # something is set: Console.frame runs run_frame
+    cdef public bint active
+    # cause of the last stop, None if the last frame ran to its end
+    cdef public dict hit
+    # address of the instruction started last
+    cdef uint16_t instruction_PC
+    # the instruction stopped before, not stopped at again when the next frame goes on from it
+    cdef int32_t resume_PC
+
+    cpdef void add_breakpoint(self, uint16_t)
+    cpdef void remove_breakpoint(self, uint16_t)
+    cpdef void add_watchpoint(self, uint16_t, str mode = *, bint PPU = *)
+    cpdef void remove_watchpoint(self, uint16_t, str mode = *, bint PPU = *)
+    cpdef void add_condition(self, str, uint8_t, uint8_t mask = *, int32_t PC = *) except *
+    cpdef void clear(self)
+
+    cdef void set_flags(self, uint16_t, uint8_t, bint, bint)
+    cdef void set_flag(self, uint32_t, uint8_t, bint, bint)
+    cdef void update(self)
+    cdef void unmap_page(self, uint8_t)
+    cdef void unmap_pages(self)
+    cdef void watch_hit(self, uint8_t, bint, uint16_t, uint8_t)
+    cdef bint check_instruction(self)
+    cdef void stop(self, str, uint16_t, int32_t)
+    cdef bint run_frame(self) except *
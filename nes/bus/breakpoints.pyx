@@ -0,0 +1,265 @@
+from libc.string cimport memset
+
+from nes.cpu.cpu cimport CPU6502
+
+
+MAX_CONDITIONS = 16
+
+REGISTERS = {"A": REGISTER_A, "X": REGISTER_X, "Y": REGISTER_Y, "SP": REGISTER_SP, "P": REGISTER_P}
+
+cdef uint8_t mode_flags(str mode) except 0:
+    cdef uint8_t flags = 0
+
+    for character in mode.lower():
+        if character == "r":
+            flags |= WATCH_READ
+        elif character == "w":
+            flags |= WATCH_WRITE
+        else:
+            raise ValueError("watchpoint mode must be made of 'r' and 'w', not '{}'".format(mode))
+    if flags == 0:
+        raise ValueError("watchpoint mode must be made of 'r' and 'w', not '{}'".format(mode))
+    return flags
+
+cdef class Breakpoints:
+    '''
+    Execution breakpoints, read / write watchpoints and conditions on register values. While any is set,
+    Console.frame runs the frame through run_frame, which checks them at every instruction and stops early
+    at the first hit (see hit); the next Console.frame goes on from there. Without any, nothing is checked.
+
+    Pages holding a watched CPU address lose their direct access, so accesses to them go through
+    CPUBus.read / write and are checked there. PPU watchpoints catch the CPU accessing PPU memory
+    through PPUDATA ($2007), not the fetches of rendering.
+    '''
+    def __init__(self, CPUBus bus) -> None:
+        self.bus = bus
+        self.clear()
+
+    cpdef void add_breakpoint(self, uint16_t addr):
+        '''
+        Stops before the instruction at addr
+        '''
+        self.set_flag(addr, WATCH_EXECUTE, False, True)
+        self.update()
+
+    cpdef void remove_breakpoint(self, uint16_t addr):
+        self.set_flag(addr, WATCH_EXECUTE, False, False)
+        self.update()
+
+    cpdef void add_watchpoint(self, uint16_t addr, str mode = "rw", bint PPU = False):
+        '''
+        Stops after the instruction reading (mode "r") / writing ("w") / accessing ("rw") addr,
+        of the PPU address space with PPU set. Mirrors of addr are watched too.
+        '''
+        self.set_flags(addr, mode_flags(mode), PPU, True)
+        self.update()
+
+    cpdef void remove_watchpoint(self, uint16_t addr, str mode = "rw", bint PPU = False):
+        self.set_flags(addr, mode_flags(mode), PPU, False)
+        self.update()
+
+    cpdef void add_condition(self, str register, uint8_t value, uint8_t mask = 0xFF, int32_t PC = -1) except *:
+        '''
+        Stops before an instruction (at PC, or any with PC = -1) while register (A, X, Y, SP, P) & mask == value
+        '''
+        cdef RegisterCondition* condition
+
+        if register.upper() not in REGISTERS:
+            raise ValueError("register must be one of {}, not '{}'".format(", ".join(REGISTERS), register))
+        if self.condition_count >= MAX_CONDITIONS:
+            raise ValueError("at most {} register conditions can be set".format(MAX_CONDITIONS))
+        condition = &self.conditions[self.condition_count]
+        condition.target = REGISTERS[register.upper()]
+        condition.mask = mask
+        condition.value = value & mask
+        condition.PC = PC
+        self.condition_count += 1
+        self.update()
+
+    cpdef void clear(self):
+        cdef bint unmapped = self.CPU_watched > 0
+
+        memset(self.CPU_flags, 0, sizeof(self.CPU_flags))
+        memset(self.PPU_flags, 0, sizeof(self.PPU_flags))
+        memset(self.CPU_reads, 0, sizeof(self.CPU_reads))
+        memset(self.CPU_writes, 0, sizeof(self.CPU_writes))
+        self.CPU_watched, self.CPU_executed, self.PPU_watched = 0, 0, 0
+        self.condition_count = 0
+        self.hit = None
+        self.resume_PC = -1
+        self.update()
+        if unmapped:
+            self.bus.map_pages()
+
+    cdef void set_flags(self, uint16_t addr, uint8_t flags, bint PPU, bint watched):
+        cdef uint32_t mirror
+        cdef uint32_t first = addr, last = addr, step = 1
+
+        if PPU:
+            addr &= 0x3FFF
+            first, last = addr, addr
+            if addr >= 0x3F00:
+                # palette RAM repeats every 32 bytes
+                first, last, step = 0x3F00 | (addr & 0x1F), 0x3FFF, 0x20
+            elif addr >= 0x3000:
+                # $3000-$3EFF mirror $2000-$2EFF
+                first, last, step = addr - 0x1000, addr, 0x1000
+            elif 0x2000 <= addr < 0x2F00:
+                first, last, step = addr, addr + 0x1000, 0x1000
+        elif addr < 0x2000:
+            # 2KB of RAM mirrored 4 times
+            first, last, step = addr & 0x07FF, 0x1FFF, 0x0800
+        elif addr < 0x4000:
+            # 8 PPU registers repeated up to $3FFF
+            first, last, step = 0x2000 | (addr & 0x0007), 0x3FFF, 0x0008
+
+        for mirror in range(first, last + 1, step):
+            self.set_flag(mirror, flags, PPU, watched)
+
+    cdef void set_flag(self, uint32_t addr, uint8_t flags, bint PPU, bint watched):
+        cdef uint8_t old, new, changed
+        cdef uint8_t page = addr >> 8
+
+        if PPU:
+            old = self.PPU_flags[addr]
+            new = (old | flags) if watched else (old & ~flags)
+            self.PPU_flags[addr] = new
+            if (old != 0) != (new != 0):
+                self.PPU_watched += 1 if new != 0 else -1
+            return
+
+        old = self.CPU_flags[addr]
+        new = (old | flags) if watched else (old & ~flags)
+        self.CPU_flags[addr] = new
+        changed = old ^ new
+        if changed & WATCH_EXECUTE:
+            self.CPU_executed += 1 if new & WATCH_EXECUTE else -1
+        if (old & (WATCH_READ | WATCH_WRITE) != 0) != (new & (WATCH_READ | WATCH_WRITE) != 0):
+            self.CPU_watched += 1 if new & (WATCH_READ | WATCH_WRITE) else -1
+        if changed & WATCH_READ:
+            self.CPU_reads[page] += 1 if new & WATCH_READ else -1
+        if changed & WATCH_WRITE:
+            self.CPU_writes[page] += 1 if new & WATCH_WRITE else -1
+
+        # only a page whose first address got watched or whose last one stopped being watched is mapped again
+        if (changed & WATCH_READ and self.CPU_reads[page] == (1 if watched else 0)) or \
+                (changed & WATCH_WRITE and self.CPU_writes[page] == (1 if watched else 0)):
+            self.bus.map_page(page)
+            self.unmap_page(page)
+            self.bus.idle_loop.reset()
+
+    cdef void update(self):
+        self.active = self.CPU_executed > 0 or self.CPU_watched > 0 or self.PPU_watched > 0 or self.condition_count > 0
+        self.bus.watch = &self.CPU_flags[0] if self.CPU_watched > 0 else NULL
+        self.bus.ppu.watch = &self.PPU_flags[0] if self.PPU_watched > 0 else NULL
+
+    cdef void unmap_page(self, uint8_t page):
+        if self.CPU_reads[page] > 0:
+            self.bus.read_pages[page] = NULL
+        if self.CPU_writes[page] > 0:
+            self.bus.write_pages[page] = NULL
+
+    cdef void unmap_pages(self):
+        '''
+        Sends accesses to pages holding watched addresses through CPUBus.read / write, called whenever
+        the bus has mapped its pages
+        '''
+        cdef int page
+
+        for page in range(256):
+            self.unmap_page(page)
+
+    cdef void watch_hit(self, uint8_t flag, bint PPU, uint16_t addr, uint8_t value):
+        '''
+        Called by the bus / PPU on an access with flag set for addr
+        '''
+        if self.hit is not None:
+            return
+        self.stop("read" if flag == WATCH_READ else "write", self.instruction_PC, -1)
+        self.hit["space"] = "PPU" if PPU else "CPU"
+        self.hit["addr"] = addr
+        self.hit["value"] = value
+
+    cdef bint check_instruction(self):
+        '''
+        On the clock the CPU fetches its next instruction: True if it is stopped at
+        '''
+        cdef CPU6502 cpu = self.bus.cpu
+        cdef uint16_t PC = cpu.registers.PC
+        cdef RegisterCondition* condition
+        cdef uint8_t value
+        cdef int i
+
+        self.instruction_PC = PC
+        if PC == self.resume_PC:
+            self.resume_PC = -1
+            return False
+        self.resume_PC = -1
+        if self.CPU_flags[PC] & WATCH_EXECUTE:
+            self.stop("breakpoint", PC, PC)
+            return True
+        for i in range(self.condition_count):
+            condition = &self.conditions[i]
+            if condition.PC >= 0 and condition.PC != PC:
+                continue
+            if condition.target == REGISTER_A:
+                value = cpu.registers.A
+            elif condition.target == REGISTER_X:
+                value = cpu.registers.X
+            elif condition.target == REGISTER_Y:
+                value = cpu.registers.Y
+            elif condition.target == REGISTER_SP:
+                value = cpu.registers.SP
+            else:
+                value = cpu.registers.status.value & 0xFF
+            if value & condition.mask == condition.value:
+                self.stop("condition", PC, PC)
+                self.hit["condition"] = i
+                return True
+        return False
+
+    cdef void stop(self, str cause, uint16_t PC, int32_t resume_PC):
+        self.hit = {
+            "cause": cause,
+            "PC": PC,
+            "scanline": self.bus.ppu.scanline,
+            "cycle": self.bus.ppu.cycle,
+        }
+        self.resume_PC = resume_PC
+
+    cdef bint run_frame(self) except *:
+        '''
+        Same as the loops of Console.frame, instruction by instruction without blocks or idle loop
+        skipping. False if it stopped at a hit before the frame was complete.
+        '''
+        cdef CPUBus bus = self.bus
+        cdef uint32_t ticks
+
+        self.hit = None
+        while True:
+            # clocks until the CPU fetches its next instruction
+            ticks = (3 - bus.nSystemClockCounter % 3) % 3 + 3 * bus.cpu.remaining_cycles
+            if ticks == 0 and not bus.dma_transfer:
+                if self.check_instruction():
+                    return False
+                bus.clock()
+            elif ticks == 0 or bus.per_clock or bus.dma_transfer:
+                bus.clock()
+            else:
+                bus.catch_up(ticks)
+            if self.hit is not None:
+                return False
+            if bus.ppu.frame_complete:
+                break
+        # the CPU may fetch one more instruction before it completes, which is checked the same way
+        while True:
+            ticks = (3 - bus.nSystemClockCounter % 3) % 3 + 3 * bus.cpu.remaining_cycles
+            if ticks == 0 and not bus.dma_transfer:
+                if self.check_instruction():
+                    return False
+            bus.clock()
+            if self.hit is not None:
+                return False
+            if bus.cpu.complete():
+                break
+        return True
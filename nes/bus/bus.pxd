@@ -1,9 +1,13 @@
 from libc.stdint cimport uint8_t, uint16_t, uint32_t
+from libc.string cimport memcpy
 
 from nes.cart.cart cimport Cartridge
 from nes.cpu.cpu cimport CPU6502
 from nes.ppu.ppu cimport PPU2C02
-# from nes.apu.apu cimport APU2A03
+from nes.apu.apu cimport APU2A03
+from nes.bus.idle cimport IdleLoop
+from nes.bus.block cimport BlockCache
+from nes.bus.breakpoints cimport Breakpoints, WATCH_READ, WATCH_WRITE
 
 
 cdef class CPUBus:
@@ -19,14 +23,33 @@ cdef class CPUBus:
     cdef bint dma_dummy
     cdef bint dma_transfer
 
+    cdef public bint per_clock
+
+    # 256 byte pages CPU reads / writes can access directly, NULL for I/O and mapper registers
+    cdef uint8_t* read_pages[256]
+    cdef uint8_t* write_pages[256]
+    # WatchFlags of every address while a CPU address is watched, else NULL
+    cdef uint8_t* watch
+
     cdef public CPU6502 cpu 
     cdef public PPU2C02 ppu
-    # cdef public APU2A03 apu
-    cdef Cartridge cartridge
+    cdef public APU2A03 apu
+    cdef public Cartridge cartridge
+    cdef public IdleLoop idle_loop
+    cdef public BlockCache blocks
+    cdef public Breakpoints breakpoints
+
+    cdef void map_page(self, uint8_t)
+    cdef void map_pages(self)
+    cdef void map_cartridge_pages(self)
 
     cpdef uint8_t read(self, uint16_t, bint)
+    cpdef bytes dump_ram(self)
+    cpdef void copy_ram(self, uint8_t[::1]) except *
     cpdef void write(self, uint16_t, uint8_t)
     cpdef void reset(self)
     cpdef void power_up(self)
     cpdef void clock(self)
+    cdef void step(self) except *
+    cdef void catch_up(self, uint32_t) except *
     cpdef void run_frame(self)
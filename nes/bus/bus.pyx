@@ -1,6 +1,3 @@
-import pygame
-
-
 cdef class CPUBus:
     def __init__(self, Cartridge cartridge) -> None:
         self.ram = [0x00] * 2 * 1024
@@ -15,14 +12,58 @@ cdef class CPUBus:
         self.dma_dummy = True
         self.dma_transfer = False
 
+        self.per_clock = False
+
         self.cpu = CPU6502(self)
         self.ppu = PPU2C02(self)
-        # self.apu = APU2A03()
+        self.apu = APU2A03(self)
+        self.idle_loop = IdleLoop(self)
+        self.blocks = BlockCache(self)
+        self.watch = NULL
         self.cartridge = cartridge
         self.cartridge.connect_bus(self)
         self.ppu.connectCartridge(self.cartridge)
+        self.map_pages()
+        self.breakpoints = Breakpoints(self)
+
+    cdef void map_page(self, uint8_t page):
+        if page < 0x20:
+            # $0000–$07FF: 2KB internal RAM and its mirrors up to $1FFF
+            self.read_pages[page] = &self.cpu.ram[(page & 0x07) << 8]
+            self.write_pages[page] = self.read_pages[page]
+        elif page < 0x60:
+            # $2000–$5FFF: PPU / APU / I/O registers and expansion area
+            self.read_pages[page] = NULL
+            self.write_pages[page] = NULL
+        else:
+            # $6000–$FFFF: PRG RAM and PRG ROM banks
+            self.read_pages[page] = self.cartridge.readPageByCPU(page << 8)
+            self.write_pages[page] = self.cartridge.writePageByCPU(page << 8)
+
+    cdef void map_pages(self):
+        cdef int page
+
+        for page in range(0x00, 0x60):
+            self.map_page(page)
+        self.map_cartridge_pages()
+        self.ppu.map_pages()
+        self.idle_loop.reset()
+        self.blocks.clear()
+
+    cdef void map_cartridge_pages(self):
+        cdef int page
+
+        for page in range(0x60, 0x100):
+            self.map_page(page)
+        self.cartridge.mapper.PRG_switched = False
+        if self.watch != NULL:
+            self.breakpoints.unmap_pages()
 
     cpdef uint8_t read(self, uint16_t addr, bint readOnly):
+        cdef uint8_t* page = self.read_pages[addr >> 8]
+        if page != NULL:
+            return page[addr & 0xFF]
+
         success, data = self.cartridge.readByCPU(addr)
         if success:
             # $4020–$FFFF: Cartridge space: PRG ROM, PRG RAM, and mapper registers
@@ -37,17 +78,36 @@ cdef class CPUBus:
             data = self.ppu.readByCPU(addr & 0x0007, readOnly)
         elif addr == 0x4015:
             # $4015: APU Status
-            # data = self.apu.readByCPU(addr)
-            pass
+            self.apu.catch_up(self.nSystemClockCounter)
+            data = self.apu.readByCPU(addr, readOnly)
         elif 0x4016 <= addr <= 0x4017:
             # $4016:  I/O registers Joystick 1 data
             # $4017:  I/O registers Joystick 2 data       
             data = 1 if (self.controller_state[addr & 0x0001] & 0x80) > 0 else 0
             self.controller_state[addr & 0x0001] <<= 1
+        if self.watch != NULL and not readOnly and self.watch[addr] & WATCH_READ:
+            self.breakpoints.watch_hit(WATCH_READ, False, addr, data)
         return data
 
     cpdef void write(self, uint16_t addr, uint8_t data):
+        cdef uint8_t* page = self.write_pages[addr >> 8]
+        if page != NULL:
+            page[addr & 0xFF] = data
+            return
+
+        if self.watch != NULL and self.watch[addr] & WATCH_WRITE:
+            self.breakpoints.watch_hit(WATCH_WRITE, False, addr, data)
+        if addr >= 0x4020 and self.cartridge.mapper.CHR_switchable:
+            # a CHR bank switch must not reach the dots the PPU has put off
+            self.ppu.flush()
+        if addr >= 0x4020 and self.apu.dmc.bytes_remaining > 0:
+            # nor a PRG bank switch the sample bytes the DMC has yet to fetch
+            self.apu.catch_up(self.nSystemClockCounter)
         success = self.cartridge.writeByCPU(addr, data)
+        if self.cartridge.mapper.PRG_switched:
+            self.map_cartridge_pages()
+        if self.cartridge.mapper.CHR_switched or self.cartridge.mapper.mirror_switched:
+            self.ppu.map_pages()
         if success:
             # $4020–$FFFF: Cartridge space: PRG ROM, PRG RAM, and mapper registers
             pass
@@ -66,8 +126,8 @@ cdef class CPUBus:
             # $4010–$4013: DMC
             # $4015: Status
             # $4017: Frame Counter
-            # self.apu.writeByCPU(addr, data)
-            pass
+            self.apu.catch_up(self.nSystemClockCounter)
+            self.apu.writeByCPU(addr, data)
         elif addr == 0x4014:
             # $4014: Copy 256 bytes from $xx00-$xxFF into OAM via OAMDATA ($2004)
             self.dma_page = data
@@ -78,11 +138,26 @@ cdef class CPUBus:
             # $4017: Frame counter control
             self.controller_state[addr & 0x0001] = self.controller[addr & 0x0001]
 
+    cpdef bytes dump_ram(self):
+        '''
+        Copy of the 2KB internal RAM at $0000–$07FF
+        '''
+        return bytes(self.cpu.ram)
+
+    cpdef void copy_ram(self, uint8_t[::1] out) except *:
+        '''
+        Copies the 2KB internal RAM into out, e.g. a row of a preallocated array
+        '''
+        if out.shape[0] < 2048:
+            raise ValueError("RAM buffer must hold 2048 bytes")
+        memcpy(&out[0], &self.cpu.ram[0], 2048)
+
     cpdef void reset(self):
         self.cartridge.reset()
+        self.map_pages()
         self.cpu.reset()
         self.ppu.reset()
-        # self.apu.reset()
+        self.apu.reset()
         self.nSystemClockCounter = 0
         self.dma_page = 0x00
         self.dma_addr = 0x00
@@ -92,8 +167,10 @@ cdef class CPUBus:
 
     cpdef void power_up(self):
         self.cartridge.reset()
+        self.map_pages()
         self.cpu.power_up()
         self.ppu.reset()
+        self.apu.power_up()
         self.nSystemClockCounter = 0
         self.dma_page = 0x00
         self.dma_addr = 0x00
@@ -104,6 +181,9 @@ cdef class CPUBus:
     cpdef void clock(self):
         cdef uint8_t cycles = 0
 
+        if self.nSystemClockCounter - self.apu.system_clock >= self.apu.sync_ticks:
+            self.apu.catch_up(self.nSystemClockCounter)
+
         self.ppu.clock()
         if self.nSystemClockCounter % 3 == 0:
             if self.dma_transfer:
@@ -120,6 +200,8 @@ cdef class CPUBus:
                             self.dma_transfer = False
                             self.dma_dummy = True
             else:
+                if self.apu.IRQ and self.cpu.remaining_cycles == 0:
+                    self.cpu.irq()
                 cycles = self.cpu.clock()
         if self.ppu.nmi:
             self.ppu.nmi = False
@@ -130,10 +212,77 @@ cdef class CPUBus:
             self.cpu.irq()
 
         self.nSystemClockCounter += 1
-        # self.apu.clock(cycles)
+
+    cdef void step(self) except *:
+        '''
+        Advance to the next point where the CPU has to be synced with the PPU:
+        the next instruction is executed on its own clock, the clocks in
+        between are run by catch_up. DMA and per_clock use clock() as is.
+        Idle loops are run through by idle_loop, see IdleLoop, runs of
+        instructions that only touch RAM / ROM by blocks, see BlockCache.
+        '''
+        cdef uint32_t ticks
+
+        if self.per_clock or self.dma_transfer:
+            self.clock()
+            return
+        # clocks until the CPU fetches its next instruction
+        ticks = (3 - self.nSystemClockCounter % 3) % 3 + 3 * self.cpu.remaining_cycles
+        if ticks == 0:
+            if self.blocks.enabled and self.blocks.run():
+                return
+            if self.idle_loop.enabled:
+                self.idle_loop.instruction()
+            else:
+                self.clock()
+        else:
+            self.catch_up(ticks)
+
+    cdef void catch_up(self, uint32_t ticks) except *:
+        '''
+        Same as calling clock() ticks times while the CPU is busy with an instruction,
+        stops early once NMI / mapper IRQ were delivered or the frame is complete
+        '''
+        cdef bint sync
+        cdef uint32_t dots, first
+
+        while ticks > 0:
+            # dots the scanline renderer puts off go by at once, nothing can happen on them
+            # (up to the counter wrapping around, which shifts the clocks CPU cycles fall on)
+            dots = self.ppu.skip(ticks) if self.nSystemClockCounter <= <uint32_t> 0xFFFFFFFF - ticks else 0
+            if dots > 0:
+                # CPU cycles among them
+                first = (3 - self.nSystemClockCounter % 3) % 3
+                if dots > first:
+                    self.cpu.clock_count += (dots - first + 2) // 3
+                    self.cpu.remaining_cycles -= (dots - first + 2) // 3
+                self.nSystemClockCounter += dots
+                ticks -= dots
+                continue
+            self.ppu.clock()
+            if self.nSystemClockCounter % 3 == 0:
+                self.cpu.clock_count += 1
+                self.cpu.remaining_cycles -= 1
+
+            sync = False
+            if self.ppu.nmi:
+                self.ppu.nmi = False
+                self.cpu.nmi()
+                sync = True
+            # mapper IRQs are only raised by PPU.clock() through mapper.scanline() at cycle 260
+            if self.ppu.cycle == 260 and self.cartridge.mapper.IRQ_state():
+                self.cartridge.mapper.IRQ_clear()
+                self.cpu.irq()
+                sync = True
+
+            self.nSystemClockCounter += 1
+            ticks -= 1
+            if sync or self.ppu.frame_complete:
+                return
 
     cpdef void run_frame(self):
-        _clock = pygame.time.Clock()
         for _ in range(262):
             for self.ppu.cycle in range(341):               
                 self.clock()
+        self.idle_loop.unobserved()
+        self.apu.catch_up(self.nSystemClockCounter)
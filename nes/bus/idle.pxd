@@ -0,0 +1,72 @@
+from libc.stdint cimport uint8_t, uint16_t, uint32_t, uint64_t
+
+from nes.bus.bus cimport CPUBus
+
+
+# longest loop looked at, in instructions and in bytes from the backward jump to its target
+cdef int MAX_LOOP_INSTRUCTIONS
+cdef int MAX_LOOP_BYTES
+
+cdef enum IdleState:
+    IDLE_NONE
+    # one iteration of the loop is being checked
+    IDLE_RECORDING
+    # the loop repeats itself until an interrupt
+    IDLE_CONFIRMED
+
+# CPU registers and the internals save states keep, as left by an instruction
+cdef struct CPUSnapshot:
+    uint16_t PC
+    uint8_t SP
+    uint8_t A
+    uint8_t X
+    uint8_t Y
+    uint8_t P
+    uint8_t fetched
+    uint16_t addr_abs
+    uint16_t addr_rel
+    uint8_t opcode
+    uint16_t temp
+
+cdef class IdleLoop:
+    cdef CPUBus bus
+
+    cdef public bint enabled
+    # CPU cycles run without executing instructions, and how many times that happened
+    cdef public uint64_t skipped_cycles
+    cdef public uint64_t fast_forwards
+
+    cdef IdleState state
+    # loop target and the PC of the jump back to it
+    cdef uint16_t start
+    cdef uint16_t end
+    # PC the next instruction of the iteration being recorded has to start at
+    cdef uint16_t next_PC
+    # loop that failed the check twice, not recorded again until another loop is entered, -1 for none
+    cdef int rejected
+    cdef uint8_t attempts
+
+    # state on entering the loop, then after each instruction of one iteration
+    cdef CPUSnapshot entry
+    cdef CPUSnapshot[16] trace
+    cdef uint8_t[16] cycles
+    # CPU cycle of the iteration each instruction starts on, cycles of one iteration
+    cdef uint16_t[16] first_cycle
+    cdef uint16_t iteration_cycles
+    cdef uint8_t count
+    # instructions of the loop reading PPUSTATUS ($2002 or a mirror), e.g. to wait for vblank
+    cdef bint[16] status_reads
+    # all instructions of the loop run with interrupts disabled
+    cdef bint IRQ_masked
+
+    cpdef void reset(self)
+    cdef void unobserved(self)
+    cdef void instruction(self) except *
+    cdef void observe(self, uint16_t, uint8_t)
+    cdef bint pure(self, uint16_t)
+    cdef void confirm(self)
+    cdef bint fast_forward(self) except *
+    cdef void restore(self, uint64_t, int, uint8_t, uint16_t)
+
+    cdef void take(self, CPUSnapshot*)
+    cdef void put(self, CPUSnapshot*)
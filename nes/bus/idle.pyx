@@ -0,0 +1,290 @@
+from nes.cpu.cpu cimport CPU6502
+from nes.cpu.registers cimport StatusMask
+from nes.cpu.cpu_op cimport AddressingMode, Instruction, OP_ADDRMODE, OP_INSTRUCTION
+
+
+MAX_LOOP_INSTRUCTIONS = 16
+MAX_LOOP_BYTES = 64
+
+cdef bint same(CPUSnapshot* a, CPUSnapshot* b):
+    return a.PC == b.PC and a.SP == b.SP and a.A == b.A and a.X == b.X and a.Y == b.Y and a.P == b.P \
+        and a.fetched == b.fetched and a.addr_abs == b.addr_abs and a.addr_rel == b.addr_rel \
+        and a.opcode == b.opcode and a.temp == b.temp
+
+cdef bint jumps(uint8_t opcode):
+    '''
+    Branch or absolute JMP, what a loop ends with
+    '''
+    return OP_ADDRMODE[opcode] == AddressingMode.REL \
+        or (OP_INSTRUCTION[opcode] == Instruction.JMP and OP_ADDRMODE[opcode] == AddressingMode.ABS)
+
+cdef bint reads_status(uint8_t opcode, uint16_t addr):
+    '''
+    Instruction reading PPUSTATUS at addr and depending only on the value it reads
+    '''
+    cdef uint8_t mode = OP_ADDRMODE[opcode]
+    cdef uint8_t instruction = OP_INSTRUCTION[opcode]
+
+    if mode == AddressingMode.IMP or mode == AddressingMode.IMM or mode == AddressingMode.REL:
+        return False
+    if addr < 0x2000 or addr >= 0x4000 or addr & 0x0007 != 0x0002:
+        return False
+    return instruction == Instruction.LDA or instruction == Instruction.LDX or instruction == Instruction.LDY \
+        or instruction == Instruction.BIT or instruction == Instruction.AND or instruction == Instruction.ORA \
+        or instruction == Instruction.EOR or instruction == Instruction.ADC or instruction == Instruction.SBC \
+        or instruction == Instruction.CMP or instruction == Instruction.CPX or instruction == Instruction.CPY
+
+cdef class IdleLoop:
+    '''
+    Finds short loops that only read RAM / ROM and branch back, e.g. waiting for a flag the NMI
+    handler sets, and once one iteration ends in the state it started from, runs only the PPU
+    through the following iterations. The CPU is put into the state executing every instruction
+    would have left it in on the clock NMI / mapper IRQ arrive, the APU needs to catch up or the
+    frame completes, so results are identical.
+
+    Loops polling PPUSTATUS (vblank, sprite 0 hit) are run through the same way while every read
+    would return what the recorded iteration read; the read clearing the vblank flag and the
+    address latch is applied, the first read returning something else runs for real and ends it.
+    '''
+    def __init__(self, CPUBus bus) -> None:
+        self.bus = bus
+        self.enabled = True
+        self.skipped_cycles = 0
+        self.fast_forwards = 0
+        self.reset()
+
+    cpdef void reset(self):
+        '''
+        Forgets the loop being looked at, called when the memory map or CPU state change under it
+        '''
+        self.state = IDLE_NONE
+        self.rejected = -1
+        self.attempts = 0
+        self.count = 0
+
+    cdef void unobserved(self):
+        '''
+        Instructions ran without being observed (e.g. the one finishing a frame): whatever was recorded
+        or confirmed may not hold anymore
+        '''
+        self.state = IDLE_NONE
+
+    cdef void instruction(self) except *:
+        '''
+        In place of bus.clock() on the clocks the CPU fetches an instruction
+        '''
+        cdef CPU6502 cpu = self.bus.cpu
+        cdef uint16_t PC = cpu.registers.PC
+        cdef uint8_t SP = cpu.registers.SP
+
+        if self.state == IDLE_CONFIRMED and PC == self.start and (self.IRQ_masked or not self.bus.apu.IRQ):
+            if self.fast_forward():
+                return
+        self.bus.clock()
+        self.observe(PC, SP)
+
+    cdef void observe(self, uint16_t PC, uint8_t SP):
+        cdef CPU6502 cpu = self.bus.cpu
+        cdef uint16_t next_PC = cpu.registers.PC
+
+        if cpu.registers.SP != SP:
+            # an interrupt was taken: loop instructions never move the stack pointer
+            self.state = IDLE_NONE
+            return
+
+        if self.state == IDLE_NONE:
+            if next_PC <= PC and PC - next_PC <= MAX_LOOP_BYTES and jumps(cpu.opcode) and next_PC != self.rejected:
+                self.start, self.end = next_PC, PC
+                self.next_PC = next_PC
+                self.rejected = -1
+                self.attempts = 0
+                self.count = 0
+                self.take(&self.entry)
+                self.state = IDLE_RECORDING
+            return
+
+        if PC < self.start or PC > self.end:
+            self.state = IDLE_NONE
+            return
+        if self.state == IDLE_CONFIRMED:
+            return
+
+        if PC != self.next_PC or not self.pure(PC) or self.count == MAX_LOOP_INSTRUCTIONS:
+            # an instruction of the iteration was not observed, or left the memory it may touch
+            self.state = IDLE_NONE
+            return
+        self.next_PC = next_PC
+        self.take(&self.trace[self.count])
+        self.cycles[self.count] = cpu.remaining_cycles + 1
+        self.count += 1
+        if next_PC != self.start:
+            return
+
+        if same(&self.trace[self.count - 1], &self.entry):
+            self.confirm()
+            return
+        # the first iteration may start from other registers than the following ones
+        self.attempts += 1
+        if self.attempts == 2:
+            self.rejected = self.start
+            self.state = IDLE_NONE
+        else:
+            self.entry = self.trace[self.count - 1]
+            self.count = 0
+
+    cdef bint pure(self, uint16_t PC):
+        '''
+        The instruction just executed from PC read nothing but RAM / ROM / PPUSTATUS and changed nothing but registers
+        '''
+        cdef CPU6502 cpu = self.bus.cpu
+        cdef uint8_t mode = OP_ADDRMODE[cpu.opcode]
+        cdef uint8_t instruction = OP_INSTRUCTION[cpu.opcode]
+
+        if instruction == Instruction.STA or instruction == Instruction.STX or instruction == Instruction.STY \
+            or instruction == Instruction.INC or instruction == Instruction.DEC \
+            or instruction == Instruction.PHA or instruction == Instruction.PHP or instruction == Instruction.PLA or instruction == Instruction.PLP \
+            or instruction == Instruction.JSR or instruction == Instruction.RTS or instruction == Instruction.RTI \
+            or instruction == Instruction.BRK or instruction == Instruction.TXS or instruction == Instruction.XXX:
+            return False
+        if (instruction == Instruction.ASL or instruction == Instruction.LSR or instruction == Instruction.ROL or instruction == Instruction.ROR) \
+            and mode != AddressingMode.IMP:
+            return False
+        if mode == AddressingMode.IND:
+            return False
+        # the opcode and its operand bytes
+        if self.bus.read_pages[PC >> 8] == NULL or self.bus.read_pages[<uint16_t> (PC + 2) >> 8] == NULL:
+            return False
+        if mode != AddressingMode.IMP and mode != AddressingMode.IMM and mode != AddressingMode.REL and instruction != Instruction.JMP:
+            return self.bus.read_pages[cpu.addr_abs >> 8] != NULL or reads_status(cpu.opcode, cpu.addr_abs)
+        return True
+
+    cdef void confirm(self):
+        cdef uint8_t i
+
+        self.iteration_cycles = 0
+        self.IRQ_masked = True
+        for i in range(self.count):
+            self.first_cycle[i] = self.iteration_cycles
+            self.iteration_cycles += self.cycles[i]
+            self.status_reads[i] = reads_status(self.trace[i].opcode, self.trace[i].addr_abs)
+            if self.trace[i].P & StatusMask.I == 0:
+                self.IRQ_masked = False
+        self.state = IDLE_CONFIRMED
+
+    cdef bint fast_forward(self) except *:
+        '''
+        Clocks the PPU through the loop from its first instruction on, the same way bus.step() would
+        interleave it with the CPU. False if not a single clock could be run this way.
+        '''
+        cdef CPUBus bus = self.bus
+        cdef CPU6502 cpu = bus.cpu
+        cdef int clock_count = cpu.clock_count
+        # CPU cycles run, cycle of the iteration / instruction the next one belongs to, and of the last one
+        cdef uint64_t cycles = 0
+        cdef uint16_t position = 0, last_position = 0
+        cdef uint8_t instruction = 0, last_instruction = 0
+        cdef uint8_t phase = 0
+        cdef bint restored = False
+
+        while True:
+            if phase == 0:
+                if position == self.first_cycle[instruction] \
+                    and bus.nSystemClockCounter - bus.apu.system_clock >= bus.apu.sync_ticks:
+                    # bus.clock() lets the APU catch up before this instruction
+                    break
+            bus.ppu.clock()
+            if phase == 0 and position == self.first_cycle[instruction] and self.status_reads[instruction]:
+                # the instruction reads PPUSTATUS on this clock
+                bus.ppu.flush()
+                if (bus.ppu.PPUSTATUS.value & 0xE0) | (bus.ppu.ppu_data_buffer & 0x1F) == self.trace[instruction].fetched:
+                    bus.ppu.PPUSTATUS.vertical_blank = 0
+                    bus.ppu.address_latch = 0
+                else:
+                    # it reads something else than the loop was recorded with, e.g. the vblank flag: it runs
+                    # on the CPU after the instructions before it
+                    if cycles > 0:
+                        self.restore(cycles, clock_count, last_instruction, last_position)
+                    restored = True
+                    if bus.apu.IRQ and cpu.remaining_cycles == 0:
+                        cpu.irq()
+                    cpu.clock()
+            if phase == 0 and not restored:
+                cycles += 1
+                last_position, last_instruction = position, instruction
+                position += 1
+                if position == self.iteration_cycles:
+                    position, instruction = 0, 0
+                elif instruction + 1 < self.count and position == self.first_cycle[instruction + 1]:
+                    instruction += 1
+
+            if bus.ppu.nmi:
+                if not restored:
+                    self.restore(cycles, clock_count, last_instruction, last_position)
+                    restored = True
+                bus.ppu.nmi = False
+                cpu.nmi()
+            if bus.ppu.cycle == 260 and bus.cartridge.mapper.IRQ_state():
+                if not restored:
+                    self.restore(cycles, clock_count, last_instruction, last_position)
+                    restored = True
+                bus.cartridge.mapper.IRQ_clear()
+                cpu.irq()
+
+            bus.nSystemClockCounter += 1
+            phase = 0 if phase == 2 else phase + 1
+            if restored:
+                break
+            if bus.ppu.frame_complete:
+                self.restore(cycles, clock_count, last_instruction, last_position)
+                return True
+
+        if restored:
+            # the interrupt handler may change what the loop reads
+            self.state = IDLE_NONE
+            return True
+        if cycles == 0:
+            return False
+        self.restore(cycles, clock_count, last_instruction, last_position)
+        return True
+
+    cdef void restore(self, uint64_t cycles, int clock_count, uint8_t instruction, uint16_t position):
+        '''
+        CPU state after cycles CPU cycles of the loop, the last one at position of the iteration, within instruction
+        '''
+        cdef CPU6502 cpu = self.bus.cpu
+
+        self.put(&self.trace[instruction])
+        cpu.remaining_cycles = self.cycles[instruction] - 1 - (position - self.first_cycle[instruction])
+        cpu.clock_count = clock_count + cycles
+        self.skipped_cycles += cycles
+        self.fast_forwards += 1
+
+    cdef void take(self, CPUSnapshot* snapshot):
+        cdef CPU6502 cpu = self.bus.cpu
+
+        snapshot.PC = cpu.registers.PC
+        snapshot.SP = cpu.registers.SP
+        snapshot.A = cpu.registers.A
+        snapshot.X = cpu.registers.X
+        snapshot.Y = cpu.registers.Y
+        snapshot.P = cpu.registers.status.value
+        snapshot.fetched = cpu.fetched
+        snapshot.addr_abs = cpu.addr_abs
+        snapshot.addr_rel = cpu.addr_rel
+        snapshot.opcode = cpu.opcode
+        snapshot.temp = cpu.temp
+
+    cdef void put(self, CPUSnapshot* snapshot):
+        cdef CPU6502 cpu = self.bus.cpu
+
+        cpu.registers.PC = snapshot.PC
+        cpu.registers.SP = snapshot.SP
+        cpu.registers.A = snapshot.A
+        cpu.registers.X = snapshot.X
+        cpu.registers.Y = snapshot.Y
+        cpu.registers.status.value = snapshot.P
+        cpu.fetched = snapshot.fetched
+        cpu.addr_abs = snapshot.addr_abs
+        cpu.addr_rel = snapshot.addr_rel
+        cpu.opcode = snapshot.opcode
+        cpu.temp = snapshot.temp
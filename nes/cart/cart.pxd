@@ -13,10 +13,17 @@ cdef class Cartridge:
     cdef uint32_t CHR_ROM_bytes
     cdef uint32_t CHR_RAM_bytes
 
-    cdef uint8_t[:] PRG_ROM_data
+    # ROM is a view of the read-only file mapping until something writes to it, see PRG_ROM_writable
+    cdef const uint8_t[:] PRG_ROM_data
     cdef uint8_t[:] PRG_RAM_data
-    cdef uint8_t[:] CHR_ROM_data
+    cdef const uint8_t[:] CHR_ROM_data
     cdef uint8_t[:] CHR_RAM_data
+    # ROM copied out of the file mapping
+    cdef bint PRG_ROM_private
+    cdef bint CHR_ROM_private
+
+    # SHA-1 of PRG ROM + CHR ROM as loaded, identifies the game in save states
+    cdef public bytes ROM_hash
 
     cdef CPUBus bus    
     cdef Mapper mapper
@@ -25,8 +32,18 @@ cdef class Cartridge:
     cdef void connect_bus(self, CPUBus)
     cdef void reset(self)
     cdef uint8_t mapper_no(self)
+    cdef void parse(self, object) except *
+    cdef void hash_ROM(self)
+    cpdef Cartridge clone(self)
+    cdef void copy_from(self, Cartridge)
 
     cdef (bint, uint8_t) readByCPU(self, uint16_t)
     cdef bint writeByCPU(self, uint16_t, uint8_t)
     cdef (bint, uint8_t) readByPPU(self, uint16_t)
     cdef bint writeByPPU(self, uint16_t, uint8_t)
+
+    cdef uint8_t* PRG_ROM_writable(self)
+    cdef uint8_t* CHR_ROM_writable(self)
+
+    cdef uint8_t* readPageByCPU(self, uint16_t)
+    cdef uint8_t* writePageByCPU(self, uint16_t)
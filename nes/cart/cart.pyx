@@ -1,5 +1,10 @@
 from libc.stdint cimport uint8_t, uint16_t, UINT32_MAX
+import hashlib
 
+import numpy as np
+cimport numpy as np
+
+from nes.mapper.mirror cimport VERTICAL
 from nes.mapper.mapping cimport CPUReadMapping, CPUWriteMapping, PPUReadMapping, PPUWriteMapping
 
 
@@ -22,11 +27,66 @@ cdef class Cartridge:
     cdef uint8_t mapper_no(self):
         pass
 
+    cdef void parse(self, object image) except *:
+        '''
+        Header, ROM / RAM data and mirroring from a ROMImage, everything but the mapper and the ROM hash
+        '''
+        pass
+
+    @classmethod
+    def describe(cls, image) -> dict:
+        '''
+        Header metadata and ROM hash of a ROMImage, without creating the mapper
+        '''
+        cdef Cartridge cartridge = cls.__new__(cls)
+        cartridge.parse(image)
+        cartridge.hash_ROM()
+        return {
+            "mapper": cartridge.mapper_no(),
+            "prg_rom_bytes": cartridge.PRG_ROM_bytes,
+            "prg_ram_bytes": cartridge.PRG_RAM_bytes,
+            "chr_rom_bytes": cartridge.CHR_ROM_bytes,
+            "chr_ram_bytes": cartridge.CHR_RAM_bytes,
+            "mirroring": "vertical" if cartridge.mirror_mode == VERTICAL else "horizontal",
+            "sha1": cartridge.ROM_hash.hex(),
+        }
+
+    cdef void hash_ROM(self):
+        ROM_hash = hashlib.sha1(np.asarray(self.PRG_ROM_data).tobytes())
+        if self.CHR_ROM_bytes > 0:
+            ROM_hash.update(np.asarray(self.CHR_ROM_data).tobytes())
+        self.ROM_hash = ROM_hash.digest()
+
+    cpdef Cartridge clone(self):
+        '''
+        Independent copy of a parsed cartridge, the file is not read again
+        '''
+        cdef Cartridge cartridge = type(self).__new__(type(self))
+        cartridge.copy_from(self)
+        return cartridge
+
+    cdef void copy_from(self, Cartridge other):
+        self.PRG_ROM_bytes = other.PRG_ROM_bytes
+        self.PRG_RAM_bytes = other.PRG_RAM_bytes
+        self.CHR_ROM_bytes = other.CHR_ROM_bytes
+        self.CHR_RAM_bytes = other.CHR_RAM_bytes
+        self.PRG_ROM_data = np.array(other.PRG_ROM_data, dtype = np.uint8)
+        self.PRG_ROM_private = True
+        if other.PRG_RAM_bytes > 0:
+            self.PRG_RAM_data = np.array(other.PRG_RAM_data, dtype = np.uint8)
+        if other.CHR_ROM_bytes > 0:
+            self.CHR_ROM_data = np.array(other.CHR_ROM_data, dtype = np.uint8)
+            self.CHR_ROM_private = True
+        if other.CHR_RAM_bytes > 0:
+            self.CHR_RAM_data = np.array(other.CHR_RAM_data, dtype = np.uint8)
+        self.mapper = type(other.mapper)(other.mapper.PRG_banks, other.mapper.CHR_banks)
+        self.mirror_mode = other.mirror_mode
+        self.ROM_hash = other.ROM_hash
+
     @staticmethod
     def nes_version(header_bytes: bytes) -> int:
-        word = header_bytes[0:3].decode("UTF-8")
-        is_ines_format = word == 'NES' and header_bytes[3] == 0x1A
-        is_nes2_format = is_ines_format and header_bytes[7] & 0x0C == 0x08
+        is_ines_format = header_bytes[0:4] == b'NES\x1a'
+        is_nes2_format = is_ines_format and len(header_bytes) > 7 and header_bytes[7] & 0x0C == 0x08
         if is_nes2_format:
             return 2
         if is_ines_format:
@@ -51,7 +111,7 @@ cdef class Cartridge:
             if mapping.addr == UINT32_MAX:
                 return True
             else:
-               self.PRG_ROM_data[mapping.addr] = data
+               self.PRG_ROM_writable()[mapping.addr] = data
                return True
         else:
             return False 
@@ -74,5 +134,50 @@ cdef class Cartridge:
             if self.CHR_RAM_bytes > 0:
                 self.CHR_RAM_data[mapping.addr] = data
             else:
-                self.CHR_ROM_data[mapping.addr] = data
+                self.CHR_ROM_writable()[mapping.addr] = data
         return mapping.success
+
+    cdef uint8_t* PRG_ROM_writable(self):
+        '''
+        PRG ROM a mapper writes to, copied out of the read-only file mapping on the first write
+        '''
+        if not self.PRG_ROM_private:
+            self.PRG_ROM_data = np.array(self.PRG_ROM_data, dtype = np.uint8)
+            self.PRG_ROM_private = True
+            if self.bus is not None:
+                # pages and decoded blocks point into the mapping
+                self.bus.map_pages()
+        return <uint8_t*> &self.PRG_ROM_data[0]
+
+    cdef uint8_t* CHR_ROM_writable(self):
+        '''
+        CHR ROM a mapper maps PPU writes to, copied out of the read-only file mapping on the first call,
+        before the PPU maps its pages to it
+        '''
+        if not self.CHR_ROM_private:
+            self.CHR_ROM_data = np.array(self.CHR_ROM_data, dtype = np.uint8)
+            self.CHR_ROM_private = True
+        return <uint8_t*> &self.CHR_ROM_data[0]
+
+    cdef uint8_t* readPageByCPU(self, uint16_t addr):
+        '''
+        256 byte page starting at addr that CPU reads can access directly,
+        NULL if reads have to go through readByCPU
+        '''
+        cdef CPUReadMapping mapping = self.mapper.mapReadByCPU(addr)
+
+        if not mapping.success:
+            return NULL
+        if mapping.addr == UINT32_MAX:
+            return self.mapper.RAM_page(addr)
+        if mapping.addr + 0xFF >= self.PRG_ROM_bytes:
+            return NULL
+        # only ever read through
+        return <uint8_t*> &self.PRG_ROM_data[mapping.addr]
+
+    cdef uint8_t* writePageByCPU(self, uint16_t addr):
+        '''
+        256 byte page starting at addr that CPU writes can access directly,
+        only mapper RAM qualifies: everything else may hit mapper registers
+        '''
+        return self.mapper.RAM_page(addr)
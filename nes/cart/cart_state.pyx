@@ -1,36 +1,52 @@
 import cython
+
+from libc.stdint cimport uint8_t
+from libc.string cimport memcpy
+
 import numpy as np
 cimport numpy as np
 
 
 @cython.auto_pickle(True)
 cdef class CartridgeState:
-    def __init__(self, Cartridge cartridge) -> None:
-        self.PRG_ROM_bytes = cartridge.PRG_ROM_bytes
-        self.PRG_RAM_bytes = cartridge.PRG_RAM_bytes
-        self.CHR_ROM_bytes = cartridge.CHR_ROM_bytes
-        self.CHR_RAM_bytes = cartridge.CHR_RAM_bytes
-        self.PRG_ROM_data = np.array(cartridge.PRG_ROM_data, dtype = np.uint8)
-        if self.PRG_RAM_bytes > 0:
-            self.PRG_RAM_data = np.array(cartridge.PRG_RAM_data, dtype = np.uint8)
-        else:
-            self.PRG_RAM_data = np.zeros(self.PRG_RAM_bytes, dtype = np.uint8)
-        if self.CHR_ROM_bytes > 0:
-            self.CHR_ROM_data = np.array(cartridge.CHR_ROM_data, dtype = np.uint8)
-        else:
-            self.CHR_ROM_data = np.zeros(self.CHR_ROM_bytes, dtype = np.uint8)
-        if self.CHR_RAM_bytes > 0:
-            self.CHR_RAM_data = np.array(cartridge.CHR_RAM_data, dtype = np.uint8)
-        else:
-            self.CHR_RAM_data = np.zeros(self.CHR_RAM_bytes, dtype = np.uint8)
-
-    cdef void load_to(self, Cartridge cartridge):
-        cartridge.PRG_ROM_bytes = self.PRG_ROM_bytes
-        cartridge.PRG_RAM_bytes = self.PRG_RAM_bytes
-        cartridge.CHR_ROM_bytes = self.CHR_ROM_bytes
-        cartridge.CHR_RAM_bytes = self.CHR_RAM_bytes
-        cartridge.PRG_ROM_data = self.PRG_ROM_data
-        cartridge.PRG_RAM_data = self.PRG_RAM_data
-        cartridge.CHR_ROM_data = self.CHR_ROM_data
-        cartridge.CHR_RAM_data = self.CHR_RAM_data
-    
\ No newline at end of file
+    '''
+    Mapper registers and the cartridge's RAM, ROM is never copied
+    '''
+    def __init__(self, Cartridge cartridge = None) -> None:
+        cdef uint8_t* RAM_page
+
+        if cartridge is None:
+            return
+        self.mapper_registers = cartridge.mapper.save_registers()
+        # $6000-$7FFF, 8KB the mapper keeps in one piece
+        RAM_page = cartridge.mapper.RAM_page(0x6000)
+        self.mapper_RAM = (<char*> RAM_page)[:0x2000] if RAM_page != NULL else b""
+        self.PRG_RAM_data = np.asarray(cartridge.PRG_RAM_data).tobytes() if cartridge.PRG_RAM_bytes > 0 else b""
+        self.CHR_RAM_data = np.asarray(cartridge.CHR_RAM_data).tobytes() if cartridge.CHR_RAM_bytes > 0 else b""
+
+    cdef void write_blocks(self, list blocks):
+        blocks.append((b"MAPR", self.mapper_registers))
+        if len(self.mapper_RAM) > 0:
+            blocks.append((b"WRAM", self.mapper_RAM))
+        if len(self.PRG_RAM_data) > 0:
+            blocks.append((b"PRAM", self.PRG_RAM_data))
+        if len(self.CHR_RAM_data) > 0:
+            blocks.append((b"CRAM", self.CHR_RAM_data))
+
+    cdef void read_blocks(self, dict blocks) except *:
+        self.mapper_registers = blocks[b"MAPR"]
+        self.mapper_RAM = blocks.get(b"WRAM", b"")
+        self.PRG_RAM_data = blocks.get(b"PRAM", b"")
+        self.CHR_RAM_data = blocks.get(b"CRAM", b"")
+
+    cdef void load_to(self, Cartridge cartridge) except *:
+        cdef uint8_t* RAM_page = cartridge.mapper.RAM_page(0x6000)
+
+        cartridge.mapper.load_registers(self.mapper_registers)
+        if RAM_page != NULL and len(self.mapper_RAM) == 0x2000:
+            memcpy(RAM_page, <char*> self.mapper_RAM, 0x2000)
+        if cartridge.PRG_RAM_bytes > 0 and len(self.PRG_RAM_data) > 0:
+            np.asarray(cartridge.PRG_RAM_data)[:] = np.frombuffer(self.PRG_RAM_data, dtype = np.uint8)
+        if cartridge.CHR_RAM_bytes > 0 and len(self.CHR_RAM_data) > 0:
+            np.asarray(cartridge.CHR_RAM_data)[:] = np.frombuffer(self.CHR_RAM_data, dtype = np.uint8)
+        cartridge.mapper.CHR_switched = True
@@ -8,6 +8,9 @@ cdef class INesCart(Cartridge):
     cdef bytes PlayChoice_INST_ROM
     cdef bytes PlayChoice_PROM
 
+    cdef void parse(self, object) except *
+    cdef void copy_from(self, Cartridge)
+
 cdef class INesHeader(Header):
     cdef bytes constant
     cdef uint8_t PRG_ROM_size
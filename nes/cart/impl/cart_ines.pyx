@@ -1,50 +1,67 @@
 import numpy as np
 cimport numpy as np
 
+from nes.cart.rom_image import ROMImage
 from nes.mapper.mapper_factory cimport MapperFactory
 from nes.mapper.mirror cimport *
 
 
 cdef class INesCart(Cartridge):
-    def __init__(self, filename) -> None:
-        with open(filename, 'rb') as ines:
-            self.header = INesHeader(ines.read(16))
-            if self.header.flags_6.present_trainer == 1:
-                self.trainer = ines.read(512)
-            # ROM & RAM size
-            self.PRG_ROM_bytes = 16384 * self.header.PRG_ROM_size
-            if self.header.flags_6.present_persistent_memory == 1:
-                self.PRG_RAM_bytes = 8192 * self.header.flags_8.PRG_RAM_size    
-            self.CHR_ROM_bytes = 8192 * self.header.CHR_ROM_size
-            if self.CHR_ROM_bytes == 0:
-                self.CHR_RAM_bytes = 8192
-            # load ROM & RAM
-            self.PRG_ROM_data = np.frombuffer(ines.read(self.PRG_ROM_bytes), dtype = np.uint8).copy()
-            if self.PRG_RAM_bytes > 0:
-                self.PRG_RAM_data = np.frombuffer(ines.read(self.PRG_RAM_bytes), dtype = np.uint8).copy()
-                if len(self.PRG_RAM_data) == 0:
-                    self.PRG_RAM_data = np.zeros(self.PRG_RAM_bytes, dtype = np.uint8)
-            if self.CHR_ROM_bytes > 0:
-                self.CHR_ROM_data = np.frombuffer(ines.read(self.CHR_ROM_bytes), dtype = np.uint8).copy()
-                if len(self.CHR_ROM_data) == 0:
-                    self.CHR_ROM_data = np.zeros(self.CHR_ROM_bytes, dtype = np.uint8)
-            if self.CHR_RAM_bytes > 0:
-                self.CHR_RAM_data = np.frombuffer(ines.read(self.CHR_RAM_bytes), dtype = np.uint8).copy()
-                if len(self.CHR_RAM_data) == 0:
-                    self.CHR_RAM_data = np.zeros(self.CHR_RAM_bytes, dtype = np.uint8)
-            # PlayChoice10
-            if self.header.flags_7.is_PlayChoice10 == 1:
-                self.PlayChoice_INST_ROM = ines.read(8192)
-                self.PlayChoice_PROM = ines.read(16)
-            # mapper & mirror
-            self.mapper = MapperFactory.of(self.mapper_no())(self.PRG_ROM_bytes / 16384, self.CHR_ROM_bytes / 8192)
-            self.mirror_mode = VERTICAL if self.header.flags_6.nametable_arrangement == 1 else HORIZONTAL
+    def __init__(self, rom, bytes ROM_hash = None) -> None:
+        '''
+        ROM_hash: known SHA-1 of the ROM data (e.g. from a RomLibrary index), computed when None
+        '''
+        self.parse(rom if isinstance(rom, ROMImage) else ROMImage(rom))
+        if ROM_hash is None:
+            self.hash_ROM()
+        else:
+            self.ROM_hash = ROM_hash
+        self.mapper = MapperFactory.of(self.mapper_no())(self.PRG_ROM_bytes / 16384, self.CHR_ROM_bytes / 8192)
+
+    cdef void parse(self, object ines) except *:
+        self.header = INesHeader(ines.header())
+        ines.seek(16)
+        if self.header.flags_6.present_trainer == 1:
+            self.trainer = bytes(ines.read(512))
+        # ROM & RAM size
+        self.PRG_ROM_bytes = 16384 * self.header.PRG_ROM_size
+        if self.header.flags_6.present_persistent_memory == 1:
+            self.PRG_RAM_bytes = 8192 * self.header.flags_8.PRG_RAM_size    
+        self.CHR_ROM_bytes = 8192 * self.header.CHR_ROM_size
+        if self.CHR_ROM_bytes == 0:
+            self.CHR_RAM_bytes = 8192
+        # load ROM & RAM
+        self.PRG_ROM_data = np.frombuffer(ines.read(self.PRG_ROM_bytes), dtype = np.uint8)
+        if self.PRG_RAM_bytes > 0:
+            self.PRG_RAM_data = np.array(ines.read(self.PRG_RAM_bytes), dtype = np.uint8)
+            if len(self.PRG_RAM_data) == 0:
+                self.PRG_RAM_data = np.zeros(self.PRG_RAM_bytes, dtype = np.uint8)
+        if self.CHR_ROM_bytes > 0:
+            self.CHR_ROM_data = np.frombuffer(ines.read(self.CHR_ROM_bytes), dtype = np.uint8)
+            if len(self.CHR_ROM_data) == 0:
+                self.CHR_ROM_data = np.zeros(self.CHR_ROM_bytes, dtype = np.uint8)
+        if self.CHR_RAM_bytes > 0:
+            self.CHR_RAM_data = np.array(ines.read(self.CHR_RAM_bytes), dtype = np.uint8)
+            if len(self.CHR_RAM_data) == 0:
+                self.CHR_RAM_data = np.zeros(self.CHR_RAM_bytes, dtype = np.uint8)
+        # PlayChoice10
+        if self.header.flags_7.is_PlayChoice10 == 1:
+            self.PlayChoice_INST_ROM = bytes(ines.read(8192))
+            self.PlayChoice_PROM = bytes(ines.read(16))
+        # mirror
+        self.mirror_mode = VERTICAL if self.header.flags_6.nametable_arrangement == 1 else HORIZONTAL
 
     cdef uint8_t mapper_no(self):
         cdef uint8_t lower_nybble = self.header.flags_6.mapper_no_lower_nybble
         cdef uint8_t upper_nybble = self.header.flags_7.mapper_no_upper_nybble
         return (upper_nybble << 4) | lower_nybble
 
+    cdef void copy_from(self, Cartridge other):
+        Cartridge.copy_from(self, other)
+        self.header = (<INesCart> other).header
+        self.PlayChoice_INST_ROM = (<INesCart> other).PlayChoice_INST_ROM
+        self.PlayChoice_PROM = (<INesCart> other).PlayChoice_PROM
+
 cdef class INesHeader(Header):
     def __init__(self, bytes header_bytes) -> None:
         self.constant = header_bytes[0:4]
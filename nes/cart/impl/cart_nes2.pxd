@@ -6,6 +6,9 @@ from nes.cart.cart cimport Header, Cartridge
 cdef class Nes2Cart(Cartridge):
     cdef Nes2Header header
 
+    cdef void parse(self, object) except *
+    cdef void copy_from(self, Cartridge)
+
 cdef class Nes2Header(Header):
     cdef bytes constant
     cdef uint8_t PRG_ROM_size_LSB
@@ -2,56 +2,71 @@ import numpy as np
 cimport numpy as np
 from libc.string cimport memset
 
+from nes.cart.rom_image import ROMImage
 from nes.mapper.mapper_factory cimport MapperFactory
 from nes.mapper.mirror cimport *
 
 
 cdef class Nes2Cart(Cartridge):
-    def __init__(self, filename) -> None:
-        with open(filename, 'rb') as nes2:
-            self.header = Nes2Header(nes2.read(16))
-            if self.header.flags_6.present_trainer == 1:
-                self.trainer = nes2.read(512)
-            # ROM & RAM size
-            if self.header.flags_9.PRG_ROM_size_MSB == 0xF:
-                multiplier = self.header.PRG_ROM_size_LSB & 0b11
-                exponent = (self.header.PRG_ROM_size_LSB & 0xFC) >> 2
-                self.PRG_ROM_bytes = (1 << exponent) * (multiplier * 2 + 1)
-            else:
-                self.PRG_ROM_bytes = 16384 * ((self.header.flags_9.PRG_ROM_size_MSB << 8) | self.header.PRG_ROM_size_LSB)
-            if self.header.flags_10.PRG_RAM_shift_count > 0:
-                self.PRG_RAM_bytes = 64 << self.header.flags_10.PRG_RAM_shift_count
-            if self.header.flags_9.CHR_ROM_size_MSB == 0xF:
-                multiplier = self.header.CHR_ROM_size_LSB & 0b11
-                exponent = (self.header.CHR_ROM_size_LSB & 0xFC) >> 2
-                self.CHR_ROM_bytes = (1 << exponent) * (multiplier * 2 + 1)
-            else:
-                self.CHR_ROM_bytes = 8192 * ((self.header.flags_9.CHR_ROM_size_MSB << 8) | self.header.CHR_ROM_size_LSB)
-            if self.header.flags_11.CHR_RAM_size_shift_count > 0:
-                self.CHR_RAM_bytes = 64 << self.header.flags_11.CHR_RAM_size_shift_count
-            # load ROM & RAM
-            self.PRG_ROM_data = np.frombuffer(nes2.read(self.PRG_ROM_bytes), dtype = np.uint8).copy()
-            if self.PRG_RAM_bytes > 0:
-                self.PRG_RAM_data = np.frombuffer(nes2.read(self.PRG_RAM_bytes), dtype = np.uint8).copy()    
-                if len(self.PRG_RAM_data) == 0:
-                    self.PRG_RAM_data = np.zeros(self.PRG_RAM_bytes, dtype = np.uint8).copy()
-            if self.CHR_ROM_bytes > 0:
-                self.CHR_ROM_data = np.frombuffer(nes2.read(self.CHR_ROM_bytes), dtype = np.uint8).copy()
-                if len(self.CHR_ROM_data) == 0:
-                    self.CHR_ROM_data = np.zeros(self.CHR_ROM_bytes, dtype = np.uint8).copy()
-            if self.CHR_RAM_bytes > 0:
-                self.CHR_RAM_data = np.frombuffer(nes2.read(self.CHR_RAM_bytes), dtype = np.uint8).copy()
-                if len(self.CHR_RAM_data) == 0:
-                    self.CHR_RAM_data = np.zeros(self.CHR_RAM_bytes, dtype = np.uint8)
-            # mapper & mirror
-            self.mapper = MapperFactory.of(self.mapper_no())(self.PRG_ROM_bytes / 16384, self.CHR_ROM_bytes / 8192)
-            self.mirror_mode = VERTICAL if self.header.flags_6.nametable_arrangement == 1 else HORIZONTAL 
+    def __init__(self, rom, bytes ROM_hash = None) -> None:
+        '''
+        ROM_hash: known SHA-1 of the ROM data (e.g. from a RomLibrary index), computed when None
+        '''
+        self.parse(rom if isinstance(rom, ROMImage) else ROMImage(rom))
+        if ROM_hash is None:
+            self.hash_ROM()
+        else:
+            self.ROM_hash = ROM_hash
+        self.mapper = MapperFactory.of(self.mapper_no())(self.PRG_ROM_bytes / 16384, self.CHR_ROM_bytes / 8192)
+
+    cdef void parse(self, object nes2) except *:
+        self.header = Nes2Header(nes2.header())
+        nes2.seek(16)
+        if self.header.flags_6.present_trainer == 1:
+            self.trainer = bytes(nes2.read(512))
+        # ROM & RAM size
+        if self.header.flags_9.PRG_ROM_size_MSB == 0xF:
+            multiplier = self.header.PRG_ROM_size_LSB & 0b11
+            exponent = (self.header.PRG_ROM_size_LSB & 0xFC) >> 2
+            self.PRG_ROM_bytes = (1 << exponent) * (multiplier * 2 + 1)
+        else:
+            self.PRG_ROM_bytes = 16384 * ((self.header.flags_9.PRG_ROM_size_MSB << 8) | self.header.PRG_ROM_size_LSB)
+        if self.header.flags_10.PRG_RAM_shift_count > 0:
+            self.PRG_RAM_bytes = 64 << self.header.flags_10.PRG_RAM_shift_count
+        if self.header.flags_9.CHR_ROM_size_MSB == 0xF:
+            multiplier = self.header.CHR_ROM_size_LSB & 0b11
+            exponent = (self.header.CHR_ROM_size_LSB & 0xFC) >> 2
+            self.CHR_ROM_bytes = (1 << exponent) * (multiplier * 2 + 1)
+        else:
+            self.CHR_ROM_bytes = 8192 * ((self.header.flags_9.CHR_ROM_size_MSB << 8) | self.header.CHR_ROM_size_LSB)
+        if self.header.flags_11.CHR_RAM_size_shift_count > 0:
+            self.CHR_RAM_bytes = 64 << self.header.flags_11.CHR_RAM_size_shift_count
+        # load ROM & RAM
+        self.PRG_ROM_data = np.frombuffer(nes2.read(self.PRG_ROM_bytes), dtype = np.uint8)
+        if self.PRG_RAM_bytes > 0:
+            self.PRG_RAM_data = np.array(nes2.read(self.PRG_RAM_bytes), dtype = np.uint8)
+            if len(self.PRG_RAM_data) == 0:
+                self.PRG_RAM_data = np.zeros(self.PRG_RAM_bytes, dtype = np.uint8).copy()
+        if self.CHR_ROM_bytes > 0:
+            self.CHR_ROM_data = np.frombuffer(nes2.read(self.CHR_ROM_bytes), dtype = np.uint8)
+            if len(self.CHR_ROM_data) == 0:
+                self.CHR_ROM_data = np.zeros(self.CHR_ROM_bytes, dtype = np.uint8).copy()
+        if self.CHR_RAM_bytes > 0:
+            self.CHR_RAM_data = np.array(nes2.read(self.CHR_RAM_bytes), dtype = np.uint8)
+            if len(self.CHR_RAM_data) == 0:
+                self.CHR_RAM_data = np.zeros(self.CHR_RAM_bytes, dtype = np.uint8)
+        # mirror
+        self.mirror_mode = VERTICAL if self.header.flags_6.nametable_arrangement == 1 else HORIZONTAL 
 
     cdef uint8_t mapper_no(self):
         cdef uint8_t lower_part = self.header.flags_6.mapper_no_lower_part
         cdef uint8_t middle_part = self.header.flags_7.mapper_no_middle_part
         cdef uint8_t upper_part = self.header.flags_8.mapper_no_upper_part
         return (upper_part << 8) | (middle_part << 4) | lower_part  
+
+    cdef void copy_from(self, Cartridge other):
+        Cartridge.copy_from(self, other)
+        self.header = (<Nes2Cart> other).header
         
 cdef class Nes2Header(Header):
     def __init__(self, bytes header_bytes) -> None:
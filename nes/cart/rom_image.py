@@ -0,0 +1,41 @@
+import mmap
+
+
+HEADER_SIZE = 16
+
+
+class ROMImage:
+    '''
+    .nes file mapped read-only, read() hands out views of it instead of copies: the pages of
+    PRG / CHR ROM stay shared with the OS file cache (and with other processes loading the same
+    file). Cartridges copy out what is written to, RAM and ROM a mapper writes into.
+    The file stays open while cartridges use the mapping, it can not be deleted or replaced on
+    Windows meanwhile, and truncating it under a running console crashes the process (SIGBUS).
+    '''
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        with open(filename, 'rb') as nes_file:
+            try:
+                self.buffer = mmap.mmap(nes_file.fileno(), 0, access = mmap.ACCESS_READ)
+            except ValueError:
+                # an empty file can not be mapped
+                self.buffer = b""
+        self.view = memoryview(self.buffer)
+        self.position = 0
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def header(self) -> bytes:
+        return bytes(self.view[0:HEADER_SIZE])
+
+    def seek(self, position: int) -> None:
+        self.position = position
+
+    def read(self, size: int) -> memoryview:
+        '''
+        Next size bytes, fewer at the end of the file like file.read()
+        '''
+        data = self.view[self.position:self.position + size]
+        self.position += len(data)
+        return data
@@ -1,6 +1,8 @@
-from libc.stdint cimport uint8_t
+from libc.stdint cimport uint8_t, uint32_t
 
 from nes.bus.bus cimport CPUBus
+from nes.rewind cimport RewindBuffer
+from nes.profiler cimport Profiler
 
 from nes.cpu.cpu_debug cimport CPUDebugger
 from nes.ppu.ppu_debug cimport PPUDebugger
@@ -23,12 +25,31 @@ cdef class Console:
     cdef public PPUDebugger ppu_debugger
     cdef public CartridgeDebugger cartridge_debugger
 
+    # frames run since power up / reset
+    cdef public uint32_t frame_count
+    # clocked or loaded with a state since it was created, which power_up does not undo (RAM is kept)
+    cdef public bint started
+    cdef public RewindBuffer rewind_buffer
+    cdef public Profiler profiler
+
     cpdef void power_up(self)
     cpdef void reset(self)
     cpdef void clock(self)
-    cpdef void frame(self)
+    cpdef void frame(self, bint render = *)
+    cpdef void fast_forward(self, uint32_t)
     cpdef void run(self)
     cpdef void control(self, list)
+    cpdef tuple controllers(self)
+    cpdef void set_controllers(self, uint8_t, uint8_t)
 
     cpdef void save_state(self, str)
-    cpdef void load_state(self, str)
+    cpdef void load_state(self, str) except *
+    cpdef bytes dump_state(self)
+    cpdef void restore_state(self, data) except *
+
+    cpdef void enable_rewind(self, int interval = *, size_t budget = *, int keyframe_every = *)
+    cpdef void disable_rewind(self)
+    cpdef void rewind(self, uint32_t frame) except *
+
+    cpdef Profiler enable_profiler(self)
+    cpdef void disable_profiler(self)
@@ -1,6 +1,5 @@
-import pickle
-
 from nes.file_loader import FileLoader
+from nes.cart.cart cimport Cartridge
 from nes.state cimport State
 
 
@@ -14,20 +13,34 @@ K_LEFT = 6
 K_RIGHT = 7
 
 cdef class Console:
-    def __init__(self, filename: str) -> None:
-        cart = FileLoader.load(filename)
+    def __init__(self, rom) -> None:
+        '''
+        rom: path of a .nes file, or an already parsed Cartridge
+        '''
+        cart = rom if isinstance(rom, Cartridge) else FileLoader.load(rom)
         self.bus = CPUBus(cart)
         self.cpu_debugger = CPUDebugger(self.bus)
         self.ppu_debugger = PPUDebugger(self.bus.ppu)
         self.cartridge_debugger = CartridgeDebugger(self.bus.cartridge)
+        self.frame_count = 0
+        self.started = False
+        self.rewind_buffer = None
+        self.profiler = None
 
     cpdef void power_up(self):
         self.bus.power_up()
+        self.frame_count = 0
+        if self.rewind_buffer is not None:
+            self.rewind_buffer.clear()
 
     cpdef void reset(self):
         self.bus.reset()
+        self.frame_count = 0
+        if self.rewind_buffer is not None:
+            self.rewind_buffer.clear()
 
     cpdef void clock(self):
+        self.started = True
         while True:
             self.bus.clock()
             if self.bus.cpu.complete():
@@ -36,50 +49,133 @@ cdef class Console:
             self.bus.clock()
             if not self.bus.cpu.complete():
                 break
+        self.bus.idle_loop.unobserved()
 
-    cpdef void frame(self):
-        while True:
-            self.bus.clock()
-            if self.bus.ppu.frame_complete:
-                break
-        while True:
-            self.bus.clock()
-            if self.bus.cpu.complete():
-                break
+    cpdef void frame(self, bint render = True):
+        '''
+        render: draw the frame, False leaves the screen at the last frame drawn and only computes
+                what the emulation depends on, with the same state as drawing it
+        With breakpoints set (bus.breakpoints) it returns early at the first hit, bus.breakpoints.hit tells
+        what stopped it; the next call goes on with the same frame.
+        '''
+        self.started = True
+        self.bus.ppu.render = render
+        if self.bus.breakpoints.active:
+            if not self.bus.breakpoints.run_frame():
+                self.bus.idle_loop.unobserved()
+                return
+        elif self.profiler is not None:
+            self.profiler.run_frame()
+        else:
+            while True:
+                self.bus.step()
+                if self.bus.ppu.frame_complete:
+                    break
+            while True:
+                self.bus.clock()
+                if self.bus.cpu.complete():
+                    break
+        # the instruction finishing the frame, and every one of profiled / checked frames, ran without
+        # the idle loop observing it
+        self.bus.idle_loop.unobserved()
         self.bus.ppu.frame_complete = False
+        self.bus.apu.catch_up(self.bus.nSystemClockCounter)
+        self.frame_count += 1
+        if self.rewind_buffer is not None and self.frame_count % self.rewind_buffer.interval == 0:
+            self.rewind_buffer.push(self.frame_count, self.dump_state())
+
+    cpdef void fast_forward(self, uint32_t frames):
+        '''
+        Runs frames frames, only the last one is drawn, up to a breakpoint hit
+        '''
+        cdef uint32_t i
+
+        for i in range(frames):
+            self.frame(i == frames - 1)
+            if self.bus.breakpoints.active and self.bus.breakpoints.hit is not None:
+                break
 
     cpdef void run(self):
+        self.started = True
         self.bus.run_frame()
 
     cpdef void control(self, list pressed):
         self.bus.controller[0] = 0x00
         if pressed[K_x]:
             self.bus.controller[0] |= 0x80
-        elif pressed[K_z]:
+        if pressed[K_z]:
             self.bus.controller[0] |= 0x40
-        elif pressed[K_a]:
+        if pressed[K_a]:
             self.bus.controller[0] |= 0x20
-        elif pressed[K_s]:
+        if pressed[K_s]:
             self.bus.controller[0] |= 0x10
-        elif pressed[K_UP]:
+        if pressed[K_UP]:
             self.bus.controller[0] |= 0x08
-        elif pressed[K_DOWN]:
+        if pressed[K_DOWN]:
             self.bus.controller[0] |= 0x04
-        elif pressed[K_LEFT]:
+        if pressed[K_LEFT]:
             self.bus.controller[0] |= 0x02
-        elif pressed[K_RIGHT]:
+        if pressed[K_RIGHT]:
             self.bus.controller[0] |= 0x01
 
-    cpdef void save_state(self, str archive_path):
-        cdef State state
+    cpdef tuple controllers(self):
+        '''
+        Button bytes of both controller ports, bit 7..0: A B SELECT START UP DOWN LEFT RIGHT
+        '''
+        return self.bus.controller[0], self.bus.controller[1]
 
-        with open(archive_path, "wb") as file:
-            state = State(self.bus)
-            data = pickle.dump(state, file)
+    cpdef void set_controllers(self, uint8_t controller_1, uint8_t controller_2):
+        self.bus.controller[0] = controller_1
+        self.bus.controller[1] = controller_2
 
-    cpdef void load_state(self, str archive_path):
-        cdef State state
+    cpdef void save_state(self, str archive_path):
+        with open(archive_path, "wb") as file:
+            file.write(self.dump_state())
 
+    cpdef void load_state(self, str archive_path) except *:
         with open(archive_path, "rb") as file:
-            state = pickle.load(file)
-            state.load_to(self.bus)
+            self.restore_state(file.read())
+
+    cpdef bytes dump_state(self):
+        '''
+        Current state in the binary save state format, see State
+        '''
+        return State(self.bus).to_bytes()
+
+    cpdef void restore_state(self, data) except *:
+        '''
+        data: bytes-like object returned by dump_state or read from a save state file
+        '''
+        cdef State state = State.from_bytes(data)
+        state.load_to(self.bus)
+        self.started = True
+
+    cpdef void enable_rewind(self, int interval = 1, size_t budget = 64 * 1024 * 1024, int keyframe_every = 60):
+        '''
+        Keeps the state of every interval-th frame in memory, up to budget bytes, see RewindBuffer
+        '''
+        self.rewind_buffer = RewindBuffer(interval, budget, keyframe_every)
+
+    cpdef void disable_rewind(self):
+        self.rewind_buffer = None
+
+    cpdef void rewind(self, uint32_t frame) except *:
+        '''
+        Goes back to a frame still in the rewind buffer, later frames are dropped
+        '''
+        if self.rewind_buffer is None:
+            raise RuntimeError("rewind is not enabled")
+        self.restore_state(self.rewind_buffer.state_at(frame))
+        self.rewind_buffer.discard_after(frame)
+        self.frame_count = frame
+
+    cpdef Profiler enable_profiler(self):
+        '''
+        Runs the following frames through an instrumented loop, see Profiler
+        '''
+        if self.profiler is None:
+            self.profiler = Profiler(self.bus)
+        return self.profiler
+
+    cpdef void disable_profiler(self):
+        self.profiler = None
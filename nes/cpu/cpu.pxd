@@ -25,18 +25,18 @@ cdef class CPU6502:
     cdef void push_2_bytes(self, uint16_t)
     cdef uint16_t pull_2_bytes(self)
 
-    cpdef uint8_t IMP(self)
-    cpdef uint8_t IMM(self)
-    cpdef uint8_t ZP0(self)
-    cpdef uint8_t ZPX(self)
-    cpdef uint8_t ZPY(self)
-    cpdef uint8_t REL(self)
-    cpdef uint8_t ABS(self)
-    cpdef uint8_t ABX(self)
-    cpdef uint8_t ABY(self)
-    cpdef uint8_t IND(self)
-    cpdef uint8_t IZX(self)
-    cpdef uint8_t IZY(self)
+    cdef uint8_t IMP(self, uint8_t, uint8_t)
+    cdef uint8_t IMM(self, uint8_t, uint8_t)
+    cdef uint8_t ZP0(self, uint8_t, uint8_t)
+    cdef uint8_t ZPX(self, uint8_t, uint8_t)
+    cdef uint8_t ZPY(self, uint8_t, uint8_t)
+    cdef uint8_t REL(self, uint8_t, uint8_t)
+    cdef uint8_t ABS(self, uint8_t, uint8_t)
+    cdef uint8_t ABX(self, uint8_t, uint8_t)
+    cdef uint8_t ABY(self, uint8_t, uint8_t)
+    cdef uint8_t IND(self, uint8_t, uint8_t)
+    cdef uint8_t IZX(self, uint8_t, uint8_t)
+    cdef uint8_t IZY(self, uint8_t, uint8_t)
 
     cdef uint8_t opcode
     cdef uint16_t temp
@@ -45,63 +45,66 @@ cdef class CPU6502:
     cdef void set_temp(self, uint16_t)
     cdef uint8_t fetch(self)
 
-    cpdef uint8_t ADC(self)
-    cpdef uint8_t SBC(self)
-    cpdef uint8_t AND(self)
-    cpdef uint8_t ASL(self)
-    cpdef uint8_t BCC(self)
-    cpdef uint8_t BCS(self)
-    cpdef uint8_t BEQ(self)
-    cpdef uint8_t BIT(self)
-    cpdef uint8_t BMI(self)
-    cpdef uint8_t BNE(self)
-    cpdef uint8_t BPL(self)
-    cpdef uint8_t BRK(self)
-    cpdef uint8_t BVC(self)
-    cpdef uint8_t BVS(self)
-    cpdef uint8_t CLC(self)
-    cpdef uint8_t CLD(self)
-    cpdef uint8_t CLI(self)
-    cpdef uint8_t CLV(self)
-    cpdef uint8_t CMP(self)
-    cpdef uint8_t CPX(self)
-    cpdef uint8_t CPY(self)
-    cpdef uint8_t DEC(self)
-    cpdef uint8_t DEX(self)
-    cpdef uint8_t DEY(self)
-    cpdef uint8_t EOR(self)
-    cpdef uint8_t INC(self)
-    cpdef uint8_t INX(self)
-    cpdef uint8_t INY(self)
-    cpdef uint8_t JMP(self)
-    cpdef uint8_t JSR(self)
-    cpdef uint8_t LDA(self)
-    cpdef uint8_t LDX(self)
-    cpdef uint8_t LDY(self)
-    cpdef uint8_t LSR(self)
-    cpdef uint8_t NOP(self)
-    cpdef uint8_t ORA(self)
-    cpdef uint8_t PHA(self)
-    cpdef uint8_t PHP(self)
-    cpdef uint8_t PLA(self)
-    cpdef uint8_t PLP(self)
-    cpdef uint8_t ROL(self)
-    cpdef uint8_t ROR(self)
-    cpdef uint8_t RTI(self)
-    cpdef uint8_t RTS(self)
-    cpdef uint8_t SEC(self)
-    cpdef uint8_t SED(self)
-    cpdef uint8_t SEI(self)
-    cpdef uint8_t STA(self)
-    cpdef uint8_t STX(self)
-    cpdef uint8_t STY(self)
-    cpdef uint8_t TAX(self)
-    cpdef uint8_t TAY(self)
-    cpdef uint8_t TSX(self)
-    cpdef uint8_t TXA(self)
-    cpdef uint8_t TXS(self)
-    cpdef uint8_t TYA(self)
-    cpdef uint8_t XXX(self)
+    cdef uint8_t addressing(self, uint8_t, uint8_t, uint8_t)
+    cdef uint8_t operate(self, uint8_t)
+
+    cdef uint8_t ADC(self)
+    cdef uint8_t SBC(self)
+    cdef uint8_t AND(self)
+    cdef uint8_t ASL(self)
+    cdef uint8_t BCC(self)
+    cdef uint8_t BCS(self)
+    cdef uint8_t BEQ(self)
+    cdef uint8_t BIT(self)
+    cdef uint8_t BMI(self)
+    cdef uint8_t BNE(self)
+    cdef uint8_t BPL(self)
+    cdef uint8_t BRK(self)
+    cdef uint8_t BVC(self)
+    cdef uint8_t BVS(self)
+    cdef uint8_t CLC(self)
+    cdef uint8_t CLD(self)
+    cdef uint8_t CLI(self)
+    cdef uint8_t CLV(self)
+    cdef uint8_t CMP(self)
+    cdef uint8_t CPX(self)
+    cdef uint8_t CPY(self)
+    cdef uint8_t DEC(self)
+    cdef uint8_t DEX(self)
+    cdef uint8_t DEY(self)
+    cdef uint8_t EOR(self)
+    cdef uint8_t INC(self)
+    cdef uint8_t INX(self)
+    cdef uint8_t INY(self)
+    cdef uint8_t JMP(self)
+    cdef uint8_t JSR(self)
+    cdef uint8_t LDA(self)
+    cdef uint8_t LDX(self)
+    cdef uint8_t LDY(self)
+    cdef uint8_t LSR(self)
+    cdef uint8_t NOP(self)
+    cdef uint8_t ORA(self)
+    cdef uint8_t PHA(self)
+    cdef uint8_t PHP(self)
+    cdef uint8_t PLA(self)
+    cdef uint8_t PLP(self)
+    cdef uint8_t ROL(self)
+    cdef uint8_t ROR(self)
+    cdef uint8_t RTI(self)
+    cdef uint8_t RTS(self)
+    cdef uint8_t SEC(self)
+    cdef uint8_t SED(self)
+    cdef uint8_t SEI(self)
+    cdef uint8_t STA(self)
+    cdef uint8_t STX(self)
+    cdef uint8_t STY(self)
+    cdef uint8_t TAX(self)
+    cdef uint8_t TAY(self)
+    cdef uint8_t TSX(self)
+    cdef uint8_t TXA(self)
+    cdef uint8_t TXS(self)
+    cdef uint8_t TYA(self)
+    cdef uint8_t XXX(self)
     
     cdef list lookup
     
@@ -113,4 +116,5 @@ cdef class CPU6502:
     cdef int clock_count
     
     cdef uint8_t clock(self) except *
+    cdef uint8_t execute(self, uint8_t, uint8_t, uint8_t) except *
     cpdef bint complete(self)
@@ -1,4 +1,4 @@
-from nes.cpu.cpu_op cimport Op
+from nes.cpu.cpu_op cimport AddressingMode, Instruction, OP_CYCLES, OP_ADDRMODE, OP_INSTRUCTION, ADDRMODE_LENGTH, LOOKUP
 
 import numpy as np
 cimport numpy as np
@@ -6,11 +6,16 @@ cimport numpy as np
 
 cdef class CPU6502:    
     cdef uint8_t read(self, uint16_t addr):
-        addr &= 0xFFFF
+        cdef uint8_t* page = self.bus.read_pages[addr >> 8]
+        if page != NULL:
+            return page[addr & 0xFF]
         return self.bus.read(addr, False)
 
     cdef void write(self, uint16_t addr, uint8_t data):                      
-        addr, data = addr & 0xFFFF, data & 0xFF
+        cdef uint8_t* page = self.bus.write_pages[addr >> 8]
+        if page != NULL:
+            page[addr & 0xFF] = data
+            return
         self.bus.write(addr, data)
 
     cdef void set_fetched(self, uint8_t fetched):
@@ -53,102 +58,77 @@ cdef class CPU6502:
         cdef uint16_t hi = <uint16_t> self.pull()
         return hi << 8 | lo
 
-    cpdef uint8_t IMP(self):
+    cdef uint8_t IMP(self, uint8_t lo, uint8_t hi):
         '''
         Address Mode: Implied
         '''
         self.set_fetched(self.registers.A)
         return 0
 
-    cpdef uint8_t IMM(self):
+    cdef uint8_t IMM(self, uint8_t lo, uint8_t hi):
         '''
         Address Mode: Immediate
         '''
-        self.set_addr_abs(self.registers.PC)
-        self.registers.PC = self.registers.PC + 1
+        self.set_addr_abs(<uint16_t> (self.registers.PC - 1))
         return 0
 
-    cpdef uint8_t ZP0(self):
+    cdef uint8_t ZP0(self, uint8_t lo, uint8_t hi):
         '''
         Address Mode: Zero Page
         '''
-        self.set_addr_abs(self.read(self.registers.PC) & 0x00FF)
-        self.registers.PC = self.registers.PC + 1
+        self.set_addr_abs(lo)
         return 0
 
-    cpdef uint8_t ZPX(self):
+    cdef uint8_t ZPX(self, uint8_t lo, uint8_t hi):
         '''
         Address Mode: Zero Page with X Offset
         '''
-        self.set_addr_abs((self.read(self.registers.PC) + self.registers.X) & 0x00FF)
-        self.registers.PC = self.registers.PC + 1
+        self.set_addr_abs((lo + self.registers.X) & 0x00FF)
         return 0
 
-    cpdef uint8_t ZPY(self):
+    cdef uint8_t ZPY(self, uint8_t lo, uint8_t hi):
         '''
         Address Mode: Zero Page with Y Offset
         '''
-        self.set_addr_abs((self.read(self.registers.PC) + self.registers.Y) & 0x00FF)
-        self.registers.PC = self.registers.PC + 1
+        self.set_addr_abs((lo + self.registers.Y) & 0x00FF)
         return 0
 
-    cpdef uint8_t REL(self):
+    cdef uint8_t REL(self, uint8_t lo, uint8_t hi):
         '''
         Address Mode: Relative 
         '''
-        self.set_addr_rel(self.read(self.registers.PC))
-        self.registers.PC = self.registers.PC + 1
+        self.set_addr_rel(lo)
         if (self.addr_rel & 0x80):
             self.set_addr_rel(self.addr_rel | 0xFF00)
         return 0
 
-    cpdef uint8_t ABS(self):
+    cdef uint8_t ABS(self, uint8_t lo, uint8_t hi):
         '''
         Address Mode: Absolute 
         '''
-        cdef uint8_t lo = self.read(self.registers.PC)
-        self.registers.PC = self.registers.PC + 1
-        cdef uint8_t hi = self.read(self.registers.PC)
-        self.registers.PC = self.registers.PC + 1
-        
         self.set_addr_abs((hi << 8) | lo)
         return 0
 
-    cpdef uint8_t ABX(self):
+    cdef uint8_t ABX(self, uint8_t lo, uint8_t hi):
         '''
         Address Mode: Absolute with X Offset
         '''
-        cdef uint8_t lo = self.read(self.registers.PC)
-        self.registers.PC = self.registers.PC + 1
-        cdef uint8_t hi = self.read(self.registers.PC)
-        self.registers.PC = self.registers.PC + 1
-        
         self.set_addr_abs(<uint16_t> (hi << 8 | lo) + self.registers.X)
                 
         return 1 if (self.addr_abs & 0xFF00) != (hi << 8) else 0
 
-    cpdef uint8_t ABY(self):
+    cdef uint8_t ABY(self, uint8_t lo, uint8_t hi):
         '''
         Address Mode: Absolute with Y Offset
         '''
-        cdef uint8_t lo = self.read(self.registers.PC)
-        self.registers.PC = self.registers.PC + 1
-        cdef uint8_t hi = self.read(self.registers.PC)
-        self.registers.PC = self.registers.PC + 1
-        
         self.set_addr_abs(<uint16_t> (hi << 8 | lo) + self.registers.Y)
         
         return 1 if (self.addr_abs & 0xFF00) != (hi << 8) else 0
 
-    cpdef uint8_t IND(self):
+    cdef uint8_t IND(self, uint8_t ptr_lo, uint8_t ptr_hi):
         '''
         Address Mode: Indirect
         '''
-        cdef uint8_t ptr_lo = self.read(self.registers.PC)
-        self.registers.PC = self.registers.PC + 1
-        cdef uint8_t ptr_hi = self.read(self.registers.PC)
-        self.registers.PC = self.registers.PC + 1
-        
         cdef uint16_t ptr = (ptr_hi << 8) | ptr_lo
         if ptr_lo == 0x00FF:
             self.set_addr_abs((self.read(ptr & 0xFF00) << 8) | (self.read(ptr + 0)))
@@ -157,32 +137,176 @@ cdef class CPU6502:
 
         return 0
 
-    cpdef uint8_t IZX(self):
+    cdef uint8_t IZX(self, uint8_t t, uint8_t unused):
         '''
         Address Mode: Indirect X / Indexed Indirect
         '''
-        cdef uint8_t t = self.read(self.registers.PC)
-        self.registers.PC = self.registers.PC + 1
-
         cdef uint8_t lo = self.read((t + self.registers.X) & 0x00FF)
         cdef uint8_t hi = self.read((t + self.registers.X + 1) & 0x00FF)     
         self.set_addr_abs((hi << 8) | lo)
 
         return 0
 
-    cpdef uint8_t IZY(self):
+    cdef uint8_t IZY(self, uint8_t t, uint8_t unused):
         '''
         Address Mode: Indirect Y / Indirect Indexed
         '''
-        cdef uint8_t t = self.read(self.registers.PC)
-        self.registers.PC = self.registers.PC + 1
-        
         cdef uint8_t lo = self.read(t & 0x00FF)
         cdef uint8_t hi = self.read((t + 1) & 0x00FF)
         self.set_addr_abs(((hi << 8) | lo) + self.registers.Y)
 
         return 1 if (self.addr_abs & 0xFF00) != (hi << 8) else 0
 
+    cdef uint8_t addressing(self, uint8_t addrmode, uint8_t lo, uint8_t hi):
+        '''
+        dispatch addressing mode on the operand bytes, compiled to a C switch
+        '''
+        if addrmode == AddressingMode.IMP:
+            return self.IMP(lo, hi)
+        elif addrmode == AddressingMode.IMM:
+            return self.IMM(lo, hi)
+        elif addrmode == AddressingMode.ZP0:
+            return self.ZP0(lo, hi)
+        elif addrmode == AddressingMode.ZPX:
+            return self.ZPX(lo, hi)
+        elif addrmode == AddressingMode.ZPY:
+            return self.ZPY(lo, hi)
+        elif addrmode == AddressingMode.REL:
+            return self.REL(lo, hi)
+        elif addrmode == AddressingMode.ABS:
+            return self.ABS(lo, hi)
+        elif addrmode == AddressingMode.ABX:
+            return self.ABX(lo, hi)
+        elif addrmode == AddressingMode.ABY:
+            return self.ABY(lo, hi)
+        elif addrmode == AddressingMode.IND:
+            return self.IND(lo, hi)
+        elif addrmode == AddressingMode.IZX:
+            return self.IZX(lo, hi)
+        elif addrmode == AddressingMode.IZY:
+            return self.IZY(lo, hi)
+        return 0
+
+    cdef uint8_t operate(self, uint8_t instruction):
+        '''
+        dispatch instruction, compiled to a C switch
+        '''
+        if instruction == Instruction.ADC:
+            return self.ADC()
+        elif instruction == Instruction.SBC:
+            return self.SBC()
+        elif instruction == Instruction.AND:
+            return self.AND()
+        elif instruction == Instruction.ASL:
+            return self.ASL()
+        elif instruction == Instruction.BCC:
+            return self.BCC()
+        elif instruction == Instruction.BCS:
+            return self.BCS()
+        elif instruction == Instruction.BEQ:
+            return self.BEQ()
+        elif instruction == Instruction.BIT:
+            return self.BIT()
+        elif instruction == Instruction.BMI:
+            return self.BMI()
+        elif instruction == Instruction.BNE:
+            return self.BNE()
+        elif instruction == Instruction.BPL:
+            return self.BPL()
+        elif instruction == Instruction.BRK:
+            return self.BRK()
+        elif instruction == Instruction.BVC:
+            return self.BVC()
+        elif instruction == Instruction.BVS:
+            return self.BVS()
+        elif instruction == Instruction.CLC:
+            return self.CLC()
+        elif instruction == Instruction.CLD:
+            return self.CLD()
+        elif instruction == Instruction.CLI:
+            return self.CLI()
+        elif instruction == Instruction.CLV:
+            return self.CLV()
+        elif instruction == Instruction.CMP:
+            return self.CMP()
+        elif instruction == Instruction.CPX:
+            return self.CPX()
+        elif instruction == Instruction.CPY:
+            return self.CPY()
+        elif instruction == Instruction.DEC:
+            return self.DEC()
+        elif instruction == Instruction.DEX:
+            return self.DEX()
+        elif instruction == Instruction.DEY:
+            return self.DEY()
+        elif instruction == Instruction.EOR:
+            return self.EOR()
+        elif instruction == Instruction.INC:
+            return self.INC()
+        elif instruction == Instruction.INX:
+            return self.INX()
+        elif instruction == Instruction.INY:
+            return self.INY()
+        elif instruction == Instruction.JMP:
+            return self.JMP()
+        elif instruction == Instruction.JSR:
+            return self.JSR()
+        elif instruction == Instruction.LDA:
+            return self.LDA()
+        elif instruction == Instruction.LDX:
+            return self.LDX()
+        elif instruction == Instruction.LDY:
+            return self.LDY()
+        elif instruction == Instruction.LSR:
+            return self.LSR()
+        elif instruction == Instruction.NOP:
+            return self.NOP()
+        elif instruction == Instruction.ORA:
+            return self.ORA()
+        elif instruction == Instruction.PHA:
+            return self.PHA()
+        elif instruction == Instruction.PHP:
+            return self.PHP()
+        elif instruction == Instruction.PLA:
+            return self.PLA()
+        elif instruction == Instruction.PLP:
+            return self.PLP()
+        elif instruction == Instruction.ROL:
+            return self.ROL()
+        elif instruction == Instruction.ROR:
+            return self.ROR()
+        elif instruction == Instruction.RTI:
+            return self.RTI()
+        elif instruction == Instruction.RTS:
+            return self.RTS()
+        elif instruction == Instruction.SEC:
+            return self.SEC()
+        elif instruction == Instruction.SED:
+            return self.SED()
+        elif instruction == Instruction.SEI:
+            return self.SEI()
+        elif instruction == Instruction.STA:
+            return self.STA()
+        elif instruction == Instruction.STX:
+            return self.STX()
+        elif instruction == Instruction.STY:
+            return self.STY()
+        elif instruction == Instruction.TAX:
+            return self.TAX()
+        elif instruction == Instruction.TAY:
+            return self.TAY()
+        elif instruction == Instruction.TSX:
+            return self.TSX()
+        elif instruction == Instruction.TXA:
+            return self.TXA()
+        elif instruction == Instruction.TXS:
+            return self.TXS()
+        elif instruction == Instruction.TYA:
+            return self.TYA()
+        elif instruction == Instruction.XXX:
+            return self.XXX()
+        return 0
+
     cdef void set_temp(self, uint16_t temp):
         self.temp = temp & 0xFFFF
 
@@ -190,11 +314,11 @@ cdef class CPU6502:
         '''
         fetch opcode
         '''
-        if self.lookup[self.opcode].addrmode != self.IMP:
+        if OP_ADDRMODE[self.opcode] != AddressingMode.IMP:
             self.fetched = self.read(self.addr_abs)
         return self.fetched
 
-    cpdef uint8_t ADC(self):
+    cdef uint8_t ADC(self):
         '''
         Instruction: Add with Carry In
         Function:    A = A + M + C
@@ -212,7 +336,7 @@ cdef class CPU6502:
         self.registers.A = self.temp & 0x00FF
         return 1
 
-    cpdef uint8_t SBC(self):
+    cdef uint8_t SBC(self):
         '''
         Instruction: Subtraction with Borrow In
         Function:    A = A - M - (1 - C)
@@ -231,7 +355,7 @@ cdef class CPU6502:
         self.registers.A = self.temp & 0x00FF
         return 1
 
-    cpdef uint8_t AND(self):
+    cdef uint8_t AND(self):
         '''
         Instruction: Bitwise Logic AND
         Function:    A = A & M
@@ -246,7 +370,7 @@ cdef class CPU6502:
         
         return 1
 
-    cpdef uint8_t ASL(self):
+    cdef uint8_t ASL(self):
         '''
         Instruction: Arithmetic Shift Left
         Function:    A = C <- (A << 1) <- 0
@@ -260,13 +384,13 @@ cdef class CPU6502:
         self.registers.status.bits.Z = self.temp & 0x00FF == 0x0000
         self.registers.status.bits.N = self.temp & 0x80 > 0
         
-        if (self.lookup[self.opcode].addrmode == self.IMP):
+        if (OP_ADDRMODE[self.opcode] == AddressingMode.IMP):
             self.registers.A = self.temp & 0x00FF
         else:
             self.write(self.addr_abs, self.temp & 0x00FF)
         return 0
 
-    cpdef uint8_t BCC(self):
+    cdef uint8_t BCC(self):
         '''
         Instruction: Branch if Carry Clear
         Function:    if(C == 0) pc = address 
@@ -282,7 +406,7 @@ cdef class CPU6502:
             self.registers.PC = self.addr_abs
         return 0
 
-    cpdef uint8_t BCS(self):
+    cdef uint8_t BCS(self):
         '''
         Instruction: Branch if Carry Set
         Function:    if(C == 1) pc = address
@@ -298,7 +422,7 @@ cdef class CPU6502:
             self.registers.PC = self.addr_abs
         return 0
 
-    cpdef uint8_t BEQ(self):
+    cdef uint8_t BEQ(self):
         '''
         Instruction: Branch if Equal
         Function:    if(Z == 1) pc = address
@@ -314,7 +438,7 @@ cdef class CPU6502:
             self.registers.PC = self.addr_abs
         return 0
 
-    cpdef uint8_t BIT(self):
+    cdef uint8_t BIT(self):
         ''' 
         Return:      Require additional 0 clock cycle
         '''
@@ -327,7 +451,7 @@ cdef class CPU6502:
 
         return 0
 
-    cpdef uint8_t BMI(self):
+    cdef uint8_t BMI(self):
         '''
         Instruction: Branch if Negative
         Function:    if(N == 1) pc = address
@@ -342,7 +466,7 @@ cdef class CPU6502:
             self.registers.PC = self.addr_abs
         return 0
 
-    cpdef uint8_t BNE(self):
+    cdef uint8_t BNE(self):
         '''
         Instruction: Branch if Not Equal
         Function:    if(Z == 0) pc = address
@@ -358,7 +482,7 @@ cdef class CPU6502:
             self.registers.PC = self.addr_abs
         return 0
 
-    cpdef uint8_t BPL(self):
+    cdef uint8_t BPL(self):
         '''
         Instruction: Branch if Positive
         Function:    if(N == 0) pc = address
@@ -375,7 +499,7 @@ cdef class CPU6502:
     
         return 0
 
-    cpdef uint8_t BRK(self):
+    cdef uint8_t BRK(self):
         '''
         Instruction: Break
         Function:    Program Sourced Interrupt
@@ -393,7 +517,7 @@ cdef class CPU6502:
         self.registers.PC = self.read(0xFFFE) | self.read(0xFFFF) << 8
         return 0
 
-    cpdef uint8_t BVC(self):
+    cdef uint8_t BVC(self):
         '''
         Instruction: Branch if Overflow Clear
         Function:    if(V == 0) pc = address
@@ -409,7 +533,7 @@ cdef class CPU6502:
             self.registers.PC = self.addr_abs
         return 0
 
-    cpdef uint8_t BVS(self):
+    cdef uint8_t BVS(self):
         '''
         Instruction: Branch if Overflow Set
         Function:    if(V == 1) pc = address
@@ -425,7 +549,7 @@ cdef class CPU6502:
             self.registers.PC = self.addr_abs
         return 0
 
-    cpdef uint8_t CLC(self):
+    cdef uint8_t CLC(self):
         '''
         Instruction: Clear Carry Flag
         Function:    C = 0
@@ -434,7 +558,7 @@ cdef class CPU6502:
         self.registers.status.bits.C = False
         return 0
 
-    cpdef uint8_t CLD(self):
+    cdef uint8_t CLD(self):
         '''
         Instruction: Clear Decimal Flag
         Function:    D = 0
@@ -443,7 +567,7 @@ cdef class CPU6502:
         self.registers.status.bits.D = False
         return 0
 
-    cpdef uint8_t CLI(self):
+    cdef uint8_t CLI(self):
         '''
         Instruction: Disable Interrupts / Clear Interrupt Flag
         Function:    I = 0
@@ -452,7 +576,7 @@ cdef class CPU6502:
         self.registers.status.bits.I = False
         return 0
 
-    cpdef uint8_t CLV(self):
+    cdef uint8_t CLV(self):
         '''
         Instruction: Clear Overflow Flag
         Function:    V = 0
@@ -461,7 +585,7 @@ cdef class CPU6502:
         self.registers.status.bits.V = False
         return 0
 
-    cpdef uint8_t CMP(self):
+    cdef uint8_t CMP(self):
         '''
         Instruction: Compare Accumulator
         Function:    C <- A >= M      Z <- (A - M) == 0
@@ -475,7 +599,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.temp & 0x0080 > 0
         return 1
 
-    cpdef uint8_t CPX(self):
+    cdef uint8_t CPX(self):
         '''
         Instruction: Compare X Register
         Function:    C <- X >= M      Z <- (X - M) == 0
@@ -489,7 +613,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.temp & 0x0080 > 0
         return 0
 
-    cpdef uint8_t CPY(self):
+    cdef uint8_t CPY(self):
         '''
         Instruction: Compare Y Register
         Function:    C <- Y >= M      Z <- (Y - M) == 0
@@ -503,7 +627,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.temp & 0x0080 > 0
         return 0
 
-    cpdef uint8_t DEC(self):
+    cdef uint8_t DEC(self):
         '''
         Instruction: Decrement Value at Memory Location
         Function:    M = M - 1
@@ -517,7 +641,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.temp & 0x0080 > 0
         return 0
 
-    cpdef uint8_t DEX(self):
+    cdef uint8_t DEX(self):
         '''
         Instruction: Decrement X Register
         Function:    X = X - 1
@@ -529,7 +653,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.X & 0x80 > 0
         return 0
 
-    cpdef uint8_t DEY(self):
+    cdef uint8_t DEY(self):
         '''
         Instruction: Decrement Y Register
         Function:    Y = Y - 1
@@ -541,7 +665,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.Y & 0x80 > 0
         return 0
 
-    cpdef uint8_t EOR(self):
+    cdef uint8_t EOR(self):
         '''
         Instruction: Bitwise Logic XOR
         Function:    A = A xor M
@@ -554,7 +678,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.A & 0x80 > 0
         return 1
 
-    cpdef uint8_t INC(self):
+    cdef uint8_t INC(self):
         '''
         Instruction: Increment Value at Memory Location
         Function:    M = M + 1
@@ -568,7 +692,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.temp & 0x0080 > 0
         return 0
 
-    cpdef uint8_t INX(self):
+    cdef uint8_t INX(self):
         '''
         Instruction: Increment X Register
         Function:    X = X + 1
@@ -580,7 +704,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.X & 0x80 > 0
         return 0
 
-    cpdef uint8_t INY(self):
+    cdef uint8_t INY(self):
         '''
         Instruction: Increment Y Register
         Function:    Y = Y + 1
@@ -592,7 +716,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.Y & 0x80 > 0
         return 0
 
-    cpdef uint8_t JMP(self):
+    cdef uint8_t JMP(self):
         '''
         Instruction: Jump To Location
         Function:    pc = address
@@ -601,7 +725,7 @@ cdef class CPU6502:
         self.registers.PC = self.addr_abs
         return 0
 
-    cpdef uint8_t JSR(self):
+    cdef uint8_t JSR(self):
         '''
         Instruction: Jump To Sub-Routine
         Function:    Push current pc to stack, pc = address
@@ -612,7 +736,7 @@ cdef class CPU6502:
         self.registers.PC = self.addr_abs
         return 0
 
-    cpdef uint8_t LDA(self):
+    cdef uint8_t LDA(self):
         '''
         Instruction: Load The Accumulator
         Function:    A = M
@@ -625,7 +749,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.A & 0x80 > 0
         return 1
 
-    cpdef uint8_t LDX(self):
+    cdef uint8_t LDX(self):
         '''
         Instruction: Load The X Register
         Function:    X = M
@@ -638,7 +762,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.X & 0x80 > 0
         return 1
 
-    cpdef uint8_t LDY(self):
+    cdef uint8_t LDY(self):
         '''
         Instruction: Load The Y Register
         Function:    Y = M
@@ -651,7 +775,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.Y & 0x80 > 0
         return 1
 
-    cpdef uint8_t LSR(self):
+    cdef uint8_t LSR(self):
         '''
         Return:      Require additional 0 clock cycle
         '''
@@ -660,13 +784,13 @@ cdef class CPU6502:
         self.set_temp(self.fetched >> 1)   
         self.registers.status.bits.Z = self.temp & 0x00FF == 0x0000
         self.registers.status.bits.N = self.temp & 0x0080 > 0
-        if (self.lookup[self.opcode].addrmode == self.IMP):
+        if (OP_ADDRMODE[self.opcode] == AddressingMode.IMP):
             self.registers.A = self.temp & 0x00FF
         else:
             self.write(self.addr_abs, self.temp & 0x00FF)
         return 0
 
-    cpdef uint8_t NOP(self):
+    cdef uint8_t NOP(self):
         '''
         Instruction: Do nothing
         Return:      Require additional 0 or 1 clock cycle
@@ -679,7 +803,7 @@ cdef class CPU6502:
             or self.opcode == 0xFC \
             else 0
 
-    cpdef uint8_t ORA(self):
+    cdef uint8_t ORA(self):
         '''
         Instruction: Bitwise Logic OR
         Function:    A = A | M
@@ -692,7 +816,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.A & 0x80 > 0
         return 1
 
-    cpdef uint8_t PHA(self):
+    cdef uint8_t PHA(self):
         '''
         Instruction: Push Accumulator to Stack
         Function:    A -> stack
@@ -701,7 +825,7 @@ cdef class CPU6502:
         self.push(self.registers.A)
         return 0
 
-    cpdef uint8_t PHP(self):
+    cdef uint8_t PHP(self):
         '''
         Instruction: Push Status Register to Stack
         Function:    status -> stack
@@ -712,7 +836,7 @@ cdef class CPU6502:
         self.registers.status.bits.U = False
         return 0
 
-    cpdef uint8_t PLA(self):
+    cdef uint8_t PLA(self):
         '''
         Instruction: Pop Accumulator off Stack
         Function:    A <- stack
@@ -724,7 +848,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.A & 0x80 > 0
         return 0
 
-    cpdef uint8_t PLP(self):
+    cdef uint8_t PLP(self):
         '''
         Instruction: Pop Status Register off Stack
         Function:    Status <- stack
@@ -734,7 +858,7 @@ cdef class CPU6502:
         self.registers.status.bits.U = True
         return 0
 
-    cpdef uint8_t ROL(self):
+    cdef uint8_t ROL(self):
         '''
         Return:      Require additional 0 clock cycle
         '''
@@ -743,13 +867,13 @@ cdef class CPU6502:
         self.registers.status.bits.C = self.temp & 0xFF00 > 0
         self.registers.status.bits.Z = self.temp & 0x00FF == 0x0000
         self.registers.status.bits.N = self.temp & 0x0080 > 0
-        if (self.lookup[self.opcode].addrmode == self.IMP):
+        if (OP_ADDRMODE[self.opcode] == AddressingMode.IMP):
             self.registers.A = self.temp & 0x00FF
         else:
             self.write(self.addr_abs, self.temp & 0x00FF)
         return 0
 
-    cpdef uint8_t ROR(self):
+    cdef uint8_t ROR(self):
         '''
         Return:      Require additional 0 clock cycle
         '''
@@ -758,13 +882,13 @@ cdef class CPU6502:
         self.registers.status.bits.C = self.fetched & 0x01 > 0
         self.registers.status.bits.Z = self.temp & 0x00FF == 0x00
         self.registers.status.bits.N = self.temp & 0x0080 > 0
-        if (self.lookup[self.opcode].addrmode == self.IMP):
+        if (OP_ADDRMODE[self.opcode] == AddressingMode.IMP):
             self.registers.A = self.temp & 0x00FF
         else:
             self.write(self.addr_abs, self.temp & 0x00FF)
         return 0
 
-    cpdef uint8_t RTI(self):
+    cdef uint8_t RTI(self):
         '''
         Return:      Require additional 0 clock cycle
         '''
@@ -775,7 +899,7 @@ cdef class CPU6502:
         self.registers.PC = self.pull_2_bytes()
         return 0
 
-    cpdef uint8_t RTS(self):
+    cdef uint8_t RTS(self):
         '''
         Return:      Require additional 0 clock cycle
         '''
@@ -784,7 +908,7 @@ cdef class CPU6502:
         self.registers.PC = self.registers.PC + 1
         return 0
 
-    cpdef uint8_t SEC(self):
+    cdef uint8_t SEC(self):
         '''
         Instruction: Set Carry Flag
         Function:    C = 1 
@@ -793,7 +917,7 @@ cdef class CPU6502:
         self.registers.status.bits.C = True
         return 0
 
-    cpdef uint8_t SED(self):
+    cdef uint8_t SED(self):
         '''
         Instruction: Set Decimal Flag
         Function:    D = 1
@@ -802,7 +926,7 @@ cdef class CPU6502:
         self.registers.status.bits.D = True
         return 0
 
-    cpdef uint8_t SEI(self):
+    cdef uint8_t SEI(self):
         '''
         Instruction: Set Interrupt Flag / Enable Interrupts
         Function:    I = 1
@@ -811,7 +935,7 @@ cdef class CPU6502:
         self.registers.status.bits.I = True
         return 0
 
-    cpdef uint8_t STA(self):
+    cdef uint8_t STA(self):
         '''
         Instruction: Store Accumulator at Address
         Function:    M = A
@@ -820,7 +944,7 @@ cdef class CPU6502:
         self.write(self.addr_abs, self.registers.A)
         return 0
 
-    cpdef uint8_t STX(self):
+    cdef uint8_t STX(self):
         '''
         Instruction: Store X Register at Address
         Function:    M = X
@@ -829,7 +953,7 @@ cdef class CPU6502:
         self.write(self.addr_abs, self.registers.X)
         return 0
 
-    cpdef uint8_t STY(self):
+    cdef uint8_t STY(self):
         '''
         Instruction: Store Y Register at Address
         Function:    M = Y
@@ -838,7 +962,7 @@ cdef class CPU6502:
         self.write(self.addr_abs, self.registers.Y)
         return 0
 
-    cpdef uint8_t TAX(self):
+    cdef uint8_t TAX(self):
         '''
         Instruction: Transfer Accumulator to X Register
         Function:    X = A
@@ -850,7 +974,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.X & 0x80 > 0
         return 0
 
-    cpdef uint8_t TAY(self):
+    cdef uint8_t TAY(self):
         '''
         Instruction: Transfer Accumulator to Y Register
         Function:    Y = A
@@ -862,7 +986,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.Y & 0x80 > 0
         return 0
 
-    cpdef uint8_t TSX(self):
+    cdef uint8_t TSX(self):
         '''
         Instruction: Transfer Stack Pointer to X Register
         Function:    X = stack pointer
@@ -874,7 +998,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.X & 0x80 > 0
         return 0
 
-    cpdef uint8_t TXA(self):
+    cdef uint8_t TXA(self):
         '''
         Instruction: Transfer X Register to Accumulator
         Function:    A = X
@@ -886,7 +1010,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.A & 0x80 > 0
         return 0
 
-    cpdef uint8_t TXS(self):
+    cdef uint8_t TXS(self):
         '''
         Instruction: Transfer X Register to Stack Pointer
         Function:    stack pointer = X
@@ -895,7 +1019,7 @@ cdef class CPU6502:
         self.registers.SP = self.registers.X
         return 0
 
-    cpdef uint8_t TYA(self):
+    cdef uint8_t TYA(self):
         '''
         Instruction: Transfer Y Register to Accumulator
         Function:    A = Y
@@ -907,7 +1031,7 @@ cdef class CPU6502:
         self.registers.status.bits.N = self.registers.A & 0x80 > 0
         return 0
 
-    cpdef uint8_t XXX(self):
+    cdef uint8_t XXX(self):
         '''
         Instruction: captures illegal opcodes
         Return:      Require additional 0 clock cycle
@@ -933,24 +1057,7 @@ cdef class CPU6502:
 
         self.clock_count = 0
 
-        self.lookup = [
-            Op( "BRK", self.BRK, self.IMM, 7 ),Op( "ORA", self.ORA, self.IZX, 6 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 8 ),Op( "???", self.NOP, self.IMP, 3 ),Op( "ORA", self.ORA, self.ZP0, 3 ),Op( "ASL", self.ASL, self.ZP0, 5 ),Op( "???", self.XXX, self.IMP, 5 ),Op( "PHP", self.PHP, self.IMP, 3 ),Op( "ORA", self.ORA, self.IMM, 2 ),Op( "ASL", self.ASL, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "???", self.NOP, self.IMP, 4 ),Op( "ORA", self.ORA, self.ABS, 4 ),Op( "ASL", self.ASL, self.ABS, 6 ),Op( "???", self.XXX, self.IMP, 6 ),
-            Op( "BPL", self.BPL, self.REL, 2 ),Op( "ORA", self.ORA, self.IZY, 5 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 8 ),Op( "???", self.NOP, self.IMP, 4 ),Op( "ORA", self.ORA, self.ZPX, 4 ),Op( "ASL", self.ASL, self.ZPX, 6 ),Op( "???", self.XXX, self.IMP, 6 ),Op( "CLC", self.CLC, self.IMP, 2 ),Op( "ORA", self.ORA, self.ABY, 4 ),Op( "???", self.NOP, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 7 ),Op( "???", self.NOP, self.IMP, 4 ),Op( "ORA", self.ORA, self.ABX, 4 ),Op( "ASL", self.ASL, self.ABX, 7 ),Op( "???", self.XXX, self.IMP, 7 ),
-            Op( "JSR", self.JSR, self.ABS, 6 ),Op( "AND", self.AND, self.IZX, 6 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 8 ),Op( "BIT", self.BIT, self.ZP0, 3 ),Op( "AND", self.AND, self.ZP0, 3 ),Op( "ROL", self.ROL, self.ZP0, 5 ),Op( "???", self.XXX, self.IMP, 5 ),Op( "PLP", self.PLP, self.IMP, 4 ),Op( "AND", self.AND, self.IMM, 2 ),Op( "ROL", self.ROL, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "BIT", self.BIT, self.ABS, 4 ),Op( "AND", self.AND, self.ABS, 4 ),Op( "ROL", self.ROL, self.ABS, 6 ),Op( "???", self.XXX, self.IMP, 6 ),
-            Op( "BMI", self.BMI, self.REL, 2 ),Op( "AND", self.AND, self.IZY, 5 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 8 ),Op( "???", self.NOP, self.IMP, 4 ),Op( "AND", self.AND, self.ZPX, 4 ),Op( "ROL", self.ROL, self.ZPX, 6 ),Op( "???", self.XXX, self.IMP, 6 ),Op( "SEC", self.SEC, self.IMP, 2 ),Op( "AND", self.AND, self.ABY, 4 ),Op( "???", self.NOP, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 7 ),Op( "???", self.NOP, self.IMP, 4 ),Op( "AND", self.AND, self.ABX, 4 ),Op( "ROL", self.ROL, self.ABX, 7 ),Op( "???", self.XXX, self.IMP, 7 ),
-            Op( "RTI", self.RTI, self.IMP, 6 ),Op( "EOR", self.EOR, self.IZX, 6 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 8 ),Op( "???", self.NOP, self.IMP, 3 ),Op( "EOR", self.EOR, self.ZP0, 3 ),Op( "LSR", self.LSR, self.ZP0, 5 ),Op( "???", self.XXX, self.IMP, 5 ),Op( "PHA", self.PHA, self.IMP, 3 ),Op( "EOR", self.EOR, self.IMM, 2 ),Op( "LSR", self.LSR, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "JMP", self.JMP, self.ABS, 3 ),Op( "EOR", self.EOR, self.ABS, 4 ),Op( "LSR", self.LSR, self.ABS, 6 ),Op( "???", self.XXX, self.IMP, 6 ),
-            Op( "BVC", self.BVC, self.REL, 2 ),Op( "EOR", self.EOR, self.IZY, 5 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 8 ),Op( "???", self.NOP, self.IMP, 4 ),Op( "EOR", self.EOR, self.ZPX, 4 ),Op( "LSR", self.LSR, self.ZPX, 6 ),Op( "???", self.XXX, self.IMP, 6 ),Op( "CLI", self.CLI, self.IMP, 2 ),Op( "EOR", self.EOR, self.ABY, 4 ),Op( "???", self.NOP, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 7 ),Op( "???", self.NOP, self.IMP, 4 ),Op( "EOR", self.EOR, self.ABX, 4 ),Op( "LSR", self.LSR, self.ABX, 7 ),Op( "???", self.XXX, self.IMP, 7 ),
-            Op( "RTS", self.RTS, self.IMP, 6 ),Op( "ADC", self.ADC, self.IZX, 6 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 8 ),Op( "???", self.NOP, self.IMP, 3 ),Op( "ADC", self.ADC, self.ZP0, 3 ),Op( "ROR", self.ROR, self.ZP0, 5 ),Op( "???", self.XXX, self.IMP, 5 ),Op( "PLA", self.PLA, self.IMP, 4 ),Op( "ADC", self.ADC, self.IMM, 2 ),Op( "ROR", self.ROR, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "JMP", self.JMP, self.IND, 5 ),Op( "ADC", self.ADC, self.ABS, 4 ),Op( "ROR", self.ROR, self.ABS, 6 ),Op( "???", self.XXX, self.IMP, 6 ),
-            Op( "BVS", self.BVS, self.REL, 2 ),Op( "ADC", self.ADC, self.IZY, 5 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 8 ),Op( "???", self.NOP, self.IMP, 4 ),Op( "ADC", self.ADC, self.ZPX, 4 ),Op( "ROR", self.ROR, self.ZPX, 6 ),Op( "???", self.XXX, self.IMP, 6 ),Op( "SEI", self.SEI, self.IMP, 2 ),Op( "ADC", self.ADC, self.ABY, 4 ),Op( "???", self.NOP, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 7 ),Op( "???", self.NOP, self.IMP, 4 ),Op( "ADC", self.ADC, self.ABX, 4 ),Op( "ROR", self.ROR, self.ABX, 7 ),Op( "???", self.XXX, self.IMP, 7 ),
-            Op( "???", self.NOP, self.IMP, 2 ),Op( "STA", self.STA, self.IZX, 6 ),Op( "???", self.NOP, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 6 ),Op( "STY", self.STY, self.ZP0, 3 ),Op( "STA", self.STA, self.ZP0, 3 ),Op( "STX", self.STX, self.ZP0, 3 ),Op( "???", self.XXX, self.IMP, 3 ),Op( "DEY", self.DEY, self.IMP, 2 ),Op( "???", self.NOP, self.IMP, 2 ),Op( "TXA", self.TXA, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "STY", self.STY, self.ABS, 4 ),Op( "STA", self.STA, self.ABS, 4 ),Op( "STX", self.STX, self.ABS, 4 ),Op( "???", self.XXX, self.IMP, 4 ),
-            Op( "BCC", self.BCC, self.REL, 2 ),Op( "STA", self.STA, self.IZY, 6 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 6 ),Op( "STY", self.STY, self.ZPX, 4 ),Op( "STA", self.STA, self.ZPX, 4 ),Op( "STX", self.STX, self.ZPY, 4 ),Op( "???", self.XXX, self.IMP, 4 ),Op( "TYA", self.TYA, self.IMP, 2 ),Op( "STA", self.STA, self.ABY, 5 ),Op( "TXS", self.TXS, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 5 ),Op( "???", self.NOP, self.IMP, 5 ),Op( "STA", self.STA, self.ABX, 5 ),Op( "???", self.XXX, self.IMP, 5 ),Op( "???", self.XXX, self.IMP, 5 ),
-            Op( "LDY", self.LDY, self.IMM, 2 ),Op( "LDA", self.LDA, self.IZX, 6 ),Op( "LDX", self.LDX, self.IMM, 2 ),Op( "???", self.XXX, self.IMP, 6 ),Op( "LDY", self.LDY, self.ZP0, 3 ),Op( "LDA", self.LDA, self.ZP0, 3 ),Op( "LDX", self.LDX, self.ZP0, 3 ),Op( "???", self.XXX, self.IMP, 3 ),Op( "TAY", self.TAY, self.IMP, 2 ),Op( "LDA", self.LDA, self.IMM, 2 ),Op( "TAX", self.TAX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "LDY", self.LDY, self.ABS, 4 ),Op( "LDA", self.LDA, self.ABS, 4 ),Op( "LDX", self.LDX, self.ABS, 4 ),Op( "???", self.XXX, self.IMP, 4 ),
-            Op( "BCS", self.BCS, self.REL, 2 ),Op( "LDA", self.LDA, self.IZY, 5 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 5 ),Op( "LDY", self.LDY, self.ZPX, 4 ),Op( "LDA", self.LDA, self.ZPX, 4 ),Op( "LDX", self.LDX, self.ZPY, 4 ),Op( "???", self.XXX, self.IMP, 4 ),Op( "CLV", self.CLV, self.IMP, 2 ),Op( "LDA", self.LDA, self.ABY, 4 ),Op( "TSX", self.TSX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 4 ),Op( "LDY", self.LDY, self.ABX, 4 ),Op( "LDA", self.LDA, self.ABX, 4 ),Op( "LDX", self.LDX, self.ABY, 4 ),Op( "???", self.XXX, self.IMP, 4 ),
-            Op( "CPY", self.CPY, self.IMM, 2 ),Op( "CMP", self.CMP, self.IZX, 6 ),Op( "???", self.NOP, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 8 ),Op( "CPY", self.CPY, self.ZP0, 3 ),Op( "CMP", self.CMP, self.ZP0, 3 ),Op( "DEC", self.DEC, self.ZP0, 5 ),Op( "???", self.XXX, self.IMP, 5 ),Op( "INY", self.INY, self.IMP, 2 ),Op( "CMP", self.CMP, self.IMM, 2 ),Op( "DEX", self.DEX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "CPY", self.CPY, self.ABS, 4 ),Op( "CMP", self.CMP, self.ABS, 4 ),Op( "DEC", self.DEC, self.ABS, 6 ),Op( "???", self.XXX, self.IMP, 6 ),
-            Op( "BNE", self.BNE, self.REL, 2 ),Op( "CMP", self.CMP, self.IZY, 5 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 8 ),Op( "???", self.NOP, self.IMP, 4 ),Op( "CMP", self.CMP, self.ZPX, 4 ),Op( "DEC", self.DEC, self.ZPX, 6 ),Op( "???", self.XXX, self.IMP, 6 ),Op( "CLD", self.CLD, self.IMP, 2 ),Op( "CMP", self.CMP, self.ABY, 4 ),Op( "NOP", self.NOP, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 7 ),Op( "???", self.NOP, self.IMP, 4 ),Op( "CMP", self.CMP, self.ABX, 4 ),Op( "DEC", self.DEC, self.ABX, 7 ),Op( "???", self.XXX, self.IMP, 7 ),
-            Op( "CPX", self.CPX, self.IMM, 2 ),Op( "SBC", self.SBC, self.IZX, 6 ),Op( "???", self.NOP, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 8 ),Op( "CPX", self.CPX, self.ZP0, 3 ),Op( "SBC", self.SBC, self.ZP0, 3 ),Op( "INC", self.INC, self.ZP0, 5 ),Op( "???", self.XXX, self.IMP, 5 ),Op( "INX", self.INX, self.IMP, 2 ),Op( "SBC", self.SBC, self.IMM, 2 ),Op( "NOP", self.NOP, self.IMP, 2 ),Op( "???", self.SBC, self.IMP, 2 ),Op( "CPX", self.CPX, self.ABS, 4 ),Op( "SBC", self.SBC, self.ABS, 4 ),Op( "INC", self.INC, self.ABS, 6 ),Op( "???", self.XXX, self.IMP, 6 ),
-            Op( "BEQ", self.BEQ, self.REL, 2 ),Op( "SBC", self.SBC, self.IZY, 5 ),Op( "???", self.XXX, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 8 ),Op( "???", self.NOP, self.IMP, 4 ),Op( "SBC", self.SBC, self.ZPX, 4 ),Op( "INC", self.INC, self.ZPX, 6 ),Op( "???", self.XXX, self.IMP, 6 ),Op( "SED", self.SED, self.IMP, 2 ),Op( "SBC", self.SBC, self.ABY, 4 ),Op( "NOP", self.NOP, self.IMP, 2 ),Op( "???", self.XXX, self.IMP, 7 ),Op( "???", self.NOP, self.IMP, 4 ),Op( "SBC", self.SBC, self.ABX, 4 ),Op( "INC", self.INC, self.ABX, 7 ),Op( "???", self.XXX, self.IMP, 7 ),
-        ]
+        self.lookup = LOOKUP
 
     cdef void power_up(self):
         '''
@@ -1018,25 +1125,39 @@ cdef class CPU6502:
         '''
         Perform one clock cycle
         '''
-        cdef Op op 
-        cdef uint8_t op_cycles = 0
+        cdef uint8_t opcode, addrmode
+        cdef uint8_t lo = 0, hi = 0
+
+        if self.remaining_cycles == 0:
+            opcode = self.read(self.registers.PC)
+            addrmode = OP_ADDRMODE[opcode]
+            if addrmode != AddressingMode.IMP and addrmode != AddressingMode.IMM:
+                lo = self.read(self.registers.PC + 1)
+                if ADDRMODE_LENGTH[addrmode] == 3:
+                    hi = self.read(self.registers.PC + 2)
+            return self.execute(opcode, lo, hi)
+        self.clock_count += 1
+        self.remaining_cycles -= 1
+        return 0
+
+    cdef uint8_t execute(self, uint8_t opcode, uint8_t lo, uint8_t hi) except *:
+        '''
+        clock() on the cycle an instruction is fetched, its operand bytes already read
+        '''
         cdef uint8_t additional_cycle1 = 0
         cdef uint8_t additional_cycle2 = 0
 
-        if self.remaining_cycles == 0:
-            self.opcode = self.read(self.registers.PC)
-            self.registers.status.bits.U = True
-            self.registers.PC = self.registers.PC + 1
-            op = self.lookup[self.opcode]
-            self.remaining_cycles = op.cycles
-            op_cycles = op.cycles
-            additional_cycle1 = op.addrmode()
-            additional_cycle2 = op.operate()
-            self.remaining_cycles += (additional_cycle1 & additional_cycle2)
-            self.registers.status.bits.U = True
+        self.opcode = opcode
+        self.registers.status.bits.U = True
+        self.registers.PC = self.registers.PC + ADDRMODE_LENGTH[OP_ADDRMODE[opcode]]
+        self.remaining_cycles = OP_CYCLES[opcode]
+        additional_cycle1 = self.addressing(OP_ADDRMODE[opcode], lo, hi)
+        additional_cycle2 = self.operate(OP_INSTRUCTION[opcode])
+        self.remaining_cycles += (additional_cycle1 & additional_cycle2)
+        self.registers.status.bits.U = True
         self.clock_count += 1
         self.remaining_cycles -= 1
-        return op_cycles + additional_cycle1 + additional_cycle2
+        return OP_CYCLES[opcode] + additional_cycle1 + additional_cycle2
 
     cpdef bint complete(self):
         return self.remaining_cycles == 0
@@ -1,10 +1,12 @@
 from libc.stdint cimport int8_t, uint16_t
 
 from nes.bus.bus cimport CPUBus
+from nes.cpu.disassembler cimport Disassembler
 
 
 cdef class CPUDebugger:
     cdef CPUBus bus
+    cdef public Disassembler disassembler
 
     cpdef dict status(self)
     cpdef dict registers(self)
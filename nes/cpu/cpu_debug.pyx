@@ -1,6 +1,7 @@
 cdef class CPUDebugger:
     def __init__(self, bus: CPUBus) -> None:
         self.bus = bus
+        self.disassembler = Disassembler(bus)
 
     cpdef dict status(self):
         return {
@@ -30,75 +31,7 @@ cdef class CPUDebugger:
         return hex_code
 
     cpdef dict to_asm(self, uint16_t start_addr, uint16_t end_addr):
-        asm = {}
-
-        addr: int = start_addr
-        while addr < end_addr:
-            opcode = self.bus.read(addr, True)
-            opaddr = addr
-            addr += 1
-            op = self.bus.cpu.lookup[opcode]
-            if op.addrmode.__name__ == "IMP":
-                value = "    "
-            if op.addrmode.__name__ == "IMM":
-                value = "#${value:02X}".format(value = self.bus.read(addr, True))
-                addr += 1
-            elif op.addrmode.__name__ == "ZP0":
-                lo = self.bus.read(addr, True)
-                addr += 1
-                value = "${value:02X}".format(value = lo) 
-            elif op.addrmode.__name__ == "ZPX":
-                lo = self.bus.read(addr, True)
-                addr += 1
-                value = "${value:02X},X".format(value = lo) 
-            elif op.addrmode.__name__ == "ZPY":
-                lo = self.bus.read(addr, True)
-                addr += 1
-                value = "${value:02X},Y".format(value = lo)
-            elif op.addrmode.__name__ == "IZX":
-                lo = self.bus.read(addr, True)
-                addr += 1
-                value = "(${value:02X},X)".format(value = lo)
-            elif op.addrmode.__name__ == "IZY":
-                lo = self.bus.read(addr, True)
-                addr += 1  
-                value = "(${value:02X},Y)".format(value = lo)  
-            elif op.addrmode.__name__ == "ABS":
-                lo = self.bus.read(addr, True)
-                addr += 1
-                hi = self.bus.read(addr, True)
-                addr += 1
-                value = "${value:02X}".format(value = hi << 8 | lo)
-            elif op.addrmode.__name__ == "ABX":
-                lo = self.bus.read(addr, True)
-                addr += 1
-                hi = self.bus.read(addr, True)
-                addr += 1
-                value = "${value:02X},X".format(value = hi << 8 | lo)
-            elif op.addrmode.__name__ == "ABY":
-                lo = self.bus.read(addr, True)
-                addr += 1
-                hi = self.bus.read(addr, True)
-                addr += 1
-                value = "${value:02X},Y".format(value = hi << 8 | lo)
-            elif op.addrmode.__name__ == "IND":
-                lo = self.bus.read(addr, True)
-                addr += 1
-                hi = self.bus.read(addr, True)
-                addr += 1
-                value = "(${value:02X})".format(value = hi << 8 | lo)
-            elif op.addrmode.__name__ == "REL":
-                inst = self.bus.read(addr, True)
-                addr += 1
-                offset = addr + <int8_t> inst
-                value = "${value:02X} [${offset:04X}]".format(value = inst, offset = offset)
-
-            asm[opaddr] = "${addr:04X}: {name} {value:11s} ({addrmode})".format(
-                addr = opaddr,
-                name = op.name,
-                value = value,
-                addrmode = op.addrmode.__name__)
-        return asm 
+        return self.disassembler.to_asm(start_addr, end_addr)
 
     cpdef uint16_t PC(self):
         return self.bus.cpu.registers.PC
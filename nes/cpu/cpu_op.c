@@ -0,0 +1,15008 @@
+/* Generated by Cython 3.3.0 */
+
+/* BEGIN: Cython Metadata
+{
+    "distutils": {
+        "depends": [],
+        "name": "nes.cpu.cpu_op",
+        "sources": [
+            "nes/cpu/cpu_op.pyx"
+        ]
+    },
+    "module_name": "nes.cpu.cpu_op"
+}
+END: Cython Metadata */
+
+#ifndef PY_SSIZE_T_CLEAN
+#define PY_SSIZE_T_CLEAN
+#endif /* PY_SSIZE_T_CLEAN */
+/* InitLimitedAPI */
+#if defined(Py_LIMITED_API)
+  #if !defined(CYTHON_LIMITED_API)
+  #define CYTHON_LIMITED_API 1
+  #endif
+#elif defined(CYTHON_LIMITED_API)
+  #ifdef _MSC_VER
+  #pragma message ("Limited API usage is enabled with 'CYTHON_LIMITED_API' but 'Py_LIMITED_API' does not define a Python target version. Consider setting 'Py_LIMITED_API' instead.")
+  #else
+  #warning Limited API usage is enabled with 'CYTHON_LIMITED_API' but 'Py_LIMITED_API' does not define a Python target version. Consider setting 'Py_LIMITED_API' instead.
+  #endif
+#endif
+
+#include "Python.h"
+#ifndef Py_PYTHON_H
+    #error Python headers needed to compile C extensions, please install development version of Python.
+#elif PY_VERSION_HEX < 0x03090000
+    #error Cython requires Python 3.9+.
+#elif defined(Py_LIMITED_API) && (Py_LIMITED_API & 0xFFFF0000) > (PY_VERSION_HEX & 0xFFFF0000)
+    #error 'Py_LIMITED_API' can only select past Python X.Y versions, not future ones.
+#else
+#define __PYX_ABI_VERSION "3_3_0"
+#define CYTHON_HEX_VERSION 0x030300F0
+#define CYTHON_FUTURE_DIVISION 1
+/* CModulePreamble */
+#include <stddef.h>
+#ifndef offsetof
+  #define offsetof(type, member) ( (size_t) & ((type*)0) -> member )
+#endif
+#if !defined(_WIN32) && !defined(WIN32) && !defined(MS_WINDOWS)
+  #ifndef __stdcall
+    #define __stdcall
+  #endif
+  #ifndef __cdecl
+    #define __cdecl
+  #endif
+  #ifndef __fastcall
+    #define __fastcall
+  #endif
+#endif
+#ifdef __has_builtin
+  #define __Pyx_has_cbuiltin(name) __has_builtin(name)
+#else
+  #define __Pyx_has_cbuiltin(name) (0)
+#endif
+#ifndef DL_IMPORT
+  #define DL_IMPORT(t) t
+#endif
+#ifndef DL_EXPORT
+  #define DL_EXPORT(t) t
+#endif
+#define __PYX_COMMA ,
+#ifndef PY_LONG_LONG
+  #define PY_LONG_LONG LONG_LONG
+#endif
+#ifndef Py_HUGE_VAL
+  #define Py_HUGE_VAL HUGE_VAL
+#endif
+#define __PYX_LIMITED_VERSION_HEX PY_VERSION_HEX
+#if defined(CYTHON_LIMITED_API)
+  #ifdef Py_LIMITED_API
+    #undef __PYX_LIMITED_VERSION_HEX
+    #define __PYX_LIMITED_VERSION_HEX Py_LIMITED_API
+    #if Py_LIMITED_API < 0x03090000
+      #error "Cython 3.3 requires the Python Limited API version to be 3.9 or greater."
+    #endif
+  #endif
+  #if defined(GRAALVM_PYTHON) || defined(PYPY_VERSION)
+    #ifdef _MSC_VER
+      #pragma message ("Py_LIMITED_API is defined on PyPy or GraalPy. This takes precedence over Cython's specialized\
+        code for PyPy and GraalPy and is unlikely to work.")
+    #else
+      #warning "Py_LIMITED_API is defined on PyPy or GraalPy. This takes precedence over Cython's specialized\
+        code for PyPy and GraalPy and is unlikely to work."
+    #endif
+  #endif
+  #define CYTHON_COMPILING_IN_PYPY 0
+  #define CYTHON_COMPILING_IN_CPYTHON 0
+  #define CYTHON_COMPILING_IN_LIMITED_API 1
+  #define CYTHON_COMPILING_IN_GRAAL 0
+  #define CYTHON_COMPILING_IN_CPYTHON_FREETHREADING 0
+  #undef CYTHON_USE_TYPE_SLOTS
+  #define CYTHON_USE_TYPE_SLOTS 0
+  #undef CYTHON_USE_TYPE_SPECS
+  #define CYTHON_USE_TYPE_SPECS 1
+  #undef CYTHON_USE_PYTYPE_LOOKUP
+  #define CYTHON_USE_PYTYPE_LOOKUP 0
+  #undef CYTHON_USE_PYLIST_INTERNALS
+  #define CYTHON_USE_PYLIST_INTERNALS 0
+  #undef CYTHON_USE_UNICODE_INTERNALS
+  #define CYTHON_USE_UNICODE_INTERNALS 0
+  #ifndef CYTHON_USE_UNICODE_WRITER
+    #define CYTHON_USE_UNICODE_WRITER 0
+  #endif
+  #undef CYTHON_USE_PYLONG_INTERNALS
+  #define CYTHON_USE_PYLONG_INTERNALS 0
+  #ifndef CYTHON_AVOID_BORROWED_REFS
+    #define CYTHON_AVOID_BORROWED_REFS 0
+  #endif
+  #ifndef CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS
+    #define CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS 0
+  #endif
+  #undef CYTHON_ASSUME_SAFE_MACROS
+  #define CYTHON_ASSUME_SAFE_MACROS 0
+  #undef CYTHON_ASSUME_SAFE_SIZE
+  #define CYTHON_ASSUME_SAFE_SIZE 0
+  #undef CYTHON_UNPACK_METHODS
+  #define CYTHON_UNPACK_METHODS 0
+  #undef CYTHON_FAST_THREAD_STATE
+  #define CYTHON_FAST_THREAD_STATE 0
+  #undef CYTHON_FAST_GIL
+  #define CYTHON_FAST_GIL 0
+  #undef CYTHON_VECTORCALL
+  #define CYTHON_VECTORCALL (__PYX_LIMITED_VERSION_HEX >= 0x030C0000)
+  #ifndef CYTHON_VECTORCALL_TPNEW
+    #define CYTHON_VECTORCALL_TPNEW (CYTHON_VECTORCALL && __PYX_LIMITED_VERSION_HEX >= 0x030E0000)
+  #endif
+  #ifndef CYTHON_PEP487_INIT_SUBCLASS
+    #define CYTHON_PEP487_INIT_SUBCLASS 1
+  #endif
+  #ifndef CYTHON_PEP489_MULTI_PHASE_INIT
+    #define CYTHON_PEP489_MULTI_PHASE_INIT 1
+  #endif
+  #ifndef CYTHON_USE_MODULE_STATE
+    #define CYTHON_USE_MODULE_STATE 0
+  #endif
+  #undef CYTHON_USE_SYS_MONITORING
+  #define CYTHON_USE_SYS_MONITORING 0
+  #ifndef CYTHON_USE_TP_FINALIZE
+    #define CYTHON_USE_TP_FINALIZE (__PYX_LIMITED_VERSION_HEX >= 0x030F0000 && PY_VERSION_HEX > 0x030F00A8)
+  #endif
+  #ifndef CYTHON_USE_AM_SEND
+    #define CYTHON_USE_AM_SEND (__PYX_LIMITED_VERSION_HEX >= 0x030A0000)
+  #endif
+  #undef CYTHON_USE_DICT_VERSIONS
+  #define CYTHON_USE_DICT_VERSIONS 0
+  #undef CYTHON_USE_EXC_INFO_STACK
+  #define CYTHON_USE_EXC_INFO_STACK 0
+  #ifndef CYTHON_UPDATE_DESCRIPTOR_DOC
+    #define CYTHON_UPDATE_DESCRIPTOR_DOC 0
+  #endif
+  #ifndef CYTHON_USE_OWN_PREP_RERAISE_STAR
+    #define CYTHON_USE_OWN_PREP_RERAISE_STAR 1
+  #endif
+  #ifndef CYTHON_USE_FREELISTS
+  #define CYTHON_USE_FREELISTS 1
+  #endif
+  #undef CYTHON_IMMORTAL_CONSTANTS
+  #define CYTHON_IMMORTAL_CONSTANTS 0
+  #if __PYX_LIMITED_VERSION_HEX < 0x030E0000
+  #undef CYTHON_OPAQUE_OBJECTS
+  #define CYTHON_OPAQUE_OBJECTS 0
+  #elif !defined(CYTHON_OPAQUE_OBJECTS)
+  #define CYTHON_OPAQUE_OBJECTS (__PYX_LIMITED_VERSION_HEX >= 0x030F0000)
+  #endif
+#elif defined(GRAALVM_PYTHON)
+  /* For very preliminary testing purposes. Most variables are set the same as PyPy.
+     The existence of this section does not imply that anything works or is even tested */
+  #define CYTHON_COMPILING_IN_PYPY 0
+  #define CYTHON_COMPILING_IN_CPYTHON 0
+  #define CYTHON_COMPILING_IN_LIMITED_API 0
+  #define CYTHON_COMPILING_IN_GRAAL 1
+  #define CYTHON_COMPILING_IN_CPYTHON_FREETHREADING 0
+  #ifndef CYTHON_USE_TYPE_SLOTS
+    #define CYTHON_USE_TYPE_SLOTS 0
+  #endif
+  #undef CYTHON_USE_TYPE_SPECS
+  #define CYTHON_USE_TYPE_SPECS 0
+  #undef CYTHON_USE_PYTYPE_LOOKUP
+  #define CYTHON_USE_PYTYPE_LOOKUP 0
+  #undef CYTHON_USE_PYLIST_INTERNALS
+  #define CYTHON_USE_PYLIST_INTERNALS 0
+  #undef CYTHON_USE_UNICODE_INTERNALS
+  #define CYTHON_USE_UNICODE_INTERNALS 0
+  #undef CYTHON_USE_UNICODE_WRITER
+  #define CYTHON_USE_UNICODE_WRITER 0
+  #undef CYTHON_USE_PYLONG_INTERNALS
+  #define CYTHON_USE_PYLONG_INTERNALS 0
+  #undef CYTHON_AVOID_BORROWED_REFS
+  #define CYTHON_AVOID_BORROWED_REFS 1
+  #undef CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS
+  #define CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS 0
+  #undef CYTHON_ASSUME_SAFE_MACROS
+  #define CYTHON_ASSUME_SAFE_MACROS 0
+  #undef CYTHON_ASSUME_SAFE_SIZE
+  #define CYTHON_ASSUME_SAFE_SIZE 0
+  #undef CYTHON_UNPACK_METHODS
+  #define CYTHON_UNPACK_METHODS 0
+  #undef CYTHON_FAST_THREAD_STATE
+  #define CYTHON_FAST_THREAD_STATE 0
+  #undef CYTHON_FAST_GIL
+  #define CYTHON_FAST_GIL 0
+  #ifndef CYTHON_VECTORCALL
+    #define CYTHON_VECTORCALL 1
+  #endif
+  #if CYTHON_USE_TYPE_SPECS && PY_VERSION_HEX < 0x030E0000
+    #undef CYTHON_VECTORCALL_TPNEW
+    #define CYTHON_VECTORCALL_TPNEW 0
+  #elif !defined(CYTHON_VECTORCALL_TPNEW)
+    #define CYTHON_VECTORCALL_TPNEW CYTHON_VECTORCALL
+  #endif
+  #ifndef CYTHON_PEP487_INIT_SUBCLASS
+    #define CYTHON_PEP487_INIT_SUBCLASS 1
+  #endif
+  #undef CYTHON_PEP489_MULTI_PHASE_INIT
+  #define CYTHON_PEP489_MULTI_PHASE_INIT 1
+  #undef CYTHON_USE_MODULE_STATE
+  #define CYTHON_USE_MODULE_STATE 0
+  #undef CYTHON_USE_SYS_MONITORING
+  #define CYTHON_USE_SYS_MONITORING 0
+  #undef CYTHON_USE_TP_FINALIZE
+  #define CYTHON_USE_TP_FINALIZE 0
+  #undef CYTHON_USE_AM_SEND
+  #define CYTHON_USE_AM_SEND 0
+  #undef CYTHON_USE_DICT_VERSIONS
+  #define CYTHON_USE_DICT_VERSIONS 0
+  #undef CYTHON_USE_EXC_INFO_STACK
+  #define CYTHON_USE_EXC_INFO_STACK 1
+  #ifndef CYTHON_UPDATE_DESCRIPTOR_DOC
+    #define CYTHON_UPDATE_DESCRIPTOR_DOC 0
+  #endif
+  #ifndef CYTHON_USE_OWN_PREP_RERAISE_STAR
+    #define CYTHON_USE_OWN_PREP_RERAISE_STAR 1
+  #endif
+  #undef CYTHON_USE_FREELISTS
+  #define CYTHON_USE_FREELISTS 0
+  #undef CYTHON_IMMORTAL_CONSTANTS
+  #define CYTHON_IMMORTAL_CONSTANTS 0
+  #undef CYTHON_OPAQUE_OBJECTS
+  #define CYTHON_OPAQUE_OBJECTS 0
+#elif defined(PYPY_VERSION)
+  #define CYTHON_COMPILING_IN_PYPY 1
+  #define CYTHON_COMPILING_IN_CPYTHON 0
+  #define CYTHON_COMPILING_IN_LIMITED_API 0
+  #define CYTHON_COMPILING_IN_GRAAL 0
+  #define CYTHON_COMPILING_IN_CPYTHON_FREETHREADING 0
+  #undef CYTHON_USE_TYPE_SLOTS
+  #define CYTHON_USE_TYPE_SLOTS 1
+  #ifndef CYTHON_USE_TYPE_SPECS
+    #define CYTHON_USE_TYPE_SPECS 0
+  #endif
+  #undef CYTHON_USE_PYTYPE_LOOKUP
+  #define CYTHON_USE_PYTYPE_LOOKUP 0
+  #undef CYTHON_USE_PYLIST_INTERNALS
+  #define CYTHON_USE_PYLIST_INTERNALS 0
+  #undef CYTHON_USE_UNICODE_INTERNALS
+  #define CYTHON_USE_UNICODE_INTERNALS 0
+  #undef CYTHON_USE_UNICODE_WRITER
+  #define CYTHON_USE_UNICODE_WRITER 0
+  #undef CYTHON_USE_PYLONG_INTERNALS
+  #define CYTHON_USE_PYLONG_INTERNALS 0
+  #undef CYTHON_AVOID_BORROWED_REFS
+  #define CYTHON_AVOID_BORROWED_REFS 1
+  #undef CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS
+  #define CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS 1
+  #undef CYTHON_ASSUME_SAFE_MACROS
+  #define CYTHON_ASSUME_SAFE_MACROS 0
+  #ifndef CYTHON_ASSUME_SAFE_SIZE
+    #define CYTHON_ASSUME_SAFE_SIZE 1
+  #endif
+  #undef CYTHON_UNPACK_METHODS
+  #define CYTHON_UNPACK_METHODS 0
+  #undef CYTHON_FAST_THREAD_STATE
+  #define CYTHON_FAST_THREAD_STATE 0
+  #undef CYTHON_FAST_GIL
+  #define CYTHON_FAST_GIL 0
+  #ifndef CYTHON_VECTORCALL
+    #define CYTHON_VECTORCALL 1
+  #endif
+  #if CYTHON_USE_TYPE_SPECS && PY_VERSION_HEX < 0x030E0000
+    #undef CYTHON_VECTORCALL_TPNEW
+    #define CYTHON_VECTORCALL_TPNEW 0
+  #elif !defined(CYTHON_VECTORCALL_TPNEW)
+    #define CYTHON_VECTORCALL_TPNEW (PYPY_VERSION_NUM >= 0x07030800 && CYTHON_VECTORCALL)
+  #endif
+  #ifndef CYTHON_PEP487_INIT_SUBCLASS
+    #define CYTHON_PEP487_INIT_SUBCLASS 1
+  #endif
+  #ifndef CYTHON_PEP489_MULTI_PHASE_INIT
+    #define CYTHON_PEP489_MULTI_PHASE_INIT 1
+  #endif
+  #undef CYTHON_USE_MODULE_STATE
+  #define CYTHON_USE_MODULE_STATE 0
+  #undef CYTHON_USE_SYS_MONITORING
+  #define CYTHON_USE_SYS_MONITORING 0
+  #ifndef CYTHON_USE_TP_FINALIZE
+    #define CYTHON_USE_TP_FINALIZE (PYPY_VERSION_NUM >= 0x07030C00)
+  #endif
+  #undef CYTHON_USE_AM_SEND
+  #define CYTHON_USE_AM_SEND 0
+  #undef CYTHON_USE_DICT_VERSIONS
+  #define CYTHON_USE_DICT_VERSIONS 0
+  #undef CYTHON_USE_EXC_INFO_STACK
+  #define CYTHON_USE_EXC_INFO_STACK 0
+  #ifndef CYTHON_UPDATE_DESCRIPTOR_DOC
+    #define CYTHON_UPDATE_DESCRIPTOR_DOC (PYPY_VERSION_NUM >= 0x07031100)
+  #endif
+  #ifndef CYTHON_USE_OWN_PREP_RERAISE_STAR
+    #define CYTHON_USE_OWN_PREP_RERAISE_STAR 1
+  #endif
+  #undef CYTHON_USE_FREELISTS
+  #define CYTHON_USE_FREELISTS 0
+  #undef CYTHON_IMMORTAL_CONSTANTS
+  #define CYTHON_IMMORTAL_CONSTANTS 0
+  #undef CYTHON_OPAQUE_OBJECTS
+  #define CYTHON_OPAQUE_OBJECTS 0
+#else
+  #define CYTHON_COMPILING_IN_PYPY 0
+  #define CYTHON_COMPILING_IN_CPYTHON 1
+  #define CYTHON_COMPILING_IN_LIMITED_API 0
+  #define CYTHON_COMPILING_IN_GRAAL 0
+  #ifdef Py_GIL_DISABLED
+    #define CYTHON_COMPILING_IN_CPYTHON_FREETHREADING 1
+  #else
+    #define CYTHON_COMPILING_IN_CPYTHON_FREETHREADING 0
+  #endif
+  #if PY_VERSION_HEX < 0x030A0000
+    #undef CYTHON_USE_TYPE_SLOTS
+    #define CYTHON_USE_TYPE_SLOTS 1
+  #elif !defined(CYTHON_USE_TYPE_SLOTS)
+    #define CYTHON_USE_TYPE_SLOTS 1
+  #endif
+  #ifndef CYTHON_USE_TYPE_SPECS
+    #define CYTHON_USE_TYPE_SPECS 0
+  #endif
+  #ifndef CYTHON_USE_PYTYPE_LOOKUP
+    #define CYTHON_USE_PYTYPE_LOOKUP 1
+  #endif
+  #ifndef CYTHON_USE_PYLONG_INTERNALS
+    #define CYTHON_USE_PYLONG_INTERNALS 1
+  #endif
+  #if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+    #undef CYTHON_USE_PYLIST_INTERNALS
+    #define CYTHON_USE_PYLIST_INTERNALS 0
+  #elif !defined(CYTHON_USE_PYLIST_INTERNALS)
+    #define CYTHON_USE_PYLIST_INTERNALS 1
+  #endif
+  #ifndef CYTHON_USE_UNICODE_INTERNALS
+    #define CYTHON_USE_UNICODE_INTERNALS 1
+  #endif
+  #if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING || PY_VERSION_HEX >= 0x030B00A2
+    #undef CYTHON_USE_UNICODE_WRITER
+    #define CYTHON_USE_UNICODE_WRITER 0
+  #elif !defined(CYTHON_USE_UNICODE_WRITER)
+    #define CYTHON_USE_UNICODE_WRITER 1
+  #endif
+  #ifndef CYTHON_AVOID_BORROWED_REFS
+    #define CYTHON_AVOID_BORROWED_REFS 0
+  #endif
+  #if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+    #undef CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS
+    #define CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS 1
+  #elif !defined(CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS)
+    #define CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS 0
+  #endif
+  #ifndef CYTHON_ASSUME_SAFE_MACROS
+    #define CYTHON_ASSUME_SAFE_MACROS 1
+  #endif
+  #ifndef CYTHON_ASSUME_SAFE_SIZE
+    #define CYTHON_ASSUME_SAFE_SIZE 1
+  #endif
+  #ifndef CYTHON_UNPACK_METHODS
+    #define CYTHON_UNPACK_METHODS 1
+  #endif
+  #ifndef CYTHON_FAST_THREAD_STATE
+    #define CYTHON_FAST_THREAD_STATE 1
+  #endif
+  #if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+    #undef CYTHON_FAST_GIL
+    #define CYTHON_FAST_GIL 0
+  #elif !defined(CYTHON_FAST_GIL)
+    #define CYTHON_FAST_GIL (PY_VERSION_HEX < 0x030C00A6)
+  #endif
+  #ifndef CYTHON_VECTORCALL
+    #define CYTHON_VECTORCALL 1
+  #endif
+  #if CYTHON_USE_TYPE_SPECS && PY_VERSION_HEX < 0x030E0000
+    #undef CYTHON_VECTORCALL_TPNEW
+    #define CYTHON_VECTORCALL_TPNEW 0
+  #elif !defined(CYTHON_VECTORCALL_TPNEW)
+    #define CYTHON_VECTORCALL_TPNEW CYTHON_VECTORCALL
+  #endif
+  #ifndef CYTHON_PEP487_INIT_SUBCLASS
+    #define CYTHON_PEP487_INIT_SUBCLASS 1
+  #endif
+  #ifndef CYTHON_PEP489_MULTI_PHASE_INIT
+    #define CYTHON_PEP489_MULTI_PHASE_INIT 1
+  #endif
+  #ifndef CYTHON_USE_MODULE_STATE
+    #define CYTHON_USE_MODULE_STATE 0
+  #endif
+  #ifndef CYTHON_USE_SYS_MONITORING
+    #define CYTHON_USE_SYS_MONITORING (PY_VERSION_HEX >= 0x030d00B1)
+  #endif
+  #ifndef CYTHON_USE_TP_FINALIZE
+    #define CYTHON_USE_TP_FINALIZE 1
+  #endif
+  #ifndef CYTHON_USE_AM_SEND
+    #define CYTHON_USE_AM_SEND 1
+  #endif
+  #if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+    #undef CYTHON_USE_DICT_VERSIONS
+    #define CYTHON_USE_DICT_VERSIONS 0
+  #elif !defined(CYTHON_USE_DICT_VERSIONS)
+    #define CYTHON_USE_DICT_VERSIONS  (PY_VERSION_HEX < 0x030C00A5 && !CYTHON_USE_MODULE_STATE)
+  #endif
+  #ifndef CYTHON_USE_EXC_INFO_STACK
+    #define CYTHON_USE_EXC_INFO_STACK 1
+  #endif
+  #ifndef CYTHON_UPDATE_DESCRIPTOR_DOC
+    #define CYTHON_UPDATE_DESCRIPTOR_DOC 1
+  #endif
+  #ifndef CYTHON_USE_OWN_PREP_RERAISE_STAR
+    #define CYTHON_USE_OWN_PREP_RERAISE_STAR (PY_VERSION_HEX < 0x030C00B2)
+  #endif
+  #ifndef CYTHON_USE_FREELISTS
+    #define CYTHON_USE_FREELISTS (!CYTHON_COMPILING_IN_CPYTHON_FREETHREADING)
+  #endif
+  #if defined(CYTHON_IMMORTAL_CONSTANTS) && PY_VERSION_HEX < 0x030C0000
+    #undef CYTHON_IMMORTAL_CONSTANTS
+    #define CYTHON_IMMORTAL_CONSTANTS 0  // definitely won't work
+  #elif !defined(CYTHON_IMMORTAL_CONSTANTS)
+    #define CYTHON_IMMORTAL_CONSTANTS (PY_VERSION_HEX >= 0x030C0000 && !CYTHON_USE_MODULE_STATE && CYTHON_COMPILING_IN_CPYTHON_FREETHREADING)
+  #endif
+  #ifndef CYTHON_OPAQUE_OBJECTS
+    #define CYTHON_OPAQUE_OBJECTS 0
+  #endif
+#endif
+#if CYTHON_USE_PYLONG_INTERNALS
+  #undef SHIFT
+  #undef BASE
+  #undef MASK
+  #ifdef SIZEOF_VOID_P
+    enum { __pyx_check_sizeof_voidp = 1 / (int)(SIZEOF_VOID_P == sizeof(void*)) };
+  #endif
+#endif
+#ifndef __has_attribute
+  #define __has_attribute(x) 0
+#endif
+#ifndef __has_cpp_attribute
+  #define __has_cpp_attribute(x) 0
+#endif
+#ifndef CYTHON_RESTRICT
+  #if defined(__GNUC__)
+    #define CYTHON_RESTRICT __restrict__
+  #elif defined(_MSC_VER) && _MSC_VER >= 1400
+    #define CYTHON_RESTRICT __restrict
+  #elif defined (__STDC_VERSION__) && __STDC_VERSION__ >= 199901L
+    #define CYTHON_RESTRICT restrict
+  #else
+    #define CYTHON_RESTRICT
+  #endif
+#endif
+#ifndef CYTHON_UNUSED
+  #if defined(__cplusplus)
+    /* for clang __has_cpp_attribute(maybe_unused) is true even before C++17
+     * but leads to warnings with -pedantic, since it is a C++17 feature */
+    #if ((defined(_MSVC_LANG) && _MSVC_LANG >= 201703L) || __cplusplus >= 201703L)
+      #if __has_cpp_attribute(maybe_unused)
+        #define CYTHON_UNUSED [[maybe_unused]]
+      #endif
+    #endif
+  #elif defined(__STDC_VERSION__) && __STDC_VERSION__ >= 202311L
+    #define CYTHON_UNUSED [[maybe_unused]]
+  #endif
+#endif
+#ifndef CYTHON_UNUSED
+# if defined(__GNUC__)
+#   if !(defined(__cplusplus)) || (__GNUC__ > 3 || (__GNUC__ == 3 && __GNUC_MINOR__ >= 4))
+#     define CYTHON_UNUSED __attribute__ ((__unused__))
+#   else
+#     define CYTHON_UNUSED
+#   endif
+# elif defined(__ICC) || (defined(__INTEL_COMPILER) && !defined(_MSC_VER))
+#   define CYTHON_UNUSED __attribute__ ((__unused__))
+# else
+#   define CYTHON_UNUSED
+# endif
+#endif
+#ifndef CYTHON_UNUSED_VAR
+#  if defined(__cplusplus)
+     template<class T> void CYTHON_UNUSED_VAR( const T& ) { }
+#  else
+#    define CYTHON_UNUSED_VAR(x) (void)(x)
+#  endif
+#endif
+#ifndef CYTHON_MAYBE_UNUSED_VAR
+  #define CYTHON_MAYBE_UNUSED_VAR(x) CYTHON_UNUSED_VAR(x)
+#endif
+#ifndef CYTHON_NCP_UNUSED
+# if CYTHON_COMPILING_IN_CPYTHON && !CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+#  define CYTHON_NCP_UNUSED
+# else
+#  define CYTHON_NCP_UNUSED CYTHON_UNUSED
+# endif
+#endif
+#ifndef CYTHON_USE_CPP_STD_MOVE
+  #if defined(__cplusplus) && (\
+    __cplusplus >= 201103L || (defined(_MSC_VER) && _MSC_VER >= 1600))
+    #define CYTHON_USE_CPP_STD_MOVE 1
+  #else
+    #define CYTHON_USE_CPP_STD_MOVE 0
+  #endif
+#endif
+#define __Pyx_void_to_None(void_result) ((void)(void_result), Py_INCREF(Py_None), Py_None)
+#include <stdint.h>
+typedef uintptr_t  __pyx_uintptr_t;
+#ifndef CYTHON_FALLTHROUGH
+  #if defined(__cplusplus)
+    /* for clang __has_cpp_attribute(fallthrough) is true even before C++17
+     * but leads to warnings with -pedantic, since it is a C++17 feature */
+    #if ((defined(_MSVC_LANG) && _MSVC_LANG >= 201703L) || __cplusplus >= 201703L)
+      #if __has_cpp_attribute(fallthrough)
+        #define CYTHON_FALLTHROUGH [[fallthrough]]
+      #endif
+    #endif
+    #ifndef CYTHON_FALLTHROUGH
+      #if __has_cpp_attribute(clang::fallthrough)
+        #define CYTHON_FALLTHROUGH [[clang::fallthrough]]
+      #elif __has_cpp_attribute(gnu::fallthrough)
+        #define CYTHON_FALLTHROUGH [[gnu::fallthrough]]
+      #endif
+    #endif
+  #endif
+  #ifndef CYTHON_FALLTHROUGH
+    #if __has_attribute(fallthrough)
+      #define CYTHON_FALLTHROUGH __attribute__((fallthrough))
+    #else
+      #define CYTHON_FALLTHROUGH
+    #endif
+  #endif
+  #if defined(__clang__) && defined(__apple_build_version__)
+    #if __apple_build_version__ < 7000000
+      #undef  CYTHON_FALLTHROUGH
+      #define CYTHON_FALLTHROUGH
+    #endif
+  #endif
+#endif
+#ifdef Py_UNREACHABLE
+  #define __Pyx_UNREACHABLE() Py_UNREACHABLE()
+#elif __Pyx_has_cbuiltin(__builtin_unreachable)
+  #define __Pyx_UNREACHABLE() __builtin_unreachable()
+#elif defined(__clang__) || defined(__INTEL_COMPILER) || (defined(__GNUC__) && (__GNUC__ > 4 || (__GNUC__ == 4 && __GNUC_MINOR__ >= 5)))
+  #define __Pyx_UNREACHABLE() __builtin_unreachable()
+#elif defined(_MSC_VER)
+  #define __Pyx_UNREACHABLE() __assume(0)
+#else
+  #define __Pyx_UNREACHABLE() Py_FatalError("Unreachable C code path reached")
+#endif
+#ifndef Py_UNREACHABLE
+  #define Py_UNREACHABLE() __Pyx_UNREACHABLE()
+#endif
+#ifdef __cplusplus
+  template <typename T>
+  struct __PYX_IS_UNSIGNED_IMPL {static const bool value = T(0) < T(-1);};
+  #define __PYX_IS_UNSIGNED(type) (__PYX_IS_UNSIGNED_IMPL<type>::value)
+#else
+  #define __PYX_IS_UNSIGNED(type) (((type)-1) > 0)
+#endif
+#if CYTHON_COMPILING_IN_PYPY == 1
+  #define __PYX_NEED_TP_PRINT_SLOT  (PY_VERSION_HEX < 0x030A0000)
+#else
+  #define __PYX_NEED_TP_PRINT_SLOT  0
+#endif
+#define __PYX_REINTERPRET_FUNCION(func_pointer, other_pointer) ((func_pointer)(void(*)(void))(other_pointer))
+#if __PYX_LIMITED_VERSION_HEX < 0x030C0000
+#define __Pyx_PyErr_FetchException(petype, peval, petb) PyErr_Fetch(petype, peval, petb)
+#define __Pyx_PyErr_RestoreException(etype, eval, etb) PyErr_Restore(etype, eval, etb)
+#else
+#define __Pyx_PyErr_FetchException(petype, peval, petb) *(petype)=NULL; *(peval)=PyErr_GetRaisedException(); *(petb)=NULL
+#define __Pyx_PyErr_RestoreException(etype, eval, etb) PyErr_SetRaisedException(eval)
+#endif
+
+/* CInitCode */
+#ifndef CYTHON_INLINE
+  #if defined(__clang__)
+    #define CYTHON_INLINE __inline__ __attribute__ ((__unused__))
+  #elif defined(__GNUC__)
+    #define CYTHON_INLINE __inline__
+  #elif defined(_MSC_VER)
+    #define CYTHON_INLINE __inline
+  #elif defined (__STDC_VERSION__) && __STDC_VERSION__ >= 199901L
+    #define CYTHON_INLINE inline
+  #else
+    #define CYTHON_INLINE
+  #endif
+#endif
+
+/* PythonCompatibility */
+#define __PYX_BUILD_PY_SSIZE_T "n"
+#define CYTHON_FORMAT_SSIZE_T "z"
+#define __Pyx_BUILTIN_MODULE_NAME "builtins"
+#define __Pyx_DefaultClassType PyType_Type
+#if CYTHON_COMPILING_IN_LIMITED_API
+    #ifndef CO_OPTIMIZED
+    static int CO_OPTIMIZED;
+    #endif
+    #ifndef CO_NEWLOCALS
+    static int CO_NEWLOCALS;
+    #endif
+    #ifndef CO_VARARGS
+    static int CO_VARARGS;
+    #endif
+    #ifndef CO_VARKEYWORDS
+    static int CO_VARKEYWORDS;
+    #endif
+    #ifndef CO_ASYNC_GENERATOR
+    static int CO_ASYNC_GENERATOR;
+    #endif
+    #ifndef CO_GENERATOR
+    static int CO_GENERATOR;
+    #endif
+    #ifndef CO_COROUTINE
+    static int CO_COROUTINE;
+    #endif
+#else
+    #ifndef CO_COROUTINE
+      #define CO_COROUTINE 0x80
+    #endif
+    #ifndef CO_ASYNC_GENERATOR
+      #define CO_ASYNC_GENERATOR 0x200
+    #endif
+#endif
+static int __Pyx_init_co_variables(void);
+#if PY_VERSION_HEX >= 0x030A00B1 || defined(Py_Is)
+  #define __Pyx_Py_Is(x, y)  Py_Is(x, y)
+#else
+  #define __Pyx_Py_Is(x, y) ((x) == (y))
+#endif
+#if PY_VERSION_HEX >= 0x030A00B1 || defined(Py_IsNone)
+  #define __Pyx_Py_IsNone(ob) Py_IsNone(ob)
+#else
+  #define __Pyx_Py_IsNone(ob) __Pyx_Py_Is((ob), Py_None)
+#endif
+#if PY_VERSION_HEX >= 0x030A00B1 || defined(Py_IsTrue)
+  #define __Pyx_Py_IsTrue(ob) Py_IsTrue(ob)
+#else
+  #define __Pyx_Py_IsTrue(ob) __Pyx_Py_Is((ob), Py_True)
+#endif
+#if PY_VERSION_HEX >= 0x030A00B1 || defined(Py_IsFalse)
+  #define __Pyx_Py_IsFalse(ob) Py_IsFalse(ob)
+#else
+  #define __Pyx_Py_IsFalse(ob) __Pyx_Py_Is((ob), Py_False)
+#endif
+#define __Pyx_NoneAsNull(obj)  (__Pyx_Py_IsNone(obj) ? NULL : (obj))
+#if CYTHON_COMPILING_IN_PYPY
+  #define __Pyx_PyObject_GC_IsFinalized(o) _PyGC_FINALIZED(o)
+#else
+  #define __Pyx_PyObject_GC_IsFinalized(o) PyObject_GC_IsFinalized(o)
+#endif
+#if CYTHON_COMPILING_IN_LIMITED_API
+static unsigned long __Pyx_Runtime_TPFLAGS_SEQUENCE;
+static unsigned long __Pyx_Runtime_TPFLAGS_MAPPING;
+#else
+#define __Pyx_Runtime_TPFLAGS_SEQUENCE Py_TPFLAGS_SEQUENCE
+#define __Pyx_Runtime_TPFLAGS_MAPPING Py_TPFLAGS_MAPPING
+#endif
+static int __Pyx_init_tpflags_variables(void);
+#ifndef Py_TPFLAGS_HAVE_FINALIZE
+  #define Py_TPFLAGS_HAVE_FINALIZE 0
+#endif
+#ifndef Py_TPFLAGS_SEQUENCE
+  #define Py_TPFLAGS_SEQUENCE (CYTHON_COMPILING_IN_LIMITED_API ? 0 : 1 << 5)
+#endif
+#ifndef Py_TPFLAGS_MAPPING
+  #define Py_TPFLAGS_MAPPING (CYTHON_COMPILING_IN_LIMITED_API ? 0 : 1 << 6)
+#endif
+#ifndef Py_TPFLAGS_IMMUTABLETYPE
+  #define Py_TPFLAGS_IMMUTABLETYPE (1UL << 8)
+#endif
+#ifndef Py_TPFLAGS_DISALLOW_INSTANTIATION
+  #define Py_TPFLAGS_DISALLOW_INSTANTIATION (1UL << 7)
+#endif
+#ifndef METH_STACKLESS
+  #define METH_STACKLESS 0
+#endif
+#if !defined(METH_FASTCALL) || CYTHON_COMPILING_IN_PYPY
+  #ifndef METH_FASTCALL
+     #define METH_FASTCALL 0x80
+  #endif
+  typedef PyObject *(*__Pyx_PyCFunctionFast) (PyObject *self, PyObject *const *args, Py_ssize_t nargs);
+  typedef PyObject *(*__Pyx_PyCFunctionFastWithKeywords) (PyObject *self, PyObject *const *args,
+                                                          Py_ssize_t nargs, PyObject *kwnames);
+#else
+  #if PY_VERSION_HEX >= 0x030d00A4
+  #  define __Pyx_PyCFunctionFast PyCFunctionFast
+  #  define __Pyx_PyCFunctionFastWithKeywords PyCFunctionFastWithKeywords
+  #else
+  #  define __Pyx_PyCFunctionFast _PyCFunctionFast
+  #  define __Pyx_PyCFunctionFastWithKeywords _PyCFunctionFastWithKeywords
+  #endif
+#endif
+#if CYTHON_VECTORCALL
+  #define __Pyx_METH_FASTCALL METH_FASTCALL
+  #define __Pyx_PyCFunction_FastCall __Pyx_PyCFunctionFast
+  #define __Pyx_PyCFunction_FastCallWithKeywords __Pyx_PyCFunctionFastWithKeywords
+#else
+  #define __Pyx_METH_FASTCALL METH_VARARGS
+  #define __Pyx_PyCFunction_FastCall PyCFunction
+  #define __Pyx_PyCFunction_FastCallWithKeywords PyCFunctionWithKeywords
+#endif
+#if CYTHON_VECTORCALL
+  #define __pyx_vectorcallfunc vectorcallfunc
+  #define __Pyx_PY_VECTORCALL_ARGUMENTS_OFFSET  PY_VECTORCALL_ARGUMENTS_OFFSET
+  #define __Pyx_PyVectorcall_NARGS(n)  PyVectorcall_NARGS((size_t)(n))
+#else
+  #define __Pyx_PY_VECTORCALL_ARGUMENTS_OFFSET  0
+  #define __Pyx_PyVectorcall_NARGS(n)  ((Py_ssize_t)(n))
+#endif
+#define __Pyx_PyCFunction_CheckExact(func) PyCFunction_CheckExact(func)
+#define __Pyx_CyOrPyCFunction_Check(func)  PyCFunction_Check(func)
+#if CYTHON_COMPILING_IN_CPYTHON
+#define __Pyx_CyOrPyCFunction_GET_FUNCTION(func)  (((PyCFunctionObject*)(func))->m_ml->ml_meth)
+#elif !CYTHON_COMPILING_IN_LIMITED_API
+#define __Pyx_CyOrPyCFunction_GET_FUNCTION(func)  PyCFunction_GET_FUNCTION(func)
+#endif
+#if CYTHON_COMPILING_IN_CPYTHON
+#define __Pyx_CyOrPyCFunction_GET_FLAGS(func)  (((PyCFunctionObject*)(func))->m_ml->ml_flags)
+static CYTHON_INLINE PyObject* __Pyx_CyOrPyCFunction_GET_SELF(PyObject *func) {
+    return (__Pyx_CyOrPyCFunction_GET_FLAGS(func) & METH_STATIC) ? NULL : ((PyCFunctionObject*)func)->m_self;
+}
+#endif
+static CYTHON_INLINE int __Pyx__IsSameCFunction(PyObject *func, void (*cfunc)(void)) {
+#if CYTHON_COMPILING_IN_LIMITED_API
+    return PyCFunction_Check(func) && PyCFunction_GetFunction(func) == (PyCFunction) cfunc;
+#else
+    return PyCFunction_Check(func) && PyCFunction_GET_FUNCTION(func) == (PyCFunction) cfunc;
+#endif
+}
+#define __Pyx_IsSameCFunction(func, cfunc)   __Pyx__IsSameCFunction(func, cfunc)
+#if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030A0000
+  #define __Pyx_PyType_FromModuleAndSpec(m, s, b)  ((void)m, PyType_FromSpecWithBases(s, b))
+#else
+  #define __Pyx_PyType_FromModuleAndSpec(m, s, b)  PyType_FromModuleAndSpec(m, s, b)
+#endif
+#if CYTHON_COMPILING_IN_PYPY
+  typedef PyObject *(*__Pyx_PyCMethod)(PyObject *, PyTypeObject *, PyObject *const *, size_t, PyObject *);
+#else
+  #define __Pyx_PyCMethod  PyCMethod
+#endif
+#ifndef METH_METHOD
+  #define METH_METHOD 0x200
+#endif
+#if CYTHON_COMPILING_IN_PYPY && !defined(PyObject_Malloc)
+  #define PyObject_Malloc(s)   PyMem_Malloc(s)
+  #define PyObject_Free(p)     PyMem_Free(p)
+  #define PyObject_Realloc(p)  PyMem_Realloc(p)
+#endif
+#if CYTHON_COMPILING_IN_LIMITED_API
+  #define __Pyx_PyFrame_SetLineNumber(frame, lineno)
+#elif CYTHON_COMPILING_IN_GRAAL && defined(GRAALPY_VERSION_NUM) && GRAALPY_VERSION_NUM > 0x19000000
+  #define __Pyx_PyCode_HasFreeVars(co)  (PyCode_GetNumFree(co) > 0)
+  #define __Pyx_PyFrame_SetLineNumber(frame, lineno) GraalPyFrame_SetLineNumber((frame), (lineno))
+#elif CYTHON_COMPILING_IN_GRAAL
+  #define __Pyx_PyCode_HasFreeVars(co)  (PyCode_GetNumFree(co) > 0)
+  #define __Pyx_PyFrame_SetLineNumber(frame, lineno) _PyFrame_SetLineNumber((frame), (lineno))
+#else
+  #define __Pyx_PyCode_HasFreeVars(co)  (PyCode_GetNumFree(co) > 0)
+  #define __Pyx_PyFrame_SetLineNumber(frame, lineno)  (frame)->f_lineno = (lineno)
+#endif
+#if CYTHON_COMPILING_IN_LIMITED_API
+  #define __Pyx_PyThreadState_Current PyThreadState_Get()
+#elif !CYTHON_FAST_THREAD_STATE
+  #define __Pyx_PyThreadState_Current PyThreadState_GET()
+#elif PY_VERSION_HEX >= 0x030d00A1
+  #define __Pyx_PyThreadState_Current PyThreadState_GetUnchecked()
+#else
+  #define __Pyx_PyThreadState_Current _PyThreadState_UncheckedGet()
+#endif
+#if CYTHON_OPAQUE_OBJECTS && CYTHON_COMPILING_IN_LIMITED_API
+    #define __PYX_SHARED_SIZEOF(T) -((int)sizeof(T))
+    #define __PYX_SHARED_RELATIVE_OFFSET Py_RELATIVE_OFFSET
+    #define CYTHON_OPAQUE_SHARED_TYPES 1
+#else
+    #define __PYX_SHARED_SIZEOF(T) sizeof(T)
+    #define __PYX_SHARED_RELATIVE_OFFSET 0
+    #define CYTHON_OPAQUE_SHARED_TYPES 0
+#endif
+#if CYTHON_USE_MODULE_STATE
+static CYTHON_INLINE void *__Pyx__PyModule_GetState(PyObject *op)
+{
+    void *result;
+    result = PyModule_GetState(op);
+    if (!result)
+        Py_FatalError("Couldn't find the module state");
+    return result;
+}
+#define __Pyx_PyModule_GetState(o) (__pyx_mstatetype *)__Pyx__PyModule_GetState(o)
+#else
+#define __Pyx_PyModule_GetState(op) ((void)op,__pyx_mstate_global)
+#endif
+#define __Pyx_PyObject_GetSlot(obj, name, func_ctype)  __Pyx_PyType_GetSlot(Py_TYPE((PyObject *) obj), name, func_ctype)
+#define __Pyx_PyObject_TryGetSlot(obj, name, func_ctype) __Pyx_PyType_TryGetSlot(Py_TYPE(obj), name, func_ctype)
+#define __Pyx_PyObject_GetSubSlot(obj, sub, name, func_ctype) __Pyx_PyType_GetSubSlot(Py_TYPE(obj), sub, name, func_ctype)
+#define __Pyx_PyObject_TryGetSubSlot(obj, sub, name, func_ctype) __Pyx_PyType_TryGetSubSlot(Py_TYPE(obj), sub, name, func_ctype)
+#if CYTHON_USE_TYPE_SLOTS
+  #define __Pyx_PyType_GetSlot(type, name, func_ctype)  ((type)->name)
+  #define __Pyx_PyType_TryGetSlot(type, name, func_ctype) __Pyx_PyType_GetSlot(type, name, func_ctype)
+  #define __Pyx_PyType_GetSubSlot(type, sub, name, func_ctype) (((type)->sub) ? ((type)->sub->name) : NULL)
+  #define __Pyx_PyType_TryGetSubSlot(type, sub, name, func_ctype) __Pyx_PyType_GetSubSlot(type, sub, name, func_ctype)
+#else
+  #define __Pyx_PyType_GetSlot(type, name, func_ctype)  ((func_ctype) PyType_GetSlot((type), Py_##name))
+  #define __Pyx_PyType_TryGetSlot(type, name, func_ctype)\
+    ((__PYX_LIMITED_VERSION_HEX >= 0x030A0000 ||\
+     (PyType_GetFlags(type) & Py_TPFLAGS_HEAPTYPE) || __Pyx_get_runtime_version() >= 0x030A0000) ?\
+     __Pyx_PyType_GetSlot(type, name, func_ctype) : NULL)
+  #define __Pyx_PyType_GetSubSlot(obj, sub, name, func_ctype) __Pyx_PyType_GetSlot(obj, name, func_ctype)
+  #define __Pyx_PyType_TryGetSubSlot(obj, sub, name, func_ctype) __Pyx_PyType_TryGetSlot(obj, name, func_ctype)
+#endif
+#if CYTHON_COMPILING_IN_CPYTHON || defined(_PyDict_NewPresized)
+#define __Pyx_PyDict_NewPresized(n)  ((n <= 8) ? PyDict_New() : _PyDict_NewPresized(n))
+#else
+#define __Pyx_PyDict_NewPresized(n)  PyDict_New()
+#endif
+#define __Pyx_PyNumber_Divide(x,y)         PyNumber_TrueDivide(x,y)
+#define __Pyx_PyNumber_InPlaceDivide(x,y)  PyNumber_InPlaceTrueDivide(x,y)
+#if CYTHON_COMPILING_IN_CPYTHON && CYTHON_USE_UNICODE_INTERNALS
+#define __Pyx_PyDict_GetItemStrWithError(dict, name)  _PyDict_GetItem_KnownHash(dict, name, ((PyASCIIObject *) name)->hash)
+static CYTHON_INLINE PyObject * __Pyx_PyDict_GetItemStr(PyObject *dict, PyObject *name) {
+    PyObject *res = __Pyx_PyDict_GetItemStrWithError(dict, name);
+    if (res == NULL && PyErr_Occurred()) {
+        PyErr_WriteUnraisable(NULL);
+    }
+    return res;
+}
+#elif !CYTHON_COMPILING_IN_PYPY || PYPY_VERSION_NUM >= 0x07020000
+#define __Pyx_PyDict_GetItemStrWithError  PyDict_GetItemWithError
+#define __Pyx_PyDict_GetItemStr           PyDict_GetItem
+#else
+static CYTHON_INLINE PyObject * __Pyx_PyDict_GetItemStrWithError(PyObject *dict, PyObject *name) {
+#if CYTHON_COMPILING_IN_PYPY
+    return PyDict_GetItem(dict, name);
+#else
+    PyDictEntry *ep;
+    PyDictObject *mp = (PyDictObject*) dict;
+    long hash = ((PyStringObject *) name)->ob_shash;
+    assert(hash != -1);
+    ep = (mp->ma_lookup)(mp, name, hash);
+    if (ep == NULL) {
+        return NULL;
+    }
+    return ep->me_value;
+#endif
+}
+#define __Pyx_PyDict_GetItemStr           PyDict_GetItem
+#endif
+#if CYTHON_USE_TYPE_SLOTS
+  #define __Pyx_PyType_GetFlags(tp)   (((PyTypeObject *)tp)->tp_flags)
+  #define __Pyx_PyType_HasFeature(type, feature)  ((__Pyx_PyType_GetFlags(type) & (feature)) != 0)
+#else
+  #define __Pyx_PyType_GetFlags(tp)   (PyType_GetFlags((PyTypeObject *)tp))
+  #define __Pyx_PyType_HasFeature(type, feature)  PyType_HasFeature(type, feature)
+#endif
+#define __Pyx_PyObject_GetIterNextFunc(iterator)  __Pyx_PyObject_GetSlot(iterator, tp_iternext, iternextfunc)
+#if CYTHON_USE_TYPE_SPECS
+#define __Pyx_PyHeapTypeObject_GC_Del(obj)  {\
+    PyTypeObject *type = Py_TYPE((PyObject*)obj);\
+    assert(__Pyx_PyType_HasFeature(type, Py_TPFLAGS_HEAPTYPE));\
+    PyObject_GC_Del(obj);\
+    Py_DECREF(type);\
+}
+#else
+#define __Pyx_PyHeapTypeObject_GC_Del(obj)  PyObject_GC_Del(obj)
+#endif
+#if CYTHON_COMPILING_IN_LIMITED_API
+  #define __Pyx_PyUnicode_READY(op)       (0)
+  #define __Pyx_PyUnicode_READ_CHAR(u, i) PyUnicode_ReadChar(u, i)
+  #define __Pyx_PyUnicode_MAX_CHAR_VALUE(u)   ((void)u, 1114111U)
+  #define __Pyx_PyUnicode_KIND(u)         ((void)u, (0))
+  #define __Pyx_PyUnicode_KIND_04(u)      __Pyx_PyUnicode_KIND(u)
+  #define __Pyx_PyUnicode_DATA(u)         ((void*)u)
+  #define __Pyx_PyUnicode_READ(k, d, i)   ((void)k, PyUnicode_ReadChar((PyObject*)(d), i))
+  #define __Pyx_PyUnicode_IS_TRUE(u)      (0 != PyUnicode_GetLength(u))
+#else
+  #if PY_VERSION_HEX >= 0x030C0000
+    #define __Pyx_PyUnicode_READY(op)       (0)
+  #else
+    #define __Pyx_PyUnicode_READY(op)       (likely(PyUnicode_IS_READY(op)) ?\
+                                                0 : _PyUnicode_Ready((PyObject *)(op)))
+  #endif
+  #define __Pyx_PyUnicode_READ_CHAR(u, i) PyUnicode_READ_CHAR(u, i)
+  #define __Pyx_PyUnicode_MAX_CHAR_VALUE(u)   PyUnicode_MAX_CHAR_VALUE(u)
+  #define __Pyx_PyUnicode_KIND(u)         ((int)PyUnicode_KIND(u))
+  #define __Pyx_PyUnicode_DATA(u)         PyUnicode_DATA(u)
+  #define __Pyx_PyUnicode_READ(k, d, i)   PyUnicode_READ(k, d, i)
+  #define __Pyx_PyUnicode_WRITE(k, d, i, ch)  PyUnicode_WRITE(k, d, i, (Py_UCS4) ch)
+  #if PY_VERSION_HEX >= 0x030C0000
+    #define __Pyx_PyUnicode_IS_TRUE(u)      (0 != PyUnicode_GET_LENGTH(u))
+  #else
+    #if CYTHON_COMPILING_IN_CPYTHON
+    #define __Pyx_PyUnicode_IS_TRUE(u)      (0 != (likely(PyUnicode_IS_READY(u)) ? PyUnicode_GET_LENGTH(u) : ((PyCompactUnicodeObject *)(u))->wstr_length))
+    #else
+    #define __Pyx_PyUnicode_IS_TRUE(u)      (0 != (likely(PyUnicode_IS_READY(u)) ? PyUnicode_GET_LENGTH(u) : PyUnicode_GET_SIZE(u)))
+    #endif
+  #endif
+  static CYTHON_INLINE int __Pyx_PyUnicode_KIND_04(PyObject *o) {
+      return __Pyx_PyUnicode_KIND(o) - (int) !!PyUnicode_IS_ASCII(o);
+  }
+#endif
+#if CYTHON_COMPILING_IN_PYPY
+  #define __Pyx_PyUnicode_Concat(a, b)      PyNumber_Add(a, b)
+  #define __Pyx_PyUnicode_ConcatSafe(a, b)  PyNumber_Add(a, b)
+#else
+  #define __Pyx_PyUnicode_Concat(a, b)      PyUnicode_Concat(a, b)
+  #define __Pyx_PyUnicode_ConcatSafe(a, b)  ((unlikely((a) == Py_None) || unlikely((b) == Py_None)) ?\
+      PyNumber_Add(a, b) : __Pyx_PyUnicode_Concat(a, b))
+#endif
+#if CYTHON_COMPILING_IN_PYPY
+  #if !defined(PyUnicode_DecodeUnicodeEscape)
+    #define PyUnicode_DecodeUnicodeEscape(s, size, errors)  PyUnicode_Decode(s, size, "unicode_escape", errors)
+  #endif
+  #if !defined(PyUnicode_Contains)
+    #define PyUnicode_Contains(u, s)  PySequence_Contains(u, s)
+  #endif
+  #if !defined(PyByteArray_Check)
+    #define PyByteArray_Check(obj)  PyObject_TypeCheck(obj, &PyByteArray_Type)
+  #endif
+  #if !defined(PyObject_Format)
+    #define PyObject_Format(obj, fmt)  PyObject_CallMethod(obj, "__format__", "O", fmt)
+  #endif
+#endif
+#define __Pyx_PyUnicode_FormatSafe(a, b)  ((unlikely((a) == Py_None || (PyUnicode_Check(b) && !PyUnicode_CheckExact(b)))) ? PyNumber_Remainder(a, b) : PyUnicode_Format(a, b))
+#if CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX >= 0x030E0000
+  #define __Pyx_PySequence_ListKeepNew(obj)\
+    (likely(PyList_CheckExact(obj) && PyUnstable_Object_IsUniquelyReferenced(obj)) ? __Pyx_NewRef(obj) : PySequence_List(obj))
+#elif CYTHON_COMPILING_IN_CPYTHON
+  #define __Pyx_PySequence_ListKeepNew(obj)\
+    (likely(PyList_CheckExact(obj) && Py_REFCNT(obj) == 1) ? __Pyx_NewRef(obj) : PySequence_List(obj))
+#else
+  #define __Pyx_PySequence_ListKeepNew(obj)  PySequence_List(obj)
+#endif
+#ifndef PySet_CheckExact
+  #define PySet_CheckExact(obj)        Py_IS_TYPE(obj, &PySet_Type)
+#endif
+enum __Pyx_ReferenceSharing {
+  __Pyx_ReferenceSharing_DefinitelyUnique, // We created it so we know it's unshared - no need to check
+  __Pyx_ReferenceSharing_OwnStrongReference,
+  __Pyx_ReferenceSharing_FunctionArgument,
+  __Pyx_ReferenceSharing_SharedReference, // Never trust it to be unshared because it's a global or similar
+};
+#if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING && PY_VERSION_HEX >= 0x030E0000
+#define __Pyx_IS_UNIQUELY_REFERENCED(o, sharing)\
+    (sharing == __Pyx_ReferenceSharing_DefinitelyUnique ? 1 :\
+      (sharing == __Pyx_ReferenceSharing_FunctionArgument ? PyUnstable_Object_IsUniqueReferencedTemporary(o) :\
+      (sharing == __Pyx_ReferenceSharing_OwnStrongReference ? PyUnstable_Object_IsUniquelyReferenced(o) : 0)))
+#elif (CYTHON_COMPILING_IN_CPYTHON && !CYTHON_COMPILING_IN_CPYTHON_FREETHREADING) || CYTHON_COMPILING_IN_LIMITED_API
+#define __Pyx_IS_UNIQUELY_REFERENCED(o, sharing) (((void)sharing), Py_REFCNT(o) == 1)
+#else
+#define __Pyx_IS_UNIQUELY_REFERENCED(o, sharing) (((void)o), ((void)sharing), 0)
+#endif
+#if __PYX_LIMITED_VERSION_HEX >= 0x030d0000
+  #define __Pyx_PyList_GetItemRef(o, i) PyList_GetItemRef(o, i)
+#elif CYTHON_AVOID_BORROWED_REFS || CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS
+  #if CYTHON_COMPILING_IN_LIMITED_API || !CYTHON_ASSUME_SAFE_MACROS
+    #define __Pyx_PyList_GetItemRef(o, i) (likely((i) >= 0) ? PySequence_GetItem(o, i) : (PyErr_SetString(PyExc_IndexError, "list index out of range"), (PyObject*)NULL))
+  #else
+    #define __Pyx_PyList_GetItemRef(o, i) PySequence_ITEM(o, i)
+  #endif
+#elif CYTHON_COMPILING_IN_LIMITED_API || !(CYTHON_ASSUME_SAFE_MACROS && CYTHON_ASSUME_SAFE_SIZE)
+  #define __Pyx_PyList_GetItemRef(o, i) __Pyx_XNewRef(PyList_GetItem(o, i))
+#else
+  #define __Pyx_PyList_GetItemRef(o, i) (likely(__Pyx_is_valid_index(i, PyList_GET_SIZE(o))) ?\
+    __Pyx_NewRef(PyList_GET_ITEM(o, i)) : (PyErr_SetString(PyExc_IndexError, "list index out of range"), (PyObject*)NULL))
+#endif
+#if CYTHON_AVOID_BORROWED_REFS || CYTHON_COMPILING_IN_LIMITED_API
+  #define __Pyx_PyList_GET_ITEM_REF(o, i, unsafe_shared)  ((void)(unsafe_shared),\
+      __Pyx_PyList_GetItemRef(o, i))
+#elif CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS
+  #if CYTHON_ASSUME_SAFE_MACROS
+  #define __Pyx_PyList_GET_ITEM_REF(o, i, unsafe_shared) (\
+      __Pyx_IS_UNIQUELY_REFERENCED(o, unsafe_shared) ?\
+      __Pyx_NewRef(PyList_GET_ITEM(o, i)) : __Pyx_PyList_GetItemRef(o, i))
+  #else
+  #define __Pyx_PyList_GET_ITEM_REF(o, i, unsafe_shared) (\
+      __Pyx_IS_UNIQUELY_REFERENCED(o, unsafe_shared) ?\
+      __Pyx_XNewRef(PyList_GetItem(o, i)) : __Pyx_PyList_GetItemRef(o, i))
+  #endif
+#elif CYTHON_ASSUME_SAFE_MACROS
+  #define __Pyx_PyList_GET_ITEM_REF(o, i, unsafe_shared)  ((void)(unsafe_shared),\
+      __Pyx_NewRef(PyList_GET_ITEM(o, i)))
+#else
+  #define __Pyx_PyList_GET_ITEM_REF(o, i, unsafe_shared)  ((void)(unsafe_shared),\
+      __Pyx_XNewRef(PyList_GetItem(o, i)))
+#endif
+#if __PYX_LIMITED_VERSION_HEX >= 0x030d0000
+#define __Pyx_PyDict_GetItemRef(dict, key, result) PyDict_GetItemRef(dict, key, result)
+#elif CYTHON_AVOID_BORROWED_REFS || CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS
+static CYTHON_INLINE int __Pyx_PyDict_GetItemRef(PyObject *dict, PyObject *key, PyObject **result) {
+  *result = PyObject_GetItem(dict, key);
+  if (*result == NULL) {
+    if (PyErr_ExceptionMatches(PyExc_KeyError)) {
+      PyErr_Clear();
+      return 0;
+    }
+    return -1;
+  }
+  return 1;
+}
+#else
+static CYTHON_INLINE int __Pyx_PyDict_GetItemRef(PyObject *dict, PyObject *key, PyObject **result) {
+  *result = PyDict_GetItemWithError(dict, key);
+  if (*result == NULL) {
+    return PyErr_Occurred() ? -1 : 0;
+  }
+  Py_INCREF(*result);
+  return 1;
+}
+#endif
+#if defined(CYTHON_DEBUG_VISIT_CONST) && CYTHON_DEBUG_VISIT_CONST
+  #define __Pyx_VISIT_CONST(obj)  Py_VISIT(obj)
+#else
+  #define __Pyx_VISIT_CONST(obj)
+#endif
+#if CYTHON_ASSUME_SAFE_MACROS
+  #define __Pyx_PySequence_ITEM(o, i) PySequence_ITEM(o, i)
+  #define __Pyx_PySequence_SIZE(seq)  Py_SIZE(seq)
+  #define __Pyx_PyTuple_SET_ITEM(o, i, v) (PyTuple_SET_ITEM(o, i, v), (0))
+  #define __Pyx_PyTuple_GET_ITEM(o, i) PyTuple_GET_ITEM(o, i)
+  #define __Pyx_PyList_SET_ITEM(o, i, v) (PyList_SET_ITEM(o, i, v), (0))
+  #define __Pyx_PyList_GET_ITEM(o, i) PyList_GET_ITEM(o, i)
+#else
+  #define __Pyx_PySequence_ITEM(o, i) PySequence_GetItem(o, i)
+  #define __Pyx_PySequence_SIZE(seq)  PySequence_Size(seq)
+  #define __Pyx_PyTuple_SET_ITEM(o, i, v) PyTuple_SetItem(o, i, v)
+  #define __Pyx_PyTuple_GET_ITEM(o, i) PyTuple_GetItem(o, i)
+  #define __Pyx_PyList_SET_ITEM(o, i, v) PyList_SetItem(o, i, v)
+  #define __Pyx_PyList_GET_ITEM(o, i) PyList_GetItem(o, i)
+#endif
+#if CYTHON_ASSUME_SAFE_SIZE
+  #define __Pyx_PyTuple_GET_SIZE(o) PyTuple_GET_SIZE(o)
+  #define __Pyx_PyList_GET_SIZE(o) PyList_GET_SIZE(o)
+  #define __Pyx_PySet_GET_SIZE(o) PySet_GET_SIZE(o)
+  #define __Pyx_PyDict_GET_SIZE(o) PyDict_GET_SIZE(o)
+  #define __Pyx_PyBytes_GET_SIZE(o) PyBytes_GET_SIZE(o)
+  #define __Pyx_PyByteArray_GET_SIZE(o) PyByteArray_GET_SIZE(o)
+  #define __Pyx_PyUnicode_GET_LENGTH(o) PyUnicode_GET_LENGTH(o)
+#else
+  #define __Pyx_PyTuple_GET_SIZE(o) PyTuple_Size(o)
+  #define __Pyx_PyList_GET_SIZE(o) PyList_Size(o)
+  #define __Pyx_PySet_GET_SIZE(o) PySet_Size(o)
+  #define __Pyx_PyDict_GET_SIZE(o) PyDict_Size(o)
+  #define __Pyx_PyBytes_GET_SIZE(o) PyBytes_Size(o)
+  #define __Pyx_PyByteArray_GET_SIZE(o) PyByteArray_Size(o)
+  #define __Pyx_PyUnicode_GET_LENGTH(o) PyUnicode_GetLength(o)
+#endif
+#if CYTHON_COMPILING_IN_PYPY && !defined(PyUnicode_InternFromString)
+  #define PyUnicode_InternFromString(s) PyUnicode_FromString(s)
+#endif
+#define __Pyx_PyLong_FromHash_t PyLong_FromSsize_t
+#define __Pyx_PyLong_AsHash_t   __Pyx_PyIndex_AsSsize_t
+#if __PYX_LIMITED_VERSION_HEX >= 0x030A0000
+    #define __Pyx_PySendResult PySendResult
+#else
+    typedef enum {
+        PYGEN_RETURN = 0,
+        PYGEN_ERROR = -1,
+        PYGEN_NEXT = 1,
+    } __Pyx_PySendResult;
+#endif
+#if CYTHON_COMPILING_IN_LIMITED_API || PY_VERSION_HEX < 0x030A00A3
+  typedef __Pyx_PySendResult (*__Pyx_pyiter_sendfunc)(PyObject *iter, PyObject *value, PyObject **result);
+#else
+  #define __Pyx_pyiter_sendfunc sendfunc
+#endif
+#if !CYTHON_USE_AM_SEND
+#define __PYX_HAS_PY_AM_SEND 0
+#elif __PYX_LIMITED_VERSION_HEX >= 0x030A0000
+#define __PYX_HAS_PY_AM_SEND 1
+#else
+#define __PYX_HAS_PY_AM_SEND 2  // our own backported implementation
+#endif
+#if __PYX_HAS_PY_AM_SEND < 2
+    #define __Pyx_PyAsyncMethodsStruct PyAsyncMethods
+#else
+    typedef struct {
+        unaryfunc am_await;
+        unaryfunc am_aiter;
+        unaryfunc am_anext;
+        __Pyx_pyiter_sendfunc am_send;
+    } __Pyx_PyAsyncMethodsStruct;
+    #define __Pyx_SlotTpAsAsync(s) ((PyAsyncMethods*)(s))
+#endif
+#if CYTHON_USE_AM_SEND && PY_VERSION_HEX < 0x030A00F0
+    #define __Pyx_TPFLAGS_HAVE_AM_SEND (1UL << 21)
+#else
+    #define __Pyx_TPFLAGS_HAVE_AM_SEND (0)
+#endif
+#if CYTHON_COMPILING_IN_LIMITED_API && PY_VERSION_HEX < 0x030A0000
+#ifdef __cplusplus
+extern "C"
+#endif
+PyAPI_FUNC(void *) PyMem_Calloc(size_t nelem, size_t elsize);
+#endif
+#if CYTHON_COMPILING_IN_LIMITED_API
+static int __Pyx_init_co_variable(PyObject *inspect, const char* name, int *write_to) {
+    int value;
+    PyObject *py_value = PyObject_GetAttrString(inspect, name);
+    if (!py_value) return 0;
+    value = (int) PyLong_AsLong(py_value);
+    Py_DECREF(py_value);
+    *write_to = value;
+    return value != -1 || !PyErr_Occurred();
+}
+static int __Pyx_init_co_variables(void) {
+    PyObject *inspect;
+    int result;
+    inspect = PyImport_ImportModule("inspect");
+    result =
+#if !defined(CO_OPTIMIZED)
+        __Pyx_init_co_variable(inspect, "CO_OPTIMIZED", &CO_OPTIMIZED) &&
+#endif
+#if !defined(CO_NEWLOCALS)
+        __Pyx_init_co_variable(inspect, "CO_NEWLOCALS", &CO_NEWLOCALS) &&
+#endif
+#if !defined(CO_VARARGS)
+        __Pyx_init_co_variable(inspect, "CO_VARARGS", &CO_VARARGS) &&
+#endif
+#if !defined(CO_VARKEYWORDS)
+        __Pyx_init_co_variable(inspect, "CO_VARKEYWORDS", &CO_VARKEYWORDS) &&
+#endif
+#if !defined(CO_ASYNC_GENERATOR)
+        __Pyx_init_co_variable(inspect, "CO_ASYNC_GENERATOR", &CO_ASYNC_GENERATOR) &&
+#endif
+#if !defined(CO_GENERATOR)
+        __Pyx_init_co_variable(inspect, "CO_GENERATOR", &CO_GENERATOR) &&
+#endif
+#if !defined(CO_COROUTINE)
+        __Pyx_init_co_variable(inspect, "CO_COROUTINE", &CO_COROUTINE) &&
+#endif
+        1;
+    Py_DECREF(inspect);
+    return result ? 0 : -1;
+}
+static int __Pyx_init_tpflags_bitcount(unsigned long flag) {
+    int count = 0;
+    while (flag) {
+        count += (int) (flag & 1);
+        flag >>= 1;
+    }
+    return count;
+}
+static int __Pyx_init_tpflags_variables(void) {
+    if (__Pyx_Runtime_TPFLAGS_SEQUENCE != 0 && __Pyx_Runtime_TPFLAGS_MAPPING != 0) {
+        return 0;
+    }
+    PyObject *collections_abc = PyImport_ImportModule("collections.abc");
+    if (!collections_abc) return -1;
+    int result = 0;
+    PyObject *sequence = NULL, *mapping = NULL;
+#if __PYX_LIMITED_VERSION_HEX >= 0x030D0000
+    if (PyObject_GetOptionalAttrString(collections_abc, "Sequence", &sequence) != 1) goto fail;
+    if (PyObject_GetOptionalAttrString(collections_abc, "Mapping", &mapping) != 1) goto fail;
+#else
+    sequence = PyObject_GetAttrString(collections_abc, "Sequence");
+    if (!sequence) goto fail_attr_lookup;
+    mapping = PyObject_GetAttrString(collections_abc, "Mapping");
+    if (!mapping) goto fail_attr_lookup;
+#endif
+    if (!PyType_Check(sequence) || !PyType_Check(mapping)) goto fail;
+    {
+        unsigned long sequence_flags = PyType_GetFlags((PyTypeObject*)sequence);
+        unsigned long mapping_flags = PyType_GetFlags((PyTypeObject*)mapping);
+        unsigned long mutual_flags = sequence_flags & mapping_flags;
+        sequence_flags = sequence_flags ^ mutual_flags;
+        mapping_flags = mapping_flags ^ mutual_flags;
+        if (__Pyx_Runtime_TPFLAGS_SEQUENCE == 0 && __Pyx_init_tpflags_bitcount(sequence_flags) == 1) {
+            __Pyx_Runtime_TPFLAGS_SEQUENCE = sequence_flags;
+        }
+        if (__Pyx_Runtime_TPFLAGS_MAPPING == 0 && __Pyx_init_tpflags_bitcount(mapping_flags) == 1) {
+            __Pyx_Runtime_TPFLAGS_MAPPING = mapping_flags;
+        }
+    }
+    cleanup:
+    Py_XDECREF(mapping);
+    Py_XDECREF(sequence);
+    Py_DECREF(collections_abc);
+    return result;
+#if __PYX_LIMITED_VERSION_HEX < 0x030D0000
+    fail_attr_lookup:
+    if (PyErr_ExceptionMatches(PyExc_AttributeError)) {
+        PyErr_Clear();
+    }
+#endif
+    fail:
+    result = PyErr_Occurred() ? -1 : 0;
+    goto cleanup;
+}
+#else
+static int __Pyx_init_co_variables(void) {
+    return 0;  // It's a limited API-only feature
+}
+static int __Pyx_init_tpflags_variables(void) {
+    return 0;  // It's a limited API-only feature
+}
+#endif
+
+/* MathInitCode */
+#if defined(_WIN32) || defined(WIN32) || defined(MS_WINDOWS)
+  #ifndef _USE_MATH_DEFINES
+    #define _USE_MATH_DEFINES
+  #endif
+#endif
+#include <math.h>
+#if defined(__CYGWIN__) && defined(_LDBL_EQ_DBL)
+#define __Pyx_truncl trunc
+#else
+#define __Pyx_truncl truncl
+#endif
+
+#ifndef CYTHON_CLINE_IN_TRACEBACK_RUNTIME
+#define CYTHON_CLINE_IN_TRACEBACK_RUNTIME 0
+#endif
+#ifndef CYTHON_CLINE_IN_TRACEBACK
+#define CYTHON_CLINE_IN_TRACEBACK CYTHON_CLINE_IN_TRACEBACK_RUNTIME
+#endif
+#if CYTHON_CLINE_IN_TRACEBACK
+#define __PYX_MARK_ERR_POS(f_index, lineno)  { __pyx_filename = __pyx_f[f_index]; (void) __pyx_filename; __pyx_lineno = lineno; (void) __pyx_lineno; __pyx_clineno = __LINE__; (void) __pyx_clineno; }
+#else
+#define __PYX_MARK_ERR_POS(f_index, lineno)  { __pyx_filename = __pyx_f[f_index]; (void) __pyx_filename; __pyx_lineno = lineno; (void) __pyx_lineno; (void) __pyx_clineno; }
+#endif
+#define __PYX_ERR(f_index, lineno, Ln_error) \
+    { __PYX_MARK_ERR_POS(f_index, lineno) goto Ln_error; }
+
+#ifdef CYTHON_EXTERN_C
+    #undef __PYX_EXTERN_C
+    #define __PYX_EXTERN_C CYTHON_EXTERN_C
+#elif defined(__PYX_EXTERN_C)
+    #ifdef _MSC_VER
+    #pragma message ("Please do not define the '__PYX_EXTERN_C' macro externally. Use 'CYTHON_EXTERN_C' instead.")
+    #else
+    #warning Please do not define the '__PYX_EXTERN_C' macro externally. Use 'CYTHON_EXTERN_C' instead.
+    #endif
+#else
+  #ifdef __cplusplus
+    #define __PYX_EXTERN_C extern "C"
+  #else
+    #define __PYX_EXTERN_C extern
+  #endif
+#endif
+
+#define __PYX_HAVE__nes__cpu__cpu_op
+#define __PYX_HAVE_API__nes__cpu__cpu_op
+/* Early includes */
+#include <stdint.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif /* _OPENMP */
+
+#if defined(PYREX_WITHOUT_ASSERTIONS) && !defined(CYTHON_WITHOUT_ASSERTIONS)
+#define CYTHON_WITHOUT_ASSERTIONS
+#endif
+
+#ifdef CYTHON_FREETHREADING_COMPATIBLE
+#if CYTHON_FREETHREADING_COMPATIBLE
+#define __Pyx_FREETHREADING_COMPATIBLE Py_MOD_GIL_NOT_USED
+#else
+#define __Pyx_FREETHREADING_COMPATIBLE Py_MOD_GIL_USED
+#endif
+#else
+#define __Pyx_FREETHREADING_COMPATIBLE Py_MOD_GIL_USED
+#endif
+#define __PYX_DEFAULT_STRING_ENCODING_IS_ASCII 0
+#define __PYX_DEFAULT_STRING_ENCODING_IS_UTF8 0
+#define __PYX_DEFAULT_STRING_ENCODING ""
+#define __Pyx_PyObject_FromString __Pyx_PyBytes_FromString
+#define __Pyx_PyObject_FromStringAndSize __Pyx_PyBytes_FromStringAndSize
+#define __Pyx_uchar_cast(c) ((unsigned char)c)
+#define __Pyx_long_cast(x) ((long)x)
+#define __Pyx_fits_Py_ssize_t(v, type, is_signed)  (\
+    (sizeof(type) < sizeof(Py_ssize_t))  ||\
+    (sizeof(type) > sizeof(Py_ssize_t) &&\
+          likely(v < (type)PY_SSIZE_T_MAX ||\
+                 v == (type)PY_SSIZE_T_MAX)  &&\
+          (!is_signed || likely(v > (type)PY_SSIZE_T_MIN ||\
+                                v == (type)PY_SSIZE_T_MIN)))  ||\
+    (sizeof(type) == sizeof(Py_ssize_t) &&\
+          (is_signed || likely(v < (type)PY_SSIZE_T_MAX ||\
+                               v == (type)PY_SSIZE_T_MAX)))  )
+static CYTHON_INLINE int __Pyx_is_valid_index(Py_ssize_t i, Py_ssize_t limit) {
+    return (size_t) i < (size_t) limit;
+}
+#if defined (__cplusplus) && __cplusplus >= 201103L
+    #include <cstdlib>
+    #define __Pyx_sst_abs(value) std::abs(value)
+#elif SIZEOF_INT >= SIZEOF_SIZE_T
+    #define __Pyx_sst_abs(value) abs(value)
+#elif SIZEOF_LONG >= SIZEOF_SIZE_T
+    #define __Pyx_sst_abs(value) labs(value)
+#elif defined (_MSC_VER)
+    #define __Pyx_sst_abs(value) ((Py_ssize_t)_abs64(value))
+#elif defined (__STDC_VERSION__) && __STDC_VERSION__ >= 199901L
+    #define __Pyx_sst_abs(value) llabs(value)
+#elif defined (__GNUC__)
+    #define __Pyx_sst_abs(value) __builtin_llabs(value)
+#else
+    #define __Pyx_sst_abs(value) ((value<0) ? -value : value)
+#endif
+static CYTHON_INLINE Py_ssize_t __Pyx_ssize_strlen(const char *s);
+static CYTHON_INLINE const char* __Pyx_PyObject_AsString(PyObject*);
+static CYTHON_INLINE const char* __Pyx_PyObject_AsStringAndSize(PyObject*, Py_ssize_t* length);
+static CYTHON_INLINE PyObject* __Pyx_PyByteArray_FromString(const char*);
+#define __Pyx_PyByteArray_FromStringAndSize(s, l) PyByteArray_FromStringAndSize((const char*)s, l)
+#define __Pyx_PyBytes_FromString        PyBytes_FromString
+#define __Pyx_PyBytes_FromStringAndSize PyBytes_FromStringAndSize
+static CYTHON_INLINE PyObject* __Pyx_PyUnicode_FromString(const char*);
+#if CYTHON_ASSUME_SAFE_MACROS
+    #define __Pyx_PyBytes_AsWritableString(s)     ((char*) PyBytes_AS_STRING(s))
+    #define __Pyx_PyBytes_AsWritableSString(s)    ((signed char*) PyBytes_AS_STRING(s))
+    #define __Pyx_PyBytes_AsWritableUString(s)    ((unsigned char*) PyBytes_AS_STRING(s))
+    #define __Pyx_PyBytes_AsString(s)     ((const char*) PyBytes_AS_STRING(s))
+    #define __Pyx_PyBytes_AsSString(s)    ((const signed char*) PyBytes_AS_STRING(s))
+    #define __Pyx_PyBytes_AsUString(s)    ((const unsigned char*) PyBytes_AS_STRING(s))
+    #define __Pyx_PyByteArray_AsString(s) PyByteArray_AS_STRING(s)
+#else
+    #define __Pyx_PyBytes_AsWritableString(s)     ((char*) PyBytes_AsString(s))
+    #define __Pyx_PyBytes_AsWritableSString(s)    ((signed char*) PyBytes_AsString(s))
+    #define __Pyx_PyBytes_AsWritableUString(s)    ((unsigned char*) PyBytes_AsString(s))
+    #define __Pyx_PyBytes_AsString(s)     ((const char*) PyBytes_AsString(s))
+    #define __Pyx_PyBytes_AsSString(s)    ((const signed char*) PyBytes_AsString(s))
+    #define __Pyx_PyBytes_AsUString(s)    ((const unsigned char*) PyBytes_AsString(s))
+    #define __Pyx_PyByteArray_AsString(s) PyByteArray_AsString(s)
+#endif
+#define __Pyx_PyObject_AsWritableString(s)    ((char*)(__pyx_uintptr_t) __Pyx_PyObject_AsString(s))
+#define __Pyx_PyObject_AsWritableSString(s)    ((signed char*)(__pyx_uintptr_t) __Pyx_PyObject_AsString(s))
+#define __Pyx_PyObject_AsWritableUString(s)    ((unsigned char*)(__pyx_uintptr_t) __Pyx_PyObject_AsString(s))
+#define __Pyx_PyObject_AsSString(s)    ((const signed char*) __Pyx_PyObject_AsString(s))
+#define __Pyx_PyObject_AsUString(s)    ((const unsigned char*) __Pyx_PyObject_AsString(s))
+#define __Pyx_PyObject_FromCString(s)  __Pyx_PyObject_FromString((const char*)s)
+#define __Pyx_PyBytes_FromCString(s)   __Pyx_PyBytes_FromString((const char*)s)
+#define __Pyx_PyByteArray_FromCString(s)   __Pyx_PyByteArray_FromString((const char*)s)
+#define __Pyx_PyUnicode_FromCString(s) __Pyx_PyUnicode_FromString((const char*)s)
+#define __Pyx_PyUnicode_FromOrdinal(o)       PyUnicode_FromOrdinal((int)o)
+#define __Pyx_PyUnicode_AsUnicode            PyUnicode_AsUnicode
+static CYTHON_INLINE PyObject *__Pyx_NewRef(PyObject *obj) {
+#if CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX >= 0x030a0000 || defined(Py_NewRef)
+    return Py_NewRef(obj);
+#else
+    Py_INCREF(obj);
+    return obj;
+#endif
+}
+static CYTHON_INLINE PyObject *__Pyx_XNewRef(PyObject *obj) {
+#if CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX >= 0x030a0000 || defined(Py_XNewRef)
+    return Py_XNewRef(obj);
+#else
+    Py_XINCREF(obj);
+    return obj;
+#endif
+}
+static CYTHON_INLINE PyObject *__Pyx_Owned_Py_None(int b);
+static CYTHON_INLINE PyObject * __Pyx_PyBool_FromLong(long b);
+static CYTHON_INLINE int __Pyx_PyObject_IsTrue(PyObject*);
+static CYTHON_INLINE int __Pyx_PyObject_IsTrueAndDecref(PyObject*);
+static CYTHON_INLINE PyObject* __Pyx_PyNumber_Long(PyObject* x);
+#define __Pyx_PyObject_RichCompareBool(a,b,cmp)  __Pyx_PyObject_IsTrueAndDecref(PyObject_RichCompare((a),(b),(cmp)))
+#define __Pyx_PySequence_Tuple(obj)\
+    (likely(PyTuple_CheckExact(obj)) ? __Pyx_NewRef(obj) : PySequence_Tuple(obj))
+static CYTHON_INLINE Py_ssize_t __Pyx_PyIndex_AsSsize_t(PyObject*);
+static CYTHON_INLINE PyObject * __Pyx_PyLong_FromSize_t(size_t);
+static CYTHON_INLINE Py_hash_t __Pyx_PyIndex_AsHash_t(PyObject*);
+#if CYTHON_ASSUME_SAFE_MACROS
+#define __Pyx_PyFloat_AsDouble(x) (PyFloat_CheckExact(x) ? PyFloat_AS_DOUBLE(x) : PyFloat_AsDouble(x))
+#define __Pyx_PyFloat_AS_DOUBLE(x) PyFloat_AS_DOUBLE(x)
+#define __Pyx_PyFloat_IsNonZero(x) (PyFloat_AS_DOUBLE(x) != 0.0)
+#else
+#define __Pyx_PyFloat_AsDouble(x) PyFloat_AsDouble(x)
+#define __Pyx_PyFloat_AS_DOUBLE(x) PyFloat_AsDouble(x)
+#define __Pyx_PyFloat_IsNonZero(x) PyObject_IsTrue(x)
+#endif
+#define __Pyx_PyFloat_AsFloat(x) ((float) __Pyx_PyFloat_AsDouble(x))
+#define __Pyx_PyNumber_Int(x) (PyLong_CheckExact(x) ? __Pyx_NewRef(x) : PyNumber_Long(x))
+#if CYTHON_USE_PYLONG_INTERNALS
+  #if PY_VERSION_HEX >= 0x030C00A7
+  #ifndef _PyLong_SIGN_MASK
+    #define _PyLong_SIGN_MASK 3
+  #endif
+  #ifndef _PyLong_NON_SIZE_BITS
+    #define _PyLong_NON_SIZE_BITS 3
+  #endif
+  #define __Pyx_PyLong_SignBits(x)  ((int) (((PyLongObject*)x)->long_value.lv_tag & _PyLong_SIGN_MASK))
+  #define __Pyx_PyLong_Sign(x)  (1 - __Pyx_PyLong_SignBits(x))
+  #define __Pyx_PyLong_IsNeg(x)  ((__Pyx_PyLong_SignBits(x) & 2) != 0)
+  #define __Pyx_PyLong_IsNonNeg(x)  (!__Pyx_PyLong_IsNeg(x))
+  #define __Pyx_PyLong_IsZero(x)  (__Pyx_PyLong_SignBits(x) & 1)
+  #define __Pyx_PyLong_IsPos(x)  (__Pyx_PyLong_SignBits(x) == 0)
+  #define __Pyx_PyLong_CompactValueUnsigned(x)  (__Pyx_PyLong_Digits(x)[0])
+  #define __Pyx_PyLong_DigitCount(x)  ((Py_ssize_t) (((PyLongObject*)x)->long_value.lv_tag >> _PyLong_NON_SIZE_BITS))
+  #define __Pyx_PyLong_SignedDigitCount(x)\
+        (((Py_ssize_t) __Pyx_PyLong_Sign(x)) * __Pyx_PyLong_DigitCount(x))
+  #if defined(PyUnstable_Long_IsCompact) && defined(PyUnstable_Long_CompactValue)
+    #define __Pyx_PyLong_IsCompact(x)     PyUnstable_Long_IsCompact((PyLongObject*) x)
+    #define __Pyx_PyLong_CompactValue(x)  PyUnstable_Long_CompactValue((PyLongObject*) x)
+  #else
+    #define __Pyx_PyLong_IsCompact(x)     (((PyLongObject*)x)->long_value.lv_tag < (2 << _PyLong_NON_SIZE_BITS))
+    #define __Pyx_PyLong_CompactValue(x)  (((Py_ssize_t) __Pyx_PyLong_Sign(x)) * (Py_ssize_t) __Pyx_PyLong_Digits(x)[0])
+  #endif
+  static CYTHON_INLINE Py_ssize_t __Pyx_PyLong_CompareSignAndSize(PyObject *a, PyObject *b) {
+      uintptr_t tag_a = ((PyLongObject*)a)->long_value.lv_tag;
+      uintptr_t tag_b = ((PyLongObject*)b)->long_value.lv_tag;
+      if (tag_a == tag_b) return 0;
+      int sign_a = (int) (tag_a & _PyLong_SIGN_MASK);
+      int sign_b = (int) (tag_b & _PyLong_SIGN_MASK);
+      if (sign_a > sign_b) return -1;
+      if (sign_a < sign_b) return 1;
+      Py_ssize_t size_a = (Py_ssize_t) (tag_a >> _PyLong_NON_SIZE_BITS);
+      Py_ssize_t size_b = (Py_ssize_t) (tag_b >> _PyLong_NON_SIZE_BITS);
+      return (1 - sign_a) * (size_a - size_b);
+  }
+  typedef Py_ssize_t  __Pyx_compact_pylong;
+  typedef size_t  __Pyx_compact_upylong;
+  #else
+  #define __Pyx_PyLong_Sign(x)  ((int) ((Py_SIZE(x) == 0) ? 0 : (Py_SIZE(x) < 0) ? -1 : 1))
+  #define __Pyx_PyLong_IsNeg(x)  (Py_SIZE(x) < 0)
+  #define __Pyx_PyLong_IsNonNeg(x)  (Py_SIZE(x) >= 0)
+  #define __Pyx_PyLong_IsZero(x)  (Py_SIZE(x) == 0)
+  #define __Pyx_PyLong_IsPos(x)  (Py_SIZE(x) > 0)
+  #define __Pyx_PyLong_CompactValueUnsigned(x)  ((Py_SIZE(x) == 0) ? 0 : __Pyx_PyLong_Digits(x)[0])
+  #define __Pyx_PyLong_DigitCount(x)  __Pyx_sst_abs(Py_SIZE(x))
+  #define __Pyx_PyLong_SignedDigitCount(x)  Py_SIZE(x)
+  #define __Pyx_PyLong_IsCompact(x)  (Py_SIZE(x) == 0 || Py_SIZE(x) == 1 || Py_SIZE(x) == -1)
+  #define __Pyx_PyLong_CompactValue(x)\
+        ((Py_SIZE(x) == 0) ? (sdigit) 0 : ((Py_SIZE(x) < 0) ? -(sdigit)__Pyx_PyLong_Digits(x)[0] : (sdigit)__Pyx_PyLong_Digits(x)[0]))
+  #define __Pyx_PyLong_CompareSignAndSize(a, b)  (Py_SIZE(a) - Py_SIZE(b))
+  typedef sdigit  __Pyx_compact_pylong;
+  typedef digit  __Pyx_compact_upylong;
+  #endif
+  #if PY_VERSION_HEX >= 0x030C00A5
+  #define __Pyx_PyLong_Digits(x)  (((PyLongObject*)x)->long_value.ob_digit)
+  #else
+  #define __Pyx_PyLong_Digits(x)  (((PyLongObject*)x)->ob_digit)
+  #endif
+  #define __Pyx_PyLong_IsNonZero(x)  (!__Pyx_PyLong_IsZero(x))
+#else
+  #define __Pyx_PyLong_IsNonZero(x)  PyObject_IsTrue(x)
+#endif
+#if __PYX_DEFAULT_STRING_ENCODING_IS_UTF8
+  #define __Pyx_PyUnicode_FromStringAndSize(c_str, size) PyUnicode_DecodeUTF8(c_str, size, NULL)
+#elif __PYX_DEFAULT_STRING_ENCODING_IS_ASCII
+  #define __Pyx_PyUnicode_FromStringAndSize(c_str, size) PyUnicode_DecodeASCII(c_str, size, NULL)
+#else
+  #define __Pyx_PyUnicode_FromStringAndSize(c_str, size) PyUnicode_Decode(c_str, size, __PYX_DEFAULT_STRING_ENCODING, NULL)
+#endif
+
+
+/* Test for GCC > 2.95 */
+#if defined(__GNUC__)     && (__GNUC__ > 2 || (__GNUC__ == 2 && (__GNUC_MINOR__ > 95)))
+  #define likely(x)   __builtin_expect(!!(x), 1)
+  #define unlikely(x) __builtin_expect(!!(x), 0)
+#else /* !__GNUC__ or GCC < 2.95 */
+  #define likely(x)   (x)
+  #define unlikely(x) (x)
+#endif /* __GNUC__ */
+/* PretendToInitialize */
+#ifdef __cplusplus
+#if __cplusplus > 201103L
+#include <type_traits>
+#endif
+template <typename T>
+static void __Pyx_pretend_to_initialize(T* ptr) {
+#if __cplusplus > 201103L
+    if ((std::is_trivially_default_constructible<T>::value))
+#endif
+        *ptr = T();
+    (void)ptr;
+}
+#else
+static CYTHON_INLINE void __Pyx_pretend_to_initialize(void* ptr) { (void)ptr; }
+#endif
+
+
+#if !CYTHON_USE_MODULE_STATE
+static PyObject *__pyx_m = NULL;
+#endif
+static const char * const __pyx_cfilenm = __FILE__;
+
+/* #### Code section: filename_table ### */
+
+static const char* const __pyx_f[] = {
+  "nes/cpu/cpu_op.pyx",
+  "nes/cpu/cpu_op.pxd",
+  "(tree fragment)",
+};
+/* #### Code section: utility_code_proto_before_types ### */
+/* Atomics.proto (used by UnpackUnboundCMethod) */
+#include <pythread.h>
+#ifndef CYTHON_ATOMICS
+    #define CYTHON_ATOMICS 1
+#endif
+#define __PYX_CYTHON_ATOMICS_ENABLED() CYTHON_ATOMICS
+#define __PYX_GET_CYTHON_COMPILING_IN_CPYTHON_FREETHREADING() CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+#define __pyx_atomic_int_type int
+#define __pyx_nonatomic_int_type int
+#if CYTHON_ATOMICS && (defined(__STDC_VERSION__) &&\
+                        (__STDC_VERSION__ >= 201112L) &&\
+                        !defined(__STDC_NO_ATOMICS__))
+    #include <stdatomic.h>
+#elif CYTHON_ATOMICS && (defined(__cplusplus) && (\
+                    (__cplusplus >= 201103L) ||\
+                    (defined(_MSC_VER) && _MSC_VER >= 1700)))
+    #include <atomic>
+#endif
+#if CYTHON_ATOMICS && (defined(__STDC_VERSION__) &&\
+                        (__STDC_VERSION__ >= 201112L) &&\
+                        !defined(__STDC_NO_ATOMICS__) &&\
+                       ATOMIC_INT_LOCK_FREE == 2)
+    #undef __pyx_atomic_int_type
+    #define __pyx_atomic_int_type atomic_int
+    #define __pyx_atomic_ptr_type atomic_uintptr_t
+    #define __pyx_nonatomic_ptr_type uintptr_t
+    #define __pyx_atomic_incr_relaxed(value) atomic_fetch_add_explicit(value, 1, memory_order_relaxed)
+    #define __pyx_atomic_incr_acq_rel(value) atomic_fetch_add_explicit(value, 1, memory_order_acq_rel)
+    #define __pyx_atomic_decr_acq_rel(value) atomic_fetch_sub_explicit(value, 1, memory_order_acq_rel)
+    #define __pyx_atomic_sub(value, arg) atomic_fetch_sub(value, arg)
+    #define __pyx_atomic_int_cmp_exchange(value, expected, desired) atomic_compare_exchange_strong(value, expected, desired)
+    #define __pyx_atomic_load(value) atomic_load(value)
+    #define __pyx_atomic_store(value, new_value) atomic_store(value, new_value)
+    #define __pyx_atomic_pointer_load_relaxed(value) atomic_load_explicit(value, memory_order_relaxed)
+    #define __pyx_atomic_pointer_load_acquire(value) atomic_load_explicit(value, memory_order_acquire)
+    #define __pyx_atomic_pointer_exchange(value, new_value) atomic_exchange(value, (__pyx_nonatomic_ptr_type)new_value)
+    #define __pyx_atomic_pointer_cmp_exchange(value, expected, desired) atomic_compare_exchange_strong(value, expected, desired)
+    #if defined(__PYX_DEBUG_ATOMICS) && defined(_MSC_VER)
+        #pragma message ("Using standard C atomics")
+    #elif defined(__PYX_DEBUG_ATOMICS)
+        #warning "Using standard C atomics"
+    #endif
+#elif CYTHON_ATOMICS && (defined(__cplusplus) && (\
+                    (__cplusplus >= 201103L) ||\
+\
+                    (defined(_MSC_VER) && _MSC_VER >= 1700)) &&\
+                    ATOMIC_INT_LOCK_FREE == 2)
+    #undef __pyx_atomic_int_type
+    #define __pyx_atomic_int_type std::atomic_int
+    #define __pyx_atomic_ptr_type std::atomic_uintptr_t
+    #define __pyx_nonatomic_ptr_type uintptr_t
+    #define __pyx_atomic_incr_relaxed(value) std::atomic_fetch_add_explicit(value, 1, std::memory_order_relaxed)
+    #define __pyx_atomic_incr_acq_rel(value) std::atomic_fetch_add_explicit(value, 1, std::memory_order_acq_rel)
+    #define __pyx_atomic_decr_acq_rel(value) std::atomic_fetch_sub_explicit(value, 1, std::memory_order_acq_rel)
+    #define __pyx_atomic_sub(value, arg) std::atomic_fetch_sub(value, arg)
+    #define __pyx_atomic_int_cmp_exchange(value, expected, desired) std::atomic_compare_exchange_strong(value, expected, desired)
+    #define __pyx_atomic_load(value) std::atomic_load(value)
+    #define __pyx_atomic_store(value, new_value) std::atomic_store(value, new_value)
+    #define __pyx_atomic_pointer_load_relaxed(value) std::atomic_load_explicit(value, std::memory_order_relaxed)
+    #define __pyx_atomic_pointer_load_acquire(value) std::atomic_load_explicit(value, std::memory_order_acquire)
+    #define __pyx_atomic_pointer_exchange(value, new_value) std::atomic_exchange(value, (__pyx_nonatomic_ptr_type)new_value)
+    #define __pyx_atomic_pointer_cmp_exchange(value, expected, desired) std::atomic_compare_exchange_strong(value, expected, desired)
+    #if defined(__PYX_DEBUG_ATOMICS) && defined(_MSC_VER)
+        #pragma message ("Using standard C++ atomics")
+    #elif defined(__PYX_DEBUG_ATOMICS)
+        #warning "Using standard C++ atomics"
+    #endif
+#elif CYTHON_ATOMICS && (__GNUC__ >= 5 || (__GNUC__ == 4 &&\
+                    (__GNUC_MINOR__ > 1 ||\
+                    (__GNUC_MINOR__ == 1 && __GNUC_PATCHLEVEL__ >= 2))))
+    #define __pyx_atomic_ptr_type void*
+    #define __pyx_nonatomic_ptr_type void*
+    #define __pyx_atomic_incr_relaxed(value) __sync_fetch_and_add(value, 1)
+    #define __pyx_atomic_incr_acq_rel(value) __sync_fetch_and_add(value, 1)
+    #define __pyx_atomic_decr_acq_rel(value) __sync_fetch_and_sub(value, 1)
+    #define __pyx_atomic_sub(value, arg) __sync_fetch_and_sub(value, arg)
+    static CYTHON_INLINE int __pyx_atomic_int_cmp_exchange(__pyx_atomic_int_type* value, __pyx_nonatomic_int_type* expected, __pyx_nonatomic_int_type desired) {
+        __pyx_nonatomic_int_type old = __sync_val_compare_and_swap(value, *expected, desired);
+        int result = old == *expected;
+        *expected = old;
+        return result;
+    }
+    #define __pyx_atomic_load(value) __sync_fetch_and_add(value, 0)
+    #define __pyx_atomic_store(value, new_value) __sync_lock_test_and_set(value, new_value)
+    #define __pyx_atomic_pointer_load_relaxed(value) __sync_fetch_and_add(value, 0)
+    #define __pyx_atomic_pointer_load_acquire(value) __sync_fetch_and_add(value, 0)
+    #define __pyx_atomic_pointer_exchange(value, new_value) __sync_lock_test_and_set(value, (__pyx_atomic_ptr_type)new_value)
+    static CYTHON_INLINE int __pyx_atomic_pointer_cmp_exchange(__pyx_atomic_ptr_type* value, __pyx_nonatomic_ptr_type* expected, __pyx_nonatomic_ptr_type desired) {
+        __pyx_nonatomic_ptr_type old = __sync_val_compare_and_swap(value, *expected, desired);
+        int result = old == *expected;
+        *expected = old;
+        return result;
+    }
+    #ifdef __PYX_DEBUG_ATOMICS
+        #warning "Using GNU atomics"
+    #endif
+#elif CYTHON_ATOMICS && defined(_MSC_VER)
+    #include <intrin.h>
+    #undef __pyx_atomic_int_type
+    #define __pyx_atomic_int_type long
+    #define __pyx_atomic_ptr_type void*
+    #undef __pyx_nonatomic_int_type
+    #define __pyx_nonatomic_int_type long
+    #define __pyx_nonatomic_ptr_type void*
+    #pragma intrinsic (_InterlockedExchangeAdd, _InterlockedExchange, _InterlockedCompareExchange, _InterlockedCompareExchangePointer, _InterlockedExchangePointer)
+    #define __pyx_atomic_incr_relaxed(value) _InterlockedExchangeAdd(value, 1)
+    #define __pyx_atomic_incr_acq_rel(value) _InterlockedExchangeAdd(value, 1)
+    #define __pyx_atomic_decr_acq_rel(value) _InterlockedExchangeAdd(value, -1)
+    #define __pyx_atomic_sub(value, arg) _InterlockedExchangeAdd(value, -arg)
+    static CYTHON_INLINE int __pyx_atomic_int_cmp_exchange(__pyx_atomic_int_type* value, __pyx_nonatomic_int_type* expected, __pyx_nonatomic_int_type desired) {
+        __pyx_nonatomic_int_type old = _InterlockedCompareExchange(value, desired, *expected);
+        int result = old == *expected;
+        *expected = old;
+        return result;
+    }
+    #define __pyx_atomic_load(value) _InterlockedExchangeAdd(value, 0)
+    #define __pyx_atomic_store(value, new_value) _InterlockedExchange(value, new_value)
+    #define __pyx_atomic_pointer_load_relaxed(value) *(void * volatile *)value
+    #define __pyx_atomic_pointer_load_acquire(value) _InterlockedCompareExchangePointer(value, 0, 0)
+    #define __pyx_atomic_pointer_exchange(value, new_value) _InterlockedExchangePointer(value, (__pyx_atomic_ptr_type)new_value)
+    static CYTHON_INLINE int __pyx_atomic_pointer_cmp_exchange(__pyx_atomic_ptr_type* value, __pyx_nonatomic_ptr_type* expected, __pyx_nonatomic_ptr_type desired) {
+        __pyx_atomic_ptr_type old = _InterlockedCompareExchangePointer(value, desired, *expected);
+        int result = old == *expected;
+        *expected = old;
+        return result;
+    }
+    #ifdef __PYX_DEBUG_ATOMICS
+        #pragma message ("Using MSVC atomics")
+    #endif
+#else
+    #undef CYTHON_ATOMICS
+    #define CYTHON_ATOMICS 0
+    #ifdef __PYX_DEBUG_ATOMICS
+        #warning "Not using atomics"
+    #endif
+#endif
+
+/* CriticalSectionsDefinition.proto (used by CriticalSections) */
+#if !CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+#define __Pyx_PyCriticalSection void*
+#define __Pyx_PyCriticalSection2 void*
+#define __Pyx_PyCriticalSection_End(cs)
+#define __Pyx_PyCriticalSection2_End(cs)
+#else
+#define __Pyx_PyCriticalSection PyCriticalSection
+#define __Pyx_PyCriticalSection2 PyCriticalSection2
+#define __Pyx_PyCriticalSection_End PyCriticalSection_End
+#define __Pyx_PyCriticalSection2_End PyCriticalSection2_End
+#endif
+
+/* CriticalSections.proto (used by ParseKeywordsImpl) */
+#if !CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+#define __Pyx_PyCriticalSection_Begin(cs, arg) (void)(cs)
+#define __Pyx_PyCriticalSection2_Begin(cs, arg1, arg2) (void)(cs)
+#else
+#define __Pyx_PyCriticalSection_Begin PyCriticalSection_Begin
+#define __Pyx_PyCriticalSection2_Begin PyCriticalSection2_Begin
+#endif
+#if PY_VERSION_HEX < 0x030d0000 || CYTHON_COMPILING_IN_LIMITED_API
+#define __Pyx_BEGIN_CRITICAL_SECTION(o) {
+#define __Pyx_END_CRITICAL_SECTION() }
+#else
+#define __Pyx_BEGIN_CRITICAL_SECTION Py_BEGIN_CRITICAL_SECTION
+#define __Pyx_END_CRITICAL_SECTION Py_END_CRITICAL_SECTION
+#endif
+
+/* IncludeStructmemberH.proto (used by CythonFunctionShared) */
+#include <structmember.h>
+
+/* #### Code section: numeric_typedefs ### */
+/* #### Code section: complex_type_declarations ### */
+/* #### Code section: type_declarations ### */
+
+/*--- Type declarations ---*/
+struct __pyx_obj_3nes_3cpu_6cpu_op_Op;
+
+/* "nes/cpu/cpu_op.pxd":4
+ * 
+ * 
+ * cdef enum AddressingMode:             # <<<<<<<<<<<<<<
+ *     IMP
+ *     IMM
+*/
+enum __pyx_t_3nes_3cpu_6cpu_op_AddressingMode {
+  __pyx_e_3nes_3cpu_6cpu_op_IMP,
+  __pyx_e_3nes_3cpu_6cpu_op_IMM,
+  __pyx_e_3nes_3cpu_6cpu_op_ZP0,
+  __pyx_e_3nes_3cpu_6cpu_op_ZPX,
+  __pyx_e_3nes_3cpu_6cpu_op_ZPY,
+  __pyx_e_3nes_3cpu_6cpu_op_REL,
+  __pyx_e_3nes_3cpu_6cpu_op_ABS,
+  __pyx_e_3nes_3cpu_6cpu_op_ABX,
+  __pyx_e_3nes_3cpu_6cpu_op_ABY,
+  __pyx_e_3nes_3cpu_6cpu_op_IND,
+  __pyx_e_3nes_3cpu_6cpu_op_IZX,
+  __pyx_e_3nes_3cpu_6cpu_op_IZY
+};
+
+/* "nes/cpu/cpu_op.pxd":18
+ *     IZY
+ * 
+ * cdef enum Instruction:             # <<<<<<<<<<<<<<
+ *     ADC
+ *     SBC
+*/
+enum __pyx_t_3nes_3cpu_6cpu_op_Instruction {
+  __pyx_e_3nes_3cpu_6cpu_op_ADC,
+  __pyx_e_3nes_3cpu_6cpu_op_SBC,
+  __pyx_e_3nes_3cpu_6cpu_op_AND,
+  __pyx_e_3nes_3cpu_6cpu_op_ASL,
+  __pyx_e_3nes_3cpu_6cpu_op_BCC,
+  __pyx_e_3nes_3cpu_6cpu_op_BCS,
+  __pyx_e_3nes_3cpu_6cpu_op_BEQ,
+  __pyx_e_3nes_3cpu_6cpu_op_BIT,
+  __pyx_e_3nes_3cpu_6cpu_op_BMI,
+  __pyx_e_3nes_3cpu_6cpu_op_BNE,
+  __pyx_e_3nes_3cpu_6cpu_op_BPL,
+  __pyx_e_3nes_3cpu_6cpu_op_BRK,
+  __pyx_e_3nes_3cpu_6cpu_op_BVC,
+  __pyx_e_3nes_3cpu_6cpu_op_BVS,
+  __pyx_e_3nes_3cpu_6cpu_op_CLC,
+  __pyx_e_3nes_3cpu_6cpu_op_CLD,
+  __pyx_e_3nes_3cpu_6cpu_op_CLI,
+  __pyx_e_3nes_3cpu_6cpu_op_CLV,
+  __pyx_e_3nes_3cpu_6cpu_op_CMP,
+  __pyx_e_3nes_3cpu_6cpu_op_CPX,
+  __pyx_e_3nes_3cpu_6cpu_op_CPY,
+  __pyx_e_3nes_3cpu_6cpu_op_DEC,
+  __pyx_e_3nes_3cpu_6cpu_op_DEX,
+  __pyx_e_3nes_3cpu_6cpu_op_DEY,
+  __pyx_e_3nes_3cpu_6cpu_op_EOR,
+  __pyx_e_3nes_3cpu_6cpu_op_INC,
+  __pyx_e_3nes_3cpu_6cpu_op_INX,
+  __pyx_e_3nes_3cpu_6cpu_op_INY,
+  __pyx_e_3nes_3cpu_6cpu_op_JMP,
+  __pyx_e_3nes_3cpu_6cpu_op_JSR,
+  __pyx_e_3nes_3cpu_6cpu_op_LDA,
+  __pyx_e_3nes_3cpu_6cpu_op_LDX,
+  __pyx_e_3nes_3cpu_6cpu_op_LDY,
+  __pyx_e_3nes_3cpu_6cpu_op_LSR,
+  __pyx_e_3nes_3cpu_6cpu_op_NOP,
+  __pyx_e_3nes_3cpu_6cpu_op_ORA,
+  __pyx_e_3nes_3cpu_6cpu_op_PHA,
+  __pyx_e_3nes_3cpu_6cpu_op_PHP,
+  __pyx_e_3nes_3cpu_6cpu_op_PLA,
+  __pyx_e_3nes_3cpu_6cpu_op_PLP,
+  __pyx_e_3nes_3cpu_6cpu_op_ROL,
+  __pyx_e_3nes_3cpu_6cpu_op_ROR,
+  __pyx_e_3nes_3cpu_6cpu_op_RTI,
+  __pyx_e_3nes_3cpu_6cpu_op_RTS,
+  __pyx_e_3nes_3cpu_6cpu_op_SEC,
+  __pyx_e_3nes_3cpu_6cpu_op_SED,
+  __pyx_e_3nes_3cpu_6cpu_op_SEI,
+  __pyx_e_3nes_3cpu_6cpu_op_STA,
+  __pyx_e_3nes_3cpu_6cpu_op_STX,
+  __pyx_e_3nes_3cpu_6cpu_op_STY,
+  __pyx_e_3nes_3cpu_6cpu_op_TAX,
+  __pyx_e_3nes_3cpu_6cpu_op_TAY,
+  __pyx_e_3nes_3cpu_6cpu_op_TSX,
+  __pyx_e_3nes_3cpu_6cpu_op_TXA,
+  __pyx_e_3nes_3cpu_6cpu_op_TXS,
+  __pyx_e_3nes_3cpu_6cpu_op_TYA,
+  __pyx_e_3nes_3cpu_6cpu_op_XXX
+};
+
+/* "nes/cpu/cpu_op.pxd":85
+ * cdef list LOOKUP
+ * 
+ * cdef class Op:             # <<<<<<<<<<<<<<
+ *     cdef public str name
+ *     cdef public str operate
+*/
+struct __pyx_obj_3nes_3cpu_6cpu_op_Op {
+  PyObject_HEAD
+  PyObject *name;
+  PyObject *operate;
+  PyObject *addrmode;
+  int cycles;
+};
+
+/* #### Code section: utility_code_proto ### */
+
+/* --- Runtime support code (head) --- */
+/* Refnanny.proto */
+#ifndef CYTHON_REFNANNY
+  #define CYTHON_REFNANNY 0
+#endif
+#if CYTHON_REFNANNY
+  typedef struct {
+    void (*INCREF)(void*, PyObject*, Py_ssize_t);
+    void (*DECREF)(void*, PyObject*, Py_ssize_t);
+    void (*GOTREF)(void*, PyObject*, Py_ssize_t);
+    void (*GIVEREF)(void*, PyObject*, Py_ssize_t);
+    void* (*SetupContext)(const char*, Py_ssize_t, const char*);
+    void (*FinishContext)(void**);
+  } __Pyx_RefNannyAPIStruct;
+  static __Pyx_RefNannyAPIStruct *__Pyx_RefNanny = NULL;
+  static __Pyx_RefNannyAPIStruct *__Pyx_RefNannyImportAPI(const char *modname);
+  #define __Pyx_RefNannyDeclarations void *__pyx_refnanny = NULL;
+  #define __Pyx_RefNannySetupContext(name, acquire_gil)\
+          if (acquire_gil) {\
+              PyGILState_STATE __pyx_gilstate_save = PyGILState_Ensure();\
+              __pyx_refnanny = __Pyx_RefNanny->SetupContext((name), (__LINE__), (__FILE__));\
+              PyGILState_Release(__pyx_gilstate_save);\
+          } else {\
+              __pyx_refnanny = __Pyx_RefNanny->SetupContext((name), (__LINE__), (__FILE__));\
+          }
+  #define __Pyx_RefNannyFinishContextNogil() {\
+              PyGILState_STATE __pyx_gilstate_save = PyGILState_Ensure();\
+              __Pyx_RefNannyFinishContext();\
+              PyGILState_Release(__pyx_gilstate_save);\
+          }
+  #define __Pyx_RefNannyFinishContextNogil() {\
+              PyGILState_STATE __pyx_gilstate_save = PyGILState_Ensure();\
+              __Pyx_RefNannyFinishContext();\
+              PyGILState_Release(__pyx_gilstate_save);\
+          }
+  #define __Pyx_RefNannyFinishContext()\
+          __Pyx_RefNanny->FinishContext(&__pyx_refnanny)
+  #define __Pyx_INCREF(r)  __Pyx_RefNanny->INCREF(__pyx_refnanny, (PyObject *)(r), (__LINE__))
+  #define __Pyx_DECREF(r)  __Pyx_RefNanny->DECREF(__pyx_refnanny, (PyObject *)(r), (__LINE__))
+  #define __Pyx_GOTREF(r)  __Pyx_RefNanny->GOTREF(__pyx_refnanny, (PyObject *)(r), (__LINE__))
+  #define __Pyx_GIVEREF(r) __Pyx_RefNanny->GIVEREF(__pyx_refnanny, (PyObject *)(r), (__LINE__))
+  #define __Pyx_XINCREF(r)  do { if((r) == NULL); else {__Pyx_INCREF(r); }} while(0)
+  #define __Pyx_XDECREF(r)  do { if((r) == NULL); else {__Pyx_DECREF(r); }} while(0)
+  #define __Pyx_XGOTREF(r)  do { if((r) == NULL); else {__Pyx_GOTREF(r); }} while(0)
+  #define __Pyx_XGIVEREF(r) do { if((r) == NULL); else {__Pyx_GIVEREF(r);}} while(0)
+#else
+  #define __Pyx_RefNannyDeclarations
+  #define __Pyx_RefNannySetupContext(name, acquire_gil)
+  #define __Pyx_RefNannyFinishContextNogil()
+  #define __Pyx_RefNannyFinishContext()
+  #define __Pyx_INCREF(r) Py_INCREF(r)
+  #define __Pyx_DECREF(r) Py_DECREF(r)
+  #define __Pyx_GOTREF(r)
+  #define __Pyx_GIVEREF(r)
+  #define __Pyx_XINCREF(r) Py_XINCREF(r)
+  #define __Pyx_XDECREF(r) Py_XDECREF(r)
+  #define __Pyx_XGOTREF(r)
+  #define __Pyx_XGIVEREF(r)
+#endif
+#define __Pyx_Py_XDECREF_SET(r, v) do {\
+        PyObject *tmp = (PyObject *) r;\
+        r = v; Py_XDECREF(tmp);\
+    } while (0)
+#define __Pyx_XDECREF_SET(r, v) do {\
+        PyObject *tmp = (PyObject *) r;\
+        r = v; __Pyx_XDECREF(tmp);\
+    } while (0)
+#define __Pyx_DECREF_SET(r, v) do {\
+        PyObject *tmp = (PyObject *) r;\
+        r = v; __Pyx_DECREF(tmp);\
+    } while (0)
+#define __Pyx_CLEAR(r)    do { PyObject* tmp = ((PyObject*)(r)); r = NULL; __Pyx_DECREF(tmp);} while(0)
+#define __Pyx_XCLEAR(r)   do { if((r) != NULL) {PyObject* tmp = ((PyObject*)(r)); r = NULL; __Pyx_DECREF(tmp);}} while(0)
+
+/* FastTypeChecks.proto (used by GivenExceptionMatches) */
+#if CYTHON_COMPILING_IN_CPYTHON
+#define __Pyx_TypeCheck(obj, type) __Pyx_IsSubtype(Py_TYPE(obj), (PyTypeObject *)type)
+#define __Pyx_TypeCheck2(obj, type1, type2) __Pyx_IsAnySubtype2(Py_TYPE(obj), (PyTypeObject *)type1, (PyTypeObject *)type2)
+static CYTHON_INLINE int __Pyx_IsSubtype(PyTypeObject *a, PyTypeObject *b);
+static CYTHON_INLINE int __Pyx_IsAnySubtype2(PyTypeObject *cls, PyTypeObject *a, PyTypeObject *b);
+#define __Pyx_PyAnySet_Check(obj)  __Pyx_TypeCheck2(obj, &PySet_Type, &PyFrozenSet_Type)
+#else
+#define __Pyx_TypeCheck(obj, type) PyObject_TypeCheck(obj, (PyTypeObject *)type)
+#define __Pyx_TypeCheck2(obj, type1, type2) (PyObject_TypeCheck(obj, (PyTypeObject *)type1) || PyObject_TypeCheck(obj, (PyTypeObject *)type2))
+#define __Pyx_PyAnySet_Check(obj)  PyAnySet_Check(obj)
+#endif
+
+/* PyThreadStateGet.proto (used by PyErrFetchRestore) */
+#if CYTHON_FAST_THREAD_STATE
+#define __Pyx_PyThreadState_declare  PyThreadState *__pyx_tstate;
+#define __Pyx_PyThreadState_assign  __pyx_tstate = __Pyx_PyThreadState_Current;
+#if PY_VERSION_HEX >= 0x030C00A6
+#define __Pyx_PyErr_Occurred()  (__pyx_tstate->current_exception != NULL)
+#define __Pyx_PyErr_CurrentExceptionType()  (__pyx_tstate->current_exception ? (PyObject*) Py_TYPE(__pyx_tstate->current_exception) : (PyObject*) NULL)
+#else
+#define __Pyx_PyErr_Occurred()  (__pyx_tstate->curexc_type != NULL)
+#define __Pyx_PyErr_CurrentExceptionType()  (__pyx_tstate->curexc_type)
+#endif
+#else
+#define __Pyx_PyThreadState_declare
+#define __Pyx_PyThreadState_assign
+#define __Pyx_PyErr_Occurred()  (PyErr_Occurred() != NULL)
+#define __Pyx_PyErr_CurrentExceptionType()  PyErr_Occurred()
+#endif
+
+/* PyErrFetchRestore.proto (used by GivenExceptionMatches) */
+#if CYTHON_FAST_THREAD_STATE
+#define __Pyx_PyErr_Clear() __Pyx_ErrRestore(NULL, NULL, NULL)
+#define __Pyx_ErrRestoreWithState(type, value, tb)  __Pyx_ErrRestoreInState(PyThreadState_GET(), type, value, tb)
+#define __Pyx_ErrFetchWithState(type, value, tb)    __Pyx_ErrFetchInState(PyThreadState_GET(), type, value, tb)
+#define __Pyx_ErrRestore(type, value, tb)  __Pyx_ErrRestoreInState(__pyx_tstate, type, value, tb)
+#define __Pyx_ErrFetch(type, value, tb)    __Pyx_ErrFetchInState(__pyx_tstate, type, value, tb)
+static CYTHON_INLINE void __Pyx_ErrRestoreInState(PyThreadState *tstate, PyObject *type, PyObject *value, PyObject *tb);
+static CYTHON_INLINE void __Pyx_ErrFetchInState(PyThreadState *tstate, PyObject **type, PyObject **value, PyObject **tb);
+#if CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX < 0x030C00A6
+#define __Pyx_PyErr_SetNone(exc) (Py_INCREF(exc), __Pyx_ErrRestore((exc), NULL, NULL))
+#else
+#define __Pyx_PyErr_SetNone(exc) PyErr_SetNone(exc)
+#endif
+#else
+#define __Pyx_PyErr_Clear() PyErr_Clear()
+#define __Pyx_PyErr_SetNone(exc) PyErr_SetNone(exc)
+#define __Pyx_ErrRestoreWithState(type, value, tb)  PyErr_Restore(type, value, tb)
+#define __Pyx_ErrFetchWithState(type, value, tb)  PyErr_Fetch(type, value, tb)
+#define __Pyx_ErrRestoreInState(tstate, type, value, tb)  PyErr_Restore(type, value, tb)
+#define __Pyx_ErrFetchInState(tstate, type, value, tb)  PyErr_Fetch(type, value, tb)
+#define __Pyx_ErrRestore(type, value, tb)  PyErr_Restore(type, value, tb)
+#define __Pyx_ErrFetch(type, value, tb)  PyErr_Fetch(type, value, tb)
+#endif
+
+/* GivenExceptionMatches.proto (used by PyErrExceptionMatches) */
+#if CYTHON_COMPILING_IN_CPYTHON
+static CYTHON_INLINE int __Pyx_PyErr_GivenExceptionMatches(PyObject *err, PyObject *type);
+static CYTHON_INLINE int __Pyx_PyErr_GivenExceptionMatches2(PyObject *err, PyObject *type1, PyObject *type2);
+#else
+#define __Pyx_PyErr_GivenExceptionMatches(err, type) PyErr_GivenExceptionMatches(err, type)
+static CYTHON_INLINE int __Pyx_PyErr_GivenExceptionMatches2(PyObject *err, PyObject *type1, PyObject *type2) {
+    return PyErr_GivenExceptionMatches(err, type1) || PyErr_GivenExceptionMatches(err, type2);
+}
+#endif
+#define __Pyx_PyErr_ExceptionMatches2(err1, err2)  __Pyx_PyErr_GivenExceptionMatches2(__Pyx_PyErr_CurrentExceptionType(), err1, err2)
+
+/* PyErrExceptionMatches.proto (used by PyObjectGetAttrStrNoError) */
+#if CYTHON_FAST_THREAD_STATE
+#define __Pyx_PyErr_ExceptionMatches(err) __Pyx_PyErr_ExceptionMatchesInState(__pyx_tstate, err)
+static CYTHON_INLINE int __Pyx_PyErr_ExceptionMatchesInState(PyThreadState* tstate, PyObject* err);
+#else
+#define __Pyx_PyErr_ExceptionMatches(err)  PyErr_ExceptionMatches(err)
+#endif
+
+/* PyObjectGetAttrStr.proto (used by PyObjectGetAttrStrNoError) */
+#if CYTHON_USE_TYPE_SLOTS
+static CYTHON_INLINE PyObject* __Pyx_PyObject_GetAttrStr(PyObject* obj, PyObject* attr_name);
+#else
+#define __Pyx_PyObject_GetAttrStr(o,n) PyObject_GetAttr(o,n)
+#endif
+
+/* PyObjectGetAttrStrNoError.proto (used by GetBuiltinName) */
+static CYTHON_INLINE PyObject* __Pyx_PyObject_GetAttrStrNoError(PyObject* obj, PyObject* attr_name);
+
+/* GetBuiltinName.proto */
+static PyObject *__Pyx_GetBuiltinName(PyObject *name);
+
+/* CopyObjectArray.proto (used by TupleOrListFromArrayImpl) */
+#if CYTHON_COMPILING_IN_CPYTHON
+static CYTHON_INLINE void __Pyx_copy_object_array(PyObject *const *CYTHON_RESTRICT src, PyObject** CYTHON_RESTRICT dest, Py_ssize_t length);
+#endif
+
+/* TupleOrListFromArrayImpl.proto (used by TupleFromArray) */
+#if PY_VERSION_HEX >= 0x030F0000 && !CYTHON_COMPILING_IN_LIMITED_API
+#define __Pyx_PyTuple_FromArray(src, n) PyTuple_FromArray(src, ((n)<0) ? 0 : (n))
+#else
+CYTHON_UNUSED static PyObject *
+__Pyx_PyTuple_FromArray(PyObject *const *src, Py_ssize_t n);
+#endif
+
+/* TupleFromArray.proto (used by fastcall) */
+
+
+/* IncludeStringH.proto (used by PyObjectCompare) */
+#include <string.h>
+
+/* PyObjectCompare.proto (used by UnicodeEquals) */
+static CYTHON_INLINE int __Pyx_PyObject_CompareBoolEq_str_str(PyObject *op1, PyObject *op2, int pyop);
+
+/* UnicodeEquals.proto (used by fastcall) */
+#define __Pyx_PyUnicode_Equals(s1, s2)  __Pyx_PyObject_CompareBoolEq_str_str(s1, s2, Py_EQ)
+
+/* fastcall.proto */
+#if CYTHON_AVOID_BORROWED_REFS
+    #define __Pyx_ArgRef_VARARGS(args, i) __Pyx_PySequence_ITEM(args, i)
+#elif CYTHON_ASSUME_SAFE_MACROS
+    #define __Pyx_ArgRef_VARARGS(args, i) __Pyx_NewRef(__Pyx_PyTuple_GET_ITEM(args, i))
+#else
+    #define __Pyx_ArgRef_VARARGS(args, i) __Pyx_XNewRef(PyTuple_GetItem(args, i))
+#endif
+#define __Pyx_NumKwargs_VARARGS(kwds) PyDict_Size(kwds)
+#define __Pyx_KwValues_VARARGS(args, nargs) NULL
+#define __Pyx_GetKwValue_VARARGS(kw, kwvalues, s) __Pyx_PyDict_GetItemStrWithError(kw, s)
+#define __Pyx_KwargsAsDict_VARARGS(kw, kwvalues) PyDict_Copy(kw)
+#if CYTHON_VECTORCALL
+    #define __Pyx_ArgRef_FASTCALL(args, i) __Pyx_NewRef(args[i])
+    #define __Pyx_NumKwargs_FASTCALL(kwds) __Pyx_PyTuple_GET_SIZE(kwds)
+    #define __Pyx_KwValues_FASTCALL(args, nargs) ((args) + (nargs))
+    static CYTHON_INLINE PyObject * __Pyx_GetKwValue_FASTCALL(PyObject *kwnames, PyObject *const *kwvalues, PyObject *s);
+  #if CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX >= 0x030d0000 || CYTHON_COMPILING_IN_LIMITED_API || CYTHON_COMPILING_IN_PYPY || CYTHON_COMPILING_IN_GRAAL
+    CYTHON_UNUSED static PyObject *__Pyx_KwargsAsDict_FASTCALL(PyObject *kwnames, PyObject *const *kwvalues);
+  #else
+    #define __Pyx_KwargsAsDict_FASTCALL(kw, kwvalues) _PyStack_AsDict(kwvalues, kw)
+  #endif
+#else
+    #define __Pyx_ArgRef_FASTCALL __Pyx_ArgRef_VARARGS
+    #define __Pyx_NumKwargs_FASTCALL __Pyx_NumKwargs_VARARGS
+    #define __Pyx_KwValues_FASTCALL __Pyx_KwValues_VARARGS
+    #define __Pyx_GetKwValue_FASTCALL __Pyx_GetKwValue_VARARGS
+    #define __Pyx_KwargsAsDict_FASTCALL __Pyx_KwargsAsDict_VARARGS
+#endif
+#if CYTHON_VECTORCALL_TPNEW
+    #if !CYTHON_VECTORCALL
+        #error Enabling CYTHON_VECTORCALL_TPNEW without CYTHON_VECTORCALL is not supported
+    #endif
+    #define __Pyx_ArgRef_FASTCALL_TPNEW __Pyx_ArgRef_FASTCALL
+    #define __Pyx_NumKwargs_FASTCALL_TPNEW __Pyx_NumKwargs_FASTCALL
+    #define __Pyx_KwValues_FASTCALL_TPNEW __Pyx_KwValues_FASTCALL
+    #define __Pyx_GetKwValue_FASTCALL_TPNEW __Pyx_GetKwValue_FASTCALL
+    #define __Pyx_KwargsAsDict_FASTCALL_TPNEW __Pyx_KwargsAsDict_FASTCALL
+#else
+    #define __Pyx_ArgRef_FASTCALL_TPNEW __Pyx_ArgRef_VARARGS
+    #define __Pyx_NumKwargs_FASTCALL_TPNEW __Pyx_NumKwargs_VARARGS
+    #define __Pyx_KwValues_FASTCALL_TPNEW __Pyx_KwValues_VARARGS
+    #define __Pyx_GetKwValue_FASTCALL_TPNEW __Pyx_GetKwValue_VARARGS
+    #define __Pyx_KwargsAsDict_FASTCALL_TPNEW __Pyx_KwargsAsDict_VARARGS
+#endif
+#define __Pyx_ArgsSlice_VARARGS(args, start, stop) PyTuple_GetSlice(args, start, stop)
+#if CYTHON_VECTORCALL
+#define __Pyx_ArgsSlice_FASTCALL(args, start, stop) __Pyx_PyTuple_FromArray(args + start, stop - start)
+#else
+#define __Pyx_ArgsSlice_FASTCALL __Pyx_ArgsSlice_VARARGS
+#endif
+
+/* py_dict_items.proto (used by OwnedDictNext) */
+#define __Pyx_PyDict_items_TypePtr  (&PyDictKeys_Type)
+#define __Pyx_PyDict_items_Check(obj)  PyObject_TypeCheck((obj), __Pyx_PyDictItems_TypePtr)
+#define __Pyx_PyDict_items_CheckExact(obj)  Py_IS_TYPE((obj), __Pyx_PyDictItems_TypePtr)
+static CYTHON_INLINE PyObject* __Pyx_PyDict_Items(PyObject* d);
+
+/* CallCFunction.proto (used by CallUnboundCMethod0) */
+#define __Pyx_CallCFunction(cfunc, self, args)\
+    ((PyCFunction)(void(*)(void))(cfunc)->func)(self, args)
+#define __Pyx_CallCFunctionWithKeywords(cfunc, self, args, kwargs)\
+    ((PyCFunctionWithKeywords)(void(*)(void))(cfunc)->func)(self, args, kwargs)
+#define __Pyx_CallCFunctionFast(cfunc, self, args, nargs)\
+    ((__Pyx_PyCFunctionFast)(void(*)(void))(PyCFunction)(cfunc)->func)(self, args, nargs)
+#define __Pyx_CallCFunctionFastWithKeywords(cfunc, self, args, nargs, kwnames)\
+    ((__Pyx_PyCFunctionFastWithKeywords)(void(*)(void))(PyCFunction)(cfunc)->func)(self, args, nargs, kwnames)
+
+/* PyObjectCall.proto (used by PyObjectFastCall) */
+#if CYTHON_COMPILING_IN_CPYTHON
+static CYTHON_INLINE PyObject* __Pyx_PyObject_Call(PyObject *func, PyObject *arg, PyObject *kw);
+#else
+#define __Pyx_PyObject_Call(func, arg, kw) PyObject_Call(func, arg, kw)
+#endif
+
+/* PyObjectCallMethO.proto (used by PyObjectFastCall) */
+#if CYTHON_COMPILING_IN_CPYTHON
+static CYTHON_INLINE PyObject* __Pyx_PyObject_CallMethO(PyObject *func, PyObject *arg);
+#endif
+
+/* PyObjectFastCall.proto (used by PyObjectCallOneArg) */
+#define __Pyx_PyObject_FastCall(func, args, nargs)  __Pyx_PyObject_FastCallDict(func, args, (size_t)(nargs), NULL)
+static CYTHON_INLINE PyObject* __Pyx_PyObject_FastCallDict(PyObject *func, PyObject * const*args, size_t nargsf, PyObject *kwargs);
+
+/* PyObjectCallOneArg.proto (used by CallUnboundCMethod0) */
+static CYTHON_INLINE PyObject* __Pyx_PyObject_CallOneArg(PyObject *func, PyObject *arg);
+
+/* UnpackUnboundCMethod_decl.proto (used by UnpackUnboundCMethod) */
+typedef struct {
+    PyObject *type;
+    PyObject **method_name;
+    PyCFunction func;
+    PyObject *method;
+    int flag;
+#if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING && CYTHON_ATOMICS
+    __pyx_atomic_int_type initialized;
+#endif
+} __Pyx_CachedCFunction;
+
+/* IgnoreException.proto (used by UnpackUnboundCMethod_impl) */
+static CYTHON_INLINE int __Pyx_IgnoreGivenException(PyObject *given_exception, PyObject *ignorable_exception);
+#define __Pyx_IgnoreException(ignorable_exception) __Pyx_IgnoreGivenException(NULL, ignorable_exception)
+
+/* UnpackUnboundCMethod_impl.export */
+static int __Pyx_TryUnpackUnboundCMethod(__Pyx_CachedCFunction* target);
+
+/* UnpackUnboundCMethod.proto (used by CallUnboundCMethod0) */
+#if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+static CYTHON_INLINE int __Pyx_CachedCFunction_GetAndSetInitializing(__Pyx_CachedCFunction *cfunc) {
+#if !CYTHON_ATOMICS
+    return 1;
+#else
+    __pyx_nonatomic_int_type expected = 0;
+    if (__pyx_atomic_int_cmp_exchange(&cfunc->initialized, &expected, 1)) {
+        return 0;
+    }
+    return expected;
+#endif
+}
+static CYTHON_INLINE void __Pyx_CachedCFunction_SetFinishedInitializing(__Pyx_CachedCFunction *cfunc) {
+#if CYTHON_ATOMICS
+    __pyx_atomic_store(&cfunc->initialized, 2);
+#endif
+}
+#else
+#define __Pyx_CachedCFunction_GetAndSetInitializing(cfunc) 2
+#define __Pyx_CachedCFunction_SetFinishedInitializing(cfunc)
+#endif
+
+/* CallUnboundCMethod0.proto */
+CYTHON_UNUSED
+static PyObject* __Pyx__CallUnboundCMethod0(__Pyx_CachedCFunction* cfunc, PyObject* self);
+#if CYTHON_COMPILING_IN_CPYTHON
+static CYTHON_INLINE PyObject* __Pyx_CallUnboundCMethod0(__Pyx_CachedCFunction* cfunc, PyObject* self);
+#else
+#define __Pyx_CallUnboundCMethod0(cfunc, self)  __Pyx__CallUnboundCMethod0(cfunc, self)
+#endif
+
+/* py_dict_values.proto (used by OwnedDictNext) */
+#define __Pyx_PyDict_values_TypePtr  (&PyDictKeys_Type)
+#define __Pyx_PyDict_values_Check(obj)  PyObject_TypeCheck((obj), __Pyx_PyDictValues_TypePtr)
+#define __Pyx_PyDict_values_CheckExact(obj)  Py_IS_TYPE((obj), __Pyx_PyDictValues_TypePtr)
+static CYTHON_INLINE PyObject* __Pyx_PyDict_Values(PyObject* d);
+
+/* OwnedDictNext.proto (used by ParseKeywordsImpl) */
+#if CYTHON_AVOID_BORROWED_REFS
+static int __Pyx_PyDict_NextRef(PyObject *p, PyObject **ppos, PyObject **pkey, PyObject **pvalue);
+#else
+CYTHON_INLINE
+static int __Pyx_PyDict_NextRef(PyObject *p, Py_ssize_t *ppos, PyObject **pkey, PyObject **pvalue);
+#endif
+
+/* RaiseDoubleKeywords.proto (used by ParseKeywordsImpl) */
+static void __Pyx_RaiseDoubleKeywordsError(const char* func_name, PyObject* kw_name);
+
+/* ParseKeywordsImpl.export */
+static int __Pyx_ParseKeywordsTuple(
+    PyObject *kwds,
+    PyObject * const *kwvalues,
+    PyObject ** const argnames[],
+    PyObject *kwds2,
+    PyObject *values[],
+    Py_ssize_t num_pos_args,
+    Py_ssize_t num_kwargs,
+    const char* function_name,
+    int ignore_unknown_kwargs
+);
+static int __Pyx_ParseKeywordDictToDict(
+    PyObject *kwds,
+    PyObject ** const argnames[],
+    PyObject *kwds2,
+    PyObject *values[],
+    Py_ssize_t num_pos_args,
+    const char* function_name
+);
+static int __Pyx_ParseKeywordDict(
+    PyObject *kwds,
+    PyObject ** const argnames[],
+    PyObject *values[],
+    Py_ssize_t num_pos_args,
+    Py_ssize_t num_kwargs,
+    const char* function_name,
+    int ignore_unknown_kwargs
+);
+
+/* CallUnboundCMethod2.proto */
+CYTHON_UNUSED
+static PyObject* __Pyx__CallUnboundCMethod2(__Pyx_CachedCFunction* cfunc, PyObject* self, PyObject* arg1, PyObject* arg2);
+#if CYTHON_COMPILING_IN_CPYTHON
+static CYTHON_INLINE PyObject *__Pyx_CallUnboundCMethod2(__Pyx_CachedCFunction *cfunc, PyObject *self, PyObject *arg1, PyObject *arg2);
+#else
+#define __Pyx_CallUnboundCMethod2(cfunc, self, arg1, arg2)  __Pyx__CallUnboundCMethod2(cfunc, self, arg1, arg2)
+#endif
+
+/* ParseKeywords.proto */
+static CYTHON_INLINE int __Pyx_ParseKeywords(
+    PyObject *kwds, PyObject *const *kwvalues, PyObject ** const argnames[],
+    PyObject *kwds2, PyObject *values[],
+    Py_ssize_t num_pos_args, Py_ssize_t num_kwargs,
+    const char* function_name,
+    int ignore_unknown_kwargs
+);
+
+/* RaiseArgTupleInvalid.export */
+static void __Pyx_RaiseArgtupleInvalid(const char* func_name, int exact,
+    Py_ssize_t num_min, Py_ssize_t num_max, Py_ssize_t num_found);
+
+/* ArgTypeTestError.export */
+static void __Pyx_ArgTypeError(PyObject *obj, PyTypeObject *type, const char *name, int exact);
+
+/* ArgTypeTest.proto */
+static CYTHON_INLINE int __Pyx_ArgTypeTest(PyObject *obj, PyTypeObject *type, int none_allowed, const char *name, int exact);
+
+/* FormatTypeName.proto (used by RaiseErrorWithObjectType1) */
+#if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX >= 0x030d0000
+typedef PyObject *__Pyx_TypeName;
+#define __Pyx_FMT_TYPENAME "%N"
+#define __Pyx_PyType_GetFullyQualifiedName(tp) Py_NewRef((PyObject*)tp)
+#define __Pyx_DECREF_TypeName(obj) Py_DECREF(obj)
+#elif CYTHON_COMPILING_IN_LIMITED_API
+typedef PyObject *__Pyx_TypeName;
+#define __Pyx_FMT_TYPENAME "%U"
+#define __Pyx_DECREF_TypeName(obj) Py_XDECREF(obj)
+static __Pyx_TypeName __Pyx_PyType_GetFullyQualifiedName(PyTypeObject* tp);
+#else  // !LIMITED_API
+typedef const char *__Pyx_TypeName;
+#define __Pyx_FMT_TYPENAME "%.200s"
+#define __Pyx_PyType_GetFullyQualifiedName(tp) ((tp)->tp_name)
+#define __Pyx_DECREF_TypeName(obj)
+#endif
+
+/* RaiseErrorWithObjectType1.proto (used by RaiseUnexpectedTypeError) */
+#define __Pyx_RaiseTypeErrorWithObjectType1(message, arg, obj) __Pyx_RaiseErrorWithObjectType1(PyExc_TypeError, message, arg, obj)
+#define __Pyx_RaiseErrorWithObjectType1(exc_type, message, arg, obj) __Pyx_RaiseErrorWithType1(exc_type, message, arg, Py_TYPE(obj))
+CYTHON_UNUSED
+static void __Pyx_RaiseErrorWithType1(PyObject* exc_type, const char* message, const char *arg, PyTypeObject *type_obj);
+
+/* RaiseUnexpectedTypeError.proto */
+CYTHON_UNUSED
+static int __Pyx_RaiseUnexpectedTypeError(const char *expected, PyObject *obj);
+
+/* RejectKeywords.export */
+static void __Pyx_RejectKeywords(const char* function_name, PyObject *kwds);
+
+/* GetAttr3.proto */
+static CYTHON_INLINE PyObject *__Pyx_GetAttr3(PyObject *, PyObject *, PyObject *);
+
+/* PyDictVersioning.proto (used by GetModuleGlobalName) */
+#if CYTHON_USE_DICT_VERSIONS && CYTHON_USE_TYPE_SLOTS
+#define __PYX_DICT_VERSION_INIT  ((PY_UINT64_T) -1)
+#define __PYX_GET_DICT_VERSION(dict)  (((PyDictObject*)(dict))->ma_version_tag)
+#define __PYX_UPDATE_DICT_CACHE(dict, value, cache_var, version_var)\
+    (version_var) = __PYX_GET_DICT_VERSION(dict);\
+    (cache_var) = (value);
+#define __PYX_PY_DICT_LOOKUP_IF_MODIFIED(VAR, DICT, LOOKUP) {\
+    static PY_UINT64_T __pyx_dict_version = 0;\
+    static PyObject *__pyx_dict_cached_value = NULL;\
+    if (likely(__PYX_GET_DICT_VERSION(DICT) == __pyx_dict_version)) {\
+        (VAR) = __Pyx_XNewRef(__pyx_dict_cached_value);\
+    } else {\
+        (VAR) = __pyx_dict_cached_value = (LOOKUP);\
+        __pyx_dict_version = __PYX_GET_DICT_VERSION(DICT);\
+    }\
+}
+static CYTHON_INLINE PY_UINT64_T __Pyx_get_tp_dict_version(PyObject *obj);
+static CYTHON_INLINE PY_UINT64_T __Pyx_get_object_dict_version(PyObject *obj);
+static CYTHON_INLINE int __Pyx_object_dict_version_matches(PyObject* obj, PY_UINT64_T tp_dict_version, PY_UINT64_T obj_dict_version);
+#else
+#define __PYX_GET_DICT_VERSION(dict)  (0)
+#define __PYX_UPDATE_DICT_CACHE(dict, value, cache_var, version_var)
+#define __PYX_PY_DICT_LOOKUP_IF_MODIFIED(VAR, DICT, LOOKUP)  (VAR) = (LOOKUP);
+#endif
+
+/* GetModuleGlobalName.proto */
+#if CYTHON_USE_DICT_VERSIONS
+#define __Pyx_GetModuleGlobalName(var, name)  do {\
+    static PY_UINT64_T __pyx_dict_version = 0;\
+    static PyObject *__pyx_dict_cached_value = NULL;\
+    (var) = (likely(__pyx_dict_version == __PYX_GET_DICT_VERSION(__pyx_mstate_global->__pyx_d))) ?\
+        (likely(__pyx_dict_cached_value) ? __Pyx_NewRef(__pyx_dict_cached_value) : __Pyx_GetBuiltinName(name)) :\
+        __Pyx__GetModuleGlobalName(name, &__pyx_dict_version, &__pyx_dict_cached_value);\
+} while(0)
+#define __Pyx_GetModuleGlobalNameUncached(var, name)  do {\
+    PY_UINT64_T __pyx_dict_version;\
+    PyObject *__pyx_dict_cached_value;\
+    (var) = __Pyx__GetModuleGlobalName(name, &__pyx_dict_version, &__pyx_dict_cached_value);\
+} while(0)
+static PyObject *__Pyx__GetModuleGlobalName(PyObject *name, PY_UINT64_T *dict_version, PyObject **dict_cached_value);
+#else
+#define __Pyx_GetModuleGlobalName(var, name)  (var) = __Pyx__GetModuleGlobalName(name)
+#define __Pyx_GetModuleGlobalNameUncached(var, name)  (var) = __Pyx__GetModuleGlobalName(name)
+static CYTHON_INLINE PyObject *__Pyx__GetModuleGlobalName(PyObject *name);
+#endif
+
+/* PyObjectFastCallMethod.proto */
+#if CYTHON_VECTORCALL
+#define __Pyx_PyObject_FastCallMethod(name, args, nargsf) PyObject_VectorcallMethod(name, args, nargsf, NULL)
+#else
+static PyObject *__Pyx_PyObject_FastCallMethod(PyObject *name, PyObject *const *args, size_t nargsf);
+#endif
+
+/* PyFrozenDict.proto (used by GetItemInt) */
+#if CYTHON_COMPILING_IN_LIMITED_API
+#define __Pyx_PyFrozenDict_TypePtr  ((PyTypeObject*) __pyx_mstate_global->__Pyx_PyFrozenDictType)
+#define __Pyx_PyFrozenDict_New(it)  __Pyx__PyFrozenDict_New(__pyx_mstate_global->__Pyx_PyFrozenDictType, it)
+static CYTHON_INLINE PyObject* __Pyx__PyFrozenDict_New(PyObject* frozendict_type, PyObject* it);
+#define __Pyx_PyFrozenDict_NewEmpty()  __Pyx_PyFrozenDict_New(NULL)
+#define __Pyx_PyFrozenDict_Check(obj)  PyObject_TypeCheck((obj), __Pyx_PyFrozenDict_TypePtr)
+#define __Pyx_PyFrozenDict_CheckExact(obj)  Py_IS_TYPE((obj), __Pyx_PyFrozenDict_TypePtr)
+#define __Pyx_PyAnyDict_Check(obj)   __Pyx__PyAnyDict_Check(obj, __Pyx_PyFrozenDict_TypePtr)
+static CYTHON_INLINE int __Pyx__PyAnyDict_Check(PyObject *obj, PyTypeObject* frozendict_type) {
+    return PyObject_TypeCheck(obj, &PyDict_Type) || PyObject_TypeCheck(obj, frozendict_type);
+}
+#define __Pyx_PyAnyDict_CheckExact(obj)  __Pyx__PyAnyDict_CheckExact(obj, __Pyx_PyFrozenDict_TypePtr)
+static CYTHON_INLINE int __Pyx__PyAnyDict_CheckExact(PyObject *obj, PyTypeObject* frozendict_type) {
+    return Py_IS_TYPE(obj, &PyDict_Type) || Py_IS_TYPE(obj, frozendict_type);
+}
+#elif PY_VERSION_HEX >= 0x030f00a6 ||\
+    (defined(PyFrozenDict_Check) && defined(PyAnyDict_Check) && defined(PyFrozenDict_New))
+#define __Pyx_PyFrozenDict_TypePtr  (&PyFrozenDict_Type)
+#define __Pyx_PyFrozenDict_New(it)  PyFrozenDict_New(it)
+#define __Pyx_PyFrozenDict_NewEmpty()  PyFrozenDict_New(NULL)
+#define __Pyx_PyFrozenDict_Check(obj)  PyFrozenDict_Check(obj)
+#define __Pyx_PyFrozenDict_CheckExact(obj)  PyFrozenDict_CheckExact(obj)
+#define __Pyx_PyAnyDict_Check(obj)  PyAnyDict_Check(obj)
+#define __Pyx_PyAnyDict_CheckExact(obj)  PyAnyDict_CheckExact(obj)
+#else
+#define __Pyx_PyFrozenDict_TypePtr  (&PyDict_Type)
+static CYTHON_INLINE PyObject* __Pyx_PyFrozenDict_New(PyObject* it) {
+    if (!it) {
+        return PyDict_New();
+    } else if (PyDict_Check(it)) {
+        return PyDict_Copy(it);
+    } else {
+        PyObject *dict = PyDict_New();
+        if (!dict) return NULL;
+        PyObject *result = PyNumber_InPlaceOr(dict, it);
+        Py_DECREF(dict);
+        return result;
+    }
+}
+#define __Pyx_PyFrozenDict_NewEmpty()  PyDict_New()
+#define __Pyx_PyFrozenDict_Check(obj)  PyDict_Check(obj)
+#define __Pyx_PyFrozenDict_CheckExact(obj)  PyDict_CheckExact(obj)
+#define __Pyx_PyAnyDict_Check(obj)  PyDict_Check(obj)
+#define __Pyx_PyAnyDict_CheckExact(obj)  PyDict_CheckExact(obj)
+#endif
+
+/* GetItemInt.proto */
+#define __Pyx_GetItemInt(o, i, type, is_signed, to_py_func, wraparound, boundscheck, has_gil, unsafe_shared)\
+    (__Pyx_fits_Py_ssize_t(i, type, is_signed) ?\
+    __Pyx_GetItemInt_Fast(o, (Py_ssize_t)i, wraparound, boundscheck, unsafe_shared) :\
+    __Pyx_GetItemInt_Generic(o, to_py_func(i)))
+#define __Pyx_GetItemInt_List(o, i, type, is_signed, to_py_func, wraparound, boundscheck, has_gil, unsafe_shared)\
+    (__Pyx_fits_Py_ssize_t(i, type, is_signed) ?\
+    __Pyx_GetItemInt_List_Fast(o, (Py_ssize_t)i, wraparound, boundscheck, unsafe_shared) :\
+    (PyErr_SetString(PyExc_IndexError, "list index out of range"), (PyObject*)NULL))
+static CYTHON_INLINE PyObject *__Pyx_GetItemInt_List_Fast(PyObject *o, Py_ssize_t i,
+                                                              int wraparound, int boundscheck, int unsafe_shared);
+#define __Pyx_GetItemInt_Tuple(o, i, type, is_signed, to_py_func, wraparound, boundscheck, has_gil, unsafe_shared)\
+    (__Pyx_fits_Py_ssize_t(i, type, is_signed) ?\
+    __Pyx_GetItemInt_Tuple_Fast(o, (Py_ssize_t)i, wraparound, boundscheck, unsafe_shared) :\
+    (PyErr_SetString(PyExc_IndexError, "tuple index out of range"), (PyObject*)NULL))
+static CYTHON_INLINE PyObject *__Pyx_GetItemInt_Tuple_Fast(PyObject *o, Py_ssize_t i,
+                                                              int wraparound, int boundscheck, int unsafe_shared);
+static PyObject *__Pyx_GetItemInt_Generic(PyObject *o, PyObject* j);
+static CYTHON_INLINE PyObject *__Pyx_GetItemInt_Fast(PyObject *o, Py_ssize_t i,
+                                                     int wraparound, int boundscheck, int unsafe_shared);
+
+/* AllocateExtensionType.proto */
+static PyObject *__Pyx_AllocateExtensionType(PyTypeObject *t, int is_final);
+
+/* CallSlotAsVectorcall.proto */
+#if CYTHON_VECTORCALL_TPNEW
+typedef PyObject * (*__Pyx_tpnewvectorcallfunc)(PyTypeObject* o, PyObject *const *args, Py_ssize_t nargs, PyObject *kwnames);
+static PyObject * __Pyx_CallTpnewAsVectorcall(__Pyx_tpnewvectorcallfunc f, PyTypeObject* o, PyObject *a, PyObject *k);
+#endif
+
+/* RaiseErrorWithObjectType.proto (used by CallNewInitFromVectorcall) */
+#define __Pyx_RaiseTypeErrorWithObjectType(message, obj)  __Pyx_RaiseErrorWithObjectType(PyExc_TypeError, message, obj)
+#define __Pyx_RaiseErrorWithObjectType(exc_type, message, obj)  __Pyx_RaiseErrorWithType(exc_type, message, Py_TYPE(obj))
+CYTHON_UNUSED
+static void __Pyx_RaiseErrorWithType(PyObject* exc_type, const char* message, PyTypeObject *type_obj);
+
+/* CallNewInitFromVectorcall.proto */
+#if CYTHON_VECTORCALL_TPNEW
+static PyObject *__Pyx_CallNewInitFromVectorcall(PyTypeObject *t, PyObject *const *args, size_t nargsf, PyObject *kwnames);
+#endif
+
+/* CallSlotAsVectorcall.proto */
+#if CYTHON_VECTORCALL_TPNEW
+typedef int (*__Pyx_tpinitvectorcallfunc)(PyObject* o, PyObject *const *args, Py_ssize_t nargs, PyObject *kwnames);
+static int __Pyx_CallTpinitAsVectorcall(__Pyx_tpinitvectorcallfunc f, PyObject* o, PyObject *a, PyObject *k);
+#endif
+
+/* VoidPtrExport.proto */
+static int __Pyx_ExportVoidPtr(PyObject *api_dict, const char *name, void *p, const char *sig);
+
+/* GetApiDict.proto */
+static PyObject *__Pyx_ApiExport_GetApiDict(void);
+
+/* PyObjectCallMethod0.proto (used by PyType_Ready) */
+static CYTHON_INLINE PyObject* __Pyx_PyObject_CallMethod0(PyObject* obj, PyObject* method_name);
+
+/* GetTypeDictOffset.proto (used by ValidateBasesTuple) */
+#if !CYTHON_USE_TYPE_SLOTS
+CYTHON_UNUSED static Py_ssize_t __Pyx_GetTypeDictOffset(PyObject *tp, int require_cython_valid_result);
+#endif
+
+/* ValidateBasesTuple.proto (used by PyType_Ready) */
+#if CYTHON_COMPILING_IN_CPYTHON || CYTHON_COMPILING_IN_LIMITED_API || CYTHON_USE_TYPE_SPECS
+static int __Pyx_validate_bases_tuple(const char *type_name, int has_dictoffset, PyObject *bases);
+#endif
+
+/* PyType_Ready.export */
+CYTHON_UNUSED static int __Pyx_PyType_Ready(PyTypeObject *t);
+
+/* LimitedApiGetTypeTypeDict.proto (used by DelItemOnTypeDict) */
+#if CYTHON_COMPILING_IN_LIMITED_API
+static PyObject *__Pyx_GetTypeTypeDict(PyTypeObject *tp);
+#endif
+
+/* DelItemOnTypeDict.proto (used by SetupReduce) */
+#define __Pyx_DelItemOnTypeDict(tp, k) __Pyx__DelItemOnTypeDict((PyTypeObject*)tp, k)
+
+/* DelItemOnTypeDict.export */
+static int __Pyx__DelItemOnTypeDict(PyTypeObject *tp, PyObject *k);
+
+/* SetItemOnTypeDict.proto (used by SetupReduce) */
+#define __Pyx_SetItemOnTypeDict(tp, k, v) __Pyx__SetItemOnTypeDict((PyTypeObject*)tp, k, v)
+
+/* SetItemOnTypeDict.export */
+static int __Pyx__SetItemOnTypeDict(PyTypeObject *tp, PyObject *k, PyObject *v);
+
+/* SetupReduce.export */
+static int __Pyx_setup_reduce(PyObject* type_obj);
+
+/* dict_setdefault.proto (used by FetchCommonType) */
+static CYTHON_INLINE PyObject *__Pyx_PyDict_SetDefault(PyObject *d, PyObject *key, PyObject *default_value);
+
+/* AddModuleRef.proto (used by FetchSharedCythonModule) */
+#if ((CYTHON_COMPILING_IN_CPYTHON_FREETHREADING && PY_VERSION_HEX < 0x030F00a3) ||\
+     __PYX_LIMITED_VERSION_HEX < 0x030d0000)
+  static PyObject *__Pyx_PyImport_AddModuleRef(const char *name);
+#else
+  #define __Pyx_PyImport_AddModuleRef(name) PyImport_AddModuleRef(name)
+#endif
+
+/* FetchSharedCythonModule.proto (used by FetchCommonType) */
+static PyObject *__Pyx_FetchSharedCythonABIModule(void);
+
+/* VerifyCachedType.proto (used by FetchCommonType) */
+static int __Pyx_VerifyCachedType(PyObject *cached_type,
+                               const char *name,
+                               Py_ssize_t expected_basicsize);
+
+/* FetchCommonType.proto (used by CommonTypesMetaclass) */
+static PyTypeObject* __Pyx_FetchCommonTypeFromSpec(PyTypeObject *metaclass, PyObject *module, PyType_Spec *spec, PyObject *bases);
+
+/* CommonTypesMetaclass.proto (used by CythonFunctionShared) */
+static int __pyx_CommonTypesMetaclass_init(PyObject *module);
+#define __Pyx_CommonTypesMetaclass_USED
+
+/* CythonFunctionPerModule.proto (used by CythonFunctionShared) */
+#define __Pyx_CyFunction_USED
+#if CYTHON_OPAQUE_SHARED_TYPES
+#define __Pyx_as_CyFunctionObject(o) ((__pyx_CyFunctionObject *)PyObject_GetTypeData((o), __pyx_mstate_global->__pyx_CyFunctionType))
+#else
+#define __Pyx_as_CyFunctionObject(o) ((__pyx_CyFunctionObject *)o)
+#endif
+#define __Pyx_CYFUNCTION_STATICMETHOD  0x01
+#define __Pyx_CYFUNCTION_CLASSMETHOD   0x02
+#define __Pyx_CYFUNCTION_CCLASS        0x04
+#define __Pyx_CYFUNCTION_COROUTINE     0x08
+#define __Pyx_CyFunction_GetClosure(f)\
+    ((__Pyx_as_CyFunctionObject(f))->func_closure)
+#if CYTHON_COMPILING_IN_LIMITED_API
+  #define __Pyx__CyFunction_GetClassObj(f)\
+      ((f)->func_classobj)
+#else
+  #define __Pyx__CyFunction_GetClassObj(f)\
+      ((PyObject*) ((PyCMethodObject *) (f))->mm_class)
+#endif
+#define __Pyx_CyFunction_GetClassObj(f)\
+    __Pyx__CyFunction_GetClassObj(__Pyx_as_CyFunctionObject(f))
+#define __Pyx_CyFunction_SetClassObj(f, classobj)\
+    __Pyx__CyFunction_SetClassObj(__Pyx_as_CyFunctionObject(f), (classobj))
+#define __Pyx_CyFunction_Defaults(type, f)\
+    ((type *)((__Pyx_as_CyFunctionObject(f))->defaults))
+#define __Pyx_CyFunction_SetDefaultsGetter(f, g)\
+    (__Pyx_as_CyFunctionObject(f))->defaults_getter = (g)
+typedef struct {
+#if CYTHON_COMPILING_IN_LIMITED_API
+#if !CYTHON_OPAQUE_OBJECTS
+    PyObject_HEAD
+#endif
+    PyMethodDef *func_methoddef;
+    PyObject *func_module;
+#else
+    PyCMethodObject func;
+#endif
+#if (CYTHON_COMPILING_IN_LIMITED_API || CYTHON_COMPILING_IN_PYPY) && CYTHON_VECTORCALL
+    __pyx_vectorcallfunc func_vectorcall;
+#endif
+#if CYTHON_COMPILING_IN_LIMITED_API
+    PyObject *func_weakreflist;
+#endif
+#if PY_VERSION_HEX < 0x030C0000 || CYTHON_COMPILING_IN_LIMITED_API
+    PyObject *func_dict;
+#endif
+    PyObject *func_name;
+    PyObject *func_qualname;
+    PyObject *func_doc;
+    PyObject *func_globals;
+    PyObject *func_code;
+    PyObject *func_closure;
+#if CYTHON_COMPILING_IN_LIMITED_API
+    PyObject *func_classobj;
+#endif
+    PyObject *defaults;
+    int flags;
+    PyObject *defaults_tuple;
+    PyObject *defaults_kwdict;
+    PyObject *(*defaults_getter)(PyObject *);
+    PyObject *func_annotations;
+#if __PYX_LIMITED_VERSION_HEX < 0x030B0000
+    PyObject *func_is_coroutine;
+#endif
+} __pyx_CyFunctionObject;
+#undef __Pyx_CyOrPyCFunction_Check
+#define __Pyx_CyFunction_Check(obj)  __Pyx_TypeCheck(obj, __pyx_mstate_global->__pyx_CyFunctionType)
+#define __Pyx_CyOrPyCFunction_Check(obj)  __Pyx_TypeCheck2(obj, __pyx_mstate_global->__pyx_CyFunctionType, &PyCFunction_Type)
+#define __Pyx_CyFunction_CheckExact(obj)  Py_IS_TYPE(obj, __pyx_mstate_global->__pyx_CyFunctionType)
+static CYTHON_INLINE int __Pyx__IsSameCyOrCFunction(PyObject *func, void (*cfunc)(void));
+#undef __Pyx_IsSameCFunction
+#define __Pyx_IsSameCFunction(func, cfunc)   __Pyx__IsSameCyOrCFunction(func, cfunc)
+static CYTHON_INLINE void __Pyx__CyFunction_SetClassObj(__pyx_CyFunctionObject* f, PyObject* classobj);
+static CYTHON_INLINE PyObject *__Pyx_CyFunction_InitDefaults(PyObject *func,
+                                                         PyTypeObject *defaults_type);
+static CYTHON_INLINE void __Pyx_CyFunction_SetDefaultsTuple(PyObject *m,
+                                                            PyObject *tuple);
+static CYTHON_INLINE void __Pyx_CyFunction_SetDefaultsKwDict(PyObject *m,
+                                                             PyObject *dict);
+static CYTHON_INLINE void __Pyx_CyFunction_SetAnnotationsDict(PyObject *m,
+                                                              PyObject *dict);
+static int __pyx_CyFunction_init(PyObject *module);
+#if CYTHON_VECTORCALL
+#if CYTHON_COMPILING_IN_LIMITED_API || CYTHON_COMPILING_IN_PYPY
+#define __Pyx_CyFunction_func_vectorcall(f) ((f)->func_vectorcall)
+#else
+#define __Pyx_CyFunction_func_vectorcall(f) (((PyCFunctionObject*)f)->vectorcall)
+#endif
+#endif
+
+/* CallTypeTraverse.proto (used by CythonFunctionShared) */
+#if !CYTHON_USE_TYPE_SPECS
+#define __Pyx_call_type_traverse(o, always_call, visit, arg) 0
+#else
+static int __Pyx_call_type_traverse(PyObject *o, int always_call, visitproc visit, void *arg);
+#endif
+
+/* PyMethodNew.proto (used by CythonFunctionShared) */
+static PyObject *__Pyx_PyMethod_New(PyObject *func, PyObject *self, PyObject *typ);
+
+/* PyVectorcallFastCallDict.proto (used by CythonFunctionShared) */
+#if CYTHON_VECTORCALL
+static CYTHON_INLINE PyObject *__Pyx_PyVectorcall_FastCallDict(PyObject *func, __pyx_vectorcallfunc vc, PyObject *const *args, size_t nargs, PyObject *kw);
+#endif
+
+/* CythonFunctionShared.proto (used by CythonFunction) */
+static PyObject *__Pyx_CyFunction_Init(PyObject *op_in, PyMethodDef *ml,
+                                      int flags, PyObject* qualname,
+                                      PyObject *closure,
+                                      PyObject *module, PyObject *globals,
+                                      PyObject* code);
+#if CYTHON_VECTORCALL
+static PyObject * __Pyx_CyFunction_Vectorcall_NOARGS(PyObject *func, PyObject *const *args, size_t nargsf, PyObject *kwnames);
+static PyObject * __Pyx_CyFunction_Vectorcall_O(PyObject *func, PyObject *const *args, size_t nargsf, PyObject *kwnames);
+static PyObject * __Pyx_CyFunction_Vectorcall_FASTCALL_KEYWORDS(PyObject *func, PyObject *const *args, size_t nargsf, PyObject *kwnames);
+static PyObject * __Pyx_CyFunction_Vectorcall_FASTCALL_KEYWORDS_METHOD(PyObject *func, PyObject *const *args, size_t nargsf, PyObject *kwnames);
+#endif
+
+/* CythonFunction.export */
+static PyObject *__Pyx_CyFunction_New(PyMethodDef *ml,
+                                      int flags, PyObject* qualname,
+                                      PyObject *closure,
+                                      PyObject *module, PyObject *globals,
+                                      PyObject* code);
+static PyTypeObject *__Pyx_Get_CyFunction_Type(void);
+
+/* TupleOrListFromArrayImpl.proto (used by ListFromArray) */
+CYTHON_UNUSED static PyObject *
+__Pyx_PyList_FromArray(PyObject *const *src, Py_ssize_t n);
+
+/* ListFromArray.proto */
+
+
+/* PyLongBinop.proto */
+#if !CYTHON_COMPILING_IN_PYPY
+static CYTHON_INLINE PyObject* __Pyx_PyLong_AddObjC(PyObject *op1, PyObject *op2, long intval, int inplace, int zerodivision_check);
+#else
+#define __Pyx_PyLong_AddObjC(op1, op2, intval, inplace, zerodivision_check)\
+    (inplace ? PyNumber_InPlaceAdd(op1, op2) : PyNumber_Add(op1, op2))
+#endif
+
+/* CLineInTraceback.proto (used by AddTraceback) */
+#if CYTHON_CLINE_IN_TRACEBACK && CYTHON_CLINE_IN_TRACEBACK_RUNTIME
+static int __Pyx_CLineForTraceback(PyThreadState *tstate, int c_line);
+#else
+#define __Pyx_CLineForTraceback(tstate, c_line)  (((CYTHON_CLINE_IN_TRACEBACK)) ? c_line : 0)
+#endif
+
+/* CodeObjectCache.proto (used by AddTraceback) */
+#if CYTHON_COMPILING_IN_LIMITED_API
+typedef PyObject __Pyx_CachedCodeObjectType;
+#else
+typedef PyCodeObject __Pyx_CachedCodeObjectType;
+#endif
+typedef struct {
+    __Pyx_CachedCodeObjectType* code_object;
+    int code_line;
+} __Pyx_CodeObjectCacheEntry;
+struct __Pyx_CodeObjectCache {
+    int count;
+    int max_count;
+    __Pyx_CodeObjectCacheEntry* entries;
+  #if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+    __pyx_atomic_int_type accessor_count;
+  #endif
+};
+static int __pyx_bisect_code_objects(__Pyx_CodeObjectCacheEntry* entries, int count, int code_line);
+static __Pyx_CachedCodeObjectType *__pyx_find_code_object(int code_line);
+static void __pyx_insert_code_object(int code_line, __Pyx_CachedCodeObjectType* code_object);
+
+/* AddTraceback.proto */
+static void __Pyx_AddTraceback(const char *funcname, int c_line,
+                               int py_line, const char *filename);
+
+/* GCCDiagnostics.proto */
+#if !defined(__INTEL_COMPILER) && defined(__GNUC__) && (__GNUC__ > 4 || (__GNUC__ == 4 && __GNUC_MINOR__ >= 6))
+#define __Pyx_HAS_GCC_DIAGNOSTIC
+#endif
+
+/* PyObjectCallMethod1.proto */
+static CYTHON_INLINE PyObject* __Pyx_PyObject_CallMethod1(PyObject* obj, PyObject* method_name, PyObject* arg);
+
+/* CheckUnpickleChecksumError.export */
+static void __Pyx_RaiseUnpickleChecksumError(long checksum, long checksum1, long checksum2, long checksum3, const char *members);
+
+/* PyObjectVectorcallKwds.proto (used by PyObjectVectorcallMethodKwds) */
+#if CYTHON_VECTORCALL
+#define __Pyx_Object_VectorcallKwds PyObject_Vectorcall
+CYTHON_UNUSED static int __Pyx_CheckVectorcallKwarg(PyObject *kwnames, Py_ssize_t i);
+#else
+#define __Pyx_Object_VectorcallKwds __Pyx_PyObject_FastCallDict
+CYTHON_UNUSED static PyObject *__Pyx_MakeKwargDict(PyObject **keys, PyObject **values, Py_ssize_t n);
+CYTHON_UNUSED static int __Pyx_CheckVectorcallKwarg(PyObject **kwnames, Py_ssize_t i);
+#endif
+
+/* PyObjectVectorcallMethodKwds.proto (used by CIntToPy) */
+#if CYTHON_VECTORCALL
+#define __Pyx_Object_VectorcallMethodKwds PyObject_VectorcallMethod
+#else
+static PyObject *__Pyx_Object_VectorcallMethodKwds(PyObject *name, PyObject *const *args, size_t nargsf, PyObject *kwnames);
+#endif
+
+/* CIntToPy.proto */
+static CYTHON_INLINE PyObject* __Pyx_PyLong_From_int(int value);
+
+/* CIntFromPy.proto */
+static CYTHON_INLINE int __Pyx_PyLong_As_int(PyObject *);
+
+/* CIntFromPy.proto */
+static CYTHON_INLINE uint8_t __Pyx_PyLong_As_uint8_t(PyObject *);
+
+/* CIntFromPy.proto */
+static CYTHON_INLINE long __Pyx_PyLong_As_long(PyObject *);
+
+/* CIntToPy.proto */
+static CYTHON_INLINE PyObject* __Pyx_PyLong_From_long(long value);
+
+/* UpdateUnpickledDict.export */
+static int __Pyx_UpdateUnpickledDict(PyObject *obj, PyObject *state, Py_ssize_t index);
+
+/* CheckUnpickleChecksum.proto */
+static CYTHON_INLINE int __Pyx_CheckUnpickleChecksum(long checksum, long checksum1, long checksum2, long checksum3, const char *members);
+
+/* GetRuntimeVersion.proto */
+#if __PYX_LIMITED_VERSION_HEX < 0x030b0000
+static unsigned long __Pyx_cached_runtime_version = 0;
+static void __Pyx_init_runtime_version(void);
+#else
+#define __Pyx_init_runtime_version()
+#endif
+static unsigned long __Pyx_get_runtime_version(void);
+
+/* CheckBinaryVersion.proto */
+static int __Pyx_check_binary_version(unsigned long ct_version, unsigned long rt_version, int allow_newer);
+
+/* DecompressString.proto */
+static PyObject *__Pyx_DecompressString(const char *s, Py_ssize_t length, int algo);
+
+/* MultiPhaseInitModuleState.proto */
+#if CYTHON_PEP489_MULTI_PHASE_INIT && CYTHON_USE_MODULE_STATE
+#include <stdlib.h>
+static PyObject *__Pyx_State_FindModule(void*);
+static int __Pyx_State_AddModule(PyObject* module, void*);
+static int __Pyx_State_RemoveModule(void*);
+#elif CYTHON_USE_MODULE_STATE
+#define __Pyx_State_FindModule PyState_FindModule
+#define __Pyx_State_AddModule PyState_AddModule
+#define __Pyx_State_RemoveModule PyState_RemoveModule
+#endif
+
+/* #### Code section: module_declarations ### */
+/* CythonABIVersion.proto */
+#if CYTHON_COMPILING_IN_LIMITED_API
+    #if CYTHON_VECTORCALL
+        #define __PYX_VECTORCALL_ABI_SUFFIX  "_vectorcall"
+    #else
+        #define __PYX_VECTORCALL_ABI_SUFFIX
+    #endif
+    #define __PYX_LIMITED_ABI_SUFFIX "limited" __PYX_VECTORCALL_ABI_SUFFIX __PYX_AM_SEND_ABI_SUFFIX
+#else
+    #define __PYX_LIMITED_ABI_SUFFIX
+#endif
+#if __PYX_HAS_PY_AM_SEND == 1
+    #define __PYX_AM_SEND_ABI_SUFFIX
+#elif __PYX_HAS_PY_AM_SEND == 2
+    #define __PYX_AM_SEND_ABI_SUFFIX "amsendbackport"
+#else
+    #define __PYX_AM_SEND_ABI_SUFFIX "noamsend"
+#endif
+#ifndef __PYX_MONITORING_ABI_SUFFIX
+    #define __PYX_MONITORING_ABI_SUFFIX
+#endif
+#if CYTHON_USE_TP_FINALIZE
+    #define __PYX_TP_FINALIZE_ABI_SUFFIX
+#else
+    #define __PYX_TP_FINALIZE_ABI_SUFFIX "nofinalize"
+#endif
+#if CYTHON_USE_FREELISTS || !defined(__Pyx_AsyncGen_USED)
+    #define __PYX_FREELISTS_ABI_SUFFIX
+#else
+    #define __PYX_FREELISTS_ABI_SUFFIX "nofreelists"
+#endif
+#if CYTHON_OPAQUE_OBJECTS && CYTHON_COMPILING_IN_LIMITED_API
+    #define __PYX_OPAQUE_OBJECTS_ABI_SUFFIX "opaque"
+#else
+    #define __PYX_OPAQUE_OBJECTS_ABI_SUFFIX
+#endif
+#define CYTHON_ABI  __PYX_ABI_VERSION __PYX_LIMITED_ABI_SUFFIX __PYX_MONITORING_ABI_SUFFIX __PYX_TP_FINALIZE_ABI_SUFFIX __PYX_FREELISTS_ABI_SUFFIX __PYX_AM_SEND_ABI_SUFFIX __PYX_OPAQUE_OBJECTS_ABI_SUFFIX
+#define __PYX_ABI_MODULE_NAME "_cython_" CYTHON_ABI
+#define __PYX_TYPE_MODULE_PREFIX __PYX_ABI_MODULE_NAME "."
+
+
+/* Module declarations from "libc.stdint" */
+
+/* Module declarations from "nes.cpu.cpu_op" */
+static uint8_t __pyx_v_3nes_3cpu_6cpu_op_OP_CYCLES[256];
+static uint8_t __pyx_v_3nes_3cpu_6cpu_op_OP_ADDRMODE[256];
+static uint8_t __pyx_v_3nes_3cpu_6cpu_op_OP_INSTRUCTION[256];
+static uint8_t __pyx_v_3nes_3cpu_6cpu_op_ADDRMODE_LENGTH[12];
+static PyObject *__pyx_v_3nes_3cpu_6cpu_op_LOOKUP = 0;
+static PyObject *__pyx_f_3nes_3cpu_6cpu_op___pyx_unpickle_Op__set_state(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *, PyObject *); /*proto*/
+/* #### Code section: typeinfo ### */
+/* #### Code section: before_global_var ### */
+#define __Pyx_MODULE_NAME "nes.cpu.cpu_op"
+extern int __pyx_module_is_main_nes__cpu__cpu_op;
+int __pyx_module_is_main_nes__cpu__cpu_op = 0;
+
+/* Implementation of "nes.cpu.cpu_op" */
+/* #### Code section: global_var ### */
+static PyObject *__pyx_builtin_enumerate;
+/* #### Code section: string_decls ### */
+static const char __pyx_k_addrmode_cycles_name_operate[] = "addrmode, cycles, name, operate";
+/* #### Code section: decls ### */
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op___init__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self, PyObject *__pyx_v_name, PyObject *__pyx_v_operate, PyObject *__pyx_v_addrmode, int __pyx_v_cycles); /* proto */
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op_2Op_4name___get__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self); /* proto */
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_4name_2__set__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self, PyObject *__pyx_v_value); /* proto */
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_4name_4__del__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self); /* proto */
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op_2Op_7operate___get__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self); /* proto */
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_7operate_2__set__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self, PyObject *__pyx_v_value); /* proto */
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_7operate_4__del__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self); /* proto */
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op_2Op_8addrmode___get__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self); /* proto */
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_8addrmode_2__set__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self, PyObject *__pyx_v_value); /* proto */
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_8addrmode_4__del__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self); /* proto */
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op_2Op_6cycles___get__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self); /* proto */
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_6cycles_2__set__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self, PyObject *__pyx_v_value); /* proto */
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op_2Op_2__reduce_cython__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self); /* proto */
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op_2Op_4__setstate_cython__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self, PyObject *__pyx_v___pyx_state); /* proto */
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op___pyx_unpickle_Op(CYTHON_UNUSED PyObject *__pyx_self, PyObject *__pyx_v___pyx_type, long __pyx_v___pyx_checksum, PyObject *__pyx_v___pyx_state); /* proto */
+static PyObject *__pyx_tp_new__initialisation_3nes_3cpu_6cpu_op_Op(PyObject *o, 
+#if CYTHON_VECTORCALL_TPNEW
+    PyObject *const *args, Py_ssize_t nargs, PyObject *kwnames
+#else
+    PyObject *a, PyObject *k
+#endif
+); /*proto*/
+static PyObject *__pyx_tp_new_vectorcall_3nes_3cpu_6cpu_op_Op(PyTypeObject *t, 
+#if CYTHON_VECTORCALL_TPNEW
+    PyObject *const *args, Py_ssize_t nargs, PyObject *kwnames
+#else
+    PyObject *a, PyObject *k
+#endif
+); /*proto*/
+#if CYTHON_VECTORCALL_TPNEW
+static PyObject *__pyx_tp_new_3nes_3cpu_6cpu_op_Op(PyTypeObject *t, PyObject *a, PyObject *k); /*proto*/
+#endif
+#if !CYTHON_VECTORCALL_TPNEW
+#define __pyx_tp_new_3nes_3cpu_6cpu_op_Op __pyx_tp_new_vectorcall_3nes_3cpu_6cpu_op_Op
+#endif
+#if CYTHON_VECTORCALL_TPNEW
+static PyObject *__pyx_tp_vectorcall_3nes_3cpu_6cpu_op_Op(PyObject *t, PyObject *const *args, size_t nargsf, PyObject *kwnames); /*proto*/
+#endif
+#if CYTHON_VECTORCALL_TPNEW
+static int __pyx_tp_init_3nes_3cpu_6cpu_op_Op(PyObject *o, PyObject *args, PyObject *kwds); /*proto*/
+#endif
+#if !CYTHON_VECTORCALL_TPNEW
+#define __pyx_tp_init_3nes_3cpu_6cpu_op_Op __pyx_pw_3nes_3cpu_6cpu_op_2Op_1__init__
+#endif
+/* #### Code section: late_includes ### */
+/* #### Code section: module_state ### */
+/* SmallCodeConfig */
+#ifndef CYTHON_SMALL_CODE
+#if defined(__clang__)
+    #define CYTHON_SMALL_CODE
+#elif defined(__GNUC__) && (__GNUC__ > 4 || (__GNUC__ == 4 && __GNUC_MINOR__ >= 3))
+    #define CYTHON_SMALL_CODE __attribute__((cold))
+#else
+    #define CYTHON_SMALL_CODE
+#endif
+#endif
+
+#ifdef __cplusplus
+namespace {
+  #endif
+  typedef struct {
+    PyObject *__pyx_d;
+    PyObject *__pyx_b;
+    PyObject *__pyx_cython_runtime;
+    PyObject *__pyx_empty_tuple;
+    PyObject *__pyx_empty_bytes;
+    PyObject *__pyx_empty_unicode;
+    PyObject *__pyx_type_3nes_3cpu_6cpu_op_Op;
+    PyTypeObject *__pyx_ptype_3nes_3cpu_6cpu_op_Op;
+    __Pyx_CachedCFunction __pyx_umethod_PyDict_Type_items;
+    __Pyx_CachedCFunction __pyx_umethod_PyDict_Type_pop;
+    __Pyx_CachedCFunction __pyx_umethod_PyDict_Type_values;
+    PyObject *__pyx_tuple[163];
+    PyObject *__pyx_codeobj_tab[3];
+    PyObject *__pyx_string_tab[133];
+    PyObject *__pyx_number_tab[10];
+/* #### Code section: module_state_contents ### */
+/* PyFrozenDict.module_state_decls */
+#if CYTHON_COMPILING_IN_LIMITED_API
+PyObject *__Pyx_PyFrozenDictType;
+#endif
+
+/* CommonTypesMetaclass.module_state_decls */
+PyTypeObject *__pyx_CommonTypesMetaclassType;
+
+/* CachedMethodType.module_state_decls */
+#if CYTHON_COMPILING_IN_LIMITED_API
+PyObject *__Pyx_CachedMethodType;
+#endif
+
+/* CythonFunctionPerModule.module_state_decls */
+PyTypeObject *__pyx_CyFunctionType;
+
+/* CodeObjectCache.module_state_decls */
+struct __Pyx_CodeObjectCache __pyx_code_cache;
+
+/* #### Code section: module_state_end ### */
+} __pyx_mstatetype;
+#ifdef __cplusplus
+} /* anonymous namespace */
+#endif
+
+#if CYTHON_USE_MODULE_STATE
+#ifdef __cplusplus
+namespace {
+extern struct PyModuleDef __pyx_moduledef;
+} /* anonymous namespace */
+#else
+static struct PyModuleDef __pyx_moduledef;
+#endif
+
+#define __pyx_mstate_global (__Pyx_PyModule_GetState(__Pyx_State_FindModule(&__pyx_moduledef)))
+
+#define __pyx_m (__Pyx_State_FindModule(&__pyx_moduledef))
+#else
+static __pyx_mstatetype __pyx_mstate_global_static =
+#ifdef __cplusplus
+    {};
+#else
+    {0};
+#endif
+static __pyx_mstatetype * const __pyx_mstate_global = &__pyx_mstate_global_static;
+#endif
+/* #### Code section: constant_name_defines ### */
+#define __pyx_kp_u_tree_fragment __pyx_string_tab[0]
+#define __pyx_kp_u_ __pyx_string_tab[1]
+#define __pyx_kp_u__2 __pyx_string_tab[2]
+#define __pyx_kp_u_Note_that_Cython_is_deliberately __pyx_string_tab[3]
+#define __pyx_kp_u_add_note __pyx_string_tab[4]
+#define __pyx_kp_u_disable __pyx_string_tab[5]
+#define __pyx_kp_u_enable __pyx_string_tab[6]
+#define __pyx_kp_u_gc __pyx_string_tab[7]
+#define __pyx_kp_u_isenabled __pyx_string_tab[8]
+#define __pyx_n_u_ABS __pyx_string_tab[9]
+#define __pyx_n_u_ABX __pyx_string_tab[10]
+#define __pyx_n_u_ABY __pyx_string_tab[11]
+#define __pyx_n_u_ADC __pyx_string_tab[12]
+#define __pyx_n_u_ADDRMODES __pyx_string_tab[13]
+#define __pyx_n_u_AND __pyx_string_tab[14]
+#define __pyx_n_u_ASL __pyx_string_tab[15]
+#define __pyx_n_u_BCC __pyx_string_tab[16]
+#define __pyx_n_u_BCS __pyx_string_tab[17]
+#define __pyx_n_u_BEQ __pyx_string_tab[18]
+#define __pyx_n_u_BIT __pyx_string_tab[19]
+#define __pyx_n_u_BMI __pyx_string_tab[20]
+#define __pyx_n_u_BNE __pyx_string_tab[21]
+#define __pyx_n_u_BPL __pyx_string_tab[22]
+#define __pyx_n_u_BRK __pyx_string_tab[23]
+#define __pyx_n_u_BVC __pyx_string_tab[24]
+#define __pyx_n_u_BVS __pyx_string_tab[25]
+#define __pyx_n_u_CLC __pyx_string_tab[26]
+#define __pyx_n_u_CLD __pyx_string_tab[27]
+#define __pyx_n_u_CLI __pyx_string_tab[28]
+#define __pyx_n_u_CLV __pyx_string_tab[29]
+#define __pyx_n_u_CMP __pyx_string_tab[30]
+#define __pyx_n_u_CPX __pyx_string_tab[31]
+#define __pyx_n_u_CPY __pyx_string_tab[32]
+#define __pyx_n_u_DEC __pyx_string_tab[33]
+#define __pyx_n_u_DEX __pyx_string_tab[34]
+#define __pyx_n_u_DEY __pyx_string_tab[35]
+#define __pyx_n_u_EOR __pyx_string_tab[36]
+#define __pyx_n_u_IMM __pyx_string_tab[37]
+#define __pyx_n_u_IMP __pyx_string_tab[38]
+#define __pyx_n_u_INC __pyx_string_tab[39]
+#define __pyx_n_u_IND __pyx_string_tab[40]
+#define __pyx_n_u_INSTRUCTIONS __pyx_string_tab[41]
+#define __pyx_n_u_INX __pyx_string_tab[42]
+#define __pyx_n_u_INY __pyx_string_tab[43]
+#define __pyx_n_u_IZX __pyx_string_tab[44]
+#define __pyx_n_u_IZY __pyx_string_tab[45]
+#define __pyx_n_u_JMP __pyx_string_tab[46]
+#define __pyx_n_u_JSR __pyx_string_tab[47]
+#define __pyx_n_u_LDA __pyx_string_tab[48]
+#define __pyx_n_u_LDX __pyx_string_tab[49]
+#define __pyx_n_u_LDY __pyx_string_tab[50]
+#define __pyx_n_u_LENGTHS __pyx_string_tab[51]
+#define __pyx_n_u_LSR __pyx_string_tab[52]
+#define __pyx_n_u_NOP __pyx_string_tab[53]
+#define __pyx_n_u_ORA __pyx_string_tab[54]
+#define __pyx_n_u_Op __pyx_string_tab[55]
+#define __pyx_n_u_Op___reduce_cython __pyx_string_tab[56]
+#define __pyx_n_u_Op___setstate_cython __pyx_string_tab[57]
+#define __pyx_n_u_PHA __pyx_string_tab[58]
+#define __pyx_n_u_PHP __pyx_string_tab[59]
+#define __pyx_n_u_PLA __pyx_string_tab[60]
+#define __pyx_n_u_PLP __pyx_string_tab[61]
+#define __pyx_n_u_REL __pyx_string_tab[62]
+#define __pyx_n_u_ROL __pyx_string_tab[63]
+#define __pyx_n_u_ROR __pyx_string_tab[64]
+#define __pyx_n_u_RTI __pyx_string_tab[65]
+#define __pyx_n_u_RTS __pyx_string_tab[66]
+#define __pyx_n_u_SBC __pyx_string_tab[67]
+#define __pyx_n_u_SEC __pyx_string_tab[68]
+#define __pyx_n_u_SED __pyx_string_tab[69]
+#define __pyx_n_u_SEI __pyx_string_tab[70]
+#define __pyx_n_u_STA __pyx_string_tab[71]
+#define __pyx_n_u_STX __pyx_string_tab[72]
+#define __pyx_n_u_STY __pyx_string_tab[73]
+#define __pyx_n_u_TAX __pyx_string_tab[74]
+#define __pyx_n_u_TAY __pyx_string_tab[75]
+#define __pyx_n_u_TSX __pyx_string_tab[76]
+#define __pyx_n_u_TXA __pyx_string_tab[77]
+#define __pyx_n_u_TXS __pyx_string_tab[78]
+#define __pyx_n_u_TYA __pyx_string_tab[79]
+#define __pyx_n_u_XXX __pyx_string_tab[80]
+#define __pyx_n_u_ZP0 __pyx_string_tab[81]
+#define __pyx_n_u_ZPX __pyx_string_tab[82]
+#define __pyx_n_u_ZPY __pyx_string_tab[83]
+#define __pyx_n_u_Pyx_PyDict_NextRef __pyx_string_tab[84]
+#define __pyx_n_u_annotate __pyx_string_tab[85]
+#define __pyx_n_u_dict __pyx_string_tab[86]
+#define __pyx_n_u_func __pyx_string_tab[87]
+#define __pyx_n_u_getstate __pyx_string_tab[88]
+#define __pyx_n_u_main __pyx_string_tab[89]
+#define __pyx_n_u_module __pyx_string_tab[90]
+#define __pyx_n_u_name_2 __pyx_string_tab[91]
+#define __pyx_n_u_new __pyx_string_tab[92]
+#define __pyx_n_u_pyx_capi __pyx_string_tab[93]
+#define __pyx_n_u_pyx_checksum __pyx_string_tab[94]
+#define __pyx_n_u_pyx_result __pyx_string_tab[95]
+#define __pyx_n_u_pyx_state __pyx_string_tab[96]
+#define __pyx_n_u_pyx_type __pyx_string_tab[97]
+#define __pyx_n_u_pyx_unpickle_Op __pyx_string_tab[98]
+#define __pyx_n_u_qualname __pyx_string_tab[99]
+#define __pyx_n_u_reduce __pyx_string_tab[100]
+#define __pyx_n_u_reduce_cython __pyx_string_tab[101]
+#define __pyx_n_u_reduce_ex __pyx_string_tab[102]
+#define __pyx_n_u_set_name __pyx_string_tab[103]
+#define __pyx_n_u_setstate __pyx_string_tab[104]
+#define __pyx_n_u_setstate_cython __pyx_string_tab[105]
+#define __pyx_n_u_test __pyx_string_tab[106]
+#define __pyx_n_u_dict_2 __pyx_string_tab[107]
+#define __pyx_n_u_is_coroutine __pyx_string_tab[108]
+#define __pyx_n_u_addrmode __pyx_string_tab[109]
+#define __pyx_n_u_asyncio_coroutines __pyx_string_tab[110]
+#define __pyx_n_u_cline_in_traceback __pyx_string_tab[111]
+#define __pyx_n_u_cycles __pyx_string_tab[112]
+#define __pyx_n_u_enumerate __pyx_string_tab[113]
+#define __pyx_n_u_index __pyx_string_tab[114]
+#define __pyx_n_u_items __pyx_string_tab[115]
+#define __pyx_n_u_length __pyx_string_tab[116]
+#define __pyx_n_u_name __pyx_string_tab[117]
+#define __pyx_n_u_nes_cpu_cpu_op __pyx_string_tab[118]
+#define __pyx_n_u_op __pyx_string_tab[119]
+#define __pyx_n_u_opcode __pyx_string_tab[120]
+#define __pyx_n_u_operate __pyx_string_tab[121]
+#define __pyx_n_u_pop __pyx_string_tab[122]
+#define __pyx_n_u_self __pyx_string_tab[123]
+#define __pyx_n_u_setdefault __pyx_string_tab[124]
+#define __pyx_n_u_state __pyx_string_tab[125]
+#define __pyx_n_u_update __pyx_string_tab[126]
+#define __pyx_n_u_use_setstate __pyx_string_tab[127]
+#define __pyx_n_u_values __pyx_string_tab[128]
+#define __pyx_kp_b_PyObject_uint8_t_12_uint8_t_256 __pyx_string_tab[129]
+#define __pyx_kp_b_iso88591_q __pyx_string_tab[130]
+#define __pyx_kp_b_iso88591_q_0_kQR_2XQa_7_AU_1 __pyx_string_tab[131]
+#define __pyx_kp_b_iso88591_IT_A_q_l_vWE_Q_q_t_WE_D_gU_TQZZ __pyx_string_tab[132]
+#define __pyx_int_0 __pyx_number_tab[0]
+#define __pyx_int_1 __pyx_number_tab[1]
+#define __pyx_int_2 __pyx_number_tab[2]
+#define __pyx_int_3 __pyx_number_tab[3]
+#define __pyx_int_4 __pyx_number_tab[4]
+#define __pyx_int_5 __pyx_number_tab[5]
+#define __pyx_int_6 __pyx_number_tab[6]
+#define __pyx_int_7 __pyx_number_tab[7]
+#define __pyx_int_8 __pyx_number_tab[8]
+#define __pyx_int_143756315 __pyx_number_tab[9]
+/* #### Code section: module_state_clear ### */
+#if CYTHON_USE_MODULE_STATE
+static CYTHON_SMALL_CODE int __pyx_m_clear(PyObject *m) {
+  __pyx_mstatetype *clear_module_state = __Pyx_PyModule_GetState(m);
+  if (!clear_module_state) return 0;
+  Py_CLEAR(clear_module_state->__pyx_d);
+  Py_CLEAR(clear_module_state->__pyx_b);
+  Py_CLEAR(clear_module_state->__pyx_cython_runtime);
+  Py_CLEAR(clear_module_state->__pyx_empty_tuple);
+  Py_CLEAR(clear_module_state->__pyx_empty_bytes);
+  Py_CLEAR(clear_module_state->__pyx_empty_unicode);
+  #if CYTHON_PEP489_MULTI_PHASE_INIT
+  __Pyx_State_RemoveModule(NULL);
+  #endif
+  Py_CLEAR(clear_module_state->__pyx_ptype_3nes_3cpu_6cpu_op_Op);
+  Py_CLEAR(clear_module_state->__pyx_type_3nes_3cpu_6cpu_op_Op);
+  Py_CLEAR(clear_module_state->__pyx_umethod_PyDict_Type_items.method);
+  Py_CLEAR(clear_module_state->__pyx_umethod_PyDict_Type_pop.method);
+  Py_CLEAR(clear_module_state->__pyx_umethod_PyDict_Type_values.method);
+  for (int i=0; i<163; ++i) { Py_CLEAR(clear_module_state->__pyx_tuple[i]); }
+  for (int i=0; i<3; ++i) { Py_CLEAR(clear_module_state->__pyx_codeobj_tab[i]); }
+  for (int i=0; i<133; ++i) { Py_CLEAR(clear_module_state->__pyx_string_tab[i]); }
+  for (int i=0; i<10; ++i) { Py_CLEAR(clear_module_state->__pyx_number_tab[i]); }
+/* #### Code section: module_state_clear_contents ### */
+/* CommonTypesMetaclass.module_state_clear */
+Py_CLEAR(clear_module_state->__pyx_CommonTypesMetaclassType);
+
+/* CythonFunctionPerModule.module_state_clear */
+Py_CLEAR(clear_module_state->__pyx_CyFunctionType);
+
+/* #### Code section: module_state_clear_end ### */
+return 0;
+}
+#endif
+/* #### Code section: module_state_traverse ### */
+#if CYTHON_USE_MODULE_STATE
+static CYTHON_SMALL_CODE int __pyx_m_traverse(PyObject *m, visitproc visit, void *arg) {
+  __pyx_mstatetype *traverse_module_state = __Pyx_PyModule_GetState(m);
+  if (!traverse_module_state) return 0;
+  Py_VISIT(traverse_module_state->__pyx_d);
+  Py_VISIT(traverse_module_state->__pyx_b);
+  Py_VISIT(traverse_module_state->__pyx_cython_runtime);
+  __Pyx_VISIT_CONST(traverse_module_state->__pyx_empty_tuple);
+  __Pyx_VISIT_CONST(traverse_module_state->__pyx_empty_bytes);
+  __Pyx_VISIT_CONST(traverse_module_state->__pyx_empty_unicode);
+  Py_VISIT(traverse_module_state->__pyx_ptype_3nes_3cpu_6cpu_op_Op);
+  Py_VISIT(traverse_module_state->__pyx_type_3nes_3cpu_6cpu_op_Op);
+  Py_VISIT(traverse_module_state->__pyx_umethod_PyDict_Type_items.method);
+  Py_VISIT(traverse_module_state->__pyx_umethod_PyDict_Type_pop.method);
+  Py_VISIT(traverse_module_state->__pyx_umethod_PyDict_Type_values.method);
+  for (int i=0; i<163; ++i) { __Pyx_VISIT_CONST(traverse_module_state->__pyx_tuple[i]); }
+  for (int i=0; i<3; ++i) { __Pyx_VISIT_CONST(traverse_module_state->__pyx_codeobj_tab[i]); }
+  for (int i=0; i<133; ++i) { __Pyx_VISIT_CONST(traverse_module_state->__pyx_string_tab[i]); }
+  for (int i=0; i<10; ++i) { __Pyx_VISIT_CONST(traverse_module_state->__pyx_number_tab[i]); }
+/* #### Code section: module_state_traverse_contents ### */
+/* CommonTypesMetaclass.module_state_traverse */
+Py_VISIT(traverse_module_state->__pyx_CommonTypesMetaclassType);
+
+/* CythonFunctionPerModule.module_state_traverse */
+Py_VISIT(traverse_module_state->__pyx_CyFunctionType);
+
+/* #### Code section: module_state_traverse_end ### */
+return 0;
+}
+#endif
+/* #### Code section: module_code ### */
+
+/* "nes/cpu/cpu_op.pyx":5
+ *     Opcode metadata, only used for disassembling: the CPU dispatches on the typed tables below
+ *     '''
+ *     def __init__(self, str name, str operate, str addrmode, int cycles):             # <<<<<<<<<<<<<<
+ *         self.name = name
+ *         self.operate = operate
+*/
+
+/* Python wrapper */
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_1__init__(PyObject *__pyx_v_self, 
+#if CYTHON_VECTORCALL_TPNEW
+PyObject *const *__pyx_args, Py_ssize_t __pyx_nargs, PyObject *__pyx_kwds
+#else
+PyObject *__pyx_args, PyObject *__pyx_kwds
+#endif
+); /*proto*/
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_1__init__(PyObject *__pyx_v_self, 
+#if CYTHON_VECTORCALL_TPNEW
+PyObject *const *__pyx_args, Py_ssize_t __pyx_nargs, PyObject *__pyx_kwds
+#else
+PyObject *__pyx_args, PyObject *__pyx_kwds
+#endif
+) {
+  PyObject *__pyx_v_name = 0;
+  PyObject *__pyx_v_operate = 0;
+  PyObject *__pyx_v_addrmode = 0;
+  int __pyx_v_cycles;
+  #if !CYTHON_VECTORCALL_TPNEW
+  CYTHON_UNUSED Py_ssize_t __pyx_nargs;
+  #endif
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  PyObject* values[4] = {0,0,0,0};
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__init__ (wrapper)", 0);
+  #if !CYTHON_VECTORCALL_TPNEW
+  #if CYTHON_ASSUME_SAFE_SIZE
+  __pyx_nargs = PyTuple_GET_SIZE(__pyx_args);
+  #else
+  __pyx_nargs = PyTuple_Size(__pyx_args); if (unlikely(__pyx_nargs < 0)) return -1;
+  #endif
+  #endif
+  __pyx_kwvalues = __Pyx_KwValues_FASTCALL_TPNEW(__pyx_args, __pyx_nargs);
+  {
+    PyObject ** const __pyx_pyargnames[] = {&__pyx_mstate_global->__pyx_n_u_name,&__pyx_mstate_global->__pyx_n_u_operate,&__pyx_mstate_global->__pyx_n_u_addrmode,&__pyx_mstate_global->__pyx_n_u_cycles,0};
+    const Py_ssize_t __pyx_kwds_len = (__pyx_kwds) ? __Pyx_NumKwargs_FASTCALL_TPNEW(__pyx_kwds) : 0;
+    if (unlikely(__pyx_kwds_len < 0)) __PYX_ERR(0, 5, __pyx_L3_error)
+    if (__pyx_kwds_len > 0) {
+      switch (__pyx_nargs) {
+        case  4:
+        values[3] = __Pyx_ArgRef_FASTCALL_TPNEW(__pyx_args, 3);
+        if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[3])) __PYX_ERR(0, 5, __pyx_L3_error)
+        CYTHON_FALLTHROUGH;
+        case  3:
+        values[2] = __Pyx_ArgRef_FASTCALL_TPNEW(__pyx_args, 2);
+        if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[2])) __PYX_ERR(0, 5, __pyx_L3_error)
+        CYTHON_FALLTHROUGH;
+        case  2:
+        values[1] = __Pyx_ArgRef_FASTCALL_TPNEW(__pyx_args, 1);
+        if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[1])) __PYX_ERR(0, 5, __pyx_L3_error)
+        CYTHON_FALLTHROUGH;
+        case  1:
+        values[0] = __Pyx_ArgRef_FASTCALL_TPNEW(__pyx_args, 0);
+        if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[0])) __PYX_ERR(0, 5, __pyx_L3_error)
+        CYTHON_FALLTHROUGH;
+        case  0: break;
+        default: goto __pyx_L5_argtuple_error;
+      }
+      const Py_ssize_t kwd_pos_args = __pyx_nargs;
+      if (__Pyx_ParseKeywords(__pyx_kwds, __pyx_kwvalues, __pyx_pyargnames, 0, values, kwd_pos_args, __pyx_kwds_len, "__init__", 0) < (0)) __PYX_ERR(0, 5, __pyx_L3_error)
+      for (Py_ssize_t i = __pyx_nargs; i < 4; i++) {
+        if (unlikely(!values[i])) { __Pyx_RaiseArgtupleInvalid("__init__", 1, 4, 4, i); __PYX_ERR(0, 5, __pyx_L3_error) }
+      }
+    } else if (unlikely(__pyx_nargs != 4)) {
+      goto __pyx_L5_argtuple_error;
+    } else {
+      values[0] = __Pyx_ArgRef_FASTCALL_TPNEW(__pyx_args, 0);
+      if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[0])) __PYX_ERR(0, 5, __pyx_L3_error)
+      values[1] = __Pyx_ArgRef_FASTCALL_TPNEW(__pyx_args, 1);
+      if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[1])) __PYX_ERR(0, 5, __pyx_L3_error)
+      values[2] = __Pyx_ArgRef_FASTCALL_TPNEW(__pyx_args, 2);
+      if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[2])) __PYX_ERR(0, 5, __pyx_L3_error)
+      values[3] = __Pyx_ArgRef_FASTCALL_TPNEW(__pyx_args, 3);
+      if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[3])) __PYX_ERR(0, 5, __pyx_L3_error)
+    }
+    __pyx_v_name = ((PyObject*)values[0]);
+    __pyx_v_operate = ((PyObject*)values[1]);
+    __pyx_v_addrmode = ((PyObject*)values[2]);
+    __pyx_v_cycles = __Pyx_PyLong_As_int(values[3]); if (unlikely((__pyx_v_cycles == (int)-1) && PyErr_Occurred())) __PYX_ERR(0, 5, __pyx_L3_error)
+  }
+  goto __pyx_L6_skip;
+  __pyx_L5_argtuple_error:;
+  __Pyx_RaiseArgtupleInvalid("__init__", 1, 4, 4, __pyx_nargs); __PYX_ERR(0, 5, __pyx_L3_error)
+  __pyx_L6_skip:;
+  goto __pyx_L4_argument_unpacking_done;
+  __pyx_L3_error:;
+  for (Py_ssize_t __pyx_temp=0; __pyx_temp < (Py_ssize_t)(sizeof(values)/sizeof(values[0])); ++__pyx_temp) {
+    Py_XDECREF(values[__pyx_temp]);
+  }
+  __Pyx_AddTraceback("nes.cpu.cpu_op.Op.__init__", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __Pyx_RefNannyFinishContext();
+  return -1;
+  __pyx_L4_argument_unpacking_done:;
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_name), (&PyUnicode_Type), 1, "name", 1))) __PYX_ERR(0, 5, __pyx_L1_error)
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_operate), (&PyUnicode_Type), 1, "operate", 1))) __PYX_ERR(0, 5, __pyx_L1_error)
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v_addrmode), (&PyUnicode_Type), 1, "addrmode", 1))) __PYX_ERR(0, 5, __pyx_L1_error)
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op___init__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self), __pyx_v_name, __pyx_v_operate, __pyx_v_addrmode, __pyx_v_cycles);
+
+  /* function exit code */
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __pyx_r = -1;
+  for (Py_ssize_t __pyx_temp=0; __pyx_temp < (Py_ssize_t)(sizeof(values)/sizeof(values[0])); ++__pyx_temp) {
+    Py_XDECREF(values[__pyx_temp]);
+  }
+  goto __pyx_L7_cleaned_up;
+  __pyx_L0:;
+  for (Py_ssize_t __pyx_temp=0; __pyx_temp < (Py_ssize_t)(sizeof(values)/sizeof(values[0])); ++__pyx_temp) {
+    Py_XDECREF(values[__pyx_temp]);
+  }
+  __pyx_L7_cleaned_up:;
+
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op___init__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self, PyObject *__pyx_v_name, PyObject *__pyx_v_operate, PyObject *__pyx_v_addrmode, int __pyx_v_cycles) {
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__init__", 0);
+
+  /* "nes/cpu/cpu_op.pyx":6
+ *     '''
+ *     def __init__(self, str name, str operate, str addrmode, int cycles):
+ *         self.name = name             # <<<<<<<<<<<<<<
+ *         self.operate = operate
+ *         self.addrmode = addrmode
+*/
+  __Pyx_INCREF(__pyx_v_name);
+  __Pyx_GIVEREF(__pyx_v_name);
+  __Pyx_GOTREF(__pyx_v_self->name);
+  __Pyx_DECREF(__pyx_v_self->name);
+  __pyx_v_self->name = __pyx_v_name;
+
+  /* "nes/cpu/cpu_op.pyx":7
+ *     def __init__(self, str name, str operate, str addrmode, int cycles):
+ *         self.name = name
+ *         self.operate = operate             # <<<<<<<<<<<<<<
+ *         self.addrmode = addrmode
+ *         self.cycles = cycles
+*/
+  __Pyx_INCREF(__pyx_v_operate);
+  __Pyx_GIVEREF(__pyx_v_operate);
+  __Pyx_GOTREF(__pyx_v_self->operate);
+  __Pyx_DECREF(__pyx_v_self->operate);
+  __pyx_v_self->operate = __pyx_v_operate;
+
+  /* "nes/cpu/cpu_op.pyx":8
+ *         self.name = name
+ *         self.operate = operate
+ *         self.addrmode = addrmode             # <<<<<<<<<<<<<<
+ *         self.cycles = cycles
+ * 
+*/
+  __Pyx_INCREF(__pyx_v_addrmode);
+  __Pyx_GIVEREF(__pyx_v_addrmode);
+  __Pyx_GOTREF(__pyx_v_self->addrmode);
+  __Pyx_DECREF(__pyx_v_self->addrmode);
+  __pyx_v_self->addrmode = __pyx_v_addrmode;
+
+  /* "nes/cpu/cpu_op.pyx":9
+ *         self.operate = operate
+ *         self.addrmode = addrmode
+ *         self.cycles = cycles             # <<<<<<<<<<<<<<
+ * 
+ * # names in the same order as the AddressingMode / Instruction enums
+*/
+  __pyx_v_self->cycles = __pyx_v_cycles;
+
+  /* "nes/cpu/cpu_op.pyx":5
+ *     Opcode metadata, only used for disassembling: the CPU dispatches on the typed tables below
+ *     '''
+ *     def __init__(self, str name, str operate, str addrmode, int cycles):             # <<<<<<<<<<<<<<
+ *         self.name = name
+ *         self.operate = operate
+*/
+
+  /* function exit code */
+  __pyx_r = 0;
+
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "nes/cpu/cpu_op.pxd":86
+ * 
+ * cdef class Op:
+ *     cdef public str name             # <<<<<<<<<<<<<<
+ *     cdef public str operate
+ *     cdef public str addrmode
+*/
+
+/* Python wrapper */
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_2Op_4name_1__get__(PyObject *__pyx_v_self); /*proto*/
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_2Op_4name_1__get__(PyObject *__pyx_v_self) {
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  PyObject *__pyx_r = 0;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__get__ (wrapper)", 0);
+  __pyx_kwvalues = __Pyx_KwValues_VARARGS(__pyx_args, __pyx_nargs);
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op_4name___get__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self));
+
+  /* function exit code */
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op_2Op_4name___get__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self) {
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  __Pyx_RefNannySetupContext("__get__", 0);
+  {
+      __Pyx_PyCriticalSection __pyx_cs;
+      __pyx_t_1 = ((PyObject *)__pyx_v_self);
+      __Pyx_INCREF(__pyx_t_1);
+      __Pyx_PyCriticalSection_Begin(&__pyx_cs, (PyObject*)__pyx_t_1);
+      /*try:*/ {
+        {
+          PyObject *__pyx_temp;
+          {
+            __pyx_temp = __pyx_r;
+            __Pyx_INCREF(__pyx_v_self->name);
+            __pyx_r = __pyx_v_self->name;
+          }
+          __Pyx_XDECREF(__pyx_temp);
+        }
+        __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+        goto __pyx_L3_return;
+      }
+      /*finally:*/ {
+        __pyx_L3_return: {
+          __pyx_t_2 = __pyx_r;
+          __pyx_r = 0;
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          __pyx_r = __pyx_t_2;
+          __pyx_t_2 = 0;
+          goto __pyx_L0;
+        }
+      }
+      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  }
+
+  /* function exit code */
+  __pyx_L0:;
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* Python wrapper */
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_4name_3__set__(PyObject *__pyx_v_self, PyObject *__pyx_v_value); /*proto*/
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_4name_3__set__(PyObject *__pyx_v_self, PyObject *__pyx_v_value) {
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__set__ (wrapper)", 0);
+  __pyx_kwvalues = __Pyx_KwValues_VARARGS(__pyx_args, __pyx_nargs);
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op_4name_2__set__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self), ((PyObject *)__pyx_v_value));
+
+  /* function exit code */
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_4name_2__set__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self, PyObject *__pyx_v_value) {
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("__set__", 0);
+  {
+      __Pyx_PyCriticalSection __pyx_cs;
+      __pyx_t_1 = ((PyObject *)__pyx_v_self);
+      __Pyx_INCREF(__pyx_t_1);
+      __Pyx_PyCriticalSection_Begin(&__pyx_cs, (PyObject*)__pyx_t_1);
+      /*try:*/ {
+        __pyx_t_2 = __pyx_v_value;
+        __Pyx_INCREF(__pyx_t_2);
+        if (!(likely(PyUnicode_CheckExact(__pyx_t_2))||((__pyx_t_2) == Py_None) || __Pyx_RaiseUnexpectedTypeError("str", __pyx_t_2))) __PYX_ERR(1, 86, __pyx_L4_error)
+        __Pyx_GIVEREF(__pyx_t_2);
+        __Pyx_GOTREF(__pyx_v_self->name);
+        __Pyx_DECREF(__pyx_v_self->name);
+        __pyx_v_self->name = ((PyObject*)__pyx_t_2);
+        __pyx_t_2 = 0;
+      }
+      /*finally:*/ {
+        /*normal exit:*/{
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L5;
+        }
+        __pyx_L4_error: {
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L1_error;
+        }
+        __pyx_L5:;
+      }
+      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  }
+
+  /* function exit code */
+  __pyx_r = 0;
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_AddTraceback("nes.cpu.cpu_op.Op.name.__set__", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = -1;
+  __pyx_L0:;
+
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* Python wrapper */
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_4name_5__del__(PyObject *__pyx_v_self); /*proto*/
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_4name_5__del__(PyObject *__pyx_v_self) {
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__del__ (wrapper)", 0);
+  __pyx_kwvalues = __Pyx_KwValues_VARARGS(__pyx_args, __pyx_nargs);
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op_4name_4__del__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self));
+
+  /* function exit code */
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_4name_4__del__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self) {
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  __Pyx_RefNannySetupContext("__del__", 0);
+  {
+      __Pyx_PyCriticalSection __pyx_cs;
+      __pyx_t_1 = ((PyObject *)__pyx_v_self);
+      __Pyx_INCREF(__pyx_t_1);
+      __Pyx_PyCriticalSection_Begin(&__pyx_cs, (PyObject*)__pyx_t_1);
+      /*try:*/ {
+        __Pyx_INCREF(Py_None);
+        __Pyx_GIVEREF(Py_None);
+        __Pyx_GOTREF(__pyx_v_self->name);
+        __Pyx_DECREF(__pyx_v_self->name);
+        __pyx_v_self->name = ((PyObject*)Py_None);
+      }
+      /*finally:*/ {
+        /*normal exit:*/{
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L5;
+        }
+        __pyx_L5:;
+      }
+      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  }
+
+  /* function exit code */
+  __pyx_r = 0;
+
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "nes/cpu/cpu_op.pxd":87
+ * cdef class Op:
+ *     cdef public str name
+ *     cdef public str operate             # <<<<<<<<<<<<<<
+ *     cdef public str addrmode
+ *     cdef public int cycles
+*/
+
+/* Python wrapper */
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_2Op_7operate_1__get__(PyObject *__pyx_v_self); /*proto*/
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_2Op_7operate_1__get__(PyObject *__pyx_v_self) {
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  PyObject *__pyx_r = 0;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__get__ (wrapper)", 0);
+  __pyx_kwvalues = __Pyx_KwValues_VARARGS(__pyx_args, __pyx_nargs);
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op_7operate___get__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self));
+
+  /* function exit code */
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op_2Op_7operate___get__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self) {
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  __Pyx_RefNannySetupContext("__get__", 0);
+  {
+      __Pyx_PyCriticalSection __pyx_cs;
+      __pyx_t_1 = ((PyObject *)__pyx_v_self);
+      __Pyx_INCREF(__pyx_t_1);
+      __Pyx_PyCriticalSection_Begin(&__pyx_cs, (PyObject*)__pyx_t_1);
+      /*try:*/ {
+        {
+          PyObject *__pyx_temp;
+          {
+            __pyx_temp = __pyx_r;
+            __Pyx_INCREF(__pyx_v_self->operate);
+            __pyx_r = __pyx_v_self->operate;
+          }
+          __Pyx_XDECREF(__pyx_temp);
+        }
+        __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+        goto __pyx_L3_return;
+      }
+      /*finally:*/ {
+        __pyx_L3_return: {
+          __pyx_t_2 = __pyx_r;
+          __pyx_r = 0;
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          __pyx_r = __pyx_t_2;
+          __pyx_t_2 = 0;
+          goto __pyx_L0;
+        }
+      }
+      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  }
+
+  /* function exit code */
+  __pyx_L0:;
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* Python wrapper */
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_7operate_3__set__(PyObject *__pyx_v_self, PyObject *__pyx_v_value); /*proto*/
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_7operate_3__set__(PyObject *__pyx_v_self, PyObject *__pyx_v_value) {
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__set__ (wrapper)", 0);
+  __pyx_kwvalues = __Pyx_KwValues_VARARGS(__pyx_args, __pyx_nargs);
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op_7operate_2__set__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self), ((PyObject *)__pyx_v_value));
+
+  /* function exit code */
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_7operate_2__set__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self, PyObject *__pyx_v_value) {
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("__set__", 0);
+  {
+      __Pyx_PyCriticalSection __pyx_cs;
+      __pyx_t_1 = ((PyObject *)__pyx_v_self);
+      __Pyx_INCREF(__pyx_t_1);
+      __Pyx_PyCriticalSection_Begin(&__pyx_cs, (PyObject*)__pyx_t_1);
+      /*try:*/ {
+        __pyx_t_2 = __pyx_v_value;
+        __Pyx_INCREF(__pyx_t_2);
+        if (!(likely(PyUnicode_CheckExact(__pyx_t_2))||((__pyx_t_2) == Py_None) || __Pyx_RaiseUnexpectedTypeError("str", __pyx_t_2))) __PYX_ERR(1, 87, __pyx_L4_error)
+        __Pyx_GIVEREF(__pyx_t_2);
+        __Pyx_GOTREF(__pyx_v_self->operate);
+        __Pyx_DECREF(__pyx_v_self->operate);
+        __pyx_v_self->operate = ((PyObject*)__pyx_t_2);
+        __pyx_t_2 = 0;
+      }
+      /*finally:*/ {
+        /*normal exit:*/{
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L5;
+        }
+        __pyx_L4_error: {
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L1_error;
+        }
+        __pyx_L5:;
+      }
+      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  }
+
+  /* function exit code */
+  __pyx_r = 0;
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_AddTraceback("nes.cpu.cpu_op.Op.operate.__set__", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = -1;
+  __pyx_L0:;
+
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* Python wrapper */
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_7operate_5__del__(PyObject *__pyx_v_self); /*proto*/
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_7operate_5__del__(PyObject *__pyx_v_self) {
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__del__ (wrapper)", 0);
+  __pyx_kwvalues = __Pyx_KwValues_VARARGS(__pyx_args, __pyx_nargs);
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op_7operate_4__del__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self));
+
+  /* function exit code */
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_7operate_4__del__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self) {
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  __Pyx_RefNannySetupContext("__del__", 0);
+  {
+      __Pyx_PyCriticalSection __pyx_cs;
+      __pyx_t_1 = ((PyObject *)__pyx_v_self);
+      __Pyx_INCREF(__pyx_t_1);
+      __Pyx_PyCriticalSection_Begin(&__pyx_cs, (PyObject*)__pyx_t_1);
+      /*try:*/ {
+        __Pyx_INCREF(Py_None);
+        __Pyx_GIVEREF(Py_None);
+        __Pyx_GOTREF(__pyx_v_self->operate);
+        __Pyx_DECREF(__pyx_v_self->operate);
+        __pyx_v_self->operate = ((PyObject*)Py_None);
+      }
+      /*finally:*/ {
+        /*normal exit:*/{
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L5;
+        }
+        __pyx_L5:;
+      }
+      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  }
+
+  /* function exit code */
+  __pyx_r = 0;
+
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "nes/cpu/cpu_op.pxd":88
+ *     cdef public str name
+ *     cdef public str operate
+ *     cdef public str addrmode             # <<<<<<<<<<<<<<
+ *     cdef public int cycles
+*/
+
+/* Python wrapper */
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_2Op_8addrmode_1__get__(PyObject *__pyx_v_self); /*proto*/
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_2Op_8addrmode_1__get__(PyObject *__pyx_v_self) {
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  PyObject *__pyx_r = 0;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__get__ (wrapper)", 0);
+  __pyx_kwvalues = __Pyx_KwValues_VARARGS(__pyx_args, __pyx_nargs);
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op_8addrmode___get__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self));
+
+  /* function exit code */
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op_2Op_8addrmode___get__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self) {
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  __Pyx_RefNannySetupContext("__get__", 0);
+  {
+      __Pyx_PyCriticalSection __pyx_cs;
+      __pyx_t_1 = ((PyObject *)__pyx_v_self);
+      __Pyx_INCREF(__pyx_t_1);
+      __Pyx_PyCriticalSection_Begin(&__pyx_cs, (PyObject*)__pyx_t_1);
+      /*try:*/ {
+        {
+          PyObject *__pyx_temp;
+          {
+            __pyx_temp = __pyx_r;
+            __Pyx_INCREF(__pyx_v_self->addrmode);
+            __pyx_r = __pyx_v_self->addrmode;
+          }
+          __Pyx_XDECREF(__pyx_temp);
+        }
+        __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+        goto __pyx_L3_return;
+      }
+      /*finally:*/ {
+        __pyx_L3_return: {
+          __pyx_t_2 = __pyx_r;
+          __pyx_r = 0;
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          __pyx_r = __pyx_t_2;
+          __pyx_t_2 = 0;
+          goto __pyx_L0;
+        }
+      }
+      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  }
+
+  /* function exit code */
+  __pyx_L0:;
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* Python wrapper */
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_8addrmode_3__set__(PyObject *__pyx_v_self, PyObject *__pyx_v_value); /*proto*/
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_8addrmode_3__set__(PyObject *__pyx_v_self, PyObject *__pyx_v_value) {
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__set__ (wrapper)", 0);
+  __pyx_kwvalues = __Pyx_KwValues_VARARGS(__pyx_args, __pyx_nargs);
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op_8addrmode_2__set__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self), ((PyObject *)__pyx_v_value));
+
+  /* function exit code */
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_8addrmode_2__set__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self, PyObject *__pyx_v_value) {
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("__set__", 0);
+  {
+      __Pyx_PyCriticalSection __pyx_cs;
+      __pyx_t_1 = ((PyObject *)__pyx_v_self);
+      __Pyx_INCREF(__pyx_t_1);
+      __Pyx_PyCriticalSection_Begin(&__pyx_cs, (PyObject*)__pyx_t_1);
+      /*try:*/ {
+        __pyx_t_2 = __pyx_v_value;
+        __Pyx_INCREF(__pyx_t_2);
+        if (!(likely(PyUnicode_CheckExact(__pyx_t_2))||((__pyx_t_2) == Py_None) || __Pyx_RaiseUnexpectedTypeError("str", __pyx_t_2))) __PYX_ERR(1, 88, __pyx_L4_error)
+        __Pyx_GIVEREF(__pyx_t_2);
+        __Pyx_GOTREF(__pyx_v_self->addrmode);
+        __Pyx_DECREF(__pyx_v_self->addrmode);
+        __pyx_v_self->addrmode = ((PyObject*)__pyx_t_2);
+        __pyx_t_2 = 0;
+      }
+      /*finally:*/ {
+        /*normal exit:*/{
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L5;
+        }
+        __pyx_L4_error: {
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L1_error;
+        }
+        __pyx_L5:;
+      }
+      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  }
+
+  /* function exit code */
+  __pyx_r = 0;
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_AddTraceback("nes.cpu.cpu_op.Op.addrmode.__set__", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = -1;
+  __pyx_L0:;
+
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* Python wrapper */
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_8addrmode_5__del__(PyObject *__pyx_v_self); /*proto*/
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_8addrmode_5__del__(PyObject *__pyx_v_self) {
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__del__ (wrapper)", 0);
+  __pyx_kwvalues = __Pyx_KwValues_VARARGS(__pyx_args, __pyx_nargs);
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op_8addrmode_4__del__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self));
+
+  /* function exit code */
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_8addrmode_4__del__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self) {
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  __Pyx_RefNannySetupContext("__del__", 0);
+  {
+      __Pyx_PyCriticalSection __pyx_cs;
+      __pyx_t_1 = ((PyObject *)__pyx_v_self);
+      __Pyx_INCREF(__pyx_t_1);
+      __Pyx_PyCriticalSection_Begin(&__pyx_cs, (PyObject*)__pyx_t_1);
+      /*try:*/ {
+        __Pyx_INCREF(Py_None);
+        __Pyx_GIVEREF(Py_None);
+        __Pyx_GOTREF(__pyx_v_self->addrmode);
+        __Pyx_DECREF(__pyx_v_self->addrmode);
+        __pyx_v_self->addrmode = ((PyObject*)Py_None);
+      }
+      /*finally:*/ {
+        /*normal exit:*/{
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L5;
+        }
+        __pyx_L5:;
+      }
+      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  }
+
+  /* function exit code */
+  __pyx_r = 0;
+
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "nes/cpu/cpu_op.pxd":89
+ *     cdef public str operate
+ *     cdef public str addrmode
+ *     cdef public int cycles             # <<<<<<<<<<<<<<
+*/
+
+/* Python wrapper */
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_2Op_6cycles_1__get__(PyObject *__pyx_v_self); /*proto*/
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_2Op_6cycles_1__get__(PyObject *__pyx_v_self) {
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  PyObject *__pyx_r = 0;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__get__ (wrapper)", 0);
+  __pyx_kwvalues = __Pyx_KwValues_VARARGS(__pyx_args, __pyx_nargs);
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op_6cycles___get__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self));
+
+  /* function exit code */
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op_2Op_6cycles___get__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self) {
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  PyObject *__pyx_t_3 = NULL;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("__get__", 0);
+  {
+      __Pyx_PyCriticalSection __pyx_cs;
+      __pyx_t_1 = ((PyObject *)__pyx_v_self);
+      __Pyx_INCREF(__pyx_t_1);
+      __Pyx_PyCriticalSection_Begin(&__pyx_cs, (PyObject*)__pyx_t_1);
+      /*try:*/ {
+        __pyx_t_2 = __Pyx_PyLong_From_int(__pyx_v_self->cycles); if (unlikely(!__pyx_t_2)) __PYX_ERR(1, 89, __pyx_L4_error)
+        __Pyx_GOTREF(__pyx_t_2);
+        {
+          PyObject *__pyx_temp;
+          {
+            __pyx_temp = __pyx_r;
+            __pyx_r = __pyx_t_2;
+          }
+          __Pyx_XDECREF(__pyx_temp);
+        }
+        __pyx_t_2 = 0;
+        __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+        goto __pyx_L3_return;
+      }
+      /*finally:*/ {
+        __pyx_L3_return: {
+          __pyx_t_3 = __pyx_r;
+          __pyx_r = 0;
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          __pyx_r = __pyx_t_3;
+          __pyx_t_3 = 0;
+          goto __pyx_L0;
+        }
+        __pyx_L4_error: {
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L1_error;
+        }
+      }
+      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  }
+
+  /* function exit code */
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_AddTraceback("nes.cpu.cpu_op.Op.cycles.__get__", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = NULL;
+  __pyx_L0:;
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* Python wrapper */
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_6cycles_3__set__(PyObject *__pyx_v_self, PyObject *__pyx_v_value); /*proto*/
+static int __pyx_pw_3nes_3cpu_6cpu_op_2Op_6cycles_3__set__(PyObject *__pyx_v_self, PyObject *__pyx_v_value) {
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__set__ (wrapper)", 0);
+  __pyx_kwvalues = __Pyx_KwValues_VARARGS(__pyx_args, __pyx_nargs);
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op_6cycles_2__set__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self), ((PyObject *)__pyx_v_value));
+
+  /* function exit code */
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static int __pyx_pf_3nes_3cpu_6cpu_op_2Op_6cycles_2__set__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self, PyObject *__pyx_v_value) {
+  int __pyx_r;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  int __pyx_t_2;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("__set__", 0);
+  {
+      __Pyx_PyCriticalSection __pyx_cs;
+      __pyx_t_1 = ((PyObject *)__pyx_v_self);
+      __Pyx_INCREF(__pyx_t_1);
+      __Pyx_PyCriticalSection_Begin(&__pyx_cs, (PyObject*)__pyx_t_1);
+      /*try:*/ {
+        __pyx_t_2 = __Pyx_PyLong_As_int(__pyx_v_value); if (unlikely((__pyx_t_2 == (int)-1) && PyErr_Occurred())) __PYX_ERR(1, 89, __pyx_L4_error)
+        __pyx_v_self->cycles = __pyx_t_2;
+      }
+      /*finally:*/ {
+        /*normal exit:*/{
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L5;
+        }
+        __pyx_L4_error: {
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L1_error;
+        }
+        __pyx_L5:;
+      }
+      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  }
+
+  /* function exit code */
+  __pyx_r = 0;
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_AddTraceback("nes.cpu.cpu_op.Op.cycles.__set__", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = -1;
+  __pyx_L0:;
+
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "(tree fragment)":1
+ * def __reduce_cython__(self):             # <<<<<<<<<<<<<<
+ *     cdef tuple state
+ *     cdef object _dict
+*/
+
+/* Python wrapper */
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_2Op_3__reduce_cython__(PyObject *__pyx_v_self, 
+#if CYTHON_VECTORCALL
+PyObject *const *__pyx_args, Py_ssize_t __pyx_nargs, PyObject *__pyx_kwds
+#else
+PyObject *__pyx_args, PyObject *__pyx_kwds
+#endif
+); /*proto*/
+static PyMethodDef __pyx_mdef_3nes_3cpu_6cpu_op_2Op_3__reduce_cython__ = {"__reduce_cython__", (PyCFunction)(void(*)(void))(__Pyx_PyCFunction_FastCallWithKeywords)__pyx_pw_3nes_3cpu_6cpu_op_2Op_3__reduce_cython__, __Pyx_METH_FASTCALL|METH_KEYWORDS, 0};
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_2Op_3__reduce_cython__(PyObject *__pyx_v_self, 
+#if CYTHON_VECTORCALL
+PyObject *const *__pyx_args, Py_ssize_t __pyx_nargs, PyObject *__pyx_kwds
+#else
+PyObject *__pyx_args, PyObject *__pyx_kwds
+#endif
+) {
+  #if !CYTHON_VECTORCALL
+  CYTHON_UNUSED Py_ssize_t __pyx_nargs;
+  #endif
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  PyObject *__pyx_r = 0;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__reduce_cython__ (wrapper)", 0);
+  #if !CYTHON_VECTORCALL
+  #if CYTHON_ASSUME_SAFE_SIZE
+  __pyx_nargs = PyTuple_GET_SIZE(__pyx_args);
+  #else
+  __pyx_nargs = PyTuple_Size(__pyx_args); if (unlikely(__pyx_nargs < 0)) return NULL;
+  #endif
+  #endif
+  __pyx_kwvalues = __Pyx_KwValues_FASTCALL(__pyx_args, __pyx_nargs);
+  if (unlikely(__pyx_nargs > 0)) { __Pyx_RaiseArgtupleInvalid("__reduce_cython__", 1, 0, 0, __pyx_nargs); return NULL; }
+  const Py_ssize_t __pyx_kwds_len = unlikely(__pyx_kwds) ? __Pyx_NumKwargs_FASTCALL(__pyx_kwds) : 0;
+  if (unlikely(__pyx_kwds_len < 0)) return NULL;
+  if (unlikely(__pyx_kwds_len > 0)) {__Pyx_RejectKeywords("__reduce_cython__", __pyx_kwds); return NULL;}
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op_2__reduce_cython__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self));
+
+  /* function exit code */
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op_2Op_2__reduce_cython__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self) {
+  PyObject *__pyx_v_state = 0;
+  PyObject *__pyx_v__dict = 0;
+  int __pyx_v_use_setstate;
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  PyObject *__pyx_t_3 = NULL;
+  int __pyx_t_4;
+  int __pyx_t_5;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("__reduce_cython__", 0);
+
+  /* "(tree fragment)":5
+ *     cdef object _dict
+ *     cdef bint use_setstate
+ *     with CRITICAL_SECTION(self):             # <<<<<<<<<<<<<<
+ *         state = (self.addrmode, self.cycles, self.name, self.operate)
+ *         _dict = getattr(self, '__dict__', None)
+*/
+  {
+      __Pyx_PyCriticalSection __pyx_cs;
+      __pyx_t_1 = ((PyObject *)__pyx_v_self);
+      __Pyx_INCREF(__pyx_t_1);
+      __Pyx_PyCriticalSection_Begin(&__pyx_cs, (PyObject*)__pyx_t_1);
+      /*try:*/ {
+
+        /* "(tree fragment)":6
+ *     cdef bint use_setstate
+ *     with CRITICAL_SECTION(self):
+ *         state = (self.addrmode, self.cycles, self.name, self.operate)             # <<<<<<<<<<<<<<
+ *         _dict = getattr(self, '__dict__', None)
+ *     if _dict is not None and _dict:
+*/
+        __pyx_t_2 = __Pyx_PyLong_From_int(__pyx_v_self->cycles); if (unlikely(!__pyx_t_2)) __PYX_ERR(2, 6, __pyx_L4_error)
+        __Pyx_GOTREF(__pyx_t_2);
+        __pyx_t_3 = PyTuple_New(4); if (unlikely(!__pyx_t_3)) __PYX_ERR(2, 6, __pyx_L4_error)
+        __Pyx_GOTREF(__pyx_t_3);
+        __Pyx_INCREF(__pyx_v_self->addrmode);
+        __Pyx_GIVEREF(__pyx_v_self->addrmode);
+        if (__Pyx_PyTuple_SET_ITEM(__pyx_t_3, 0, __pyx_v_self->addrmode) != (0)) __PYX_ERR(2, 6, __pyx_L4_error);
+        __Pyx_GIVEREF(__pyx_t_2);
+        if (__Pyx_PyTuple_SET_ITEM(__pyx_t_3, 1, __pyx_t_2) != (0)) __PYX_ERR(2, 6, __pyx_L4_error);
+        __Pyx_INCREF(__pyx_v_self->name);
+        __Pyx_GIVEREF(__pyx_v_self->name);
+        if (__Pyx_PyTuple_SET_ITEM(__pyx_t_3, 2, __pyx_v_self->name) != (0)) __PYX_ERR(2, 6, __pyx_L4_error);
+        __Pyx_INCREF(__pyx_v_self->operate);
+        __Pyx_GIVEREF(__pyx_v_self->operate);
+        if (__Pyx_PyTuple_SET_ITEM(__pyx_t_3, 3, __pyx_v_self->operate) != (0)) __PYX_ERR(2, 6, __pyx_L4_error);
+        __pyx_t_2 = 0;
+        __pyx_v_state = ((PyObject*)__pyx_t_3);
+        __pyx_t_3 = 0;
+
+        /* "(tree fragment)":7
+ *     with CRITICAL_SECTION(self):
+ *         state = (self.addrmode, self.cycles, self.name, self.operate)
+ *         _dict = getattr(self, '__dict__', None)             # <<<<<<<<<<<<<<
+ *     if _dict is not None and _dict:
+ *         state += (_dict,)
+*/
+        __pyx_t_3 = __Pyx_GetAttr3(((PyObject *)__pyx_v_self), __pyx_mstate_global->__pyx_n_u_dict, Py_None); if (unlikely(!__pyx_t_3)) __PYX_ERR(2, 7, __pyx_L4_error)
+        __Pyx_GOTREF(__pyx_t_3);
+        __pyx_v__dict = __pyx_t_3;
+        __pyx_t_3 = 0;
+      }
+
+      /* "(tree fragment)":5
+ *     cdef object _dict
+ *     cdef bint use_setstate
+ *     with CRITICAL_SECTION(self):             # <<<<<<<<<<<<<<
+ *         state = (self.addrmode, self.cycles, self.name, self.operate)
+ *         _dict = getattr(self, '__dict__', None)
+*/
+      /*finally:*/ {
+        /*normal exit:*/{
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L5;
+        }
+        __pyx_L4_error: {
+          __Pyx_PyCriticalSection_End(&__pyx_cs);
+          goto __pyx_L1_error;
+        }
+        __pyx_L5:;
+      }
+      __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  }
+
+  /* "(tree fragment)":8
+ *         state = (self.addrmode, self.cycles, self.name, self.operate)
+ *         _dict = getattr(self, '__dict__', None)
+ *     if _dict is not None and _dict:             # <<<<<<<<<<<<<<
+ *         state += (_dict,)
+ *         use_setstate = True
+*/
+  __pyx_t_5 = (__pyx_v__dict != Py_None);
+  if (__pyx_t_5) {
+
+  } else {
+
+    __pyx_t_4 = __pyx_t_5;
+
+    goto __pyx_L7_bool_binop_done;
+  }
+  __pyx_t_5 = __Pyx_PyObject_IsTrue(__pyx_v__dict); if (unlikely((__pyx_t_5 < 0))) __PYX_ERR(2, 8, __pyx_L1_error)
+
+  __pyx_t_4 = __pyx_t_5;
+
+  __pyx_L7_bool_binop_done:;
+  if (__pyx_t_4) {
+
+
+    /* "(tree fragment)":9
+ *         _dict = getattr(self, '__dict__', None)
+ *     if _dict is not None and _dict:
+ *         state += (_dict,)             # <<<<<<<<<<<<<<
+ *         use_setstate = True
+ *     else:
+*/
+    __pyx_t_1 = PyTuple_New(1); if (unlikely(!__pyx_t_1)) __PYX_ERR(2, 9, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_1);
+    __Pyx_INCREF(__pyx_v__dict);
+    __Pyx_GIVEREF(__pyx_v__dict);
+    if (__Pyx_PyTuple_SET_ITEM(__pyx_t_1, 0, __pyx_v__dict) != (0)) __PYX_ERR(2, 9, __pyx_L1_error);
+    __pyx_t_3 = PyNumber_InPlaceAdd(__pyx_v_state, __pyx_t_1); if (unlikely(!__pyx_t_3)) __PYX_ERR(2, 9, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_3);
+    __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+    __Pyx_DECREF_SET(__pyx_v_state, ((PyObject*)__pyx_t_3));
+    __pyx_t_3 = 0;
+
+    /* "(tree fragment)":10
+ *     if _dict is not None and _dict:
+ *         state += (_dict,)
+ *         use_setstate = True             # <<<<<<<<<<<<<<
+ *     else:
+ *         use_setstate = self.addrmode is not None or self.name is not None or self.operate is not None
+*/
+    __pyx_v_use_setstate = 1;
+
+    /* "(tree fragment)":8
+ *         state = (self.addrmode, self.cycles, self.name, self.operate)
+ *         _dict = getattr(self, '__dict__', None)
+ *     if _dict is not None and _dict:             # <<<<<<<<<<<<<<
+ *         state += (_dict,)
+ *         use_setstate = True
+*/
+    goto __pyx_L6;
+  }
+
+  /* "(tree fragment)":12
+ *         use_setstate = True
+ *     else:
+ *         use_setstate = self.addrmode is not None or self.name is not None or self.operate is not None             # <<<<<<<<<<<<<<
+ *     if use_setstate:
+ *         return __pyx_unpickle_Op, (type(self), 0x8918c1b, None), state
+*/
+  /*else*/ {
+    __pyx_t_5 = (__pyx_v_self->addrmode != ((PyObject*)Py_None));
+    if (!__pyx_t_5) {
+
+    } else {
+
+      __pyx_t_4 = __pyx_t_5;
+
+      goto __pyx_L9_bool_binop_done;
+    }
+    __pyx_t_5 = (__pyx_v_self->name != ((PyObject*)Py_None));
+    if (!__pyx_t_5) {
+
+    } else {
+
+      __pyx_t_4 = __pyx_t_5;
+
+      goto __pyx_L9_bool_binop_done;
+    }
+    __pyx_t_5 = (__pyx_v_self->operate != ((PyObject*)Py_None));
+
+    __pyx_t_4 = __pyx_t_5;
+
+    __pyx_L9_bool_binop_done:;
+    __pyx_v_use_setstate = __pyx_t_4;
+  }
+  __pyx_L6:;
+
+  /* "(tree fragment)":13
+ *     else:
+ *         use_setstate = self.addrmode is not None or self.name is not None or self.operate is not None
+ *     if use_setstate:             # <<<<<<<<<<<<<<
+ *         return __pyx_unpickle_Op, (type(self), 0x8918c1b, None), state
+ *     else:
+*/
+  if (__pyx_v_use_setstate) {
+
+    /* "(tree fragment)":14
+ *         use_setstate = self.addrmode is not None or self.name is not None or self.operate is not None
+ *     if use_setstate:
+ *         return __pyx_unpickle_Op, (type(self), 0x8918c1b, None), state             # <<<<<<<<<<<<<<
+ *     else:
+ *         return __pyx_unpickle_Op, (type(self), 0x8918c1b, state)
+*/
+    __Pyx_GetModuleGlobalName(__pyx_t_3, __pyx_mstate_global->__pyx_n_u_pyx_unpickle_Op); if (unlikely(!__pyx_t_3)) __PYX_ERR(2, 14, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_3);
+    __pyx_t_1 = PyTuple_New(3); if (unlikely(!__pyx_t_1)) __PYX_ERR(2, 14, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_1);
+    __Pyx_INCREF(((PyObject *)Py_TYPE(((PyObject *)__pyx_v_self))));
+    __Pyx_GIVEREF(((PyObject *)Py_TYPE(((PyObject *)__pyx_v_self))));
+    if (__Pyx_PyTuple_SET_ITEM(__pyx_t_1, 0, ((PyObject *)Py_TYPE(((PyObject *)__pyx_v_self)))) != (0)) __PYX_ERR(2, 14, __pyx_L1_error);
+    __Pyx_INCREF(__pyx_mstate_global->__pyx_int_143756315);
+    __Pyx_GIVEREF(__pyx_mstate_global->__pyx_int_143756315);
+    if (__Pyx_PyTuple_SET_ITEM(__pyx_t_1, 1, __pyx_mstate_global->__pyx_int_143756315) != (0)) __PYX_ERR(2, 14, __pyx_L1_error);
+    __Pyx_INCREF(Py_None);
+    __Pyx_GIVEREF(Py_None);
+    if (__Pyx_PyTuple_SET_ITEM(__pyx_t_1, 2, Py_None) != (0)) __PYX_ERR(2, 14, __pyx_L1_error);
+    __pyx_t_2 = PyTuple_New(3); if (unlikely(!__pyx_t_2)) __PYX_ERR(2, 14, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_2);
+    __Pyx_GIVEREF(__pyx_t_3);
+    if (__Pyx_PyTuple_SET_ITEM(__pyx_t_2, 0, __pyx_t_3) != (0)) __PYX_ERR(2, 14, __pyx_L1_error);
+    __Pyx_GIVEREF(__pyx_t_1);
+    if (__Pyx_PyTuple_SET_ITEM(__pyx_t_2, 1, __pyx_t_1) != (0)) __PYX_ERR(2, 14, __pyx_L1_error);
+    __Pyx_INCREF(__pyx_v_state);
+    __Pyx_GIVEREF(__pyx_v_state);
+    if (__Pyx_PyTuple_SET_ITEM(__pyx_t_2, 2, __pyx_v_state) != (0)) __PYX_ERR(2, 14, __pyx_L1_error);
+    __pyx_t_3 = 0;
+    __pyx_t_1 = 0;
+    {
+      PyObject *__pyx_temp;
+      {
+        __pyx_temp = __pyx_r;
+        __pyx_r = __pyx_t_2;
+      }
+      __Pyx_XDECREF(__pyx_temp);
+    }
+    __pyx_t_2 = 0;
+    goto __pyx_L0;
+
+    /* "(tree fragment)":13
+ *     else:
+ *         use_setstate = self.addrmode is not None or self.name is not None or self.operate is not None
+ *     if use_setstate:             # <<<<<<<<<<<<<<
+ *         return __pyx_unpickle_Op, (type(self), 0x8918c1b, None), state
+ *     else:
+*/
+  }
+
+  /* "(tree fragment)":16
+ *         return __pyx_unpickle_Op, (type(self), 0x8918c1b, None), state
+ *     else:
+ *         return __pyx_unpickle_Op, (type(self), 0x8918c1b, state)             # <<<<<<<<<<<<<<
+ * def __setstate_cython__(self, __pyx_state):
+ *     __pyx_unpickle_Op__set_state(self, __pyx_state)
+*/
+  /*else*/ {
+    __Pyx_GetModuleGlobalName(__pyx_t_2, __pyx_mstate_global->__pyx_n_u_pyx_unpickle_Op); if (unlikely(!__pyx_t_2)) __PYX_ERR(2, 16, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_2);
+    __pyx_t_1 = PyTuple_New(3); if (unlikely(!__pyx_t_1)) __PYX_ERR(2, 16, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_1);
+    __Pyx_INCREF(((PyObject *)Py_TYPE(((PyObject *)__pyx_v_self))));
+    __Pyx_GIVEREF(((PyObject *)Py_TYPE(((PyObject *)__pyx_v_self))));
+    if (__Pyx_PyTuple_SET_ITEM(__pyx_t_1, 0, ((PyObject *)Py_TYPE(((PyObject *)__pyx_v_self)))) != (0)) __PYX_ERR(2, 16, __pyx_L1_error);
+    __Pyx_INCREF(__pyx_mstate_global->__pyx_int_143756315);
+    __Pyx_GIVEREF(__pyx_mstate_global->__pyx_int_143756315);
+    if (__Pyx_PyTuple_SET_ITEM(__pyx_t_1, 1, __pyx_mstate_global->__pyx_int_143756315) != (0)) __PYX_ERR(2, 16, __pyx_L1_error);
+    __Pyx_INCREF(__pyx_v_state);
+    __Pyx_GIVEREF(__pyx_v_state);
+    if (__Pyx_PyTuple_SET_ITEM(__pyx_t_1, 2, __pyx_v_state) != (0)) __PYX_ERR(2, 16, __pyx_L1_error);
+    __pyx_t_3 = PyTuple_New(2); if (unlikely(!__pyx_t_3)) __PYX_ERR(2, 16, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_3);
+    __Pyx_GIVEREF(__pyx_t_2);
+    if (__Pyx_PyTuple_SET_ITEM(__pyx_t_3, 0, __pyx_t_2) != (0)) __PYX_ERR(2, 16, __pyx_L1_error);
+    __Pyx_GIVEREF(__pyx_t_1);
+    if (__Pyx_PyTuple_SET_ITEM(__pyx_t_3, 1, __pyx_t_1) != (0)) __PYX_ERR(2, 16, __pyx_L1_error);
+    __pyx_t_2 = 0;
+    __pyx_t_1 = 0;
+    {
+      PyObject *__pyx_temp;
+      {
+        __pyx_temp = __pyx_r;
+        __pyx_r = __pyx_t_3;
+      }
+      __Pyx_XDECREF(__pyx_temp);
+    }
+    __pyx_t_3 = 0;
+    goto __pyx_L0;
+  }
+
+  /* "(tree fragment)":1
+ * def __reduce_cython__(self):             # <<<<<<<<<<<<<<
+ *     cdef tuple state
+ *     cdef object _dict
+*/
+
+  /* function exit code */
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_XDECREF(__pyx_t_3);
+  __Pyx_AddTraceback("nes.cpu.cpu_op.Op.__reduce_cython__", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = NULL;
+  __pyx_L0:;
+  __Pyx_XDECREF(__pyx_v_state);
+  __Pyx_XDECREF(__pyx_v__dict);
+
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "(tree fragment)":17
+ *     else:
+ *         return __pyx_unpickle_Op, (type(self), 0x8918c1b, state)
+ * def __setstate_cython__(self, __pyx_state):             # <<<<<<<<<<<<<<
+ *     __pyx_unpickle_Op__set_state(self, __pyx_state)
+*/
+
+/* Python wrapper */
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_2Op_5__setstate_cython__(PyObject *__pyx_v_self, 
+#if CYTHON_VECTORCALL
+PyObject *const *__pyx_args, Py_ssize_t __pyx_nargs, PyObject *__pyx_kwds
+#else
+PyObject *__pyx_args, PyObject *__pyx_kwds
+#endif
+); /*proto*/
+static PyMethodDef __pyx_mdef_3nes_3cpu_6cpu_op_2Op_5__setstate_cython__ = {"__setstate_cython__", (PyCFunction)(void(*)(void))(__Pyx_PyCFunction_FastCallWithKeywords)__pyx_pw_3nes_3cpu_6cpu_op_2Op_5__setstate_cython__, __Pyx_METH_FASTCALL|METH_KEYWORDS, 0};
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_2Op_5__setstate_cython__(PyObject *__pyx_v_self, 
+#if CYTHON_VECTORCALL
+PyObject *const *__pyx_args, Py_ssize_t __pyx_nargs, PyObject *__pyx_kwds
+#else
+PyObject *__pyx_args, PyObject *__pyx_kwds
+#endif
+) {
+  PyObject *__pyx_v___pyx_state = 0;
+  #if !CYTHON_VECTORCALL
+  CYTHON_UNUSED Py_ssize_t __pyx_nargs;
+  #endif
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  PyObject* values[1] = {0};
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  PyObject *__pyx_r = 0;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__setstate_cython__ (wrapper)", 0);
+  #if !CYTHON_VECTORCALL
+  #if CYTHON_ASSUME_SAFE_SIZE
+  __pyx_nargs = PyTuple_GET_SIZE(__pyx_args);
+  #else
+  __pyx_nargs = PyTuple_Size(__pyx_args); if (unlikely(__pyx_nargs < 0)) return NULL;
+  #endif
+  #endif
+  __pyx_kwvalues = __Pyx_KwValues_FASTCALL(__pyx_args, __pyx_nargs);
+  {
+    PyObject ** const __pyx_pyargnames[] = {&__pyx_mstate_global->__pyx_n_u_pyx_state,0};
+    const Py_ssize_t __pyx_kwds_len = (__pyx_kwds) ? __Pyx_NumKwargs_FASTCALL(__pyx_kwds) : 0;
+    if (unlikely(__pyx_kwds_len < 0)) __PYX_ERR(2, 17, __pyx_L3_error)
+    if (__pyx_kwds_len > 0) {
+      switch (__pyx_nargs) {
+        case  1:
+        values[0] = __Pyx_ArgRef_FASTCALL(__pyx_args, 0);
+        if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[0])) __PYX_ERR(2, 17, __pyx_L3_error)
+        CYTHON_FALLTHROUGH;
+        case  0: break;
+        default: goto __pyx_L5_argtuple_error;
+      }
+      const Py_ssize_t kwd_pos_args = __pyx_nargs;
+      if (__Pyx_ParseKeywords(__pyx_kwds, __pyx_kwvalues, __pyx_pyargnames, 0, values, kwd_pos_args, __pyx_kwds_len, "__setstate_cython__", 0) < (0)) __PYX_ERR(2, 17, __pyx_L3_error)
+      for (Py_ssize_t i = __pyx_nargs; i < 1; i++) {
+        if (unlikely(!values[i])) { __Pyx_RaiseArgtupleInvalid("__setstate_cython__", 1, 1, 1, i); __PYX_ERR(2, 17, __pyx_L3_error) }
+      }
+    } else if (unlikely(__pyx_nargs != 1)) {
+      goto __pyx_L5_argtuple_error;
+    } else {
+      values[0] = __Pyx_ArgRef_FASTCALL(__pyx_args, 0);
+      if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[0])) __PYX_ERR(2, 17, __pyx_L3_error)
+    }
+    __pyx_v___pyx_state = values[0];
+  }
+  goto __pyx_L6_skip;
+  __pyx_L5_argtuple_error:;
+  __Pyx_RaiseArgtupleInvalid("__setstate_cython__", 1, 1, 1, __pyx_nargs); __PYX_ERR(2, 17, __pyx_L3_error)
+  __pyx_L6_skip:;
+  goto __pyx_L4_argument_unpacking_done;
+  __pyx_L3_error:;
+  for (Py_ssize_t __pyx_temp=0; __pyx_temp < (Py_ssize_t)(sizeof(values)/sizeof(values[0])); ++__pyx_temp) {
+    Py_XDECREF(values[__pyx_temp]);
+  }
+  __Pyx_AddTraceback("nes.cpu.cpu_op.Op.__setstate_cython__", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __Pyx_RefNannyFinishContext();
+  return NULL;
+  __pyx_L4_argument_unpacking_done:;
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op_2Op_4__setstate_cython__(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v_self), __pyx_v___pyx_state);
+
+  /* function exit code */
+  for (Py_ssize_t __pyx_temp=0; __pyx_temp < (Py_ssize_t)(sizeof(values)/sizeof(values[0])); ++__pyx_temp) {
+    Py_XDECREF(values[__pyx_temp]);
+  }
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op_2Op_4__setstate_cython__(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v_self, PyObject *__pyx_v___pyx_state) {
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("__setstate_cython__", 0);
+
+  /* "(tree fragment)":18
+ *         return __pyx_unpickle_Op, (type(self), 0x8918c1b, state)
+ * def __setstate_cython__(self, __pyx_state):
+ *     __pyx_unpickle_Op__set_state(self, __pyx_state)             # <<<<<<<<<<<<<<
+*/
+  __pyx_t_1 = __pyx_v___pyx_state;
+  __Pyx_INCREF(__pyx_t_1);
+  if (!(likely(PyTuple_CheckExact(__pyx_t_1))||((__pyx_t_1) == Py_None) || __Pyx_RaiseUnexpectedTypeError("tuple", __pyx_t_1))) __PYX_ERR(2, 18, __pyx_L1_error)
+  if (unlikely(__pyx_t_1 == Py_None)) {
+    PyErr_SetString(PyExc_TypeError, "cannot pass None into a C function argument that is declared \047not None\047");
+    __PYX_ERR(2, 18, __pyx_L1_error)
+  }
+  __pyx_t_2 = __pyx_f_3nes_3cpu_6cpu_op___pyx_unpickle_Op__set_state(__pyx_v_self, ((PyObject*)__pyx_t_1)); if (unlikely(!__pyx_t_2)) __PYX_ERR(2, 18, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_2);
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+
+  /* "(tree fragment)":17
+ *     else:
+ *         return __pyx_unpickle_Op, (type(self), 0x8918c1b, state)
+ * def __setstate_cython__(self, __pyx_state):             # <<<<<<<<<<<<<<
+ *     __pyx_unpickle_Op__set_state(self, __pyx_state)
+*/
+
+  /* function exit code */
+  __pyx_r = Py_None; __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_AddTraceback("nes.cpu.cpu_op.Op.__setstate_cython__", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = NULL;
+  __pyx_L0:;
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "(tree fragment)":4
+ *     int __Pyx_CheckUnpickleChecksum(long, long, long, long, const char*) except -1
+ *     int __Pyx_UpdateUnpickledDict(object, object, Py_ssize_t) except -1
+ * def __pyx_unpickle_Op(__pyx_type, long __pyx_checksum, tuple __pyx_state):             # <<<<<<<<<<<<<<
+ *     cdef object __pyx_result
+ *     __Pyx_CheckUnpickleChecksum(__pyx_checksum, 0x8918c1b, 0xf920461, 0x4e94d2c, b'addrmode, cycles, name, operate')
+*/
+
+/* Python wrapper */
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_1__pyx_unpickle_Op(PyObject *__pyx_self, 
+#if CYTHON_VECTORCALL
+PyObject *const *__pyx_args, Py_ssize_t __pyx_nargs, PyObject *__pyx_kwds
+#else
+PyObject *__pyx_args, PyObject *__pyx_kwds
+#endif
+); /*proto*/
+static PyMethodDef __pyx_mdef_3nes_3cpu_6cpu_op_1__pyx_unpickle_Op = {"__pyx_unpickle_Op", (PyCFunction)(void(*)(void))(__Pyx_PyCFunction_FastCallWithKeywords)__pyx_pw_3nes_3cpu_6cpu_op_1__pyx_unpickle_Op, __Pyx_METH_FASTCALL|METH_KEYWORDS, 0};
+static PyObject *__pyx_pw_3nes_3cpu_6cpu_op_1__pyx_unpickle_Op(PyObject *__pyx_self, 
+#if CYTHON_VECTORCALL
+PyObject *const *__pyx_args, Py_ssize_t __pyx_nargs, PyObject *__pyx_kwds
+#else
+PyObject *__pyx_args, PyObject *__pyx_kwds
+#endif
+) {
+  PyObject *__pyx_v___pyx_type = 0;
+  long __pyx_v___pyx_checksum;
+  PyObject *__pyx_v___pyx_state = 0;
+  #if !CYTHON_VECTORCALL
+  CYTHON_UNUSED Py_ssize_t __pyx_nargs;
+  #endif
+  CYTHON_UNUSED PyObject *const *__pyx_kwvalues;
+  PyObject* values[3] = {0,0,0};
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  PyObject *__pyx_r = 0;
+  __Pyx_RefNannyDeclarations
+  __Pyx_RefNannySetupContext("__pyx_unpickle_Op (wrapper)", 0);
+  #if !CYTHON_VECTORCALL
+  #if CYTHON_ASSUME_SAFE_SIZE
+  __pyx_nargs = PyTuple_GET_SIZE(__pyx_args);
+  #else
+  __pyx_nargs = PyTuple_Size(__pyx_args); if (unlikely(__pyx_nargs < 0)) return NULL;
+  #endif
+  #endif
+  __pyx_kwvalues = __Pyx_KwValues_FASTCALL(__pyx_args, __pyx_nargs);
+  {
+    PyObject ** const __pyx_pyargnames[] = {&__pyx_mstate_global->__pyx_n_u_pyx_type,&__pyx_mstate_global->__pyx_n_u_pyx_checksum,&__pyx_mstate_global->__pyx_n_u_pyx_state,0};
+    const Py_ssize_t __pyx_kwds_len = (__pyx_kwds) ? __Pyx_NumKwargs_FASTCALL(__pyx_kwds) : 0;
+    if (unlikely(__pyx_kwds_len < 0)) __PYX_ERR(2, 4, __pyx_L3_error)
+    if (__pyx_kwds_len > 0) {
+      switch (__pyx_nargs) {
+        case  3:
+        values[2] = __Pyx_ArgRef_FASTCALL(__pyx_args, 2);
+        if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[2])) __PYX_ERR(2, 4, __pyx_L3_error)
+        CYTHON_FALLTHROUGH;
+        case  2:
+        values[1] = __Pyx_ArgRef_FASTCALL(__pyx_args, 1);
+        if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[1])) __PYX_ERR(2, 4, __pyx_L3_error)
+        CYTHON_FALLTHROUGH;
+        case  1:
+        values[0] = __Pyx_ArgRef_FASTCALL(__pyx_args, 0);
+        if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[0])) __PYX_ERR(2, 4, __pyx_L3_error)
+        CYTHON_FALLTHROUGH;
+        case  0: break;
+        default: goto __pyx_L5_argtuple_error;
+      }
+      const Py_ssize_t kwd_pos_args = __pyx_nargs;
+      if (__Pyx_ParseKeywords(__pyx_kwds, __pyx_kwvalues, __pyx_pyargnames, 0, values, kwd_pos_args, __pyx_kwds_len, "__pyx_unpickle_Op", 0) < (0)) __PYX_ERR(2, 4, __pyx_L3_error)
+      for (Py_ssize_t i = __pyx_nargs; i < 3; i++) {
+        if (unlikely(!values[i])) { __Pyx_RaiseArgtupleInvalid("__pyx_unpickle_Op", 1, 3, 3, i); __PYX_ERR(2, 4, __pyx_L3_error) }
+      }
+    } else if (unlikely(__pyx_nargs != 3)) {
+      goto __pyx_L5_argtuple_error;
+    } else {
+      values[0] = __Pyx_ArgRef_FASTCALL(__pyx_args, 0);
+      if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[0])) __PYX_ERR(2, 4, __pyx_L3_error)
+      values[1] = __Pyx_ArgRef_FASTCALL(__pyx_args, 1);
+      if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[1])) __PYX_ERR(2, 4, __pyx_L3_error)
+      values[2] = __Pyx_ArgRef_FASTCALL(__pyx_args, 2);
+      if (!CYTHON_ASSUME_SAFE_MACROS && unlikely(!values[2])) __PYX_ERR(2, 4, __pyx_L3_error)
+    }
+    __pyx_v___pyx_type = values[0];
+    __pyx_v___pyx_checksum = __Pyx_PyLong_As_long(values[1]); if (unlikely((__pyx_v___pyx_checksum == (long)-1) && PyErr_Occurred())) __PYX_ERR(2, 4, __pyx_L3_error)
+    __pyx_v___pyx_state = ((PyObject*)values[2]);
+  }
+  goto __pyx_L6_skip;
+  __pyx_L5_argtuple_error:;
+  __Pyx_RaiseArgtupleInvalid("__pyx_unpickle_Op", 1, 3, 3, __pyx_nargs); __PYX_ERR(2, 4, __pyx_L3_error)
+  __pyx_L6_skip:;
+  goto __pyx_L4_argument_unpacking_done;
+  __pyx_L3_error:;
+  for (Py_ssize_t __pyx_temp=0; __pyx_temp < (Py_ssize_t)(sizeof(values)/sizeof(values[0])); ++__pyx_temp) {
+    Py_XDECREF(values[__pyx_temp]);
+  }
+  __Pyx_AddTraceback("nes.cpu.cpu_op.__pyx_unpickle_Op", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __Pyx_RefNannyFinishContext();
+  return NULL;
+  __pyx_L4_argument_unpacking_done:;
+  if (unlikely(!__Pyx_ArgTypeTest(((PyObject *)__pyx_v___pyx_state), (&PyTuple_Type), 1, "__pyx_state", 1))) __PYX_ERR(2, 4, __pyx_L1_error)
+  __pyx_r = __pyx_pf_3nes_3cpu_6cpu_op___pyx_unpickle_Op(__pyx_self, __pyx_v___pyx_type, __pyx_v___pyx_checksum, __pyx_v___pyx_state);
+
+  /* function exit code */
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __pyx_r = NULL;
+  for (Py_ssize_t __pyx_temp=0; __pyx_temp < (Py_ssize_t)(sizeof(values)/sizeof(values[0])); ++__pyx_temp) {
+    Py_XDECREF(values[__pyx_temp]);
+  }
+  goto __pyx_L7_cleaned_up;
+  __pyx_L0:;
+  for (Py_ssize_t __pyx_temp=0; __pyx_temp < (Py_ssize_t)(sizeof(values)/sizeof(values[0])); ++__pyx_temp) {
+    Py_XDECREF(values[__pyx_temp]);
+  }
+  __pyx_L7_cleaned_up:;
+
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+static PyObject *__pyx_pf_3nes_3cpu_6cpu_op___pyx_unpickle_Op(CYTHON_UNUSED PyObject *__pyx_self, PyObject *__pyx_v___pyx_type, long __pyx_v___pyx_checksum, PyObject *__pyx_v___pyx_state) {
+  PyObject *__pyx_v___pyx_result = 0;
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  int __pyx_t_1;
+  PyObject *__pyx_t_2 = NULL;
+  PyObject *__pyx_t_3 = NULL;
+  size_t __pyx_t_4;
+  int __pyx_t_5;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("__pyx_unpickle_Op", 0);
+
+  /* "(tree fragment)":6
+ * def __pyx_unpickle_Op(__pyx_type, long __pyx_checksum, tuple __pyx_state):
+ *     cdef object __pyx_result
+ *     __Pyx_CheckUnpickleChecksum(__pyx_checksum, 0x8918c1b, 0xf920461, 0x4e94d2c, b'addrmode, cycles, name, operate')             # <<<<<<<<<<<<<<
+ *     __pyx_result = Op.__new__(__pyx_type)
+ *     if __pyx_state is not None:
+*/
+  __pyx_t_1 = __Pyx_CheckUnpickleChecksum(__pyx_v___pyx_checksum, 0x8918c1b, 0xf920461, 0x4e94d2c, __pyx_k_addrmode_cycles_name_operate); if (unlikely(__pyx_t_1 == ((int)-1))) __PYX_ERR(2, 6, __pyx_L1_error)
+
+
+  /* "(tree fragment)":7
+ *     cdef object __pyx_result
+ *     __Pyx_CheckUnpickleChecksum(__pyx_checksum, 0x8918c1b, 0xf920461, 0x4e94d2c, b'addrmode, cycles, name, operate')
+ *     __pyx_result = Op.__new__(__pyx_type)             # <<<<<<<<<<<<<<
+ *     if __pyx_state is not None:
+ *         __pyx_unpickle_Op__set_state(<Op> __pyx_result, __pyx_state)
+*/
+  __pyx_t_3 = ((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op);
+  __Pyx_INCREF(__pyx_t_3);
+  __pyx_t_4 = 0;
+  {
+    PyObject *__pyx_callargs[2] = {__pyx_t_3, __pyx_v___pyx_type};
+    __pyx_t_2 = __Pyx_PyObject_FastCallMethod((PyObject*)__pyx_mstate_global->__pyx_n_u_new, __pyx_callargs+__pyx_t_4, (2-__pyx_t_4) | (1*__Pyx_PY_VECTORCALL_ARGUMENTS_OFFSET));
+    __Pyx_XDECREF(__pyx_t_3); __pyx_t_3 = 0;
+    if (unlikely(!__pyx_t_2)) __PYX_ERR(2, 7, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_2);
+  }
+  __pyx_v___pyx_result = __pyx_t_2;
+  __pyx_t_2 = 0;
+
+  /* "(tree fragment)":8
+ *     __Pyx_CheckUnpickleChecksum(__pyx_checksum, 0x8918c1b, 0xf920461, 0x4e94d2c, b'addrmode, cycles, name, operate')
+ *     __pyx_result = Op.__new__(__pyx_type)
+ *     if __pyx_state is not None:             # <<<<<<<<<<<<<<
+ *         __pyx_unpickle_Op__set_state(<Op> __pyx_result, __pyx_state)
+ *     return __pyx_result
+*/
+  __pyx_t_5 = (__pyx_v___pyx_state != ((PyObject*)Py_None));
+  if (__pyx_t_5) {
+
+
+    /* "(tree fragment)":9
+ *     __pyx_result = Op.__new__(__pyx_type)
+ *     if __pyx_state is not None:
+ *         __pyx_unpickle_Op__set_state(<Op> __pyx_result, __pyx_state)             # <<<<<<<<<<<<<<
+ *     return __pyx_result
+ * cdef __pyx_unpickle_Op__set_state(Op __pyx_result, __pyx_state: tuple):
+*/
+    if (unlikely(__pyx_v___pyx_state == Py_None)) {
+      PyErr_SetString(PyExc_TypeError, "cannot pass None into a C function argument that is declared \047not None\047");
+      __PYX_ERR(2, 9, __pyx_L1_error)
+    }
+    __pyx_t_2 = __pyx_f_3nes_3cpu_6cpu_op___pyx_unpickle_Op__set_state(((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)__pyx_v___pyx_result), __pyx_v___pyx_state); if (unlikely(!__pyx_t_2)) __PYX_ERR(2, 9, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_2);
+    __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+
+    /* "(tree fragment)":8
+ *     __Pyx_CheckUnpickleChecksum(__pyx_checksum, 0x8918c1b, 0xf920461, 0x4e94d2c, b'addrmode, cycles, name, operate')
+ *     __pyx_result = Op.__new__(__pyx_type)
+ *     if __pyx_state is not None:             # <<<<<<<<<<<<<<
+ *         __pyx_unpickle_Op__set_state(<Op> __pyx_result, __pyx_state)
+ *     return __pyx_result
+*/
+  }
+
+  /* "(tree fragment)":10
+ *     if __pyx_state is not None:
+ *         __pyx_unpickle_Op__set_state(<Op> __pyx_result, __pyx_state)
+ *     return __pyx_result             # <<<<<<<<<<<<<<
+ * cdef __pyx_unpickle_Op__set_state(Op __pyx_result, __pyx_state: tuple):
+ *     __pyx_result.addrmode = __pyx_state[0]; __pyx_result.cycles = __pyx_state[1]; __pyx_result.name = __pyx_state[2]; __pyx_result.operate = __pyx_state[3]
+*/
+  {
+    PyObject *__pyx_temp;
+    {
+      __pyx_temp = __pyx_r;
+      __Pyx_INCREF(__pyx_v___pyx_result);
+      __pyx_r = __pyx_v___pyx_result;
+    }
+    __Pyx_XDECREF(__pyx_temp);
+  }
+  goto __pyx_L0;
+
+  /* "(tree fragment)":4
+ *     int __Pyx_CheckUnpickleChecksum(long, long, long, long, const char*) except -1
+ *     int __Pyx_UpdateUnpickledDict(object, object, Py_ssize_t) except -1
+ * def __pyx_unpickle_Op(__pyx_type, long __pyx_checksum, tuple __pyx_state):             # <<<<<<<<<<<<<<
+ *     cdef object __pyx_result
+ *     __Pyx_CheckUnpickleChecksum(__pyx_checksum, 0x8918c1b, 0xf920461, 0x4e94d2c, b'addrmode, cycles, name, operate')
+*/
+
+  /* function exit code */
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_XDECREF(__pyx_t_3);
+  __Pyx_AddTraceback("nes.cpu.cpu_op.__pyx_unpickle_Op", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = NULL;
+  __pyx_L0:;
+  __Pyx_XDECREF(__pyx_v___pyx_result);
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+
+/* "(tree fragment)":11
+ *         __pyx_unpickle_Op__set_state(<Op> __pyx_result, __pyx_state)
+ *     return __pyx_result
+ * cdef __pyx_unpickle_Op__set_state(Op __pyx_result, __pyx_state: tuple):             # <<<<<<<<<<<<<<
+ *     __pyx_result.addrmode = __pyx_state[0]; __pyx_result.cycles = __pyx_state[1]; __pyx_result.name = __pyx_state[2]; __pyx_result.operate = __pyx_state[3]
+ *     __Pyx_UpdateUnpickledDict(__pyx_result, __pyx_state, 4)
+*/
+
+static PyObject *__pyx_f_3nes_3cpu_6cpu_op___pyx_unpickle_Op__set_state(struct __pyx_obj_3nes_3cpu_6cpu_op_Op *__pyx_v___pyx_result, PyObject *__pyx_v___pyx_state) {
+  PyObject *__pyx_r = NULL;
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  int __pyx_t_2;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannySetupContext("__pyx_unpickle_Op__set_state", 0);
+
+  /* "(tree fragment)":12
+ *     return __pyx_result
+ * cdef __pyx_unpickle_Op__set_state(Op __pyx_result, __pyx_state: tuple):
+ *     __pyx_result.addrmode = __pyx_state[0]; __pyx_result.cycles = __pyx_state[1]; __pyx_result.name = __pyx_state[2]; __pyx_result.operate = __pyx_state[3]             # <<<<<<<<<<<<<<
+ *     __Pyx_UpdateUnpickledDict(__pyx_result, __pyx_state, 4)
+*/
+  __pyx_t_1 = __Pyx_GetItemInt_Tuple(__pyx_v___pyx_state, 0, long, 1, __Pyx_PyLong_From_long, 0, 1, 1, __Pyx_ReferenceSharing_FunctionArgument); if (unlikely(!__pyx_t_1)) __PYX_ERR(2, 12, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_1);
+  if (!(likely(PyUnicode_CheckExact(__pyx_t_1))||((__pyx_t_1) == Py_None) || __Pyx_RaiseUnexpectedTypeError("str", __pyx_t_1))) __PYX_ERR(2, 12, __pyx_L1_error)
+  __Pyx_GIVEREF(__pyx_t_1);
+  __Pyx_GOTREF(__pyx_v___pyx_result->addrmode);
+  __Pyx_DECREF(__pyx_v___pyx_result->addrmode);
+  __pyx_v___pyx_result->addrmode = ((PyObject*)__pyx_t_1);
+  __pyx_t_1 = 0;
+  __pyx_t_1 = __Pyx_GetItemInt_Tuple(__pyx_v___pyx_state, 1, long, 1, __Pyx_PyLong_From_long, 0, 1, 1, __Pyx_ReferenceSharing_FunctionArgument); if (unlikely(!__pyx_t_1)) __PYX_ERR(2, 12, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_1);
+  __pyx_t_2 = __Pyx_PyLong_As_int(__pyx_t_1); if (unlikely((__pyx_t_2 == (int)-1) && PyErr_Occurred())) __PYX_ERR(2, 12, __pyx_L1_error)
+  __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  __pyx_v___pyx_result->cycles = __pyx_t_2;
+  __pyx_t_1 = __Pyx_GetItemInt_Tuple(__pyx_v___pyx_state, 2, long, 1, __Pyx_PyLong_From_long, 0, 1, 1, __Pyx_ReferenceSharing_FunctionArgument); if (unlikely(!__pyx_t_1)) __PYX_ERR(2, 12, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_1);
+  if (!(likely(PyUnicode_CheckExact(__pyx_t_1))||((__pyx_t_1) == Py_None) || __Pyx_RaiseUnexpectedTypeError("str", __pyx_t_1))) __PYX_ERR(2, 12, __pyx_L1_error)
+  __Pyx_GIVEREF(__pyx_t_1);
+  __Pyx_GOTREF(__pyx_v___pyx_result->name);
+  __Pyx_DECREF(__pyx_v___pyx_result->name);
+  __pyx_v___pyx_result->name = ((PyObject*)__pyx_t_1);
+  __pyx_t_1 = 0;
+  __pyx_t_1 = __Pyx_GetItemInt_Tuple(__pyx_v___pyx_state, 3, long, 1, __Pyx_PyLong_From_long, 0, 1, 1, __Pyx_ReferenceSharing_FunctionArgument); if (unlikely(!__pyx_t_1)) __PYX_ERR(2, 12, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_1);
+  if (!(likely(PyUnicode_CheckExact(__pyx_t_1))||((__pyx_t_1) == Py_None) || __Pyx_RaiseUnexpectedTypeError("str", __pyx_t_1))) __PYX_ERR(2, 12, __pyx_L1_error)
+  __Pyx_GIVEREF(__pyx_t_1);
+  __Pyx_GOTREF(__pyx_v___pyx_result->operate);
+  __Pyx_DECREF(__pyx_v___pyx_result->operate);
+  __pyx_v___pyx_result->operate = ((PyObject*)__pyx_t_1);
+  __pyx_t_1 = 0;
+
+  /* "(tree fragment)":13
+ * cdef __pyx_unpickle_Op__set_state(Op __pyx_result, __pyx_state: tuple):
+ *     __pyx_result.addrmode = __pyx_state[0]; __pyx_result.cycles = __pyx_state[1]; __pyx_result.name = __pyx_state[2]; __pyx_result.operate = __pyx_state[3]
+ *     __Pyx_UpdateUnpickledDict(__pyx_result, __pyx_state, 4)             # <<<<<<<<<<<<<<
+*/
+  __pyx_t_2 = __Pyx_UpdateUnpickledDict(((PyObject *)__pyx_v___pyx_result), __pyx_v___pyx_state, 4); if (unlikely(__pyx_t_2 == ((int)-1))) __PYX_ERR(2, 13, __pyx_L1_error)
+
+
+  /* "(tree fragment)":11
+ *         __pyx_unpickle_Op__set_state(<Op> __pyx_result, __pyx_state)
+ *     return __pyx_result
+ * cdef __pyx_unpickle_Op__set_state(Op __pyx_result, __pyx_state: tuple):             # <<<<<<<<<<<<<<
+ *     __pyx_result.addrmode = __pyx_state[0]; __pyx_result.cycles = __pyx_state[1]; __pyx_result.name = __pyx_state[2]; __pyx_result.operate = __pyx_state[3]
+ *     __Pyx_UpdateUnpickledDict(__pyx_result, __pyx_state, 4)
+*/
+
+  /* function exit code */
+  __pyx_r = Py_None; __Pyx_INCREF(Py_None);
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_AddTraceback("nes.cpu.cpu_op.__pyx_unpickle_Op__set_state", __pyx_clineno, __pyx_lineno, __pyx_filename);
+  __pyx_r = 0;
+  __pyx_L0:;
+  __Pyx_XGIVEREF(__pyx_r);
+  __Pyx_RefNannyFinishContext();
+  return __pyx_r;
+}
+/* #### Code section: module_exttypes ### */
+
+static PyObject *__pyx_tp_new__initialisation_3nes_3cpu_6cpu_op_Op(PyObject *o, 
+#if CYTHON_VECTORCALL_TPNEW
+    CYTHON_UNUSED PyObject *const *args, CYTHON_UNUSED Py_ssize_t nargs, CYTHON_UNUSED PyObject *kwnames
+#else
+    CYTHON_UNUSED PyObject *a, CYTHON_UNUSED PyObject *k
+#endif
+) {
+  struct __pyx_obj_3nes_3cpu_6cpu_op_Op *p = ((struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)o);
+  p->name = ((PyObject*)Py_None); Py_INCREF(Py_None);
+  p->operate = ((PyObject*)Py_None); Py_INCREF(Py_None);
+  p->addrmode = ((PyObject*)Py_None); Py_INCREF(Py_None);
+  return o;
+}
+
+static PyObject *__pyx_tp_new_vectorcall_3nes_3cpu_6cpu_op_Op(PyTypeObject *t, 
+#if CYTHON_VECTORCALL_TPNEW
+    PyObject *const *args, Py_ssize_t nargs, PyObject *kwnames
+#else
+    PyObject *a, PyObject *k
+#endif
+) {
+  PyObject *o;
+  o = __Pyx_AllocateExtensionType(t, 0);
+  if (unlikely(!o)) return 0;
+  return __pyx_tp_new__initialisation_3nes_3cpu_6cpu_op_Op(o, 
+#if CYTHON_VECTORCALL_TPNEW
+    args, nargs, kwnames
+#else
+    a, k
+#endif
+);
+}
+
+#if CYTHON_VECTORCALL_TPNEW
+static PyObject *__pyx_tp_new_3nes_3cpu_6cpu_op_Op(PyTypeObject *t, PyObject *a, PyObject *k) {
+  return __Pyx_CallTpnewAsVectorcall(__pyx_tp_new_vectorcall_3nes_3cpu_6cpu_op_Op, t, a, k);
+}
+#endif
+
+#if CYTHON_VECTORCALL_TPNEW
+static PyObject *__pyx_tp_vectorcall_3nes_3cpu_6cpu_op_Op(PyObject *t, PyObject *const *args, size_t nargsf, PyObject *kwnames) {
+  if (unlikely((PyTypeObject*)t != __pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op || __Pyx_PyType_HasFeature((PyTypeObject*)t, Py_TPFLAGS_IS_ABSTRACT))) {
+    return __Pyx_CallNewInitFromVectorcall((PyTypeObject*)t, args, nargsf, kwnames);
+  }
+  Py_ssize_t nargs = PyVectorcall_NARGS(nargsf);
+  PyObject *o = __pyx_tp_new_vectorcall_3nes_3cpu_6cpu_op_Op((PyTypeObject*)t, args, nargs, kwnames);
+  if (likely(o)) {
+    assert(Py_TYPE(o) == (PyTypeObject*)t);
+    if (unlikely(__pyx_pw_3nes_3cpu_6cpu_op_2Op_1__init__(o, args, nargs, kwnames) < 0)) {
+      Py_CLEAR(o);
+    }
+  }
+  return o;
+}
+#endif
+
+#if CYTHON_VECTORCALL_TPNEW
+static int __pyx_tp_init_3nes_3cpu_6cpu_op_Op(PyObject *o, PyObject *args, PyObject *kwds) {
+  return __Pyx_CallTpinitAsVectorcall(__pyx_pw_3nes_3cpu_6cpu_op_2Op_1__init__, o, args, kwds);
+}
+#endif
+
+static void __pyx_tp_dealloc_3nes_3cpu_6cpu_op_Op(PyObject *o) {
+  struct __pyx_obj_3nes_3cpu_6cpu_op_Op *p = (struct __pyx_obj_3nes_3cpu_6cpu_op_Op *)o;
+  #if CYTHON_USE_TP_FINALIZE
+  if (unlikely(__Pyx_PyObject_GetSlot(o, tp_finalize, destructor)) && (!PyType_IS_GC(Py_TYPE(o)) || !__Pyx_PyObject_GC_IsFinalized(o))) {
+    if (__Pyx_PyObject_GetSlot(o, tp_dealloc, destructor) == __pyx_tp_dealloc_3nes_3cpu_6cpu_op_Op) {
+      if (PyObject_CallFinalizerFromDealloc(o)) return;
+    }
+  }
+  #endif
+  Py_CLEAR(p->name);
+  Py_CLEAR(p->operate);
+  Py_CLEAR(p->addrmode);
+  PyTypeObject *tp = Py_TYPE(o);
+  #if CYTHON_USE_TYPE_SLOTS
+  (*tp->tp_free)(o);
+  #else
+  {
+    freefunc tp_free = (freefunc)PyType_GetSlot(tp, Py_tp_free);
+    if (tp_free) tp_free(o);
+  }
+  #endif
+  #if CYTHON_USE_TYPE_SPECS
+  Py_DECREF(tp);
+  #endif
+}
+
+static PyObject *__pyx_getprop_3nes_3cpu_6cpu_op_2Op_name(PyObject *o, CYTHON_UNUSED void *x) {
+  return __pyx_pw_3nes_3cpu_6cpu_op_2Op_4name_1__get__(o);
+}
+
+static int __pyx_setprop_3nes_3cpu_6cpu_op_2Op_name(PyObject *o, PyObject *v, CYTHON_UNUSED void *x) {
+  if (v) {
+    return __pyx_pw_3nes_3cpu_6cpu_op_2Op_4name_3__set__(o, v);
+  }
+  else {
+    return __pyx_pw_3nes_3cpu_6cpu_op_2Op_4name_5__del__(o);
+  }
+}
+
+static PyObject *__pyx_getprop_3nes_3cpu_6cpu_op_2Op_operate(PyObject *o, CYTHON_UNUSED void *x) {
+  return __pyx_pw_3nes_3cpu_6cpu_op_2Op_7operate_1__get__(o);
+}
+
+static int __pyx_setprop_3nes_3cpu_6cpu_op_2Op_operate(PyObject *o, PyObject *v, CYTHON_UNUSED void *x) {
+  if (v) {
+    return __pyx_pw_3nes_3cpu_6cpu_op_2Op_7operate_3__set__(o, v);
+  }
+  else {
+    return __pyx_pw_3nes_3cpu_6cpu_op_2Op_7operate_5__del__(o);
+  }
+}
+
+static PyObject *__pyx_getprop_3nes_3cpu_6cpu_op_2Op_addrmode(PyObject *o, CYTHON_UNUSED void *x) {
+  return __pyx_pw_3nes_3cpu_6cpu_op_2Op_8addrmode_1__get__(o);
+}
+
+static int __pyx_setprop_3nes_3cpu_6cpu_op_2Op_addrmode(PyObject *o, PyObject *v, CYTHON_UNUSED void *x) {
+  if (v) {
+    return __pyx_pw_3nes_3cpu_6cpu_op_2Op_8addrmode_3__set__(o, v);
+  }
+  else {
+    return __pyx_pw_3nes_3cpu_6cpu_op_2Op_8addrmode_5__del__(o);
+  }
+}
+
+static PyObject *__pyx_getprop_3nes_3cpu_6cpu_op_2Op_cycles(PyObject *o, CYTHON_UNUSED void *x) {
+  return __pyx_pw_3nes_3cpu_6cpu_op_2Op_6cycles_1__get__(o);
+}
+
+static int __pyx_setprop_3nes_3cpu_6cpu_op_2Op_cycles(PyObject *o, PyObject *v, CYTHON_UNUSED void *x) {
+  if (v) {
+    return __pyx_pw_3nes_3cpu_6cpu_op_2Op_6cycles_3__set__(o, v);
+  }
+  else {
+    PyErr_SetString(PyExc_NotImplementedError, "__del__");
+    return -1;
+  }
+}
+
+static PyMethodDef __pyx_methods_3nes_3cpu_6cpu_op_Op[] = {
+  {"__reduce_cython__", (PyCFunction)(void(*)(void))(__Pyx_PyCFunction_FastCallWithKeywords)__pyx_pw_3nes_3cpu_6cpu_op_2Op_3__reduce_cython__, __Pyx_METH_FASTCALL|METH_KEYWORDS, 0},
+  {"__setstate_cython__", (PyCFunction)(void(*)(void))(__Pyx_PyCFunction_FastCallWithKeywords)__pyx_pw_3nes_3cpu_6cpu_op_2Op_5__setstate_cython__, __Pyx_METH_FASTCALL|METH_KEYWORDS, 0},
+  {0, 0, 0, 0}
+};
+
+static struct PyGetSetDef __pyx_getsets_3nes_3cpu_6cpu_op_Op[] = {
+  {"name", __pyx_getprop_3nes_3cpu_6cpu_op_2Op_name, __pyx_setprop_3nes_3cpu_6cpu_op_2Op_name, 0, 0},
+  {"operate", __pyx_getprop_3nes_3cpu_6cpu_op_2Op_operate, __pyx_setprop_3nes_3cpu_6cpu_op_2Op_operate, 0, 0},
+  {"addrmode", __pyx_getprop_3nes_3cpu_6cpu_op_2Op_addrmode, __pyx_setprop_3nes_3cpu_6cpu_op_2Op_addrmode, 0, 0},
+  {"cycles", __pyx_getprop_3nes_3cpu_6cpu_op_2Op_cycles, __pyx_setprop_3nes_3cpu_6cpu_op_2Op_cycles, 0, 0},
+  {0, 0, 0, 0, 0}
+};
+#if CYTHON_USE_TYPE_SPECS
+static PyType_Slot __pyx_type_3nes_3cpu_6cpu_op_Op_slots[] = {
+  {Py_tp_dealloc, (void *)__pyx_tp_dealloc_3nes_3cpu_6cpu_op_Op},
+  {Py_tp_doc, (void *)PyDoc_STR("\n    Opcode metadata, only used for disassembling: the CPU dispatches on the typed tables below\n    ")},
+  {Py_tp_methods, (void *)__pyx_methods_3nes_3cpu_6cpu_op_Op},
+  {Py_tp_getset, (void *)__pyx_getsets_3nes_3cpu_6cpu_op_Op},
+  {Py_tp_init, (void *)__pyx_tp_init_3nes_3cpu_6cpu_op_Op},
+  {Py_tp_new, (void *)__pyx_tp_new_3nes_3cpu_6cpu_op_Op},
+  #if (!CYTHON_COMPILING_IN_PYPY || PYPY_VERSION_NUM >= 0x07030800) && (!CYTHON_COMPILING_IN_LIMITED_API || __PYX_LIMITED_VERSION_HEX >= 0x030E0000)
+  #if CYTHON_VECTORCALL_TPNEW
+  {Py_tp_vectorcall, (void *)__pyx_tp_vectorcall_3nes_3cpu_6cpu_op_Op},
+  #endif
+  #endif
+  {0, 0},
+};
+static PyType_Spec __pyx_type_3nes_3cpu_6cpu_op_Op_spec = {
+  "nes.cpu.cpu_op.Op",
+  sizeof(struct __pyx_obj_3nes_3cpu_6cpu_op_Op),
+  0,
+  Py_TPFLAGS_DEFAULT|Py_TPFLAGS_HAVE_VERSION_TAG|Py_TPFLAGS_BASETYPE,
+  __pyx_type_3nes_3cpu_6cpu_op_Op_slots,
+};
+#else
+
+static PyTypeObject __pyx_type_3nes_3cpu_6cpu_op_Op = {
+  PyVarObject_HEAD_INIT(0, 0)
+  "nes.cpu.cpu_op.""Op", /*tp_name*/
+  sizeof(struct __pyx_obj_3nes_3cpu_6cpu_op_Op), /*tp_basicsize*/
+  0, /*tp_itemsize*/
+  __pyx_tp_dealloc_3nes_3cpu_6cpu_op_Op, /*tp_dealloc*/
+  0, /*tp_vectorcall_offset*/
+  0, /*tp_getattr*/
+  0, /*tp_setattr*/
+  0, /*tp_as_async*/
+  0, /*tp_repr*/
+  0, /*tp_as_number*/
+  0, /*tp_as_sequence*/
+  0, /*tp_as_mapping*/
+  0, /*tp_hash*/
+  0, /*tp_call*/
+  0, /*tp_str*/
+  0, /*tp_getattro*/
+  0, /*tp_setattro*/
+  0, /*tp_as_buffer*/
+  Py_TPFLAGS_DEFAULT|Py_TPFLAGS_HAVE_VERSION_TAG|Py_TPFLAGS_BASETYPE, /*tp_flags*/
+  PyDoc_STR("\n    Opcode metadata, only used for disassembling: the CPU dispatches on the typed tables below\n    "), /*tp_doc*/
+  0, /*tp_traverse*/
+  0, /*tp_clear*/
+  0, /*tp_richcompare*/
+  0, /*tp_weaklistoffset*/
+  0, /*tp_iter*/
+  0, /*tp_iternext*/
+  __pyx_methods_3nes_3cpu_6cpu_op_Op, /*tp_methods*/
+  0, /*tp_members*/
+  __pyx_getsets_3nes_3cpu_6cpu_op_Op, /*tp_getset*/
+  0, /*tp_base*/
+  0, /*tp_dict*/
+  0, /*tp_descr_get*/
+  0, /*tp_descr_set*/
+  #if !CYTHON_USE_TYPE_SPECS
+  0, /*tp_dictoffset*/
+  #endif
+  __pyx_tp_init_3nes_3cpu_6cpu_op_Op, /*tp_init*/
+  0, /*tp_alloc*/
+  __pyx_tp_new_3nes_3cpu_6cpu_op_Op, /*tp_new*/
+  0, /*tp_free*/
+  0, /*tp_is_gc*/
+  0, /*tp_bases*/
+  0, /*tp_mro*/
+  0, /*tp_cache*/
+  0, /*tp_subclasses*/
+  0, /*tp_weaklist*/
+  0, /*tp_del*/
+  0, /*tp_version_tag*/
+  #if CYTHON_USE_TP_FINALIZE
+  0, /*tp_finalize*/
+  #else
+  NULL, /*tp_finalize*/
+  #endif
+  #if (!CYTHON_COMPILING_IN_PYPY || PYPY_VERSION_NUM >= 0x07030800) && (!CYTHON_COMPILING_IN_LIMITED_API || __PYX_LIMITED_VERSION_HEX >= 0x030E0000)
+  #if CYTHON_VECTORCALL_TPNEW
+  __pyx_tp_vectorcall_3nes_3cpu_6cpu_op_Op, /*tp_vectorcall*/
+  #else
+  NULL, /*tp_vectorcall*/
+  #endif
+  #endif
+  #if __PYX_NEED_TP_PRINT_SLOT == 1
+  0, /*tp_print*/
+  #endif
+  #if PY_VERSION_HEX >= 0x030C0000
+  0, /*tp_watched*/
+  #endif
+  #if PY_VERSION_HEX >= 0x030d00A4
+  0, /*tp_versions_used*/
+  #endif
+  #if CYTHON_COMPILING_IN_PYPY && PY_VERSION_HEX < 0x030a0000
+  0, /*tp_pypy_flags*/
+  #endif
+};
+#endif
+
+static PyMethodDef __pyx_methods[] = {
+  {0, 0, 0, 0}
+};
+/* #### Code section: initfunc_declarations ### */
+static CYTHON_SMALL_CODE int __Pyx_InitCachedBuiltins(__pyx_mstatetype *__pyx_mstate); /*proto*/
+static CYTHON_SMALL_CODE int __Pyx_InitCachedConstants(__pyx_mstatetype *__pyx_mstate); /*proto*/
+static CYTHON_SMALL_CODE int __Pyx_InitGlobals(void); /*proto*/
+static CYTHON_SMALL_CODE int __Pyx_InitAfterSharedUtility(void); /*proto*/
+static CYTHON_SMALL_CODE int __Pyx_InitConstants(__pyx_mstatetype *__pyx_mstate); /*proto*/
+static CYTHON_SMALL_CODE int __Pyx_modinit_Global_init_code(__pyx_mstatetype *__pyx_mstate); /*proto*/
+static CYTHON_SMALL_CODE int __Pyx_modinit_Variable_export_code(__pyx_mstatetype *__pyx_mstate); /*proto*/
+static CYTHON_SMALL_CODE int __Pyx_modinit_Function_export_code(__pyx_mstatetype *__pyx_mstate); /*proto*/
+static CYTHON_SMALL_CODE int __Pyx_modinit_Exttype___pyx_obj_3nes_3cpu_6cpu_op_Op(__pyx_mstatetype *__pyx_mstate); /*proto*/
+static CYTHON_SMALL_CODE int __Pyx_modinit_Type_import_code(__pyx_mstatetype *__pyx_mstate); /*proto*/
+static CYTHON_SMALL_CODE int __Pyx_modinit_Variable_import_code(__pyx_mstatetype *__pyx_mstate); /*proto*/
+static CYTHON_SMALL_CODE int __Pyx_modinit_Function_import_code(__pyx_mstatetype *__pyx_mstate); /*proto*/
+static CYTHON_SMALL_CODE int __Pyx_CreateCodeObjects(__pyx_mstatetype *__pyx_mstate); /*proto*/
+/* #### Code section: init_module ### */
+
+static int __Pyx_modinit_Global_init_code(__pyx_mstatetype *__pyx_mstate) {
+  __Pyx_RefNannyDeclarations
+  CYTHON_UNUSED_VAR(__pyx_mstate);
+  __Pyx_RefNannySetupContext("__Pyx_modinit_Global_init_code", 0);
+  /*--- Global init code ---*/
+  __pyx_v_3nes_3cpu_6cpu_op_LOOKUP = ((PyObject*)Py_None); Py_INCREF(Py_None);
+  __Pyx_RefNannyFinishContext();
+  return 0;
+}
+
+static int __Pyx_modinit_Variable_export_code(__pyx_mstatetype *__pyx_mstate) {
+  __Pyx_RefNannyDeclarations
+  PyObject *__pyx_t_1 = NULL;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  CYTHON_UNUSED_VAR(__pyx_mstate);
+  __Pyx_RefNannySetupContext("__Pyx_modinit_Variable_export_code", 0);
+  /*--- Variable export code ---*/
+  {
+    __pyx_t_1 = __Pyx_ApiExport_GetApiDict(); if (unlikely(!__pyx_t_1)) __PYX_ERR(0, 1, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_1);
+    const char * __pyx_export_signature = __Pyx_PyBytes_AsString(__pyx_mstate_global->__pyx_kp_b_PyObject_uint8_t_12_uint8_t_256);
+    #if !CYTHON_ASSUME_SAFE_MACROS
+    if (unlikely(!__pyx_export_signature)) __PYX_ERR(0, 1, __pyx_L1_error)
+    #endif
+    const char * __pyx_export_name = __pyx_export_signature + 40;
+    void *const __pyx_export_pointers[] = {(void *)&__pyx_v_3nes_3cpu_6cpu_op_LOOKUP, (void *)&__pyx_v_3nes_3cpu_6cpu_op_ADDRMODE_LENGTH, (void *)&__pyx_v_3nes_3cpu_6cpu_op_OP_ADDRMODE, (void *)&__pyx_v_3nes_3cpu_6cpu_op_OP_CYCLES, (void *)&__pyx_v_3nes_3cpu_6cpu_op_OP_INSTRUCTION, (void *) NULL};
+    void *const *__pyx_export_pointer = __pyx_export_pointers;
+    const char *__pyx_export_current_signature = __pyx_export_signature;
+    while (*__pyx_export_pointer) {
+      if (__Pyx_ExportVoidPtr(__pyx_t_1, __pyx_export_name, *__pyx_export_pointer, __pyx_export_current_signature) < (0)) __PYX_ERR(0, 1, __pyx_L1_error)
+      ++__pyx_export_pointer;
+      __pyx_export_name = strchr(__pyx_export_name, '\0') + 1;
+      __pyx_export_signature = strchr(__pyx_export_signature, '\0') + 1;
+      if (*__pyx_export_signature != '\0') __pyx_export_current_signature = __pyx_export_signature;
+    }
+    __Pyx_DECREF(__pyx_t_1); __pyx_t_1 = 0;
+  }
+  __Pyx_RefNannyFinishContext();
+  return 0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_1);
+  __Pyx_RefNannyFinishContext();
+  return -1;
+}
+
+static int __Pyx_modinit_Function_export_code(__pyx_mstatetype *__pyx_mstate) {
+  __Pyx_RefNannyDeclarations
+  CYTHON_UNUSED_VAR(__pyx_mstate);
+  __Pyx_RefNannySetupContext("__Pyx_modinit_Function_export_code", 0);
+  /*--- Function export code ---*/
+  __Pyx_RefNannyFinishContext();
+  return 0;
+}
+
+static int __Pyx_modinit_Exttype___pyx_obj_3nes_3cpu_6cpu_op_Op(__pyx_mstatetype *__pyx_mstate) {
+  __Pyx_RefNannyDeclarations
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  CYTHON_UNUSED_VAR(__pyx_mstate);
+  __Pyx_RefNannySetupContext("__Pyx_modinit_Exttype___pyx_obj_3nes_3cpu_6cpu_op_Op", 0);
+  /*--- Exttype __pyx_obj_3nes_3cpu_6cpu_op_Op ---*/
+  #if CYTHON_USE_TYPE_SPECS
+  __pyx_mstate->__pyx_ptype_3nes_3cpu_6cpu_op_Op = (PyTypeObject *) __Pyx_PyType_FromModuleAndSpec(__pyx_m, &__pyx_type_3nes_3cpu_6cpu_op_Op_spec, NULL); if (unlikely(!__pyx_mstate->__pyx_ptype_3nes_3cpu_6cpu_op_Op)) __PYX_ERR(0, 1, __pyx_L1_error)
+  #else
+  __pyx_mstate->__pyx_ptype_3nes_3cpu_6cpu_op_Op = &__pyx_type_3nes_3cpu_6cpu_op_Op;
+  #endif
+  #if !CYTHON_COMPILING_IN_LIMITED_API
+  #endif
+  #if !CYTHON_USE_TYPE_SPECS
+  if (__Pyx_PyType_Ready(__pyx_mstate->__pyx_ptype_3nes_3cpu_6cpu_op_Op) < (0)) __PYX_ERR(0, 1, __pyx_L1_error)
+  #endif
+  #if CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX >= 0x030E0000
+  PyUnstable_Object_EnableDeferredRefcount((PyObject*)__pyx_mstate->__pyx_ptype_3nes_3cpu_6cpu_op_Op);
+  #endif
+  #if !CYTHON_COMPILING_IN_LIMITED_API
+  if ((CYTHON_USE_TYPE_SLOTS && CYTHON_USE_PYTYPE_LOOKUP) && likely(!__pyx_mstate->__pyx_ptype_3nes_3cpu_6cpu_op_Op->tp_dictoffset && __pyx_mstate->__pyx_ptype_3nes_3cpu_6cpu_op_Op->tp_getattro == PyObject_GenericGetAttr)) {
+    __pyx_mstate->__pyx_ptype_3nes_3cpu_6cpu_op_Op->tp_getattro = PyObject_GenericGetAttr;
+  }
+  #endif
+  if (PyObject_SetAttr(__pyx_m, __pyx_mstate_global->__pyx_n_u_Op, (PyObject *) __pyx_mstate->__pyx_ptype_3nes_3cpu_6cpu_op_Op) < (0)) __PYX_ERR(0, 1, __pyx_L1_error)
+  if (__Pyx_setup_reduce((PyObject *) __pyx_mstate->__pyx_ptype_3nes_3cpu_6cpu_op_Op) < (0)) __PYX_ERR(0, 1, __pyx_L1_error)
+  __Pyx_RefNannyFinishContext();
+  return 0;
+  __pyx_L1_error:;
+  __Pyx_RefNannyFinishContext();
+  return -1;
+}
+
+static int __Pyx_modinit_Type_import_code(__pyx_mstatetype *__pyx_mstate) {
+  __Pyx_RefNannyDeclarations
+  CYTHON_UNUSED_VAR(__pyx_mstate);
+  __Pyx_RefNannySetupContext("__Pyx_modinit_Type_import_code", 0);
+  /*--- Type import code ---*/
+  __Pyx_RefNannyFinishContext();
+  return 0;
+}
+
+static int __Pyx_modinit_Variable_import_code(__pyx_mstatetype *__pyx_mstate) {
+  __Pyx_RefNannyDeclarations
+  CYTHON_UNUSED_VAR(__pyx_mstate);
+  __Pyx_RefNannySetupContext("__Pyx_modinit_Variable_import_code", 0);
+  /*--- Variable import code ---*/
+  __Pyx_RefNannyFinishContext();
+  return 0;
+}
+
+static int __Pyx_modinit_Function_import_code(__pyx_mstatetype *__pyx_mstate) {
+  __Pyx_RefNannyDeclarations
+  CYTHON_UNUSED_VAR(__pyx_mstate);
+  __Pyx_RefNannySetupContext("__Pyx_modinit_Function_import_code", 0);
+  /*--- Function import code ---*/
+  __Pyx_RefNannyFinishContext();
+  return 0;
+}
+
+#if CYTHON_PEP489_MULTI_PHASE_INIT
+static PyObject* __pyx_pymod_create(PyObject *spec, PyModuleDef *def); /*proto*/
+static int __pyx_pymod_exec_cpu_op(PyObject* module); /*proto*/
+static PyModuleDef_Slot __pyx_moduledef_slots[] = {
+  {Py_mod_create, (void*)__pyx_pymod_create},
+  {Py_mod_exec, (void*)__pyx_pymod_exec_cpu_op},
+  #if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+  {Py_mod_gil, __Pyx_FREETHREADING_COMPATIBLE},
+  #endif
+  #if PY_VERSION_HEX >= 0x030C0000 && CYTHON_USE_MODULE_STATE
+  {Py_mod_multiple_interpreters, Py_MOD_MULTIPLE_INTERPRETERS_NOT_SUPPORTED},
+  #endif
+  {0, NULL}
+};
+#endif
+
+#ifdef __cplusplus
+namespace {
+  struct PyModuleDef __pyx_moduledef =
+  #else
+  static struct PyModuleDef __pyx_moduledef =
+  #endif
+  {
+      PyModuleDef_HEAD_INIT,
+      "cpu_op",
+      0, /* m_doc */
+    #if CYTHON_USE_MODULE_STATE
+      sizeof(__pyx_mstatetype), /* m_size */
+    #else
+      (CYTHON_PEP489_MULTI_PHASE_INIT) ? 0 : -1, /* m_size */
+    #endif
+      __pyx_methods /* m_methods */,
+    #if CYTHON_PEP489_MULTI_PHASE_INIT
+      __pyx_moduledef_slots, /* m_slots */
+    #else
+      NULL, /* m_reload */
+    #endif
+    #if CYTHON_USE_MODULE_STATE
+      __pyx_m_traverse, /* m_traverse */
+      __pyx_m_clear, /* m_clear */
+      NULL /* m_free */
+    #else
+      NULL, /* m_traverse */
+      NULL, /* m_clear */
+      NULL /* m_free */
+    #endif
+  };
+  #ifdef __cplusplus
+} /* anonymous namespace */
+#endif
+
+/* PyModInitFuncType */
+#ifndef CYTHON_NO_PYINIT_EXPORT
+  #define __Pyx_PyMODINIT_FUNC PyMODINIT_FUNC
+#else
+  #ifdef __cplusplus
+  #define __Pyx_PyMODINIT_FUNC extern "C" PyObject *
+  #else
+  #define __Pyx_PyMODINIT_FUNC PyObject *
+  #endif
+#endif
+
+__Pyx_PyMODINIT_FUNC PyInit_cpu_op(void) CYTHON_SMALL_CODE; /*proto*/
+__Pyx_PyMODINIT_FUNC PyInit_cpu_op(void)
+#if CYTHON_PEP489_MULTI_PHASE_INIT
+{
+  return PyModuleDef_Init(&__pyx_moduledef);
+}
+/* ModuleCreationPEP489 */
+#if CYTHON_COMPILING_IN_LIMITED_API && (__PYX_LIMITED_VERSION_HEX < 0x030A0000 &&\
+      (defined(_WIN32) || defined(WIN32) || defined(MS_WINDOWS)))
+static PY_INT64_T __Pyx_GetCurrentInterpreterId(void) {
+    {
+        PyObject *module = PyImport_ImportModule("_interpreters"); // 3.13+ I think
+        if (!module) {
+            if (!PyErr_ExceptionMatches(PyExc_Exception)) {
+                goto bad; // BaseException
+            }
+            PyErr_Clear(); // just try the 3.8-3.12 version
+            module = PyImport_ImportModule("_xxsubinterpreters");
+            if (!module) goto bad;
+        }
+        PyObject *current = PyObject_CallMethod(module, "get_current", NULL);
+        Py_DECREF(module);
+        if (!current) goto bad;
+        if (PyTuple_Check(current)) {
+            PyObject *new_current = PySequence_GetItem(current, 0);
+            Py_DECREF(current);
+            current = new_current;
+            if (!new_current) goto bad;
+        }
+        long long as_c_int = PyLong_AsLongLong(current);
+        Py_DECREF(current);
+        return as_c_int;
+    }
+  bad:
+    PySys_WriteStderr("__Pyx_GetCurrentInterpreterId failed. Try setting the C define CYTHON_PEP489_MULTI_PHASE_INIT=0\n");
+    return -1;
+}
+#endif
+#if !CYTHON_USE_MODULE_STATE
+static CYTHON_SMALL_CODE int __Pyx_check_single_interpreter(void) {
+    static PY_INT64_T main_interpreter_id = -1;
+#if CYTHON_COMPILING_IN_GRAAL && defined(GRAALPY_VERSION_NUM) && GRAALPY_VERSION_NUM > 0x19000000
+    PY_INT64_T current_id = GraalPyInterpreterState_GetIDFromThreadState(PyThreadState_Get());
+#elif CYTHON_COMPILING_IN_GRAAL
+    PY_INT64_T current_id = PyInterpreterState_GetIDFromThreadState(PyThreadState_Get());
+#elif CYTHON_COMPILING_IN_LIMITED_API && (__PYX_LIMITED_VERSION_HEX < 0x030A0000 &&\
+      (defined(_WIN32) || defined(WIN32) || defined(MS_WINDOWS)))
+    PY_INT64_T current_id = __Pyx_GetCurrentInterpreterId();
+#elif CYTHON_COMPILING_IN_LIMITED_API
+    PY_INT64_T current_id = PyInterpreterState_GetID(PyInterpreterState_Get());
+#else
+    PY_INT64_T current_id = PyInterpreterState_GetID(PyThreadState_Get()->interp);
+#endif
+    if (unlikely(current_id == -1)) {
+        return -1;
+    }
+    if (main_interpreter_id == -1) {
+        main_interpreter_id = current_id;
+        return 0;
+    } else if (unlikely(main_interpreter_id != current_id)) {
+        PyErr_SetString(
+            PyExc_ImportError,
+            "Interpreter change detected - this module can only be loaded into one interpreter per process.");
+        return -1;
+    }
+    return 0;
+}
+#endif
+static CYTHON_SMALL_CODE int __Pyx_copy_spec_to_module(PyObject *spec, PyObject *moddict, const char* from_name, const char* to_name, int allow_none)
+{
+    PyObject *value = PyObject_GetAttrString(spec, from_name);
+    int result = 0;
+    if (likely(value)) {
+        if (allow_none || value != Py_None) {
+            result = PyDict_SetItemString(moddict, to_name, value);
+        }
+        Py_DECREF(value);
+    } else if (PyErr_ExceptionMatches(PyExc_AttributeError)) {
+        PyErr_Clear();
+    } else {
+        result = -1;
+    }
+    return result;
+}
+static CYTHON_SMALL_CODE PyObject* __pyx_pymod_create(PyObject *spec, PyModuleDef *def) {
+    PyObject *module = NULL, *moddict, *modname;
+    CYTHON_UNUSED_VAR(def);
+    #if !CYTHON_USE_MODULE_STATE
+    if (__Pyx_check_single_interpreter())
+        return NULL;
+    #endif
+    if (__pyx_m)
+        return __Pyx_NewRef(__pyx_m);
+    modname = PyObject_GetAttrString(spec, "name");
+    if (unlikely(!modname)) goto bad;
+    module = PyModule_NewObject(modname);
+    Py_DECREF(modname);
+    if (unlikely(!module)) goto bad;
+    moddict = PyModule_GetDict(module);
+    if (unlikely(!moddict)) goto bad;
+    if (unlikely(__Pyx_copy_spec_to_module(spec, moddict, "loader", "__loader__", 1) < 0)) goto bad;
+    if (unlikely(__Pyx_copy_spec_to_module(spec, moddict, "origin", "__file__", 1) < 0)) goto bad;
+    if (unlikely(__Pyx_copy_spec_to_module(spec, moddict, "parent", "__package__", 1) < 0)) goto bad;
+    if (unlikely(__Pyx_copy_spec_to_module(spec, moddict, "submodule_search_locations", "__path__", 0) < 0)) goto bad;
+    return module;
+bad:
+    Py_XDECREF(module);
+    return NULL;
+}
+
+
+static CYTHON_SMALL_CODE int __pyx_pymod_exec_cpu_op(PyObject *__pyx_pyinit_module)
+#endif
+{
+  int stringtab_initialized = 0;
+  #if CYTHON_USE_MODULE_STATE
+  int pystate_addmodule_run = 0;
+  #endif
+  __pyx_mstatetype *__pyx_mstate = NULL;
+  PyObject *__pyx_t_1 = NULL;
+  PyObject *__pyx_t_2 = NULL;
+  PyObject *__pyx_t_3 = NULL;
+  PyObject *__pyx_t_4 = NULL;
+  PyObject *__pyx_t_5 = NULL;
+  PyObject *__pyx_t_6 = NULL;
+  PyObject *__pyx_t_7 = NULL;
+  PyObject *__pyx_t_8 = NULL;
+  PyObject *__pyx_t_9 = NULL;
+  PyObject *__pyx_t_10 = NULL;
+  PyObject *__pyx_t_11 = NULL;
+  PyObject *__pyx_t_12 = NULL;
+  PyObject *__pyx_t_13 = NULL;
+  PyObject *__pyx_t_14 = NULL;
+  PyObject *__pyx_t_15 = NULL;
+  PyObject *__pyx_t_16 = NULL;
+  PyObject *__pyx_t_17 = NULL;
+  PyObject *__pyx_t_18 = NULL;
+  PyObject *__pyx_t_19 = NULL;
+  PyObject *__pyx_t_20 = NULL;
+  PyObject *__pyx_t_21 = NULL;
+  PyObject *__pyx_t_22 = NULL;
+  PyObject *__pyx_t_23 = NULL;
+  PyObject *__pyx_t_24 = NULL;
+  PyObject *__pyx_t_25 = NULL;
+  PyObject *__pyx_t_26 = NULL;
+  PyObject *__pyx_t_27 = NULL;
+  PyObject *__pyx_t_28 = NULL;
+  PyObject *__pyx_t_29 = NULL;
+  PyObject *__pyx_t_30 = NULL;
+  PyObject *__pyx_t_31 = NULL;
+  PyObject *__pyx_t_32 = NULL;
+  PyObject *__pyx_t_33 = NULL;
+  PyObject *__pyx_t_34 = NULL;
+  PyObject *__pyx_t_35 = NULL;
+  PyObject *__pyx_t_36 = NULL;
+  PyObject *__pyx_t_37 = NULL;
+  PyObject *__pyx_t_38 = NULL;
+  PyObject *__pyx_t_39 = NULL;
+  PyObject *__pyx_t_40 = NULL;
+  PyObject *__pyx_t_41 = NULL;
+  PyObject *__pyx_t_42 = NULL;
+  PyObject *__pyx_t_43 = NULL;
+  PyObject *__pyx_t_44 = NULL;
+  PyObject *__pyx_t_45 = NULL;
+  PyObject *__pyx_t_46 = NULL;
+  PyObject *__pyx_t_47 = NULL;
+  PyObject *__pyx_t_48 = NULL;
+  PyObject *__pyx_t_49 = NULL;
+  PyObject *__pyx_t_50 = NULL;
+  PyObject *__pyx_t_51 = NULL;
+  PyObject *__pyx_t_52 = NULL;
+  PyObject *__pyx_t_53 = NULL;
+  PyObject *__pyx_t_54 = NULL;
+  PyObject *__pyx_t_55 = NULL;
+  PyObject *__pyx_t_56 = NULL;
+  PyObject *__pyx_t_57 = NULL;
+  PyObject *__pyx_t_58 = NULL;
+  PyObject *__pyx_t_59 = NULL;
+  PyObject *__pyx_t_60 = NULL;
+  PyObject *__pyx_t_61 = NULL;
+  PyObject *__pyx_t_62 = NULL;
+  PyObject *__pyx_t_63 = NULL;
+  PyObject *__pyx_t_64 = NULL;
+  PyObject *__pyx_t_65 = NULL;
+  PyObject *__pyx_t_66 = NULL;
+  PyObject *__pyx_t_67 = NULL;
+  PyObject *__pyx_t_68 = NULL;
+  PyObject *__pyx_t_69 = NULL;
+  PyObject *__pyx_t_70 = NULL;
+  PyObject *__pyx_t_71 = NULL;
+  PyObject *__pyx_t_72 = NULL;
+  PyObject *__pyx_t_73 = NULL;
+  PyObject *__pyx_t_74 = NULL;
+  PyObject *__pyx_t_75 = NULL;
+  PyObject *__pyx_t_76 = NULL;
+  PyObject *__pyx_t_77 = NULL;
+  PyObject *__pyx_t_78 = NULL;
+  PyObject *__pyx_t_79 = NULL;
+  PyObject *__pyx_t_80 = NULL;
+  PyObject *__pyx_t_81 = NULL;
+  PyObject *__pyx_t_82 = NULL;
+  PyObject *__pyx_t_83 = NULL;
+  PyObject *__pyx_t_84 = NULL;
+  PyObject *__pyx_t_85 = NULL;
+  PyObject *__pyx_t_86 = NULL;
+  PyObject *__pyx_t_87 = NULL;
+  PyObject *__pyx_t_88 = NULL;
+  PyObject *__pyx_t_89 = NULL;
+  PyObject *__pyx_t_90 = NULL;
+  PyObject *__pyx_t_91 = NULL;
+  PyObject *__pyx_t_92 = NULL;
+  PyObject *__pyx_t_93 = NULL;
+  PyObject *__pyx_t_94 = NULL;
+  PyObject *__pyx_t_95 = NULL;
+  PyObject *__pyx_t_96 = NULL;
+  PyObject *__pyx_t_97 = NULL;
+  PyObject *__pyx_t_98 = NULL;
+  PyObject *__pyx_t_99 = NULL;
+  PyObject *__pyx_t_100 = NULL;
+  PyObject *__pyx_t_101 = NULL;
+  PyObject *__pyx_t_102 = NULL;
+  PyObject *__pyx_t_103 = NULL;
+  PyObject *__pyx_t_104 = NULL;
+  PyObject *__pyx_t_105 = NULL;
+  PyObject *__pyx_t_106 = NULL;
+  PyObject *__pyx_t_107 = NULL;
+  PyObject *__pyx_t_108 = NULL;
+  PyObject *__pyx_t_109 = NULL;
+  PyObject *__pyx_t_110 = NULL;
+  PyObject *__pyx_t_111 = NULL;
+  PyObject *__pyx_t_112 = NULL;
+  PyObject *__pyx_t_113 = NULL;
+  PyObject *__pyx_t_114 = NULL;
+  PyObject *__pyx_t_115 = NULL;
+  PyObject *__pyx_t_116 = NULL;
+  PyObject *__pyx_t_117 = NULL;
+  PyObject *__pyx_t_118 = NULL;
+  PyObject *__pyx_t_119 = NULL;
+  PyObject *__pyx_t_120 = NULL;
+  PyObject *__pyx_t_121 = NULL;
+  PyObject *__pyx_t_122 = NULL;
+  PyObject *__pyx_t_123 = NULL;
+  PyObject *__pyx_t_124 = NULL;
+  PyObject *__pyx_t_125 = NULL;
+  PyObject *__pyx_t_126 = NULL;
+  PyObject *__pyx_t_127 = NULL;
+  PyObject *__pyx_t_128 = NULL;
+  PyObject *__pyx_t_129 = NULL;
+  PyObject *__pyx_t_130 = NULL;
+  PyObject *__pyx_t_131 = NULL;
+  PyObject *__pyx_t_132 = NULL;
+  PyObject *__pyx_t_133 = NULL;
+  PyObject *__pyx_t_134 = NULL;
+  PyObject *__pyx_t_135 = NULL;
+  PyObject *__pyx_t_136 = NULL;
+  PyObject *__pyx_t_137 = NULL;
+  PyObject *__pyx_t_138 = NULL;
+  PyObject *__pyx_t_139 = NULL;
+  PyObject *__pyx_t_140 = NULL;
+  PyObject *__pyx_t_141 = NULL;
+  PyObject *__pyx_t_142 = NULL;
+  PyObject *__pyx_t_143 = NULL;
+  PyObject *__pyx_t_144 = NULL;
+  PyObject *__pyx_t_145 = NULL;
+  PyObject *__pyx_t_146 = NULL;
+  PyObject *__pyx_t_147 = NULL;
+  PyObject *__pyx_t_148 = NULL;
+  PyObject *__pyx_t_149 = NULL;
+  PyObject *__pyx_t_150 = NULL;
+  PyObject *__pyx_t_151 = NULL;
+  PyObject *__pyx_t_152 = NULL;
+  PyObject *__pyx_t_153 = NULL;
+  PyObject *__pyx_t_154 = NULL;
+  PyObject *__pyx_t_155 = NULL;
+  PyObject *__pyx_t_156 = NULL;
+  PyObject *__pyx_t_157 = NULL;
+  PyObject *__pyx_t_158 = NULL;
+  PyObject *__pyx_t_159 = NULL;
+  PyObject *__pyx_t_160 = NULL;
+  PyObject *__pyx_t_161 = NULL;
+  PyObject *__pyx_t_162 = NULL;
+  PyObject *__pyx_t_163 = NULL;
+  PyObject *__pyx_t_164 = NULL;
+  PyObject *__pyx_t_165 = NULL;
+  PyObject *__pyx_t_166 = NULL;
+  PyObject *__pyx_t_167 = NULL;
+  PyObject *__pyx_t_168 = NULL;
+  PyObject *__pyx_t_169 = NULL;
+  PyObject *__pyx_t_170 = NULL;
+  PyObject *__pyx_t_171 = NULL;
+  PyObject *__pyx_t_172 = NULL;
+  PyObject *__pyx_t_173 = NULL;
+  PyObject *__pyx_t_174 = NULL;
+  PyObject *__pyx_t_175 = NULL;
+  PyObject *__pyx_t_176 = NULL;
+  PyObject *__pyx_t_177 = NULL;
+  PyObject *__pyx_t_178 = NULL;
+  PyObject *__pyx_t_179 = NULL;
+  PyObject *__pyx_t_180 = NULL;
+  PyObject *__pyx_t_181 = NULL;
+  PyObject *__pyx_t_182 = NULL;
+  PyObject *__pyx_t_183 = NULL;
+  PyObject *__pyx_t_184 = NULL;
+  PyObject *__pyx_t_185 = NULL;
+  PyObject *__pyx_t_186 = NULL;
+  PyObject *__pyx_t_187 = NULL;
+  PyObject *__pyx_t_188 = NULL;
+  PyObject *__pyx_t_189 = NULL;
+  PyObject *__pyx_t_190 = NULL;
+  PyObject *__pyx_t_191 = NULL;
+  PyObject *__pyx_t_192 = NULL;
+  PyObject *__pyx_t_193 = NULL;
+  PyObject *__pyx_t_194 = NULL;
+  PyObject *__pyx_t_195 = NULL;
+  PyObject *__pyx_t_196 = NULL;
+  PyObject *__pyx_t_197 = NULL;
+  PyObject *__pyx_t_198 = NULL;
+  PyObject *__pyx_t_199 = NULL;
+  PyObject *__pyx_t_200 = NULL;
+  PyObject *__pyx_t_201 = NULL;
+  PyObject *__pyx_t_202 = NULL;
+  PyObject *__pyx_t_203 = NULL;
+  PyObject *__pyx_t_204 = NULL;
+  PyObject *__pyx_t_205 = NULL;
+  PyObject *__pyx_t_206 = NULL;
+  PyObject *__pyx_t_207 = NULL;
+  PyObject *__pyx_t_208 = NULL;
+  PyObject *__pyx_t_209 = NULL;
+  PyObject *__pyx_t_210 = NULL;
+  PyObject *__pyx_t_211 = NULL;
+  PyObject *__pyx_t_212 = NULL;
+  PyObject *__pyx_t_213 = NULL;
+  PyObject *__pyx_t_214 = NULL;
+  PyObject *__pyx_t_215 = NULL;
+  PyObject *__pyx_t_216 = NULL;
+  PyObject *__pyx_t_217 = NULL;
+  PyObject *__pyx_t_218 = NULL;
+  PyObject *__pyx_t_219 = NULL;
+  PyObject *__pyx_t_220 = NULL;
+  PyObject *__pyx_t_221 = NULL;
+  PyObject *__pyx_t_222 = NULL;
+  PyObject *__pyx_t_223 = NULL;
+  PyObject *__pyx_t_224 = NULL;
+  PyObject *__pyx_t_225 = NULL;
+  PyObject *__pyx_t_226 = NULL;
+  PyObject *__pyx_t_227 = NULL;
+  PyObject *__pyx_t_228 = NULL;
+  PyObject *__pyx_t_229 = NULL;
+  PyObject *__pyx_t_230 = NULL;
+  PyObject *__pyx_t_231 = NULL;
+  PyObject *__pyx_t_232 = NULL;
+  PyObject *__pyx_t_233 = NULL;
+  PyObject *__pyx_t_234 = NULL;
+  PyObject *__pyx_t_235 = NULL;
+  PyObject *__pyx_t_236 = NULL;
+  PyObject *__pyx_t_237 = NULL;
+  PyObject *__pyx_t_238 = NULL;
+  PyObject *__pyx_t_239 = NULL;
+  PyObject *__pyx_t_240 = NULL;
+  PyObject *__pyx_t_241 = NULL;
+  PyObject *__pyx_t_242 = NULL;
+  PyObject *__pyx_t_243 = NULL;
+  PyObject *__pyx_t_244 = NULL;
+  PyObject *__pyx_t_245 = NULL;
+  PyObject *__pyx_t_246 = NULL;
+  PyObject *__pyx_t_247 = NULL;
+  PyObject *__pyx_t_248 = NULL;
+  PyObject *__pyx_t_249 = NULL;
+  PyObject *__pyx_t_250 = NULL;
+  PyObject *__pyx_t_251 = NULL;
+  PyObject *__pyx_t_252 = NULL;
+  PyObject *__pyx_t_253 = NULL;
+  PyObject *__pyx_t_254 = NULL;
+  PyObject *__pyx_t_255 = NULL;
+  PyObject *__pyx_t_256 = NULL;
+  PyObject *__pyx_t_257 = NULL;
+  PyObject *__pyx_t_258 = NULL;
+  Py_ssize_t __pyx_t_259;
+  PyObject *(*__pyx_t_260)(PyObject *);
+  uint8_t __pyx_t_261;
+  Py_ssize_t __pyx_t_262;
+  size_t __pyx_t_263;
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  __Pyx_RefNannyDeclarations
+  #if CYTHON_PEP489_MULTI_PHASE_INIT
+  if (__pyx_m) {
+    if (__pyx_m == __pyx_pyinit_module) return 0;
+    PyErr_SetString(PyExc_RuntimeError, "Module 'cpu_op' has already been imported. Re-initialisation is not supported.");
+    return -1;
+  }
+  #else
+  if (__pyx_m) return __Pyx_NewRef(__pyx_m);
+  #endif
+  /*--- Module creation code ---*/
+  #if CYTHON_PEP489_MULTI_PHASE_INIT
+  __pyx_t_1 = __pyx_pyinit_module;
+  Py_INCREF(__pyx_t_1);
+  #else
+  __pyx_t_1 = PyModule_Create(&__pyx_moduledef); if (unlikely(!__pyx_t_1)) __PYX_ERR(0, 1, __pyx_L1_error)
+  #endif
+  #if CYTHON_USE_MODULE_STATE
+  {
+    int add_module_result = __Pyx_State_AddModule(__pyx_t_1, &__pyx_moduledef);
+    __pyx_t_1 = 0; /* transfer ownership from __pyx_t_1 to "cpu_op" pseudovariable */
+    if (unlikely((add_module_result < 0))) __PYX_ERR(0, 1, __pyx_L1_error)
+    pystate_addmodule_run = 1;
+  }
+  #else
+  __pyx_m = __pyx_t_1;
+  #endif
+  #if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+  PyUnstable_Module_SetGIL(__pyx_m, Py_MOD_GIL_USED);
+  #endif
+  __pyx_mstate = __pyx_mstate_global;
+  CYTHON_UNUSED_VAR(__pyx_t_1);
+  __pyx_mstate->__pyx_d = PyModule_GetDict(__pyx_m); if (unlikely(!__pyx_mstate->__pyx_d)) __PYX_ERR(0, 1, __pyx_L1_error)
+  Py_INCREF(__pyx_mstate->__pyx_d);
+  __pyx_mstate->__pyx_b = __Pyx_PyImport_AddModuleRef(__Pyx_BUILTIN_MODULE_NAME); if (unlikely(!__pyx_mstate->__pyx_b)) __PYX_ERR(0, 1, __pyx_L1_error)
+  __pyx_mstate->__pyx_cython_runtime = __Pyx_PyImport_AddModuleRef("cython_runtime"); if (unlikely(!__pyx_mstate->__pyx_cython_runtime)) __PYX_ERR(0, 1, __pyx_L1_error)
+  if (PyObject_SetAttrString(__pyx_m, "__builtins__", __pyx_mstate->__pyx_b) < 0) __PYX_ERR(0, 1, __pyx_L1_error)
+  /* ImportRefnannyAPI */
+  #if CYTHON_REFNANNY
+  __Pyx_RefNanny = __Pyx_RefNannyImportAPI("refnanny");
+  if (!__Pyx_RefNanny) {
+    if (PyErr_ExceptionMatches(PyExc_Exception)) {
+      PyErr_Clear();
+      __Pyx_RefNanny = __Pyx_RefNannyImportAPI("Cython.Runtime.refnanny");
+    }
+    if (!__Pyx_RefNanny)
+        Py_FatalError("failed to import 'refnanny' module");
+  }
+  #endif
+  
+__Pyx_RefNannySetupContext("PyInit_cpu_op", 0);
+  __Pyx_init_runtime_version();
+  if (__Pyx_check_binary_version(__PYX_LIMITED_VERSION_HEX, __Pyx_get_runtime_version(), CYTHON_COMPILING_IN_LIMITED_API) < (0)) __PYX_ERR(0, 1, __pyx_L1_error)
+  __pyx_mstate->__pyx_empty_tuple = PyTuple_New(0); if (unlikely(!__pyx_mstate->__pyx_empty_tuple)) __PYX_ERR(0, 1, __pyx_L1_error)
+  __pyx_mstate->__pyx_empty_bytes = PyBytes_FromStringAndSize("", 0); if (unlikely(!__pyx_mstate->__pyx_empty_bytes)) __PYX_ERR(0, 1, __pyx_L1_error)
+  __pyx_mstate->__pyx_empty_unicode = PyUnicode_FromStringAndSize("", 0); if (unlikely(!__pyx_mstate->__pyx_empty_unicode)) __PYX_ERR(0, 1, __pyx_L1_error)
+  /*--- Library function declarations ---*/
+  /*--- Initialize various global constants etc. ---*/
+  if (__Pyx_InitConstants(__pyx_mstate) < (0)) __PYX_ERR(0, 1, __pyx_L1_error)
+  stringtab_initialized = 1;
+  if (__Pyx_InitGlobals() < (0)) __PYX_ERR(0, 1, __pyx_L1_error)
+  if (__pyx_module_is_main_nes__cpu__cpu_op) {
+    if (PyObject_SetAttr(__pyx_m, __pyx_mstate_global->__pyx_n_u_name_2, __pyx_mstate_global->__pyx_n_u_main) < (0)) __PYX_ERR(0, 1, __pyx_L1_error)
+  }
+  {
+    PyObject *modules = PyImport_GetModuleDict(); if (unlikely(!modules)) __PYX_ERR(0, 1, __pyx_L1_error)
+    if (!PyDict_GetItemString(modules, "nes.cpu.cpu_op")) {
+      if (unlikely((PyDict_SetItemString(modules, "nes.cpu.cpu_op", __pyx_m) < 0))) __PYX_ERR(0, 1, __pyx_L1_error)
+    }
+  }
+  /*--- Builtin init code ---*/
+  if (__Pyx_InitCachedBuiltins(__pyx_mstate) < (0)) __PYX_ERR(0, 1, __pyx_L1_error)
+  /*--- Constants init code ---*/
+  if (__Pyx_InitCachedConstants(__pyx_mstate) < (0)) __PYX_ERR(0, 1, __pyx_L1_error)
+  if (__Pyx_CreateCodeObjects(__pyx_mstate) < (0)) __PYX_ERR(0, 1, __pyx_L1_error)
+  /*--- Global type/function init code ---*/
+  (void)__Pyx_modinit_Global_init_code(__pyx_mstate);
+  if (unlikely((__Pyx_modinit_Variable_export_code(__pyx_mstate) < 0))) __PYX_ERR(0, 1, __pyx_L1_error)
+  (void)__Pyx_modinit_Function_export_code(__pyx_mstate);
+  /*--- Type init code ---*/
+  if (unlikely((__Pyx_modinit_Exttype___pyx_obj_3nes_3cpu_6cpu_op_Op(__pyx_mstate) < 0))) __PYX_ERR(0, 1, __pyx_L1_error)
+  (void)__Pyx_modinit_Type_import_code(__pyx_mstate);
+  (void)__Pyx_modinit_Variable_import_code(__pyx_mstate);
+  (void)__Pyx_modinit_Function_import_code(__pyx_mstate);
+  if (__Pyx_InitAfterSharedUtility() < (0)) __PYX_ERR(0, 1, __pyx_L1_error)
+  /*--- Execution code ---*/
+
+  /* "(tree fragment)":1
+ * def __reduce_cython__(self):             # <<<<<<<<<<<<<<
+ *     cdef tuple state
+ *     cdef object _dict
+*/
+  __pyx_t_2 = __Pyx_CyFunction_New(&__pyx_mdef_3nes_3cpu_6cpu_op_2Op_3__reduce_cython__, __Pyx_CYFUNCTION_CCLASS, __pyx_mstate_global->__pyx_n_u_Op___reduce_cython, NULL, __pyx_mstate_global->__pyx_n_u_nes_cpu_cpu_op, __pyx_mstate_global->__pyx_d, ((PyObject *)__pyx_mstate_global->__pyx_codeobj_tab[0])); if (unlikely(!__pyx_t_2)) __PYX_ERR(2, 1, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_2);
+  #if CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX >= 0x030E0000
+  PyUnstable_Object_EnableDeferredRefcount(__pyx_t_2);
+  #endif
+  if (__Pyx_SetItemOnTypeDict(__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op, __pyx_mstate_global->__pyx_n_u_reduce_cython, __pyx_t_2) < (0)) __PYX_ERR(2, 1, __pyx_L1_error)
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+
+  /* "(tree fragment)":17
+ *     else:
+ *         return __pyx_unpickle_Op, (type(self), 0x8918c1b, state)
+ * def __setstate_cython__(self, __pyx_state):             # <<<<<<<<<<<<<<
+ *     __pyx_unpickle_Op__set_state(self, __pyx_state)
+*/
+  __pyx_t_2 = __Pyx_CyFunction_New(&__pyx_mdef_3nes_3cpu_6cpu_op_2Op_5__setstate_cython__, __Pyx_CYFUNCTION_CCLASS, __pyx_mstate_global->__pyx_n_u_Op___setstate_cython, NULL, __pyx_mstate_global->__pyx_n_u_nes_cpu_cpu_op, __pyx_mstate_global->__pyx_d, ((PyObject *)__pyx_mstate_global->__pyx_codeobj_tab[1])); if (unlikely(!__pyx_t_2)) __PYX_ERR(2, 17, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_2);
+  #if CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX >= 0x030E0000
+  PyUnstable_Object_EnableDeferredRefcount(__pyx_t_2);
+  #endif
+  if (__Pyx_SetItemOnTypeDict(__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op, __pyx_mstate_global->__pyx_n_u_setstate_cython, __pyx_t_2) < (0)) __PYX_ERR(2, 17, __pyx_L1_error)
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+
+  /* "nes/cpu/cpu_op.pyx":12
+ * 
+ * # names in the same order as the AddressingMode / Instruction enums
+ * ADDRMODES = [ "IMP", "IMM", "ZP0", "ZPX", "ZPY", "REL", "ABS", "ABX", "ABY", "IND", "IZX", "IZY" ]             # <<<<<<<<<<<<<<
+ * INSTRUCTIONS = [
+ *     "ADC", "SBC", "AND", "ASL", "BCC", "BCS", "BEQ", "BIT", "BMI", "BNE", "BPL", "BRK", "BVC", "BVS", "CLC", "CLD",
+*/
+  {
+    PyObject* __pyx_temp[12] = {__pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_n_u_IMM, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_n_u_ZPY, __pyx_mstate_global->__pyx_n_u_REL, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_n_u_ABY, __pyx_mstate_global->__pyx_n_u_IND, __pyx_mstate_global->__pyx_n_u_IZX, __pyx_mstate_global->__pyx_n_u_IZY};
+    __pyx_t_2 = __Pyx_PyList_FromArray(__pyx_temp, 12); if (unlikely(!__pyx_t_2)) __PYX_ERR(0, 12, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_2);
+  }
+  if (PyDict_SetItem(__pyx_mstate_global->__pyx_d, __pyx_mstate_global->__pyx_n_u_ADDRMODES, __pyx_t_2) < (0)) __PYX_ERR(0, 12, __pyx_L1_error)
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+
+  /* "nes/cpu/cpu_op.pyx":13
+ * # names in the same order as the AddressingMode / Instruction enums
+ * ADDRMODES = [ "IMP", "IMM", "ZP0", "ZPX", "ZPY", "REL", "ABS", "ABX", "ABY", "IND", "IZX", "IZY" ]
+ * INSTRUCTIONS = [             # <<<<<<<<<<<<<<
+ *     "ADC", "SBC", "AND", "ASL", "BCC", "BCS", "BEQ", "BIT", "BMI", "BNE", "BPL", "BRK", "BVC", "BVS", "CLC", "CLD",
+ *     "CLI", "CLV", "CMP", "CPX", "CPY", "DEC", "DEX", "DEY", "EOR", "INC", "INX", "INY", "JMP", "JSR", "LDA", "LDX",
+*/
+  {
+    PyObject* __pyx_temp[57] = {__pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_ASL, __pyx_mstate_global->__pyx_n_u_BCC, __pyx_mstate_global->__pyx_n_u_BCS, __pyx_mstate_global->__pyx_n_u_BEQ, __pyx_mstate_global->__pyx_n_u_BIT, __pyx_mstate_global->__pyx_n_u_BMI, __pyx_mstate_global->__pyx_n_u_BNE, __pyx_mstate_global->__pyx_n_u_BPL, __pyx_mstate_global->__pyx_n_u_BRK, __pyx_mstate_global->__pyx_n_u_BVC, __pyx_mstate_global->__pyx_n_u_BVS, __pyx_mstate_global->__pyx_n_u_CLC, __pyx_mstate_global->__pyx_n_u_CLD, __pyx_mstate_global->__pyx_n_u_CLI, __pyx_mstate_global->__pyx_n_u_CLV, __pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_CPX, __pyx_mstate_global->__pyx_n_u_CPY, __pyx_mstate_global->__pyx_n_u_DEC, __pyx_mstate_global->__pyx_n_u_DEX, __pyx_mstate_global->__pyx_n_u_DEY, __pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_INC, __pyx_mstate_global->__pyx_n_u_INX, __pyx_mstate_global->__pyx_n_u_INY, __pyx_mstate_global->__pyx_n_u_JMP, __pyx_mstate_global->__pyx_n_u_JSR, __pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_LDX, __pyx_mstate_global->__pyx_n_u_LDY, __pyx_mstate_global->__pyx_n_u_LSR, __pyx_mstate_global->__pyx_n_u_NOP, __pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_PHA, __pyx_mstate_global->__pyx_n_u_PHP, __pyx_mstate_global->__pyx_n_u_PLA, __pyx_mstate_global->__pyx_n_u_PLP, __pyx_mstate_global->__pyx_n_u_ROL, __pyx_mstate_global->__pyx_n_u_ROR, __pyx_mstate_global->__pyx_n_u_RTI, __pyx_mstate_global->__pyx_n_u_RTS, __pyx_mstate_global->__pyx_n_u_SEC, __pyx_mstate_global->__pyx_n_u_SED, __pyx_mstate_global->__pyx_n_u_SEI, __pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_STX, __pyx_mstate_global->__pyx_n_u_STY, __pyx_mstate_global->__pyx_n_u_TAX, __pyx_mstate_global->__pyx_n_u_TAY, __pyx_mstate_global->__pyx_n_u_TSX, __pyx_mstate_global->__pyx_n_u_TXA, __pyx_mstate_global->__pyx_n_u_TXS, __pyx_mstate_global->__pyx_n_u_TYA, __pyx_mstate_global->__pyx_n_u_XXX};
+    __pyx_t_2 = __Pyx_PyList_FromArray(__pyx_temp, 57); if (unlikely(!__pyx_t_2)) __PYX_ERR(0, 13, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_2);
+  }
+  if (PyDict_SetItem(__pyx_mstate_global->__pyx_d, __pyx_mstate_global->__pyx_n_u_INSTRUCTIONS, __pyx_t_2) < (0)) __PYX_ERR(0, 13, __pyx_L1_error)
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+
+  /* "nes/cpu/cpu_op.pyx":21
+ * 
+ * LOOKUP = [
+ *     Op( "BRK", "BRK", "IMM", 7 ),Op( "ORA", "ORA", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ORA", "ORA", "ZP0", 3 ),Op( "ASL", "ASL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHP", "PHP", "IMP", 3 ),Op( "ORA", "ORA", "IMM", 2 ),Op( "ASL", "ASL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABS", 4 ),Op( "ASL", "ASL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),             # <<<<<<<<<<<<<<
+ *     Op( "BPL", "BPL", "REL", 2 ),Op( "ORA", "ORA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ZPX", 4 ),Op( "ASL", "ASL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLC", "CLC", "IMP", 2 ),Op( "ORA", "ORA", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABX", 4 ),Op( "ASL", "ASL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "JSR", "JSR", "ABS", 6 ),Op( "AND", "AND", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "BIT", "BIT", "ZP0", 3 ),Op( "AND", "AND", "ZP0", 3 ),Op( "ROL", "ROL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLP", "PLP", "IMP", 4 ),Op( "AND", "AND", "IMM", 2 ),Op( "ROL", "ROL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "BIT", "BIT", "ABS", 4 ),Op( "AND", "AND", "ABS", 4 ),Op( "ROL", "ROL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+*/
+  __pyx_t_2 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[0], NULL); if (unlikely(!__pyx_t_2)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_2);
+  __pyx_t_3 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[1], NULL); if (unlikely(!__pyx_t_3)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_3);
+  __pyx_t_4 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_4)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_4);
+  __pyx_t_5 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[3], NULL); if (unlikely(!__pyx_t_5)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_5);
+  __pyx_t_6 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[4], NULL); if (unlikely(!__pyx_t_6)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_6);
+  __pyx_t_7 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[5], NULL); if (unlikely(!__pyx_t_7)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_7);
+  __pyx_t_8 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[6], NULL); if (unlikely(!__pyx_t_8)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_8);
+  __pyx_t_9 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[7], NULL); if (unlikely(!__pyx_t_9)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_9);
+  __pyx_t_10 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[8], NULL); if (unlikely(!__pyx_t_10)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_10);
+  __pyx_t_11 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[9], NULL); if (unlikely(!__pyx_t_11)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_11);
+  __pyx_t_12 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[10], NULL); if (unlikely(!__pyx_t_12)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_12);
+  __pyx_t_13 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_13)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_13);
+  __pyx_t_14 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[11], NULL); if (unlikely(!__pyx_t_14)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_14);
+  __pyx_t_15 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[12], NULL); if (unlikely(!__pyx_t_15)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_15);
+  __pyx_t_16 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[13], NULL); if (unlikely(!__pyx_t_16)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_16);
+  __pyx_t_17 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_17)) __PYX_ERR(0, 21, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_17);
+
+  /* "nes/cpu/cpu_op.pyx":22
+ * LOOKUP = [
+ *     Op( "BRK", "BRK", "IMM", 7 ),Op( "ORA", "ORA", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ORA", "ORA", "ZP0", 3 ),Op( "ASL", "ASL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHP", "PHP", "IMP", 3 ),Op( "ORA", "ORA", "IMM", 2 ),Op( "ASL", "ASL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABS", 4 ),Op( "ASL", "ASL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BPL", "BPL", "REL", 2 ),Op( "ORA", "ORA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ZPX", 4 ),Op( "ASL", "ASL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLC", "CLC", "IMP", 2 ),Op( "ORA", "ORA", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABX", 4 ),Op( "ASL", "ASL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),             # <<<<<<<<<<<<<<
+ *     Op( "JSR", "JSR", "ABS", 6 ),Op( "AND", "AND", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "BIT", "BIT", "ZP0", 3 ),Op( "AND", "AND", "ZP0", 3 ),Op( "ROL", "ROL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLP", "PLP", "IMP", 4 ),Op( "AND", "AND", "IMM", 2 ),Op( "ROL", "ROL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "BIT", "BIT", "ABS", 4 ),Op( "AND", "AND", "ABS", 4 ),Op( "ROL", "ROL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BMI", "BMI", "REL", 2 ),Op( "AND", "AND", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ZPX", 4 ),Op( "ROL", "ROL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEC", "SEC", "IMP", 2 ),Op( "AND", "AND", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ABX", 4 ),Op( "ROL", "ROL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+*/
+  __pyx_t_18 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[15], NULL); if (unlikely(!__pyx_t_18)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_18);
+  __pyx_t_19 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[16], NULL); if (unlikely(!__pyx_t_19)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_19);
+  __pyx_t_20 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_20)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_20);
+  __pyx_t_21 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[3], NULL); if (unlikely(!__pyx_t_21)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_21);
+  __pyx_t_22 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[11], NULL); if (unlikely(!__pyx_t_22)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_22);
+  __pyx_t_23 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[17], NULL); if (unlikely(!__pyx_t_23)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_23);
+  __pyx_t_24 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[18], NULL); if (unlikely(!__pyx_t_24)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_24);
+  __pyx_t_25 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_25)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_25);
+  __pyx_t_26 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[19], NULL); if (unlikely(!__pyx_t_26)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_26);
+  __pyx_t_27 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[20], NULL); if (unlikely(!__pyx_t_27)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_27);
+  __pyx_t_28 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[21], NULL); if (unlikely(!__pyx_t_28)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_28);
+  __pyx_t_29 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[22], NULL); if (unlikely(!__pyx_t_29)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_29);
+  __pyx_t_30 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[11], NULL); if (unlikely(!__pyx_t_30)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_30);
+  __pyx_t_31 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[23], NULL); if (unlikely(!__pyx_t_31)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_31);
+  __pyx_t_32 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[24], NULL); if (unlikely(!__pyx_t_32)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_32);
+  __pyx_t_33 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[22], NULL); if (unlikely(!__pyx_t_33)) __PYX_ERR(0, 22, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_33);
+
+  /* "nes/cpu/cpu_op.pyx":23
+ *     Op( "BRK", "BRK", "IMM", 7 ),Op( "ORA", "ORA", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ORA", "ORA", "ZP0", 3 ),Op( "ASL", "ASL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHP", "PHP", "IMP", 3 ),Op( "ORA", "ORA", "IMM", 2 ),Op( "ASL", "ASL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABS", 4 ),Op( "ASL", "ASL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BPL", "BPL", "REL", 2 ),Op( "ORA", "ORA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ZPX", 4 ),Op( "ASL", "ASL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLC", "CLC", "IMP", 2 ),Op( "ORA", "ORA", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABX", 4 ),Op( "ASL", "ASL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "JSR", "JSR", "ABS", 6 ),Op( "AND", "AND", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "BIT", "BIT", "ZP0", 3 ),Op( "AND", "AND", "ZP0", 3 ),Op( "ROL", "ROL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLP", "PLP", "IMP", 4 ),Op( "AND", "AND", "IMM", 2 ),Op( "ROL", "ROL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "BIT", "BIT", "ABS", 4 ),Op( "AND", "AND", "ABS", 4 ),Op( "ROL", "ROL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),             # <<<<<<<<<<<<<<
+ *     Op( "BMI", "BMI", "REL", 2 ),Op( "AND", "AND", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ZPX", 4 ),Op( "ROL", "ROL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEC", "SEC", "IMP", 2 ),Op( "AND", "AND", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ABX", 4 ),Op( "ROL", "ROL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "RTI", "RTI", "IMP", 6 ),Op( "EOR", "EOR", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "EOR", "EOR", "ZP0", 3 ),Op( "LSR", "LSR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHA", "PHA", "IMP", 3 ),Op( "EOR", "EOR", "IMM", 2 ),Op( "LSR", "LSR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "ABS", 3 ),Op( "EOR", "EOR", "ABS", 4 ),Op( "LSR", "LSR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+*/
+  __pyx_t_34 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[25], NULL); if (unlikely(!__pyx_t_34)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_34);
+  __pyx_t_35 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[26], NULL); if (unlikely(!__pyx_t_35)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_35);
+  __pyx_t_36 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_36)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_36);
+  __pyx_t_37 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[3], NULL); if (unlikely(!__pyx_t_37)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_37);
+  __pyx_t_38 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[27], NULL); if (unlikely(!__pyx_t_38)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_38);
+  __pyx_t_39 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[28], NULL); if (unlikely(!__pyx_t_39)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_39);
+  __pyx_t_40 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[29], NULL); if (unlikely(!__pyx_t_40)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_40);
+  __pyx_t_41 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[7], NULL); if (unlikely(!__pyx_t_41)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_41);
+  __pyx_t_42 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[30], NULL); if (unlikely(!__pyx_t_42)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_42);
+  __pyx_t_43 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[31], NULL); if (unlikely(!__pyx_t_43)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_43);
+  __pyx_t_44 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[32], NULL); if (unlikely(!__pyx_t_44)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_44);
+  __pyx_t_45 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_45)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_45);
+  __pyx_t_46 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[33], NULL); if (unlikely(!__pyx_t_46)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_46);
+  __pyx_t_47 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[34], NULL); if (unlikely(!__pyx_t_47)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_47);
+  __pyx_t_48 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[35], NULL); if (unlikely(!__pyx_t_48)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_48);
+  __pyx_t_49 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_49)) __PYX_ERR(0, 23, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_49);
+
+  /* "nes/cpu/cpu_op.pyx":24
+ *     Op( "BPL", "BPL", "REL", 2 ),Op( "ORA", "ORA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ZPX", 4 ),Op( "ASL", "ASL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLC", "CLC", "IMP", 2 ),Op( "ORA", "ORA", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABX", 4 ),Op( "ASL", "ASL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "JSR", "JSR", "ABS", 6 ),Op( "AND", "AND", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "BIT", "BIT", "ZP0", 3 ),Op( "AND", "AND", "ZP0", 3 ),Op( "ROL", "ROL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLP", "PLP", "IMP", 4 ),Op( "AND", "AND", "IMM", 2 ),Op( "ROL", "ROL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "BIT", "BIT", "ABS", 4 ),Op( "AND", "AND", "ABS", 4 ),Op( "ROL", "ROL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BMI", "BMI", "REL", 2 ),Op( "AND", "AND", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ZPX", 4 ),Op( "ROL", "ROL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEC", "SEC", "IMP", 2 ),Op( "AND", "AND", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ABX", 4 ),Op( "ROL", "ROL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),             # <<<<<<<<<<<<<<
+ *     Op( "RTI", "RTI", "IMP", 6 ),Op( "EOR", "EOR", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "EOR", "EOR", "ZP0", 3 ),Op( "LSR", "LSR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHA", "PHA", "IMP", 3 ),Op( "EOR", "EOR", "IMM", 2 ),Op( "LSR", "LSR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "ABS", 3 ),Op( "EOR", "EOR", "ABS", 4 ),Op( "LSR", "LSR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BVC", "BVC", "REL", 2 ),Op( "EOR", "EOR", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ZPX", 4 ),Op( "LSR", "LSR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLI", "CLI", "IMP", 2 ),Op( "EOR", "EOR", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ABX", 4 ),Op( "LSR", "LSR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+*/
+  __pyx_t_50 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[36], NULL); if (unlikely(!__pyx_t_50)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_50);
+  __pyx_t_51 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[37], NULL); if (unlikely(!__pyx_t_51)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_51);
+  __pyx_t_52 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_52)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_52);
+  __pyx_t_53 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[3], NULL); if (unlikely(!__pyx_t_53)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_53);
+  __pyx_t_54 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[11], NULL); if (unlikely(!__pyx_t_54)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_54);
+  __pyx_t_55 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[38], NULL); if (unlikely(!__pyx_t_55)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_55);
+  __pyx_t_56 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[39], NULL); if (unlikely(!__pyx_t_56)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_56);
+  __pyx_t_57 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_57)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_57);
+  __pyx_t_58 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[40], NULL); if (unlikely(!__pyx_t_58)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_58);
+  __pyx_t_59 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[41], NULL); if (unlikely(!__pyx_t_59)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_59);
+  __pyx_t_60 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[21], NULL); if (unlikely(!__pyx_t_60)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_60);
+  __pyx_t_61 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[22], NULL); if (unlikely(!__pyx_t_61)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_61);
+  __pyx_t_62 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[11], NULL); if (unlikely(!__pyx_t_62)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_62);
+  __pyx_t_63 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[42], NULL); if (unlikely(!__pyx_t_63)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_63);
+  __pyx_t_64 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[43], NULL); if (unlikely(!__pyx_t_64)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_64);
+  __pyx_t_65 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[22], NULL); if (unlikely(!__pyx_t_65)) __PYX_ERR(0, 24, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_65);
+
+  /* "nes/cpu/cpu_op.pyx":25
+ *     Op( "JSR", "JSR", "ABS", 6 ),Op( "AND", "AND", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "BIT", "BIT", "ZP0", 3 ),Op( "AND", "AND", "ZP0", 3 ),Op( "ROL", "ROL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLP", "PLP", "IMP", 4 ),Op( "AND", "AND", "IMM", 2 ),Op( "ROL", "ROL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "BIT", "BIT", "ABS", 4 ),Op( "AND", "AND", "ABS", 4 ),Op( "ROL", "ROL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BMI", "BMI", "REL", 2 ),Op( "AND", "AND", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ZPX", 4 ),Op( "ROL", "ROL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEC", "SEC", "IMP", 2 ),Op( "AND", "AND", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ABX", 4 ),Op( "ROL", "ROL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "RTI", "RTI", "IMP", 6 ),Op( "EOR", "EOR", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "EOR", "EOR", "ZP0", 3 ),Op( "LSR", "LSR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHA", "PHA", "IMP", 3 ),Op( "EOR", "EOR", "IMM", 2 ),Op( "LSR", "LSR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "ABS", 3 ),Op( "EOR", "EOR", "ABS", 4 ),Op( "LSR", "LSR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),             # <<<<<<<<<<<<<<
+ *     Op( "BVC", "BVC", "REL", 2 ),Op( "EOR", "EOR", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ZPX", 4 ),Op( "LSR", "LSR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLI", "CLI", "IMP", 2 ),Op( "EOR", "EOR", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ABX", 4 ),Op( "LSR", "LSR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "RTS", "RTS", "IMP", 6 ),Op( "ADC", "ADC", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ADC", "ADC", "ZP0", 3 ),Op( "ROR", "ROR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLA", "PLA", "IMP", 4 ),Op( "ADC", "ADC", "IMM", 2 ),Op( "ROR", "ROR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "IND", 5 ),Op( "ADC", "ADC", "ABS", 4 ),Op( "ROR", "ROR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+*/
+  __pyx_t_66 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[44], NULL); if (unlikely(!__pyx_t_66)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_66);
+  __pyx_t_67 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[45], NULL); if (unlikely(!__pyx_t_67)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_67);
+  __pyx_t_68 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_68)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_68);
+  __pyx_t_69 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[3], NULL); if (unlikely(!__pyx_t_69)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_69);
+  __pyx_t_70 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[4], NULL); if (unlikely(!__pyx_t_70)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_70);
+  __pyx_t_71 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[46], NULL); if (unlikely(!__pyx_t_71)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_71);
+  __pyx_t_72 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[47], NULL); if (unlikely(!__pyx_t_72)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_72);
+  __pyx_t_73 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[7], NULL); if (unlikely(!__pyx_t_73)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_73);
+  __pyx_t_74 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[48], NULL); if (unlikely(!__pyx_t_74)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_74);
+  __pyx_t_75 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[49], NULL); if (unlikely(!__pyx_t_75)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_75);
+  __pyx_t_76 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[50], NULL); if (unlikely(!__pyx_t_76)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_76);
+  __pyx_t_77 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_77)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_77);
+  __pyx_t_78 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[51], NULL); if (unlikely(!__pyx_t_78)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_78);
+  __pyx_t_79 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[52], NULL); if (unlikely(!__pyx_t_79)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_79);
+  __pyx_t_80 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[53], NULL); if (unlikely(!__pyx_t_80)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_80);
+  __pyx_t_81 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_81)) __PYX_ERR(0, 25, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_81);
+
+  /* "nes/cpu/cpu_op.pyx":26
+ *     Op( "BMI", "BMI", "REL", 2 ),Op( "AND", "AND", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ZPX", 4 ),Op( "ROL", "ROL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEC", "SEC", "IMP", 2 ),Op( "AND", "AND", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ABX", 4 ),Op( "ROL", "ROL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "RTI", "RTI", "IMP", 6 ),Op( "EOR", "EOR", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "EOR", "EOR", "ZP0", 3 ),Op( "LSR", "LSR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHA", "PHA", "IMP", 3 ),Op( "EOR", "EOR", "IMM", 2 ),Op( "LSR", "LSR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "ABS", 3 ),Op( "EOR", "EOR", "ABS", 4 ),Op( "LSR", "LSR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BVC", "BVC", "REL", 2 ),Op( "EOR", "EOR", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ZPX", 4 ),Op( "LSR", "LSR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLI", "CLI", "IMP", 2 ),Op( "EOR", "EOR", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ABX", 4 ),Op( "LSR", "LSR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),             # <<<<<<<<<<<<<<
+ *     Op( "RTS", "RTS", "IMP", 6 ),Op( "ADC", "ADC", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ADC", "ADC", "ZP0", 3 ),Op( "ROR", "ROR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLA", "PLA", "IMP", 4 ),Op( "ADC", "ADC", "IMM", 2 ),Op( "ROR", "ROR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "IND", 5 ),Op( "ADC", "ADC", "ABS", 4 ),Op( "ROR", "ROR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BVS", "BVS", "REL", 2 ),Op( "ADC", "ADC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ZPX", 4 ),Op( "ROR", "ROR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEI", "SEI", "IMP", 2 ),Op( "ADC", "ADC", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ABX", 4 ),Op( "ROR", "ROR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+*/
+  __pyx_t_82 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[54], NULL); if (unlikely(!__pyx_t_82)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_82);
+  __pyx_t_83 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[55], NULL); if (unlikely(!__pyx_t_83)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_83);
+  __pyx_t_84 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_84)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_84);
+  __pyx_t_85 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[3], NULL); if (unlikely(!__pyx_t_85)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_85);
+  __pyx_t_86 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[11], NULL); if (unlikely(!__pyx_t_86)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_86);
+  __pyx_t_87 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[56], NULL); if (unlikely(!__pyx_t_87)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_87);
+  __pyx_t_88 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[57], NULL); if (unlikely(!__pyx_t_88)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_88);
+  __pyx_t_89 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_89)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_89);
+  __pyx_t_90 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[58], NULL); if (unlikely(!__pyx_t_90)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_90);
+  __pyx_t_91 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[59], NULL); if (unlikely(!__pyx_t_91)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_91);
+  __pyx_t_92 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[21], NULL); if (unlikely(!__pyx_t_92)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_92);
+  __pyx_t_93 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[22], NULL); if (unlikely(!__pyx_t_93)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_93);
+  __pyx_t_94 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[11], NULL); if (unlikely(!__pyx_t_94)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_94);
+  __pyx_t_95 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[60], NULL); if (unlikely(!__pyx_t_95)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_95);
+  __pyx_t_96 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[61], NULL); if (unlikely(!__pyx_t_96)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_96);
+  __pyx_t_97 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[22], NULL); if (unlikely(!__pyx_t_97)) __PYX_ERR(0, 26, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_97);
+
+  /* "nes/cpu/cpu_op.pyx":27
+ *     Op( "RTI", "RTI", "IMP", 6 ),Op( "EOR", "EOR", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "EOR", "EOR", "ZP0", 3 ),Op( "LSR", "LSR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHA", "PHA", "IMP", 3 ),Op( "EOR", "EOR", "IMM", 2 ),Op( "LSR", "LSR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "ABS", 3 ),Op( "EOR", "EOR", "ABS", 4 ),Op( "LSR", "LSR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BVC", "BVC", "REL", 2 ),Op( "EOR", "EOR", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ZPX", 4 ),Op( "LSR", "LSR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLI", "CLI", "IMP", 2 ),Op( "EOR", "EOR", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ABX", 4 ),Op( "LSR", "LSR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "RTS", "RTS", "IMP", 6 ),Op( "ADC", "ADC", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ADC", "ADC", "ZP0", 3 ),Op( "ROR", "ROR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLA", "PLA", "IMP", 4 ),Op( "ADC", "ADC", "IMM", 2 ),Op( "ROR", "ROR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "IND", 5 ),Op( "ADC", "ADC", "ABS", 4 ),Op( "ROR", "ROR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),             # <<<<<<<<<<<<<<
+ *     Op( "BVS", "BVS", "REL", 2 ),Op( "ADC", "ADC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ZPX", 4 ),Op( "ROR", "ROR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEI", "SEI", "IMP", 2 ),Op( "ADC", "ADC", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ABX", 4 ),Op( "ROR", "ROR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "???", "NOP", "IMP", 2 ),Op( "STA", "STA", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZP0", 3 ),Op( "STA", "STA", "ZP0", 3 ),Op( "STX", "STX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "DEY", "DEY", "IMP", 2 ),Op( "???", "NOP", "IMP", 2 ),Op( "TXA", "TXA", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "STY", "STY", "ABS", 4 ),Op( "STA", "STA", "ABS", 4 ),Op( "STX", "STX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+*/
+  __pyx_t_98 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[62], NULL); if (unlikely(!__pyx_t_98)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_98);
+  __pyx_t_99 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[63], NULL); if (unlikely(!__pyx_t_99)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_99);
+  __pyx_t_100 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_100)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_100);
+  __pyx_t_101 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[3], NULL); if (unlikely(!__pyx_t_101)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_101);
+  __pyx_t_102 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[4], NULL); if (unlikely(!__pyx_t_102)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_102);
+  __pyx_t_103 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[64], NULL); if (unlikely(!__pyx_t_103)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_103);
+  __pyx_t_104 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[65], NULL); if (unlikely(!__pyx_t_104)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_104);
+  __pyx_t_105 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[7], NULL); if (unlikely(!__pyx_t_105)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_105);
+  __pyx_t_106 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[66], NULL); if (unlikely(!__pyx_t_106)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_106);
+  __pyx_t_107 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[67], NULL); if (unlikely(!__pyx_t_107)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_107);
+  __pyx_t_108 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[68], NULL); if (unlikely(!__pyx_t_108)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_108);
+  __pyx_t_109 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_109)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_109);
+  __pyx_t_110 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[69], NULL); if (unlikely(!__pyx_t_110)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_110);
+  __pyx_t_111 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[70], NULL); if (unlikely(!__pyx_t_111)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_111);
+  __pyx_t_112 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[71], NULL); if (unlikely(!__pyx_t_112)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_112);
+  __pyx_t_113 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_113)) __PYX_ERR(0, 27, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_113);
+
+  /* "nes/cpu/cpu_op.pyx":28
+ *     Op( "BVC", "BVC", "REL", 2 ),Op( "EOR", "EOR", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ZPX", 4 ),Op( "LSR", "LSR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLI", "CLI", "IMP", 2 ),Op( "EOR", "EOR", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ABX", 4 ),Op( "LSR", "LSR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "RTS", "RTS", "IMP", 6 ),Op( "ADC", "ADC", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ADC", "ADC", "ZP0", 3 ),Op( "ROR", "ROR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLA", "PLA", "IMP", 4 ),Op( "ADC", "ADC", "IMM", 2 ),Op( "ROR", "ROR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "IND", 5 ),Op( "ADC", "ADC", "ABS", 4 ),Op( "ROR", "ROR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BVS", "BVS", "REL", 2 ),Op( "ADC", "ADC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ZPX", 4 ),Op( "ROR", "ROR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEI", "SEI", "IMP", 2 ),Op( "ADC", "ADC", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ABX", 4 ),Op( "ROR", "ROR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),             # <<<<<<<<<<<<<<
+ *     Op( "???", "NOP", "IMP", 2 ),Op( "STA", "STA", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZP0", 3 ),Op( "STA", "STA", "ZP0", 3 ),Op( "STX", "STX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "DEY", "DEY", "IMP", 2 ),Op( "???", "NOP", "IMP", 2 ),Op( "TXA", "TXA", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "STY", "STY", "ABS", 4 ),Op( "STA", "STA", "ABS", 4 ),Op( "STX", "STX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "BCC", "BCC", "REL", 2 ),Op( "STA", "STA", "IZY", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZPX", 4 ),Op( "STA", "STA", "ZPX", 4 ),Op( "STX", "STX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "TYA", "TYA", "IMP", 2 ),Op( "STA", "STA", "ABY", 5 ),Op( "TXS", "TXS", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "NOP", "IMP", 5 ),Op( "STA", "STA", "ABX", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "XXX", "IMP", 5 ),
+*/
+  __pyx_t_114 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[72], NULL); if (unlikely(!__pyx_t_114)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_114);
+  __pyx_t_115 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[73], NULL); if (unlikely(!__pyx_t_115)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_115);
+  __pyx_t_116 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_116)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_116);
+  __pyx_t_117 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[3], NULL); if (unlikely(!__pyx_t_117)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_117);
+  __pyx_t_118 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[11], NULL); if (unlikely(!__pyx_t_118)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_118);
+  __pyx_t_119 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[74], NULL); if (unlikely(!__pyx_t_119)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_119);
+  __pyx_t_120 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[75], NULL); if (unlikely(!__pyx_t_120)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_120);
+  __pyx_t_121 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_121)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_121);
+  __pyx_t_122 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[76], NULL); if (unlikely(!__pyx_t_122)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_122);
+  __pyx_t_123 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[77], NULL); if (unlikely(!__pyx_t_123)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_123);
+  __pyx_t_124 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[21], NULL); if (unlikely(!__pyx_t_124)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_124);
+  __pyx_t_125 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[22], NULL); if (unlikely(!__pyx_t_125)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_125);
+  __pyx_t_126 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[11], NULL); if (unlikely(!__pyx_t_126)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_126);
+  __pyx_t_127 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[78], NULL); if (unlikely(!__pyx_t_127)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_127);
+  __pyx_t_128 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[79], NULL); if (unlikely(!__pyx_t_128)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_128);
+  __pyx_t_129 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[22], NULL); if (unlikely(!__pyx_t_129)) __PYX_ERR(0, 28, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_129);
+
+  /* "nes/cpu/cpu_op.pyx":29
+ *     Op( "RTS", "RTS", "IMP", 6 ),Op( "ADC", "ADC", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ADC", "ADC", "ZP0", 3 ),Op( "ROR", "ROR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLA", "PLA", "IMP", 4 ),Op( "ADC", "ADC", "IMM", 2 ),Op( "ROR", "ROR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "IND", 5 ),Op( "ADC", "ADC", "ABS", 4 ),Op( "ROR", "ROR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BVS", "BVS", "REL", 2 ),Op( "ADC", "ADC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ZPX", 4 ),Op( "ROR", "ROR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEI", "SEI", "IMP", 2 ),Op( "ADC", "ADC", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ABX", 4 ),Op( "ROR", "ROR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "???", "NOP", "IMP", 2 ),Op( "STA", "STA", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZP0", 3 ),Op( "STA", "STA", "ZP0", 3 ),Op( "STX", "STX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "DEY", "DEY", "IMP", 2 ),Op( "???", "NOP", "IMP", 2 ),Op( "TXA", "TXA", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "STY", "STY", "ABS", 4 ),Op( "STA", "STA", "ABS", 4 ),Op( "STX", "STX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),             # <<<<<<<<<<<<<<
+ *     Op( "BCC", "BCC", "REL", 2 ),Op( "STA", "STA", "IZY", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZPX", 4 ),Op( "STA", "STA", "ZPX", 4 ),Op( "STX", "STX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "TYA", "TYA", "IMP", 2 ),Op( "STA", "STA", "ABY", 5 ),Op( "TXS", "TXS", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "NOP", "IMP", 5 ),Op( "STA", "STA", "ABX", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "XXX", "IMP", 5 ),
+ *     Op( "LDY", "LDY", "IMM", 2 ),Op( "LDA", "LDA", "IZX", 6 ),Op( "LDX", "LDX", "IMM", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "LDY", "LDY", "ZP0", 3 ),Op( "LDA", "LDA", "ZP0", 3 ),Op( "LDX", "LDX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "TAY", "TAY", "IMP", 2 ),Op( "LDA", "LDA", "IMM", 2 ),Op( "TAX", "TAX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "LDY", "LDY", "ABS", 4 ),Op( "LDA", "LDA", "ABS", 4 ),Op( "LDX", "LDX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+*/
+  __pyx_t_130 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[21], NULL); if (unlikely(!__pyx_t_130)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_130);
+  __pyx_t_131 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[80], NULL); if (unlikely(!__pyx_t_131)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_131);
+  __pyx_t_132 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[21], NULL); if (unlikely(!__pyx_t_132)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_132);
+  __pyx_t_133 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_133)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_133);
+  __pyx_t_134 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[81], NULL); if (unlikely(!__pyx_t_134)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_134);
+  __pyx_t_135 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[82], NULL); if (unlikely(!__pyx_t_135)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_135);
+  __pyx_t_136 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[83], NULL); if (unlikely(!__pyx_t_136)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_136);
+  __pyx_t_137 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[84], NULL); if (unlikely(!__pyx_t_137)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_137);
+  __pyx_t_138 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[85], NULL); if (unlikely(!__pyx_t_138)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_138);
+  __pyx_t_139 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[21], NULL); if (unlikely(!__pyx_t_139)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_139);
+  __pyx_t_140 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[86], NULL); if (unlikely(!__pyx_t_140)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_140);
+  __pyx_t_141 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_141)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_141);
+  __pyx_t_142 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[87], NULL); if (unlikely(!__pyx_t_142)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_142);
+  __pyx_t_143 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[88], NULL); if (unlikely(!__pyx_t_143)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_143);
+  __pyx_t_144 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[89], NULL); if (unlikely(!__pyx_t_144)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_144);
+  __pyx_t_145 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[90], NULL); if (unlikely(!__pyx_t_145)) __PYX_ERR(0, 29, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_145);
+
+  /* "nes/cpu/cpu_op.pyx":30
+ *     Op( "BVS", "BVS", "REL", 2 ),Op( "ADC", "ADC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ZPX", 4 ),Op( "ROR", "ROR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEI", "SEI", "IMP", 2 ),Op( "ADC", "ADC", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ABX", 4 ),Op( "ROR", "ROR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "???", "NOP", "IMP", 2 ),Op( "STA", "STA", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZP0", 3 ),Op( "STA", "STA", "ZP0", 3 ),Op( "STX", "STX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "DEY", "DEY", "IMP", 2 ),Op( "???", "NOP", "IMP", 2 ),Op( "TXA", "TXA", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "STY", "STY", "ABS", 4 ),Op( "STA", "STA", "ABS", 4 ),Op( "STX", "STX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "BCC", "BCC", "REL", 2 ),Op( "STA", "STA", "IZY", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZPX", 4 ),Op( "STA", "STA", "ZPX", 4 ),Op( "STX", "STX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "TYA", "TYA", "IMP", 2 ),Op( "STA", "STA", "ABY", 5 ),Op( "TXS", "TXS", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "NOP", "IMP", 5 ),Op( "STA", "STA", "ABX", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "XXX", "IMP", 5 ),             # <<<<<<<<<<<<<<
+ *     Op( "LDY", "LDY", "IMM", 2 ),Op( "LDA", "LDA", "IZX", 6 ),Op( "LDX", "LDX", "IMM", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "LDY", "LDY", "ZP0", 3 ),Op( "LDA", "LDA", "ZP0", 3 ),Op( "LDX", "LDX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "TAY", "TAY", "IMP", 2 ),Op( "LDA", "LDA", "IMM", 2 ),Op( "TAX", "TAX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "LDY", "LDY", "ABS", 4 ),Op( "LDA", "LDA", "ABS", 4 ),Op( "LDX", "LDX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "BCS", "BCS", "REL", 2 ),Op( "LDA", "LDA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "LDY", "LDY", "ZPX", 4 ),Op( "LDA", "LDA", "ZPX", 4 ),Op( "LDX", "LDX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "CLV", "CLV", "IMP", 2 ),Op( "LDA", "LDA", "ABY", 4 ),Op( "TSX", "TSX", "IMP", 2 ),Op( "???", "XXX", "IMP", 4 ),Op( "LDY", "LDY", "ABX", 4 ),Op( "LDA", "LDA", "ABX", 4 ),Op( "LDX", "LDX", "ABY", 4 ),Op( "???", "XXX", "IMP", 4 ),
+*/
+  __pyx_t_146 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[91], NULL); if (unlikely(!__pyx_t_146)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_146);
+  __pyx_t_147 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[92], NULL); if (unlikely(!__pyx_t_147)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_147);
+  __pyx_t_148 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_148)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_148);
+  __pyx_t_149 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_149)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_149);
+  __pyx_t_150 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[93], NULL); if (unlikely(!__pyx_t_150)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_150);
+  __pyx_t_151 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[94], NULL); if (unlikely(!__pyx_t_151)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_151);
+  __pyx_t_152 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[95], NULL); if (unlikely(!__pyx_t_152)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_152);
+  __pyx_t_153 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[90], NULL); if (unlikely(!__pyx_t_153)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_153);
+  __pyx_t_154 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[96], NULL); if (unlikely(!__pyx_t_154)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_154);
+  __pyx_t_155 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[97], NULL); if (unlikely(!__pyx_t_155)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_155);
+  __pyx_t_156 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[98], NULL); if (unlikely(!__pyx_t_156)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_156);
+  __pyx_t_157 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[7], NULL); if (unlikely(!__pyx_t_157)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_157);
+  __pyx_t_158 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[99], NULL); if (unlikely(!__pyx_t_158)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_158);
+  __pyx_t_159 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[100], NULL); if (unlikely(!__pyx_t_159)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_159);
+  __pyx_t_160 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[7], NULL); if (unlikely(!__pyx_t_160)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_160);
+  __pyx_t_161 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[7], NULL); if (unlikely(!__pyx_t_161)) __PYX_ERR(0, 30, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_161);
+
+  /* "nes/cpu/cpu_op.pyx":31
+ *     Op( "???", "NOP", "IMP", 2 ),Op( "STA", "STA", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZP0", 3 ),Op( "STA", "STA", "ZP0", 3 ),Op( "STX", "STX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "DEY", "DEY", "IMP", 2 ),Op( "???", "NOP", "IMP", 2 ),Op( "TXA", "TXA", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "STY", "STY", "ABS", 4 ),Op( "STA", "STA", "ABS", 4 ),Op( "STX", "STX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "BCC", "BCC", "REL", 2 ),Op( "STA", "STA", "IZY", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZPX", 4 ),Op( "STA", "STA", "ZPX", 4 ),Op( "STX", "STX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "TYA", "TYA", "IMP", 2 ),Op( "STA", "STA", "ABY", 5 ),Op( "TXS", "TXS", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "NOP", "IMP", 5 ),Op( "STA", "STA", "ABX", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "XXX", "IMP", 5 ),
+ *     Op( "LDY", "LDY", "IMM", 2 ),Op( "LDA", "LDA", "IZX", 6 ),Op( "LDX", "LDX", "IMM", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "LDY", "LDY", "ZP0", 3 ),Op( "LDA", "LDA", "ZP0", 3 ),Op( "LDX", "LDX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "TAY", "TAY", "IMP", 2 ),Op( "LDA", "LDA", "IMM", 2 ),Op( "TAX", "TAX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "LDY", "LDY", "ABS", 4 ),Op( "LDA", "LDA", "ABS", 4 ),Op( "LDX", "LDX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),             # <<<<<<<<<<<<<<
+ *     Op( "BCS", "BCS", "REL", 2 ),Op( "LDA", "LDA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "LDY", "LDY", "ZPX", 4 ),Op( "LDA", "LDA", "ZPX", 4 ),Op( "LDX", "LDX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "CLV", "CLV", "IMP", 2 ),Op( "LDA", "LDA", "ABY", 4 ),Op( "TSX", "TSX", "IMP", 2 ),Op( "???", "XXX", "IMP", 4 ),Op( "LDY", "LDY", "ABX", 4 ),Op( "LDA", "LDA", "ABX", 4 ),Op( "LDX", "LDX", "ABY", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "CPY", "CPY", "IMM", 2 ),Op( "CMP", "CMP", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPY", "CPY", "ZP0", 3 ),Op( "CMP", "CMP", "ZP0", 3 ),Op( "DEC", "DEC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INY", "INY", "IMP", 2 ),Op( "CMP", "CMP", "IMM", 2 ),Op( "DEX", "DEX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "CPY", "CPY", "ABS", 4 ),Op( "CMP", "CMP", "ABS", 4 ),Op( "DEC", "DEC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+*/
+  __pyx_t_162 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[101], NULL); if (unlikely(!__pyx_t_162)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_162);
+  __pyx_t_163 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[102], NULL); if (unlikely(!__pyx_t_163)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_163);
+  __pyx_t_164 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[103], NULL); if (unlikely(!__pyx_t_164)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_164);
+  __pyx_t_165 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_165)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_165);
+  __pyx_t_166 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[104], NULL); if (unlikely(!__pyx_t_166)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_166);
+  __pyx_t_167 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[105], NULL); if (unlikely(!__pyx_t_167)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_167);
+  __pyx_t_168 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[106], NULL); if (unlikely(!__pyx_t_168)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_168);
+  __pyx_t_169 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[84], NULL); if (unlikely(!__pyx_t_169)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_169);
+  __pyx_t_170 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[107], NULL); if (unlikely(!__pyx_t_170)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_170);
+  __pyx_t_171 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[108], NULL); if (unlikely(!__pyx_t_171)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_171);
+  __pyx_t_172 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[109], NULL); if (unlikely(!__pyx_t_172)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_172);
+  __pyx_t_173 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_173)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_173);
+  __pyx_t_174 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[110], NULL); if (unlikely(!__pyx_t_174)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_174);
+  __pyx_t_175 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[111], NULL); if (unlikely(!__pyx_t_175)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_175);
+  __pyx_t_176 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[112], NULL); if (unlikely(!__pyx_t_176)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_176);
+  __pyx_t_177 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[90], NULL); if (unlikely(!__pyx_t_177)) __PYX_ERR(0, 31, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_177);
+
+  /* "nes/cpu/cpu_op.pyx":32
+ *     Op( "BCC", "BCC", "REL", 2 ),Op( "STA", "STA", "IZY", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZPX", 4 ),Op( "STA", "STA", "ZPX", 4 ),Op( "STX", "STX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "TYA", "TYA", "IMP", 2 ),Op( "STA", "STA", "ABY", 5 ),Op( "TXS", "TXS", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "NOP", "IMP", 5 ),Op( "STA", "STA", "ABX", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "XXX", "IMP", 5 ),
+ *     Op( "LDY", "LDY", "IMM", 2 ),Op( "LDA", "LDA", "IZX", 6 ),Op( "LDX", "LDX", "IMM", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "LDY", "LDY", "ZP0", 3 ),Op( "LDA", "LDA", "ZP0", 3 ),Op( "LDX", "LDX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "TAY", "TAY", "IMP", 2 ),Op( "LDA", "LDA", "IMM", 2 ),Op( "TAX", "TAX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "LDY", "LDY", "ABS", 4 ),Op( "LDA", "LDA", "ABS", 4 ),Op( "LDX", "LDX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "BCS", "BCS", "REL", 2 ),Op( "LDA", "LDA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "LDY", "LDY", "ZPX", 4 ),Op( "LDA", "LDA", "ZPX", 4 ),Op( "LDX", "LDX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "CLV", "CLV", "IMP", 2 ),Op( "LDA", "LDA", "ABY", 4 ),Op( "TSX", "TSX", "IMP", 2 ),Op( "???", "XXX", "IMP", 4 ),Op( "LDY", "LDY", "ABX", 4 ),Op( "LDA", "LDA", "ABX", 4 ),Op( "LDX", "LDX", "ABY", 4 ),Op( "???", "XXX", "IMP", 4 ),             # <<<<<<<<<<<<<<
+ *     Op( "CPY", "CPY", "IMM", 2 ),Op( "CMP", "CMP", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPY", "CPY", "ZP0", 3 ),Op( "CMP", "CMP", "ZP0", 3 ),Op( "DEC", "DEC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INY", "INY", "IMP", 2 ),Op( "CMP", "CMP", "IMM", 2 ),Op( "DEX", "DEX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "CPY", "CPY", "ABS", 4 ),Op( "CMP", "CMP", "ABS", 4 ),Op( "DEC", "DEC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BNE", "BNE", "REL", 2 ),Op( "CMP", "CMP", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ZPX", 4 ),Op( "DEC", "DEC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLD", "CLD", "IMP", 2 ),Op( "CMP", "CMP", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ABX", 4 ),Op( "DEC", "DEC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+*/
+  __pyx_t_178 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[113], NULL); if (unlikely(!__pyx_t_178)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_178);
+  __pyx_t_179 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[114], NULL); if (unlikely(!__pyx_t_179)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_179);
+  __pyx_t_180 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_180)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_180);
+  __pyx_t_181 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[7], NULL); if (unlikely(!__pyx_t_181)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_181);
+  __pyx_t_182 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[115], NULL); if (unlikely(!__pyx_t_182)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_182);
+  __pyx_t_183 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[116], NULL); if (unlikely(!__pyx_t_183)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_183);
+  __pyx_t_184 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[117], NULL); if (unlikely(!__pyx_t_184)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_184);
+  __pyx_t_185 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[90], NULL); if (unlikely(!__pyx_t_185)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_185);
+  __pyx_t_186 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[118], NULL); if (unlikely(!__pyx_t_186)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_186);
+  __pyx_t_187 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[119], NULL); if (unlikely(!__pyx_t_187)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_187);
+  __pyx_t_188 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[120], NULL); if (unlikely(!__pyx_t_188)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_188);
+  __pyx_t_189 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[90], NULL); if (unlikely(!__pyx_t_189)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_189);
+  __pyx_t_190 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[121], NULL); if (unlikely(!__pyx_t_190)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_190);
+  __pyx_t_191 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[122], NULL); if (unlikely(!__pyx_t_191)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_191);
+  __pyx_t_192 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[123], NULL); if (unlikely(!__pyx_t_192)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_192);
+  __pyx_t_193 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[90], NULL); if (unlikely(!__pyx_t_193)) __PYX_ERR(0, 32, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_193);
+
+  /* "nes/cpu/cpu_op.pyx":33
+ *     Op( "LDY", "LDY", "IMM", 2 ),Op( "LDA", "LDA", "IZX", 6 ),Op( "LDX", "LDX", "IMM", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "LDY", "LDY", "ZP0", 3 ),Op( "LDA", "LDA", "ZP0", 3 ),Op( "LDX", "LDX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "TAY", "TAY", "IMP", 2 ),Op( "LDA", "LDA", "IMM", 2 ),Op( "TAX", "TAX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "LDY", "LDY", "ABS", 4 ),Op( "LDA", "LDA", "ABS", 4 ),Op( "LDX", "LDX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "BCS", "BCS", "REL", 2 ),Op( "LDA", "LDA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "LDY", "LDY", "ZPX", 4 ),Op( "LDA", "LDA", "ZPX", 4 ),Op( "LDX", "LDX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "CLV", "CLV", "IMP", 2 ),Op( "LDA", "LDA", "ABY", 4 ),Op( "TSX", "TSX", "IMP", 2 ),Op( "???", "XXX", "IMP", 4 ),Op( "LDY", "LDY", "ABX", 4 ),Op( "LDA", "LDA", "ABX", 4 ),Op( "LDX", "LDX", "ABY", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "CPY", "CPY", "IMM", 2 ),Op( "CMP", "CMP", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPY", "CPY", "ZP0", 3 ),Op( "CMP", "CMP", "ZP0", 3 ),Op( "DEC", "DEC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INY", "INY", "IMP", 2 ),Op( "CMP", "CMP", "IMM", 2 ),Op( "DEX", "DEX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "CPY", "CPY", "ABS", 4 ),Op( "CMP", "CMP", "ABS", 4 ),Op( "DEC", "DEC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),             # <<<<<<<<<<<<<<
+ *     Op( "BNE", "BNE", "REL", 2 ),Op( "CMP", "CMP", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ZPX", 4 ),Op( "DEC", "DEC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLD", "CLD", "IMP", 2 ),Op( "CMP", "CMP", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ABX", 4 ),Op( "DEC", "DEC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "CPX", "CPX", "IMM", 2 ),Op( "SBC", "SBC", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPX", "CPX", "ZP0", 3 ),Op( "SBC", "SBC", "ZP0", 3 ),Op( "INC", "INC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INX", "INX", "IMP", 2 ),Op( "SBC", "SBC", "IMM", 2 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "SBC", "IMP", 2 ),Op( "CPX", "CPX", "ABS", 4 ),Op( "SBC", "SBC", "ABS", 4 ),Op( "INC", "INC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+*/
+  __pyx_t_194 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[124], NULL); if (unlikely(!__pyx_t_194)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_194);
+  __pyx_t_195 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[125], NULL); if (unlikely(!__pyx_t_195)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_195);
+  __pyx_t_196 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[21], NULL); if (unlikely(!__pyx_t_196)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_196);
+  __pyx_t_197 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[3], NULL); if (unlikely(!__pyx_t_197)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_197);
+  __pyx_t_198 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[126], NULL); if (unlikely(!__pyx_t_198)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_198);
+  __pyx_t_199 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[127], NULL); if (unlikely(!__pyx_t_199)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_199);
+  __pyx_t_200 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[128], NULL); if (unlikely(!__pyx_t_200)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_200);
+  __pyx_t_201 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[7], NULL); if (unlikely(!__pyx_t_201)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_201);
+  __pyx_t_202 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[129], NULL); if (unlikely(!__pyx_t_202)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_202);
+  __pyx_t_203 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[130], NULL); if (unlikely(!__pyx_t_203)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_203);
+  __pyx_t_204 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[131], NULL); if (unlikely(!__pyx_t_204)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_204);
+  __pyx_t_205 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_205)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_205);
+  __pyx_t_206 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[132], NULL); if (unlikely(!__pyx_t_206)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_206);
+  __pyx_t_207 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[133], NULL); if (unlikely(!__pyx_t_207)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_207);
+  __pyx_t_208 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[134], NULL); if (unlikely(!__pyx_t_208)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_208);
+  __pyx_t_209 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_209)) __PYX_ERR(0, 33, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_209);
+
+  /* "nes/cpu/cpu_op.pyx":34
+ *     Op( "BCS", "BCS", "REL", 2 ),Op( "LDA", "LDA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "LDY", "LDY", "ZPX", 4 ),Op( "LDA", "LDA", "ZPX", 4 ),Op( "LDX", "LDX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "CLV", "CLV", "IMP", 2 ),Op( "LDA", "LDA", "ABY", 4 ),Op( "TSX", "TSX", "IMP", 2 ),Op( "???", "XXX", "IMP", 4 ),Op( "LDY", "LDY", "ABX", 4 ),Op( "LDA", "LDA", "ABX", 4 ),Op( "LDX", "LDX", "ABY", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "CPY", "CPY", "IMM", 2 ),Op( "CMP", "CMP", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPY", "CPY", "ZP0", 3 ),Op( "CMP", "CMP", "ZP0", 3 ),Op( "DEC", "DEC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INY", "INY", "IMP", 2 ),Op( "CMP", "CMP", "IMM", 2 ),Op( "DEX", "DEX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "CPY", "CPY", "ABS", 4 ),Op( "CMP", "CMP", "ABS", 4 ),Op( "DEC", "DEC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BNE", "BNE", "REL", 2 ),Op( "CMP", "CMP", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ZPX", 4 ),Op( "DEC", "DEC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLD", "CLD", "IMP", 2 ),Op( "CMP", "CMP", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ABX", 4 ),Op( "DEC", "DEC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),             # <<<<<<<<<<<<<<
+ *     Op( "CPX", "CPX", "IMM", 2 ),Op( "SBC", "SBC", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPX", "CPX", "ZP0", 3 ),Op( "SBC", "SBC", "ZP0", 3 ),Op( "INC", "INC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INX", "INX", "IMP", 2 ),Op( "SBC", "SBC", "IMM", 2 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "SBC", "IMP", 2 ),Op( "CPX", "CPX", "ABS", 4 ),Op( "SBC", "SBC", "ABS", 4 ),Op( "INC", "INC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BEQ", "BEQ", "REL", 2 ),Op( "SBC", "SBC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ZPX", 4 ),Op( "INC", "INC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SED", "SED", "IMP", 2 ),Op( "SBC", "SBC", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ABX", 4 ),Op( "INC", "INC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+*/
+  __pyx_t_210 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[135], NULL); if (unlikely(!__pyx_t_210)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_210);
+  __pyx_t_211 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[136], NULL); if (unlikely(!__pyx_t_211)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_211);
+  __pyx_t_212 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_212)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_212);
+  __pyx_t_213 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[3], NULL); if (unlikely(!__pyx_t_213)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_213);
+  __pyx_t_214 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[11], NULL); if (unlikely(!__pyx_t_214)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_214);
+  __pyx_t_215 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[137], NULL); if (unlikely(!__pyx_t_215)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_215);
+  __pyx_t_216 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[138], NULL); if (unlikely(!__pyx_t_216)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_216);
+  __pyx_t_217 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_217)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_217);
+  __pyx_t_218 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[139], NULL); if (unlikely(!__pyx_t_218)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_218);
+  __pyx_t_219 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[140], NULL); if (unlikely(!__pyx_t_219)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_219);
+  __pyx_t_220 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[141], NULL); if (unlikely(!__pyx_t_220)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_220);
+  __pyx_t_221 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[22], NULL); if (unlikely(!__pyx_t_221)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_221);
+  __pyx_t_222 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[11], NULL); if (unlikely(!__pyx_t_222)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_222);
+  __pyx_t_223 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[142], NULL); if (unlikely(!__pyx_t_223)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_223);
+  __pyx_t_224 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[143], NULL); if (unlikely(!__pyx_t_224)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_224);
+  __pyx_t_225 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[22], NULL); if (unlikely(!__pyx_t_225)) __PYX_ERR(0, 34, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_225);
+
+  /* "nes/cpu/cpu_op.pyx":35
+ *     Op( "CPY", "CPY", "IMM", 2 ),Op( "CMP", "CMP", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPY", "CPY", "ZP0", 3 ),Op( "CMP", "CMP", "ZP0", 3 ),Op( "DEC", "DEC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INY", "INY", "IMP", 2 ),Op( "CMP", "CMP", "IMM", 2 ),Op( "DEX", "DEX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "CPY", "CPY", "ABS", 4 ),Op( "CMP", "CMP", "ABS", 4 ),Op( "DEC", "DEC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BNE", "BNE", "REL", 2 ),Op( "CMP", "CMP", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ZPX", 4 ),Op( "DEC", "DEC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLD", "CLD", "IMP", 2 ),Op( "CMP", "CMP", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ABX", 4 ),Op( "DEC", "DEC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "CPX", "CPX", "IMM", 2 ),Op( "SBC", "SBC", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPX", "CPX", "ZP0", 3 ),Op( "SBC", "SBC", "ZP0", 3 ),Op( "INC", "INC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INX", "INX", "IMP", 2 ),Op( "SBC", "SBC", "IMM", 2 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "SBC", "IMP", 2 ),Op( "CPX", "CPX", "ABS", 4 ),Op( "SBC", "SBC", "ABS", 4 ),Op( "INC", "INC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),             # <<<<<<<<<<<<<<
+ *     Op( "BEQ", "BEQ", "REL", 2 ),Op( "SBC", "SBC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ZPX", 4 ),Op( "INC", "INC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SED", "SED", "IMP", 2 ),Op( "SBC", "SBC", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ABX", 4 ),Op( "INC", "INC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ * ]
+*/
+  __pyx_t_226 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[144], NULL); if (unlikely(!__pyx_t_226)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_226);
+  __pyx_t_227 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[145], NULL); if (unlikely(!__pyx_t_227)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_227);
+  __pyx_t_228 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[21], NULL); if (unlikely(!__pyx_t_228)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_228);
+  __pyx_t_229 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[3], NULL); if (unlikely(!__pyx_t_229)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_229);
+  __pyx_t_230 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[146], NULL); if (unlikely(!__pyx_t_230)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_230);
+  __pyx_t_231 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[147], NULL); if (unlikely(!__pyx_t_231)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_231);
+  __pyx_t_232 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[148], NULL); if (unlikely(!__pyx_t_232)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_232);
+  __pyx_t_233 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[7], NULL); if (unlikely(!__pyx_t_233)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_233);
+  __pyx_t_234 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[149], NULL); if (unlikely(!__pyx_t_234)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_234);
+  __pyx_t_235 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[150], NULL); if (unlikely(!__pyx_t_235)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_235);
+  __pyx_t_236 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[141], NULL); if (unlikely(!__pyx_t_236)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_236);
+  __pyx_t_237 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[151], NULL); if (unlikely(!__pyx_t_237)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_237);
+  __pyx_t_238 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[152], NULL); if (unlikely(!__pyx_t_238)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_238);
+  __pyx_t_239 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[153], NULL); if (unlikely(!__pyx_t_239)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_239);
+  __pyx_t_240 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[154], NULL); if (unlikely(!__pyx_t_240)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_240);
+  __pyx_t_241 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_241)) __PYX_ERR(0, 35, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_241);
+
+  /* "nes/cpu/cpu_op.pyx":36
+ *     Op( "BNE", "BNE", "REL", 2 ),Op( "CMP", "CMP", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ZPX", 4 ),Op( "DEC", "DEC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLD", "CLD", "IMP", 2 ),Op( "CMP", "CMP", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ABX", 4 ),Op( "DEC", "DEC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "CPX", "CPX", "IMM", 2 ),Op( "SBC", "SBC", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPX", "CPX", "ZP0", 3 ),Op( "SBC", "SBC", "ZP0", 3 ),Op( "INC", "INC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INX", "INX", "IMP", 2 ),Op( "SBC", "SBC", "IMM", 2 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "SBC", "IMP", 2 ),Op( "CPX", "CPX", "ABS", 4 ),Op( "SBC", "SBC", "ABS", 4 ),Op( "INC", "INC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BEQ", "BEQ", "REL", 2 ),Op( "SBC", "SBC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ZPX", 4 ),Op( "INC", "INC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SED", "SED", "IMP", 2 ),Op( "SBC", "SBC", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ABX", 4 ),Op( "INC", "INC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),             # <<<<<<<<<<<<<<
+ * ]
+ * 
+*/
+  __pyx_t_242 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[155], NULL); if (unlikely(!__pyx_t_242)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_242);
+  __pyx_t_243 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[156], NULL); if (unlikely(!__pyx_t_243)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_243);
+  __pyx_t_244 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[2], NULL); if (unlikely(!__pyx_t_244)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_244);
+  __pyx_t_245 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[3], NULL); if (unlikely(!__pyx_t_245)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_245);
+  __pyx_t_246 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[11], NULL); if (unlikely(!__pyx_t_246)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_246);
+  __pyx_t_247 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[157], NULL); if (unlikely(!__pyx_t_247)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_247);
+  __pyx_t_248 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[158], NULL); if (unlikely(!__pyx_t_248)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_248);
+  __pyx_t_249 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[14], NULL); if (unlikely(!__pyx_t_249)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_249);
+  __pyx_t_250 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[159], NULL); if (unlikely(!__pyx_t_250)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_250);
+  __pyx_t_251 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[160], NULL); if (unlikely(!__pyx_t_251)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_251);
+  __pyx_t_252 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[141], NULL); if (unlikely(!__pyx_t_252)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_252);
+  __pyx_t_253 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[22], NULL); if (unlikely(!__pyx_t_253)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_253);
+  __pyx_t_254 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[11], NULL); if (unlikely(!__pyx_t_254)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_254);
+  __pyx_t_255 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[161], NULL); if (unlikely(!__pyx_t_255)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_255);
+  __pyx_t_256 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[162], NULL); if (unlikely(!__pyx_t_256)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_256);
+  __pyx_t_257 = __Pyx_PyObject_Call(((PyObject *)__pyx_mstate_global->__pyx_ptype_3nes_3cpu_6cpu_op_Op), __pyx_mstate_global->__pyx_tuple[22], NULL); if (unlikely(!__pyx_t_257)) __PYX_ERR(0, 36, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_257);
+
+  /* "nes/cpu/cpu_op.pyx":20
+ * ]
+ * 
+ * LOOKUP = [             # <<<<<<<<<<<<<<
+ *     Op( "BRK", "BRK", "IMM", 7 ),Op( "ORA", "ORA", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ORA", "ORA", "ZP0", 3 ),Op( "ASL", "ASL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHP", "PHP", "IMP", 3 ),Op( "ORA", "ORA", "IMM", 2 ),Op( "ASL", "ASL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABS", 4 ),Op( "ASL", "ASL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BPL", "BPL", "REL", 2 ),Op( "ORA", "ORA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ZPX", 4 ),Op( "ASL", "ASL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLC", "CLC", "IMP", 2 ),Op( "ORA", "ORA", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABX", 4 ),Op( "ASL", "ASL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+*/
+  {
+    PyObject* __pyx_temp[256] = {__pyx_t_2, __pyx_t_3, __pyx_t_4, __pyx_t_5, __pyx_t_6, __pyx_t_7, __pyx_t_8, __pyx_t_9, __pyx_t_10, __pyx_t_11, __pyx_t_12, __pyx_t_13, __pyx_t_14, __pyx_t_15, __pyx_t_16, __pyx_t_17, __pyx_t_18, __pyx_t_19, __pyx_t_20, __pyx_t_21, __pyx_t_22, __pyx_t_23, __pyx_t_24, __pyx_t_25, __pyx_t_26, __pyx_t_27, __pyx_t_28, __pyx_t_29, __pyx_t_30, __pyx_t_31, __pyx_t_32, __pyx_t_33, __pyx_t_34, __pyx_t_35, __pyx_t_36, __pyx_t_37, __pyx_t_38, __pyx_t_39, __pyx_t_40, __pyx_t_41, __pyx_t_42, __pyx_t_43, __pyx_t_44, __pyx_t_45, __pyx_t_46, __pyx_t_47, __pyx_t_48, __pyx_t_49, __pyx_t_50, __pyx_t_51, __pyx_t_52, __pyx_t_53, __pyx_t_54, __pyx_t_55, __pyx_t_56, __pyx_t_57, __pyx_t_58, __pyx_t_59, __pyx_t_60, __pyx_t_61, __pyx_t_62, __pyx_t_63, __pyx_t_64, __pyx_t_65, __pyx_t_66, __pyx_t_67, __pyx_t_68, __pyx_t_69, __pyx_t_70, __pyx_t_71, __pyx_t_72, __pyx_t_73, __pyx_t_74, __pyx_t_75, __pyx_t_76, __pyx_t_77, __pyx_t_78, __pyx_t_79, __pyx_t_80, __pyx_t_81, __pyx_t_82, __pyx_t_83, __pyx_t_84, __pyx_t_85, __pyx_t_86, __pyx_t_87, __pyx_t_88, __pyx_t_89, __pyx_t_90, __pyx_t_91, __pyx_t_92, __pyx_t_93, __pyx_t_94, __pyx_t_95, __pyx_t_96, __pyx_t_97, __pyx_t_98, __pyx_t_99, __pyx_t_100, __pyx_t_101, __pyx_t_102, __pyx_t_103, __pyx_t_104, __pyx_t_105, __pyx_t_106, __pyx_t_107, __pyx_t_108, __pyx_t_109, __pyx_t_110, __pyx_t_111, __pyx_t_112, __pyx_t_113, __pyx_t_114, __pyx_t_115, __pyx_t_116, __pyx_t_117, __pyx_t_118, __pyx_t_119, __pyx_t_120, __pyx_t_121, __pyx_t_122, __pyx_t_123, __pyx_t_124, __pyx_t_125, __pyx_t_126, __pyx_t_127, __pyx_t_128, __pyx_t_129, __pyx_t_130, __pyx_t_131, __pyx_t_132, __pyx_t_133, __pyx_t_134, __pyx_t_135, __pyx_t_136, __pyx_t_137, __pyx_t_138, __pyx_t_139, __pyx_t_140, __pyx_t_141, __pyx_t_142, __pyx_t_143, __pyx_t_144, __pyx_t_145, __pyx_t_146, __pyx_t_147, __pyx_t_148, __pyx_t_149, __pyx_t_150, __pyx_t_151, __pyx_t_152, __pyx_t_153, __pyx_t_154, __pyx_t_155, __pyx_t_156, __pyx_t_157, __pyx_t_158, __pyx_t_159, __pyx_t_160, __pyx_t_161, __pyx_t_162, __pyx_t_163, __pyx_t_164, __pyx_t_165, __pyx_t_166, __pyx_t_167, __pyx_t_168, __pyx_t_169, __pyx_t_170, __pyx_t_171, __pyx_t_172, __pyx_t_173, __pyx_t_174, __pyx_t_175, __pyx_t_176, __pyx_t_177, __pyx_t_178, __pyx_t_179, __pyx_t_180, __pyx_t_181, __pyx_t_182, __pyx_t_183, __pyx_t_184, __pyx_t_185, __pyx_t_186, __pyx_t_187, __pyx_t_188, __pyx_t_189, __pyx_t_190, __pyx_t_191, __pyx_t_192, __pyx_t_193, __pyx_t_194, __pyx_t_195, __pyx_t_196, __pyx_t_197, __pyx_t_198, __pyx_t_199, __pyx_t_200, __pyx_t_201, __pyx_t_202, __pyx_t_203, __pyx_t_204, __pyx_t_205, __pyx_t_206, __pyx_t_207, __pyx_t_208, __pyx_t_209, __pyx_t_210, __pyx_t_211, __pyx_t_212, __pyx_t_213, __pyx_t_214, __pyx_t_215, __pyx_t_216, __pyx_t_217, __pyx_t_218, __pyx_t_219, __pyx_t_220, __pyx_t_221, __pyx_t_222, __pyx_t_223, __pyx_t_224, __pyx_t_225, __pyx_t_226, __pyx_t_227, __pyx_t_228, __pyx_t_229, __pyx_t_230, __pyx_t_231, __pyx_t_232, __pyx_t_233, __pyx_t_234, __pyx_t_235, __pyx_t_236, __pyx_t_237, __pyx_t_238, __pyx_t_239, __pyx_t_240, __pyx_t_241, __pyx_t_242, __pyx_t_243, __pyx_t_244, __pyx_t_245, __pyx_t_246, __pyx_t_247, __pyx_t_248, __pyx_t_249, __pyx_t_250, __pyx_t_251, __pyx_t_252, __pyx_t_253, __pyx_t_254, __pyx_t_255, __pyx_t_256, __pyx_t_257};
+    __pyx_t_258 = __Pyx_PyList_FromArray(__pyx_temp, 256); if (unlikely(!__pyx_t_258)) __PYX_ERR(0, 20, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_258);
+  }
+  __Pyx_DECREF(__pyx_t_2); __pyx_t_2 = 0;
+  __Pyx_DECREF(__pyx_t_3); __pyx_t_3 = 0;
+  __Pyx_DECREF(__pyx_t_4); __pyx_t_4 = 0;
+  __Pyx_DECREF(__pyx_t_5); __pyx_t_5 = 0;
+  __Pyx_DECREF(__pyx_t_6); __pyx_t_6 = 0;
+  __Pyx_DECREF(__pyx_t_7); __pyx_t_7 = 0;
+  __Pyx_DECREF(__pyx_t_8); __pyx_t_8 = 0;
+  __Pyx_DECREF(__pyx_t_9); __pyx_t_9 = 0;
+  __Pyx_DECREF(__pyx_t_10); __pyx_t_10 = 0;
+  __Pyx_DECREF(__pyx_t_11); __pyx_t_11 = 0;
+  __Pyx_DECREF(__pyx_t_12); __pyx_t_12 = 0;
+  __Pyx_DECREF(__pyx_t_13); __pyx_t_13 = 0;
+  __Pyx_DECREF(__pyx_t_14); __pyx_t_14 = 0;
+  __Pyx_DECREF(__pyx_t_15); __pyx_t_15 = 0;
+  __Pyx_DECREF(__pyx_t_16); __pyx_t_16 = 0;
+  __Pyx_DECREF(__pyx_t_17); __pyx_t_17 = 0;
+  __Pyx_DECREF(__pyx_t_18); __pyx_t_18 = 0;
+  __Pyx_DECREF(__pyx_t_19); __pyx_t_19 = 0;
+  __Pyx_DECREF(__pyx_t_20); __pyx_t_20 = 0;
+  __Pyx_DECREF(__pyx_t_21); __pyx_t_21 = 0;
+  __Pyx_DECREF(__pyx_t_22); __pyx_t_22 = 0;
+  __Pyx_DECREF(__pyx_t_23); __pyx_t_23 = 0;
+  __Pyx_DECREF(__pyx_t_24); __pyx_t_24 = 0;
+  __Pyx_DECREF(__pyx_t_25); __pyx_t_25 = 0;
+  __Pyx_DECREF(__pyx_t_26); __pyx_t_26 = 0;
+  __Pyx_DECREF(__pyx_t_27); __pyx_t_27 = 0;
+  __Pyx_DECREF(__pyx_t_28); __pyx_t_28 = 0;
+  __Pyx_DECREF(__pyx_t_29); __pyx_t_29 = 0;
+  __Pyx_DECREF(__pyx_t_30); __pyx_t_30 = 0;
+  __Pyx_DECREF(__pyx_t_31); __pyx_t_31 = 0;
+  __Pyx_DECREF(__pyx_t_32); __pyx_t_32 = 0;
+  __Pyx_DECREF(__pyx_t_33); __pyx_t_33 = 0;
+  __Pyx_DECREF(__pyx_t_34); __pyx_t_34 = 0;
+  __Pyx_DECREF(__pyx_t_35); __pyx_t_35 = 0;
+  __Pyx_DECREF(__pyx_t_36); __pyx_t_36 = 0;
+  __Pyx_DECREF(__pyx_t_37); __pyx_t_37 = 0;
+  __Pyx_DECREF(__pyx_t_38); __pyx_t_38 = 0;
+  __Pyx_DECREF(__pyx_t_39); __pyx_t_39 = 0;
+  __Pyx_DECREF(__pyx_t_40); __pyx_t_40 = 0;
+  __Pyx_DECREF(__pyx_t_41); __pyx_t_41 = 0;
+  __Pyx_DECREF(__pyx_t_42); __pyx_t_42 = 0;
+  __Pyx_DECREF(__pyx_t_43); __pyx_t_43 = 0;
+  __Pyx_DECREF(__pyx_t_44); __pyx_t_44 = 0;
+  __Pyx_DECREF(__pyx_t_45); __pyx_t_45 = 0;
+  __Pyx_DECREF(__pyx_t_46); __pyx_t_46 = 0;
+  __Pyx_DECREF(__pyx_t_47); __pyx_t_47 = 0;
+  __Pyx_DECREF(__pyx_t_48); __pyx_t_48 = 0;
+  __Pyx_DECREF(__pyx_t_49); __pyx_t_49 = 0;
+  __Pyx_DECREF(__pyx_t_50); __pyx_t_50 = 0;
+  __Pyx_DECREF(__pyx_t_51); __pyx_t_51 = 0;
+  __Pyx_DECREF(__pyx_t_52); __pyx_t_52 = 0;
+  __Pyx_DECREF(__pyx_t_53); __pyx_t_53 = 0;
+  __Pyx_DECREF(__pyx_t_54); __pyx_t_54 = 0;
+  __Pyx_DECREF(__pyx_t_55); __pyx_t_55 = 0;
+  __Pyx_DECREF(__pyx_t_56); __pyx_t_56 = 0;
+  __Pyx_DECREF(__pyx_t_57); __pyx_t_57 = 0;
+  __Pyx_DECREF(__pyx_t_58); __pyx_t_58 = 0;
+  __Pyx_DECREF(__pyx_t_59); __pyx_t_59 = 0;
+  __Pyx_DECREF(__pyx_t_60); __pyx_t_60 = 0;
+  __Pyx_DECREF(__pyx_t_61); __pyx_t_61 = 0;
+  __Pyx_DECREF(__pyx_t_62); __pyx_t_62 = 0;
+  __Pyx_DECREF(__pyx_t_63); __pyx_t_63 = 0;
+  __Pyx_DECREF(__pyx_t_64); __pyx_t_64 = 0;
+  __Pyx_DECREF(__pyx_t_65); __pyx_t_65 = 0;
+  __Pyx_DECREF(__pyx_t_66); __pyx_t_66 = 0;
+  __Pyx_DECREF(__pyx_t_67); __pyx_t_67 = 0;
+  __Pyx_DECREF(__pyx_t_68); __pyx_t_68 = 0;
+  __Pyx_DECREF(__pyx_t_69); __pyx_t_69 = 0;
+  __Pyx_DECREF(__pyx_t_70); __pyx_t_70 = 0;
+  __Pyx_DECREF(__pyx_t_71); __pyx_t_71 = 0;
+  __Pyx_DECREF(__pyx_t_72); __pyx_t_72 = 0;
+  __Pyx_DECREF(__pyx_t_73); __pyx_t_73 = 0;
+  __Pyx_DECREF(__pyx_t_74); __pyx_t_74 = 0;
+  __Pyx_DECREF(__pyx_t_75); __pyx_t_75 = 0;
+  __Pyx_DECREF(__pyx_t_76); __pyx_t_76 = 0;
+  __Pyx_DECREF(__pyx_t_77); __pyx_t_77 = 0;
+  __Pyx_DECREF(__pyx_t_78); __pyx_t_78 = 0;
+  __Pyx_DECREF(__pyx_t_79); __pyx_t_79 = 0;
+  __Pyx_DECREF(__pyx_t_80); __pyx_t_80 = 0;
+  __Pyx_DECREF(__pyx_t_81); __pyx_t_81 = 0;
+  __Pyx_DECREF(__pyx_t_82); __pyx_t_82 = 0;
+  __Pyx_DECREF(__pyx_t_83); __pyx_t_83 = 0;
+  __Pyx_DECREF(__pyx_t_84); __pyx_t_84 = 0;
+  __Pyx_DECREF(__pyx_t_85); __pyx_t_85 = 0;
+  __Pyx_DECREF(__pyx_t_86); __pyx_t_86 = 0;
+  __Pyx_DECREF(__pyx_t_87); __pyx_t_87 = 0;
+  __Pyx_DECREF(__pyx_t_88); __pyx_t_88 = 0;
+  __Pyx_DECREF(__pyx_t_89); __pyx_t_89 = 0;
+  __Pyx_DECREF(__pyx_t_90); __pyx_t_90 = 0;
+  __Pyx_DECREF(__pyx_t_91); __pyx_t_91 = 0;
+  __Pyx_DECREF(__pyx_t_92); __pyx_t_92 = 0;
+  __Pyx_DECREF(__pyx_t_93); __pyx_t_93 = 0;
+  __Pyx_DECREF(__pyx_t_94); __pyx_t_94 = 0;
+  __Pyx_DECREF(__pyx_t_95); __pyx_t_95 = 0;
+  __Pyx_DECREF(__pyx_t_96); __pyx_t_96 = 0;
+  __Pyx_DECREF(__pyx_t_97); __pyx_t_97 = 0;
+  __Pyx_DECREF(__pyx_t_98); __pyx_t_98 = 0;
+  __Pyx_DECREF(__pyx_t_99); __pyx_t_99 = 0;
+  __Pyx_DECREF(__pyx_t_100); __pyx_t_100 = 0;
+  __Pyx_DECREF(__pyx_t_101); __pyx_t_101 = 0;
+  __Pyx_DECREF(__pyx_t_102); __pyx_t_102 = 0;
+  __Pyx_DECREF(__pyx_t_103); __pyx_t_103 = 0;
+  __Pyx_DECREF(__pyx_t_104); __pyx_t_104 = 0;
+  __Pyx_DECREF(__pyx_t_105); __pyx_t_105 = 0;
+  __Pyx_DECREF(__pyx_t_106); __pyx_t_106 = 0;
+  __Pyx_DECREF(__pyx_t_107); __pyx_t_107 = 0;
+  __Pyx_DECREF(__pyx_t_108); __pyx_t_108 = 0;
+  __Pyx_DECREF(__pyx_t_109); __pyx_t_109 = 0;
+  __Pyx_DECREF(__pyx_t_110); __pyx_t_110 = 0;
+  __Pyx_DECREF(__pyx_t_111); __pyx_t_111 = 0;
+  __Pyx_DECREF(__pyx_t_112); __pyx_t_112 = 0;
+  __Pyx_DECREF(__pyx_t_113); __pyx_t_113 = 0;
+  __Pyx_DECREF(__pyx_t_114); __pyx_t_114 = 0;
+  __Pyx_DECREF(__pyx_t_115); __pyx_t_115 = 0;
+  __Pyx_DECREF(__pyx_t_116); __pyx_t_116 = 0;
+  __Pyx_DECREF(__pyx_t_117); __pyx_t_117 = 0;
+  __Pyx_DECREF(__pyx_t_118); __pyx_t_118 = 0;
+  __Pyx_DECREF(__pyx_t_119); __pyx_t_119 = 0;
+  __Pyx_DECREF(__pyx_t_120); __pyx_t_120 = 0;
+  __Pyx_DECREF(__pyx_t_121); __pyx_t_121 = 0;
+  __Pyx_DECREF(__pyx_t_122); __pyx_t_122 = 0;
+  __Pyx_DECREF(__pyx_t_123); __pyx_t_123 = 0;
+  __Pyx_DECREF(__pyx_t_124); __pyx_t_124 = 0;
+  __Pyx_DECREF(__pyx_t_125); __pyx_t_125 = 0;
+  __Pyx_DECREF(__pyx_t_126); __pyx_t_126 = 0;
+  __Pyx_DECREF(__pyx_t_127); __pyx_t_127 = 0;
+  __Pyx_DECREF(__pyx_t_128); __pyx_t_128 = 0;
+  __Pyx_DECREF(__pyx_t_129); __pyx_t_129 = 0;
+  __Pyx_DECREF(__pyx_t_130); __pyx_t_130 = 0;
+  __Pyx_DECREF(__pyx_t_131); __pyx_t_131 = 0;
+  __Pyx_DECREF(__pyx_t_132); __pyx_t_132 = 0;
+  __Pyx_DECREF(__pyx_t_133); __pyx_t_133 = 0;
+  __Pyx_DECREF(__pyx_t_134); __pyx_t_134 = 0;
+  __Pyx_DECREF(__pyx_t_135); __pyx_t_135 = 0;
+  __Pyx_DECREF(__pyx_t_136); __pyx_t_136 = 0;
+  __Pyx_DECREF(__pyx_t_137); __pyx_t_137 = 0;
+  __Pyx_DECREF(__pyx_t_138); __pyx_t_138 = 0;
+  __Pyx_DECREF(__pyx_t_139); __pyx_t_139 = 0;
+  __Pyx_DECREF(__pyx_t_140); __pyx_t_140 = 0;
+  __Pyx_DECREF(__pyx_t_141); __pyx_t_141 = 0;
+  __Pyx_DECREF(__pyx_t_142); __pyx_t_142 = 0;
+  __Pyx_DECREF(__pyx_t_143); __pyx_t_143 = 0;
+  __Pyx_DECREF(__pyx_t_144); __pyx_t_144 = 0;
+  __Pyx_DECREF(__pyx_t_145); __pyx_t_145 = 0;
+  __Pyx_DECREF(__pyx_t_146); __pyx_t_146 = 0;
+  __Pyx_DECREF(__pyx_t_147); __pyx_t_147 = 0;
+  __Pyx_DECREF(__pyx_t_148); __pyx_t_148 = 0;
+  __Pyx_DECREF(__pyx_t_149); __pyx_t_149 = 0;
+  __Pyx_DECREF(__pyx_t_150); __pyx_t_150 = 0;
+  __Pyx_DECREF(__pyx_t_151); __pyx_t_151 = 0;
+  __Pyx_DECREF(__pyx_t_152); __pyx_t_152 = 0;
+  __Pyx_DECREF(__pyx_t_153); __pyx_t_153 = 0;
+  __Pyx_DECREF(__pyx_t_154); __pyx_t_154 = 0;
+  __Pyx_DECREF(__pyx_t_155); __pyx_t_155 = 0;
+  __Pyx_DECREF(__pyx_t_156); __pyx_t_156 = 0;
+  __Pyx_DECREF(__pyx_t_157); __pyx_t_157 = 0;
+  __Pyx_DECREF(__pyx_t_158); __pyx_t_158 = 0;
+  __Pyx_DECREF(__pyx_t_159); __pyx_t_159 = 0;
+  __Pyx_DECREF(__pyx_t_160); __pyx_t_160 = 0;
+  __Pyx_DECREF(__pyx_t_161); __pyx_t_161 = 0;
+  __Pyx_DECREF(__pyx_t_162); __pyx_t_162 = 0;
+  __Pyx_DECREF(__pyx_t_163); __pyx_t_163 = 0;
+  __Pyx_DECREF(__pyx_t_164); __pyx_t_164 = 0;
+  __Pyx_DECREF(__pyx_t_165); __pyx_t_165 = 0;
+  __Pyx_DECREF(__pyx_t_166); __pyx_t_166 = 0;
+  __Pyx_DECREF(__pyx_t_167); __pyx_t_167 = 0;
+  __Pyx_DECREF(__pyx_t_168); __pyx_t_168 = 0;
+  __Pyx_DECREF(__pyx_t_169); __pyx_t_169 = 0;
+  __Pyx_DECREF(__pyx_t_170); __pyx_t_170 = 0;
+  __Pyx_DECREF(__pyx_t_171); __pyx_t_171 = 0;
+  __Pyx_DECREF(__pyx_t_172); __pyx_t_172 = 0;
+  __Pyx_DECREF(__pyx_t_173); __pyx_t_173 = 0;
+  __Pyx_DECREF(__pyx_t_174); __pyx_t_174 = 0;
+  __Pyx_DECREF(__pyx_t_175); __pyx_t_175 = 0;
+  __Pyx_DECREF(__pyx_t_176); __pyx_t_176 = 0;
+  __Pyx_DECREF(__pyx_t_177); __pyx_t_177 = 0;
+  __Pyx_DECREF(__pyx_t_178); __pyx_t_178 = 0;
+  __Pyx_DECREF(__pyx_t_179); __pyx_t_179 = 0;
+  __Pyx_DECREF(__pyx_t_180); __pyx_t_180 = 0;
+  __Pyx_DECREF(__pyx_t_181); __pyx_t_181 = 0;
+  __Pyx_DECREF(__pyx_t_182); __pyx_t_182 = 0;
+  __Pyx_DECREF(__pyx_t_183); __pyx_t_183 = 0;
+  __Pyx_DECREF(__pyx_t_184); __pyx_t_184 = 0;
+  __Pyx_DECREF(__pyx_t_185); __pyx_t_185 = 0;
+  __Pyx_DECREF(__pyx_t_186); __pyx_t_186 = 0;
+  __Pyx_DECREF(__pyx_t_187); __pyx_t_187 = 0;
+  __Pyx_DECREF(__pyx_t_188); __pyx_t_188 = 0;
+  __Pyx_DECREF(__pyx_t_189); __pyx_t_189 = 0;
+  __Pyx_DECREF(__pyx_t_190); __pyx_t_190 = 0;
+  __Pyx_DECREF(__pyx_t_191); __pyx_t_191 = 0;
+  __Pyx_DECREF(__pyx_t_192); __pyx_t_192 = 0;
+  __Pyx_DECREF(__pyx_t_193); __pyx_t_193 = 0;
+  __Pyx_DECREF(__pyx_t_194); __pyx_t_194 = 0;
+  __Pyx_DECREF(__pyx_t_195); __pyx_t_195 = 0;
+  __Pyx_DECREF(__pyx_t_196); __pyx_t_196 = 0;
+  __Pyx_DECREF(__pyx_t_197); __pyx_t_197 = 0;
+  __Pyx_DECREF(__pyx_t_198); __pyx_t_198 = 0;
+  __Pyx_DECREF(__pyx_t_199); __pyx_t_199 = 0;
+  __Pyx_DECREF(__pyx_t_200); __pyx_t_200 = 0;
+  __Pyx_DECREF(__pyx_t_201); __pyx_t_201 = 0;
+  __Pyx_DECREF(__pyx_t_202); __pyx_t_202 = 0;
+  __Pyx_DECREF(__pyx_t_203); __pyx_t_203 = 0;
+  __Pyx_DECREF(__pyx_t_204); __pyx_t_204 = 0;
+  __Pyx_DECREF(__pyx_t_205); __pyx_t_205 = 0;
+  __Pyx_DECREF(__pyx_t_206); __pyx_t_206 = 0;
+  __Pyx_DECREF(__pyx_t_207); __pyx_t_207 = 0;
+  __Pyx_DECREF(__pyx_t_208); __pyx_t_208 = 0;
+  __Pyx_DECREF(__pyx_t_209); __pyx_t_209 = 0;
+  __Pyx_DECREF(__pyx_t_210); __pyx_t_210 = 0;
+  __Pyx_DECREF(__pyx_t_211); __pyx_t_211 = 0;
+  __Pyx_DECREF(__pyx_t_212); __pyx_t_212 = 0;
+  __Pyx_DECREF(__pyx_t_213); __pyx_t_213 = 0;
+  __Pyx_DECREF(__pyx_t_214); __pyx_t_214 = 0;
+  __Pyx_DECREF(__pyx_t_215); __pyx_t_215 = 0;
+  __Pyx_DECREF(__pyx_t_216); __pyx_t_216 = 0;
+  __Pyx_DECREF(__pyx_t_217); __pyx_t_217 = 0;
+  __Pyx_DECREF(__pyx_t_218); __pyx_t_218 = 0;
+  __Pyx_DECREF(__pyx_t_219); __pyx_t_219 = 0;
+  __Pyx_DECREF(__pyx_t_220); __pyx_t_220 = 0;
+  __Pyx_DECREF(__pyx_t_221); __pyx_t_221 = 0;
+  __Pyx_DECREF(__pyx_t_222); __pyx_t_222 = 0;
+  __Pyx_DECREF(__pyx_t_223); __pyx_t_223 = 0;
+  __Pyx_DECREF(__pyx_t_224); __pyx_t_224 = 0;
+  __Pyx_DECREF(__pyx_t_225); __pyx_t_225 = 0;
+  __Pyx_DECREF(__pyx_t_226); __pyx_t_226 = 0;
+  __Pyx_DECREF(__pyx_t_227); __pyx_t_227 = 0;
+  __Pyx_DECREF(__pyx_t_228); __pyx_t_228 = 0;
+  __Pyx_DECREF(__pyx_t_229); __pyx_t_229 = 0;
+  __Pyx_DECREF(__pyx_t_230); __pyx_t_230 = 0;
+  __Pyx_DECREF(__pyx_t_231); __pyx_t_231 = 0;
+  __Pyx_DECREF(__pyx_t_232); __pyx_t_232 = 0;
+  __Pyx_DECREF(__pyx_t_233); __pyx_t_233 = 0;
+  __Pyx_DECREF(__pyx_t_234); __pyx_t_234 = 0;
+  __Pyx_DECREF(__pyx_t_235); __pyx_t_235 = 0;
+  __Pyx_DECREF(__pyx_t_236); __pyx_t_236 = 0;
+  __Pyx_DECREF(__pyx_t_237); __pyx_t_237 = 0;
+  __Pyx_DECREF(__pyx_t_238); __pyx_t_238 = 0;
+  __Pyx_DECREF(__pyx_t_239); __pyx_t_239 = 0;
+  __Pyx_DECREF(__pyx_t_240); __pyx_t_240 = 0;
+  __Pyx_DECREF(__pyx_t_241); __pyx_t_241 = 0;
+  __Pyx_DECREF(__pyx_t_242); __pyx_t_242 = 0;
+  __Pyx_DECREF(__pyx_t_243); __pyx_t_243 = 0;
+  __Pyx_DECREF(__pyx_t_244); __pyx_t_244 = 0;
+  __Pyx_DECREF(__pyx_t_245); __pyx_t_245 = 0;
+  __Pyx_DECREF(__pyx_t_246); __pyx_t_246 = 0;
+  __Pyx_DECREF(__pyx_t_247); __pyx_t_247 = 0;
+  __Pyx_DECREF(__pyx_t_248); __pyx_t_248 = 0;
+  __Pyx_DECREF(__pyx_t_249); __pyx_t_249 = 0;
+  __Pyx_DECREF(__pyx_t_250); __pyx_t_250 = 0;
+  __Pyx_DECREF(__pyx_t_251); __pyx_t_251 = 0;
+  __Pyx_DECREF(__pyx_t_252); __pyx_t_252 = 0;
+  __Pyx_DECREF(__pyx_t_253); __pyx_t_253 = 0;
+  __Pyx_DECREF(__pyx_t_254); __pyx_t_254 = 0;
+  __Pyx_DECREF(__pyx_t_255); __pyx_t_255 = 0;
+  __Pyx_DECREF(__pyx_t_256); __pyx_t_256 = 0;
+  __Pyx_DECREF(__pyx_t_257); __pyx_t_257 = 0;
+  __Pyx_XGOTREF(__pyx_v_3nes_3cpu_6cpu_op_LOOKUP);
+  __Pyx_DECREF_SET(__pyx_v_3nes_3cpu_6cpu_op_LOOKUP, ((PyObject*)__pyx_t_258));
+  __Pyx_GIVEREF(__pyx_t_258);
+  __pyx_t_258 = 0;
+
+  /* "nes/cpu/cpu_op.pyx":39
+ * ]
+ * 
+ * LENGTHS = [ 1, 2, 2, 2, 2, 2, 3, 3, 3, 3, 2, 2 ]             # <<<<<<<<<<<<<<
+ * 
+ * for addrmode, length in enumerate(LENGTHS):
+*/
+  {
+    PyObject* __pyx_temp[12] = {__pyx_mstate_global->__pyx_int_1, __pyx_mstate_global->__pyx_int_2, __pyx_mstate_global->__pyx_int_2, __pyx_mstate_global->__pyx_int_2, __pyx_mstate_global->__pyx_int_2, __pyx_mstate_global->__pyx_int_2, __pyx_mstate_global->__pyx_int_3, __pyx_mstate_global->__pyx_int_3, __pyx_mstate_global->__pyx_int_3, __pyx_mstate_global->__pyx_int_3, __pyx_mstate_global->__pyx_int_2, __pyx_mstate_global->__pyx_int_2};
+    __pyx_t_258 = __Pyx_PyList_FromArray(__pyx_temp, 12); if (unlikely(!__pyx_t_258)) __PYX_ERR(0, 39, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_258);
+  }
+  if (PyDict_SetItem(__pyx_mstate_global->__pyx_d, __pyx_mstate_global->__pyx_n_u_LENGTHS, __pyx_t_258) < (0)) __PYX_ERR(0, 39, __pyx_L1_error)
+  __Pyx_DECREF(__pyx_t_258); __pyx_t_258 = 0;
+
+  /* "nes/cpu/cpu_op.pyx":41
+ * LENGTHS = [ 1, 2, 2, 2, 2, 2, 3, 3, 3, 3, 2, 2 ]
+ * 
+ * for addrmode, length in enumerate(LENGTHS):             # <<<<<<<<<<<<<<
+ *     ADDRMODE_LENGTH[addrmode] = length
+ * 
+*/
+  __Pyx_INCREF(__pyx_mstate_global->__pyx_int_0);
+  __pyx_t_258 = __pyx_mstate_global->__pyx_int_0;
+  __Pyx_GetModuleGlobalName(__pyx_t_257, __pyx_mstate_global->__pyx_n_u_LENGTHS); if (unlikely(!__pyx_t_257)) __PYX_ERR(0, 41, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_257);
+  if (likely(PyList_CheckExact(__pyx_t_257)) || PyTuple_CheckExact(__pyx_t_257)) {
+    __pyx_t_256 = __pyx_t_257; __Pyx_INCREF(__pyx_t_256);
+    __pyx_t_259 = 0;
+    __pyx_t_260 = NULL;
+  } else {
+    __pyx_t_259 = -1; __pyx_t_256 = PyObject_GetIter(__pyx_t_257); if (unlikely(!__pyx_t_256)) __PYX_ERR(0, 41, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_256);
+    __pyx_t_260 = (CYTHON_COMPILING_IN_LIMITED_API) ? PyIter_Next : __Pyx_PyObject_GetIterNextFunc(__pyx_t_256); if (unlikely(!__pyx_t_260)) __PYX_ERR(0, 41, __pyx_L1_error)
+  }
+  __Pyx_DECREF(__pyx_t_257); __pyx_t_257 = 0;
+  for (;;) {
+    if (likely(!__pyx_t_260)) {
+      if (likely(PyList_CheckExact(__pyx_t_256))) {
+        {
+          Py_ssize_t __pyx_temp = __Pyx_PyList_GET_SIZE(__pyx_t_256);
+          #if !CYTHON_ASSUME_SAFE_SIZE
+          if (unlikely((__pyx_temp < 0))) __PYX_ERR(0, 41, __pyx_L1_error)
+          #endif
+          if (__pyx_t_259 >= __pyx_temp) break;
+        }
+        __pyx_t_257 = __Pyx_PyList_GET_ITEM_REF(__pyx_t_256, __pyx_t_259, __Pyx_ReferenceSharing_OwnStrongReference);
+        ++__pyx_t_259;
+      } else {
+        {
+          Py_ssize_t __pyx_temp = __Pyx_PyTuple_GET_SIZE(__pyx_t_256);
+          #if !CYTHON_ASSUME_SAFE_SIZE
+          if (unlikely((__pyx_temp < 0))) __PYX_ERR(0, 41, __pyx_L1_error)
+          #endif
+          if (__pyx_t_259 >= __pyx_temp) break;
+        }
+        #if CYTHON_ASSUME_SAFE_MACROS && !CYTHON_AVOID_BORROWED_REFS
+        __pyx_t_257 = __Pyx_NewRef(PyTuple_GET_ITEM(__pyx_t_256, __pyx_t_259));
+        #else
+        __pyx_t_257 = __Pyx_PySequence_ITEM(__pyx_t_256, __pyx_t_259);
+        #endif
+        ++__pyx_t_259;
+      }
+      if (unlikely(!__pyx_t_257)) __PYX_ERR(0, 41, __pyx_L1_error)
+    } else {
+      __pyx_t_257 = __pyx_t_260(__pyx_t_256);
+      if (unlikely(!__pyx_t_257)) {
+        PyObject* exc_type = PyErr_Occurred();
+        if (exc_type) {
+          if (unlikely(!__Pyx_PyErr_GivenExceptionMatches(exc_type, PyExc_StopIteration))) __PYX_ERR(0, 41, __pyx_L1_error)
+          PyErr_Clear();
+        }
+        break;
+      }
+    }
+    __Pyx_GOTREF(__pyx_t_257);
+    if (PyDict_SetItem(__pyx_mstate_global->__pyx_d, __pyx_mstate_global->__pyx_n_u_length, __pyx_t_257) < (0)) __PYX_ERR(0, 41, __pyx_L1_error)
+    __Pyx_DECREF(__pyx_t_257); __pyx_t_257 = 0;
+    if (PyDict_SetItem(__pyx_mstate_global->__pyx_d, __pyx_mstate_global->__pyx_n_u_addrmode, __pyx_t_258) < (0)) __PYX_ERR(0, 41, __pyx_L1_error)
+    __pyx_t_257 = __Pyx_PyLong_AddObjC(__pyx_t_258, __pyx_mstate_global->__pyx_int_1, 1, 0, 0); if (unlikely(!__pyx_t_257)) __PYX_ERR(0, 41, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_257);
+    __Pyx_DECREF(__pyx_t_258);
+    __pyx_t_258 = __pyx_t_257;
+    __pyx_t_257 = 0;
+
+    /* "nes/cpu/cpu_op.pyx":42
+ * 
+ * for addrmode, length in enumerate(LENGTHS):
+ *     ADDRMODE_LENGTH[addrmode] = length             # <<<<<<<<<<<<<<
+ * 
+ * for opcode, op in enumerate(LOOKUP):
+*/
+    __Pyx_GetModuleGlobalName(__pyx_t_257, __pyx_mstate_global->__pyx_n_u_length); if (unlikely(!__pyx_t_257)) __PYX_ERR(0, 42, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_257);
+    __pyx_t_261 = __Pyx_PyLong_As_uint8_t(__pyx_t_257); if (unlikely((__pyx_t_261 == ((uint8_t)-1)) && PyErr_Occurred())) __PYX_ERR(0, 42, __pyx_L1_error)
+    __Pyx_DECREF(__pyx_t_257); __pyx_t_257 = 0;
+    __Pyx_GetModuleGlobalName(__pyx_t_257, __pyx_mstate_global->__pyx_n_u_addrmode); if (unlikely(!__pyx_t_257)) __PYX_ERR(0, 42, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_257);
+    __pyx_t_262 = __Pyx_PyIndex_AsSsize_t(__pyx_t_257); if (unlikely((__pyx_t_262 == (Py_ssize_t)-1) && PyErr_Occurred())) __PYX_ERR(0, 42, __pyx_L1_error)
+    __Pyx_DECREF(__pyx_t_257); __pyx_t_257 = 0;
+    (__pyx_v_3nes_3cpu_6cpu_op_ADDRMODE_LENGTH[__pyx_t_262]) = __pyx_t_261;
+
+
+
+    /* "nes/cpu/cpu_op.pyx":41
+ * LENGTHS = [ 1, 2, 2, 2, 2, 2, 3, 3, 3, 3, 2, 2 ]
+ * 
+ * for addrmode, length in enumerate(LENGTHS):             # <<<<<<<<<<<<<<
+ *     ADDRMODE_LENGTH[addrmode] = length
+ * 
+*/
+  }
+  __Pyx_DECREF(__pyx_t_256); __pyx_t_256 = 0;
+  __Pyx_DECREF(__pyx_t_258); __pyx_t_258 = 0;
+
+  /* "nes/cpu/cpu_op.pyx":44
+ *     ADDRMODE_LENGTH[addrmode] = length
+ * 
+ * for opcode, op in enumerate(LOOKUP):             # <<<<<<<<<<<<<<
+ *     OP_CYCLES[opcode] = op.cycles
+ *     OP_ADDRMODE[opcode] = ADDRMODES.index(op.addrmode)
+*/
+  __Pyx_INCREF(__pyx_mstate_global->__pyx_int_0);
+  __pyx_t_258 = __pyx_mstate_global->__pyx_int_0;
+  __pyx_t_256 = __pyx_v_3nes_3cpu_6cpu_op_LOOKUP; __Pyx_INCREF(__pyx_t_256);
+  __pyx_t_259 = 0;
+  for (;;) {
+    {
+      Py_ssize_t __pyx_temp = __Pyx_PyList_GET_SIZE(__pyx_t_256);
+      #if !CYTHON_ASSUME_SAFE_SIZE
+      if (unlikely((__pyx_temp < 0))) __PYX_ERR(0, 44, __pyx_L1_error)
+      #endif
+      if (__pyx_t_259 >= __pyx_temp) break;
+    }
+    __pyx_t_257 = __Pyx_PyList_GET_ITEM_REF(__pyx_t_256, __pyx_t_259, __Pyx_ReferenceSharing_OwnStrongReference);
+    ++__pyx_t_259;
+    if (unlikely(!__pyx_t_257)) __PYX_ERR(0, 44, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_257);
+    if (PyDict_SetItem(__pyx_mstate_global->__pyx_d, __pyx_mstate_global->__pyx_n_u_op, __pyx_t_257) < (0)) __PYX_ERR(0, 44, __pyx_L1_error)
+    __Pyx_DECREF(__pyx_t_257); __pyx_t_257 = 0;
+    if (PyDict_SetItem(__pyx_mstate_global->__pyx_d, __pyx_mstate_global->__pyx_n_u_opcode, __pyx_t_258) < (0)) __PYX_ERR(0, 44, __pyx_L1_error)
+    __pyx_t_257 = __Pyx_PyLong_AddObjC(__pyx_t_258, __pyx_mstate_global->__pyx_int_1, 1, 0, 0); if (unlikely(!__pyx_t_257)) __PYX_ERR(0, 44, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_257);
+    __Pyx_DECREF(__pyx_t_258);
+    __pyx_t_258 = __pyx_t_257;
+    __pyx_t_257 = 0;
+
+    /* "nes/cpu/cpu_op.pyx":45
+ * 
+ * for opcode, op in enumerate(LOOKUP):
+ *     OP_CYCLES[opcode] = op.cycles             # <<<<<<<<<<<<<<
+ *     OP_ADDRMODE[opcode] = ADDRMODES.index(op.addrmode)
+ *     OP_INSTRUCTION[opcode] = INSTRUCTIONS.index(op.operate)
+*/
+    __Pyx_GetModuleGlobalName(__pyx_t_257, __pyx_mstate_global->__pyx_n_u_op); if (unlikely(!__pyx_t_257)) __PYX_ERR(0, 45, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_257);
+    __pyx_t_255 = __Pyx_PyObject_GetAttrStr(__pyx_t_257, __pyx_mstate_global->__pyx_n_u_cycles); if (unlikely(!__pyx_t_255)) __PYX_ERR(0, 45, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_255);
+    __Pyx_DECREF(__pyx_t_257); __pyx_t_257 = 0;
+    __pyx_t_261 = __Pyx_PyLong_As_uint8_t(__pyx_t_255); if (unlikely((__pyx_t_261 == ((uint8_t)-1)) && PyErr_Occurred())) __PYX_ERR(0, 45, __pyx_L1_error)
+    __Pyx_DECREF(__pyx_t_255); __pyx_t_255 = 0;
+    __Pyx_GetModuleGlobalName(__pyx_t_255, __pyx_mstate_global->__pyx_n_u_opcode); if (unlikely(!__pyx_t_255)) __PYX_ERR(0, 45, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_255);
+    __pyx_t_262 = __Pyx_PyIndex_AsSsize_t(__pyx_t_255); if (unlikely((__pyx_t_262 == (Py_ssize_t)-1) && PyErr_Occurred())) __PYX_ERR(0, 45, __pyx_L1_error)
+    __Pyx_DECREF(__pyx_t_255); __pyx_t_255 = 0;
+    (__pyx_v_3nes_3cpu_6cpu_op_OP_CYCLES[__pyx_t_262]) = __pyx_t_261;
+
+
+
+    /* "nes/cpu/cpu_op.pyx":46
+ * for opcode, op in enumerate(LOOKUP):
+ *     OP_CYCLES[opcode] = op.cycles
+ *     OP_ADDRMODE[opcode] = ADDRMODES.index(op.addrmode)             # <<<<<<<<<<<<<<
+ *     OP_INSTRUCTION[opcode] = INSTRUCTIONS.index(op.operate)
+*/
+    __pyx_t_257 = NULL;
+    __Pyx_GetModuleGlobalName(__pyx_t_254, __pyx_mstate_global->__pyx_n_u_ADDRMODES); if (unlikely(!__pyx_t_254)) __PYX_ERR(0, 46, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_254);
+    __pyx_t_253 = __Pyx_PyObject_GetAttrStr(__pyx_t_254, __pyx_mstate_global->__pyx_n_u_index); if (unlikely(!__pyx_t_253)) __PYX_ERR(0, 46, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_253);
+    __Pyx_DECREF(__pyx_t_254); __pyx_t_254 = 0;
+    __Pyx_GetModuleGlobalName(__pyx_t_254, __pyx_mstate_global->__pyx_n_u_op); if (unlikely(!__pyx_t_254)) __PYX_ERR(0, 46, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_254);
+    __pyx_t_252 = __Pyx_PyObject_GetAttrStr(__pyx_t_254, __pyx_mstate_global->__pyx_n_u_addrmode); if (unlikely(!__pyx_t_252)) __PYX_ERR(0, 46, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_252);
+    __Pyx_DECREF(__pyx_t_254); __pyx_t_254 = 0;
+    __pyx_t_263 = 1;
+    #if CYTHON_UNPACK_METHODS
+    if (unlikely(PyMethod_Check(__pyx_t_253))) {
+      __pyx_t_257 = PyMethod_GET_SELF(__pyx_t_253);
+      assert(__pyx_t_257);
+      PyObject* __pyx__function = PyMethod_GET_FUNCTION(__pyx_t_253);
+      __Pyx_INCREF(__pyx_t_257);
+      __Pyx_INCREF(__pyx__function);
+      __Pyx_DECREF_SET(__pyx_t_253, __pyx__function);
+      __pyx_t_263 = 0;
+    }
+    #endif
+    {
+      PyObject *__pyx_callargs[2] = {__pyx_t_257, __pyx_t_252};
+      __pyx_t_255 = __Pyx_PyObject_FastCall((PyObject*)__pyx_t_253, __pyx_callargs+__pyx_t_263, (2-__pyx_t_263) | (__pyx_t_263*__Pyx_PY_VECTORCALL_ARGUMENTS_OFFSET));
+      __Pyx_XDECREF(__pyx_t_257); __pyx_t_257 = 0;
+      __Pyx_DECREF(__pyx_t_252); __pyx_t_252 = 0;
+      __Pyx_DECREF(__pyx_t_253); __pyx_t_253 = 0;
+      if (unlikely(!__pyx_t_255)) __PYX_ERR(0, 46, __pyx_L1_error)
+      __Pyx_GOTREF(__pyx_t_255);
+    }
+    __pyx_t_261 = __Pyx_PyLong_As_uint8_t(__pyx_t_255); if (unlikely((__pyx_t_261 == ((uint8_t)-1)) && PyErr_Occurred())) __PYX_ERR(0, 46, __pyx_L1_error)
+    __Pyx_DECREF(__pyx_t_255); __pyx_t_255 = 0;
+    __Pyx_GetModuleGlobalName(__pyx_t_255, __pyx_mstate_global->__pyx_n_u_opcode); if (unlikely(!__pyx_t_255)) __PYX_ERR(0, 46, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_255);
+    __pyx_t_262 = __Pyx_PyIndex_AsSsize_t(__pyx_t_255); if (unlikely((__pyx_t_262 == (Py_ssize_t)-1) && PyErr_Occurred())) __PYX_ERR(0, 46, __pyx_L1_error)
+    __Pyx_DECREF(__pyx_t_255); __pyx_t_255 = 0;
+    (__pyx_v_3nes_3cpu_6cpu_op_OP_ADDRMODE[__pyx_t_262]) = __pyx_t_261;
+
+
+
+    /* "nes/cpu/cpu_op.pyx":47
+ *     OP_CYCLES[opcode] = op.cycles
+ *     OP_ADDRMODE[opcode] = ADDRMODES.index(op.addrmode)
+ *     OP_INSTRUCTION[opcode] = INSTRUCTIONS.index(op.operate)             # <<<<<<<<<<<<<<
+*/
+    __pyx_t_253 = NULL;
+    __Pyx_GetModuleGlobalName(__pyx_t_252, __pyx_mstate_global->__pyx_n_u_INSTRUCTIONS); if (unlikely(!__pyx_t_252)) __PYX_ERR(0, 47, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_252);
+    __pyx_t_257 = __Pyx_PyObject_GetAttrStr(__pyx_t_252, __pyx_mstate_global->__pyx_n_u_index); if (unlikely(!__pyx_t_257)) __PYX_ERR(0, 47, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_257);
+    __Pyx_DECREF(__pyx_t_252); __pyx_t_252 = 0;
+    __Pyx_GetModuleGlobalName(__pyx_t_252, __pyx_mstate_global->__pyx_n_u_op); if (unlikely(!__pyx_t_252)) __PYX_ERR(0, 47, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_252);
+    __pyx_t_254 = __Pyx_PyObject_GetAttrStr(__pyx_t_252, __pyx_mstate_global->__pyx_n_u_operate); if (unlikely(!__pyx_t_254)) __PYX_ERR(0, 47, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_254);
+    __Pyx_DECREF(__pyx_t_252); __pyx_t_252 = 0;
+    __pyx_t_263 = 1;
+    #if CYTHON_UNPACK_METHODS
+    if (unlikely(PyMethod_Check(__pyx_t_257))) {
+      __pyx_t_253 = PyMethod_GET_SELF(__pyx_t_257);
+      assert(__pyx_t_253);
+      PyObject* __pyx__function = PyMethod_GET_FUNCTION(__pyx_t_257);
+      __Pyx_INCREF(__pyx_t_253);
+      __Pyx_INCREF(__pyx__function);
+      __Pyx_DECREF_SET(__pyx_t_257, __pyx__function);
+      __pyx_t_263 = 0;
+    }
+    #endif
+    {
+      PyObject *__pyx_callargs[2] = {__pyx_t_253, __pyx_t_254};
+      __pyx_t_255 = __Pyx_PyObject_FastCall((PyObject*)__pyx_t_257, __pyx_callargs+__pyx_t_263, (2-__pyx_t_263) | (__pyx_t_263*__Pyx_PY_VECTORCALL_ARGUMENTS_OFFSET));
+      __Pyx_XDECREF(__pyx_t_253); __pyx_t_253 = 0;
+      __Pyx_DECREF(__pyx_t_254); __pyx_t_254 = 0;
+      __Pyx_DECREF(__pyx_t_257); __pyx_t_257 = 0;
+      if (unlikely(!__pyx_t_255)) __PYX_ERR(0, 47, __pyx_L1_error)
+      __Pyx_GOTREF(__pyx_t_255);
+    }
+    __pyx_t_261 = __Pyx_PyLong_As_uint8_t(__pyx_t_255); if (unlikely((__pyx_t_261 == ((uint8_t)-1)) && PyErr_Occurred())) __PYX_ERR(0, 47, __pyx_L1_error)
+    __Pyx_DECREF(__pyx_t_255); __pyx_t_255 = 0;
+    __Pyx_GetModuleGlobalName(__pyx_t_255, __pyx_mstate_global->__pyx_n_u_opcode); if (unlikely(!__pyx_t_255)) __PYX_ERR(0, 47, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_t_255);
+    __pyx_t_262 = __Pyx_PyIndex_AsSsize_t(__pyx_t_255); if (unlikely((__pyx_t_262 == (Py_ssize_t)-1) && PyErr_Occurred())) __PYX_ERR(0, 47, __pyx_L1_error)
+    __Pyx_DECREF(__pyx_t_255); __pyx_t_255 = 0;
+    (__pyx_v_3nes_3cpu_6cpu_op_OP_INSTRUCTION[__pyx_t_262]) = __pyx_t_261;
+
+
+
+    /* "nes/cpu/cpu_op.pyx":44
+ *     ADDRMODE_LENGTH[addrmode] = length
+ * 
+ * for opcode, op in enumerate(LOOKUP):             # <<<<<<<<<<<<<<
+ *     OP_CYCLES[opcode] = op.cycles
+ *     OP_ADDRMODE[opcode] = ADDRMODES.index(op.addrmode)
+*/
+  }
+  __Pyx_DECREF(__pyx_t_256); __pyx_t_256 = 0;
+  __Pyx_DECREF(__pyx_t_258); __pyx_t_258 = 0;
+
+  /* "(tree fragment)":4
+ *     int __Pyx_CheckUnpickleChecksum(long, long, long, long, const char*) except -1
+ *     int __Pyx_UpdateUnpickledDict(object, object, Py_ssize_t) except -1
+ * def __pyx_unpickle_Op(__pyx_type, long __pyx_checksum, tuple __pyx_state):             # <<<<<<<<<<<<<<
+ *     cdef object __pyx_result
+ *     __Pyx_CheckUnpickleChecksum(__pyx_checksum, 0x8918c1b, 0xf920461, 0x4e94d2c, b'addrmode, cycles, name, operate')
+*/
+  __pyx_t_258 = __Pyx_CyFunction_New(&__pyx_mdef_3nes_3cpu_6cpu_op_1__pyx_unpickle_Op, 0, __pyx_mstate_global->__pyx_n_u_pyx_unpickle_Op, NULL, __pyx_mstate_global->__pyx_n_u_nes_cpu_cpu_op, __pyx_mstate_global->__pyx_d, ((PyObject *)__pyx_mstate_global->__pyx_codeobj_tab[2])); if (unlikely(!__pyx_t_258)) __PYX_ERR(2, 4, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_258);
+  #if CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX >= 0x030E0000
+  PyUnstable_Object_EnableDeferredRefcount(__pyx_t_258);
+  #endif
+  if (PyDict_SetItem(__pyx_mstate_global->__pyx_d, __pyx_mstate_global->__pyx_n_u_pyx_unpickle_Op, __pyx_t_258) < (0)) __PYX_ERR(2, 4, __pyx_L1_error)
+  __Pyx_DECREF(__pyx_t_258); __pyx_t_258 = 0;
+
+  /* "nes/cpu/cpu_op.pyx":1
+ * cdef class Op:             # <<<<<<<<<<<<<<
+ *     '''
+ *     Opcode metadata, only used for disassembling: the CPU dispatches on the typed tables below
+*/
+  __pyx_t_258 = __Pyx_PyDict_NewPresized(0); if (unlikely(!__pyx_t_258)) __PYX_ERR(0, 1, __pyx_L1_error)
+  __Pyx_GOTREF(__pyx_t_258);
+  if (PyDict_SetItem(__pyx_mstate_global->__pyx_d, __pyx_mstate_global->__pyx_n_u_test, __pyx_t_258) < (0)) __PYX_ERR(0, 1, __pyx_L1_error)
+  __Pyx_DECREF(__pyx_t_258); __pyx_t_258 = 0;
+
+  /*--- Wrapped vars code ---*/
+
+  goto __pyx_L0;
+  __pyx_L1_error:;
+  __Pyx_XDECREF(__pyx_t_2);
+  __Pyx_XDECREF(__pyx_t_3);
+  __Pyx_XDECREF(__pyx_t_4);
+  __Pyx_XDECREF(__pyx_t_5);
+  __Pyx_XDECREF(__pyx_t_6);
+  __Pyx_XDECREF(__pyx_t_7);
+  __Pyx_XDECREF(__pyx_t_8);
+  __Pyx_XDECREF(__pyx_t_9);
+  __Pyx_XDECREF(__pyx_t_10);
+  __Pyx_XDECREF(__pyx_t_11);
+  __Pyx_XDECREF(__pyx_t_12);
+  __Pyx_XDECREF(__pyx_t_13);
+  __Pyx_XDECREF(__pyx_t_14);
+  __Pyx_XDECREF(__pyx_t_15);
+  __Pyx_XDECREF(__pyx_t_16);
+  __Pyx_XDECREF(__pyx_t_17);
+  __Pyx_XDECREF(__pyx_t_18);
+  __Pyx_XDECREF(__pyx_t_19);
+  __Pyx_XDECREF(__pyx_t_20);
+  __Pyx_XDECREF(__pyx_t_21);
+  __Pyx_XDECREF(__pyx_t_22);
+  __Pyx_XDECREF(__pyx_t_23);
+  __Pyx_XDECREF(__pyx_t_24);
+  __Pyx_XDECREF(__pyx_t_25);
+  __Pyx_XDECREF(__pyx_t_26);
+  __Pyx_XDECREF(__pyx_t_27);
+  __Pyx_XDECREF(__pyx_t_28);
+  __Pyx_XDECREF(__pyx_t_29);
+  __Pyx_XDECREF(__pyx_t_30);
+  __Pyx_XDECREF(__pyx_t_31);
+  __Pyx_XDECREF(__pyx_t_32);
+  __Pyx_XDECREF(__pyx_t_33);
+  __Pyx_XDECREF(__pyx_t_34);
+  __Pyx_XDECREF(__pyx_t_35);
+  __Pyx_XDECREF(__pyx_t_36);
+  __Pyx_XDECREF(__pyx_t_37);
+  __Pyx_XDECREF(__pyx_t_38);
+  __Pyx_XDECREF(__pyx_t_39);
+  __Pyx_XDECREF(__pyx_t_40);
+  __Pyx_XDECREF(__pyx_t_41);
+  __Pyx_XDECREF(__pyx_t_42);
+  __Pyx_XDECREF(__pyx_t_43);
+  __Pyx_XDECREF(__pyx_t_44);
+  __Pyx_XDECREF(__pyx_t_45);
+  __Pyx_XDECREF(__pyx_t_46);
+  __Pyx_XDECREF(__pyx_t_47);
+  __Pyx_XDECREF(__pyx_t_48);
+  __Pyx_XDECREF(__pyx_t_49);
+  __Pyx_XDECREF(__pyx_t_50);
+  __Pyx_XDECREF(__pyx_t_51);
+  __Pyx_XDECREF(__pyx_t_52);
+  __Pyx_XDECREF(__pyx_t_53);
+  __Pyx_XDECREF(__pyx_t_54);
+  __Pyx_XDECREF(__pyx_t_55);
+  __Pyx_XDECREF(__pyx_t_56);
+  __Pyx_XDECREF(__pyx_t_57);
+  __Pyx_XDECREF(__pyx_t_58);
+  __Pyx_XDECREF(__pyx_t_59);
+  __Pyx_XDECREF(__pyx_t_60);
+  __Pyx_XDECREF(__pyx_t_61);
+  __Pyx_XDECREF(__pyx_t_62);
+  __Pyx_XDECREF(__pyx_t_63);
+  __Pyx_XDECREF(__pyx_t_64);
+  __Pyx_XDECREF(__pyx_t_65);
+  __Pyx_XDECREF(__pyx_t_66);
+  __Pyx_XDECREF(__pyx_t_67);
+  __Pyx_XDECREF(__pyx_t_68);
+  __Pyx_XDECREF(__pyx_t_69);
+  __Pyx_XDECREF(__pyx_t_70);
+  __Pyx_XDECREF(__pyx_t_71);
+  __Pyx_XDECREF(__pyx_t_72);
+  __Pyx_XDECREF(__pyx_t_73);
+  __Pyx_XDECREF(__pyx_t_74);
+  __Pyx_XDECREF(__pyx_t_75);
+  __Pyx_XDECREF(__pyx_t_76);
+  __Pyx_XDECREF(__pyx_t_77);
+  __Pyx_XDECREF(__pyx_t_78);
+  __Pyx_XDECREF(__pyx_t_79);
+  __Pyx_XDECREF(__pyx_t_80);
+  __Pyx_XDECREF(__pyx_t_81);
+  __Pyx_XDECREF(__pyx_t_82);
+  __Pyx_XDECREF(__pyx_t_83);
+  __Pyx_XDECREF(__pyx_t_84);
+  __Pyx_XDECREF(__pyx_t_85);
+  __Pyx_XDECREF(__pyx_t_86);
+  __Pyx_XDECREF(__pyx_t_87);
+  __Pyx_XDECREF(__pyx_t_88);
+  __Pyx_XDECREF(__pyx_t_89);
+  __Pyx_XDECREF(__pyx_t_90);
+  __Pyx_XDECREF(__pyx_t_91);
+  __Pyx_XDECREF(__pyx_t_92);
+  __Pyx_XDECREF(__pyx_t_93);
+  __Pyx_XDECREF(__pyx_t_94);
+  __Pyx_XDECREF(__pyx_t_95);
+  __Pyx_XDECREF(__pyx_t_96);
+  __Pyx_XDECREF(__pyx_t_97);
+  __Pyx_XDECREF(__pyx_t_98);
+  __Pyx_XDECREF(__pyx_t_99);
+  __Pyx_XDECREF(__pyx_t_100);
+  __Pyx_XDECREF(__pyx_t_101);
+  __Pyx_XDECREF(__pyx_t_102);
+  __Pyx_XDECREF(__pyx_t_103);
+  __Pyx_XDECREF(__pyx_t_104);
+  __Pyx_XDECREF(__pyx_t_105);
+  __Pyx_XDECREF(__pyx_t_106);
+  __Pyx_XDECREF(__pyx_t_107);
+  __Pyx_XDECREF(__pyx_t_108);
+  __Pyx_XDECREF(__pyx_t_109);
+  __Pyx_XDECREF(__pyx_t_110);
+  __Pyx_XDECREF(__pyx_t_111);
+  __Pyx_XDECREF(__pyx_t_112);
+  __Pyx_XDECREF(__pyx_t_113);
+  __Pyx_XDECREF(__pyx_t_114);
+  __Pyx_XDECREF(__pyx_t_115);
+  __Pyx_XDECREF(__pyx_t_116);
+  __Pyx_XDECREF(__pyx_t_117);
+  __Pyx_XDECREF(__pyx_t_118);
+  __Pyx_XDECREF(__pyx_t_119);
+  __Pyx_XDECREF(__pyx_t_120);
+  __Pyx_XDECREF(__pyx_t_121);
+  __Pyx_XDECREF(__pyx_t_122);
+  __Pyx_XDECREF(__pyx_t_123);
+  __Pyx_XDECREF(__pyx_t_124);
+  __Pyx_XDECREF(__pyx_t_125);
+  __Pyx_XDECREF(__pyx_t_126);
+  __Pyx_XDECREF(__pyx_t_127);
+  __Pyx_XDECREF(__pyx_t_128);
+  __Pyx_XDECREF(__pyx_t_129);
+  __Pyx_XDECREF(__pyx_t_130);
+  __Pyx_XDECREF(__pyx_t_131);
+  __Pyx_XDECREF(__pyx_t_132);
+  __Pyx_XDECREF(__pyx_t_133);
+  __Pyx_XDECREF(__pyx_t_134);
+  __Pyx_XDECREF(__pyx_t_135);
+  __Pyx_XDECREF(__pyx_t_136);
+  __Pyx_XDECREF(__pyx_t_137);
+  __Pyx_XDECREF(__pyx_t_138);
+  __Pyx_XDECREF(__pyx_t_139);
+  __Pyx_XDECREF(__pyx_t_140);
+  __Pyx_XDECREF(__pyx_t_141);
+  __Pyx_XDECREF(__pyx_t_142);
+  __Pyx_XDECREF(__pyx_t_143);
+  __Pyx_XDECREF(__pyx_t_144);
+  __Pyx_XDECREF(__pyx_t_145);
+  __Pyx_XDECREF(__pyx_t_146);
+  __Pyx_XDECREF(__pyx_t_147);
+  __Pyx_XDECREF(__pyx_t_148);
+  __Pyx_XDECREF(__pyx_t_149);
+  __Pyx_XDECREF(__pyx_t_150);
+  __Pyx_XDECREF(__pyx_t_151);
+  __Pyx_XDECREF(__pyx_t_152);
+  __Pyx_XDECREF(__pyx_t_153);
+  __Pyx_XDECREF(__pyx_t_154);
+  __Pyx_XDECREF(__pyx_t_155);
+  __Pyx_XDECREF(__pyx_t_156);
+  __Pyx_XDECREF(__pyx_t_157);
+  __Pyx_XDECREF(__pyx_t_158);
+  __Pyx_XDECREF(__pyx_t_159);
+  __Pyx_XDECREF(__pyx_t_160);
+  __Pyx_XDECREF(__pyx_t_161);
+  __Pyx_XDECREF(__pyx_t_162);
+  __Pyx_XDECREF(__pyx_t_163);
+  __Pyx_XDECREF(__pyx_t_164);
+  __Pyx_XDECREF(__pyx_t_165);
+  __Pyx_XDECREF(__pyx_t_166);
+  __Pyx_XDECREF(__pyx_t_167);
+  __Pyx_XDECREF(__pyx_t_168);
+  __Pyx_XDECREF(__pyx_t_169);
+  __Pyx_XDECREF(__pyx_t_170);
+  __Pyx_XDECREF(__pyx_t_171);
+  __Pyx_XDECREF(__pyx_t_172);
+  __Pyx_XDECREF(__pyx_t_173);
+  __Pyx_XDECREF(__pyx_t_174);
+  __Pyx_XDECREF(__pyx_t_175);
+  __Pyx_XDECREF(__pyx_t_176);
+  __Pyx_XDECREF(__pyx_t_177);
+  __Pyx_XDECREF(__pyx_t_178);
+  __Pyx_XDECREF(__pyx_t_179);
+  __Pyx_XDECREF(__pyx_t_180);
+  __Pyx_XDECREF(__pyx_t_181);
+  __Pyx_XDECREF(__pyx_t_182);
+  __Pyx_XDECREF(__pyx_t_183);
+  __Pyx_XDECREF(__pyx_t_184);
+  __Pyx_XDECREF(__pyx_t_185);
+  __Pyx_XDECREF(__pyx_t_186);
+  __Pyx_XDECREF(__pyx_t_187);
+  __Pyx_XDECREF(__pyx_t_188);
+  __Pyx_XDECREF(__pyx_t_189);
+  __Pyx_XDECREF(__pyx_t_190);
+  __Pyx_XDECREF(__pyx_t_191);
+  __Pyx_XDECREF(__pyx_t_192);
+  __Pyx_XDECREF(__pyx_t_193);
+  __Pyx_XDECREF(__pyx_t_194);
+  __Pyx_XDECREF(__pyx_t_195);
+  __Pyx_XDECREF(__pyx_t_196);
+  __Pyx_XDECREF(__pyx_t_197);
+  __Pyx_XDECREF(__pyx_t_198);
+  __Pyx_XDECREF(__pyx_t_199);
+  __Pyx_XDECREF(__pyx_t_200);
+  __Pyx_XDECREF(__pyx_t_201);
+  __Pyx_XDECREF(__pyx_t_202);
+  __Pyx_XDECREF(__pyx_t_203);
+  __Pyx_XDECREF(__pyx_t_204);
+  __Pyx_XDECREF(__pyx_t_205);
+  __Pyx_XDECREF(__pyx_t_206);
+  __Pyx_XDECREF(__pyx_t_207);
+  __Pyx_XDECREF(__pyx_t_208);
+  __Pyx_XDECREF(__pyx_t_209);
+  __Pyx_XDECREF(__pyx_t_210);
+  __Pyx_XDECREF(__pyx_t_211);
+  __Pyx_XDECREF(__pyx_t_212);
+  __Pyx_XDECREF(__pyx_t_213);
+  __Pyx_XDECREF(__pyx_t_214);
+  __Pyx_XDECREF(__pyx_t_215);
+  __Pyx_XDECREF(__pyx_t_216);
+  __Pyx_XDECREF(__pyx_t_217);
+  __Pyx_XDECREF(__pyx_t_218);
+  __Pyx_XDECREF(__pyx_t_219);
+  __Pyx_XDECREF(__pyx_t_220);
+  __Pyx_XDECREF(__pyx_t_221);
+  __Pyx_XDECREF(__pyx_t_222);
+  __Pyx_XDECREF(__pyx_t_223);
+  __Pyx_XDECREF(__pyx_t_224);
+  __Pyx_XDECREF(__pyx_t_225);
+  __Pyx_XDECREF(__pyx_t_226);
+  __Pyx_XDECREF(__pyx_t_227);
+  __Pyx_XDECREF(__pyx_t_228);
+  __Pyx_XDECREF(__pyx_t_229);
+  __Pyx_XDECREF(__pyx_t_230);
+  __Pyx_XDECREF(__pyx_t_231);
+  __Pyx_XDECREF(__pyx_t_232);
+  __Pyx_XDECREF(__pyx_t_233);
+  __Pyx_XDECREF(__pyx_t_234);
+  __Pyx_XDECREF(__pyx_t_235);
+  __Pyx_XDECREF(__pyx_t_236);
+  __Pyx_XDECREF(__pyx_t_237);
+  __Pyx_XDECREF(__pyx_t_238);
+  __Pyx_XDECREF(__pyx_t_239);
+  __Pyx_XDECREF(__pyx_t_240);
+  __Pyx_XDECREF(__pyx_t_241);
+  __Pyx_XDECREF(__pyx_t_242);
+  __Pyx_XDECREF(__pyx_t_243);
+  __Pyx_XDECREF(__pyx_t_244);
+  __Pyx_XDECREF(__pyx_t_245);
+  __Pyx_XDECREF(__pyx_t_246);
+  __Pyx_XDECREF(__pyx_t_247);
+  __Pyx_XDECREF(__pyx_t_248);
+  __Pyx_XDECREF(__pyx_t_249);
+  __Pyx_XDECREF(__pyx_t_250);
+  __Pyx_XDECREF(__pyx_t_251);
+  __Pyx_XDECREF(__pyx_t_252);
+  __Pyx_XDECREF(__pyx_t_253);
+  __Pyx_XDECREF(__pyx_t_254);
+  __Pyx_XDECREF(__pyx_t_255);
+  __Pyx_XDECREF(__pyx_t_256);
+  __Pyx_XDECREF(__pyx_t_257);
+  __Pyx_XDECREF(__pyx_t_258);
+  if (__pyx_m) {
+    if (__pyx_mstate->__pyx_d && stringtab_initialized) {
+      __Pyx_AddTraceback("init nes.cpu.cpu_op", __pyx_clineno, __pyx_lineno, __pyx_filename);
+    }
+    #if !CYTHON_USE_MODULE_STATE
+    Py_CLEAR(__pyx_m);
+    #else
+    Py_DECREF(__pyx_m);
+    if (pystate_addmodule_run) {
+      PyObject *tp, *value, *tb;
+      __Pyx_PyErr_FetchException(&tp, &value, &tb);
+      __Pyx_State_RemoveModule(&__pyx_moduledef);
+      __Pyx_PyErr_RestoreException(tp, value, tb);
+    }
+    #endif
+  } else if (!PyErr_Occurred()) {
+    PyErr_SetString(PyExc_ImportError, "init nes.cpu.cpu_op");
+  }
+  __pyx_L0:;
+  __Pyx_RefNannyFinishContext();
+  #if CYTHON_PEP489_MULTI_PHASE_INIT
+  return (__pyx_m != NULL) ? 0 : -1;
+  #else
+  return __pyx_m;
+  #endif
+}
+/* #### Code section: pystring_table ### */
+/* #### Code section: cached_builtins ### */
+
+static int __Pyx_InitCachedBuiltins(__pyx_mstatetype *__pyx_mstate) {
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  CYTHON_UNUSED_VAR(__pyx_mstate);
+  __pyx_builtin_enumerate = __Pyx_GetBuiltinName(__pyx_mstate->__pyx_n_u_enumerate); if (!__pyx_builtin_enumerate) __PYX_ERR(0, 41, __pyx_L1_error)
+
+  /* Cached unbound methods */
+  __pyx_mstate->__pyx_umethod_PyDict_Type_items.type = (PyObject*)&PyDict_Type;
+  __pyx_mstate->__pyx_umethod_PyDict_Type_items.method_name = &__pyx_mstate->__pyx_n_u_items;
+  __pyx_mstate->__pyx_umethod_PyDict_Type_pop.type = (PyObject*)&PyDict_Type;
+  __pyx_mstate->__pyx_umethod_PyDict_Type_pop.method_name = &__pyx_mstate->__pyx_n_u_pop;
+  __pyx_mstate->__pyx_umethod_PyDict_Type_values.type = (PyObject*)&PyDict_Type;
+  __pyx_mstate->__pyx_umethod_PyDict_Type_values.method_name = &__pyx_mstate->__pyx_n_u_values;
+  return 0;
+  __pyx_L1_error:;
+  return -1;
+}
+/* #### Code section: cached_constants ### */
+
+static int __Pyx_InitCachedConstants(__pyx_mstatetype *__pyx_mstate) {
+  __Pyx_RefNannyDeclarations
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  CYTHON_UNUSED_VAR(__pyx_mstate);
+  __Pyx_RefNannySetupContext("__Pyx_InitCachedConstants", 0);
+
+  /* "nes/cpu/cpu_op.pyx":21
+ * 
+ * LOOKUP = [
+ *     Op( "BRK", "BRK", "IMM", 7 ),Op( "ORA", "ORA", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ORA", "ORA", "ZP0", 3 ),Op( "ASL", "ASL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHP", "PHP", "IMP", 3 ),Op( "ORA", "ORA", "IMM", 2 ),Op( "ASL", "ASL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABS", 4 ),Op( "ASL", "ASL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),             # <<<<<<<<<<<<<<
+ *     Op( "BPL", "BPL", "REL", 2 ),Op( "ORA", "ORA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ZPX", 4 ),Op( "ASL", "ASL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLC", "CLC", "IMP", 2 ),Op( "ORA", "ORA", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABX", 4 ),Op( "ASL", "ASL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "JSR", "JSR", "ABS", 6 ),Op( "AND", "AND", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "BIT", "BIT", "ZP0", 3 ),Op( "AND", "AND", "ZP0", 3 ),Op( "ROL", "ROL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLP", "PLP", "IMP", 4 ),Op( "AND", "AND", "IMM", 2 ),Op( "ROL", "ROL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "BIT", "BIT", "ABS", 4 ),Op( "AND", "AND", "ABS", 4 ),Op( "ROL", "ROL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_BRK, __pyx_mstate_global->__pyx_n_u_BRK, __pyx_mstate_global->__pyx_n_u_IMM, __pyx_mstate_global->__pyx_int_7};
+    __pyx_mstate_global->__pyx_tuple[0] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[0])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[0]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[0]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_IZX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[1] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[1])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[1]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[1]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_kp_u__2, __pyx_mstate_global->__pyx_n_u_XXX, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[2] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[2])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[2]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[2]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_kp_u__2, __pyx_mstate_global->__pyx_n_u_XXX, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_8};
+    __pyx_mstate_global->__pyx_tuple[3] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[3])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[3]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[3]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_kp_u__2, __pyx_mstate_global->__pyx_n_u_NOP, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[4] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[4])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[4]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[4]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[5] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[5])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[5]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[5]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ASL, __pyx_mstate_global->__pyx_n_u_ASL, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[6] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[6])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[6]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[6]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_kp_u__2, __pyx_mstate_global->__pyx_n_u_XXX, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[7] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[7])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[7]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[7]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_PHP, __pyx_mstate_global->__pyx_n_u_PHP, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[8] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[8])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[8]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[8]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_IMM, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[9] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[9])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[9]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[9]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ASL, __pyx_mstate_global->__pyx_n_u_ASL, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[10] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[10])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[10]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[10]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_kp_u__2, __pyx_mstate_global->__pyx_n_u_NOP, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[11] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[11])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[11]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[11]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[12] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[12])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[12]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[12]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ASL, __pyx_mstate_global->__pyx_n_u_ASL, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[13] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[13])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[13]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[13]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_kp_u__2, __pyx_mstate_global->__pyx_n_u_XXX, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[14] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[14])) __PYX_ERR(0, 21, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[14]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[14]);
+
+  /* "nes/cpu/cpu_op.pyx":22
+ * LOOKUP = [
+ *     Op( "BRK", "BRK", "IMM", 7 ),Op( "ORA", "ORA", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ORA", "ORA", "ZP0", 3 ),Op( "ASL", "ASL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHP", "PHP", "IMP", 3 ),Op( "ORA", "ORA", "IMM", 2 ),Op( "ASL", "ASL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABS", 4 ),Op( "ASL", "ASL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BPL", "BPL", "REL", 2 ),Op( "ORA", "ORA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ZPX", 4 ),Op( "ASL", "ASL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLC", "CLC", "IMP", 2 ),Op( "ORA", "ORA", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABX", 4 ),Op( "ASL", "ASL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),             # <<<<<<<<<<<<<<
+ *     Op( "JSR", "JSR", "ABS", 6 ),Op( "AND", "AND", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "BIT", "BIT", "ZP0", 3 ),Op( "AND", "AND", "ZP0", 3 ),Op( "ROL", "ROL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLP", "PLP", "IMP", 4 ),Op( "AND", "AND", "IMM", 2 ),Op( "ROL", "ROL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "BIT", "BIT", "ABS", 4 ),Op( "AND", "AND", "ABS", 4 ),Op( "ROL", "ROL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BMI", "BMI", "REL", 2 ),Op( "AND", "AND", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ZPX", 4 ),Op( "ROL", "ROL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEC", "SEC", "IMP", 2 ),Op( "AND", "AND", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ABX", 4 ),Op( "ROL", "ROL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_BPL, __pyx_mstate_global->__pyx_n_u_BPL, __pyx_mstate_global->__pyx_n_u_REL, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[15] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[15])) __PYX_ERR(0, 22, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[15]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[15]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_IZY, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[16] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[16])) __PYX_ERR(0, 22, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[16]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[16]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[17] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[17])) __PYX_ERR(0, 22, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[17]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[17]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ASL, __pyx_mstate_global->__pyx_n_u_ASL, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[18] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[18])) __PYX_ERR(0, 22, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[18]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[18]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CLC, __pyx_mstate_global->__pyx_n_u_CLC, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[19] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[19])) __PYX_ERR(0, 22, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[19]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[19]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_ABY, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[20] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[20])) __PYX_ERR(0, 22, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[20]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[20]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_kp_u__2, __pyx_mstate_global->__pyx_n_u_NOP, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[21] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[21])) __PYX_ERR(0, 22, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[21]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[21]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_kp_u__2, __pyx_mstate_global->__pyx_n_u_XXX, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_7};
+    __pyx_mstate_global->__pyx_tuple[22] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[22])) __PYX_ERR(0, 22, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[22]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[22]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_ORA, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[23] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[23])) __PYX_ERR(0, 22, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[23]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[23]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ASL, __pyx_mstate_global->__pyx_n_u_ASL, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_7};
+    __pyx_mstate_global->__pyx_tuple[24] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[24])) __PYX_ERR(0, 22, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[24]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[24]);
+
+  /* "nes/cpu/cpu_op.pyx":23
+ *     Op( "BRK", "BRK", "IMM", 7 ),Op( "ORA", "ORA", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ORA", "ORA", "ZP0", 3 ),Op( "ASL", "ASL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHP", "PHP", "IMP", 3 ),Op( "ORA", "ORA", "IMM", 2 ),Op( "ASL", "ASL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABS", 4 ),Op( "ASL", "ASL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BPL", "BPL", "REL", 2 ),Op( "ORA", "ORA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ZPX", 4 ),Op( "ASL", "ASL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLC", "CLC", "IMP", 2 ),Op( "ORA", "ORA", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABX", 4 ),Op( "ASL", "ASL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "JSR", "JSR", "ABS", 6 ),Op( "AND", "AND", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "BIT", "BIT", "ZP0", 3 ),Op( "AND", "AND", "ZP0", 3 ),Op( "ROL", "ROL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLP", "PLP", "IMP", 4 ),Op( "AND", "AND", "IMM", 2 ),Op( "ROL", "ROL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "BIT", "BIT", "ABS", 4 ),Op( "AND", "AND", "ABS", 4 ),Op( "ROL", "ROL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),             # <<<<<<<<<<<<<<
+ *     Op( "BMI", "BMI", "REL", 2 ),Op( "AND", "AND", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ZPX", 4 ),Op( "ROL", "ROL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEC", "SEC", "IMP", 2 ),Op( "AND", "AND", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ABX", 4 ),Op( "ROL", "ROL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "RTI", "RTI", "IMP", 6 ),Op( "EOR", "EOR", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "EOR", "EOR", "ZP0", 3 ),Op( "LSR", "LSR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHA", "PHA", "IMP", 3 ),Op( "EOR", "EOR", "IMM", 2 ),Op( "LSR", "LSR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "ABS", 3 ),Op( "EOR", "EOR", "ABS", 4 ),Op( "LSR", "LSR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_JSR, __pyx_mstate_global->__pyx_n_u_JSR, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[25] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[25])) __PYX_ERR(0, 23, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[25]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[25]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_IZX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[26] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[26])) __PYX_ERR(0, 23, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[26]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[26]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_BIT, __pyx_mstate_global->__pyx_n_u_BIT, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[27] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[27])) __PYX_ERR(0, 23, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[27]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[27]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[28] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[28])) __PYX_ERR(0, 23, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[28]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[28]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ROL, __pyx_mstate_global->__pyx_n_u_ROL, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[29] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[29])) __PYX_ERR(0, 23, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[29]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[29]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_PLP, __pyx_mstate_global->__pyx_n_u_PLP, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[30] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[30])) __PYX_ERR(0, 23, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[30]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[30]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_IMM, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[31] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[31])) __PYX_ERR(0, 23, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[31]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[31]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ROL, __pyx_mstate_global->__pyx_n_u_ROL, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[32] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[32])) __PYX_ERR(0, 23, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[32]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[32]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_BIT, __pyx_mstate_global->__pyx_n_u_BIT, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[33] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[33])) __PYX_ERR(0, 23, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[33]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[33]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[34] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[34])) __PYX_ERR(0, 23, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[34]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[34]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ROL, __pyx_mstate_global->__pyx_n_u_ROL, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[35] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[35])) __PYX_ERR(0, 23, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[35]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[35]);
+
+  /* "nes/cpu/cpu_op.pyx":24
+ *     Op( "BPL", "BPL", "REL", 2 ),Op( "ORA", "ORA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ZPX", 4 ),Op( "ASL", "ASL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLC", "CLC", "IMP", 2 ),Op( "ORA", "ORA", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABX", 4 ),Op( "ASL", "ASL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "JSR", "JSR", "ABS", 6 ),Op( "AND", "AND", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "BIT", "BIT", "ZP0", 3 ),Op( "AND", "AND", "ZP0", 3 ),Op( "ROL", "ROL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLP", "PLP", "IMP", 4 ),Op( "AND", "AND", "IMM", 2 ),Op( "ROL", "ROL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "BIT", "BIT", "ABS", 4 ),Op( "AND", "AND", "ABS", 4 ),Op( "ROL", "ROL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BMI", "BMI", "REL", 2 ),Op( "AND", "AND", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ZPX", 4 ),Op( "ROL", "ROL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEC", "SEC", "IMP", 2 ),Op( "AND", "AND", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ABX", 4 ),Op( "ROL", "ROL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),             # <<<<<<<<<<<<<<
+ *     Op( "RTI", "RTI", "IMP", 6 ),Op( "EOR", "EOR", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "EOR", "EOR", "ZP0", 3 ),Op( "LSR", "LSR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHA", "PHA", "IMP", 3 ),Op( "EOR", "EOR", "IMM", 2 ),Op( "LSR", "LSR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "ABS", 3 ),Op( "EOR", "EOR", "ABS", 4 ),Op( "LSR", "LSR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BVC", "BVC", "REL", 2 ),Op( "EOR", "EOR", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ZPX", 4 ),Op( "LSR", "LSR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLI", "CLI", "IMP", 2 ),Op( "EOR", "EOR", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ABX", 4 ),Op( "LSR", "LSR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_BMI, __pyx_mstate_global->__pyx_n_u_BMI, __pyx_mstate_global->__pyx_n_u_REL, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[36] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[36])) __PYX_ERR(0, 24, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[36]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[36]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_IZY, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[37] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[37])) __PYX_ERR(0, 24, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[37]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[37]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[38] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[38])) __PYX_ERR(0, 24, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[38]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[38]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ROL, __pyx_mstate_global->__pyx_n_u_ROL, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[39] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[39])) __PYX_ERR(0, 24, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[39]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[39]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_SEC, __pyx_mstate_global->__pyx_n_u_SEC, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[40] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[40])) __PYX_ERR(0, 24, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[40]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[40]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_ABY, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[41] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[41])) __PYX_ERR(0, 24, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[41]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[41]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_AND, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[42] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[42])) __PYX_ERR(0, 24, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[42]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[42]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ROL, __pyx_mstate_global->__pyx_n_u_ROL, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_7};
+    __pyx_mstate_global->__pyx_tuple[43] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[43])) __PYX_ERR(0, 24, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[43]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[43]);
+
+  /* "nes/cpu/cpu_op.pyx":25
+ *     Op( "JSR", "JSR", "ABS", 6 ),Op( "AND", "AND", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "BIT", "BIT", "ZP0", 3 ),Op( "AND", "AND", "ZP0", 3 ),Op( "ROL", "ROL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLP", "PLP", "IMP", 4 ),Op( "AND", "AND", "IMM", 2 ),Op( "ROL", "ROL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "BIT", "BIT", "ABS", 4 ),Op( "AND", "AND", "ABS", 4 ),Op( "ROL", "ROL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BMI", "BMI", "REL", 2 ),Op( "AND", "AND", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ZPX", 4 ),Op( "ROL", "ROL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEC", "SEC", "IMP", 2 ),Op( "AND", "AND", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ABX", 4 ),Op( "ROL", "ROL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "RTI", "RTI", "IMP", 6 ),Op( "EOR", "EOR", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "EOR", "EOR", "ZP0", 3 ),Op( "LSR", "LSR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHA", "PHA", "IMP", 3 ),Op( "EOR", "EOR", "IMM", 2 ),Op( "LSR", "LSR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "ABS", 3 ),Op( "EOR", "EOR", "ABS", 4 ),Op( "LSR", "LSR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),             # <<<<<<<<<<<<<<
+ *     Op( "BVC", "BVC", "REL", 2 ),Op( "EOR", "EOR", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ZPX", 4 ),Op( "LSR", "LSR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLI", "CLI", "IMP", 2 ),Op( "EOR", "EOR", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ABX", 4 ),Op( "LSR", "LSR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "RTS", "RTS", "IMP", 6 ),Op( "ADC", "ADC", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ADC", "ADC", "ZP0", 3 ),Op( "ROR", "ROR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLA", "PLA", "IMP", 4 ),Op( "ADC", "ADC", "IMM", 2 ),Op( "ROR", "ROR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "IND", 5 ),Op( "ADC", "ADC", "ABS", 4 ),Op( "ROR", "ROR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_RTI, __pyx_mstate_global->__pyx_n_u_RTI, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[44] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[44])) __PYX_ERR(0, 25, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[44]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[44]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_IZX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[45] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[45])) __PYX_ERR(0, 25, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[45]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[45]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[46] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[46])) __PYX_ERR(0, 25, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[46]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[46]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LSR, __pyx_mstate_global->__pyx_n_u_LSR, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[47] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[47])) __PYX_ERR(0, 25, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[47]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[47]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_PHA, __pyx_mstate_global->__pyx_n_u_PHA, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[48] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[48])) __PYX_ERR(0, 25, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[48]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[48]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_IMM, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[49] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[49])) __PYX_ERR(0, 25, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[49]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[49]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LSR, __pyx_mstate_global->__pyx_n_u_LSR, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[50] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[50])) __PYX_ERR(0, 25, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[50]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[50]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_JMP, __pyx_mstate_global->__pyx_n_u_JMP, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[51] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[51])) __PYX_ERR(0, 25, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[51]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[51]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[52] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[52])) __PYX_ERR(0, 25, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[52]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[52]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LSR, __pyx_mstate_global->__pyx_n_u_LSR, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[53] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[53])) __PYX_ERR(0, 25, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[53]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[53]);
+
+  /* "nes/cpu/cpu_op.pyx":26
+ *     Op( "BMI", "BMI", "REL", 2 ),Op( "AND", "AND", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ZPX", 4 ),Op( "ROL", "ROL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEC", "SEC", "IMP", 2 ),Op( "AND", "AND", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ABX", 4 ),Op( "ROL", "ROL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "RTI", "RTI", "IMP", 6 ),Op( "EOR", "EOR", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "EOR", "EOR", "ZP0", 3 ),Op( "LSR", "LSR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHA", "PHA", "IMP", 3 ),Op( "EOR", "EOR", "IMM", 2 ),Op( "LSR", "LSR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "ABS", 3 ),Op( "EOR", "EOR", "ABS", 4 ),Op( "LSR", "LSR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BVC", "BVC", "REL", 2 ),Op( "EOR", "EOR", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ZPX", 4 ),Op( "LSR", "LSR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLI", "CLI", "IMP", 2 ),Op( "EOR", "EOR", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ABX", 4 ),Op( "LSR", "LSR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),             # <<<<<<<<<<<<<<
+ *     Op( "RTS", "RTS", "IMP", 6 ),Op( "ADC", "ADC", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ADC", "ADC", "ZP0", 3 ),Op( "ROR", "ROR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLA", "PLA", "IMP", 4 ),Op( "ADC", "ADC", "IMM", 2 ),Op( "ROR", "ROR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "IND", 5 ),Op( "ADC", "ADC", "ABS", 4 ),Op( "ROR", "ROR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BVS", "BVS", "REL", 2 ),Op( "ADC", "ADC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ZPX", 4 ),Op( "ROR", "ROR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEI", "SEI", "IMP", 2 ),Op( "ADC", "ADC", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ABX", 4 ),Op( "ROR", "ROR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_BVC, __pyx_mstate_global->__pyx_n_u_BVC, __pyx_mstate_global->__pyx_n_u_REL, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[54] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[54])) __PYX_ERR(0, 26, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[54]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[54]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_IZY, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[55] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[55])) __PYX_ERR(0, 26, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[55]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[55]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[56] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[56])) __PYX_ERR(0, 26, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[56]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[56]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LSR, __pyx_mstate_global->__pyx_n_u_LSR, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[57] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[57])) __PYX_ERR(0, 26, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[57]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[57]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CLI, __pyx_mstate_global->__pyx_n_u_CLI, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[58] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[58])) __PYX_ERR(0, 26, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[58]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[58]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_ABY, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[59] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[59])) __PYX_ERR(0, 26, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[59]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[59]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_EOR, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[60] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[60])) __PYX_ERR(0, 26, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[60]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[60]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LSR, __pyx_mstate_global->__pyx_n_u_LSR, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_7};
+    __pyx_mstate_global->__pyx_tuple[61] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[61])) __PYX_ERR(0, 26, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[61]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[61]);
+
+  /* "nes/cpu/cpu_op.pyx":27
+ *     Op( "RTI", "RTI", "IMP", 6 ),Op( "EOR", "EOR", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "EOR", "EOR", "ZP0", 3 ),Op( "LSR", "LSR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHA", "PHA", "IMP", 3 ),Op( "EOR", "EOR", "IMM", 2 ),Op( "LSR", "LSR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "ABS", 3 ),Op( "EOR", "EOR", "ABS", 4 ),Op( "LSR", "LSR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BVC", "BVC", "REL", 2 ),Op( "EOR", "EOR", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ZPX", 4 ),Op( "LSR", "LSR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLI", "CLI", "IMP", 2 ),Op( "EOR", "EOR", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ABX", 4 ),Op( "LSR", "LSR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "RTS", "RTS", "IMP", 6 ),Op( "ADC", "ADC", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ADC", "ADC", "ZP0", 3 ),Op( "ROR", "ROR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLA", "PLA", "IMP", 4 ),Op( "ADC", "ADC", "IMM", 2 ),Op( "ROR", "ROR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "IND", 5 ),Op( "ADC", "ADC", "ABS", 4 ),Op( "ROR", "ROR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),             # <<<<<<<<<<<<<<
+ *     Op( "BVS", "BVS", "REL", 2 ),Op( "ADC", "ADC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ZPX", 4 ),Op( "ROR", "ROR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEI", "SEI", "IMP", 2 ),Op( "ADC", "ADC", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ABX", 4 ),Op( "ROR", "ROR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "???", "NOP", "IMP", 2 ),Op( "STA", "STA", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZP0", 3 ),Op( "STA", "STA", "ZP0", 3 ),Op( "STX", "STX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "DEY", "DEY", "IMP", 2 ),Op( "???", "NOP", "IMP", 2 ),Op( "TXA", "TXA", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "STY", "STY", "ABS", 4 ),Op( "STA", "STA", "ABS", 4 ),Op( "STX", "STX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_RTS, __pyx_mstate_global->__pyx_n_u_RTS, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[62] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[62])) __PYX_ERR(0, 27, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[62]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[62]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_IZX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[63] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[63])) __PYX_ERR(0, 27, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[63]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[63]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[64] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[64])) __PYX_ERR(0, 27, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[64]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[64]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ROR, __pyx_mstate_global->__pyx_n_u_ROR, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[65] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[65])) __PYX_ERR(0, 27, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[65]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[65]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_PLA, __pyx_mstate_global->__pyx_n_u_PLA, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[66] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[66])) __PYX_ERR(0, 27, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[66]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[66]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_IMM, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[67] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[67])) __PYX_ERR(0, 27, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[67]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[67]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ROR, __pyx_mstate_global->__pyx_n_u_ROR, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[68] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[68])) __PYX_ERR(0, 27, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[68]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[68]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_JMP, __pyx_mstate_global->__pyx_n_u_JMP, __pyx_mstate_global->__pyx_n_u_IND, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[69] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[69])) __PYX_ERR(0, 27, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[69]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[69]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[70] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[70])) __PYX_ERR(0, 27, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[70]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[70]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ROR, __pyx_mstate_global->__pyx_n_u_ROR, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[71] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[71])) __PYX_ERR(0, 27, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[71]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[71]);
+
+  /* "nes/cpu/cpu_op.pyx":28
+ *     Op( "BVC", "BVC", "REL", 2 ),Op( "EOR", "EOR", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ZPX", 4 ),Op( "LSR", "LSR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLI", "CLI", "IMP", 2 ),Op( "EOR", "EOR", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ABX", 4 ),Op( "LSR", "LSR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "RTS", "RTS", "IMP", 6 ),Op( "ADC", "ADC", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ADC", "ADC", "ZP0", 3 ),Op( "ROR", "ROR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLA", "PLA", "IMP", 4 ),Op( "ADC", "ADC", "IMM", 2 ),Op( "ROR", "ROR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "IND", 5 ),Op( "ADC", "ADC", "ABS", 4 ),Op( "ROR", "ROR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BVS", "BVS", "REL", 2 ),Op( "ADC", "ADC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ZPX", 4 ),Op( "ROR", "ROR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEI", "SEI", "IMP", 2 ),Op( "ADC", "ADC", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ABX", 4 ),Op( "ROR", "ROR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),             # <<<<<<<<<<<<<<
+ *     Op( "???", "NOP", "IMP", 2 ),Op( "STA", "STA", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZP0", 3 ),Op( "STA", "STA", "ZP0", 3 ),Op( "STX", "STX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "DEY", "DEY", "IMP", 2 ),Op( "???", "NOP", "IMP", 2 ),Op( "TXA", "TXA", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "STY", "STY", "ABS", 4 ),Op( "STA", "STA", "ABS", 4 ),Op( "STX", "STX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "BCC", "BCC", "REL", 2 ),Op( "STA", "STA", "IZY", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZPX", 4 ),Op( "STA", "STA", "ZPX", 4 ),Op( "STX", "STX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "TYA", "TYA", "IMP", 2 ),Op( "STA", "STA", "ABY", 5 ),Op( "TXS", "TXS", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "NOP", "IMP", 5 ),Op( "STA", "STA", "ABX", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "XXX", "IMP", 5 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_BVS, __pyx_mstate_global->__pyx_n_u_BVS, __pyx_mstate_global->__pyx_n_u_REL, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[72] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[72])) __PYX_ERR(0, 28, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[72]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[72]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_IZY, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[73] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[73])) __PYX_ERR(0, 28, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[73]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[73]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[74] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[74])) __PYX_ERR(0, 28, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[74]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[74]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ROR, __pyx_mstate_global->__pyx_n_u_ROR, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[75] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[75])) __PYX_ERR(0, 28, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[75]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[75]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_SEI, __pyx_mstate_global->__pyx_n_u_SEI, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[76] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[76])) __PYX_ERR(0, 28, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[76]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[76]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_ABY, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[77] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[77])) __PYX_ERR(0, 28, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[77]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[77]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_ADC, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[78] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[78])) __PYX_ERR(0, 28, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[78]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[78]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_ROR, __pyx_mstate_global->__pyx_n_u_ROR, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_7};
+    __pyx_mstate_global->__pyx_tuple[79] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[79])) __PYX_ERR(0, 28, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[79]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[79]);
+
+  /* "nes/cpu/cpu_op.pyx":29
+ *     Op( "RTS", "RTS", "IMP", 6 ),Op( "ADC", "ADC", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ADC", "ADC", "ZP0", 3 ),Op( "ROR", "ROR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLA", "PLA", "IMP", 4 ),Op( "ADC", "ADC", "IMM", 2 ),Op( "ROR", "ROR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "IND", 5 ),Op( "ADC", "ADC", "ABS", 4 ),Op( "ROR", "ROR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BVS", "BVS", "REL", 2 ),Op( "ADC", "ADC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ZPX", 4 ),Op( "ROR", "ROR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEI", "SEI", "IMP", 2 ),Op( "ADC", "ADC", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ABX", 4 ),Op( "ROR", "ROR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "???", "NOP", "IMP", 2 ),Op( "STA", "STA", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZP0", 3 ),Op( "STA", "STA", "ZP0", 3 ),Op( "STX", "STX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "DEY", "DEY", "IMP", 2 ),Op( "???", "NOP", "IMP", 2 ),Op( "TXA", "TXA", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "STY", "STY", "ABS", 4 ),Op( "STA", "STA", "ABS", 4 ),Op( "STX", "STX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),             # <<<<<<<<<<<<<<
+ *     Op( "BCC", "BCC", "REL", 2 ),Op( "STA", "STA", "IZY", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZPX", 4 ),Op( "STA", "STA", "ZPX", 4 ),Op( "STX", "STX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "TYA", "TYA", "IMP", 2 ),Op( "STA", "STA", "ABY", 5 ),Op( "TXS", "TXS", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "NOP", "IMP", 5 ),Op( "STA", "STA", "ABX", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "XXX", "IMP", 5 ),
+ *     Op( "LDY", "LDY", "IMM", 2 ),Op( "LDA", "LDA", "IZX", 6 ),Op( "LDX", "LDX", "IMM", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "LDY", "LDY", "ZP0", 3 ),Op( "LDA", "LDA", "ZP0", 3 ),Op( "LDX", "LDX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "TAY", "TAY", "IMP", 2 ),Op( "LDA", "LDA", "IMM", 2 ),Op( "TAX", "TAX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "LDY", "LDY", "ABS", 4 ),Op( "LDA", "LDA", "ABS", 4 ),Op( "LDX", "LDX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_IZX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[80] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[80])) __PYX_ERR(0, 29, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[80]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[80]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_STY, __pyx_mstate_global->__pyx_n_u_STY, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[81] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[81])) __PYX_ERR(0, 29, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[81]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[81]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[82] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[82])) __PYX_ERR(0, 29, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[82]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[82]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_STX, __pyx_mstate_global->__pyx_n_u_STX, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[83] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[83])) __PYX_ERR(0, 29, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[83]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[83]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_kp_u__2, __pyx_mstate_global->__pyx_n_u_XXX, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[84] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[84])) __PYX_ERR(0, 29, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[84]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[84]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_DEY, __pyx_mstate_global->__pyx_n_u_DEY, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[85] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[85])) __PYX_ERR(0, 29, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[85]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[85]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_TXA, __pyx_mstate_global->__pyx_n_u_TXA, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[86] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[86])) __PYX_ERR(0, 29, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[86]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[86]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_STY, __pyx_mstate_global->__pyx_n_u_STY, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[87] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[87])) __PYX_ERR(0, 29, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[87]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[87]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[88] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[88])) __PYX_ERR(0, 29, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[88]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[88]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_STX, __pyx_mstate_global->__pyx_n_u_STX, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[89] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[89])) __PYX_ERR(0, 29, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[89]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[89]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_kp_u__2, __pyx_mstate_global->__pyx_n_u_XXX, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[90] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[90])) __PYX_ERR(0, 29, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[90]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[90]);
+
+  /* "nes/cpu/cpu_op.pyx":30
+ *     Op( "BVS", "BVS", "REL", 2 ),Op( "ADC", "ADC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ZPX", 4 ),Op( "ROR", "ROR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEI", "SEI", "IMP", 2 ),Op( "ADC", "ADC", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ABX", 4 ),Op( "ROR", "ROR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "???", "NOP", "IMP", 2 ),Op( "STA", "STA", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZP0", 3 ),Op( "STA", "STA", "ZP0", 3 ),Op( "STX", "STX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "DEY", "DEY", "IMP", 2 ),Op( "???", "NOP", "IMP", 2 ),Op( "TXA", "TXA", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "STY", "STY", "ABS", 4 ),Op( "STA", "STA", "ABS", 4 ),Op( "STX", "STX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "BCC", "BCC", "REL", 2 ),Op( "STA", "STA", "IZY", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZPX", 4 ),Op( "STA", "STA", "ZPX", 4 ),Op( "STX", "STX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "TYA", "TYA", "IMP", 2 ),Op( "STA", "STA", "ABY", 5 ),Op( "TXS", "TXS", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "NOP", "IMP", 5 ),Op( "STA", "STA", "ABX", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "XXX", "IMP", 5 ),             # <<<<<<<<<<<<<<
+ *     Op( "LDY", "LDY", "IMM", 2 ),Op( "LDA", "LDA", "IZX", 6 ),Op( "LDX", "LDX", "IMM", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "LDY", "LDY", "ZP0", 3 ),Op( "LDA", "LDA", "ZP0", 3 ),Op( "LDX", "LDX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "TAY", "TAY", "IMP", 2 ),Op( "LDA", "LDA", "IMM", 2 ),Op( "TAX", "TAX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "LDY", "LDY", "ABS", 4 ),Op( "LDA", "LDA", "ABS", 4 ),Op( "LDX", "LDX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "BCS", "BCS", "REL", 2 ),Op( "LDA", "LDA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "LDY", "LDY", "ZPX", 4 ),Op( "LDA", "LDA", "ZPX", 4 ),Op( "LDX", "LDX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "CLV", "CLV", "IMP", 2 ),Op( "LDA", "LDA", "ABY", 4 ),Op( "TSX", "TSX", "IMP", 2 ),Op( "???", "XXX", "IMP", 4 ),Op( "LDY", "LDY", "ABX", 4 ),Op( "LDA", "LDA", "ABX", 4 ),Op( "LDX", "LDX", "ABY", 4 ),Op( "???", "XXX", "IMP", 4 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_BCC, __pyx_mstate_global->__pyx_n_u_BCC, __pyx_mstate_global->__pyx_n_u_REL, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[91] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[91])) __PYX_ERR(0, 30, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[91]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[91]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_IZY, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[92] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[92])) __PYX_ERR(0, 30, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[92]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[92]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_STY, __pyx_mstate_global->__pyx_n_u_STY, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[93] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[93])) __PYX_ERR(0, 30, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[93]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[93]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[94] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[94])) __PYX_ERR(0, 30, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[94]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[94]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_STX, __pyx_mstate_global->__pyx_n_u_STX, __pyx_mstate_global->__pyx_n_u_ZPY, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[95] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[95])) __PYX_ERR(0, 30, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[95]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[95]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_TYA, __pyx_mstate_global->__pyx_n_u_TYA, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[96] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[96])) __PYX_ERR(0, 30, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[96]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[96]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_ABY, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[97] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[97])) __PYX_ERR(0, 30, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[97]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[97]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_TXS, __pyx_mstate_global->__pyx_n_u_TXS, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[98] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[98])) __PYX_ERR(0, 30, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[98]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[98]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_kp_u__2, __pyx_mstate_global->__pyx_n_u_NOP, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[99] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[99])) __PYX_ERR(0, 30, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[99]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[99]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_STA, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[100] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[100])) __PYX_ERR(0, 30, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[100]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[100]);
+
+  /* "nes/cpu/cpu_op.pyx":31
+ *     Op( "???", "NOP", "IMP", 2 ),Op( "STA", "STA", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZP0", 3 ),Op( "STA", "STA", "ZP0", 3 ),Op( "STX", "STX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "DEY", "DEY", "IMP", 2 ),Op( "???", "NOP", "IMP", 2 ),Op( "TXA", "TXA", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "STY", "STY", "ABS", 4 ),Op( "STA", "STA", "ABS", 4 ),Op( "STX", "STX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "BCC", "BCC", "REL", 2 ),Op( "STA", "STA", "IZY", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZPX", 4 ),Op( "STA", "STA", "ZPX", 4 ),Op( "STX", "STX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "TYA", "TYA", "IMP", 2 ),Op( "STA", "STA", "ABY", 5 ),Op( "TXS", "TXS", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "NOP", "IMP", 5 ),Op( "STA", "STA", "ABX", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "XXX", "IMP", 5 ),
+ *     Op( "LDY", "LDY", "IMM", 2 ),Op( "LDA", "LDA", "IZX", 6 ),Op( "LDX", "LDX", "IMM", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "LDY", "LDY", "ZP0", 3 ),Op( "LDA", "LDA", "ZP0", 3 ),Op( "LDX", "LDX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "TAY", "TAY", "IMP", 2 ),Op( "LDA", "LDA", "IMM", 2 ),Op( "TAX", "TAX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "LDY", "LDY", "ABS", 4 ),Op( "LDA", "LDA", "ABS", 4 ),Op( "LDX", "LDX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),             # <<<<<<<<<<<<<<
+ *     Op( "BCS", "BCS", "REL", 2 ),Op( "LDA", "LDA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "LDY", "LDY", "ZPX", 4 ),Op( "LDA", "LDA", "ZPX", 4 ),Op( "LDX", "LDX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "CLV", "CLV", "IMP", 2 ),Op( "LDA", "LDA", "ABY", 4 ),Op( "TSX", "TSX", "IMP", 2 ),Op( "???", "XXX", "IMP", 4 ),Op( "LDY", "LDY", "ABX", 4 ),Op( "LDA", "LDA", "ABX", 4 ),Op( "LDX", "LDX", "ABY", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "CPY", "CPY", "IMM", 2 ),Op( "CMP", "CMP", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPY", "CPY", "ZP0", 3 ),Op( "CMP", "CMP", "ZP0", 3 ),Op( "DEC", "DEC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INY", "INY", "IMP", 2 ),Op( "CMP", "CMP", "IMM", 2 ),Op( "DEX", "DEX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "CPY", "CPY", "ABS", 4 ),Op( "CMP", "CMP", "ABS", 4 ),Op( "DEC", "DEC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDY, __pyx_mstate_global->__pyx_n_u_LDY, __pyx_mstate_global->__pyx_n_u_IMM, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[101] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[101])) __PYX_ERR(0, 31, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[101]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[101]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_IZX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[102] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[102])) __PYX_ERR(0, 31, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[102]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[102]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDX, __pyx_mstate_global->__pyx_n_u_LDX, __pyx_mstate_global->__pyx_n_u_IMM, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[103] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[103])) __PYX_ERR(0, 31, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[103]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[103]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDY, __pyx_mstate_global->__pyx_n_u_LDY, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[104] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[104])) __PYX_ERR(0, 31, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[104]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[104]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[105] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[105])) __PYX_ERR(0, 31, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[105]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[105]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDX, __pyx_mstate_global->__pyx_n_u_LDX, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[106] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[106])) __PYX_ERR(0, 31, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[106]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[106]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_TAY, __pyx_mstate_global->__pyx_n_u_TAY, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[107] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[107])) __PYX_ERR(0, 31, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[107]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[107]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_IMM, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[108] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[108])) __PYX_ERR(0, 31, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[108]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[108]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_TAX, __pyx_mstate_global->__pyx_n_u_TAX, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[109] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[109])) __PYX_ERR(0, 31, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[109]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[109]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDY, __pyx_mstate_global->__pyx_n_u_LDY, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[110] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[110])) __PYX_ERR(0, 31, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[110]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[110]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[111] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[111])) __PYX_ERR(0, 31, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[111]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[111]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDX, __pyx_mstate_global->__pyx_n_u_LDX, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[112] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[112])) __PYX_ERR(0, 31, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[112]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[112]);
+
+  /* "nes/cpu/cpu_op.pyx":32
+ *     Op( "BCC", "BCC", "REL", 2 ),Op( "STA", "STA", "IZY", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZPX", 4 ),Op( "STA", "STA", "ZPX", 4 ),Op( "STX", "STX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "TYA", "TYA", "IMP", 2 ),Op( "STA", "STA", "ABY", 5 ),Op( "TXS", "TXS", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "NOP", "IMP", 5 ),Op( "STA", "STA", "ABX", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "XXX", "IMP", 5 ),
+ *     Op( "LDY", "LDY", "IMM", 2 ),Op( "LDA", "LDA", "IZX", 6 ),Op( "LDX", "LDX", "IMM", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "LDY", "LDY", "ZP0", 3 ),Op( "LDA", "LDA", "ZP0", 3 ),Op( "LDX", "LDX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "TAY", "TAY", "IMP", 2 ),Op( "LDA", "LDA", "IMM", 2 ),Op( "TAX", "TAX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "LDY", "LDY", "ABS", 4 ),Op( "LDA", "LDA", "ABS", 4 ),Op( "LDX", "LDX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "BCS", "BCS", "REL", 2 ),Op( "LDA", "LDA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "LDY", "LDY", "ZPX", 4 ),Op( "LDA", "LDA", "ZPX", 4 ),Op( "LDX", "LDX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "CLV", "CLV", "IMP", 2 ),Op( "LDA", "LDA", "ABY", 4 ),Op( "TSX", "TSX", "IMP", 2 ),Op( "???", "XXX", "IMP", 4 ),Op( "LDY", "LDY", "ABX", 4 ),Op( "LDA", "LDA", "ABX", 4 ),Op( "LDX", "LDX", "ABY", 4 ),Op( "???", "XXX", "IMP", 4 ),             # <<<<<<<<<<<<<<
+ *     Op( "CPY", "CPY", "IMM", 2 ),Op( "CMP", "CMP", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPY", "CPY", "ZP0", 3 ),Op( "CMP", "CMP", "ZP0", 3 ),Op( "DEC", "DEC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INY", "INY", "IMP", 2 ),Op( "CMP", "CMP", "IMM", 2 ),Op( "DEX", "DEX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "CPY", "CPY", "ABS", 4 ),Op( "CMP", "CMP", "ABS", 4 ),Op( "DEC", "DEC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BNE", "BNE", "REL", 2 ),Op( "CMP", "CMP", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ZPX", 4 ),Op( "DEC", "DEC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLD", "CLD", "IMP", 2 ),Op( "CMP", "CMP", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ABX", 4 ),Op( "DEC", "DEC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_BCS, __pyx_mstate_global->__pyx_n_u_BCS, __pyx_mstate_global->__pyx_n_u_REL, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[113] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[113])) __PYX_ERR(0, 32, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[113]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[113]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_IZY, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[114] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[114])) __PYX_ERR(0, 32, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[114]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[114]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDY, __pyx_mstate_global->__pyx_n_u_LDY, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[115] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[115])) __PYX_ERR(0, 32, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[115]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[115]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[116] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[116])) __PYX_ERR(0, 32, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[116]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[116]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDX, __pyx_mstate_global->__pyx_n_u_LDX, __pyx_mstate_global->__pyx_n_u_ZPY, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[117] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[117])) __PYX_ERR(0, 32, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[117]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[117]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CLV, __pyx_mstate_global->__pyx_n_u_CLV, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[118] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[118])) __PYX_ERR(0, 32, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[118]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[118]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_ABY, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[119] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[119])) __PYX_ERR(0, 32, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[119]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[119]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_TSX, __pyx_mstate_global->__pyx_n_u_TSX, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[120] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[120])) __PYX_ERR(0, 32, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[120]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[120]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDY, __pyx_mstate_global->__pyx_n_u_LDY, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[121] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[121])) __PYX_ERR(0, 32, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[121]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[121]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_LDA, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[122] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[122])) __PYX_ERR(0, 32, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[122]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[122]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_LDX, __pyx_mstate_global->__pyx_n_u_LDX, __pyx_mstate_global->__pyx_n_u_ABY, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[123] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[123])) __PYX_ERR(0, 32, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[123]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[123]);
+
+  /* "nes/cpu/cpu_op.pyx":33
+ *     Op( "LDY", "LDY", "IMM", 2 ),Op( "LDA", "LDA", "IZX", 6 ),Op( "LDX", "LDX", "IMM", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "LDY", "LDY", "ZP0", 3 ),Op( "LDA", "LDA", "ZP0", 3 ),Op( "LDX", "LDX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "TAY", "TAY", "IMP", 2 ),Op( "LDA", "LDA", "IMM", 2 ),Op( "TAX", "TAX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "LDY", "LDY", "ABS", 4 ),Op( "LDA", "LDA", "ABS", 4 ),Op( "LDX", "LDX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "BCS", "BCS", "REL", 2 ),Op( "LDA", "LDA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "LDY", "LDY", "ZPX", 4 ),Op( "LDA", "LDA", "ZPX", 4 ),Op( "LDX", "LDX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "CLV", "CLV", "IMP", 2 ),Op( "LDA", "LDA", "ABY", 4 ),Op( "TSX", "TSX", "IMP", 2 ),Op( "???", "XXX", "IMP", 4 ),Op( "LDY", "LDY", "ABX", 4 ),Op( "LDA", "LDA", "ABX", 4 ),Op( "LDX", "LDX", "ABY", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "CPY", "CPY", "IMM", 2 ),Op( "CMP", "CMP", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPY", "CPY", "ZP0", 3 ),Op( "CMP", "CMP", "ZP0", 3 ),Op( "DEC", "DEC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INY", "INY", "IMP", 2 ),Op( "CMP", "CMP", "IMM", 2 ),Op( "DEX", "DEX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "CPY", "CPY", "ABS", 4 ),Op( "CMP", "CMP", "ABS", 4 ),Op( "DEC", "DEC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),             # <<<<<<<<<<<<<<
+ *     Op( "BNE", "BNE", "REL", 2 ),Op( "CMP", "CMP", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ZPX", 4 ),Op( "DEC", "DEC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLD", "CLD", "IMP", 2 ),Op( "CMP", "CMP", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ABX", 4 ),Op( "DEC", "DEC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "CPX", "CPX", "IMM", 2 ),Op( "SBC", "SBC", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPX", "CPX", "ZP0", 3 ),Op( "SBC", "SBC", "ZP0", 3 ),Op( "INC", "INC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INX", "INX", "IMP", 2 ),Op( "SBC", "SBC", "IMM", 2 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "SBC", "IMP", 2 ),Op( "CPX", "CPX", "ABS", 4 ),Op( "SBC", "SBC", "ABS", 4 ),Op( "INC", "INC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CPY, __pyx_mstate_global->__pyx_n_u_CPY, __pyx_mstate_global->__pyx_n_u_IMM, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[124] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[124])) __PYX_ERR(0, 33, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[124]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[124]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_IZX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[125] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[125])) __PYX_ERR(0, 33, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[125]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[125]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CPY, __pyx_mstate_global->__pyx_n_u_CPY, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[126] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[126])) __PYX_ERR(0, 33, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[126]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[126]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[127] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[127])) __PYX_ERR(0, 33, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[127]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[127]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_DEC, __pyx_mstate_global->__pyx_n_u_DEC, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[128] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[128])) __PYX_ERR(0, 33, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[128]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[128]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_INY, __pyx_mstate_global->__pyx_n_u_INY, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[129] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[129])) __PYX_ERR(0, 33, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[129]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[129]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_IMM, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[130] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[130])) __PYX_ERR(0, 33, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[130]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[130]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_DEX, __pyx_mstate_global->__pyx_n_u_DEX, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[131] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[131])) __PYX_ERR(0, 33, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[131]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[131]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CPY, __pyx_mstate_global->__pyx_n_u_CPY, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[132] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[132])) __PYX_ERR(0, 33, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[132]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[132]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[133] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[133])) __PYX_ERR(0, 33, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[133]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[133]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_DEC, __pyx_mstate_global->__pyx_n_u_DEC, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[134] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[134])) __PYX_ERR(0, 33, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[134]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[134]);
+
+  /* "nes/cpu/cpu_op.pyx":34
+ *     Op( "BCS", "BCS", "REL", 2 ),Op( "LDA", "LDA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "LDY", "LDY", "ZPX", 4 ),Op( "LDA", "LDA", "ZPX", 4 ),Op( "LDX", "LDX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "CLV", "CLV", "IMP", 2 ),Op( "LDA", "LDA", "ABY", 4 ),Op( "TSX", "TSX", "IMP", 2 ),Op( "???", "XXX", "IMP", 4 ),Op( "LDY", "LDY", "ABX", 4 ),Op( "LDA", "LDA", "ABX", 4 ),Op( "LDX", "LDX", "ABY", 4 ),Op( "???", "XXX", "IMP", 4 ),
+ *     Op( "CPY", "CPY", "IMM", 2 ),Op( "CMP", "CMP", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPY", "CPY", "ZP0", 3 ),Op( "CMP", "CMP", "ZP0", 3 ),Op( "DEC", "DEC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INY", "INY", "IMP", 2 ),Op( "CMP", "CMP", "IMM", 2 ),Op( "DEX", "DEX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "CPY", "CPY", "ABS", 4 ),Op( "CMP", "CMP", "ABS", 4 ),Op( "DEC", "DEC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BNE", "BNE", "REL", 2 ),Op( "CMP", "CMP", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ZPX", 4 ),Op( "DEC", "DEC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLD", "CLD", "IMP", 2 ),Op( "CMP", "CMP", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ABX", 4 ),Op( "DEC", "DEC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),             # <<<<<<<<<<<<<<
+ *     Op( "CPX", "CPX", "IMM", 2 ),Op( "SBC", "SBC", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPX", "CPX", "ZP0", 3 ),Op( "SBC", "SBC", "ZP0", 3 ),Op( "INC", "INC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INX", "INX", "IMP", 2 ),Op( "SBC", "SBC", "IMM", 2 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "SBC", "IMP", 2 ),Op( "CPX", "CPX", "ABS", 4 ),Op( "SBC", "SBC", "ABS", 4 ),Op( "INC", "INC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BEQ", "BEQ", "REL", 2 ),Op( "SBC", "SBC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ZPX", 4 ),Op( "INC", "INC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SED", "SED", "IMP", 2 ),Op( "SBC", "SBC", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ABX", 4 ),Op( "INC", "INC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_BNE, __pyx_mstate_global->__pyx_n_u_BNE, __pyx_mstate_global->__pyx_n_u_REL, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[135] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[135])) __PYX_ERR(0, 34, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[135]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[135]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_IZY, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[136] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[136])) __PYX_ERR(0, 34, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[136]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[136]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[137] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[137])) __PYX_ERR(0, 34, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[137]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[137]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_DEC, __pyx_mstate_global->__pyx_n_u_DEC, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[138] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[138])) __PYX_ERR(0, 34, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[138]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[138]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CLD, __pyx_mstate_global->__pyx_n_u_CLD, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[139] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[139])) __PYX_ERR(0, 34, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[139]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[139]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_ABY, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[140] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[140])) __PYX_ERR(0, 34, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[140]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[140]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_NOP, __pyx_mstate_global->__pyx_n_u_NOP, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[141] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[141])) __PYX_ERR(0, 34, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[141]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[141]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_CMP, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[142] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[142])) __PYX_ERR(0, 34, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[142]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[142]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_DEC, __pyx_mstate_global->__pyx_n_u_DEC, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_7};
+    __pyx_mstate_global->__pyx_tuple[143] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[143])) __PYX_ERR(0, 34, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[143]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[143]);
+
+  /* "nes/cpu/cpu_op.pyx":35
+ *     Op( "CPY", "CPY", "IMM", 2 ),Op( "CMP", "CMP", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPY", "CPY", "ZP0", 3 ),Op( "CMP", "CMP", "ZP0", 3 ),Op( "DEC", "DEC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INY", "INY", "IMP", 2 ),Op( "CMP", "CMP", "IMM", 2 ),Op( "DEX", "DEX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "CPY", "CPY", "ABS", 4 ),Op( "CMP", "CMP", "ABS", 4 ),Op( "DEC", "DEC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BNE", "BNE", "REL", 2 ),Op( "CMP", "CMP", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ZPX", 4 ),Op( "DEC", "DEC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLD", "CLD", "IMP", 2 ),Op( "CMP", "CMP", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ABX", 4 ),Op( "DEC", "DEC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "CPX", "CPX", "IMM", 2 ),Op( "SBC", "SBC", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPX", "CPX", "ZP0", 3 ),Op( "SBC", "SBC", "ZP0", 3 ),Op( "INC", "INC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INX", "INX", "IMP", 2 ),Op( "SBC", "SBC", "IMM", 2 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "SBC", "IMP", 2 ),Op( "CPX", "CPX", "ABS", 4 ),Op( "SBC", "SBC", "ABS", 4 ),Op( "INC", "INC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),             # <<<<<<<<<<<<<<
+ *     Op( "BEQ", "BEQ", "REL", 2 ),Op( "SBC", "SBC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ZPX", 4 ),Op( "INC", "INC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SED", "SED", "IMP", 2 ),Op( "SBC", "SBC", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ABX", 4 ),Op( "INC", "INC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ * ]
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CPX, __pyx_mstate_global->__pyx_n_u_CPX, __pyx_mstate_global->__pyx_n_u_IMM, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[144] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[144])) __PYX_ERR(0, 35, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[144]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[144]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_IZX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[145] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[145])) __PYX_ERR(0, 35, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[145]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[145]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CPX, __pyx_mstate_global->__pyx_n_u_CPX, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[146] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[146])) __PYX_ERR(0, 35, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[146]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[146]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_3};
+    __pyx_mstate_global->__pyx_tuple[147] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[147])) __PYX_ERR(0, 35, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[147]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[147]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_INC, __pyx_mstate_global->__pyx_n_u_INC, __pyx_mstate_global->__pyx_n_u_ZP0, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[148] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[148])) __PYX_ERR(0, 35, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[148]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[148]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_INX, __pyx_mstate_global->__pyx_n_u_INX, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[149] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[149])) __PYX_ERR(0, 35, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[149]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[149]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_IMM, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[150] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[150])) __PYX_ERR(0, 35, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[150]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[150]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_kp_u__2, __pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[151] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[151])) __PYX_ERR(0, 35, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[151]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[151]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_CPX, __pyx_mstate_global->__pyx_n_u_CPX, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[152] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[152])) __PYX_ERR(0, 35, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[152]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[152]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[153] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[153])) __PYX_ERR(0, 35, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[153]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[153]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_INC, __pyx_mstate_global->__pyx_n_u_INC, __pyx_mstate_global->__pyx_n_u_ABS, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[154] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[154])) __PYX_ERR(0, 35, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[154]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[154]);
+
+  /* "nes/cpu/cpu_op.pyx":36
+ *     Op( "BNE", "BNE", "REL", 2 ),Op( "CMP", "CMP", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ZPX", 4 ),Op( "DEC", "DEC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLD", "CLD", "IMP", 2 ),Op( "CMP", "CMP", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ABX", 4 ),Op( "DEC", "DEC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+ *     Op( "CPX", "CPX", "IMM", 2 ),Op( "SBC", "SBC", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPX", "CPX", "ZP0", 3 ),Op( "SBC", "SBC", "ZP0", 3 ),Op( "INC", "INC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INX", "INX", "IMP", 2 ),Op( "SBC", "SBC", "IMM", 2 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "SBC", "IMP", 2 ),Op( "CPX", "CPX", "ABS", 4 ),Op( "SBC", "SBC", "ABS", 4 ),Op( "INC", "INC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+ *     Op( "BEQ", "BEQ", "REL", 2 ),Op( "SBC", "SBC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ZPX", 4 ),Op( "INC", "INC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SED", "SED", "IMP", 2 ),Op( "SBC", "SBC", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ABX", 4 ),Op( "INC", "INC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),             # <<<<<<<<<<<<<<
+ * ]
+ * 
+*/
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_BEQ, __pyx_mstate_global->__pyx_n_u_BEQ, __pyx_mstate_global->__pyx_n_u_REL, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[155] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[155])) __PYX_ERR(0, 36, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[155]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[155]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_IZY, __pyx_mstate_global->__pyx_int_5};
+    __pyx_mstate_global->__pyx_tuple[156] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[156])) __PYX_ERR(0, 36, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[156]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[156]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[157] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[157])) __PYX_ERR(0, 36, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[157]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[157]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_INC, __pyx_mstate_global->__pyx_n_u_INC, __pyx_mstate_global->__pyx_n_u_ZPX, __pyx_mstate_global->__pyx_int_6};
+    __pyx_mstate_global->__pyx_tuple[158] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[158])) __PYX_ERR(0, 36, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[158]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[158]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_SED, __pyx_mstate_global->__pyx_n_u_SED, __pyx_mstate_global->__pyx_n_u_IMP, __pyx_mstate_global->__pyx_int_2};
+    __pyx_mstate_global->__pyx_tuple[159] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[159])) __PYX_ERR(0, 36, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[159]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[159]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_ABY, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[160] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[160])) __PYX_ERR(0, 36, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[160]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[160]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_SBC, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_4};
+    __pyx_mstate_global->__pyx_tuple[161] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[161])) __PYX_ERR(0, 36, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[161]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[161]);
+  {
+    PyObject* __pyx_temp[4] = {__pyx_mstate_global->__pyx_n_u_INC, __pyx_mstate_global->__pyx_n_u_INC, __pyx_mstate_global->__pyx_n_u_ABX, __pyx_mstate_global->__pyx_int_7};
+    __pyx_mstate_global->__pyx_tuple[162] = __Pyx_PyTuple_FromArray(__pyx_temp, 4); if (unlikely(!__pyx_mstate_global->__pyx_tuple[162])) __PYX_ERR(0, 36, __pyx_L1_error)
+    __Pyx_GOTREF(__pyx_mstate_global->__pyx_tuple[162]);
+  }
+  __Pyx_GIVEREF(__pyx_mstate_global->__pyx_tuple[162]);
+  #if CYTHON_IMMORTAL_CONSTANTS
+  {
+    PyObject **table = __pyx_mstate->__pyx_tuple;
+    for (Py_ssize_t i=0; i<163; ++i) {
+      #if PY_VERSION_HEX >= 0x030F0000
+      PyUnstable_SetImmortal(table[i]);
+      #elif CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+      if ((PY_SSIZE_T_MAX <= _Py_IMMORTAL_REFCNT_LOCAL)) break;
+      #if PY_VERSION_HEX < 0x030E0000
+      if (_Py_IsOwnedByCurrentThread(table[i]) && Py_REFCNT(table[i]) == 1)
+      #else
+      if (PyUnstable_Object_IsUniquelyReferenced(table[i]))
+      #endif
+      {
+        Py_SET_REFCNT(table[i], ((Py_ssize_t)_Py_IMMORTAL_REFCNT_LOCAL + 1));
+      }
+      #else
+      if ((PY_SSIZE_T_MAX < _Py_IMMORTAL_INITIAL_REFCNT)) break;
+      Py_SET_REFCNT(table[i], _Py_IMMORTAL_INITIAL_REFCNT);
+      #endif
+    }
+  }
+  #endif
+  __Pyx_RefNannyFinishContext();
+  return 0;
+  __pyx_L1_error:;
+  __Pyx_RefNannyFinishContext();
+  return -1;
+}
+/* #### Code section: init_constants ### */
+
+static int __Pyx_InitConstants(__pyx_mstatetype *__pyx_mstate) {
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  CYTHON_UNUSED_VAR(__pyx_mstate);
+  {
+    const struct { const unsigned int length: 8; } str_length_index[] = {{15},{1},{3},{179},{8},{7},{6},{2},{9},{3},{3},{3},{3},{9},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{12},{3},{3},{3},{3},{3},{3},{3},{3},{3},{7},{3},{3},{3},{2},{20},{22},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{3},{20},{12},{8},{8},{12},{8},{10},{8},{7},{12},{14},{12},{11},{10},{17},{12},{10},{17},{13},{12},{12},{19},{8},{5},{13},{8},{18},{18},{6},{9},{5},{5},{6},{4},{14},{2},{6},{7},{3},{4},{10},{5},{6},{12},{6}};
+    const struct { const unsigned int length: 8; } bytes_length_index[] = {{99},{11},{55},{137}};
+    #ifndef CYTHON_COMPRESS_STRINGS
+      #define CYTHON_COMPRESS_STRINGS 0
+    #endif
+    #if (CYTHON_COMPRESS_STRINGS) == 1 /* compression: zlib (873 bytes) */
+static const char cstring[] = "x\332eS\275o\333F\024\227\001!6\232!M\0234C\207\234\221\002n\013TH\014\267\r\322\241\340Wk&\024y\"i\207T\020\034N\344\223\304\232\")\336\321\265\320\016\0363r\324\310Q\243G\215\0363j\324\350?\241\177B\217\222\245\270\310#\357}\335\275\307\367~|\367\035\317\001P?\247\203\021$\374\373\337\004\231)\007\304\207\224#e\302\207i\202\"\206B\210\243\036\344\224C<A\214\347Q\300!\257\017%\010k\370\307\243\227G\210&!\312\341O\0108C\254\350\0051e\014\030J\373\250WD1\217\022\304\047\031\260\026\322\373h\222\026(\001\010\021OQ&\316\335\r\340CH\020\003^+\350\200&I\312)\217\322\204\210\360(\031\034\2400\312\305G\242s\250\243\177\2471\203\026\rC\"\316A\0301\332\213\001\222\232\017\202\210\255\265P\222\035I\366$\331\227TERU\273m\251\232#\231\252\344\030\262\242\310\212#k\035Yw\345\266.\233\232\214\r\331~#\237*\362\251\243\030\212b\250\212\241+\306\251\322\306\n\366\024\354\253\232\242j\236\252\371\232e\353\355\266\336\306\272\251\350\246\252\233\216k\237(\256n\231\216nz\272\351\353]O\357\372\257\333\370\265c\033\252d\250\236\241\372\206f\376\341\036;\206c\233\026\266l\311\312\254\254EH\016a\021\000\tV\230\023\262\362\t\030\230\350\376\223\027\037K\370\030cC\302\006\2665\303\266\304k\333\256n\273\216#\332\320\304\253:\232\356\270\222\343z\216\353\273\222\347J\276\353x\256\047\255\034\222\347y]\374\274\213\005\367E\276\311\205X\252\370\235\304\204\013nC\237\220[\310\201\010\n\353\035A\375\"\tj9\330\024$hD\243d%\323\260\210W\236\204\216\326\022\376\252E&\222\0074\213\266\372\020\2023V\214\326V\016\254\210\371Z\277\315Y\253\365\220\254\265\"\311\242\340Ld\2662B\306\005\2157\351o\221\"\237a\266u\300Em\010\364\266%\261;\205\177\206*!\034\030\337\264\0331\022\244yZ\210\221\0051X\271\350\017(\233$A\224\266\266\033,\210\005\047\002\001\236\323\000z48\013&A\014b\342\212\321\352\242DI\010\027\021\207\021\213!\031\360a]\211\210k\005YQ/\222f\365\023\210\344i\266\n\020\026\203\270/\252\013\241O\0056\253\"\213,\2549\203m\331\3474.\200\341\211\325\253/\033\372\241QD\t\177I8z\367\342\360\375\047\343""\360\247\237\3377\032\r\303\262\336\234\340\306f\352\311z\372\032\026&\033W\255+\276bhN\255\335\031\342\313\235e\023U;\325\327\325\370r\347\246\371t:^\240\347W\367\347\277^\237-:\366\262\371\250<,\275igJ\227\315\335\313\177\312_\246\373\313\275o+\251:\231\265\346\"\364\376\207\027\227;\377\3565\276\370\246\336xX>.\337U\315J\237\271WO\346\315\271\264\334\373\262\334-\307\323{\323x\266_g8\377\360\266\324\246\217\247\235\345\336W\245\210xR\216o\004\343\323W\325\333\231v\365\350J\235\337\233\017\256O>>\373\350.:\335E\227.h\257\016\034/\367\036,\036<\253\216\252\361lw\366\367\374\340\372\341\315\377=\373\377\001\300\352\316\241";
+    PyObject *data = __Pyx_DecompressString(cstring, 873, 1);
+    #define __Pyx_DecompressString_LZSS_UNUSED
+    if (unlikely(!data)) __PYX_ERR(0, 1, __pyx_L1_error)
+    const char* const bytes = __Pyx_PyBytes_AsString(data);
+    #if !CYTHON_ASSUME_SAFE_MACROS
+    if (likely(bytes)); else { Py_DECREF(data); __PYX_ERR(0, 1, __pyx_L1_error) }
+    #endif
+    #else /* compression: none (1255 bytes) */
+static const char bytes[] = "(tree fragment)\077\077\077\077Note that Cython is deliberately stricter than PEP-484 and rejects subclasses of builtin types. If you need to pass subclasses then set the \047annotation_typing\047 directive to False.add_notedisableenablegcisenabledABSABXABYADCADDRMODESANDASLBCCBCSBEQBITBMIBNEBPLBRKBVCBVSCLCCLDCLICLVCMPCPXCPYDECDEXDEYEORIMMIMPINCINDINSTRUCTIONSINXINYIZXIZYJMPJSRLDALDXLDYLENGTHSLSRNOPORAOpOp.__reduce_cython__Op.__setstate_cython__PHAPHPPLAPLPRELROLRORRTIRTSSBCSECSEDSEISTASTXSTYTAXTAYTSXTXATXSTYAXXXZP0ZPXZPY__Pyx_PyDict_NextRef__annotate____dict____func____getstate____main____module____name____new____pyx_capi____pyx_checksum__pyx_result__pyx_state__pyx_type__pyx_unpickle_Op__qualname____reduce____reduce_cython____reduce_ex____set_name____setstate____setstate_cython____test___dict_is_coroutineaddrmodeasyncio.coroutinescline_in_tracebackcyclesenumerateindexitemslengthnamenes.cpu.cpu_opopopcodeoperatepopselfsetdefaultstateupdateuse_setstatevaluesPyObject *\000uint8_t [12]\000uint8_t [256]\000\000\000LOOKUP\000ADDRMODE_LENGTH\000OP_ADDRMODE\000OP_CYCLES\000OP_INSTRUCTION\200\001\330\004 \240\001\240\026\240q\200\001\340\004\037\230q\320 0\260\013\270;\300k\320QR\330\004\023\2202\220X\230Q\230a\330\004\007\200|\2207\230!\330\010$\240A\240U\250.\270\001\330\004\013\2101\200\001\360\010\000\n\033\230!\330\010\021\220\024\220[\240\004\240I\250T\260\027\270\004\270A\330\010\020\220\007\220q\230\006\230l\250!\330\004\007\200v\210W\220E\230\024\230Q\330\010\022\220!\330\010\027\220q\340\010\027\220t\230:\240W\250E\260\023\260D\270\006\270g\300U\310#\310T\320QZ\320Za\320ab\330\004\007\200q\330\010\017\320\017#\2404\240q\250\007\250{\270\047\300\021\340\010\017\320\017#\2404\240q\250\007\250{\270!";
+    PyObject *data = NULL;
+    #define __Pyx_DecompressString_UNUSED
+    #define __Pyx_DecompressString_LZSS_UNUSED
+    #endif
+    PyObject **stringtab = __pyx_mstate->__pyx_string_tab;
+    Py_ssize_t pos = 0;
+    for (int i = 0; i < 129; i++) {
+      Py_ssize_t bytes_length = str_length_index[i].length;
+      PyObject *string = PyUnicode_DecodeUTF8(bytes + pos, bytes_length, NULL);
+      if (likely(string) && i >= 9) PyUnicode_InternInPlace(&string);
+      if (unlikely(!string)) {
+        Py_XDECREF(data);
+        __PYX_ERR(0, 1, __pyx_L1_error)
+      }
+      stringtab[i] = string;
+      pos += bytes_length;
+    }
+    for (int i = 129; i < 133; i++) {
+      Py_ssize_t bytes_length = bytes_length_index[i-129].length;
+      PyObject *string = PyBytes_FromStringAndSize(bytes + pos, bytes_length);
+      stringtab[i] = string;
+      pos += bytes_length;
+      if (unlikely(!string)) {
+        Py_XDECREF(data);
+        __PYX_ERR(0, 1, __pyx_L1_error)
+      }
+    }
+    Py_XDECREF(data);
+    for (Py_ssize_t i = 0; i < 133; i++) {
+      if (unlikely(PyObject_Hash(stringtab[i]) == -1)) {
+        __PYX_ERR(0, 1, __pyx_L1_error)
+      }
+    }
+    #if CYTHON_IMMORTAL_CONSTANTS
+    {
+      PyObject **table = stringtab + 129;
+      for (Py_ssize_t i=0; i<4; ++i) {
+        #if PY_VERSION_HEX >= 0x030F0000
+        PyUnstable_SetImmortal(table[i]);
+        #elif CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+        if ((PY_SSIZE_T_MAX <= _Py_IMMORTAL_REFCNT_LOCAL)) break;
+        #if PY_VERSION_HEX < 0x030E0000
+        if (_Py_IsOwnedByCurrentThread(table[i]) && Py_REFCNT(table[i]) == 1)
+        #else
+        if (PyUnstable_Object_IsUniquelyReferenced(table[i]))
+        #endif
+        {
+          Py_SET_REFCNT(table[i], ((Py_ssize_t)_Py_IMMORTAL_REFCNT_LOCAL + 1));
+        }
+        #else
+        if ((PY_SSIZE_T_MAX < _Py_IMMORTAL_INITIAL_REFCNT)) break;
+        Py_SET_REFCNT(table[i], _Py_IMMORTAL_INITIAL_REFCNT);
+        #endif
+      }
+    }
+    #endif
+  }
+  {
+    PyObject **numbertab = __pyx_mstate->__pyx_number_tab + 0;
+    int8_t const cint_constants_1[] = {0,1,2,3,4,5,6,7,8};
+    int32_t const cint_constants_4[] = {143756315L};
+    for (int i = 0; i < 10; i++) {
+      numbertab[i] = PyLong_FromLong((i < 9 ? cint_constants_1[i - 0] : cint_constants_4[i - 9]));
+      if (unlikely(!numbertab[i])) __PYX_ERR(0, 1, __pyx_L1_error)
+    }
+  }
+  #if CYTHON_IMMORTAL_CONSTANTS
+  {
+    PyObject **table = __pyx_mstate->__pyx_number_tab;
+    for (Py_ssize_t i=0; i<10; ++i) {
+      #if PY_VERSION_HEX >= 0x030F0000
+      PyUnstable_SetImmortal(table[i]);
+      #elif CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+      if ((PY_SSIZE_T_MAX <= _Py_IMMORTAL_REFCNT_LOCAL)) break;
+      #if PY_VERSION_HEX < 0x030E0000
+      if (_Py_IsOwnedByCurrentThread(table[i]) && Py_REFCNT(table[i]) == 1)
+      #else
+      if (PyUnstable_Object_IsUniquelyReferenced(table[i]))
+      #endif
+      {
+        Py_SET_REFCNT(table[i], ((Py_ssize_t)_Py_IMMORTAL_REFCNT_LOCAL + 1));
+      }
+      #else
+      if ((PY_SSIZE_T_MAX < _Py_IMMORTAL_INITIAL_REFCNT)) break;
+      Py_SET_REFCNT(table[i], _Py_IMMORTAL_INITIAL_REFCNT);
+      #endif
+    }
+  }
+  #endif
+  return 0;
+  __pyx_L1_error:;
+  return -1;
+}
+/* #### Code section: init_codeobjects ### */
+#ifdef __cplusplus
+namespace {
+#endif
+typedef struct {
+    unsigned int argcount : 2;
+    unsigned int num_posonly_args : 1;
+    unsigned int num_kwonly_args : 1;
+    unsigned int nlocals : 3;
+    unsigned int flags : 10;
+    unsigned int first_line : 5;
+} __Pyx_PyCode_New_function_description;
+#ifdef __cplusplus
+} /* anonymous namespace */
+#endif
+/* NewCodeObj.proto */
+static PyObject* __Pyx_PyCode_New(
+        const __Pyx_PyCode_New_function_description descr,
+        PyObject * const *varnames,
+        PyObject *filename,
+        PyObject *funcname,
+        PyObject *line_table,
+        PyObject *tuple_dedup_map
+);
+
+
+static int __Pyx_CreateCodeObjects(__pyx_mstatetype *__pyx_mstate) {
+  PyObject* tuple_dedup_map = PyDict_New();
+  if (unlikely(!tuple_dedup_map)) return -1;
+  {
+    const __Pyx_PyCode_New_function_description descr = {1, 0, 0, 4, (unsigned int)(CO_OPTIMIZED|CO_NEWLOCALS), 1};
+    PyObject* const varnames[] = {__pyx_mstate->__pyx_n_u_self, __pyx_mstate->__pyx_n_u_state, __pyx_mstate->__pyx_n_u_dict_2, __pyx_mstate->__pyx_n_u_use_setstate};
+    __pyx_mstate_global->__pyx_codeobj_tab[0] = __Pyx_PyCode_New(descr, varnames, __pyx_mstate->__pyx_kp_u_tree_fragment, __pyx_mstate->__pyx_n_u_reduce_cython, __pyx_mstate->__pyx_kp_b_iso88591_IT_A_q_l_vWE_Q_q_t_WE_D_gU_TQZZ, tuple_dedup_map); if (unlikely(!__pyx_mstate_global->__pyx_codeobj_tab[0])) goto bad;
+  }
+  {
+    const __Pyx_PyCode_New_function_description descr = {2, 0, 0, 2, (unsigned int)(CO_OPTIMIZED|CO_NEWLOCALS), 17};
+    PyObject* const varnames[] = {__pyx_mstate->__pyx_n_u_self, __pyx_mstate->__pyx_n_u_pyx_state};
+    __pyx_mstate_global->__pyx_codeobj_tab[1] = __Pyx_PyCode_New(descr, varnames, __pyx_mstate->__pyx_kp_u_tree_fragment, __pyx_mstate->__pyx_n_u_setstate_cython, __pyx_mstate->__pyx_kp_b_iso88591_q, tuple_dedup_map); if (unlikely(!__pyx_mstate_global->__pyx_codeobj_tab[1])) goto bad;
+  }
+  {
+    const __Pyx_PyCode_New_function_description descr = {3, 0, 0, 4, (unsigned int)(CO_OPTIMIZED|CO_NEWLOCALS), 4};
+    PyObject* const varnames[] = {__pyx_mstate->__pyx_n_u_pyx_type, __pyx_mstate->__pyx_n_u_pyx_checksum, __pyx_mstate->__pyx_n_u_pyx_state, __pyx_mstate->__pyx_n_u_pyx_result};
+    __pyx_mstate_global->__pyx_codeobj_tab[2] = __Pyx_PyCode_New(descr, varnames, __pyx_mstate->__pyx_kp_u_tree_fragment, __pyx_mstate->__pyx_n_u_pyx_unpickle_Op, __pyx_mstate->__pyx_kp_b_iso88591_q_0_kQR_2XQa_7_AU_1, tuple_dedup_map); if (unlikely(!__pyx_mstate_global->__pyx_codeobj_tab[2])) goto bad;
+  }
+  Py_DECREF(tuple_dedup_map);
+  return 0;
+  bad:
+  Py_DECREF(tuple_dedup_map);
+  return -1;
+}
+/* #### Code section: init_globals ### */
+
+static int __Pyx_InitGlobals(void) {
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  /* PythonCompatibility.init */
+  if (likely(__Pyx_init_co_variables() == 0 && __Pyx_init_tpflags_variables() == 0)); else
+  
+  if (unlikely(PyErr_Occurred())) __PYX_ERR(0, 1, __pyx_L1_error)
+
+  /* PyFrozenDict.init */
+  #if CYTHON_COMPILING_IN_LIMITED_API
+  {
+      PyObject *builtins = PyEval_GetBuiltins(); // borrowed
+      if (likely(builtins)) {
+          PyObject *type_name = PyUnicode_FromStringAndSize("frozendict", sizeof("frozendict")-1);
+          if (likely(type_name)) {
+              PyObject *frozendict_type = PyObject_GetItem(builtins, type_name);
+              Py_DECREF(type_name);
+              if (!frozendict_type && PyErr_ExceptionMatches(PyExc_KeyError)) {
+                  PyErr_Clear();
+                  frozendict_type = (PyObject*) &PyDict_Type;
+                  Py_INCREF(frozendict_type);
+              }
+              __pyx_mstate_global->__Pyx_PyFrozenDictType = frozendict_type;
+          }
+      }
+  } // error handling follows
+  #endif
+  
+  if (unlikely(PyErr_Occurred())) __PYX_ERR(0, 1, __pyx_L1_error)
+
+  /* CommonTypesMetaclass.init */
+  if (likely(__pyx_CommonTypesMetaclass_init(__pyx_m) == 0)); else
+  
+  if (unlikely(PyErr_Occurred())) __PYX_ERR(0, 1, __pyx_L1_error)
+
+  /* CachedMethodType.init */
+  #if CYTHON_COMPILING_IN_LIMITED_API
+  {
+      PyObject *typesModule=NULL;
+      typesModule = PyImport_ImportModule("types");
+      if (typesModule) {
+          __pyx_mstate_global->__Pyx_CachedMethodType = PyObject_GetAttrString(typesModule, "MethodType");
+          Py_DECREF(typesModule);
+      }
+  } // error handling follows
+  #endif
+  
+  if (unlikely(PyErr_Occurred())) __PYX_ERR(0, 1, __pyx_L1_error)
+
+  return 0;
+  __pyx_L1_error:;
+  return -1;
+}
+/* #### Code section: init_after_shared_utility ### */
+
+static int __Pyx_InitAfterSharedUtility(void) {
+  int __pyx_lineno = 0;
+  const char *__pyx_filename = NULL;
+  int __pyx_clineno = 0;
+  /* CythonFunctionPerModule.init */
+  if (likely(__pyx_CyFunction_init(__pyx_m) == 0)); else
+  
+  if (unlikely(PyErr_Occurred())) __PYX_ERR(0, 1, __pyx_L1_error)
+
+  return 0;
+  __pyx_L1_error:;
+  return -1;
+}
+/* #### Code section: cleanup_globals ### */
+/* #### Code section: cleanup_module ### */
+/* #### Code section: main_method ### */
+/* #### Code section: utility_code_pragmas ### */
+#ifdef _MSC_VER
+#pragma warning( push )
+/* Warning 4127: conditional expression is constant
+ * Cython uses constant conditional expressions to allow in inline functions to be optimized at
+ * compile-time, so this warning is not useful
+ */
+#pragma warning( disable : 4127 )
+#endif
+
+
+
+/* #### Code section: utility_code_def ### */
+
+/* --- Runtime support code --- */
+/* Refnanny */
+#if CYTHON_REFNANNY
+static __Pyx_RefNannyAPIStruct *__Pyx_RefNannyImportAPI(const char *modname) {
+    PyObject *m = NULL, *p = NULL;
+    void *r = NULL;
+    m = PyImport_ImportModule(modname);
+    if (!m) goto end;
+    p = PyObject_GetAttrString(m, "RefNannyAPI");
+    if (!p) goto end;
+    r = PyLong_AsVoidPtr(p);
+end:
+    Py_XDECREF(p);
+    Py_XDECREF(m);
+    return (__Pyx_RefNannyAPIStruct *)r;
+}
+#endif
+
+/* FastTypeChecks (used by GivenExceptionMatches) */
+#if CYTHON_COMPILING_IN_CPYTHON
+static int __Pyx_InBases(PyTypeObject *a, PyTypeObject *b) {
+    while (a) {
+        a = __Pyx_PyType_GetSlot(a, tp_base, PyTypeObject*);
+        if (a == b)
+            return 1;
+    }
+    return b == &PyBaseObject_Type;
+}
+static CYTHON_INLINE int __Pyx_IsSubtype(PyTypeObject *a, PyTypeObject *b) {
+    PyObject *mro;
+    if (a == b) return 1;
+    mro = a->tp_mro;
+    if (likely(mro)) {
+        Py_ssize_t i, n;
+        n = PyTuple_GET_SIZE(mro);
+        for (i = 0; i < n; i++) {
+            if (PyTuple_GET_ITEM(mro, i) == (PyObject *)b)
+                return 1;
+        }
+        return 0;
+    }
+    return __Pyx_InBases(a, b);
+}
+static CYTHON_INLINE int __Pyx_IsAnySubtype2(PyTypeObject *cls, PyTypeObject *a, PyTypeObject *b) {
+    PyObject *mro;
+    if (cls == a || cls == b) return 1;
+    mro = cls->tp_mro;
+    if (likely(mro)) {
+        Py_ssize_t i, n;
+        n = PyTuple_GET_SIZE(mro);
+        for (i = 0; i < n; i++) {
+            PyObject *base = PyTuple_GET_ITEM(mro, i);
+            if (base == (PyObject *)a || base == (PyObject *)b)
+                return 1;
+        }
+        return 0;
+    }
+    return __Pyx_InBases(cls, a) || __Pyx_InBases(cls, b);
+}
+#endif
+
+/* PyErrFetchRestore (used by GivenExceptionMatches) */
+#if CYTHON_FAST_THREAD_STATE
+static CYTHON_INLINE void __Pyx_ErrRestoreInState(PyThreadState *tstate, PyObject *type, PyObject *value, PyObject *tb) {
+#if PY_VERSION_HEX >= 0x030C00A6
+    PyObject *tmp_value;
+    assert(type == NULL || (value != NULL && type == (PyObject*) Py_TYPE(value)));
+    if (value) {
+        #if CYTHON_COMPILING_IN_CPYTHON
+        if (unlikely(((PyBaseExceptionObject*) value)->traceback != tb))
+        #endif
+            PyException_SetTraceback(value, tb);
+    }
+    tmp_value = tstate->current_exception;
+    tstate->current_exception = value;
+    Py_XDECREF(tmp_value);
+    Py_XDECREF(type);
+    Py_XDECREF(tb);
+#else
+    PyObject *tmp_type, *tmp_value, *tmp_tb;
+    tmp_type = tstate->curexc_type;
+    tmp_value = tstate->curexc_value;
+    tmp_tb = tstate->curexc_traceback;
+    tstate->curexc_type = type;
+    tstate->curexc_value = value;
+    tstate->curexc_traceback = tb;
+    Py_XDECREF(tmp_type);
+    Py_XDECREF(tmp_value);
+    Py_XDECREF(tmp_tb);
+#endif
+}
+static CYTHON_INLINE void __Pyx_ErrFetchInState(PyThreadState *tstate, PyObject **type, PyObject **value, PyObject **tb) {
+#if PY_VERSION_HEX >= 0x030C00A6
+    PyObject* exc_value;
+    exc_value = tstate->current_exception;
+    tstate->current_exception = 0;
+    *value = exc_value;
+    *type = NULL;
+    *tb = NULL;
+    if (exc_value) {
+        *type = (PyObject*) Py_TYPE(exc_value);
+        Py_INCREF(*type);
+        #if CYTHON_COMPILING_IN_CPYTHON
+        *tb = ((PyBaseExceptionObject*) exc_value)->traceback;
+        Py_XINCREF(*tb);
+        #else
+        *tb = PyException_GetTraceback(exc_value);
+        #endif
+    }
+#else
+    *type = tstate->curexc_type;
+    *value = tstate->curexc_value;
+    *tb = tstate->curexc_traceback;
+    tstate->curexc_type = 0;
+    tstate->curexc_value = 0;
+    tstate->curexc_traceback = 0;
+#endif
+}
+#endif
+
+/* GivenExceptionMatches (used by PyErrExceptionMatches) */
+#if CYTHON_COMPILING_IN_CPYTHON
+static CYTHON_INLINE int __Pyx_inner_PyErr_GivenExceptionMatches2(PyObject *err, PyObject* exc_type1, PyObject *exc_type2) {
+    if (exc_type1) {
+        return __Pyx_IsAnySubtype2((PyTypeObject*)err, (PyTypeObject*)exc_type1, (PyTypeObject*)exc_type2);
+    } else {
+        return __Pyx_IsSubtype((PyTypeObject*)err, (PyTypeObject*)exc_type2);
+    }
+}
+static int __Pyx_PyErr_GivenExceptionMatchesTuple(PyObject *exc_type, PyObject *tuple) {
+    Py_ssize_t i, n;
+    assert(PyExceptionClass_Check(exc_type));
+    n = PyTuple_GET_SIZE(tuple);
+    for (i=0; i<n; i++) {
+        if (exc_type == PyTuple_GET_ITEM(tuple, i)) return 1;
+    }
+    for (i=0; i<n; i++) {
+        PyObject *t = PyTuple_GET_ITEM(tuple, i);
+        if (likely(PyExceptionClass_Check(t))) {
+            if (__Pyx_inner_PyErr_GivenExceptionMatches2(exc_type, NULL, t)) return 1;
+        } else {
+        }
+    }
+    return 0;
+}
+static CYTHON_INLINE int __Pyx_PyErr_GivenExceptionMatches(PyObject *err, PyObject* exc_type) {
+    if (likely(err == exc_type)) return 1;
+    if (likely(PyExceptionClass_Check(err))) {
+        if (likely(PyExceptionClass_Check(exc_type))) {
+            return __Pyx_inner_PyErr_GivenExceptionMatches2(err, NULL, exc_type);
+        } else if (likely(PyTuple_Check(exc_type))) {
+            return __Pyx_PyErr_GivenExceptionMatchesTuple(err, exc_type);
+        } else {
+        }
+    }
+    return PyErr_GivenExceptionMatches(err, exc_type);
+}
+static CYTHON_INLINE int __Pyx_PyErr_GivenExceptionMatches2(PyObject *err, PyObject *exc_type1, PyObject *exc_type2) {
+    assert(PyExceptionClass_Check(exc_type1));
+    assert(PyExceptionClass_Check(exc_type2));
+    if (likely(err == exc_type1 || err == exc_type2)) return 1;
+    if (likely(PyExceptionClass_Check(err))) {
+        return __Pyx_inner_PyErr_GivenExceptionMatches2(err, exc_type1, exc_type2);
+    }
+    return (PyErr_GivenExceptionMatches(err, exc_type1) || PyErr_GivenExceptionMatches(err, exc_type2));
+}
+#endif
+
+/* PyErrExceptionMatches (used by PyObjectGetAttrStrNoError) */
+#if CYTHON_FAST_THREAD_STATE
+static int __Pyx_PyErr_ExceptionMatchesTuple(PyObject *exc_type, PyObject *tuple) {
+    Py_ssize_t i, n;
+    n = PyTuple_GET_SIZE(tuple);
+    for (i=0; i<n; i++) {
+        if (exc_type == PyTuple_GET_ITEM(tuple, i)) return 1;
+    }
+    for (i=0; i<n; i++) {
+        if (__Pyx_PyErr_GivenExceptionMatches(exc_type, PyTuple_GET_ITEM(tuple, i))) return 1;
+    }
+    return 0;
+}
+static CYTHON_INLINE int __Pyx_PyErr_ExceptionMatchesInState(PyThreadState* tstate, PyObject* err) {
+    int result;
+    PyObject *exc_type;
+#if PY_VERSION_HEX >= 0x030C00A6
+    PyObject *current_exception = tstate->current_exception;
+    if (unlikely(!current_exception)) return 0;
+    exc_type = (PyObject*) Py_TYPE(current_exception);
+    if (exc_type == err) return 1;
+#else
+    exc_type = tstate->curexc_type;
+    if (exc_type == err) return 1;
+    if (unlikely(!exc_type)) return 0;
+#endif
+    #if CYTHON_AVOID_BORROWED_REFS
+    Py_INCREF(exc_type);
+    #endif
+    if (unlikely(PyTuple_Check(err))) {
+        result = __Pyx_PyErr_ExceptionMatchesTuple(exc_type, err);
+    } else {
+        result = __Pyx_PyErr_GivenExceptionMatches(exc_type, err);
+    }
+    #if CYTHON_AVOID_BORROWED_REFS
+    Py_DECREF(exc_type);
+    #endif
+    return result;
+}
+#endif
+
+/* PyObjectGetAttrStr (used by PyObjectGetAttrStrNoError) */
+#if CYTHON_USE_TYPE_SLOTS
+static CYTHON_INLINE PyObject* __Pyx_PyObject_GetAttrStr(PyObject* obj, PyObject* attr_name) {
+    PyTypeObject* tp = Py_TYPE(obj);
+    if (likely(tp->tp_getattro))
+        return tp->tp_getattro(obj, attr_name);
+    return PyObject_GetAttr(obj, attr_name);
+}
+#endif
+
+/* PyObjectGetAttrStrNoError (used by GetBuiltinName) */
+#if __PYX_LIMITED_VERSION_HEX < 0x030d0000
+static void __Pyx_PyObject_GetAttrStr_ClearAttributeError(void) {
+    __Pyx_PyThreadState_declare
+    __Pyx_PyThreadState_assign
+    if (likely(__Pyx_PyErr_ExceptionMatches(PyExc_AttributeError)))
+        __Pyx_PyErr_Clear();
+}
+#endif
+static CYTHON_INLINE PyObject* __Pyx_PyObject_GetAttrStrNoError(PyObject* obj, PyObject* attr_name) {
+    PyObject *result;
+#if __PYX_LIMITED_VERSION_HEX >= 0x030d0000
+    (void) PyObject_GetOptionalAttr(obj, attr_name, &result);
+    return result;
+#else
+#if CYTHON_COMPILING_IN_CPYTHON && CYTHON_USE_TYPE_SLOTS
+    PyTypeObject* tp = Py_TYPE(obj);
+    if (likely(tp->tp_getattro == PyObject_GenericGetAttr)) {
+        return _PyObject_GenericGetAttrWithDict(obj, attr_name, NULL, 1);
+    }
+#endif
+    result = __Pyx_PyObject_GetAttrStr(obj, attr_name);
+    if (unlikely(!result)) {
+        __Pyx_PyObject_GetAttrStr_ClearAttributeError();
+    }
+    return result;
+#endif
+}
+
+/* GetBuiltinName */
+static PyObject *__Pyx_GetBuiltinName(PyObject *name) {
+    PyObject* result = __Pyx_PyObject_GetAttrStrNoError(__pyx_mstate_global->__pyx_b, name);
+    if (unlikely(!result) && !PyErr_Occurred()) {
+        PyErr_Format(PyExc_NameError,
+            "name '%U' is not defined", name);
+    }
+    return result;
+}
+
+/* CopyObjectArray (used by TupleOrListFromArrayImpl) */
+#if CYTHON_COMPILING_IN_CPYTHON
+static CYTHON_INLINE void __Pyx_copy_object_array(PyObject *const *CYTHON_RESTRICT src, PyObject** CYTHON_RESTRICT dest, Py_ssize_t length) {
+    PyObject *v;
+    Py_ssize_t i;
+    for (i = 0; i < length; i++) {
+        v = dest[i] = src[i];
+        Py_INCREF(v);
+    }
+}
+#endif
+
+/* TupleOrListFromArrayImpl (used by TupleFromArray) */
+#if !(PY_VERSION_HEX >= 0x030F0000 && !CYTHON_COMPILING_IN_LIMITED_API)
+CYTHON_UNUSED static PyObject *
+__Pyx_PyTuple_FromArray(PyObject *const *src, Py_ssize_t n) {
+    if (n <= 0) {
+        return __Pyx_NewRef(__pyx_mstate_global->__pyx_empty_tuple);
+    }
+    PyObject *res = PyTuple_New(n);
+    if (unlikely(res == NULL)) return NULL;
+    #if CYTHON_COMPILING_IN_CPYTHON
+    __Pyx_copy_object_array(src, ((PyTupleObject*)res)->ob_item, n);
+    #else
+    Py_ssize_t i;
+    for (i = 0; i < n; i++) {
+        Py_INCREF(src[i]);
+        if (unlikely(__Pyx_PyTuple_SET_ITEM(res, i, src[i]) < (0))) {
+            Py_DECREF(res);
+            return NULL;
+        }
+    }
+    #endif
+    return res;
+}
+#endif
+
+/* PyObjectCompare (used by UnicodeEquals) */
+#ifndef __Pyx_DEFINED_PyObject_CompareStrStrBoolEq
+#define __Pyx_DEFINED_PyObject_CompareStrStrBoolEq
+static CYTHON_INLINE int __Pyx_PyObject_CompareStrStrBoolEq(PyObject* s1, PyObject* s2) {
+    #if __PYX_LIMITED_VERSION_HEX >= 0x030e0000
+    int result = PyUnicode_Equal(s1, s2);
+    #if !CYTHON_COMPILING_IN_CPYTHON
+    if (unlikely(result == -1)) return -1;
+    #endif
+    if (result == 0) goto __pyx_return_false; else goto __pyx_return_true;
+    #else
+    int result = PyUnicode_Compare(s1, s2);
+    if (unlikely((result == -1) && PyErr_Occurred())) return -1;
+    if (result == 0) goto __pyx_return_true; else goto __pyx_return_false;
+    #endif
+__pyx_return_true:
+    return 1;
+__pyx_return_false:
+    return 0;
+}
+#endif
+static CYTHON_INLINE int __Pyx_PyObject_CompareBoolEq_str_str(PyObject *op1, PyObject *op2, int pyop) {
+    CYTHON_UNUSED_VAR(pyop);
+    if (unlikely(op1 == Py_None)) {
+        if (op2 == Py_None) goto __pyx_return_true; else goto __pyx_return_false;
+    }
+    if (unlikely(op2 == Py_None)) {
+        if (op1 == Py_None) goto __pyx_return_true; else goto __pyx_return_false;
+    }
+    
+    if (likely(op1 != Py_None)) {
+        if (op1 == op2) goto __pyx_return_true;
+        if (likely(op2 != Py_None)) {
+            return __Pyx_PyObject_CompareStrStrBoolEq(op1, op2);
+        }
+        goto __pyx_richcmp;
+    }
+    
+    if ((0)) goto __pyx_richcmp;
+    if ((0)) goto __pyx_return_true;
+    if ((0)) goto __pyx_return_false;
+__pyx_richcmp:
+    return __Pyx_PyObject_RichCompareBool(op1, op2, Py_EQ);
+__pyx_return_true:
+    return 1;
+__pyx_return_false:
+    return 0;
+}
+
+/* fastcall */
+#if CYTHON_VECTORCALL
+static CYTHON_INLINE PyObject * __Pyx_GetKwValue_FASTCALL(PyObject *kwnames, PyObject *const *kwvalues, PyObject *s)
+{
+    Py_ssize_t i, n = __Pyx_PyTuple_GET_SIZE(kwnames);
+    #if !CYTHON_ASSUME_SAFE_SIZE
+    if (unlikely(n == -1)) return NULL;
+    #endif
+    for (i = 0; i < n; i++)
+    {
+        PyObject *namei = __Pyx_PyTuple_GET_ITEM(kwnames, i);
+        #if !CYTHON_ASSUME_SAFE_MACROS
+        if (unlikely(!namei)) return NULL;
+        #endif
+        if (s == namei) return kwvalues[i];
+    }
+    for (i = 0; i < n; i++)
+    {
+        PyObject *namei = __Pyx_PyTuple_GET_ITEM(kwnames, i);
+        #if !CYTHON_ASSUME_SAFE_MACROS
+        if (unlikely(!namei)) return NULL;
+        #endif
+        int eq = __Pyx_PyUnicode_Equals(s, namei);
+        if (unlikely(eq != 0)) {
+            if (unlikely(eq < 0)) return NULL;
+            return kwvalues[i];
+        }
+    }
+    return NULL;
+}
+#if CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX >= 0x030d0000 || CYTHON_COMPILING_IN_LIMITED_API || CYTHON_COMPILING_IN_PYPY || CYTHON_COMPILING_IN_GRAAL
+CYTHON_UNUSED static PyObject *__Pyx_KwargsAsDict_FASTCALL(PyObject *kwnames, PyObject *const *kwvalues) {
+    Py_ssize_t i, nkwargs;
+    PyObject *dict;
+#if !CYTHON_ASSUME_SAFE_SIZE
+    nkwargs = PyTuple_Size(kwnames);
+    if (unlikely(nkwargs < 0)) return NULL;
+#else
+    nkwargs = PyTuple_GET_SIZE(kwnames);
+#endif
+    dict = PyDict_New();
+    if (unlikely(!dict))
+        return NULL;
+    for (i=0; i<nkwargs; i++) {
+#if !CYTHON_ASSUME_SAFE_MACROS
+        PyObject *key = PyTuple_GetItem(kwnames, i);
+        if (!key) goto bad;
+#else
+        PyObject *key = PyTuple_GET_ITEM(kwnames, i);
+#endif
+        if (unlikely(PyDict_SetItem(dict, key, kwvalues[i]) < 0))
+            goto bad;
+    }
+    return dict;
+bad:
+    Py_DECREF(dict);
+    return NULL;
+}
+#endif
+#endif
+
+/* PyObjectCall (used by PyObjectFastCall) */
+#if CYTHON_COMPILING_IN_CPYTHON
+static CYTHON_INLINE PyObject* __Pyx_PyObject_Call(PyObject *func, PyObject *arg, PyObject *kw) {
+    PyObject *result;
+    ternaryfunc call = Py_TYPE(func)->tp_call;
+    if (unlikely(!call))
+        return PyObject_Call(func, arg, kw);
+    if (unlikely(Py_EnterRecursiveCall(" while calling a Python object")))
+        return NULL;
+    result = (*call)(func, arg, kw);
+    Py_LeaveRecursiveCall();
+    if (unlikely(!result) && unlikely(!PyErr_Occurred())) {
+        PyErr_SetString(
+            PyExc_SystemError,
+            "NULL result without error in PyObject_Call");
+    }
+    return result;
+}
+#endif
+
+/* PyObjectCallMethO (used by PyObjectFastCall) */
+#if CYTHON_COMPILING_IN_CPYTHON
+static CYTHON_INLINE PyObject* __Pyx_PyObject_CallMethO(PyObject *func, PyObject *arg) {
+    PyObject *self, *result;
+    PyCFunction cfunc;
+    cfunc = __Pyx_CyOrPyCFunction_GET_FUNCTION(func);
+    self = __Pyx_CyOrPyCFunction_GET_SELF(func);
+    if (unlikely(Py_EnterRecursiveCall(" while calling a Python object")))
+        return NULL;
+    result = cfunc(self, arg);
+    Py_LeaveRecursiveCall();
+    if (unlikely(!result) && unlikely(!PyErr_Occurred())) {
+        PyErr_SetString(
+            PyExc_SystemError,
+            "NULL result without error in PyObject_Call");
+    }
+    return result;
+}
+#endif
+
+/* PyObjectFastCall (used by PyObjectCallOneArg) */
+#if CYTHON_COMPILING_IN_LIMITED_API
+static PyObject* __Pyx_PyObject_FastCall_fallback(PyObject *func, PyObject * const*args, size_t nargs, PyObject *kwargs) {
+    PyObject *argstuple;
+    PyObject *result = 0;
+    size_t i;
+    argstuple = PyTuple_New((Py_ssize_t)nargs);
+    if (unlikely(!argstuple)) return NULL;
+    for (i = 0; i < nargs; i++) {
+        Py_INCREF(args[i]);
+        if (__Pyx_PyTuple_SET_ITEM(argstuple, (Py_ssize_t)i, args[i]) != (0)) goto bad;
+    }
+    result = __Pyx_PyObject_Call(func, argstuple, kwargs);
+  bad:
+    Py_DECREF(argstuple);
+    return result;
+}
+#endif
+#if CYTHON_VECTORCALL && !(CYTHON_COMPILING_IN_LIMITED_API || CYTHON_COMPILING_IN_PYPY)
+  #if CYTHON_COMPILING_IN_CPYTHON
+static CYTHON_INLINE vectorcallfunc __Pyx_PyVectorcall_Function(PyObject *callable) {
+    PyTypeObject *tp = Py_TYPE(callable);
+    #if defined(__Pyx_CyFunction_USED)
+    if (__Pyx_CyFunction_CheckExact(callable)) {
+        return __Pyx_CyFunction_func_vectorcall(callable);
+    }
+    #endif
+    if (!PyType_HasFeature(tp, Py_TPFLAGS_HAVE_VECTORCALL)) {
+        return NULL;
+    }
+    assert(PyCallable_Check(callable));
+    Py_ssize_t offset = tp->tp_vectorcall_offset;
+    assert(offset > 0);
+    vectorcallfunc ptr;
+    memcpy(&ptr, (char *) callable + offset, sizeof(ptr));
+    return ptr;
+}
+  #else
+    #define __Pyx_PyVectorcall_Function(callable) PyVectorcall_Function(callable)
+  #endif
+#endif
+static CYTHON_INLINE PyObject* __Pyx_PyObject_FastCallDict(PyObject *func, PyObject *const *args, size_t nargsf, PyObject *kwargs) {
+    Py_ssize_t nargs = __Pyx_PyVectorcall_NARGS(nargsf);
+#if CYTHON_COMPILING_IN_CPYTHON
+    if (nargs == 0 && kwargs == NULL) {
+        if (__Pyx_CyOrPyCFunction_Check(func) && likely( __Pyx_CyOrPyCFunction_GET_FLAGS(func) & METH_NOARGS))
+            return __Pyx_PyObject_CallMethO(func, NULL);
+    }
+    else if (nargs == 1 && kwargs == NULL) {
+        if (__Pyx_CyOrPyCFunction_Check(func) && likely( __Pyx_CyOrPyCFunction_GET_FLAGS(func) & METH_O))
+            return __Pyx_PyObject_CallMethO(func, args[0]);
+    }
+#endif
+    if (kwargs == NULL) {
+        #if CYTHON_VECTORCALL
+          #if CYTHON_COMPILING_IN_LIMITED_API || CYTHON_COMPILING_IN_PYPY
+            return PyObject_Vectorcall(func, args, nargsf, NULL);
+          #else
+            vectorcallfunc f = __Pyx_PyVectorcall_Function(func);
+            if (f) {
+                return f(func, args, nargsf, NULL);
+            }
+          #endif
+        #endif
+    }
+    if (nargs == 0) {
+        return __Pyx_PyObject_Call(func, __pyx_mstate_global->__pyx_empty_tuple, kwargs);
+    }
+    #if CYTHON_COMPILING_IN_LIMITED_API
+    return __Pyx_PyObject_FastCall_fallback(func, args, (size_t)nargs, kwargs);
+    #elif CYTHON_COMPILING_IN_PYPY
+    return PyObject_VectorcallDict(func, args, (size_t) nargs, kwargs);
+    #else
+    return PyObject_VectorcallDict(func, args, nargsf, kwargs);
+    #endif
+}
+
+/* PyObjectCallOneArg (used by CallUnboundCMethod0) */
+static CYTHON_INLINE PyObject* __Pyx_PyObject_CallOneArg(PyObject *func, PyObject *arg) {
+    PyObject *args[2] = {NULL, arg};
+    return __Pyx_PyObject_FastCall(func, args+1, 1 | __Pyx_PY_VECTORCALL_ARGUMENTS_OFFSET);
+}
+
+/* IgnoreException (used by UnpackUnboundCMethod_impl) */
+static CYTHON_INLINE int __Pyx_IgnoreGivenException(PyObject *given_exception, PyObject *ignorable_exception) {
+    if (PyErr_GivenExceptionMatches(given_exception ? given_exception : PyErr_Occurred(), ignorable_exception)) {
+        PyErr_Clear();
+        return 1;
+    }
+    return 0;
+}
+
+/* UnpackUnboundCMethod_impl (used by UnpackUnboundCMethod) */
+#if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030C0000
+static PyObject *__Pyx_SelflessCall(PyObject *method, PyObject *args, PyObject *kwargs) {
+    PyObject *result;
+    PyObject *selfless_args = PyTuple_GetSlice(args, 1, PyTuple_Size(args));
+    if (unlikely(!selfless_args)) return NULL;
+    result = PyObject_Call(method, selfless_args, kwargs);
+    Py_DECREF(selfless_args);
+    return result;
+}
+#else
+static PyObject *__Pyx_SelflessCall(PyObject *method, PyObject *const *args, Py_ssize_t nargs, PyObject *kwnames) {
+    return PyObject_Vectorcall(method, args ? args+1 : NULL, nargs ? (size_t) nargs-1 : 0, kwnames);
+}
+#endif
+static PyMethodDef __Pyx_UnboundCMethod_Def = {
+     "CythonUnboundCMethod",
+     __PYX_REINTERPRET_FUNCION(PyCFunction, __Pyx_SelflessCall),
+#if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030C0000
+     METH_VARARGS | METH_KEYWORDS,
+#else
+     METH_FASTCALL | METH_KEYWORDS,
+#endif
+     NULL
+};
+static int __Pyx_TryUnpackUnboundCMethod(__Pyx_CachedCFunction* target) {
+    PyObject *method, *result=NULL;
+    method = __Pyx_PyObject_GetAttrStr(target->type, *target->method_name);
+    if (unlikely(!method))
+        return -1;
+    result = method;
+#if CYTHON_COMPILING_IN_CPYTHON
+    if (likely(__Pyx_TypeCheck(method, &PyMethodDescr_Type)))
+    {
+        PyMethodDescrObject *descr = (PyMethodDescrObject*) method;
+        target->func = descr->d_method->ml_meth;
+        target->flag = descr->d_method->ml_flags & ~(METH_CLASS | METH_STATIC | METH_COEXIST);
+    } else
+#endif
+#if CYTHON_COMPILING_IN_PYPY
+#else
+    if (PyCFunction_Check(method))
+#endif
+    {
+        PyObject *self;
+        int self_found;
+#if CYTHON_COMPILING_IN_LIMITED_API || CYTHON_COMPILING_IN_PYPY
+        self = PyObject_GetAttrString(method, "__self__");
+        if (!self && !__Pyx_IgnoreException(PyExc_AttributeError)) {
+            return -1;
+        }
+#else
+        self = PyCFunction_GET_SELF(method);
+#endif
+        self_found = (self && self != Py_None);
+#if CYTHON_COMPILING_IN_LIMITED_API || CYTHON_COMPILING_IN_PYPY
+        Py_XDECREF(self);
+#endif
+        if (self_found) {
+            PyObject *unbound_method = PyCFunction_New(&__Pyx_UnboundCMethod_Def, method);
+            if (unlikely(!unbound_method)) return -1;
+            Py_DECREF(method);
+            result = unbound_method;
+        }
+    }
+#if !CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+    if (unlikely(target->method)) {
+        Py_DECREF(result);
+    } else
+#endif
+    target->method = result;
+    return 0;
+}
+
+/* CallUnboundCMethod0 */
+#if CYTHON_COMPILING_IN_CPYTHON
+static CYTHON_INLINE PyObject* __Pyx_CallUnboundCMethod0(__Pyx_CachedCFunction* cfunc, PyObject* self) {
+    int was_initialized = __Pyx_CachedCFunction_GetAndSetInitializing(cfunc);
+    if (likely(was_initialized == 2 && cfunc->func)) {
+        if (likely(cfunc->flag == METH_NOARGS))
+            return __Pyx_CallCFunction(cfunc, self, NULL);
+        if (likely(cfunc->flag == METH_FASTCALL))
+            return __Pyx_CallCFunctionFast(cfunc, self, NULL, 0);
+        if (cfunc->flag == (METH_FASTCALL | METH_KEYWORDS))
+            return __Pyx_CallCFunctionFastWithKeywords(cfunc, self, NULL, 0, NULL);
+        if (likely(cfunc->flag == (METH_VARARGS | METH_KEYWORDS)))
+            return __Pyx_CallCFunctionWithKeywords(cfunc, self, __pyx_mstate_global->__pyx_empty_tuple, NULL);
+        if (cfunc->flag == METH_VARARGS)
+            return __Pyx_CallCFunction(cfunc, self, __pyx_mstate_global->__pyx_empty_tuple);
+        return __Pyx__CallUnboundCMethod0(cfunc, self);
+    }
+#if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+    else if (unlikely(was_initialized == 1)) {
+        __Pyx_CachedCFunction tmp_cfunc = {
+#ifndef __cplusplus
+            0
+#endif
+        };
+        tmp_cfunc.type = cfunc->type;
+        tmp_cfunc.method_name = cfunc->method_name;
+        return __Pyx__CallUnboundCMethod0(&tmp_cfunc, self);
+    }
+#endif
+    PyObject *result = __Pyx__CallUnboundCMethod0(cfunc, self);
+    __Pyx_CachedCFunction_SetFinishedInitializing(cfunc);
+    return result;
+}
+#endif
+static PyObject* __Pyx__CallUnboundCMethod0(__Pyx_CachedCFunction* cfunc, PyObject* self) {
+    PyObject *result;
+    if (unlikely(!cfunc->method) && unlikely(__Pyx_TryUnpackUnboundCMethod(cfunc) < 0)) return NULL;
+    result = __Pyx_PyObject_CallOneArg(cfunc->method, self);
+    return result;
+}
+
+/* py_dict_items (used by OwnedDictNext) */
+static CYTHON_INLINE PyObject* __Pyx_PyDict_Items(PyObject* d) {
+    return __Pyx_CallUnboundCMethod0(&__pyx_mstate_global->__pyx_umethod_PyDict_Type_items, d);
+}
+
+/* py_dict_values (used by OwnedDictNext) */
+static CYTHON_INLINE PyObject* __Pyx_PyDict_Values(PyObject* d) {
+    return __Pyx_CallUnboundCMethod0(&__pyx_mstate_global->__pyx_umethod_PyDict_Type_values, d);
+}
+
+/* OwnedDictNext (used by ParseKeywordsImpl) */
+#if CYTHON_AVOID_BORROWED_REFS
+static int __Pyx_PyDict_NextRef(PyObject *p, PyObject **ppos, PyObject **pkey, PyObject **pvalue) {
+    PyObject *next = NULL;
+    if (!*ppos) {
+        if (pvalue) {
+            PyObject *dictview = pkey ? __Pyx_PyDict_Items(p) : __Pyx_PyDict_Values(p);
+            if (unlikely(!dictview)) goto bad;
+            *ppos = PyObject_GetIter(dictview);
+            Py_DECREF(dictview);
+        } else {
+            *ppos = PyObject_GetIter(p);
+        }
+        if (unlikely(!*ppos)) goto bad;
+    }
+    next = PyIter_Next(*ppos);
+    if (!next) {
+        if (PyErr_Occurred()) goto bad;
+        return 0;
+    }
+    if (pkey && pvalue) {
+        *pkey = __Pyx_PySequence_ITEM(next, 0);
+        if (unlikely(*pkey)) goto bad;
+        *pvalue = __Pyx_PySequence_ITEM(next, 1);
+        if (unlikely(*pvalue)) goto bad;
+        Py_DECREF(next);
+    } else if (pkey) {
+        *pkey = next;
+    } else {
+        assert(pvalue);
+        *pvalue = next;
+    }
+    return 1;
+  bad:
+    Py_XDECREF(next);
+#if !CYTHON_COMPILING_IN_LIMITED_API && PY_VERSION_HEX >= 0x030d0000
+    PyErr_FormatUnraisable("Exception ignored in __Pyx_PyDict_NextRef");
+#else
+    PyErr_WriteUnraisable(__pyx_mstate_global->__pyx_n_u_Pyx_PyDict_NextRef);
+#endif
+    if (pkey) *pkey = NULL;
+    if (pvalue) *pvalue = NULL;
+    return 0;
+}
+#else // !CYTHON_AVOID_BORROWED_REFS
+static int __Pyx_PyDict_NextRef(PyObject *p, Py_ssize_t *ppos, PyObject **pkey, PyObject **pvalue) {
+    int result = PyDict_Next(p, ppos, pkey, pvalue);
+    if (likely(result == 1)) {
+        if (pkey) Py_INCREF(*pkey);
+        if (pvalue) Py_INCREF(*pvalue);
+    }
+    return result;
+}
+#endif
+
+/* RaiseDoubleKeywords (used by ParseKeywordsImpl) */
+static void __Pyx_RaiseDoubleKeywordsError(
+    const char* func_name,
+    PyObject* kw_name)
+{
+    PyErr_Format(PyExc_TypeError,
+        "%s() got multiple values for keyword argument '%U'", func_name, kw_name);
+}
+
+/* CallUnboundCMethod2 */
+#if CYTHON_COMPILING_IN_CPYTHON
+static CYTHON_INLINE PyObject *__Pyx_CallUnboundCMethod2(__Pyx_CachedCFunction *cfunc, PyObject *self, PyObject *arg1, PyObject *arg2) {
+    int was_initialized = __Pyx_CachedCFunction_GetAndSetInitializing(cfunc);
+    if (likely(was_initialized == 2 && cfunc->func)) {
+        PyObject *args[2] = {arg1, arg2};
+        if (cfunc->flag == METH_FASTCALL) {
+            return __Pyx_CallCFunctionFast(cfunc, self, args, 2);
+        }
+        if (cfunc->flag == (METH_FASTCALL | METH_KEYWORDS))
+            return __Pyx_CallCFunctionFastWithKeywords(cfunc, self, args, 2, NULL);
+    }
+#if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+    else if (unlikely(was_initialized == 1)) {
+        __Pyx_CachedCFunction tmp_cfunc = {
+#ifndef __cplusplus
+            0
+#endif
+        };
+        tmp_cfunc.type = cfunc->type;
+        tmp_cfunc.method_name = cfunc->method_name;
+        return __Pyx__CallUnboundCMethod2(&tmp_cfunc, self, arg1, arg2);
+    }
+#endif
+    PyObject *result = __Pyx__CallUnboundCMethod2(cfunc, self, arg1, arg2);
+    __Pyx_CachedCFunction_SetFinishedInitializing(cfunc);
+    return result;
+}
+#endif
+static PyObject* __Pyx__CallUnboundCMethod2(__Pyx_CachedCFunction* cfunc, PyObject* self, PyObject* arg1, PyObject* arg2){
+    if (unlikely(!cfunc->func && !cfunc->method) && unlikely(__Pyx_TryUnpackUnboundCMethod(cfunc) < 0)) return NULL;
+#if CYTHON_COMPILING_IN_CPYTHON
+    if (cfunc->func && (cfunc->flag & METH_VARARGS)) {
+        PyObject *result = NULL;
+        PyObject *args = PyTuple_New(2);
+        if (unlikely(!args)) return NULL;
+        Py_INCREF(arg1);
+        PyTuple_SET_ITEM(args, 0, arg1);
+        Py_INCREF(arg2);
+        PyTuple_SET_ITEM(args, 1, arg2);
+        if (cfunc->flag & METH_KEYWORDS)
+            result = __Pyx_CallCFunctionWithKeywords(cfunc, self, args, NULL);
+        else
+            result = __Pyx_CallCFunction(cfunc, self, args);
+        Py_DECREF(args);
+        return result;
+    }
+#endif
+    {
+        PyObject *args[4] = {NULL, self, arg1, arg2};
+        return __Pyx_PyObject_FastCall(cfunc->method, args+1, 3 | __Pyx_PY_VECTORCALL_ARGUMENTS_OFFSET);
+    }
+}
+
+/* ParseKeywordsImpl (used by ParseKeywords) */
+static int __Pyx_ValidateDuplicatePosArgs(
+    PyObject *kwds,
+    PyObject ** const argnames[],
+    PyObject ** const *first_kw_arg,
+    const char* function_name)
+{
+    PyObject ** const *name = argnames;
+    while (name != first_kw_arg) {
+        PyObject *key = **name;
+        int found = PyDict_Contains(kwds, key);
+        if (unlikely(found)) {
+            if (found == 1) __Pyx_RaiseDoubleKeywordsError(function_name, key);
+            goto bad;
+        }
+        name++;
+    }
+    return 0;
+bad:
+    return -1;
+}
+#if CYTHON_USE_UNICODE_INTERNALS
+static CYTHON_INLINE int __Pyx_UnicodeKeywordsEqual(PyObject *s1, PyObject *s2) {
+    int kind;
+    Py_ssize_t len = PyUnicode_GET_LENGTH(s1);
+    if (len != PyUnicode_GET_LENGTH(s2)) return 0;
+    kind = PyUnicode_KIND(s1);
+    if (kind != PyUnicode_KIND(s2)) return 0;
+    const void *data1 = PyUnicode_DATA(s1);
+    const void *data2 = PyUnicode_DATA(s2);
+    return (memcmp(data1, data2, (size_t) len * (size_t) kind) == 0);
+}
+#endif
+static int __Pyx_MatchKeywordArg_str(
+    PyObject *key,
+    PyObject ** const argnames[],
+    PyObject ** const *first_kw_arg,
+    size_t *index_found,
+    const char *function_name)
+{
+    PyObject ** const *name;
+    #if CYTHON_USE_UNICODE_INTERNALS
+    Py_hash_t key_hash = ((PyASCIIObject*)key)->hash;
+    if (unlikely(key_hash == -1)) {
+        key_hash = PyObject_Hash(key);
+        if (unlikely(key_hash == -1))
+            goto bad;
+    }
+    #endif
+    name = first_kw_arg;
+    while (*name) {
+        PyObject *name_str = **name;
+        #if CYTHON_USE_UNICODE_INTERNALS
+        if (key_hash == ((PyASCIIObject*)name_str)->hash && __Pyx_UnicodeKeywordsEqual(name_str, key)) {
+            *index_found = (size_t) (name - argnames);
+            return 1;
+        }
+        #else
+        #if CYTHON_ASSUME_SAFE_SIZE
+        if (PyUnicode_GET_LENGTH(name_str) == PyUnicode_GET_LENGTH(key))
+        #endif
+        {
+            int cmp = PyUnicode_Compare(name_str, key);
+            if (cmp < 0 && unlikely(PyErr_Occurred())) goto bad;
+            if (cmp == 0) {
+                *index_found = (size_t) (name - argnames);
+                return 1;
+            }
+        }
+        #endif
+        name++;
+    }
+    name = argnames;
+    while (name != first_kw_arg) {
+        PyObject *name_str = **name;
+        #if CYTHON_USE_UNICODE_INTERNALS
+        if (unlikely(key_hash == ((PyASCIIObject*)name_str)->hash)) {
+            if (__Pyx_UnicodeKeywordsEqual(name_str, key))
+                goto arg_passed_twice;
+        }
+        #else
+        #if CYTHON_ASSUME_SAFE_SIZE
+        if (PyUnicode_GET_LENGTH(name_str) == PyUnicode_GET_LENGTH(key))
+        #endif
+        {
+            if (unlikely(name_str == key)) goto arg_passed_twice;
+            int cmp = PyUnicode_Compare(name_str, key);
+            if (cmp < 0 && unlikely(PyErr_Occurred())) goto bad;
+            if (cmp == 0) goto arg_passed_twice;
+        }
+        #endif
+        name++;
+    }
+    return 0;
+arg_passed_twice:
+    __Pyx_RaiseDoubleKeywordsError(function_name, key);
+    goto bad;
+bad:
+    return -1;
+}
+static int __Pyx_MatchKeywordArg_nostr(
+    PyObject *key,
+    PyObject ** const argnames[],
+    PyObject ** const *first_kw_arg,
+    size_t *index_found,
+    const char *function_name)
+{
+    PyObject ** const *name;
+    if (unlikely(!PyUnicode_Check(key))) goto invalid_keyword_type;
+    name = first_kw_arg;
+    while (*name) {
+        int cmp = PyObject_RichCompareBool(**name, key, Py_EQ);
+        if (cmp == 1) {
+            *index_found = (size_t) (name - argnames);
+            return 1;
+        }
+        if (unlikely(cmp == -1)) goto bad;
+        name++;
+    }
+    name = argnames;
+    while (name != first_kw_arg) {
+        int cmp = PyObject_RichCompareBool(**name, key, Py_EQ);
+        if (unlikely(cmp != 0)) {
+            if (cmp == 1) goto arg_passed_twice;
+            else goto bad;
+        }
+        name++;
+    }
+    return 0;
+arg_passed_twice:
+    __Pyx_RaiseDoubleKeywordsError(function_name, key);
+    goto bad;
+invalid_keyword_type:
+    PyErr_Format(PyExc_TypeError,
+        "%.200s() keywords must be strings", function_name);
+    goto bad;
+bad:
+    return -1;
+}
+static CYTHON_INLINE int __Pyx_MatchKeywordArg(
+    PyObject *key,
+    PyObject ** const argnames[],
+    PyObject ** const *first_kw_arg,
+    size_t *index_found,
+    const char *function_name)
+{
+    return likely(PyUnicode_CheckExact(key)) ?
+        __Pyx_MatchKeywordArg_str(key, argnames, first_kw_arg, index_found, function_name) :
+        __Pyx_MatchKeywordArg_nostr(key, argnames, first_kw_arg, index_found, function_name);
+}
+static void __Pyx_RejectUnknownKeyword(
+    PyObject *kwds,
+    PyObject ** const argnames[],
+    PyObject ** const *first_kw_arg,
+    const char *function_name)
+{
+    #if CYTHON_AVOID_BORROWED_REFS
+    PyObject *pos = NULL;
+    #else
+    Py_ssize_t pos = 0;
+    #endif
+    PyObject *key = NULL;
+    __Pyx_BEGIN_CRITICAL_SECTION(kwds);
+    #if CYTHON_AVOID_BORROWED_REFS
+    while (__Pyx_PyDict_NextRef(kwds, &pos, &key, NULL))
+    #else
+    (void) __Pyx_PyDict_NextRef;
+    while (PyDict_Next(kwds, &pos, &key, NULL))
+    #endif
+    {
+        PyObject** const *name = first_kw_arg;
+        while (*name && (**name != key)) name++;
+        if (!*name) {
+            size_t index_found = 0;
+            int cmp = __Pyx_MatchKeywordArg(key, argnames, first_kw_arg, &index_found, function_name);
+            if (cmp != 1) {
+                if (cmp == 0) {
+                    PyErr_Format(PyExc_TypeError,
+                        "%s() got an unexpected keyword argument '%U'",
+                        function_name, key);
+                }
+                #if CYTHON_AVOID_BORROWED_REFS
+                Py_DECREF(key);
+                #endif
+                break;
+            }
+        }
+        #if CYTHON_AVOID_BORROWED_REFS
+        Py_DECREF(key);
+        #endif
+    }
+    __Pyx_END_CRITICAL_SECTION();
+    #if CYTHON_AVOID_BORROWED_REFS
+    Py_XDECREF(pos);
+    #endif
+    assert(PyErr_Occurred());
+}
+static int __Pyx_ParseKeywordDict(
+    PyObject *kwds,
+    PyObject ** const argnames[],
+    PyObject *values[],
+    Py_ssize_t num_pos_args,
+    Py_ssize_t num_kwargs,
+    const char* function_name,
+    int ignore_unknown_kwargs)
+{
+    PyObject** const *name;
+    PyObject** const *first_kw_arg = argnames + num_pos_args;
+    Py_ssize_t extracted = 0;
+#if !CYTHON_COMPILING_IN_PYPY || defined(PyArg_ValidateKeywordArguments)
+    if (unlikely(!PyArg_ValidateKeywordArguments(kwds))) return -1;
+#endif
+    name = first_kw_arg;
+    while (*name && num_kwargs > extracted) {
+        PyObject * key = **name;
+        PyObject *value;
+        int found = 0;
+        #if __PYX_LIMITED_VERSION_HEX >= 0x030d0000
+        found = PyDict_GetItemRef(kwds, key, &value);
+        #else
+        value = PyDict_GetItemWithError(kwds, key);
+        if (value) {
+            Py_INCREF(value);
+            found = 1;
+        } else {
+            if (unlikely(PyErr_Occurred())) goto bad;
+        }
+        #endif
+        if (found) {
+            if (unlikely(found < 0)) goto bad;
+            values[name-argnames] = value;
+            extracted++;
+        }
+        name++;
+    }
+    if (num_kwargs > extracted) {
+        if (ignore_unknown_kwargs) {
+            if (unlikely(__Pyx_ValidateDuplicatePosArgs(kwds, argnames, first_kw_arg, function_name) == -1))
+                goto bad;
+        } else {
+            __Pyx_RejectUnknownKeyword(kwds, argnames, first_kw_arg, function_name);
+            goto bad;
+        }
+    }
+    return 0;
+bad:
+    return -1;
+}
+static int __Pyx_ParseKeywordDictToDict(
+    PyObject *kwds,
+    PyObject ** const argnames[],
+    PyObject *kwds2,
+    PyObject *values[],
+    Py_ssize_t num_pos_args,
+    const char* function_name)
+{
+    PyObject** const *name;
+    PyObject** const *first_kw_arg = argnames + num_pos_args;
+    Py_ssize_t len;
+#if !CYTHON_COMPILING_IN_PYPY || defined(PyArg_ValidateKeywordArguments)
+    if (unlikely(!PyArg_ValidateKeywordArguments(kwds))) return -1;
+#endif
+    if (PyDict_Update(kwds2, kwds) < 0) goto bad;
+    name = first_kw_arg;
+    while (*name) {
+        PyObject *key = **name;
+        PyObject *value;
+#if !CYTHON_COMPILING_IN_LIMITED_API && (PY_VERSION_HEX >= 0x030d00A2 || defined(PyDict_Pop))
+        int found = PyDict_Pop(kwds2, key, &value);
+        if (found) {
+            if (unlikely(found < 0)) goto bad;
+            values[name-argnames] = value;
+        }
+#elif __PYX_LIMITED_VERSION_HEX >= 0x030d0000
+        int found = PyDict_GetItemRef(kwds2, key, &value);
+        if (found) {
+            if (unlikely(found < 0)) goto bad;
+            values[name-argnames] = value;
+            if (unlikely(PyDict_DelItem(kwds2, key) < 0)) goto bad;
+        }
+#else
+    #if CYTHON_COMPILING_IN_CPYTHON
+        value = _PyDict_Pop(kwds2, key, kwds2);
+    #else
+        value = __Pyx_CallUnboundCMethod2(&__pyx_mstate_global->__pyx_umethod_PyDict_Type_pop, kwds2, key, kwds2);
+    #endif
+        if (value == kwds2) {
+            Py_DECREF(value);
+        } else {
+            if (unlikely(!value)) goto bad;
+            values[name-argnames] = value;
+        }
+#endif
+        name++;
+    }
+    len = PyDict_Size(kwds2);
+    if (len > 0) {
+        return __Pyx_ValidateDuplicatePosArgs(kwds, argnames, first_kw_arg, function_name);
+    } else if (unlikely(len == -1)) {
+        goto bad;
+    }
+    return 0;
+bad:
+    return -1;
+}
+static int __Pyx_ParseKeywordsTuple(
+    PyObject *kwds,
+    PyObject * const *kwvalues,
+    PyObject ** const argnames[],
+    PyObject *kwds2,
+    PyObject *values[],
+    Py_ssize_t num_pos_args,
+    Py_ssize_t num_kwargs,
+    const char* function_name,
+    int ignore_unknown_kwargs)
+{
+    PyObject *key = NULL;
+    PyObject** const * name;
+    PyObject** const *first_kw_arg = argnames + num_pos_args;
+    for (Py_ssize_t pos = 0; pos < num_kwargs; pos++) {
+#if CYTHON_AVOID_BORROWED_REFS
+        key = __Pyx_PySequence_ITEM(kwds, pos);
+#else
+        key = __Pyx_PyTuple_GET_ITEM(kwds, pos);
+#endif
+#if !CYTHON_ASSUME_SAFE_MACROS
+        if (unlikely(!key)) goto bad;
+#endif
+        name = first_kw_arg;
+        while (*name && (**name != key)) name++;
+        if (*name) {
+            PyObject *value = kwvalues[pos];
+            values[name-argnames] = __Pyx_NewRef(value);
+        } else {
+            size_t index_found = 0;
+            int cmp = __Pyx_MatchKeywordArg(key, argnames, first_kw_arg, &index_found, function_name);
+            if (cmp == 1) {
+                PyObject *value = kwvalues[pos];
+                values[index_found] = __Pyx_NewRef(value);
+            } else {
+                if (unlikely(cmp == -1)) goto bad;
+                if (kwds2) {
+                    PyObject *value = kwvalues[pos];
+                    if (unlikely(PyDict_SetItem(kwds2, key, value))) goto bad;
+                } else if (!ignore_unknown_kwargs) {
+                    goto invalid_keyword;
+                }
+            }
+        }
+        #if CYTHON_AVOID_BORROWED_REFS
+        Py_DECREF(key);
+        key = NULL;
+        #endif
+    }
+    return 0;
+invalid_keyword:
+    PyErr_Format(PyExc_TypeError,
+        "%s() got an unexpected keyword argument '%U'",
+        function_name, key);
+    goto bad;
+bad:
+    #if CYTHON_AVOID_BORROWED_REFS
+    Py_XDECREF(key);
+    #endif
+    return -1;
+}
+
+/* ParseKeywords */
+static int __Pyx_ParseKeywords(
+    PyObject *kwds,
+    PyObject * const *kwvalues,
+    PyObject ** const argnames[],
+    PyObject *kwds2,
+    PyObject *values[],
+    Py_ssize_t num_pos_args,
+    Py_ssize_t num_kwargs,
+    const char* function_name,
+    int ignore_unknown_kwargs)
+{
+    if (CYTHON_VECTORCALL && likely(PyTuple_Check(kwds)))
+        return __Pyx_ParseKeywordsTuple(kwds, kwvalues, argnames, kwds2, values, num_pos_args, num_kwargs, function_name, ignore_unknown_kwargs);
+    else if (kwds2)
+        return __Pyx_ParseKeywordDictToDict(kwds, argnames, kwds2, values, num_pos_args, function_name);
+    else
+        return __Pyx_ParseKeywordDict(kwds, argnames, values, num_pos_args, num_kwargs, function_name, ignore_unknown_kwargs);
+}
+
+/* RaiseArgTupleInvalid */
+static void __Pyx_RaiseArgtupleInvalid(
+    const char* func_name,
+    int exact,
+    Py_ssize_t num_min,
+    Py_ssize_t num_max,
+    Py_ssize_t num_found)
+{
+    Py_ssize_t num_expected;
+    const char *more_or_less;
+    if (num_found < num_min) {
+        num_expected = num_min;
+        more_or_less = "at least";
+    } else {
+        num_expected = num_max;
+        more_or_less = "at most";
+    }
+    if (exact) {
+        more_or_less = "exactly";
+    }
+    PyErr_Format(PyExc_TypeError,
+                 "%.200s() takes %.8s %" CYTHON_FORMAT_SSIZE_T "d positional argument%.1s (%" CYTHON_FORMAT_SSIZE_T "d given)",
+                 func_name, more_or_less, num_expected,
+                 (num_expected == 1) ? "" : "s", num_found);
+}
+
+/* ArgTypeTestError (used by ArgTypeTest) */
+static void __Pyx_ArgTypeError(PyObject *obj, PyTypeObject *type, const char *name, int exact)
+{
+    __Pyx_TypeName type_name;
+    __Pyx_TypeName obj_type_name;
+    PyObject *extra_info = __pyx_mstate_global->__pyx_empty_unicode;
+    int from_annotation_subclass = 0;
+    if (unlikely(!type)) {
+        PyErr_SetString(PyExc_SystemError, "Missing type object");
+        return;
+    } else if (exact == 2) {
+        if (__Pyx_TypeCheck(obj, type)) {
+            from_annotation_subclass = 1;
+            extra_info = __pyx_mstate_global->__pyx_kp_u_Note_that_Cython_is_deliberately;
+        }
+    }
+    type_name = __Pyx_PyType_GetFullyQualifiedName(type);
+    #if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030d0000
+    if (unlikely(!type_name)) return;
+    #endif
+    obj_type_name = __Pyx_PyType_GetFullyQualifiedName(Py_TYPE(obj));
+    #if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030d0000
+    if (unlikely(!obj_type_name)) goto obj_type_name_failed;
+    #endif
+    PyErr_Format(PyExc_TypeError,
+        "Argument '%.200s' has incorrect type (expected " __Pyx_FMT_TYPENAME ", got " __Pyx_FMT_TYPENAME ")"
+#if __PYX_LIMITED_VERSION_HEX < 0x030C0000
+        "%s%U"
+#endif
+        , name, type_name, obj_type_name
+#if __PYX_LIMITED_VERSION_HEX < 0x030C0000
+        , (from_annotation_subclass ? ". " : ""), extra_info
+#endif
+        );
+#if __PYX_LIMITED_VERSION_HEX >= 0x030C0000
+    if (exact == 2 && from_annotation_subclass) {
+        PyObject *res;
+        PyObject *vargs[2];
+        vargs[0] = PyErr_GetRaisedException();
+        vargs[1] = extra_info;
+        res = PyObject_VectorcallMethod(__pyx_mstate_global->__pyx_kp_u_add_note, vargs, 2, NULL);
+        Py_XDECREF(res);
+        PyErr_SetRaisedException(vargs[0]);
+    }
+#endif
+    __Pyx_DECREF_TypeName(obj_type_name);
+#if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030d0000
+obj_type_name_failed:
+#endif
+    __Pyx_DECREF_TypeName(type_name);
+    return;
+}
+
+/* ArgTypeTest */
+static CYTHON_INLINE int __Pyx_ArgTypeTest(PyObject *obj, PyTypeObject *type, int none_allowed, const char *name, int exact) {
+    if (likely(Py_IS_TYPE(obj, type) | (none_allowed && (obj == Py_None))))
+        return 1;
+    if (!exact && likely(type) && likely(__Pyx_TypeCheck(obj, type)))
+        return 1;
+    __Pyx_ArgTypeError(obj, type, name, exact);
+    return 0;
+}
+
+/* FormatTypeName (used by RaiseErrorWithObjectType1) */
+#if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030d0000
+static __Pyx_TypeName
+__Pyx_PyType_GetFullyQualifiedName(PyTypeObject* tp)
+{
+    PyObject *module = NULL, *name = NULL, *result = NULL;
+    #if __PYX_LIMITED_VERSION_HEX < 0x030b0000
+    name = __Pyx_PyObject_GetAttrStr((PyObject *)tp,
+                                               __pyx_mstate_global->__pyx_n_u_qualname);
+    #else
+    name = PyType_GetQualName(tp);
+    #endif
+    if (unlikely(name == NULL) || unlikely(!PyUnicode_Check(name))) goto bad;
+    module = __Pyx_PyObject_GetAttrStr((PyObject *)tp,
+                                               __pyx_mstate_global->__pyx_n_u_module);
+    if (unlikely(module == NULL) || unlikely(!PyUnicode_Check(module))) goto bad;
+    if (PyUnicode_CompareWithASCIIString(module, "builtins") == 0) {
+        result = name;
+        name = NULL;
+        goto done;
+    }
+    result = PyUnicode_FromFormat("%U.%U", module, name);
+    if (unlikely(result == NULL)) goto bad;
+  done:
+    Py_XDECREF(name);
+    Py_XDECREF(module);
+    return result;
+  bad:
+    PyErr_Clear();
+    if (name) {
+        result = name;
+        name = NULL;
+    } else {
+        result = __Pyx_NewRef(__pyx_mstate_global->__pyx_kp_u_);
+    }
+    goto done;
+}
+#endif
+
+/* RaiseErrorWithObjectType1 (used by RaiseUnexpectedTypeError) */
+static void __Pyx_RaiseErrorWithType1(PyObject* exc_type, const char* message, const char *arg, PyTypeObject *type_obj) {
+    __Pyx_TypeName type_name = __Pyx_PyType_GetFullyQualifiedName(type_obj);
+    #if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030d0000
+    if (unlikely(!type_name)) return;
+    #endif
+    PyErr_Format(exc_type, message, arg, type_name);
+    __Pyx_DECREF_TypeName(type_name);
+}
+
+/* RaiseUnexpectedTypeError */
+static int __Pyx_RaiseUnexpectedTypeError(const char *expected, PyObject *obj) {
+    __Pyx_RaiseTypeErrorWithObjectType1(
+        "Expected %.42s, got " __Pyx_FMT_TYPENAME,
+        expected, obj);
+    return 0;
+}
+
+/* RejectKeywords */
+static void __Pyx_RejectKeywords(const char* function_name, PyObject *kwds) {
+    PyObject *key = NULL;
+    if (CYTHON_VECTORCALL && likely(PyTuple_Check(kwds))) {
+        key = __Pyx_PySequence_ITEM(kwds, 0);
+    } else {
+#if CYTHON_AVOID_BORROWED_REFS
+        PyObject *pos = NULL;
+#else
+        Py_ssize_t pos = 0;
+#endif
+#if !CYTHON_COMPILING_IN_PYPY || defined(PyArg_ValidateKeywordArguments)
+        if (unlikely(!PyArg_ValidateKeywordArguments(kwds))) return;
+#endif
+        __Pyx_PyDict_NextRef(kwds, &pos, &key, NULL);
+#if CYTHON_AVOID_BORROWED_REFS
+        Py_XDECREF(pos);
+#endif
+    }
+    if (likely(key)) {
+        PyErr_Format(PyExc_TypeError,
+            "%s() got an unexpected keyword argument '%U'",
+            function_name, key);
+        Py_DECREF(key);
+    }
+}
+
+/* GetAttr3 */
+#if __PYX_LIMITED_VERSION_HEX < 0x030d0000
+static PyObject *__Pyx_GetAttr3Default(PyObject *d) {
+    __Pyx_PyThreadState_declare
+    __Pyx_PyThreadState_assign
+    if (unlikely(!__Pyx_PyErr_ExceptionMatches(PyExc_AttributeError)))
+        return NULL;
+    __Pyx_PyErr_Clear();
+    Py_INCREF(d);
+    return d;
+}
+#endif
+static CYTHON_INLINE PyObject *__Pyx_GetAttr3(PyObject *o, PyObject *n, PyObject *d) {
+    PyObject *r;
+#if __PYX_LIMITED_VERSION_HEX >= 0x030d0000
+    int res = PyObject_GetOptionalAttr(o, n, &r);
+    return (res != 0) ? r : __Pyx_NewRef(d);
+#else
+  #if CYTHON_USE_TYPE_SLOTS
+    if (likely(PyUnicode_Check(n))) {
+        r = __Pyx_PyObject_GetAttrStrNoError(o, n);
+        if (unlikely(!r) && likely(!PyErr_Occurred())) {
+            r = __Pyx_NewRef(d);
+        }
+        return r;
+    }
+  #endif
+    r = PyObject_GetAttr(o, n);
+    return (likely(r)) ? r : __Pyx_GetAttr3Default(d);
+#endif
+}
+
+/* PyDictVersioning (used by GetModuleGlobalName) */
+#if CYTHON_USE_DICT_VERSIONS && CYTHON_USE_TYPE_SLOTS
+static CYTHON_INLINE PY_UINT64_T __Pyx_get_tp_dict_version(PyObject *obj) {
+    PyObject *dict = Py_TYPE(obj)->tp_dict;
+    return likely(dict) ? __PYX_GET_DICT_VERSION(dict) : 0;
+}
+static CYTHON_INLINE PY_UINT64_T __Pyx_get_object_dict_version(PyObject *obj) {
+    PyObject **dictptr = NULL;
+    Py_ssize_t offset = Py_TYPE(obj)->tp_dictoffset;
+    if (offset) {
+#if CYTHON_COMPILING_IN_CPYTHON
+        dictptr = (likely(offset > 0)) ? (PyObject **) ((char *)obj + offset) : _PyObject_GetDictPtr(obj);
+#else
+        dictptr = _PyObject_GetDictPtr(obj);
+#endif
+    }
+    return (dictptr && *dictptr) ? __PYX_GET_DICT_VERSION(*dictptr) : 0;
+}
+static CYTHON_INLINE int __Pyx_object_dict_version_matches(PyObject* obj, PY_UINT64_T tp_dict_version, PY_UINT64_T obj_dict_version) {
+    PyObject *dict = Py_TYPE(obj)->tp_dict;
+    if (unlikely(!dict) || unlikely(tp_dict_version != __PYX_GET_DICT_VERSION(dict)))
+        return 0;
+    return obj_dict_version == __Pyx_get_object_dict_version(obj);
+}
+#endif
+
+/* GetModuleGlobalName */
+#if CYTHON_USE_DICT_VERSIONS
+static PyObject *__Pyx__GetModuleGlobalName(PyObject *name, PY_UINT64_T *dict_version, PyObject **dict_cached_value)
+#else
+static CYTHON_INLINE PyObject *__Pyx__GetModuleGlobalName(PyObject *name)
+#endif
+{
+    PyObject *result;
+#if CYTHON_COMPILING_IN_LIMITED_API
+    if (unlikely(!__pyx_m)) {
+        if (!PyErr_Occurred())
+            PyErr_SetNone(PyExc_NameError);
+        return NULL;
+    }
+    result = PyObject_GetAttr(__pyx_m, name);
+    if (likely(result)) {
+        return result;
+    }
+    if (!__Pyx_IgnoreException(PyExc_Exception)) {
+        return NULL; // BaseException
+    }
+#elif CYTHON_AVOID_BORROWED_REFS || CYTHON_AVOID_THREAD_UNSAFE_BORROWED_REFS
+    if (unlikely(__Pyx_PyDict_GetItemRef(__pyx_mstate_global->__pyx_d, name, &result) == -1)) {
+        if (!__Pyx_IgnoreException(PyExc_Exception)) {
+            return NULL; // BaseException
+        }
+    }
+    __PYX_UPDATE_DICT_CACHE(__pyx_mstate_global->__pyx_d, result, *dict_cached_value, *dict_version)
+    if (likely(result)) {
+        return result;
+    }
+#else
+    result = _PyDict_GetItem_KnownHash(__pyx_mstate_global->__pyx_d, name, ((PyASCIIObject *) name)->hash);
+    __PYX_UPDATE_DICT_CACHE(__pyx_mstate_global->__pyx_d, result, *dict_cached_value, *dict_version)
+    if (likely(result)) {
+        return __Pyx_NewRef(result);
+    }
+    PyObject *exc = PyErr_Occurred();
+    if (unlikely(exc) && !__Pyx_IgnoreGivenException(exc, PyExc_Exception)) {
+        return NULL; // BaseException
+    }
+#endif
+    return __Pyx_GetBuiltinName(name);
+}
+
+/* PyObjectFastCallMethod */
+#if !CYTHON_VECTORCALL
+static PyObject *__Pyx_PyObject_FastCallMethod(PyObject *name, PyObject *const *args, size_t nargsf) {
+    PyObject *result;
+    switch (__Pyx_PyVectorcall_NARGS(nargsf)) {
+        case 1:
+            return PyObject_CallMethodObjArgs(args[0], name, NULL);
+        case 2:
+            return PyObject_CallMethodObjArgs(args[0], name, args[1], NULL);
+        case 3:
+            return PyObject_CallMethodObjArgs(args[0], name, args[1], args[2], NULL);
+        case 4:
+            return PyObject_CallMethodObjArgs(args[0], name, args[1], args[2], args[3], NULL);
+        case 5:
+            return PyObject_CallMethodObjArgs(args[0], name, args[1], args[2], args[3], args[4], NULL);
+    }
+    PyObject *attr = PyObject_GetAttr(args[0], name);
+    if (unlikely(!attr))
+        return NULL;
+    result = __Pyx_PyObject_FastCall(attr, args+1, nargsf - 1);
+    Py_DECREF(attr);
+    return result;
+}
+#endif
+
+/* PyFrozenDict (used by GetItemInt) */
+#if CYTHON_COMPILING_IN_LIMITED_API
+static CYTHON_INLINE PyObject* __Pyx__PyFrozenDict_New(PyObject* frozendict_type, PyObject* it) {
+    return PyObject_CallFunctionObjArgs(frozendict_type, it, NULL);
+}
+#endif
+
+/* GettItemInt_wraparound (used by GetItemInt) */
+#if CYTHON_USE_TYPE_SLOTS && !CYTHON_COMPILING_IN_PYPY
+static int __Pyx_GetItemInt_wraparound(PyObject *o, PySequenceMethods *sm, Py_ssize_t *i) {
+    assert(*i < 0);
+    if (likely(sm->sq_length)) {
+        Py_ssize_t l = sm->sq_length(o);
+        if (likely(l >= 0)) {
+            *i += l;
+        } else {
+            if (!PyErr_ExceptionMatches(PyExc_OverflowError))
+                return -1;
+            PyErr_Clear();
+        }
+    }
+    return 0;
+}
+#endif
+
+/* GetItemInt */
+static PyObject *__Pyx_GetItemInt_Generic(PyObject *o, PyObject* j) {
+    PyObject *r;
+    if (unlikely(!j)) return NULL;
+    r = PyObject_GetItem(o, j);
+    Py_DECREF(j);
+    return r;
+}
+static PyObject *__Pyx_GetItemInt_Generic_size(PyObject *o, Py_ssize_t i) {
+    return __Pyx_GetItemInt_Generic(o, PyLong_FromSsize_t(i));
+}
+static CYTHON_INLINE PyObject *__Pyx_GetItemInt_List_Fast(PyObject *o, Py_ssize_t i,
+                                                              int wraparound, int boundscheck, int unsafe_shared) {
+    CYTHON_MAYBE_UNUSED_VAR(unsafe_shared);
+#if CYTHON_AVOID_BORROWED_REFS
+    CYTHON_UNUSED_VAR(boundscheck);
+    Py_ssize_t wrapped_i = i;
+    if (wraparound & unlikely(i < 0)) {
+        Py_ssize_t size = __Pyx_PyList_GET_SIZE(o);
+        #if !CYTHON_ASSUME_SAFE_SIZE
+        if (unlikely(size < 0)) return NULL;
+        #endif
+        wrapped_i += size;
+    }
+    return __Pyx_PyList_GetItemRef(o, wrapped_i);
+#elif CYTHON_ASSUME_SAFE_SIZE && CYTHON_ASSUME_SAFE_MACROS
+    Py_ssize_t wrapped_i = i;
+    Py_ssize_t size = (wraparound | boundscheck) ? PyList_GET_SIZE(o) : -1;
+    if (wraparound & unlikely(i < 0)) {
+        wrapped_i += size;
+    }
+    if ((!boundscheck) || likely(__Pyx_is_valid_index(wrapped_i, size))) {
+        return __Pyx_PyList_GET_ITEM_REF(o, wrapped_i, unsafe_shared);
+    }
+    return __Pyx_GetItemInt_Generic_size(o, i);
+#else
+    (void)wraparound;
+    (void)boundscheck;
+    return PySequence_GetItem(o, i);
+#endif
+}
+static CYTHON_INLINE PyObject *__Pyx_GetItemInt_Tuple_Fast(PyObject *o, Py_ssize_t i,
+                                                              int wraparound, int boundscheck, int unsafe_shared) {
+    CYTHON_MAYBE_UNUSED_VAR(unsafe_shared);
+#if CYTHON_AVOID_BORROWED_REFS
+    CYTHON_UNUSED_VAR(boundscheck);
+    Py_ssize_t wrapped_i = i;
+    if (wraparound & unlikely(i < 0)) {
+        Py_ssize_t size = __Pyx_PyTuple_GET_SIZE(o);
+        #if !CYTHON_ASSUME_SAFE_SIZE
+        if (unlikely(size < 0)) return NULL;
+        #endif
+        wrapped_i += size;
+    }
+    #if CYTHON_ASSUME_SAFE_MACROS && !CYTHON_COMPILING_IN_LIMITED_API
+    return PySequence_ITEM(o, wrapped_i);
+    #else
+    if (unlikely(wrapped_i < 0)) {
+        PyErr_SetString(PyExc_IndexError, "tuple index out of range");
+        return NULL;
+    }
+    return PySequence_GetItem(o, wrapped_i);
+    #endif
+#elif CYTHON_ASSUME_SAFE_SIZE && CYTHON_ASSUME_SAFE_MACROS
+    Py_ssize_t wrapped_i = i;
+    Py_ssize_t size = (wraparound | boundscheck) ? PyTuple_GET_SIZE(o) : -1;
+    if (wraparound & unlikely(i < 0)) {
+        wrapped_i += size;
+    }
+    if ((!boundscheck) || likely(__Pyx_is_valid_index(wrapped_i, size))) {
+        return __Pyx_NewRef(__Pyx_PyTuple_GET_ITEM(o, wrapped_i));
+    }
+    return __Pyx_GetItemInt_Generic_size(o, i);
+#else
+    (void)wraparound;
+    (void)boundscheck;
+    return PySequence_GetItem(o, i);
+#endif
+}
+#if CYTHON_USE_TYPE_SLOTS && !CYTHON_COMPILING_IN_PYPY
+static CYTHON_INLINE PyObject *__Pyx_GetItemInt_Fast_mapping(PyObject *o, binaryfunc getitem, Py_ssize_t i) {
+    PyObject *r, *key = PyLong_FromSsize_t(i);
+    if (unlikely(!key)) return NULL;
+    r = getitem(o, key);
+    Py_DECREF(key);
+    return r;
+}
+#endif
+static CYTHON_INLINE PyObject *__Pyx_GetItemInt_Fast(PyObject *o, Py_ssize_t i,
+                                                     int wraparound, int boundscheck, int unsafe_shared) {
+    CYTHON_MAYBE_UNUSED_VAR(unsafe_shared);
+#if CYTHON_ASSUME_SAFE_SIZE
+    if (PyList_CheckExact(o)) {
+        return __Pyx_GetItemInt_List_Fast(o, i, wraparound, boundscheck, unsafe_shared);
+    } else
+    #if CYTHON_ASSUME_SAFE_MACROS && !CYTHON_AVOID_BORROWED_REFS
+    if (PyTuple_CheckExact(o)) {
+        return __Pyx_GetItemInt_Tuple_Fast(o, i, wraparound, boundscheck, unsafe_shared);
+    } else
+    #endif
+#else
+    if ((!wraparound || i >= 0) & PyList_CheckExact(o)) {
+        return boundscheck ? __Pyx_PyList_GetItemRef(o, i) : __Pyx_PyList_GET_ITEM_REF(o, i, unsafe_shared);
+    } else
+#endif
+#if CYTHON_USE_TYPE_SLOTS && !CYTHON_COMPILING_IN_PYPY
+    if (PyDict_CheckExact(o)) {
+        return __Pyx_GetItemInt_Fast_mapping(o, PyDict_Type.tp_as_mapping->mp_subscript, i);
+    #if defined(PyFrozenDict_CheckExact)
+    } else if (PyFrozenDict_CheckExact(o)) {
+        return __Pyx_GetItemInt_Fast_mapping(o, PyFrozenDict_Type.tp_as_mapping->mp_subscript, i);
+    #endif
+    } else
+    {
+        PyTypeObject *obj_type = Py_TYPE(o);
+        int seq_or_mapping = __Pyx_PyType_GetFlags(obj_type) & (Py_TPFLAGS_SEQUENCE|Py_TPFLAGS_MAPPING);
+        if (seq_or_mapping != Py_TPFLAGS_SEQUENCE) {
+            PyMappingMethods *mm = obj_type->tp_as_mapping;
+            if (mm && mm->mp_subscript)
+                return __Pyx_GetItemInt_Fast_mapping(o, mm->mp_subscript, i);
+        }
+        PySequenceMethods *sm = obj_type->tp_as_sequence;
+        if (likely(sm && sm->sq_item)) {
+            if (wraparound && (i < 0) && unlikely(__Pyx_GetItemInt_wraparound(o, sm, &i) == -1))
+                return NULL;
+            return sm->sq_item(o, i);
+        }
+        if (seq_or_mapping == Py_TPFLAGS_SEQUENCE) {
+            PyMappingMethods *mm = obj_type->tp_as_mapping;
+            if (likely(mm && mm->mp_subscript))
+                return __Pyx_GetItemInt_Fast_mapping(o, mm->mp_subscript, i);
+        }
+    }
+#else
+    if (!PyMapping_Check(o)) {
+        return PySequence_GetItem(o, i);
+    }
+#endif
+    (void)wraparound;
+    (void)boundscheck;
+    return __Pyx_GetItemInt_Generic_size(o, i);
+}
+
+/* AllocateExtensionType */
+static PyObject *__Pyx_AllocateExtensionType(PyTypeObject *t, int is_final) {
+    if (is_final || likely(!__Pyx_PyType_HasFeature(t, Py_TPFLAGS_IS_ABSTRACT))) {
+        allocfunc alloc_func = __Pyx_PyType_GetSlot(t, tp_alloc, allocfunc);
+        return alloc_func(t, 0);
+    } else {
+        newfunc tp_new = __Pyx_PyType_TryGetSlot(&PyBaseObject_Type, tp_new, newfunc);
+    #if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030A0000
+        if (!tp_new) {
+            PyObject *new_str = PyUnicode_FromString("__new__");
+            if (likely(new_str)) {
+                PyObject *o = PyObject_CallMethodObjArgs((PyObject *)&PyBaseObject_Type, new_str, t, NULL);
+                Py_DECREF(new_str);
+                return o;
+            } else
+                return NULL;
+        } else
+    #endif
+        return tp_new(t, __pyx_mstate_global->__pyx_empty_tuple, 0);
+    }
+}
+
+/* CallSlotAsVectorcallUnpackDict (used by CallSlotAsVectorcall) */
+static CYTHON_INLINE int __Pyx_CallSlotAsVectorcallUnpackDict(Py_ssize_t args_size, PyObject *keys_dict, PyObject **args, PyObject *kwnames) {
+    Py_ssize_t pos = 0, i = 0;
+    PyObject *key, *value;
+    while (PyDict_Next(keys_dict, &pos, &key, &value)) {
+        Py_INCREF(value);
+        args[args_size+i] = value;
+        Py_INCREF(key);
+        if (unlikely(__Pyx_PyTuple_SET_ITEM(kwnames, i, key) == -1)) {
+            return -1;
+        }
+        ++i;
+    }
+    return 0;
+}
+
+/* CallSlotAsVectorcall */
+#if CYTHON_VECTORCALL_TPNEW
+static PyObject * __Pyx_CallTpnewAsVectorcall(__Pyx_tpnewvectorcallfunc f, PyTypeObject* o, PyObject *a, PyObject *k) {
+    Py_ssize_t k_size = k ? __Pyx_PyDict_GET_SIZE(k) : 0;
+#if !CYTHON_ASSUME_SAFE_SIZE
+    if (unlikely(k_size < 0)) return NULL;
+#endif
+    Py_ssize_t a_size = __Pyx_PyTuple_GET_SIZE(a);
+#if !CYTHON_ASSUME_SAFE_SIZE
+    if (unlikely(a_size < 0)) return NULL;
+#endif
+#if CYTHON_ASSUME_SAFE_MACROS
+    if (k_size == 0) {
+        return f(o, &PyTuple_GET_ITEM(a, 0), a_size, NULL);
+    }
+#else
+    if (k_size == 0 && a_size == 0) {
+        return f(o, NULL, 0, NULL);
+    }
+#endif
+    PyObject *stack_args[5];
+    PyObject **args = stack_args;
+    Py_ssize_t maxnargs = PY_SSIZE_T_MAX / sizeof(PyObject*) - 1;
+    if (a_size > maxnargs - k_size) {
+        PyErr_NoMemory();
+        return NULL;
+    }
+    Py_ssize_t total_size = a_size + k_size;
+    if (total_size > 5) {
+        args = (PyObject**)PyMem_Malloc(((size_t)total_size)*sizeof(PyObject*));
+        if (unlikely(!args)) {
+            PyErr_NoMemory();
+            return NULL;
+        }
+    }
+    PyObject * result = NULL;
+    PyObject *kwnames = NULL;
+    int unpack_dict_result;
+    Py_ssize_t i = 0;
+    for (; i < a_size; ++i) {
+        args[i] = __Pyx_PyTuple_GET_ITEM(a, i);
+#if !CYTHON_ASSUME_SAFE_MACROS
+        if (unlikely(!args[i])) goto cleanup;
+#endif
+    }
+#if !CYTHON_ASSUME_SAFE_MACROS
+    if (k)  // There's a specific shortcut earlier for ASSUME_SAFE_MACROS with no keywords
+#endif
+    {
+        kwnames = PyTuple_New(k_size);
+        if (unlikely(!kwnames)) goto cleanup;
+        __Pyx_BEGIN_CRITICAL_SECTION(k);
+        unpack_dict_result = __Pyx_CallSlotAsVectorcallUnpackDict(a_size, k, args, kwnames);
+        __Pyx_END_CRITICAL_SECTION();
+        if (unlikely(unpack_dict_result == -1)) goto cleanup;
+    }
+    result = f(o, args, a_size, kwnames);
+  cleanup:
+    Py_XDECREF(kwnames);
+    for (i=a_size; i<total_size; ++i) {
+        Py_XDECREF(args[i]);
+    }
+    if (args != stack_args) {
+        PyMem_Free(args);
+    }
+    return result;
+}
+#endif
+
+/* RaiseErrorWithObjectType (used by CallNewInitFromVectorcall) */
+static void __Pyx_RaiseErrorWithType(PyObject* exc_type, const char* message, PyTypeObject *type_obj) {
+    __Pyx_TypeName type_name = __Pyx_PyType_GetFullyQualifiedName(type_obj);
+    #if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030d0000
+    if (unlikely(!type_name)) return;
+    #endif
+    PyErr_Format(exc_type, message, type_name);
+    __Pyx_DECREF_TypeName(type_name);
+}
+
+/* CallNewInitFromVectorcall */
+#if CYTHON_VECTORCALL_TPNEW
+static PyObject *__Pyx_CallNewInitFromVectorcall(PyTypeObject *t, PyObject *const *args, size_t nargsf, PyObject *kwnames) {
+    newfunc tp_new = __Pyx_PyType_GetSlot(t, tp_new, newfunc);
+    if (unlikely(!tp_new)) {
+        __Pyx_RaiseErrorWithType(PyExc_TypeError, "cannot create " __Pyx_FMT_TYPENAME " instances", t);
+        return NULL;
+    }
+    Py_ssize_t nargs = __Pyx_PyVectorcall_NARGS(nargsf);
+    PyObject *result = NULL, *args_tuple = NULL, *kwds_dict = NULL;
+    Py_ssize_t kw_size = kwnames ? __Pyx_PyTuple_GET_SIZE(kwnames) : 0;
+#if !CYTHON_ASSUME_SAFE_SIZE
+    if (unlikely(kw_size == -1)) {
+        return NULL;
+    }
+#endif
+    if (kw_size) {
+        kwds_dict = __Pyx_PyDict_NewPresized(kw_size);
+        if (unlikely(!kwds_dict)) {
+            return NULL;
+        }
+        for (Py_ssize_t i=0; i<kw_size; ++i) {
+            PyObject *v = args[nargs + i];
+            PyObject *k = __Pyx_PyTuple_GET_ITEM(kwnames, i);
+#if !CYTHON_ASSUME_SAFE_MACROS
+            if (unlikely(!k)) {
+                goto end;
+            }
+#endif
+            if (unlikely(PyDict_SetItem(kwds_dict, k, v) < 0)) {
+                goto end;
+            }
+        }
+    }
+    if (nargs) {
+        args_tuple = __Pyx_PyTuple_FromArray(args, nargs);
+        if (unlikely(!args_tuple)) {
+            goto end;
+        }
+    } else {
+        args_tuple = __Pyx_NewRef(__pyx_mstate_global->__pyx_empty_tuple);
+    }
+    result = tp_new(t, args_tuple, kwds_dict);
+    if (unlikely(!result)) {
+        goto end;
+    }
+    if (PyObject_TypeCheck(result, t)) {
+        initproc tp_init = __Pyx_PyObject_GetSlot(result, tp_init, initproc);
+        if (tp_init && unlikely(tp_init(result, args_tuple, kwds_dict) < 0)) {
+            Py_CLEAR(result);
+        }
+    }
+  end:
+    Py_XDECREF(args_tuple);
+    Py_XDECREF(kwds_dict);
+    return result;
+}
+#endif
+
+/* CallSlotAsVectorcall */
+#if CYTHON_VECTORCALL_TPNEW
+static int __Pyx_CallTpinitAsVectorcall(__Pyx_tpinitvectorcallfunc f, PyObject* o, PyObject *a, PyObject *k) {
+    Py_ssize_t k_size = k ? __Pyx_PyDict_GET_SIZE(k) : 0;
+#if !CYTHON_ASSUME_SAFE_SIZE
+    if (unlikely(k_size < 0)) return -1;
+#endif
+    Py_ssize_t a_size = __Pyx_PyTuple_GET_SIZE(a);
+#if !CYTHON_ASSUME_SAFE_SIZE
+    if (unlikely(a_size < 0)) return -1;
+#endif
+#if CYTHON_ASSUME_SAFE_MACROS
+    if (k_size == 0) {
+        return f(o, &PyTuple_GET_ITEM(a, 0), a_size, NULL);
+    }
+#else
+    if (k_size == 0 && a_size == 0) {
+        return f(o, NULL, 0, NULL);
+    }
+#endif
+    PyObject *stack_args[5];
+    PyObject **args = stack_args;
+    Py_ssize_t maxnargs = PY_SSIZE_T_MAX / sizeof(PyObject*) - 1;
+    if (a_size > maxnargs - k_size) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    Py_ssize_t total_size = a_size + k_size;
+    if (total_size > 5) {
+        args = (PyObject**)PyMem_Malloc(((size_t)total_size)*sizeof(PyObject*));
+        if (unlikely(!args)) {
+            PyErr_NoMemory();
+            return -1;
+        }
+    }
+    int result = -1;
+    PyObject *kwnames = NULL;
+    int unpack_dict_result;
+    Py_ssize_t i = 0;
+    for (; i < a_size; ++i) {
+        args[i] = __Pyx_PyTuple_GET_ITEM(a, i);
+#if !CYTHON_ASSUME_SAFE_MACROS
+        if (unlikely(!args[i])) goto cleanup;
+#endif
+    }
+#if !CYTHON_ASSUME_SAFE_MACROS
+    if (k)  // There's a specific shortcut earlier for ASSUME_SAFE_MACROS with no keywords
+#endif
+    {
+        kwnames = PyTuple_New(k_size);
+        if (unlikely(!kwnames)) goto cleanup;
+        __Pyx_BEGIN_CRITICAL_SECTION(k);
+        unpack_dict_result = __Pyx_CallSlotAsVectorcallUnpackDict(a_size, k, args, kwnames);
+        __Pyx_END_CRITICAL_SECTION();
+        if (unlikely(unpack_dict_result == -1)) goto cleanup;
+    }
+    result = f(o, args, a_size, kwnames);
+  cleanup:
+    Py_XDECREF(kwnames);
+    for (i=a_size; i<total_size; ++i) {
+        Py_XDECREF(args[i]);
+    }
+    if (args != stack_args) {
+        PyMem_Free(args);
+    }
+    return result;
+}
+#endif
+
+/* VoidPtrExport */
+static int __Pyx_ExportVoidPtr(PyObject *api_dict, const char *name, void *p, const char *sig) {
+    PyObject *cobj;
+    cobj = PyCapsule_New(p, sig, 0);
+    if (!cobj)
+        goto bad;
+    if (PyDict_SetItemString(api_dict, name, cobj) < 0)
+        goto bad;
+    Py_DECREF(cobj);
+    return 0;
+bad:
+    Py_XDECREF(cobj);
+    return -1;
+}
+
+/* GetApiDict */
+static PyObject *__Pyx_ApiExport_GetApiDict(void) {
+    PyObject *d;
+    if (__Pyx_PyDict_GetItemRef(__pyx_mstate_global->__pyx_d, __pyx_mstate_global->__pyx_n_u_pyx_capi, &d) == -1)
+        return NULL;
+    if (!d) {
+        d = PyDict_New();
+        if (!d)
+            goto bad;
+        if (PyObject_SetAttr(__pyx_m, __pyx_mstate_global->__pyx_n_u_pyx_capi, d) < 0)
+            goto bad;
+    }
+    return d;
+bad:
+    Py_XDECREF(d);
+    return NULL;
+}
+
+/* PyObjectCallMethod0 (used by PyType_Ready) */
+static CYTHON_INLINE PyObject* __Pyx_PyObject_CallMethod0(PyObject* obj, PyObject* method_name) {
+#if CYTHON_VECTORCALL && (__PYX_LIMITED_VERSION_HEX >= 0x030C0000 || !CYTHON_COMPILING_IN_LIMITED_API)
+    return PyObject_VectorcallMethod(method_name, &obj, 1 | PY_VECTORCALL_ARGUMENTS_OFFSET, NULL);
+#elif CYTHON_COMPILING_IN_LIMITED_API
+    return PyObject_CallMethodObjArgs(obj, method_name, NULL);
+#else
+    return PyObject_CallMethodNoArgs(obj, method_name);
+#endif
+}
+
+/* GetTypeDictOffset (used by ValidateBasesTuple) */
+#if !CYTHON_USE_TYPE_SLOTS
+CYTHON_UNUSED static Py_ssize_t __Pyx_GetTypeDictOffset(PyObject *tp, int require_cython_valid_result) {
+    PyObject *tp_dictoffset_o;
+    Py_ssize_t tp_dictoffset;
+    tp_dictoffset_o = PyObject_GetAttrString(tp, "__dictoffset__");
+    if (unlikely(!tp_dictoffset_o)) return -1;
+    tp_dictoffset = PyLong_AsSsize_t(tp_dictoffset_o);
+    Py_DECREF(tp_dictoffset_o);
+    if (unlikely(require_cython_valid_result && tp_dictoffset == 0)) {
+        PyErr_SetString(
+            PyExc_TypeError,
+            "'type' doesn't have a dictoffset");
+        return -1;
+    } else if (unlikely(require_cython_valid_result && tp_dictoffset < 0)) {
+        PyErr_SetString(
+            PyExc_TypeError,
+            "'type' has an unexpected negative dictoffset. "
+            "Please report this as Cython bug");
+        return -1;
+    }
+    return tp_dictoffset;
+}
+#endif
+
+/* ValidateBasesTuple (used by PyType_Ready) */
+#if CYTHON_COMPILING_IN_CPYTHON || CYTHON_COMPILING_IN_LIMITED_API || CYTHON_USE_TYPE_SPECS
+static int __Pyx_validate_bases_tuple(const char *type_name, int has_dictoffset, PyObject *bases) {
+    Py_ssize_t i, n;
+#if CYTHON_ASSUME_SAFE_SIZE
+    n = PyTuple_GET_SIZE(bases);
+#else
+    n = PyTuple_Size(bases);
+    if (unlikely(n < 0)) return -1;
+#endif
+    if (!has_dictoffset) {
+        PyObject *b;
+#if CYTHON_AVOID_BORROWED_REFS
+        b = PySequence_GetItem(bases, 0);
+        if (!b) return -1;
+#elif CYTHON_ASSUME_SAFE_MACROS
+        b = PyTuple_GET_ITEM(bases, 0);
+#else
+        b = PyTuple_GetItem(bases, 0);
+        if (!b) return -1;
+#endif
+#if CYTHON_USE_TYPE_SLOTS
+        has_dictoffset = ((PyTypeObject*)b)->tp_dictoffset != 0;
+#else
+        Py_ssize_t dictoffset = __Pyx_GetTypeDictOffset(b, 0);
+        has_dictoffset = dictoffset != 0;
+#endif
+#if CYTHON_AVOID_BORROWED_REFS
+        Py_DECREF(b);
+#endif
+#if !CYTHON_USE_TYPE_SLOTS
+        if (dictoffset == -1 && PyErr_Occurred()) return -1;
+#endif
+    }
+    for (i = 1; i < n; i++)
+    {
+        PyTypeObject *b;
+#if CYTHON_AVOID_BORROWED_REFS
+        PyObject *b0 = PySequence_GetItem(bases, i);
+        if (!b0) return -1;
+#elif CYTHON_ASSUME_SAFE_MACROS
+        PyObject *b0 = PyTuple_GET_ITEM(bases, i);
+#else
+        PyObject *b0 = PyTuple_GetItem(bases, i);
+        if (!b0) return -1;
+#endif
+        b = (PyTypeObject*) b0;
+        if (!__Pyx_PyType_HasFeature(b, Py_TPFLAGS_HEAPTYPE))
+        {
+            __Pyx_RaiseErrorWithType(
+                PyExc_TypeError, "base class '" __Pyx_FMT_TYPENAME "' is not a heap type", b);
+#if CYTHON_AVOID_BORROWED_REFS
+            Py_DECREF(b0);
+#endif
+            return -1;
+        }
+        if (!has_dictoffset)
+        {
+            Py_ssize_t b_dictoffset = 0;
+#if CYTHON_USE_TYPE_SLOTS
+            b_dictoffset = b->tp_dictoffset;
+#else
+            b_dictoffset = __Pyx_GetTypeDictOffset((PyObject*)b, 0);
+            if (b_dictoffset == -1 && PyErr_Occurred()) goto dictoffset_return;
+#endif
+            if (b_dictoffset) {
+                __Pyx_RaiseErrorWithType1(
+                    PyExc_TypeError,
+                    "extension type '%.200s' has no __dict__ slot, "
+                    "but base type '" __Pyx_FMT_TYPENAME "' has: "
+                    "either add 'cdef dict __dict__' to the extension type "
+                    "or add '__slots__ = [...]' to the base type",
+                    type_name, b);
+#if !CYTHON_USE_TYPE_SLOTS
+              dictoffset_return:
+#endif
+#if CYTHON_AVOID_BORROWED_REFS
+                Py_DECREF(b0);
+#endif
+                return -1;
+            }
+        }
+#if CYTHON_AVOID_BORROWED_REFS
+        Py_DECREF(b0);
+#endif
+    }
+    return 0;
+}
+#endif
+
+/* PyType_Ready */
+CYTHON_UNUSED static int __Pyx_PyType_HasMultipleInheritance(PyTypeObject *t) {
+    while (t) {
+        PyObject *bases = __Pyx_PyType_GetSlot(t, tp_bases, PyObject*);
+        if (bases) {
+            return 1;
+        }
+        t = __Pyx_PyType_GetSlot(t, tp_base, PyTypeObject*);
+    }
+    return 0;
+}
+static int __Pyx_PyType_Ready(PyTypeObject *t) {
+#if CYTHON_USE_TYPE_SPECS || !CYTHON_COMPILING_IN_CPYTHON
+    (void)__Pyx_PyObject_CallMethod0;
+#if CYTHON_USE_TYPE_SPECS
+    (void)__Pyx_validate_bases_tuple;
+#endif
+    return PyType_Ready(t);
+#else
+    int r;
+    if (!__Pyx_PyType_HasMultipleInheritance(t)) {
+        return PyType_Ready(t);
+    }
+    PyObject *bases = __Pyx_PyType_GetSlot(t, tp_bases, PyObject*);
+    if (bases && unlikely(__Pyx_validate_bases_tuple(t->tp_name, t->tp_dictoffset != 0, bases) == -1))
+        return -1;
+    {
+        int gc_was_enabled;
+    #if PY_VERSION_HEX >= 0x030A00b1
+        gc_was_enabled = PyGC_Disable();
+        (void)__Pyx_PyObject_CallMethod0;
+    #else
+        PyObject *ret, *py_status;
+        PyObject *gc = NULL;
+        #if (!CYTHON_COMPILING_IN_PYPY || PYPY_VERSION_NUM+0 >= 0x07030400) &&\
+                !CYTHON_COMPILING_IN_GRAAL
+        gc = PyImport_GetModule(__pyx_mstate_global->__pyx_kp_u_gc);
+        #endif
+        if (unlikely(!gc)) gc = PyImport_Import(__pyx_mstate_global->__pyx_kp_u_gc);
+        if (unlikely(!gc)) return -1;
+        py_status = __Pyx_PyObject_CallMethod0(gc, __pyx_mstate_global->__pyx_kp_u_isenabled);
+        if (unlikely(!py_status)) {
+            Py_DECREF(gc);
+            return -1;
+        }
+        gc_was_enabled = __Pyx_PyObject_IsTrue(py_status);
+        Py_DECREF(py_status);
+        if (gc_was_enabled > 0) {
+            ret = __Pyx_PyObject_CallMethod0(gc, __pyx_mstate_global->__pyx_kp_u_disable);
+            if (unlikely(!ret)) {
+                Py_DECREF(gc);
+                return -1;
+            }
+            Py_DECREF(ret);
+        } else if (unlikely(gc_was_enabled == -1)) {
+            Py_DECREF(gc);
+            return -1;
+        }
+    #endif
+        t->tp_flags |= Py_TPFLAGS_HEAPTYPE;
+#if PY_VERSION_HEX >= 0x030A0000
+        t->tp_flags |= Py_TPFLAGS_IMMUTABLETYPE;
+#endif
+        r = PyType_Ready(t);
+        t->tp_flags &= ~Py_TPFLAGS_HEAPTYPE;
+    #if PY_VERSION_HEX >= 0x030A00b1
+        if (gc_was_enabled)
+            PyGC_Enable();
+    #else
+        if (gc_was_enabled) {
+            PyObject *tp, *v, *tb;
+            PyErr_Fetch(&tp, &v, &tb);
+            ret = __Pyx_PyObject_CallMethod0(gc, __pyx_mstate_global->__pyx_kp_u_enable);
+            if (likely(ret || r == -1)) {
+                Py_XDECREF(ret);
+                PyErr_Restore(tp, v, tb);
+            } else {
+                Py_XDECREF(tp);
+                Py_XDECREF(v);
+                Py_XDECREF(tb);
+                r = -1;
+            }
+        }
+        Py_DECREF(gc);
+    #endif
+    }
+    return r;
+#endif
+}
+
+/* LimitedApiGetTypeTypeDict (used by DelItemOnTypeDict) */
+#if CYTHON_COMPILING_IN_LIMITED_API
+static PyObject *__Pyx_GetTypeTypeDict(PyTypeObject *tp) {
+    static Py_ssize_t tp_dictoffset = 0;
+    if (unlikely(tp_dictoffset == 0)) {
+        tp_dictoffset = __Pyx_GetTypeDictOffset((PyObject*)(&PyType_Type), 1);
+        if (unlikely(tp_dictoffset == -1 && PyErr_Occurred())) {
+            tp_dictoffset = 0; // try again next time?
+            return NULL;
+        }
+    }
+    return *(PyObject**)((char*)tp + tp_dictoffset);
+}
+#endif
+
+/* DelItemOnTypeDict (used by SetupReduce) */
+static int __Pyx__DelItemOnTypeDict(PyTypeObject *tp, PyObject *k) {
+    int result;
+    PyObject *tp_dict;
+#if CYTHON_COMPILING_IN_LIMITED_API
+    tp_dict = __Pyx_GetTypeTypeDict(tp);
+    if (unlikely(!tp_dict)) return -1;
+#else
+    tp_dict = tp->tp_dict;
+#endif
+    result = PyDict_DelItem(tp_dict, k);
+    if (likely(!result)) PyType_Modified(tp);
+    return result;
+}
+
+/* SetItemOnTypeDict (used by SetupReduce) */
+static int __Pyx__SetItemOnTypeDict(PyTypeObject *tp, PyObject *k, PyObject *v) {
+    int result;
+    PyObject *tp_dict;
+#if CYTHON_COMPILING_IN_LIMITED_API
+    tp_dict = __Pyx_GetTypeTypeDict(tp);
+    if (unlikely(!tp_dict)) return -1;
+#else
+    tp_dict = tp->tp_dict;
+#endif
+    result = PyDict_SetItem(tp_dict, k, v);
+    if (likely(!result)) {
+        PyType_Modified(tp);
+        if (unlikely(PyObject_HasAttr(v, __pyx_mstate_global->__pyx_n_u_set_name))) {
+            PyObject *setNameResult = PyObject_CallMethodObjArgs(v, __pyx_mstate_global->__pyx_n_u_set_name,  (PyObject *) tp, k, NULL);
+            if (!setNameResult) return -1;
+            Py_DECREF(setNameResult);
+        }
+    }
+    return result;
+}
+
+/* SetupReduce */
+static int __Pyx_setup_reduce_is_named(PyObject* meth, PyObject* name) {
+  int ret;
+  PyObject *name_attr;
+  name_attr = __Pyx_PyObject_GetAttrStrNoError(meth, __pyx_mstate_global->__pyx_n_u_name_2);
+  if (likely(name_attr)) {
+      ret = PyObject_RichCompareBool(name_attr, name, Py_EQ);
+  } else {
+      ret = -1;
+  }
+  if (unlikely(ret < 0) && __Pyx_IgnoreException(PyExc_Exception)) {
+      ret = 0;  // But BaseException is still propagated.
+  }
+  Py_XDECREF(name_attr);
+  return ret;
+}
+static PyObject *__Pyx_setup_reduce_get_reduce_attribute(PyObject *type_obj, PyObject *name, int allow_not_present) {
+#if CYTHON_USE_PYTYPE_LOOKUP
+    CYTHON_UNUSED_VAR(allow_not_present);
+    return _PyType_Lookup((PyTypeObject*)type_obj, name);
+#else
+    if (allow_not_present) {
+        return __Pyx_PyObject_GetAttrStrNoError(type_obj, name);
+    } else {
+        return __Pyx_PyObject_GetAttrStr(type_obj, name);
+    }
+#endif
+}
+static int __Pyx_setup_reduce(PyObject* type_obj) {
+    int ret = 0;
+    PyObject *object_reduce = NULL;
+    PyObject *object_getstate = NULL;
+    PyObject *object_reduce_ex = NULL;
+    PyObject *reduce = NULL;
+    PyObject *reduce_ex = NULL;
+    PyObject *reduce_cython = NULL;
+    PyObject *setstate = NULL;
+    PyObject *setstate_cython = NULL;
+    PyObject *getstate = NULL;
+    getstate = __Pyx_setup_reduce_get_reduce_attribute(type_obj, __pyx_mstate_global->__pyx_n_u_getstate, 1);
+    if (!getstate && PyErr_Occurred()) {
+        goto __PYX_BAD;
+    }
+    if (getstate) {
+        object_getstate = __Pyx_setup_reduce_get_reduce_attribute((PyObject*)&PyBaseObject_Type, __pyx_mstate_global->__pyx_n_u_getstate, 1);
+        if (!object_getstate && PyErr_Occurred()) {
+            goto __PYX_BAD;
+        }
+        if (object_getstate != getstate) {
+            goto __PYX_GOOD;
+        }
+    }
+    object_reduce_ex = __Pyx_setup_reduce_get_reduce_attribute((PyObject*)&PyBaseObject_Type, __pyx_mstate_global->__pyx_n_u_reduce_ex, 0);
+    if (unlikely(!object_reduce_ex)) goto __PYX_BAD;
+    reduce_ex = __Pyx_PyObject_GetAttrStr(type_obj, __pyx_mstate_global->__pyx_n_u_reduce_ex); if (unlikely(!reduce_ex)) goto __PYX_BAD;
+    if (reduce_ex == object_reduce_ex) {
+        object_reduce = __Pyx_setup_reduce_get_reduce_attribute((PyObject*)&PyBaseObject_Type, __pyx_mstate_global->__pyx_n_u_reduce, 0);
+        if (!object_reduce) goto __PYX_BAD;
+        reduce = __Pyx_PyObject_GetAttrStr(type_obj, __pyx_mstate_global->__pyx_n_u_reduce); if (unlikely(!reduce)) goto __PYX_BAD;
+        int try_to_replace_reduce = (reduce == object_reduce);
+        if (!try_to_replace_reduce) {
+            try_to_replace_reduce = __Pyx_setup_reduce_is_named(reduce, __pyx_mstate_global->__pyx_n_u_reduce_cython);
+            if (unlikely(try_to_replace_reduce < 0)) {
+                goto __PYX_BAD;
+            }
+        }
+        if (try_to_replace_reduce) {
+            reduce_cython = __Pyx_PyObject_GetAttrStrNoError(type_obj, __pyx_mstate_global->__pyx_n_u_reduce_cython);
+            if (likely(reduce_cython)) {
+                ret = __Pyx_SetItemOnTypeDict((PyTypeObject*)type_obj, __pyx_mstate_global->__pyx_n_u_reduce, reduce_cython); if (unlikely(ret < 0)) goto __PYX_BAD;
+                ret = __Pyx_DelItemOnTypeDict((PyTypeObject*)type_obj, __pyx_mstate_global->__pyx_n_u_reduce_cython); if (unlikely(ret < 0)) goto __PYX_BAD;
+            } else if (reduce == object_reduce || PyErr_Occurred()) {
+                goto __PYX_BAD;
+            }
+            setstate = __Pyx_PyObject_GetAttrStrNoError(type_obj, __pyx_mstate_global->__pyx_n_u_setstate);
+            int try_to_replace_setstate;
+            if (!setstate) {
+                PyObject *exc = PyErr_Occurred();
+                if (exc && !__Pyx_IgnoreGivenException(exc, PyExc_Exception)) {
+                    goto __PYX_BAD;
+                }
+                try_to_replace_setstate = 1;
+            } else {
+                try_to_replace_setstate = __Pyx_setup_reduce_is_named(setstate, __pyx_mstate_global->__pyx_n_u_setstate_cython);
+                if (unlikely(try_to_replace_setstate < 0)) {
+                    goto __PYX_BAD;
+                }
+            }
+            if (try_to_replace_setstate) {
+                setstate_cython = __Pyx_PyObject_GetAttrStrNoError(type_obj, __pyx_mstate_global->__pyx_n_u_setstate_cython);
+                if (likely(setstate_cython)) {
+                    ret = __Pyx_SetItemOnTypeDict((PyTypeObject*)type_obj, __pyx_mstate_global->__pyx_n_u_setstate, setstate_cython); if (unlikely(ret < 0)) goto __PYX_BAD;
+                    ret = __Pyx_DelItemOnTypeDict((PyTypeObject*)type_obj, __pyx_mstate_global->__pyx_n_u_setstate_cython); if (unlikely(ret < 0)) goto __PYX_BAD;
+                } else if (!setstate || PyErr_Occurred()) {
+                    goto __PYX_BAD;
+                }
+            }
+            PyType_Modified((PyTypeObject*)type_obj);
+        }
+    }
+    goto __PYX_GOOD;
+__PYX_BAD:
+    if (!PyErr_Occurred()) {
+        __Pyx_RaiseErrorWithType(
+            PyExc_RuntimeError,
+            "Unable to initialize pickling for " __Pyx_FMT_TYPENAME,
+            (PyTypeObject*)type_obj);
+    }
+    ret = -1;
+__PYX_GOOD:
+#if !CYTHON_USE_PYTYPE_LOOKUP
+    Py_XDECREF(object_reduce);
+    Py_XDECREF(object_reduce_ex);
+    Py_XDECREF(object_getstate);
+    Py_XDECREF(getstate);
+#endif
+    Py_XDECREF(reduce);
+    Py_XDECREF(reduce_ex);
+    Py_XDECREF(reduce_cython);
+    Py_XDECREF(setstate);
+    Py_XDECREF(setstate_cython);
+    return ret;
+}
+
+/* dict_setdefault (used by FetchCommonType) */
+static CYTHON_INLINE PyObject *__Pyx_PyDict_SetDefault(PyObject *d, PyObject *key, PyObject *default_value) {
+    PyObject* value;
+#if __PYX_LIMITED_VERSION_HEX >= 0x030F0000 || (!CYTHON_COMPILING_IN_LIMITED_API && PY_VERSION_HEX >= 0x030d00A4)
+    PyDict_SetDefaultRef(d, key, default_value, &value);
+#elif CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX >= 0x030C0000
+    PyObject *args[] = {d, key, default_value};
+    value = PyObject_VectorcallMethod(__pyx_mstate_global->__pyx_n_u_setdefault, args, 3 | PY_VECTORCALL_ARGUMENTS_OFFSET, NULL);
+#elif CYTHON_COMPILING_IN_LIMITED_API
+    value = PyObject_CallMethodObjArgs(d, __pyx_mstate_global->__pyx_n_u_setdefault, key, default_value, NULL);
+#else
+    value = PyDict_SetDefault(d, key, default_value);
+    if (unlikely(!value)) return NULL;
+    Py_INCREF(value);
+#endif
+    return value;
+}
+
+/* AddModuleRef (used by FetchSharedCythonModule) */
+#if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING && PY_VERSION_HEX < 0x030F00a3
+  static PyObject *__Pyx_PyImport_AddModuleObjectRef(PyObject *name) {
+      PyObject *module_dict = PyImport_GetModuleDict();
+      PyObject *m;
+      if (PyMapping_GetOptionalItem(module_dict, name, &m) < 0) {
+          return NULL;
+      }
+      if (m != NULL && PyModule_Check(m)) {
+          return m;
+      }
+      Py_XDECREF(m);
+      m = PyModule_NewObject(name);
+      if (m == NULL)
+          return NULL;
+      if (PyDict_CheckExact(module_dict)) {
+          PyObject *new_m;
+          (void)PyDict_SetDefaultRef(module_dict, name, m, &new_m);
+          Py_DECREF(m);
+          return new_m;
+      } else {
+           if (PyObject_SetItem(module_dict, name, m) != 0) {
+                Py_DECREF(m);
+                return NULL;
+            }
+            return m;
+      }
+  }
+  static PyObject *__Pyx_PyImport_AddModuleRef(const char *name) {
+      if ((PY_VERSION_HEX >= 0x030E0000) &&  Py_Version >= 0x030E0100) {
+          return PyImport_AddModuleRef(name);
+      }
+      PyObject *py_name = PyUnicode_FromString(name);
+      if (!py_name) return NULL;
+      PyObject *module = __Pyx_PyImport_AddModuleObjectRef(py_name);
+      Py_DECREF(py_name);
+      return module;
+  }
+#elif __PYX_LIMITED_VERSION_HEX < 0x030d0000
+  static PyObject *__Pyx_PyImport_AddModuleRef(const char *name) {
+      PyObject *module = PyImport_AddModule(name);
+      Py_XINCREF(module);
+      return module;
+  }
+#endif
+
+/* FetchSharedCythonModule (used by FetchCommonType) */
+static PyObject *__Pyx_FetchSharedCythonABIModule(void) {
+    return __Pyx_PyImport_AddModuleRef(__PYX_ABI_MODULE_NAME);
+}
+
+/* VerifyCachedType (used by FetchCommonType) */
+static int __Pyx_VerifyCachedType(PyObject *cached_type,
+                               const char *name,
+                               Py_ssize_t expected_basicsize) {
+    Py_ssize_t basicsize;
+    if (!PyType_Check(cached_type)) {
+        PyErr_Format(PyExc_TypeError,
+            "Shared Cython type %.200s is not a type object", name);
+        return -1;
+    }
+    if (expected_basicsize == 0) {
+        return 0; // size is inherited, nothing useful to check
+    }
+#if CYTHON_COMPILING_IN_LIMITED_API && CYTHON_OPAQUE_OBJECTS
+    if (expected_basicsize < 0) {
+        basicsize = PyType_GetTypeDataSize((PyTypeObject*)cached_type);
+    } else
+#endif
+    {
+    #if CYTHON_COMPILING_IN_LIMITED_API
+        PyObject *py_basicsize;
+        py_basicsize = PyObject_GetAttrString(cached_type, "__basicsize__");
+        if (unlikely(!py_basicsize)) return -1;
+        basicsize = PyLong_AsSsize_t(py_basicsize);
+        Py_DECREF(py_basicsize);
+        py_basicsize = NULL;
+        if (unlikely(basicsize == (Py_ssize_t)-1) && PyErr_Occurred()) return -1;
+    #else
+        basicsize = ((PyTypeObject*) cached_type)->tp_basicsize;
+    #endif
+    }
+    if ((expected_basicsize >= 0) ?
+            (basicsize != expected_basicsize) :
+            (basicsize < -expected_basicsize)) {
+        PyErr_Format(PyExc_TypeError,
+            "Shared Cython type %.200s has the wrong size, try recompiling",
+            name);
+        return -1;
+    }
+    return 0;
+}
+
+/* FetchCommonType (used by CommonTypesMetaclass) */
+#if __PYX_LIMITED_VERSION_HEX < 0x030C0000
+static PyObject* __Pyx_PyType_FromMetaclass(PyTypeObject *metaclass, PyObject *module, PyType_Spec *spec, PyObject *bases) {
+    PyObject *result = __Pyx_PyType_FromModuleAndSpec(module, spec, bases);
+    if (result && metaclass) {
+        PyObject *old_tp = (PyObject*)Py_TYPE(result);
+        Py_INCREF((PyObject*)metaclass);
+        Py_SET_TYPE(result, metaclass);
+        Py_DECREF(old_tp);
+        PyType_Modified((PyTypeObject*)result);
+    }
+    return result;
+}
+#else
+#define __Pyx_PyType_FromMetaclass(me, mo, s, b) PyType_FromMetaclass(me, mo, s, b)
+#endif
+static PyTypeObject *__Pyx_FetchCommonTypeFromSpec(PyTypeObject *metaclass, PyObject *module, PyType_Spec *spec, PyObject *bases) {
+    PyObject *abi_module = NULL, *cached_type = NULL, *abi_module_dict, *new_cached_type, *py_object_name;
+    int get_item_ref_result;
+    const char* object_name = strrchr(spec->name, '.');
+    object_name = object_name ? object_name+1 : spec->name;
+    py_object_name = PyUnicode_FromString(object_name);
+    if (!py_object_name) return NULL;
+    abi_module = __Pyx_FetchSharedCythonABIModule();
+    if (!abi_module) goto done;
+    abi_module_dict = PyModule_GetDict(abi_module);
+    if (!abi_module_dict) goto done;
+    get_item_ref_result = __Pyx_PyDict_GetItemRef(abi_module_dict, py_object_name, &cached_type);
+    if (get_item_ref_result == 1) {
+        if (__Pyx_VerifyCachedType(
+              cached_type,
+              object_name,
+              spec->basicsize) < 0) {
+            goto bad;
+        }
+        goto done;
+    } else if (unlikely(get_item_ref_result == -1)) {
+        goto bad;
+    }
+    cached_type = __Pyx_PyType_FromMetaclass(
+        metaclass,
+        CYTHON_USE_MODULE_STATE ? module : abi_module,
+        spec, bases);
+    if (unlikely(!cached_type)) goto bad;
+    new_cached_type = __Pyx_PyDict_SetDefault(abi_module_dict, py_object_name, cached_type);
+    if (unlikely(new_cached_type != cached_type)) {
+        if (unlikely(!new_cached_type)) goto bad;
+        Py_DECREF(cached_type);
+        cached_type = new_cached_type;
+        if (__Pyx_VerifyCachedType(
+                cached_type,
+                object_name,
+                spec->basicsize) < 0) {
+            goto bad;
+        }
+        goto done;
+    } else {
+        Py_DECREF(new_cached_type);
+    }
+done:
+    Py_XDECREF(abi_module);
+    Py_DECREF(py_object_name);
+    assert(cached_type == NULL || PyType_Check(cached_type));
+    return (PyTypeObject *) cached_type;
+bad:
+    Py_XDECREF(cached_type);
+    cached_type = NULL;
+    goto done;
+}
+
+/* CommonTypesMetaclass (used by CythonFunctionShared) */
+static PyObject* __pyx_CommonTypesMetaclass_get_module(CYTHON_UNUSED PyObject *self, CYTHON_UNUSED void* context) {
+    return PyUnicode_FromString(__PYX_ABI_MODULE_NAME);
+}
+#if __PYX_LIMITED_VERSION_HEX < 0x030A0000
+static PyObject* __pyx_CommonTypesMetaclass_call(CYTHON_UNUSED PyObject *self, CYTHON_UNUSED PyObject *args, CYTHON_UNUSED PyObject *kwds) {
+    PyErr_SetString(PyExc_TypeError, "Cannot instantiate Cython internal types");
+    return NULL;
+}
+static int __pyx_CommonTypesMetaclass_setattr(CYTHON_UNUSED PyObject *self, CYTHON_UNUSED PyObject *attr, CYTHON_UNUSED PyObject *value) {
+    PyErr_SetString(PyExc_TypeError, "Cython internal types are immutable");
+    return -1;
+}
+#endif
+static PyGetSetDef __pyx_CommonTypesMetaclass_getset[] = {
+    {"__module__", __pyx_CommonTypesMetaclass_get_module, NULL, NULL, NULL},
+    {0, 0, 0, 0, 0}
+};
+static PyType_Slot __pyx_CommonTypesMetaclass_slots[] = {
+    {Py_tp_getset, (void *)__pyx_CommonTypesMetaclass_getset},
+    #if __PYX_LIMITED_VERSION_HEX < 0x030A0000
+    {Py_tp_call, (void*)__pyx_CommonTypesMetaclass_call},
+    {Py_tp_new, (void*)__pyx_CommonTypesMetaclass_call},
+    {Py_tp_setattro, (void*)__pyx_CommonTypesMetaclass_setattr},
+    #endif
+    {0, 0}
+};
+static PyType_Spec __pyx_CommonTypesMetaclass_spec = {
+    __PYX_TYPE_MODULE_PREFIX "_common_types_metatype",
+    0,
+    0,
+    Py_TPFLAGS_IMMUTABLETYPE |
+    Py_TPFLAGS_DISALLOW_INSTANTIATION |
+    Py_TPFLAGS_DEFAULT,
+    __pyx_CommonTypesMetaclass_slots
+};
+static int __pyx_CommonTypesMetaclass_init(PyObject *module) {
+    __pyx_mstatetype *mstate = __Pyx_PyModule_GetState(module);
+    PyObject *bases = PyTuple_Pack(1, &PyType_Type);
+    if (unlikely(!bases)) {
+        return -1;
+    }
+    mstate->__pyx_CommonTypesMetaclassType = __Pyx_FetchCommonTypeFromSpec(NULL, module, &__pyx_CommonTypesMetaclass_spec, bases);
+    Py_DECREF(bases);
+    if (unlikely(mstate->__pyx_CommonTypesMetaclassType == NULL)) {
+        return -1;
+    }
+    return 0;
+}
+
+/* CythonFunctionPerModule (used by CythonFunctionShared) */
+#if CYTHON_COMPILING_IN_LIMITED_API
+static CYTHON_INLINE int __Pyx__IsSameCyOrCFunctionNoMethod(PyObject *func, void (*cfunc)(void)) {
+    if (__Pyx_CyFunction_Check(func)) {
+        return __Pyx_as_CyFunctionObject(func)->func_methoddef->ml_meth == (PyCFunction) cfunc;
+    } else if (PyCFunction_Check(func)) {
+        return PyCFunction_GetFunction(func) == (PyCFunction) cfunc;
+    }
+    return 0;
+}
+static CYTHON_INLINE int __Pyx__IsSameCyOrCFunction(PyObject *func, void (*cfunc)(void)) {
+    if ((PyObject*)Py_TYPE(func) == __pyx_mstate_global->__Pyx_CachedMethodType) {
+        int result;
+        PyObject *newFunc = PyObject_GetAttr(func, __pyx_mstate_global->__pyx_n_u_func);
+        if (unlikely(!newFunc)) {
+            PyErr_Clear(); // It's only an optimization, so don't throw an error
+            return 0;
+        }
+        result = __Pyx__IsSameCyOrCFunctionNoMethod(newFunc, cfunc);
+        Py_DECREF(newFunc);
+        return result;
+    }
+    return __Pyx__IsSameCyOrCFunctionNoMethod(func, cfunc);
+}
+#else
+static CYTHON_INLINE int __Pyx__IsSameCyOrCFunction(PyObject *func, void (*cfunc)(void)) {
+    if (PyMethod_Check(func)) {
+        func = PyMethod_GET_FUNCTION(func);
+    }
+    return __Pyx_CyOrPyCFunction_Check(func) && __Pyx_CyOrPyCFunction_GET_FUNCTION(func) == (PyCFunction) cfunc;
+}
+#endif
+static CYTHON_INLINE void __Pyx__CyFunction_SetClassObj(__pyx_CyFunctionObject* f, PyObject* classobj) {
+#if CYTHON_COMPILING_IN_LIMITED_API
+    __Pyx_Py_XDECREF_SET(
+        __Pyx__CyFunction_GetClassObj(f),
+            ((classobj) ? __Pyx_NewRef(classobj) : NULL));
+#else
+    __Pyx_Py_XDECREF_SET(
+        ((PyCMethodObject *) (f))->mm_class,
+        (PyTypeObject*)((classobj) ? __Pyx_NewRef(classobj) : NULL));
+#endif
+}
+static CYTHON_INLINE PyObject *__Pyx_CyFunction_InitDefaults(PyObject *func, PyTypeObject *defaults_type) {
+    __pyx_CyFunctionObject *m = __Pyx_as_CyFunctionObject(func);
+    m->defaults = PyObject_CallObject((PyObject*)defaults_type, NULL); // _PyObject_New(defaults_type);
+    if (unlikely(!m->defaults))
+        return NULL;
+    return m->defaults;
+}
+static CYTHON_INLINE void __Pyx_CyFunction_SetDefaultsTuple(PyObject *func, PyObject *tuple) {
+    __pyx_CyFunctionObject *m = __Pyx_as_CyFunctionObject(func);
+    m->defaults_tuple = tuple;
+    Py_INCREF(tuple);
+}
+static CYTHON_INLINE void __Pyx_CyFunction_SetDefaultsKwDict(PyObject *func, PyObject *dict) {
+    __pyx_CyFunctionObject *m = __Pyx_as_CyFunctionObject(func);
+    m->defaults_kwdict = dict;
+    Py_INCREF(dict);
+}
+static CYTHON_INLINE void __Pyx_CyFunction_SetAnnotationsDict(PyObject *func, PyObject *dict) {
+    __pyx_CyFunctionObject *m = __Pyx_as_CyFunctionObject(func);
+    m->func_annotations = dict;
+    Py_INCREF(dict);
+}
+
+/* CallTypeTraverse (used by CythonFunctionShared) */
+#if !CYTHON_USE_TYPE_SPECS
+#else
+static int __Pyx_call_type_traverse(PyObject *o, int always_call, visitproc visit, void *arg) {
+    if (!always_call) {
+        PyTypeObject *base = __Pyx_PyObject_GetSlot(o, tp_base, PyTypeObject*);
+        unsigned long flags = PyType_GetFlags(base);
+        if (flags & Py_TPFLAGS_HEAPTYPE) {
+            return 0;
+        }
+    }
+    Py_VISIT((PyObject*)Py_TYPE(o));
+    return 0;
+}
+#endif
+
+/* PyMethodNew (used by CythonFunctionShared) */
+#if CYTHON_COMPILING_IN_LIMITED_API
+static PyObject *__Pyx_PyMethod_New(PyObject *func, PyObject *self, PyObject *typ) {
+    PyObject *result;
+    CYTHON_UNUSED_VAR(typ);
+    if (!self)
+        return __Pyx_NewRef(func);
+    #if __PYX_LIMITED_VERSION_HEX >= 0x030C0000
+    {
+        PyObject *args[] = {func, self};
+        result = PyObject_Vectorcall(__pyx_mstate_global->__Pyx_CachedMethodType, args, 2, NULL);
+    }
+    #else
+    result = PyObject_CallFunctionObjArgs(__pyx_mstate_global->__Pyx_CachedMethodType, func, self, NULL);
+    #endif
+    return result;
+}
+#else
+static PyObject *__Pyx_PyMethod_New(PyObject *func, PyObject *self, PyObject *typ) {
+    CYTHON_UNUSED_VAR(typ);
+    if (!self)
+        return __Pyx_NewRef(func);
+    return PyMethod_New(func, self);
+}
+#endif
+
+/* PyVectorcallFastCallDict (used by CythonFunctionShared) */
+#if CYTHON_VECTORCALL
+static PyObject *__Pyx_PyVectorcall_FastCallDict_kw(PyObject *func, __pyx_vectorcallfunc vc, PyObject *const *args, size_t nargs, PyObject *kw)
+{
+    PyObject *res = NULL;
+    PyObject *kwnames;
+    PyObject **newargs;
+    PyObject **kwvalues;
+    Py_ssize_t i;
+    #if CYTHON_AVOID_BORROWED_REFS
+    PyObject *pos;
+    #else
+    Py_ssize_t pos;
+    #endif
+    size_t j;
+    PyObject *key, *value;
+    unsigned long keys_are_strings;
+    #if !CYTHON_ASSUME_SAFE_SIZE
+    Py_ssize_t nkw = PyDict_Size(kw);
+    if (unlikely(nkw == -1)) return NULL;
+    #else
+    Py_ssize_t nkw = PyDict_GET_SIZE(kw);
+    #endif
+    newargs = (PyObject **)PyMem_Malloc((nargs + (size_t)nkw) * sizeof(args[0]));
+    if (unlikely(newargs == NULL)) {
+        PyErr_NoMemory();
+        return NULL;
+    }
+    for (j = 0; j < nargs; j++) newargs[j] = args[j];
+    kwnames = PyTuple_New(nkw);
+    if (unlikely(kwnames == NULL)) {
+        PyMem_Free(newargs);
+        return NULL;
+    }
+    kwvalues = newargs + nargs;
+    pos = 0;
+    i = 0;
+    keys_are_strings = Py_TPFLAGS_UNICODE_SUBCLASS;
+    while (__Pyx_PyDict_NextRef(kw, &pos, &key, &value)) {
+        keys_are_strings &=
+        #if CYTHON_COMPILING_IN_LIMITED_API
+            PyType_GetFlags(Py_TYPE(key));
+        #else
+            Py_TYPE(key)->tp_flags;
+        #endif
+        #if !CYTHON_ASSUME_SAFE_MACROS
+        if (unlikely(PyTuple_SetItem(kwnames, i, key) < 0)) goto cleanup;
+        #else
+        PyTuple_SET_ITEM(kwnames, i, key);
+        #endif
+        kwvalues[i] = value;
+        i++;
+    }
+    if (unlikely(!keys_are_strings)) {
+        PyErr_SetString(PyExc_TypeError, "keywords must be strings");
+        goto cleanup;
+    }
+    res = vc(func, newargs, nargs, kwnames);
+cleanup:
+    #if CYTHON_AVOID_BORROWED_REFS
+    Py_DECREF(pos);
+    #endif
+    Py_DECREF(kwnames);
+    for (i = 0; i < nkw; i++)
+        Py_DECREF(kwvalues[i]);
+    PyMem_Free(newargs);
+    return res;
+}
+static CYTHON_INLINE PyObject *__Pyx_PyVectorcall_FastCallDict(PyObject *func, __pyx_vectorcallfunc vc, PyObject *const *args, size_t nargs, PyObject *kw)
+{
+    Py_ssize_t kw_size =
+        likely(kw == NULL) ?
+        0 :
+#if !CYTHON_ASSUME_SAFE_SIZE
+        PyDict_Size(kw);
+#else
+        PyDict_GET_SIZE(kw);
+#endif
+    if (kw_size == 0) {
+        return vc(func, args, nargs, NULL);
+    }
+#if !CYTHON_ASSUME_SAFE_SIZE
+    else if (unlikely(kw_size == -1)) {
+        return NULL;
+    }
+#endif
+    return __Pyx_PyVectorcall_FastCallDict_kw(func, vc, args, nargs, kw);
+}
+#endif
+
+/* CythonFunctionShared (used by CythonFunction) */
+static PyObject *
+__Pyx_CyFunction_get_doc_locked(__pyx_CyFunctionObject *op)
+{
+    if (unlikely(op->func_doc == NULL)) {
+#if CYTHON_COMPILING_IN_LIMITED_API
+        const char *doc = op->func_methoddef->ml_doc;
+#else
+        const char *doc = ((PyCFunctionObject*)op)->m_ml->ml_doc;
+#endif
+        if (doc) {
+            op->func_doc = PyUnicode_FromString(doc);
+            if (unlikely(op->func_doc == NULL))
+                return NULL;
+        } else {
+            Py_INCREF(Py_None);
+            return Py_None;
+        }
+    }
+    Py_INCREF(op->func_doc);
+    return op->func_doc;
+}
+static PyObject *
+__Pyx_CyFunction_get_doc(PyObject *op_in, void *closure) {
+    PyObject *result;
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    CYTHON_UNUSED_VAR(closure);
+    __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+    result = __Pyx_CyFunction_get_doc_locked(op);
+    __Pyx_END_CRITICAL_SECTION();
+    return result;
+}
+static int
+__Pyx_CyFunction_set_doc(PyObject *op_in, PyObject *value, void *context)
+{
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    CYTHON_UNUSED_VAR(context);
+    if (value == NULL) {
+        value = Py_None;
+    }
+    Py_INCREF(value);
+    __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+    __Pyx_Py_XDECREF_SET(op->func_doc, value);
+    __Pyx_END_CRITICAL_SECTION();
+    return 0;
+}
+static PyObject *
+__Pyx_CyFunction_get_name_locked(__pyx_CyFunctionObject *op)
+{
+    if (unlikely(op->func_name == NULL)) {
+#if CYTHON_COMPILING_IN_LIMITED_API
+        const char *name = op->func_methoddef->ml_name;
+#else
+        const char *name = ((PyCFunctionObject*)op)->m_ml->ml_name;
+#endif
+        op->func_name = PyUnicode_InternFromString(name);
+        if (unlikely(op->func_name == NULL))
+            return NULL;
+    }
+    Py_INCREF(op->func_name);
+    return op->func_name;
+}
+static PyObject *
+__Pyx_CyFunction_get_name(PyObject *op, void *context)
+{
+    PyObject *result = NULL;
+    CYTHON_UNUSED_VAR(context);
+    __Pyx_BEGIN_CRITICAL_SECTION(op);
+    result = __Pyx_CyFunction_get_name_locked(__Pyx_as_CyFunctionObject(op));
+    __Pyx_END_CRITICAL_SECTION();
+    return result;
+}
+static int
+__Pyx_CyFunction_set_name(PyObject *op_in, PyObject *value, void *context)
+{
+    CYTHON_UNUSED_VAR(context);
+    if (unlikely(value == NULL || !PyUnicode_Check(value))) {
+        PyErr_SetString(PyExc_TypeError,
+                        "__name__ must be set to a string object");
+        return -1;
+    }
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    Py_INCREF(value);
+    __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+    __Pyx_Py_XDECREF_SET(op->func_name, value);
+    __Pyx_END_CRITICAL_SECTION();
+    return 0;
+}
+static PyObject *
+__Pyx_CyFunction_get_qualname(PyObject *op_in, void *context)
+{
+    CYTHON_UNUSED_VAR(context);
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    PyObject *result;
+    __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+    Py_INCREF(op->func_qualname);
+    result = op->func_qualname;
+    __Pyx_END_CRITICAL_SECTION();
+    return result;
+}
+static int
+__Pyx_CyFunction_set_qualname(PyObject *op_in, PyObject *value, void *context)
+{
+    CYTHON_UNUSED_VAR(context);
+    if (unlikely(value == NULL || !PyUnicode_Check(value))) {
+        PyErr_SetString(PyExc_TypeError,
+                        "__qualname__ must be set to a string object");
+        return -1;
+    }
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    Py_INCREF(value);
+    __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+    __Pyx_Py_XDECREF_SET(op->func_qualname, value);
+    __Pyx_END_CRITICAL_SECTION();
+    return 0;
+}
+#if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030A0000
+static PyObject *
+__Pyx_CyFunction_get_dict(__pyx_CyFunctionObject *op, void *context)
+{
+    CYTHON_UNUSED_VAR(context);
+    if (unlikely(op->func_dict == NULL)) {
+        op->func_dict = PyDict_New();
+        if (unlikely(op->func_dict == NULL))
+            return NULL;
+    }
+    Py_INCREF(op->func_dict);
+    return op->func_dict;
+}
+#endif
+static PyObject *
+__Pyx_CyFunction_get_globals(PyObject *op_in, void *context)
+{
+    CYTHON_UNUSED_VAR(context);
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    Py_INCREF(op->func_globals);
+    return op->func_globals;
+}
+static PyObject *
+__Pyx_CyFunction_get_closure(PyObject *op, void *context)
+{
+    CYTHON_UNUSED_VAR(op);
+    CYTHON_UNUSED_VAR(context);
+    Py_INCREF(Py_None);
+    return Py_None;
+}
+static PyObject *
+__Pyx_CyFunction_get_code(PyObject *op_in, void *context)
+{
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    PyObject* result = (op->func_code) ? op->func_code : Py_None;
+    CYTHON_UNUSED_VAR(context);
+    Py_INCREF(result);
+    return result;
+}
+static int
+__Pyx_CyFunction_init_defaults(__pyx_CyFunctionObject *op, PyObject *op_obj) {
+    int result = 0;
+    PyObject *res = op->defaults_getter(op_obj);
+    if (unlikely(!res))
+        return -1;
+    #if CYTHON_ASSUME_SAFE_MACROS && !CYTHON_AVOID_BORROWED_REFS
+    op->defaults_tuple = PyTuple_GET_ITEM(res, 0);
+    Py_INCREF(op->defaults_tuple);
+    op->defaults_kwdict = PyTuple_GET_ITEM(res, 1);
+    Py_INCREF(op->defaults_kwdict);
+    #else
+    op->defaults_tuple = __Pyx_PySequence_ITEM(res, 0);
+    if (unlikely(!op->defaults_tuple)) result = -1;
+    else {
+        op->defaults_kwdict = __Pyx_PySequence_ITEM(res, 1);
+        if (unlikely(!op->defaults_kwdict)) result = -1;
+    }
+    #endif
+    Py_DECREF(res);
+    return result;
+}
+static int
+__Pyx_CyFunction_set_defaults(PyObject *op_in, PyObject* value, void *context) {
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    CYTHON_UNUSED_VAR(context);
+    if (!value) {
+        value = Py_None;
+    } else if (unlikely(value != Py_None && !PyTuple_Check(value))) {
+        PyErr_SetString(PyExc_TypeError,
+                        "__defaults__ must be set to a tuple object");
+        return -1;
+    }
+    PyErr_WarnEx(PyExc_RuntimeWarning, "changes to cyfunction.__defaults__ will not "
+                 "currently affect the values used in function calls", 1);
+    Py_INCREF(value);
+    __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+    __Pyx_Py_XDECREF_SET(op->defaults_tuple, value);
+    __Pyx_END_CRITICAL_SECTION();
+    return 0;
+}
+static PyObject *
+__Pyx_CyFunction_get_defaults_locked(PyObject *op_in) {
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    PyObject* result = op->defaults_tuple;
+    if (unlikely(!result)) {
+        if (op->defaults_getter) {
+            if (unlikely(__Pyx_CyFunction_init_defaults(op, op_in) < 0)) return NULL;
+            result = op->defaults_tuple;
+        } else {
+            result = Py_None;
+        }
+    }
+    Py_INCREF(result);
+    return result;
+}
+static PyObject *
+__Pyx_CyFunction_get_defaults(PyObject *op, void *context) {
+    PyObject* result = NULL;
+    CYTHON_UNUSED_VAR(context);
+    __Pyx_BEGIN_CRITICAL_SECTION(op);
+    result = __Pyx_CyFunction_get_defaults_locked(op);
+    __Pyx_END_CRITICAL_SECTION();
+    return result;
+}
+static int
+__Pyx_CyFunction_set_kwdefaults(PyObject *op_in, PyObject* value, void *context) {
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    CYTHON_UNUSED_VAR(context);
+    if (!value) {
+        value = Py_None;
+    } else if (unlikely(value != Py_None && !PyDict_Check(value))) {
+        PyErr_SetString(PyExc_TypeError,
+                        "__kwdefaults__ must be set to a dict object");
+        return -1;
+    }
+    PyErr_WarnEx(PyExc_RuntimeWarning, "changes to cyfunction.__kwdefaults__ will not "
+                 "currently affect the values used in function calls", 1);
+    Py_INCREF(value);
+    __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+    __Pyx_Py_XDECREF_SET(op->defaults_kwdict, value);
+    __Pyx_END_CRITICAL_SECTION();
+    return 0;
+}
+static PyObject *
+__Pyx_CyFunction_get_kwdefaults_locked(PyObject *op_in) {
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    PyObject* result = op->defaults_kwdict;
+    if (unlikely(!result)) {
+        if (op->defaults_getter) {
+            if (unlikely(__Pyx_CyFunction_init_defaults(op, op_in) < 0)) return NULL;
+            result = op->defaults_kwdict;
+        } else {
+            result = Py_None;
+        }
+    }
+    Py_INCREF(result);
+    return result;
+}
+static PyObject *
+__Pyx_CyFunction_get_kwdefaults(PyObject *op, void *context) {
+    PyObject* result;
+    CYTHON_UNUSED_VAR(context);
+    __Pyx_BEGIN_CRITICAL_SECTION(op);
+    result = __Pyx_CyFunction_get_kwdefaults_locked(op);
+    __Pyx_END_CRITICAL_SECTION();
+    return result;
+}
+static int __Pyx_CyFunction_set_annotate_in_dict_if_exists(PyObject *op_in, PyObject *value);
+static int
+__Pyx_CyFunction_set_annotations(PyObject *op_in, PyObject* value, void *context) {
+    CYTHON_UNUSED_VAR(context);
+    if (!value || value == Py_None) {
+        value = NULL;
+    } else if (unlikely(!PyDict_Check(value))) {
+        PyErr_SetString(PyExc_TypeError,
+                        "__annotations__ must be set to a dict object");
+        return -1;
+    }
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    Py_XINCREF(value);
+    __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+    __Pyx_Py_XDECREF_SET(op->func_annotations, value);
+    __Pyx_END_CRITICAL_SECTION();
+    if (unlikely(__Pyx_CyFunction_set_annotate_in_dict_if_exists(op_in, Py_None) < 0)) return -1;
+    return 0;
+}
+static int
+__Pyx_CyFunction_get_dict_if_exists(PyObject *op_in, PyObject **dict) {
+    /* Return 1 if the function dict exists, 0 otherwise.  This cannot fail:
+     * _PyObject_GetDictPtr() may clear errors internally, but never reports them. */
+#if CYTHON_COMPILING_IN_PYPY
+    *dict = PyObject_GenericGetDict(op_in, NULL);
+#elif CYTHON_COMPILING_IN_LIMITED_API || PY_VERSION_HEX < 0x030C0000
+    *dict = __Pyx_as_CyFunctionObject(op_in)->func_dict;
+#else
+    PyObject **dictptr = _PyObject_GetDictPtr(op_in);
+    *dict = likely(dictptr) ? *dictptr : NULL;
+#endif
+    return *dict ? 1 : 0;
+}
+static int
+__Pyx_CyFunction_get_annotate_from_dict_if_exists(PyObject *op_in, PyObject **annotate) {
+    PyObject *dict;
+    int dict_found;
+    *annotate = NULL;
+    dict_found = __Pyx_CyFunction_get_dict_if_exists(op_in, &dict);
+    if (!dict_found) return 0;
+    return __Pyx_PyDict_GetItemRef(dict, __pyx_mstate_global->__pyx_n_u_annotate, annotate);
+}
+static int
+__Pyx_CyFunction_set_annotate_in_dict_if_exists(PyObject *op_in, PyObject *value) {
+    PyObject *dict;
+    int dict_found;
+    dict_found = __Pyx_CyFunction_get_dict_if_exists(op_in, &dict);
+    if (!dict_found) return 0;
+    if (value) {
+        return PyDict_SetItem(dict, __pyx_mstate_global->__pyx_n_u_annotate, value);
+    } else {
+#if !CYTHON_COMPILING_IN_LIMITED_API && PY_VERSION_HEX >= 0x030d0000
+        return PyDict_Pop(dict, __pyx_mstate_global->__pyx_n_u_annotate, NULL);
+#else
+        int result = PyDict_Contains(dict, __pyx_mstate_global->__pyx_n_u_annotate);
+        if (result == 1) {
+            result = PyDict_DelItem(dict, __pyx_mstate_global->__pyx_n_u_annotate);
+        }
+        return result;
+#endif
+    }
+}
+static int
+__Pyx_CyFunction_set_annotate_in_dict(PyObject *op_in, PyObject *value) {
+    PyObject *dict;
+    int result;
+#if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030A0000
+    dict = __Pyx_CyFunction_get_dict(__Pyx_as_CyFunctionObject(op_in), NULL);
+#else
+    dict = PyObject_GenericGetDict(op_in, NULL);
+#endif
+    if (unlikely(!dict)) return -1;
+    result = PyDict_SetItem(dict, __pyx_mstate_global->__pyx_n_u_annotate, value);
+    Py_DECREF(dict);
+    return result;
+}
+static PyObject *
+__Pyx_CyFunction_get_annotations_locked(__pyx_CyFunctionObject *op) {
+    PyObject* result = op->func_annotations;
+    if (unlikely(!result)) {
+        result = PyDict_New();
+        if (unlikely(!result)) return NULL;
+        op->func_annotations = result;
+    }
+    Py_INCREF(result);
+    return result;
+}
+static PyObject *
+__Pyx_CyFunction_get_annotations(PyObject *op_in, void *context) {
+    PyObject *annotate = NULL;
+    PyObject *result = NULL;
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    CYTHON_UNUSED_VAR(context);
+    __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+    result = __Pyx_XNewRef(op->func_annotations);
+    __Pyx_END_CRITICAL_SECTION();
+    if (result) return result;
+    if (unlikely(__Pyx_CyFunction_get_annotate_from_dict_if_exists(op_in, &annotate) < 0)) return NULL;
+    if (!annotate || annotate == Py_None) {
+        Py_XDECREF(annotate);
+        __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+        result = __Pyx_CyFunction_get_annotations_locked(op);
+        __Pyx_END_CRITICAL_SECTION();
+        return result;
+    }
+    PyObject *format = PyLong_FromLong(1L);  // annotationlib.Format.VALUE
+    if (likely(format)) {
+        if (!Py_EnterRecursiveCall(" cyfunction __annotations__.__get__")) {
+            result = __Pyx_PyObject_CallOneArg(annotate, format);
+            Py_LeaveRecursiveCall();
+            Py_DECREF(format);
+        }
+    }
+    Py_DECREF(annotate);
+    if (unlikely(!result)) return NULL;
+    if (unlikely(!PyDict_Check(result))) {
+        PyErr_SetString(PyExc_TypeError, "__annotate__ must return a dict");
+        Py_DECREF(result);
+        return NULL;
+    }
+    __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+    __Pyx_Py_XDECREF_SET(op->func_annotations, __Pyx_NewRef(result));
+    __Pyx_END_CRITICAL_SECTION();
+    return result;
+}
+static PyObject *__Pyx_CyFunction_annotate_impl(PyObject *self, PyObject *arg) {
+    CYTHON_UNUSED_VAR(arg);
+    if (unlikely(!self)) {
+        PyErr_SetString(PyExc_SystemError, "cython __annotate__ called without 'self' argument");
+        return NULL;
+    }
+    PyObject *result;
+    if (Py_EnterRecursiveCall(" in cyfunction annotate")) {
+        return NULL;
+    }
+    result = __Pyx_CyFunction_get_annotations(self, NULL);
+    Py_LeaveRecursiveCall();
+    return result;
+}
+static PyObject *
+__Pyx_CyFunction_get_annotate(PyObject *op_in, void *context);
+static int
+__Pyx_CyFunction_set_annotate(PyObject *op_in, PyObject* value, void *context) {
+    CYTHON_UNUSED_VAR(context);
+    if (value == NULL) {
+        PyErr_SetString(PyExc_TypeError, "__annotate__ cannot be deleted");
+        return -1;
+    }
+    if (unlikely(value != Py_None && !PyCallable_Check(value))) {
+        PyErr_SetString(PyExc_TypeError, "__annotate__ must be callable or None");
+        return -1;
+    }
+    if (unlikely(__Pyx_TypeCheck(value, &PyCFunction_Type))) {
+#if !CYTHON_ASSUME_SAFE_MACROS && !CYTHON_COMPILING_IN_PYPY
+        PyCFunction cfunction = PyCFunction_GetFunction(value);
+        if (unlikely(!cfunction)) return -1;
+        PyObject *value_self = PyCFunction_GetSelf(value);
+        if (unlikely(!value_self && PyErr_Occurred())) return -1;
+#else
+        PyCFunction cfunction = PyCFunction_GET_FUNCTION(value);
+        PyObject *value_self = PyCFunction_GET_SELF(value);
+#endif
+        if (cfunction == __Pyx_CyFunction_annotate_impl && value_self == op_in) {
+            return __Pyx_CyFunction_set_annotate_in_dict_if_exists(op_in, NULL);
+        }
+    }
+    if (value != Py_None) {
+        __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+        __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+        Py_CLEAR(op->func_annotations);
+        __Pyx_END_CRITICAL_SECTION();
+    }
+    return __Pyx_CyFunction_set_annotate_in_dict(op_in, value);
+}
+#if __PYX_LIMITED_VERSION_HEX < 0x030B0000
+static PyObject *
+__Pyx_CyFunction_get_is_coroutine_value(__pyx_CyFunctionObject *op) {
+    int is_coroutine = op->flags & __Pyx_CYFUNCTION_COROUTINE;
+    if (is_coroutine) {
+        PyObject *is_coroutine_value, *module, *fromlist, *marker = __pyx_mstate_global->__pyx_n_u_is_coroutine;
+        fromlist = PyList_New(1);
+        if (unlikely(!fromlist)) return NULL;
+        Py_INCREF(marker);
+#if CYTHON_ASSUME_SAFE_MACROS
+        PyList_SET_ITEM(fromlist, 0, marker);
+#else
+        if (unlikely(PyList_SetItem(fromlist, 0, marker) < 0)) {
+            Py_DECREF(fromlist);
+            return NULL;
+        }
+#endif
+        module = PyImport_ImportModuleLevelObject(__pyx_mstate_global->__pyx_n_u_asyncio_coroutines, NULL, NULL, fromlist, 0);
+        Py_DECREF(fromlist);
+        if (unlikely(!module)) {
+            goto ignore_or_error;
+        }
+        is_coroutine_value = __Pyx_PyObject_GetAttrStr(module, marker);
+        Py_DECREF(module);
+        if (likely(is_coroutine_value)) {
+            return is_coroutine_value;
+        }
+ignore_or_error:
+        if (!__Pyx_IgnoreException(PyExc_Exception)) {
+            return NULL;
+        }
+    }
+    return __Pyx_PyBool_FromLong(is_coroutine);
+}
+static PyObject *
+__Pyx_CyFunction_get_is_coroutine(PyObject *op_in, void *context) {
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    PyObject *result;
+    CYTHON_UNUSED_VAR(context);
+    if (op->func_is_coroutine) {
+        return __Pyx_NewRef(op->func_is_coroutine);
+    }
+    result = __Pyx_CyFunction_get_is_coroutine_value(op);
+    if (unlikely(!result))
+        return NULL;
+    __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+    if (op->func_is_coroutine) {
+        Py_DECREF(result);
+        result = __Pyx_NewRef(op->func_is_coroutine);
+    } else {
+        op->func_is_coroutine = __Pyx_NewRef(result);
+    }
+    __Pyx_END_CRITICAL_SECTION();
+    return result;
+}
+#endif
+static void __Pyx_CyFunction_raise_argument_count_error(PyObject *func, const char* message, Py_ssize_t size) {
+#if CYTHON_COMPILING_IN_LIMITED_API
+    PyObject *py_name = __Pyx_CyFunction_get_name(func, NULL);
+    if (!py_name) return;
+    PyErr_Format(PyExc_TypeError,
+        "%.200S() %s (%" CYTHON_FORMAT_SSIZE_T "d given)",
+        py_name, message, size);
+    Py_DECREF(py_name);
+#else
+    const char* name = ((PyCFunctionObject*)func)->m_ml->ml_name;
+    PyErr_Format(PyExc_TypeError,
+        "%.200s() %s (%" CYTHON_FORMAT_SSIZE_T "d given)",
+        name, message, size);
+#endif
+}
+static void __Pyx_CyFunction_raise_type_error(PyObject *func, const char* message) {
+#if CYTHON_COMPILING_IN_LIMITED_API
+    PyObject *py_name = __Pyx_CyFunction_get_name(func, NULL);
+    if (!py_name) return;
+    PyErr_Format(PyExc_TypeError,
+        "%.200S() %s",
+        py_name, message);
+    Py_DECREF(py_name);
+#else
+    const char* name = ((PyCFunctionObject*)func)->m_ml->ml_name;
+    PyErr_Format(PyExc_TypeError,
+        "%.200s() %s",
+        name, message);
+#endif
+}
+#if CYTHON_COMPILING_IN_LIMITED_API
+static PyObject *
+__Pyx_CyFunction_get_module(PyObject *op_in, void *context) {
+    CYTHON_UNUSED_VAR(context);
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    Py_INCREF(op->func_module);
+    return op->func_module;
+}
+static int
+__Pyx_CyFunction_set_module(PyObject *op_in, PyObject* value, void *context) {
+    CYTHON_UNUSED_VAR(context);
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    if (value == NULL) {
+        value = Py_None;
+    }
+    Py_INCREF(value);
+    PyObject *old = op->func_module;
+    op->func_module = value;
+    Py_DECREF(old);
+    return 0;
+}
+#endif
+static PyGetSetDef __pyx_CyFunction_getsets[] = {
+    {"func_doc", (getter)__Pyx_CyFunction_get_doc, (setter)__Pyx_CyFunction_set_doc, 0, 0},
+    {"__doc__",  (getter)__Pyx_CyFunction_get_doc, (setter)__Pyx_CyFunction_set_doc, 0, 0},
+    {"func_name", (getter)__Pyx_CyFunction_get_name, (setter)__Pyx_CyFunction_set_name, 0, 0},
+    {"__name__", (getter)__Pyx_CyFunction_get_name, (setter)__Pyx_CyFunction_set_name, 0, 0},
+    {"__qualname__", (getter)__Pyx_CyFunction_get_qualname, (setter)__Pyx_CyFunction_set_qualname, 0, 0},
+#if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030A0000
+    {"func_dict", (getter)__Pyx_CyFunction_get_dict, (setter)PyObject_GenericSetDict, 0, 0},
+    {"__dict__", (getter)__Pyx_CyFunction_get_dict, (setter)PyObject_GenericSetDict, 0, 0},
+#else
+    {"func_dict", (getter)PyObject_GenericGetDict, (setter)PyObject_GenericSetDict, 0, 0},
+    {"__dict__", (getter)PyObject_GenericGetDict, (setter)PyObject_GenericSetDict, 0, 0},
+#endif
+    {"func_globals", (getter)__Pyx_CyFunction_get_globals, 0, 0, 0},
+    {"__globals__", (getter)__Pyx_CyFunction_get_globals, 0, 0, 0},
+    {"func_closure", (getter)__Pyx_CyFunction_get_closure, 0, 0, 0},
+    {"__closure__", (getter)__Pyx_CyFunction_get_closure, 0, 0, 0},
+    {"func_code", (getter)__Pyx_CyFunction_get_code, 0, 0, 0},
+    {"__code__", (getter)__Pyx_CyFunction_get_code, 0, 0, 0},
+    {"func_defaults", (getter)__Pyx_CyFunction_get_defaults, (setter)__Pyx_CyFunction_set_defaults, 0, 0},
+    {"__defaults__", (getter)__Pyx_CyFunction_get_defaults, (setter)__Pyx_CyFunction_set_defaults, 0, 0},
+    {"__kwdefaults__", (getter)__Pyx_CyFunction_get_kwdefaults, (setter)__Pyx_CyFunction_set_kwdefaults, 0, 0},
+    {"__annotations__", (getter)__Pyx_CyFunction_get_annotations, (setter)__Pyx_CyFunction_set_annotations, 0, 0},
+    {"__annotate__", (getter)__Pyx_CyFunction_get_annotate, (setter)__Pyx_CyFunction_set_annotate, 0, 0},
+#if __PYX_LIMITED_VERSION_HEX < 0x030B0000
+    {"_is_coroutine", (getter)__Pyx_CyFunction_get_is_coroutine, 0, 0, 0},
+#endif
+#if CYTHON_COMPILING_IN_LIMITED_API
+    {"__module__", (getter)__Pyx_CyFunction_get_module, (setter)__Pyx_CyFunction_set_module, 0, 0},
+#endif
+    {0, 0, 0, 0, 0}
+};
+static PyMemberDef __pyx_CyFunction_members[] = {
+#if !CYTHON_COMPILING_IN_LIMITED_API
+    {"__module__", T_OBJECT, offsetof(PyCFunctionObject, m_module), 0, 0},
+#endif
+#if PY_VERSION_HEX < 0x030C0000 || CYTHON_COMPILING_IN_LIMITED_API
+    {"__dictoffset__", T_PYSSIZET, offsetof(__pyx_CyFunctionObject, func_dict),
+        __PYX_SHARED_RELATIVE_OFFSET | READONLY, 0},
+#endif
+#if CYTHON_VECTORCALL
+#if CYTHON_COMPILING_IN_LIMITED_API || CYTHON_COMPILING_IN_PYPY
+    {"__vectorcalloffset__", T_PYSSIZET, offsetof(__pyx_CyFunctionObject, func_vectorcall),
+        __PYX_SHARED_RELATIVE_OFFSET | READONLY, 0},
+#else
+    {"__vectorcalloffset__", T_PYSSIZET, offsetof(PyCFunctionObject, vectorcall), READONLY, 0},
+#endif
+#if CYTHON_COMPILING_IN_LIMITED_API
+    {"__weaklistoffset__", T_PYSSIZET, offsetof(__pyx_CyFunctionObject, func_weakreflist),
+        __PYX_SHARED_RELATIVE_OFFSET | READONLY, 0},
+#else
+    {"__weaklistoffset__", T_PYSSIZET, offsetof(PyCFunctionObject, m_weakreflist), READONLY, 0},
+#endif
+#endif
+    {0, 0, 0,  0, 0}
+};
+static PyObject *
+__Pyx_CyFunction_reduce(PyObject *m_in, PyObject *args)
+{
+    PyObject *result = NULL;
+    __pyx_CyFunctionObject *m = __Pyx_as_CyFunctionObject(m_in);
+    CYTHON_UNUSED_VAR(args);
+    __Pyx_BEGIN_CRITICAL_SECTION(m_in);
+    Py_INCREF(m->func_qualname);
+    result = m->func_qualname;
+    __Pyx_END_CRITICAL_SECTION();
+    return result;
+}
+static PyMethodDef __pyx_CyFunction_methods[] = {
+    {"__annotate_cython__", __Pyx_CyFunction_annotate_impl, METH_O,
+        "Placeholder __annotate__ function to allow 'functools.wraps' to work "
+        "on Cython functions."},
+    {"__reduce__", (PyCFunction)__Pyx_CyFunction_reduce, METH_NOARGS, 0},
+    {0, 0, 0, 0}
+};
+static PyObject *
+__Pyx_CyFunction_get_annotate(PyObject *op_in, void *context) {
+    PyObject *annotate = NULL;
+    CYTHON_UNUSED_VAR(context);
+    if (unlikely(__Pyx_CyFunction_get_annotate_from_dict_if_exists(op_in, &annotate) < 0)) return NULL;
+    if (annotate) return annotate;
+    PyObject *method = PyCFunction_New(
+        &__pyx_CyFunction_methods[0],
+        op_in);
+    return method;
+}
+#if CYTHON_COMPILING_IN_LIMITED_API
+#define __Pyx_CyFunction_weakreflist(cyfunc) ((cyfunc)->func_weakreflist)
+#else
+#define __Pyx_CyFunction_weakreflist(cyfunc) (((PyCFunctionObject*)cyfunc)->m_weakreflist)
+#endif
+static PyObject *__Pyx_CyFunction_Init(PyObject *op_in,
+                                       PyMethodDef *ml, int flags, PyObject* qualname,
+                                       PyObject *closure, PyObject *module, PyObject* globals, PyObject* code) {
+    __pyx_CyFunctionObject* op = __Pyx_as_CyFunctionObject(op_in);
+#if !CYTHON_COMPILING_IN_LIMITED_API
+    PyCFunctionObject *cf = (PyCFunctionObject*) op;
+#endif
+    if (unlikely(op == NULL))
+        return NULL;
+#if CYTHON_COMPILING_IN_LIMITED_API
+    op->func_methoddef = ml;
+    Py_INCREF(module);
+    op->func_module = module;
+#endif
+    op->flags = flags;
+    __Pyx_CyFunction_weakreflist(op) = NULL;
+#if !CYTHON_COMPILING_IN_LIMITED_API
+    cf->m_ml = ml;
+    cf->m_self = (PyObject *) op;
+#endif
+    Py_XINCREF(closure);
+    op->func_closure = closure;
+#if !CYTHON_COMPILING_IN_LIMITED_API
+    Py_XINCREF(module);
+    cf->m_module = module;
+#endif
+#if PY_VERSION_HEX < 0x030C0000 || CYTHON_COMPILING_IN_LIMITED_API
+    op->func_dict = NULL;
+#endif
+    op->func_name = NULL;
+    Py_INCREF(qualname);
+    op->func_qualname = qualname;
+    op->func_doc = NULL;
+#if CYTHON_COMPILING_IN_LIMITED_API
+    op->func_classobj = NULL;
+#else
+    ((PyCMethodObject*)op)->mm_class = NULL;
+#endif
+    op->func_globals = globals;
+    Py_INCREF(op->func_globals);
+    Py_XINCREF(code);
+    op->func_code = code;
+    op->defaults = NULL;
+    op->defaults_tuple = NULL;
+    op->defaults_kwdict = NULL;
+    op->defaults_getter = NULL;
+    op->func_annotations = NULL;
+#if __PYX_LIMITED_VERSION_HEX < 0x030B0000
+    op->func_is_coroutine = NULL;
+#endif
+#if CYTHON_VECTORCALL
+    switch (ml->ml_flags & (METH_VARARGS | METH_FASTCALL | METH_NOARGS | METH_O | METH_KEYWORDS | METH_METHOD)) {
+    case METH_NOARGS:
+        __Pyx_CyFunction_func_vectorcall(op) = __Pyx_CyFunction_Vectorcall_NOARGS;
+        break;
+    case METH_O:
+        __Pyx_CyFunction_func_vectorcall(op) = __Pyx_CyFunction_Vectorcall_O;
+        break;
+    case METH_METHOD | METH_FASTCALL | METH_KEYWORDS:
+        __Pyx_CyFunction_func_vectorcall(op) = __Pyx_CyFunction_Vectorcall_FASTCALL_KEYWORDS_METHOD;
+        break;
+    case METH_FASTCALL | METH_KEYWORDS:
+        __Pyx_CyFunction_func_vectorcall(op) = __Pyx_CyFunction_Vectorcall_FASTCALL_KEYWORDS;
+        break;
+    case METH_VARARGS | METH_KEYWORDS:
+        __Pyx_CyFunction_func_vectorcall(op) = NULL;
+        break;
+    default:
+        PyErr_SetString(PyExc_SystemError, "Bad call flags for CyFunction");
+        Py_DECREF(op_in);
+        return NULL;
+    }
+#endif
+    return op_in;
+}
+static int __Pyx__CyFunction_clear(__pyx_CyFunctionObject *m)
+{
+    Py_CLEAR(m->func_closure);
+#if CYTHON_COMPILING_IN_LIMITED_API
+    Py_CLEAR(m->func_module);
+#else
+    Py_CLEAR(((PyCFunctionObject*)m)->m_module);
+#endif
+#if PY_VERSION_HEX < 0x030C0000 || CYTHON_COMPILING_IN_LIMITED_API
+    Py_CLEAR(m->func_dict);
+#elif PY_VERSION_HEX < 0x030d0000
+    _PyObject_ClearManagedDict((PyObject*)m);
+#else
+    PyObject_ClearManagedDict((PyObject*)m);
+#endif
+    Py_CLEAR(m->func_name);
+    Py_CLEAR(m->func_qualname);
+    Py_CLEAR(m->func_doc);
+    Py_CLEAR(m->func_globals);
+    Py_CLEAR(m->func_code);
+#if CYTHON_COMPILING_IN_LIMITED_API
+    Py_CLEAR(m->func_classobj);
+#else
+    {
+        PyObject *cls = (PyObject*) ((PyCMethodObject *) (m))->mm_class;
+        ((PyCMethodObject *) (m))->mm_class = NULL;
+        Py_XDECREF(cls);
+    }
+#endif
+    Py_CLEAR(m->defaults_tuple);
+    Py_CLEAR(m->defaults_kwdict);
+    Py_CLEAR(m->func_annotations);
+#if __PYX_LIMITED_VERSION_HEX < 0x030B0000
+    Py_CLEAR(m->func_is_coroutine);
+#endif
+    Py_CLEAR(m->defaults);
+    return 0;
+}
+static int
+__Pyx_CyFunction_clear(PyObject *m)
+{
+    return __Pyx__CyFunction_clear(__Pyx_as_CyFunctionObject(m));
+}
+static void __Pyx__CyFunction_dealloc(PyObject *m)
+{
+    __pyx_CyFunctionObject *cyfunc = __Pyx_as_CyFunctionObject(m);
+    if (__Pyx_CyFunction_weakreflist(cyfunc) != NULL)
+        PyObject_ClearWeakRefs(m);
+    __Pyx__CyFunction_clear(cyfunc);
+    __Pyx_PyHeapTypeObject_GC_Del(m);
+}
+static void __Pyx_CyFunction_dealloc(PyObject *m)
+{
+    PyObject_GC_UnTrack(m);
+    __Pyx__CyFunction_dealloc(m);
+}
+static int __Pyx_CyFunction_traverse(PyObject *m_in, visitproc visit, void *arg)
+{
+    __pyx_CyFunctionObject *m = __Pyx_as_CyFunctionObject(m_in);
+    {
+        int e = __Pyx_call_type_traverse(m_in, 1, visit, arg);
+        if (e) return e;
+    }
+    Py_VISIT(m->func_closure);
+#if CYTHON_COMPILING_IN_LIMITED_API
+    Py_VISIT(m->func_module);
+#else
+    Py_VISIT(((PyCFunctionObject*)m)->m_module);
+#endif
+#if PY_VERSION_HEX < 0x030C0000 || CYTHON_COMPILING_IN_LIMITED_API
+    Py_VISIT(m->func_dict);
+#else
+    {
+        int e =
+#if PY_VERSION_HEX < 0x030d0000
+            _PyObject_VisitManagedDict
+#else
+            PyObject_VisitManagedDict
+#endif
+                ((PyObject*)m, visit, arg);
+        if (e != 0) return e;
+    }
+#endif
+    __Pyx_VISIT_CONST(m->func_name);
+    __Pyx_VISIT_CONST(m->func_qualname);
+    Py_VISIT(m->func_doc);
+    Py_VISIT(m->func_globals);
+    __Pyx_VISIT_CONST(m->func_code);
+    Py_VISIT(__Pyx__CyFunction_GetClassObj(m));
+    Py_VISIT(m->defaults_tuple);
+    Py_VISIT(m->defaults_kwdict);
+    Py_VISIT(m->func_annotations);
+#if __PYX_LIMITED_VERSION_HEX < 0x030B0000
+    Py_VISIT(m->func_is_coroutine);
+#endif
+    Py_VISIT(m->defaults);
+    return 0;
+}
+static PyObject*
+__Pyx_CyFunction_repr(PyObject *op_in)
+{
+    __pyx_CyFunctionObject *op = __Pyx_as_CyFunctionObject(op_in);
+    PyObject *repr;
+    __Pyx_BEGIN_CRITICAL_SECTION(op_in);
+    repr = PyUnicode_FromFormat("<cyfunction %U at %p>",
+                                op->func_qualname, (void *)op);
+    __Pyx_END_CRITICAL_SECTION();
+    return repr;
+}
+static PyObject * __Pyx_CyFunction_CallMethod(PyObject *func, PyObject *self, PyObject *arg, PyObject *kw) {
+#if CYTHON_COMPILING_IN_LIMITED_API
+    __pyx_CyFunctionObject *cyfunc = __Pyx_as_CyFunctionObject(func);
+    PyCFunction meth = cyfunc->func_methoddef->ml_meth;
+    int flags = cyfunc->func_methoddef->ml_flags;
+#else
+    PyCFunctionObject* f = (PyCFunctionObject*)func;
+    PyCFunction meth = f->m_ml->ml_meth;
+    int flags = f->m_ml->ml_flags;
+#endif
+    Py_ssize_t size;
+    switch (flags & (METH_VARARGS | METH_KEYWORDS | METH_NOARGS | METH_O)) {
+    case METH_VARARGS:
+        if (likely(kw == NULL || PyDict_Size(kw) == 0))
+            return (*meth)(self, arg);
+        break;
+    case METH_VARARGS | METH_KEYWORDS:
+        return (*(PyCFunctionWithKeywords)(void(*)(void))meth)(self, arg, kw);
+    case METH_NOARGS:
+        if (likely(kw == NULL || PyDict_Size(kw) == 0)) {
+#if CYTHON_ASSUME_SAFE_SIZE
+            size = PyTuple_GET_SIZE(arg);
+#else
+            size = PyTuple_Size(arg);
+            if (unlikely(size < 0)) return NULL;
+#endif
+            if (likely(size == 0))
+                return (*meth)(self, NULL);
+            __Pyx_CyFunction_raise_argument_count_error(
+                func,
+                "takes no arguments", size);
+            return NULL;
+        }
+        break;
+    case METH_O:
+        if (likely(kw == NULL || PyDict_Size(kw) == 0)) {
+#if CYTHON_ASSUME_SAFE_SIZE
+            size = PyTuple_GET_SIZE(arg);
+#else
+            size = PyTuple_Size(arg);
+            if (unlikely(size < 0)) return NULL;
+#endif
+            if (likely(size == 1)) {
+                PyObject *result, *arg0;
+                #if CYTHON_ASSUME_SAFE_MACROS && !CYTHON_AVOID_BORROWED_REFS
+                arg0 = PyTuple_GET_ITEM(arg, 0);
+                #else
+                arg0 = __Pyx_PySequence_ITEM(arg, 0); if (unlikely(!arg0)) return NULL;
+                #endif
+                result = (*meth)(self, arg0);
+                #if !(CYTHON_ASSUME_SAFE_MACROS && !CYTHON_AVOID_BORROWED_REFS)
+                Py_DECREF(arg0);
+                #endif
+                return result;
+            }
+            __Pyx_CyFunction_raise_argument_count_error(
+                func,
+                "takes exactly one argument", size);
+            return NULL;
+        }
+        break;
+    default:
+        PyErr_SetString(PyExc_SystemError, "Bad call flags for CyFunction");
+        return NULL;
+    }
+    __Pyx_CyFunction_raise_type_error(
+        func, "takes no keyword arguments");
+    return NULL;
+}
+static CYTHON_INLINE PyObject *__Pyx_CyFunction_Call(PyObject *func, PyObject *arg, PyObject *kw) {
+    PyObject *result;
+    result = __Pyx_CyFunction_CallMethod(func, func, arg, kw);
+    return result;
+}
+static PyObject *__Pyx_CyFunction_CallAsMethod(PyObject *func, PyObject *args, PyObject *kw) {
+    PyObject *result;
+    __pyx_CyFunctionObject *cyfunc = __Pyx_as_CyFunctionObject(func);
+#if CYTHON_VECTORCALL
+     __pyx_vectorcallfunc vc = __Pyx_CyFunction_func_vectorcall(cyfunc);
+    if (vc) {
+#if CYTHON_ASSUME_SAFE_MACROS && CYTHON_ASSUME_SAFE_SIZE
+        return __Pyx_PyVectorcall_FastCallDict(func, vc, &PyTuple_GET_ITEM(args, 0), (size_t)PyTuple_GET_SIZE(args), kw);
+#else
+        (void) &__Pyx_PyVectorcall_FastCallDict;
+        return PyVectorcall_Call(func, args, kw);
+#endif
+    }
+#endif
+    if ((cyfunc->flags & __Pyx_CYFUNCTION_CCLASS) && !(cyfunc->flags & __Pyx_CYFUNCTION_STATICMETHOD)) {
+        Py_ssize_t argc;
+        PyObject *new_args;
+        PyObject *self;
+#if CYTHON_ASSUME_SAFE_SIZE
+        argc = PyTuple_GET_SIZE(args);
+#else
+        argc = PyTuple_Size(args);
+        if (unlikely(argc < 0)) return NULL;
+#endif
+        new_args = PyTuple_GetSlice(args, 1, argc);
+        if (unlikely(!new_args))
+            return NULL;
+        self = PyTuple_GetItem(args, 0);
+        if (unlikely(!self)) {
+            Py_DECREF(new_args);
+            PyErr_Format(PyExc_TypeError,
+                         "unbound method %.200S() needs an argument",
+                         cyfunc->func_qualname);
+            return NULL;
+        }
+        result = __Pyx_CyFunction_CallMethod(func, self, new_args, kw);
+        Py_DECREF(new_args);
+    } else {
+        result = __Pyx_CyFunction_Call(func, args, kw);
+    }
+    return result;
+}
+#if CYTHON_VECTORCALL
+static CYTHON_INLINE int __Pyx_CyFunction_Vectorcall_CheckArgs(PyObject *func, __pyx_CyFunctionObject *cyfunc, Py_ssize_t nargs, PyObject *kwnames)
+{
+    int ret = 0;
+    if ((cyfunc->flags & __Pyx_CYFUNCTION_CCLASS) && !(cyfunc->flags & __Pyx_CYFUNCTION_STATICMETHOD)) {
+        if (unlikely(nargs < 1)) {
+            __Pyx_CyFunction_raise_type_error(
+                func, "needs an argument");
+            return -1;
+        }
+        ret = 1;
+    }
+    if (unlikely(kwnames) && unlikely(__Pyx_PyTuple_GET_SIZE(kwnames))) {
+        __Pyx_CyFunction_raise_type_error(
+            func, "takes no keyword arguments");
+        return -1;
+    }
+    return ret;
+}
+static PyObject * __Pyx_CyFunction_Vectorcall_NOARGS(PyObject *func, PyObject *const *args, size_t nargsf, PyObject *kwnames)
+{
+    __pyx_CyFunctionObject *cyfunc = __Pyx_as_CyFunctionObject(func);
+    Py_ssize_t nargs = PyVectorcall_NARGS(nargsf);
+    PyObject *self;
+#if CYTHON_COMPILING_IN_LIMITED_API
+    PyCFunction meth = cyfunc->func_methoddef->ml_meth;
+    if (unlikely(!meth)) return NULL;
+#else
+    PyCFunction meth = ((PyCFunctionObject*)cyfunc)->m_ml->ml_meth;
+#endif
+    switch (__Pyx_CyFunction_Vectorcall_CheckArgs(func, cyfunc, nargs, kwnames)) {
+    case 1:
+        self = args[0];
+        args += 1;
+        nargs -= 1;
+        break;
+    case 0:
+        self = func;
+        break;
+    default:
+        return NULL;
+    }
+    if (unlikely(nargs != 0)) {
+        __Pyx_CyFunction_raise_argument_count_error(
+            func, "takes no arguments", nargs);
+        return NULL;
+    }
+    return meth(self, NULL);
+}
+static PyObject * __Pyx_CyFunction_Vectorcall_O(PyObject *func, PyObject *const *args, size_t nargsf, PyObject *kwnames)
+{
+    __pyx_CyFunctionObject *cyfunc = __Pyx_as_CyFunctionObject(func);
+    Py_ssize_t nargs = PyVectorcall_NARGS(nargsf);
+    PyObject *self;
+#if CYTHON_COMPILING_IN_LIMITED_API
+    PyCFunction meth = cyfunc->func_methoddef->ml_meth;
+    if (unlikely(!meth)) return NULL;
+#else
+    PyCFunction meth = ((PyCFunctionObject*)cyfunc)->m_ml->ml_meth;
+#endif
+    switch (__Pyx_CyFunction_Vectorcall_CheckArgs(func, cyfunc, nargs, kwnames)) {
+    case 1:
+        self = args[0];
+        args += 1;
+        nargs -= 1;
+        break;
+    case 0:
+        self = func;
+        break;
+    default:
+        return NULL;
+    }
+    if (unlikely(nargs != 1)) {
+        __Pyx_CyFunction_raise_argument_count_error(
+            func, "takes exactly one argument", nargs);
+        return NULL;
+    }
+    return meth(self, args[0]);
+}
+static PyObject * __Pyx_CyFunction_Vectorcall_FASTCALL_KEYWORDS(PyObject *func, PyObject *const *args, size_t nargsf, PyObject *kwnames)
+{
+    __pyx_CyFunctionObject *cyfunc = __Pyx_as_CyFunctionObject(func);
+    Py_ssize_t nargs = PyVectorcall_NARGS(nargsf);
+    PyObject *self;
+#if CYTHON_COMPILING_IN_LIMITED_API
+    PyCFunction meth = cyfunc->func_methoddef->ml_meth;
+    if (unlikely(!meth)) return NULL;
+#else
+    PyCFunction meth = ((PyCFunctionObject*)cyfunc)->m_ml->ml_meth;
+#endif
+    switch (__Pyx_CyFunction_Vectorcall_CheckArgs(func, cyfunc, nargs, NULL)) {
+    case 1:
+        self = args[0];
+        args += 1;
+        nargs -= 1;
+        break;
+    case 0:
+        self = func;
+        break;
+    default:
+        return NULL;
+    }
+    return ((__Pyx_PyCFunctionFastWithKeywords)(void(*)(void))meth)(self, args, nargs, kwnames);
+}
+static PyObject * __Pyx_CyFunction_Vectorcall_FASTCALL_KEYWORDS_METHOD(PyObject *func, PyObject *const *args, size_t nargsf, PyObject *kwnames)
+{
+    __pyx_CyFunctionObject *cyfunc = __Pyx_as_CyFunctionObject(func);
+    PyTypeObject *cls = (PyTypeObject *) __Pyx__CyFunction_GetClassObj(cyfunc);
+    Py_ssize_t nargs = PyVectorcall_NARGS(nargsf);
+    PyObject *self;
+#if CYTHON_COMPILING_IN_LIMITED_API
+    PyCFunction meth = cyfunc->func_methoddef->ml_meth;
+    if (unlikely(!meth)) return NULL;
+#else
+    PyCFunction meth = ((PyCFunctionObject*)cyfunc)->m_ml->ml_meth;
+#endif
+    switch (__Pyx_CyFunction_Vectorcall_CheckArgs(func, cyfunc, nargs, NULL)) {
+    case 1:
+        self = args[0];
+        args += 1;
+        nargs -= 1;
+        break;
+    case 0:
+        self = func;
+        break;
+    default:
+        return NULL;
+    }
+    #if PY_VERSION_HEX < 0x030e00A6
+    size_t nargs_value = (size_t) nargs;
+    #else
+    Py_ssize_t nargs_value = nargs;
+    #endif
+    return ((__Pyx_PyCMethod)(void(*)(void))meth)(self, cls, args, nargs_value, kwnames);
+}
+#endif
+static PyType_Slot __pyx_CyFunctionType_slots[] = {
+    {Py_tp_dealloc, (void *)__Pyx_CyFunction_dealloc},
+    {Py_tp_repr, (void *)__Pyx_CyFunction_repr},
+    {Py_tp_call, (void *)__Pyx_CyFunction_CallAsMethod},
+    {Py_tp_traverse, (void *)__Pyx_CyFunction_traverse},
+    {Py_tp_clear, (void *)__Pyx_CyFunction_clear},
+    {Py_tp_methods, (void *)__pyx_CyFunction_methods},
+    {Py_tp_members, (void *)__pyx_CyFunction_members},
+    {Py_tp_getset, (void *)__pyx_CyFunction_getsets},
+    {Py_tp_descr_get, (void *)__Pyx_PyMethod_New},
+    {0, 0},
+};
+static PyType_Spec __pyx_CyFunctionType_spec = {
+    __PYX_TYPE_MODULE_PREFIX "cython_function_or_method",
+    __PYX_SHARED_SIZEOF(__pyx_CyFunctionObject),
+    0,
+#ifdef Py_TPFLAGS_METHOD_DESCRIPTOR
+    Py_TPFLAGS_METHOD_DESCRIPTOR |
+#endif
+#if CYTHON_VECTORCALL
+#if defined(Py_TPFLAGS_HAVE_VECTORCALL)
+    Py_TPFLAGS_HAVE_VECTORCALL |
+#elif defined(_Py_TPFLAGS_HAVE_VECTORCALL)
+    _Py_TPFLAGS_HAVE_VECTORCALL |
+#endif
+#endif // CYTHON_VECTORCALL
+#if PY_VERSION_HEX >= 0x030C0000 && !CYTHON_COMPILING_IN_LIMITED_API
+    Py_TPFLAGS_MANAGED_DICT |
+#endif
+    Py_TPFLAGS_IMMUTABLETYPE | Py_TPFLAGS_DISALLOW_INSTANTIATION |
+    Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_GC | Py_TPFLAGS_BASETYPE,
+    __pyx_CyFunctionType_slots
+};
+static int __pyx_CyFunction_init(PyObject *module) {
+    __pyx_mstatetype *mstate = __Pyx_PyModule_GetState(module);
+    mstate->__pyx_CyFunctionType = __Pyx_FetchCommonTypeFromSpec(
+        mstate->__pyx_CommonTypesMetaclassType, module, &__pyx_CyFunctionType_spec, NULL);
+    if (unlikely(mstate->__pyx_CyFunctionType == NULL)) {
+        return -1;
+    }
+    return 0;
+}
+
+/* CythonFunction */
+static PyObject *__Pyx_CyFunction_New(PyMethodDef *ml, int flags, PyObject* qualname,
+                                      PyObject *closure, PyObject *module, PyObject* globals, PyObject* code) {
+    (void)&__Pyx_Get_CyFunction_Type;
+    PyObject *op = __Pyx_CyFunction_Init(
+        PyObject_GC_New(PyObject, __pyx_mstate_global->__pyx_CyFunctionType),
+        ml, flags, qualname, closure, module, globals, code
+    );
+    if (likely(op)) {
+        PyObject_GC_Track(op);
+    }
+    return op;
+}
+static PyTypeObject *__Pyx_Get_CyFunction_Type(void) {
+    PyTypeObject *tp = __pyx_mstate_global->__pyx_CyFunctionType;
+    Py_INCREF((PyObject*)tp);
+    return tp;
+}
+
+/* TupleOrListFromArrayImpl (used by ListFromArray) */
+CYTHON_UNUSED static PyObject *
+__Pyx_PyList_FromArray(PyObject *const *src, Py_ssize_t n) {
+    PyObject *res = PyList_New(n);
+    if (unlikely(res == NULL)) return NULL;
+    #if CYTHON_COMPILING_IN_CPYTHON
+    __Pyx_copy_object_array(src, ((PyListObject*)res)->ob_item, n);
+    #else
+    Py_ssize_t i;
+    for (i = 0; i < n; i++) {
+        Py_INCREF(src[i]);
+        if (unlikely(__Pyx_PyList_SET_ITEM(res, i, src[i]) < (0))) {
+            Py_DECREF(res);
+            return NULL;
+        }
+    }
+    #endif
+    return res;
+}
+
+/* PyLongBinop */
+#if !CYTHON_COMPILING_IN_PYPY
+static PyObject* __Pyx_Fallback___Pyx_PyLong_AddObjC(PyObject *op1, PyObject *op2, int inplace) {
+    return (inplace ? PyNumber_InPlaceAdd : PyNumber_Add)(op1, op2);
+}
+#if CYTHON_USE_PYLONG_INTERNALS
+static PyObject* __Pyx_Unpacked___Pyx_PyLong_AddObjC(PyObject *op1, PyObject *op2, long intval, int inplace, int zerodivision_check) {
+    CYTHON_MAYBE_UNUSED_VAR(inplace);
+    CYTHON_UNUSED_VAR(zerodivision_check);
+    const long b = intval;
+    long a;
+    const PY_LONG_LONG llb = intval;
+    PY_LONG_LONG lla;
+    if (unlikely(__Pyx_PyLong_IsZero(op1))) {
+        return __Pyx_NewRef(op2);
+    }
+    const int is_positive = __Pyx_PyLong_IsPos(op1);
+    const digit* digits = __Pyx_PyLong_Digits(op1);
+    const Py_ssize_t size = __Pyx_PyLong_DigitCount(op1);
+    if (likely(size == 1)) {
+        a = (long) digits[0];
+        if (!is_positive) a *= -1;
+    } else {
+        if (size == 2 && 8 * sizeof(long) - 1 > 2 * PyLong_SHIFT) {
+            a = (long) (((((unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0]));
+            if (!is_positive) a *= -1;
+            goto calculate_long;
+        } else if (size == 2 && 8 * sizeof(PY_LONG_LONG) - 1 > 2 * PyLong_SHIFT) {
+            lla = (PY_LONG_LONG) (((((unsigned PY_LONG_LONG)digits[1]) << PyLong_SHIFT) | (unsigned PY_LONG_LONG)digits[0]));
+            if (!is_positive) lla *= -1;
+            goto calculate_long_long;
+        } else
+        if (size == 3 && 8 * sizeof(long) - 1 > 3 * PyLong_SHIFT) {
+            a = (long) (((((((unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0]));
+            if (!is_positive) a *= -1;
+            goto calculate_long;
+        } else if (size == 3 && 8 * sizeof(PY_LONG_LONG) - 1 > 3 * PyLong_SHIFT) {
+            lla = (PY_LONG_LONG) (((((((unsigned PY_LONG_LONG)digits[2]) << PyLong_SHIFT) | (unsigned PY_LONG_LONG)digits[1]) << PyLong_SHIFT) | (unsigned PY_LONG_LONG)digits[0]));
+            if (!is_positive) lla *= -1;
+            goto calculate_long_long;
+        } else
+        if (size == 4 && 8 * sizeof(long) - 1 > 4 * PyLong_SHIFT) {
+            a = (long) (((((((((unsigned long)digits[3]) << PyLong_SHIFT) | (unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0]));
+            if (!is_positive) a *= -1;
+            goto calculate_long;
+        } else if (size == 4 && 8 * sizeof(PY_LONG_LONG) - 1 > 4 * PyLong_SHIFT) {
+            lla = (PY_LONG_LONG) (((((((((unsigned PY_LONG_LONG)digits[3]) << PyLong_SHIFT) | (unsigned PY_LONG_LONG)digits[2]) << PyLong_SHIFT) | (unsigned PY_LONG_LONG)digits[1]) << PyLong_SHIFT) | (unsigned PY_LONG_LONG)digits[0]));
+            if (!is_positive) lla *= -1;
+            goto calculate_long_long;
+        } else
+        {}
+        return PyLong_Type.tp_as_number->nb_add(op1, op2);
+    }
+    calculate_long:
+        {
+            long x;
+            x = a + b;
+            return PyLong_FromLong(x);
+        }
+    calculate_long_long:
+        {
+            PY_LONG_LONG llx;
+            llx = lla + llb;
+            return PyLong_FromLongLong(llx);
+        }
+    
+}
+#endif
+static PyObject* __Pyx_Float___Pyx_PyLong_AddObjC(PyObject *float_val, long intval, int zerodivision_check) {
+    CYTHON_UNUSED_VAR(zerodivision_check);
+    const long b = intval;
+    double a = __Pyx_PyFloat_AS_DOUBLE(float_val);
+        double result;
+        
+        result = ((double)a) + (double)b;
+        return PyFloat_FromDouble(result);
+}
+static CYTHON_INLINE PyObject* __Pyx_PyLong_AddObjC(PyObject *op1, PyObject *op2, long intval, int inplace, int zerodivision_check) {
+    CYTHON_MAYBE_UNUSED_VAR(intval);
+    CYTHON_UNUSED_VAR(zerodivision_check);
+    #if CYTHON_USE_PYLONG_INTERNALS
+    if (likely(PyLong_CheckExact(op1))) {
+        return __Pyx_Unpacked___Pyx_PyLong_AddObjC(op1, op2, intval, inplace, zerodivision_check);
+    }
+    #endif
+    if (PyFloat_CheckExact(op1)) {
+        return __Pyx_Float___Pyx_PyLong_AddObjC(op1, intval, zerodivision_check);
+    }
+    return __Pyx_Fallback___Pyx_PyLong_AddObjC(op1, op2, inplace);
+}
+#endif
+
+/* CLineInTraceback (used by AddTraceback) */
+#if CYTHON_CLINE_IN_TRACEBACK && CYTHON_CLINE_IN_TRACEBACK_RUNTIME
+#if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030A0000
+#define __Pyx_PyProbablyModule_GetDict(o) __Pyx_XNewRef(PyModule_GetDict(o))
+#elif !CYTHON_COMPILING_IN_CPYTHON || CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+#define __Pyx_PyProbablyModule_GetDict(o) PyObject_GenericGetDict(o, NULL);
+#else
+PyObject* __Pyx_PyProbablyModule_GetDict(PyObject *o) {
+    PyObject **dict_ptr = _PyObject_GetDictPtr(o);
+    return dict_ptr ? __Pyx_XNewRef(*dict_ptr) : NULL;
+}
+#endif
+static int __Pyx_CLineForTraceback(PyThreadState *tstate, int c_line) {
+    PyObject *use_cline = NULL;
+    PyObject *ptype, *pvalue, *ptraceback;
+    PyObject *cython_runtime_dict;
+    CYTHON_MAYBE_UNUSED_VAR(tstate);
+    if (unlikely(!__pyx_mstate_global->__pyx_cython_runtime)) {
+        return c_line;
+    }
+    __Pyx_ErrFetchInState(tstate, &ptype, &pvalue, &ptraceback);
+    cython_runtime_dict = __Pyx_PyProbablyModule_GetDict(__pyx_mstate_global->__pyx_cython_runtime);
+    if (likely(cython_runtime_dict)) {
+        __PYX_PY_DICT_LOOKUP_IF_MODIFIED(
+            use_cline, cython_runtime_dict,
+            __Pyx_PyDict_SetDefault(cython_runtime_dict, __pyx_mstate_global->__pyx_n_u_cline_in_traceback, Py_False))
+    }
+    if (use_cline == NULL || use_cline == Py_False || (use_cline != Py_True && PyObject_Not(use_cline) != 0)) {
+        c_line = 0;
+    }
+    Py_XDECREF(use_cline);
+    Py_XDECREF(cython_runtime_dict);
+    __Pyx_ErrRestoreInState(tstate, ptype, pvalue, ptraceback);
+    return c_line;
+}
+#endif
+
+/* CodeObjectCache (used by AddTraceback) */
+static int __pyx_bisect_code_objects(__Pyx_CodeObjectCacheEntry* entries, int count, int code_line) {
+    int start = 0, mid = 0, end = count - 1;
+    if (end >= 0 && code_line > entries[end].code_line) {
+        return count;
+    }
+    while (start < end) {
+        mid = start + (end - start) / 2;
+        if (code_line < entries[mid].code_line) {
+            end = mid;
+        } else if (code_line > entries[mid].code_line) {
+             start = mid + 1;
+        } else {
+            return mid;
+        }
+    }
+    if (code_line <= entries[mid].code_line) {
+        return mid;
+    } else {
+        return mid + 1;
+    }
+}
+static __Pyx_CachedCodeObjectType *__pyx__find_code_object(struct __Pyx_CodeObjectCache *code_cache, int code_line) {
+    __Pyx_CachedCodeObjectType* code_object;
+    int pos;
+    if (unlikely(!code_line) || unlikely(!code_cache->entries)) {
+        return NULL;
+    }
+    pos = __pyx_bisect_code_objects(code_cache->entries, code_cache->count, code_line);
+    if (unlikely(pos >= code_cache->count) || unlikely(code_cache->entries[pos].code_line != code_line)) {
+        return NULL;
+    }
+    code_object = code_cache->entries[pos].code_object;
+    Py_INCREF(code_object);
+    return code_object;
+}
+static __Pyx_CachedCodeObjectType *__pyx_find_code_object(int code_line) {
+#if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING && !CYTHON_ATOMICS
+    (void)__pyx__find_code_object;
+    return NULL; // Most implementation should have atomics. But otherwise, don't make it thread-safe, just miss.
+#else
+    struct __Pyx_CodeObjectCache *code_cache = &__pyx_mstate_global->__pyx_code_cache;
+#if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+    __pyx_nonatomic_int_type old_count = __pyx_atomic_incr_acq_rel(&code_cache->accessor_count);
+    if (old_count < 0) {
+        __pyx_atomic_decr_acq_rel(&code_cache->accessor_count);
+        return NULL;
+    }
+#endif
+    __Pyx_CachedCodeObjectType *result = __pyx__find_code_object(code_cache, code_line);
+#if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+    __pyx_atomic_decr_acq_rel(&code_cache->accessor_count);
+#endif
+    return result;
+#endif
+}
+static void __pyx__insert_code_object(struct __Pyx_CodeObjectCache *code_cache, int code_line, __Pyx_CachedCodeObjectType* code_object)
+{
+    int pos, i;
+    __Pyx_CodeObjectCacheEntry* entries = code_cache->entries;
+    if (unlikely(!code_line)) {
+        return;
+    }
+    if (unlikely(!entries)) {
+        entries = (__Pyx_CodeObjectCacheEntry*)PyMem_Malloc(64*sizeof(__Pyx_CodeObjectCacheEntry));
+        if (likely(entries)) {
+            code_cache->entries = entries;
+            code_cache->max_count = 64;
+            code_cache->count = 1;
+            entries[0].code_line = code_line;
+            entries[0].code_object = code_object;
+            Py_INCREF(code_object);
+        }
+        return;
+    }
+    pos = __pyx_bisect_code_objects(code_cache->entries, code_cache->count, code_line);
+    if ((pos < code_cache->count) && unlikely(code_cache->entries[pos].code_line == code_line)) {
+        __Pyx_CachedCodeObjectType* tmp = entries[pos].code_object;
+        entries[pos].code_object = code_object;
+        Py_INCREF(code_object);
+        Py_DECREF(tmp);
+        return;
+    }
+    if (code_cache->count == code_cache->max_count) {
+        int new_max = code_cache->max_count + 64;
+        entries = (__Pyx_CodeObjectCacheEntry*)PyMem_Realloc(
+            code_cache->entries, ((size_t)new_max) * sizeof(__Pyx_CodeObjectCacheEntry));
+        if (unlikely(!entries)) {
+            return;
+        }
+        code_cache->entries = entries;
+        code_cache->max_count = new_max;
+    }
+    for (i=code_cache->count; i>pos; i--) {
+        entries[i] = entries[i-1];
+    }
+    entries[pos].code_line = code_line;
+    entries[pos].code_object = code_object;
+    code_cache->count++;
+    Py_INCREF(code_object);
+}
+static void __pyx_insert_code_object(int code_line, __Pyx_CachedCodeObjectType* code_object) {
+#if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING && !CYTHON_ATOMICS
+    (void)__pyx__insert_code_object;
+    return; // Most implementation should have atomics. But otherwise, don't make it thread-safe, just fail.
+#else
+    struct __Pyx_CodeObjectCache *code_cache = &__pyx_mstate_global->__pyx_code_cache;
+#if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+    __pyx_nonatomic_int_type expected = 0;
+    if (!__pyx_atomic_int_cmp_exchange(&code_cache->accessor_count, &expected, INT_MIN)) {
+        return;
+    }
+#endif
+    __pyx__insert_code_object(code_cache, code_line, code_object);
+#if CYTHON_COMPILING_IN_CPYTHON_FREETHREADING
+    __pyx_atomic_sub(&code_cache->accessor_count, INT_MIN);
+#endif
+#endif
+}
+
+/* AddTraceback */
+#include "compile.h"
+#include "frameobject.h"
+#include "traceback.h"
+#if PY_VERSION_HEX >= 0x030b00a6 && !CYTHON_COMPILING_IN_LIMITED_API && !defined(PYPY_VERSION)
+  #ifndef Py_BUILD_CORE
+    #define Py_BUILD_CORE 1
+  #endif
+  #include "internal/pycore_frame.h"
+#endif
+#if CYTHON_COMPILING_IN_LIMITED_API
+static PyObject *__Pyx_PyCode_Replace_For_AddTraceback(PyObject *code, PyObject *scratch_dict,
+                                                       PyObject *firstlineno, PyObject *name) {
+    PyObject *replace = NULL;
+    if (unlikely(PyDict_SetItemString(scratch_dict, "co_firstlineno", firstlineno))) return NULL;
+    if (unlikely(PyDict_SetItemString(scratch_dict, "co_name", name))) return NULL;
+    replace = PyObject_GetAttrString(code, "replace");
+    if (likely(replace)) {
+        PyObject *result = PyObject_Call(replace, __pyx_mstate_global->__pyx_empty_tuple, scratch_dict);
+        Py_DECREF(replace);
+        return result;
+    }
+    return NULL;
+}
+static void __Pyx_AddTraceback(const char *funcname, int c_line,
+                               int py_line, const char *filename) {
+    PyObject *code_object = NULL, *py_py_line = NULL, *py_funcname = NULL, *dict = NULL;
+    PyObject *replace = NULL, *getframe = NULL, *frame = NULL;
+    PyObject *exc_type, *exc_value, *exc_traceback;
+    int success = 0;
+    if (c_line) {
+        c_line = __Pyx_CLineForTraceback(__Pyx_PyThreadState_Current, c_line);
+    }
+    __Pyx_PyErr_FetchException(&exc_type, &exc_value, &exc_traceback);
+    code_object = __pyx_find_code_object(c_line ? -c_line : py_line);
+    if (!code_object) {
+        code_object = Py_CompileString("_getframe()", filename, Py_eval_input);
+        if (unlikely(!code_object)) goto bad;
+        py_py_line = PyLong_FromLong(py_line);
+        if (unlikely(!py_py_line)) goto bad;
+        if (c_line) {
+            py_funcname = PyUnicode_FromFormat( "%s (%s:%d)", funcname, __pyx_cfilenm, c_line);
+        } else {
+            py_funcname = PyUnicode_FromString(funcname);
+        }
+        if (unlikely(!py_funcname)) goto bad;
+        dict = PyDict_New();
+        if (unlikely(!dict)) goto bad;
+        {
+            PyObject *old_code_object = code_object;
+            code_object = __Pyx_PyCode_Replace_For_AddTraceback(code_object, dict, py_py_line, py_funcname);
+            Py_DECREF(old_code_object);
+        }
+        if (unlikely(!code_object)) goto bad;
+        __pyx_insert_code_object(c_line ? -c_line : py_line, code_object);
+    } else {
+        dict = PyDict_New();
+    }
+    getframe = PySys_GetObject("_getframe");
+    if (unlikely(!getframe)) goto bad;
+    if (unlikely(PyDict_SetItemString(dict, "_getframe", getframe))) goto bad;
+    frame = PyEval_EvalCode(code_object, dict, dict);
+    if (unlikely(!frame) || frame == Py_None) goto bad;
+    success = 1;
+  bad:
+    __Pyx_PyErr_RestoreException(exc_type, exc_value, exc_traceback);
+    Py_XDECREF(code_object);
+    Py_XDECREF(py_py_line);
+    Py_XDECREF(py_funcname);
+    Py_XDECREF(dict);
+    Py_XDECREF(replace);
+    if (success) {
+        PyTraceBack_Here(
+            (struct _frame*)frame);
+    }
+    Py_XDECREF(frame);
+}
+#else
+static PyCodeObject* __Pyx_CreateCodeObjectForTraceback(
+            const char *funcname, int c_line,
+            int py_line, const char *filename) {
+    PyCodeObject *py_code = NULL;
+    PyObject *py_funcname = NULL;
+    if (c_line) {
+        py_funcname = PyUnicode_FromFormat( "%s (%s:%d)", funcname, __pyx_cfilenm, c_line);
+        if (!py_funcname) goto bad;
+        funcname = PyUnicode_AsUTF8(py_funcname);
+        if (!funcname) goto bad;
+    }
+    py_code = PyCode_NewEmpty(filename, funcname, py_line);
+    Py_XDECREF(py_funcname);
+    return py_code;
+bad:
+    Py_XDECREF(py_funcname);
+    return NULL;
+}
+static void __Pyx_AddTraceback(const char *funcname, int c_line,
+                               int py_line, const char *filename) {
+    PyCodeObject *py_code = 0;
+    PyFrameObject *py_frame = 0;
+    PyThreadState *tstate = __Pyx_PyThreadState_Current;
+    PyObject *ptype, *pvalue, *ptraceback;
+    if (c_line) {
+        c_line = __Pyx_CLineForTraceback(tstate, c_line);
+    }
+    py_code = __pyx_find_code_object(c_line ? -c_line : py_line);
+    if (!py_code) {
+        __Pyx_ErrFetchInState(tstate, &ptype, &pvalue, &ptraceback);
+        py_code = __Pyx_CreateCodeObjectForTraceback(
+            funcname, c_line, py_line, filename);
+        if (!py_code) {
+            /* If the code object creation fails, then we should clear the
+               fetched exception references and propagate the new exception */
+            Py_XDECREF(ptype);
+            Py_XDECREF(pvalue);
+            Py_XDECREF(ptraceback);
+            goto bad;
+        }
+        __Pyx_ErrRestoreInState(tstate, ptype, pvalue, ptraceback);
+        __pyx_insert_code_object(c_line ? -c_line : py_line, py_code);
+    }
+    py_frame = PyFrame_New(
+        tstate,            /*PyThreadState *tstate,*/
+        py_code,           /*PyCodeObject *code,*/
+        __pyx_mstate_global->__pyx_d,    /*PyObject *globals,*/
+        0                  /*PyObject *locals*/
+    );
+    if (!py_frame) goto bad;
+    __Pyx_PyFrame_SetLineNumber(py_frame, py_line);
+    PyTraceBack_Here(py_frame);
+bad:
+    Py_XDECREF(py_code);
+    Py_XDECREF(py_frame);
+}
+#endif
+
+/* CIntFromPyVerify */
+#define __PYX_VERIFY_RETURN_INT(target_type, func_type, func_value)\
+    __PYX__VERIFY_RETURN_INT(target_type, func_type, func_value, 0)
+#define __PYX_VERIFY_RETURN_INT_EXC(target_type, func_type, func_value)\
+    __PYX__VERIFY_RETURN_INT(target_type, func_type, func_value, 1)
+#define __PYX__VERIFY_RETURN_INT(target_type, func_type, func_value, exc)\
+    {\
+        func_type value = func_value;\
+        if (sizeof(target_type) < sizeof(func_type)) {\
+            if (unlikely(value != (func_type) (target_type) value)) {\
+                func_type zero = 0;\
+                if (exc && unlikely(value == (func_type)-1 && PyErr_Occurred()))\
+                    return (target_type) -1;\
+                if (is_unsigned && unlikely(value < zero))\
+                    goto raise_neg_overflow;\
+                else\
+                    goto raise_overflow;\
+            }\
+        }\
+        return (target_type) value;\
+    }
+
+/* PyObjectCallMethod1 */
+static CYTHON_INLINE PyObject* __Pyx_PyObject_CallMethod1(PyObject* obj, PyObject* method_name, PyObject* arg) {
+#if CYTHON_VECTORCALL && (__PYX_LIMITED_VERSION_HEX >= 0x030C0000 || !CYTHON_COMPILING_IN_LIMITED_API)
+    PyObject *args[2] = {obj, arg};
+    return PyObject_VectorcallMethod(method_name, args, 2 | PY_VECTORCALL_ARGUMENTS_OFFSET, NULL);
+#elif CYTHON_COMPILING_IN_LIMITED_API
+    return PyObject_CallMethodObjArgs(obj, method_name, arg, NULL);
+#else
+    return PyObject_CallMethodOneArg(obj, method_name, arg);
+#endif
+}
+
+/* CheckUnpickleChecksumError */
+static void __Pyx_RaiseUnpickleChecksumError(long checksum, long checksum1, long checksum2, long checksum3, const char *members) {
+    PyObject *pickle_module = PyImport_ImportModule("pickle");
+    if (unlikely(!pickle_module)) return;
+    PyObject *pickle_error = PyObject_GetAttrString(pickle_module, "PickleError");
+    Py_DECREF(pickle_module);
+    if (unlikely(!pickle_error)) return;
+    if (checksum2 == checksum1) {
+        PyErr_Format(pickle_error, "Incompatible checksums (0x%x vs (0x%x) = (%s))",
+            checksum, checksum1, members);
+    } else if (checksum3 == checksum2) {
+        PyErr_Format(pickle_error, "Incompatible checksums (0x%x vs (0x%x, 0x%x) = (%s))",
+            checksum, checksum1, checksum2, members);
+    } else {
+        PyErr_Format(pickle_error, "Incompatible checksums (0x%x vs (0x%x, 0x%x, 0x%x) = (%s))",
+            checksum, checksum1, checksum2, checksum3, members);
+    }
+    Py_DECREF(pickle_error);
+}
+
+/* PyObjectVectorcallKwds (used by PyObjectVectorcallMethodKwds) */
+#if CYTHON_VECTORCALL
+CYTHON_UNUSED static int __Pyx_CheckVectorcallKwarg(PyObject *kwnames, Py_ssize_t i) {
+    PyObject *key = __Pyx_PyTuple_GET_ITEM(kwnames, i);
+#if !CYTHON_ASSUME_SAFE_MACROS
+    if (unlikely(!key)) return -1;
+#endif
+    if (unlikely(!PyUnicode_Check(key))) {
+        PyErr_SetString(PyExc_TypeError, "keywords must be strings");
+        return -1;
+    }
+    return 0;
+}
+#else
+CYTHON_UNUSED static PyObject *__Pyx_MakeKwargDict(PyObject **keys, PyObject **values, Py_ssize_t n) {
+    PyObject *out = PyDict_New();
+    if (unlikely(!out)) return NULL;
+    for (Py_ssize_t i=0; i<n; ++i) {
+        if (unlikely(PyDict_SetItem(out, keys[i], values[i]) < 0)) {
+            Py_DECREF(out);
+            return NULL;
+        }
+    }
+    return out;
+}
+CYTHON_UNUSED static int __Pyx_CheckVectorcallKwarg(PyObject **kwnames, Py_ssize_t i) {
+    PyObject *key = kwnames[i];
+    if (unlikely(!PyUnicode_Check(key))) {
+        PyErr_SetString(PyExc_TypeError, "keywords must be strings");
+        return -1;
+    }
+    return 0;
+}
+#endif
+
+/* PyObjectVectorcallMethodKwds (used by CIntToPy) */
+#if !CYTHON_VECTORCALL
+static PyObject *__Pyx_Object_VectorcallMethodKwds(PyObject *name, PyObject *const *args, size_t nargsf, PyObject *kwnames) {
+    PyObject *result;
+    PyObject *obj = PyObject_GetAttr(args[0], name);
+    if (unlikely(!obj))
+        return NULL;
+    result = __Pyx_Object_VectorcallKwds(obj, args+1, nargsf-1, kwnames);
+    Py_DECREF(obj);
+    return result;
+}
+#endif
+
+/* CIntToPy */
+static CYTHON_INLINE PyObject* __Pyx_PyLong_From_int(int value) {
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Wconversion"
+#endif
+    const int neg_one = (int) -1, const_zero = (int) 0;
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic pop
+#endif
+    const int is_unsigned = neg_one > const_zero;
+    if (is_unsigned) {
+        if (sizeof(int) < sizeof(long)) {
+            return PyLong_FromLong((long) value);
+        } else if (sizeof(int) <= sizeof(unsigned long)) {
+            return PyLong_FromUnsignedLong((unsigned long) value);
+#if !CYTHON_COMPILING_IN_PYPY
+        } else if (sizeof(int) <= sizeof(unsigned PY_LONG_LONG)) {
+            return PyLong_FromUnsignedLongLong((unsigned PY_LONG_LONG) value);
+#endif
+        }
+    } else {
+        if (sizeof(int) <= sizeof(long)) {
+            return PyLong_FromLong((long) value);
+        } else if (sizeof(int) <= sizeof(PY_LONG_LONG)) {
+            return PyLong_FromLongLong((PY_LONG_LONG) value);
+        }
+    }
+    {
+        unsigned char *bytes = (unsigned char *)&value;
+#if !CYTHON_COMPILING_IN_LIMITED_API && PY_VERSION_HEX >= 0x030d00A4
+        if (is_unsigned) {
+            return PyLong_FromUnsignedNativeBytes(bytes, sizeof(value), -1);
+        } else {
+            return PyLong_FromNativeBytes(bytes, sizeof(value), -1);
+        }
+#elif !CYTHON_COMPILING_IN_LIMITED_API && PY_VERSION_HEX < 0x030d0000
+        int one = 1; int little = (int)*(unsigned char *)&one;
+        return _PyLong_FromByteArray(bytes, sizeof(int),
+                                     little, !is_unsigned);
+#else
+        int one = 1; int little = (int)*(unsigned char *)&one;
+        PyObject *result = NULL, *kwds = NULL;
+        PyObject *py_bytes = NULL, *order_str = NULL, *from_bytes_str = NULL;;
+        py_bytes = PyBytes_FromStringAndSize((char*)bytes, sizeof(int));
+        if (!py_bytes) goto limited_bad;
+        from_bytes_str = PyUnicode_FromStringAndSize("from_bytes", 10);
+        if (!from_bytes_str) goto limited_bad;
+        order_str = PyUnicode_FromString(little ? "little" : "big");
+        if (!order_str) goto limited_bad;
+        {
+            PyObject *args[] = { (PyObject*)&PyLong_Type, py_bytes, order_str, Py_True };
+            if (!is_unsigned) {
+                PyObject *signed_str = PyUnicode_FromStringAndSize("signed", 6);
+                if (!signed_str) goto limited_bad;
+#if CYTHON_VECTORCALL
+                kwds = PyTuple_Pack(1, signed_str);
+#else
+                {
+                    PyObject *keys[] = {signed_str};
+                    PyObject *values[] = {Py_True};
+                    kwds = __Pyx_MakeKwargDict(keys, values, 1);
+                }
+#endif
+                Py_DECREF(signed_str);
+                if (unlikely(!kwds)) goto limited_bad;
+            }
+            result = __Pyx_Object_VectorcallMethodKwds(from_bytes_str, args, 3 | __Pyx_PY_VECTORCALL_ARGUMENTS_OFFSET, kwds);
+        }
+        limited_bad:
+        Py_XDECREF(kwds);
+        Py_XDECREF(order_str);
+        Py_XDECREF(py_bytes);
+        Py_XDECREF(from_bytes_str);
+        return result;
+#endif
+    }
+}
+
+/* CIntFromPy */
+static int __Pyx_LargePyLong___Pyx_PyLong_As_int(PyObject *x);
+static int __Pyx_raise_neg_overflow___Pyx_PyLong_As_int(void) {
+    const char* type_name = "int";
+    PyErr_Format(PyExc_OverflowError,
+        "can't convert negative value to %.200s", type_name);
+    return (int) -1;
+}
+static int __Pyx_raise_overflow___Pyx_PyLong_As_int(void) {
+    const char* type_name = "int";
+    PyErr_Format(PyExc_OverflowError,
+        "value too large to convert to %.200s", type_name);
+    return (int) -1;
+}
+static CYTHON_INLINE int __Pyx_PyULong___Pyx_PyLong_As_int(PyObject *x) {
+    const int is_unsigned = 1;
+#if CYTHON_USE_PYLONG_INTERNALS
+    {
+        const digit* digits = __Pyx_PyLong_Digits(x);
+        const Py_ssize_t size = __Pyx_PyLong_DigitCount(x);
+        if (size == 2 && (8 * sizeof(int) > 1 * PyLong_SHIFT)) {
+            if ((8 * sizeof(unsigned long) > 2 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(int, unsigned long, (((((unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(int) >= 2 * PyLong_SHIFT)) {
+                return (int) (((((int)digits[1]) << PyLong_SHIFT) | (int)digits[0]));
+            }
+        } else
+        if (size == 3 && (8 * sizeof(int) > 2 * PyLong_SHIFT)) {
+            if ((8 * sizeof(unsigned long) > 3 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(int, unsigned long, (((((((unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(int) >= 3 * PyLong_SHIFT)) {
+                return (int) (((((((int)digits[2]) << PyLong_SHIFT) | (int)digits[1]) << PyLong_SHIFT) | (int)digits[0]));
+            }
+        } else
+        if (size == 4 && (8 * sizeof(int) > 3 * PyLong_SHIFT)) {
+            if ((8 * sizeof(unsigned long) > 4 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(int, unsigned long, (((((((((unsigned long)digits[3]) << PyLong_SHIFT) | (unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(int) >= 4 * PyLong_SHIFT)) {
+                return (int) (((((((((int)digits[3]) << PyLong_SHIFT) | (int)digits[2]) << PyLong_SHIFT) | (int)digits[1]) << PyLong_SHIFT) | (int)digits[0]));
+            }
+        } else
+        {}
+    }
+#elif CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX < 0x030C00A7
+    if (unlikely(Py_SIZE(x) < 0)) {
+        goto raise_neg_overflow;
+    }
+#else
+    {
+        int result = PyObject_RichCompareBool(x, Py_False, Py_LT);
+        if (unlikely(result < 0))
+            return (int) -1;
+        if (unlikely(result == 1))
+            goto raise_neg_overflow;
+    }
+#endif
+    if ((sizeof(int) <= sizeof(unsigned long))) {
+        __PYX_VERIFY_RETURN_INT_EXC(int, unsigned long, PyLong_AsUnsignedLong(x))
+    } else if ((sizeof(int) <= sizeof(unsigned PY_LONG_LONG))) {
+        __PYX_VERIFY_RETURN_INT_EXC(int, unsigned PY_LONG_LONG, PyLong_AsUnsignedLongLong(x))
+    }
+    return __Pyx_LargePyLong___Pyx_PyLong_As_int(x);
+raise_neg_overflow:
+    return __Pyx_raise_neg_overflow___Pyx_PyLong_As_int();
+raise_overflow:
+    return __Pyx_raise_overflow___Pyx_PyLong_As_int();
+}
+static CYTHON_INLINE int __Pyx_PySLong___Pyx_PyLong_As_int(PyObject *x) {
+    const int is_unsigned = 0;
+#if CYTHON_USE_PYLONG_INTERNALS
+    if (__Pyx_PyLong_IsNeg(x)) {
+        const Py_ssize_t size = __Pyx_PyLong_DigitCount(x);
+        const digit* digits = __Pyx_PyLong_Digits(x);
+        if (size == 2 && (8 * sizeof(int) > 1 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 2 * PyLong_SHIFT)) {
+                long ival = - (long) (((((unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0]));
+                __PYX_VERIFY_RETURN_INT(int, long, ival)
+            } else if ((8 * sizeof(int) - 1 > 2 * PyLong_SHIFT)) {
+                return (int) (((int) -1) * (((((int)digits[1]) << PyLong_SHIFT) | (int)digits[0])));
+            }
+        } else
+        if (size == 3 && (8 * sizeof(int) > 2 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 3 * PyLong_SHIFT)) {
+                long ival = - (long) (((((((unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0]));
+                __PYX_VERIFY_RETURN_INT(int, long, ival)
+            } else if ((8 * sizeof(int) - 1 > 3 * PyLong_SHIFT)) {
+                return (int) (((int) -1) * (((((((int)digits[2]) << PyLong_SHIFT) | (int)digits[1]) << PyLong_SHIFT) | (int)digits[0])));
+            }
+        } else
+        if (size == 4 && (8 * sizeof(int) > 3 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 4 * PyLong_SHIFT)) {
+                long ival = - (long) (((((((((unsigned long)digits[3]) << PyLong_SHIFT) | (unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0]));
+                __PYX_VERIFY_RETURN_INT(int, long, ival)
+            } else if ((8 * sizeof(int) - 1 > 4 * PyLong_SHIFT)) {
+                return (int) (((int) -1) * (((((((((int)digits[3]) << PyLong_SHIFT) | (int)digits[2]) << PyLong_SHIFT) | (int)digits[1]) << PyLong_SHIFT) | (int)digits[0])));
+            }
+        } else
+        {}
+    } else {
+        const Py_ssize_t size = __Pyx_PyLong_DigitCount(x);
+        const digit* digits = __Pyx_PyLong_Digits(x);
+        if (size == 2 && (8 * sizeof(int) > 1 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 2 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(int, unsigned long, (((((unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(int) - 1 > 2 * PyLong_SHIFT)) {
+                return (int) (((((int)digits[1]) << PyLong_SHIFT) | (int)digits[0]));
+            }
+        } else
+        if (size == 3 && (8 * sizeof(int) > 2 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 3 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(int, unsigned long, (((((((unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(int) - 1 > 3 * PyLong_SHIFT)) {
+                return (int) (((((((int)digits[2]) << PyLong_SHIFT) | (int)digits[1]) << PyLong_SHIFT) | (int)digits[0]));
+            }
+        } else
+        if (size == 4 && (8 * sizeof(int) > 3 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 4 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(int, unsigned long, (((((((((unsigned long)digits[3]) << PyLong_SHIFT) | (unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(int) - 1 > 4 * PyLong_SHIFT)) {
+                return (int) (((((((((int)digits[3]) << PyLong_SHIFT) | (int)digits[2]) << PyLong_SHIFT) | (int)digits[1]) << PyLong_SHIFT) | (int)digits[0]));
+            }
+        } else
+        {}
+    }
+#endif
+    #if __PYX_LIMITED_VERSION_HEX >= 0x030d0000
+    if ((sizeof(int) <= sizeof(int)) && (sizeof(int) < sizeof(long))) {
+        __PYX_VERIFY_RETURN_INT_EXC(int, int, PyLong_AsInt(x))
+    } else
+    #endif
+    if ((sizeof(int) <= sizeof(long))) {
+        __PYX_VERIFY_RETURN_INT_EXC(int, long, PyLong_AsLong(x))
+    } else if ((sizeof(int) <= sizeof(PY_LONG_LONG))) {
+        __PYX_VERIFY_RETURN_INT_EXC(int, PY_LONG_LONG, PyLong_AsLongLong(x))
+    }
+    return __Pyx_LargePyLong___Pyx_PyLong_As_int(x);
+raise_neg_overflow:
+    return __Pyx_raise_neg_overflow___Pyx_PyLong_As_int();
+raise_overflow:
+    return __Pyx_raise_overflow___Pyx_PyLong_As_int();
+}
+static int __Pyx_LargePyLong___Pyx_PyLong_As_int(PyObject *x) {
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Wconversion"
+#endif
+    const int neg_one = (int) -1, const_zero = (int) 0;
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic pop
+#endif
+    const int is_unsigned = neg_one > const_zero;
+    int val;
+    int ret = -1;
+#if PY_VERSION_HEX >= 0x030d00A6 && !CYTHON_COMPILING_IN_LIMITED_API
+    Py_ssize_t bytes_copied = PyLong_AsNativeBytes(
+        x, &val, sizeof(val), Py_ASNATIVEBYTES_NATIVE_ENDIAN | (is_unsigned ? Py_ASNATIVEBYTES_UNSIGNED_BUFFER | Py_ASNATIVEBYTES_REJECT_NEGATIVE : 0));
+    if (unlikely(bytes_copied == -1)) {
+    } else if (unlikely(bytes_copied > (Py_ssize_t) sizeof(val))) {
+        goto raise_overflow;
+    } else {
+        ret = 0;
+    }
+#elif PY_VERSION_HEX < 0x030d0000 && !(CYTHON_COMPILING_IN_PYPY || CYTHON_COMPILING_IN_LIMITED_API) || defined(_PyLong_AsByteArray)
+    int one = 1; int is_little = (int)*(unsigned char *)&one;
+    unsigned char *bytes = (unsigned char *)&val;
+    ret = _PyLong_AsByteArray((PyLongObject *)x,
+                                bytes, sizeof(val),
+                                is_little, !is_unsigned);
+    if ((0)) goto raise_overflow;
+#else
+    PyObject *v;
+    PyObject *stepval = NULL, *mask = NULL, *shift = NULL;
+    int bits, remaining_bits, is_negative = 0;
+    int chunk_size = (sizeof(long) < 8) ? 30 : 62;
+    if (likely(PyLong_CheckExact(x))) {
+        v = __Pyx_NewRef(x);
+    } else {
+        v = PyNumber_Long(x);
+        if (unlikely(!v)) return (int) -1;
+        assert(PyLong_CheckExact(v));
+    }
+    {
+        int result = PyObject_RichCompareBool(v, Py_False, Py_LT);
+        if (unlikely(result < 0)) {
+            Py_DECREF(v);
+            return (int) -1;
+        }
+        is_negative = result == 1;
+    }
+    if (is_unsigned && unlikely(is_negative)) {
+        Py_DECREF(v);
+        PyErr_SetString(PyExc_OverflowError,
+            "can't convert negative value to int");
+        return (int) -1;
+    } else if (is_negative) {
+        stepval = PyNumber_Invert(v);
+        Py_DECREF(v);
+        if (unlikely(!stepval))
+            return (int) -1;
+    } else {
+        stepval = v;
+    }
+    v = NULL;
+    val = (int) 0;
+    mask = PyLong_FromLong((1L << chunk_size) - 1); if (unlikely(!mask)) goto done;
+    shift = PyLong_FromLong(chunk_size); if (unlikely(!shift)) goto done;
+    for (bits = 0; bits < (int) sizeof(int) * 8 - chunk_size; bits += chunk_size) {
+        PyObject *tmp, *digit;
+        long idigit;
+        digit = PyNumber_And(stepval, mask);
+        if (unlikely(!digit)) goto done;
+        idigit = PyLong_AsLong(digit);
+        Py_DECREF(digit);
+        if (unlikely(idigit < 0)) goto done;
+        val |= ((int) idigit) << bits;
+        tmp = PyNumber_Rshift(stepval, shift);
+        if (unlikely(!tmp)) goto done;
+        Py_DECREF(stepval); stepval = tmp;
+    }
+    Py_DECREF(shift); shift = NULL;
+    Py_DECREF(mask); mask = NULL;
+    {
+        long idigit = PyLong_AsLong(stepval);
+        if (unlikely(idigit < 0)) goto done;
+        remaining_bits = ((int) sizeof(int) * 8) - bits - (is_unsigned ? 0 : 1);
+        if (unlikely(idigit >= (1L << remaining_bits)))
+            goto raise_overflow;
+        val |= ((int) idigit) << bits;
+    }
+    if (!is_unsigned) {
+        if (unlikely(val & (((int) 1) << (sizeof(int) * 8 - 1))))
+            goto raise_overflow;
+        if (is_negative)
+            val = ~val;
+    }
+    ret = 0;
+done:
+    Py_XDECREF(shift);
+    Py_XDECREF(mask);
+    Py_XDECREF(stepval);
+#endif
+    if (unlikely(ret))
+        return (int) -1;
+    return val;
+raise_overflow:
+    return __Pyx_raise_overflow___Pyx_PyLong_As_int();
+}
+static CYTHON_INLINE int __Pyx_PyLong___Pyx_PyLong_As_int(PyObject *x) {
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Wconversion"
+#endif
+    const int neg_one = (int) -1, const_zero = (int) 0;
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic pop
+#endif
+    const int is_unsigned = neg_one > const_zero;
+    if (is_unsigned) {
+        #if CYTHON_USE_PYLONG_INTERNALS
+        if (unlikely(__Pyx_PyLong_IsNeg(x))) {
+            goto raise_neg_overflow;
+        } else if (__Pyx_PyLong_IsCompact(x)) {
+            __PYX_VERIFY_RETURN_INT(int, __Pyx_compact_upylong, __Pyx_PyLong_CompactValueUnsigned(x))
+        } else
+        #endif
+        {
+            return __Pyx_PyULong___Pyx_PyLong_As_int(x);
+        }
+    } else {
+        #if CYTHON_USE_PYLONG_INTERNALS
+        if (__Pyx_PyLong_IsCompact(x)) {
+            __PYX_VERIFY_RETURN_INT(int, __Pyx_compact_pylong, __Pyx_PyLong_CompactValue(x))
+        } else
+        #endif
+        {
+            return __Pyx_PySLong___Pyx_PyLong_As_int(x);
+        }
+    }
+#if CYTHON_USE_PYLONG_INTERNALS
+raise_neg_overflow:
+    return __Pyx_raise_neg_overflow___Pyx_PyLong_As_int();
+raise_overflow:
+    return __Pyx_raise_overflow___Pyx_PyLong_As_int();
+#endif
+}
+static int __Pyx_NonPyLong___Pyx_PyLong_As_int(PyObject *x) {
+    int val;
+    PyObject *tmp = __Pyx_PyNumber_Long(x);
+    if (!tmp) return (int) -1;
+    val = __Pyx_PyLong_As_int(tmp);
+    Py_DECREF(tmp);
+    return val;
+}
+static CYTHON_INLINE int __Pyx_PyLong_As_int(PyObject *x) {
+    if (likely(PyLong_Check(x))) {
+        return __Pyx_PyLong___Pyx_PyLong_As_int(x);
+    } else {
+        return __Pyx_NonPyLong___Pyx_PyLong_As_int(x);
+    }
+}
+
+/* CIntFromPy */
+static uint8_t __Pyx_LargePyLong___Pyx_PyLong_As_uint8_t(PyObject *x);
+static uint8_t __Pyx_raise_neg_overflow___Pyx_PyLong_As_uint8_t(void) {
+    const char* type_name = "uint8_t";
+    PyErr_Format(PyExc_OverflowError,
+        "can't convert negative value to %.200s", type_name);
+    return (uint8_t) -1;
+}
+static uint8_t __Pyx_raise_overflow___Pyx_PyLong_As_uint8_t(void) {
+    const char* type_name = "uint8_t";
+    PyErr_Format(PyExc_OverflowError,
+        "value too large to convert to %.200s", type_name);
+    return (uint8_t) -1;
+}
+static CYTHON_INLINE uint8_t __Pyx_PyULong___Pyx_PyLong_As_uint8_t(PyObject *x) {
+    const int is_unsigned = 1;
+#if CYTHON_USE_PYLONG_INTERNALS
+    {
+        const digit* digits = __Pyx_PyLong_Digits(x);
+        const Py_ssize_t size = __Pyx_PyLong_DigitCount(x);
+        if (size == 2 && (8 * sizeof(uint8_t) > 1 * PyLong_SHIFT)) {
+            if ((8 * sizeof(unsigned long) > 2 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(uint8_t, unsigned long, (((((unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(uint8_t) >= 2 * PyLong_SHIFT)) {
+                return (uint8_t) (((((uint8_t)digits[1]) << PyLong_SHIFT) | (uint8_t)digits[0]));
+            }
+        } else
+        if (size == 3 && (8 * sizeof(uint8_t) > 2 * PyLong_SHIFT)) {
+            if ((8 * sizeof(unsigned long) > 3 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(uint8_t, unsigned long, (((((((unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(uint8_t) >= 3 * PyLong_SHIFT)) {
+                return (uint8_t) (((((((uint8_t)digits[2]) << PyLong_SHIFT) | (uint8_t)digits[1]) << PyLong_SHIFT) | (uint8_t)digits[0]));
+            }
+        } else
+        if (size == 4 && (8 * sizeof(uint8_t) > 3 * PyLong_SHIFT)) {
+            if ((8 * sizeof(unsigned long) > 4 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(uint8_t, unsigned long, (((((((((unsigned long)digits[3]) << PyLong_SHIFT) | (unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(uint8_t) >= 4 * PyLong_SHIFT)) {
+                return (uint8_t) (((((((((uint8_t)digits[3]) << PyLong_SHIFT) | (uint8_t)digits[2]) << PyLong_SHIFT) | (uint8_t)digits[1]) << PyLong_SHIFT) | (uint8_t)digits[0]));
+            }
+        } else
+        {}
+    }
+#elif CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX < 0x030C00A7
+    if (unlikely(Py_SIZE(x) < 0)) {
+        goto raise_neg_overflow;
+    }
+#else
+    {
+        int result = PyObject_RichCompareBool(x, Py_False, Py_LT);
+        if (unlikely(result < 0))
+            return (uint8_t) -1;
+        if (unlikely(result == 1))
+            goto raise_neg_overflow;
+    }
+#endif
+    if ((sizeof(uint8_t) <= sizeof(unsigned long))) {
+        __PYX_VERIFY_RETURN_INT_EXC(uint8_t, unsigned long, PyLong_AsUnsignedLong(x))
+    } else if ((sizeof(uint8_t) <= sizeof(unsigned PY_LONG_LONG))) {
+        __PYX_VERIFY_RETURN_INT_EXC(uint8_t, unsigned PY_LONG_LONG, PyLong_AsUnsignedLongLong(x))
+    }
+    return __Pyx_LargePyLong___Pyx_PyLong_As_uint8_t(x);
+raise_neg_overflow:
+    return __Pyx_raise_neg_overflow___Pyx_PyLong_As_uint8_t();
+raise_overflow:
+    return __Pyx_raise_overflow___Pyx_PyLong_As_uint8_t();
+}
+static CYTHON_INLINE uint8_t __Pyx_PySLong___Pyx_PyLong_As_uint8_t(PyObject *x) {
+    const int is_unsigned = 0;
+#if CYTHON_USE_PYLONG_INTERNALS
+    if (__Pyx_PyLong_IsNeg(x)) {
+        const Py_ssize_t size = __Pyx_PyLong_DigitCount(x);
+        const digit* digits = __Pyx_PyLong_Digits(x);
+        if (size == 2 && (8 * sizeof(uint8_t) > 1 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 2 * PyLong_SHIFT)) {
+                long ival = - (long) (((((unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0]));
+                __PYX_VERIFY_RETURN_INT(uint8_t, long, ival)
+            } else if ((8 * sizeof(uint8_t) - 1 > 2 * PyLong_SHIFT)) {
+                return (uint8_t) (((uint8_t) -1) * (((((uint8_t)digits[1]) << PyLong_SHIFT) | (uint8_t)digits[0])));
+            }
+        } else
+        if (size == 3 && (8 * sizeof(uint8_t) > 2 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 3 * PyLong_SHIFT)) {
+                long ival = - (long) (((((((unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0]));
+                __PYX_VERIFY_RETURN_INT(uint8_t, long, ival)
+            } else if ((8 * sizeof(uint8_t) - 1 > 3 * PyLong_SHIFT)) {
+                return (uint8_t) (((uint8_t) -1) * (((((((uint8_t)digits[2]) << PyLong_SHIFT) | (uint8_t)digits[1]) << PyLong_SHIFT) | (uint8_t)digits[0])));
+            }
+        } else
+        if (size == 4 && (8 * sizeof(uint8_t) > 3 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 4 * PyLong_SHIFT)) {
+                long ival = - (long) (((((((((unsigned long)digits[3]) << PyLong_SHIFT) | (unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0]));
+                __PYX_VERIFY_RETURN_INT(uint8_t, long, ival)
+            } else if ((8 * sizeof(uint8_t) - 1 > 4 * PyLong_SHIFT)) {
+                return (uint8_t) (((uint8_t) -1) * (((((((((uint8_t)digits[3]) << PyLong_SHIFT) | (uint8_t)digits[2]) << PyLong_SHIFT) | (uint8_t)digits[1]) << PyLong_SHIFT) | (uint8_t)digits[0])));
+            }
+        } else
+        {}
+    } else {
+        const Py_ssize_t size = __Pyx_PyLong_DigitCount(x);
+        const digit* digits = __Pyx_PyLong_Digits(x);
+        if (size == 2 && (8 * sizeof(uint8_t) > 1 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 2 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(uint8_t, unsigned long, (((((unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(uint8_t) - 1 > 2 * PyLong_SHIFT)) {
+                return (uint8_t) (((((uint8_t)digits[1]) << PyLong_SHIFT) | (uint8_t)digits[0]));
+            }
+        } else
+        if (size == 3 && (8 * sizeof(uint8_t) > 2 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 3 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(uint8_t, unsigned long, (((((((unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(uint8_t) - 1 > 3 * PyLong_SHIFT)) {
+                return (uint8_t) (((((((uint8_t)digits[2]) << PyLong_SHIFT) | (uint8_t)digits[1]) << PyLong_SHIFT) | (uint8_t)digits[0]));
+            }
+        } else
+        if (size == 4 && (8 * sizeof(uint8_t) > 3 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 4 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(uint8_t, unsigned long, (((((((((unsigned long)digits[3]) << PyLong_SHIFT) | (unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(uint8_t) - 1 > 4 * PyLong_SHIFT)) {
+                return (uint8_t) (((((((((uint8_t)digits[3]) << PyLong_SHIFT) | (uint8_t)digits[2]) << PyLong_SHIFT) | (uint8_t)digits[1]) << PyLong_SHIFT) | (uint8_t)digits[0]));
+            }
+        } else
+        {}
+    }
+#endif
+    #if __PYX_LIMITED_VERSION_HEX >= 0x030d0000
+    if ((sizeof(uint8_t) <= sizeof(int)) && (sizeof(int) < sizeof(long))) {
+        __PYX_VERIFY_RETURN_INT_EXC(uint8_t, int, PyLong_AsInt(x))
+    } else
+    #endif
+    if ((sizeof(uint8_t) <= sizeof(long))) {
+        __PYX_VERIFY_RETURN_INT_EXC(uint8_t, long, PyLong_AsLong(x))
+    } else if ((sizeof(uint8_t) <= sizeof(PY_LONG_LONG))) {
+        __PYX_VERIFY_RETURN_INT_EXC(uint8_t, PY_LONG_LONG, PyLong_AsLongLong(x))
+    }
+    return __Pyx_LargePyLong___Pyx_PyLong_As_uint8_t(x);
+raise_neg_overflow:
+    return __Pyx_raise_neg_overflow___Pyx_PyLong_As_uint8_t();
+raise_overflow:
+    return __Pyx_raise_overflow___Pyx_PyLong_As_uint8_t();
+}
+static uint8_t __Pyx_LargePyLong___Pyx_PyLong_As_uint8_t(PyObject *x) {
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Wconversion"
+#endif
+    const uint8_t neg_one = (uint8_t) -1, const_zero = (uint8_t) 0;
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic pop
+#endif
+    const int is_unsigned = neg_one > const_zero;
+    uint8_t val;
+    int ret = -1;
+#if PY_VERSION_HEX >= 0x030d00A6 && !CYTHON_COMPILING_IN_LIMITED_API
+    Py_ssize_t bytes_copied = PyLong_AsNativeBytes(
+        x, &val, sizeof(val), Py_ASNATIVEBYTES_NATIVE_ENDIAN | (is_unsigned ? Py_ASNATIVEBYTES_UNSIGNED_BUFFER | Py_ASNATIVEBYTES_REJECT_NEGATIVE : 0));
+    if (unlikely(bytes_copied == -1)) {
+    } else if (unlikely(bytes_copied > (Py_ssize_t) sizeof(val))) {
+        goto raise_overflow;
+    } else {
+        ret = 0;
+    }
+#elif PY_VERSION_HEX < 0x030d0000 && !(CYTHON_COMPILING_IN_PYPY || CYTHON_COMPILING_IN_LIMITED_API) || defined(_PyLong_AsByteArray)
+    int one = 1; int is_little = (int)*(unsigned char *)&one;
+    unsigned char *bytes = (unsigned char *)&val;
+    ret = _PyLong_AsByteArray((PyLongObject *)x,
+                                bytes, sizeof(val),
+                                is_little, !is_unsigned);
+    if ((0)) goto raise_overflow;
+#else
+    PyObject *v;
+    PyObject *stepval = NULL, *mask = NULL, *shift = NULL;
+    int bits, remaining_bits, is_negative = 0;
+    int chunk_size = (sizeof(long) < 8) ? 30 : 62;
+    if (likely(PyLong_CheckExact(x))) {
+        v = __Pyx_NewRef(x);
+    } else {
+        v = PyNumber_Long(x);
+        if (unlikely(!v)) return (uint8_t) -1;
+        assert(PyLong_CheckExact(v));
+    }
+    {
+        int result = PyObject_RichCompareBool(v, Py_False, Py_LT);
+        if (unlikely(result < 0)) {
+            Py_DECREF(v);
+            return (uint8_t) -1;
+        }
+        is_negative = result == 1;
+    }
+    if (is_unsigned && unlikely(is_negative)) {
+        Py_DECREF(v);
+        PyErr_SetString(PyExc_OverflowError,
+            "can't convert negative value to uint8_t");
+        return (uint8_t) -1;
+    } else if (is_negative) {
+        stepval = PyNumber_Invert(v);
+        Py_DECREF(v);
+        if (unlikely(!stepval))
+            return (uint8_t) -1;
+    } else {
+        stepval = v;
+    }
+    v = NULL;
+    val = (uint8_t) 0;
+    mask = PyLong_FromLong((1L << chunk_size) - 1); if (unlikely(!mask)) goto done;
+    shift = PyLong_FromLong(chunk_size); if (unlikely(!shift)) goto done;
+    for (bits = 0; bits < (int) sizeof(uint8_t) * 8 - chunk_size; bits += chunk_size) {
+        PyObject *tmp, *digit;
+        long idigit;
+        digit = PyNumber_And(stepval, mask);
+        if (unlikely(!digit)) goto done;
+        idigit = PyLong_AsLong(digit);
+        Py_DECREF(digit);
+        if (unlikely(idigit < 0)) goto done;
+        val |= ((uint8_t) idigit) << bits;
+        tmp = PyNumber_Rshift(stepval, shift);
+        if (unlikely(!tmp)) goto done;
+        Py_DECREF(stepval); stepval = tmp;
+    }
+    Py_DECREF(shift); shift = NULL;
+    Py_DECREF(mask); mask = NULL;
+    {
+        long idigit = PyLong_AsLong(stepval);
+        if (unlikely(idigit < 0)) goto done;
+        remaining_bits = ((int) sizeof(uint8_t) * 8) - bits - (is_unsigned ? 0 : 1);
+        if (unlikely(idigit >= (1L << remaining_bits)))
+            goto raise_overflow;
+        val |= ((uint8_t) idigit) << bits;
+    }
+    if (!is_unsigned) {
+        if (unlikely(val & (((uint8_t) 1) << (sizeof(uint8_t) * 8 - 1))))
+            goto raise_overflow;
+        if (is_negative)
+            val = ~val;
+    }
+    ret = 0;
+done:
+    Py_XDECREF(shift);
+    Py_XDECREF(mask);
+    Py_XDECREF(stepval);
+#endif
+    if (unlikely(ret))
+        return (uint8_t) -1;
+    return val;
+raise_overflow:
+    return __Pyx_raise_overflow___Pyx_PyLong_As_uint8_t();
+}
+static CYTHON_INLINE uint8_t __Pyx_PyLong___Pyx_PyLong_As_uint8_t(PyObject *x) {
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Wconversion"
+#endif
+    const uint8_t neg_one = (uint8_t) -1, const_zero = (uint8_t) 0;
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic pop
+#endif
+    const int is_unsigned = neg_one > const_zero;
+    if (is_unsigned) {
+        #if CYTHON_USE_PYLONG_INTERNALS
+        if (unlikely(__Pyx_PyLong_IsNeg(x))) {
+            goto raise_neg_overflow;
+        } else if (__Pyx_PyLong_IsCompact(x)) {
+            __PYX_VERIFY_RETURN_INT(uint8_t, __Pyx_compact_upylong, __Pyx_PyLong_CompactValueUnsigned(x))
+        } else
+        #endif
+        {
+            return __Pyx_PyULong___Pyx_PyLong_As_uint8_t(x);
+        }
+    } else {
+        #if CYTHON_USE_PYLONG_INTERNALS
+        if (__Pyx_PyLong_IsCompact(x)) {
+            __PYX_VERIFY_RETURN_INT(uint8_t, __Pyx_compact_pylong, __Pyx_PyLong_CompactValue(x))
+        } else
+        #endif
+        {
+            return __Pyx_PySLong___Pyx_PyLong_As_uint8_t(x);
+        }
+    }
+#if CYTHON_USE_PYLONG_INTERNALS
+raise_neg_overflow:
+    return __Pyx_raise_neg_overflow___Pyx_PyLong_As_uint8_t();
+raise_overflow:
+    return __Pyx_raise_overflow___Pyx_PyLong_As_uint8_t();
+#endif
+}
+static uint8_t __Pyx_NonPyLong___Pyx_PyLong_As_uint8_t(PyObject *x) {
+    uint8_t val;
+    PyObject *tmp = __Pyx_PyNumber_Long(x);
+    if (!tmp) return (uint8_t) -1;
+    val = __Pyx_PyLong_As_uint8_t(tmp);
+    Py_DECREF(tmp);
+    return val;
+}
+static CYTHON_INLINE uint8_t __Pyx_PyLong_As_uint8_t(PyObject *x) {
+    if (likely(PyLong_Check(x))) {
+        return __Pyx_PyLong___Pyx_PyLong_As_uint8_t(x);
+    } else {
+        return __Pyx_NonPyLong___Pyx_PyLong_As_uint8_t(x);
+    }
+}
+
+/* CIntFromPy */
+static long __Pyx_LargePyLong___Pyx_PyLong_As_long(PyObject *x);
+static long __Pyx_raise_neg_overflow___Pyx_PyLong_As_long(void) {
+    const char* type_name = "long";
+    PyErr_Format(PyExc_OverflowError,
+        "can't convert negative value to %.200s", type_name);
+    return (long) -1;
+}
+static long __Pyx_raise_overflow___Pyx_PyLong_As_long(void) {
+    const char* type_name = "long";
+    PyErr_Format(PyExc_OverflowError,
+        "value too large to convert to %.200s", type_name);
+    return (long) -1;
+}
+static CYTHON_INLINE long __Pyx_PyULong___Pyx_PyLong_As_long(PyObject *x) {
+    const int is_unsigned = 1;
+#if CYTHON_USE_PYLONG_INTERNALS
+    {
+        const digit* digits = __Pyx_PyLong_Digits(x);
+        const Py_ssize_t size = __Pyx_PyLong_DigitCount(x);
+        if (size == 2 && (8 * sizeof(long) > 1 * PyLong_SHIFT)) {
+            if ((8 * sizeof(unsigned long) > 2 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(long, unsigned long, (((((unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(long) >= 2 * PyLong_SHIFT)) {
+                return (long) (((((long)digits[1]) << PyLong_SHIFT) | (long)digits[0]));
+            }
+        } else
+        if (size == 3 && (8 * sizeof(long) > 2 * PyLong_SHIFT)) {
+            if ((8 * sizeof(unsigned long) > 3 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(long, unsigned long, (((((((unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(long) >= 3 * PyLong_SHIFT)) {
+                return (long) (((((((long)digits[2]) << PyLong_SHIFT) | (long)digits[1]) << PyLong_SHIFT) | (long)digits[0]));
+            }
+        } else
+        if (size == 4 && (8 * sizeof(long) > 3 * PyLong_SHIFT)) {
+            if ((8 * sizeof(unsigned long) > 4 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(long, unsigned long, (((((((((unsigned long)digits[3]) << PyLong_SHIFT) | (unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(long) >= 4 * PyLong_SHIFT)) {
+                return (long) (((((((((long)digits[3]) << PyLong_SHIFT) | (long)digits[2]) << PyLong_SHIFT) | (long)digits[1]) << PyLong_SHIFT) | (long)digits[0]));
+            }
+        } else
+        {}
+    }
+#elif CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX < 0x030C00A7
+    if (unlikely(Py_SIZE(x) < 0)) {
+        goto raise_neg_overflow;
+    }
+#else
+    {
+        int result = PyObject_RichCompareBool(x, Py_False, Py_LT);
+        if (unlikely(result < 0))
+            return (long) -1;
+        if (unlikely(result == 1))
+            goto raise_neg_overflow;
+    }
+#endif
+    if ((sizeof(long) <= sizeof(unsigned long))) {
+        __PYX_VERIFY_RETURN_INT_EXC(long, unsigned long, PyLong_AsUnsignedLong(x))
+    } else if ((sizeof(long) <= sizeof(unsigned PY_LONG_LONG))) {
+        __PYX_VERIFY_RETURN_INT_EXC(long, unsigned PY_LONG_LONG, PyLong_AsUnsignedLongLong(x))
+    }
+    return __Pyx_LargePyLong___Pyx_PyLong_As_long(x);
+raise_neg_overflow:
+    return __Pyx_raise_neg_overflow___Pyx_PyLong_As_long();
+raise_overflow:
+    return __Pyx_raise_overflow___Pyx_PyLong_As_long();
+}
+static CYTHON_INLINE long __Pyx_PySLong___Pyx_PyLong_As_long(PyObject *x) {
+    const int is_unsigned = 0;
+#if CYTHON_USE_PYLONG_INTERNALS
+    if (__Pyx_PyLong_IsNeg(x)) {
+        const Py_ssize_t size = __Pyx_PyLong_DigitCount(x);
+        const digit* digits = __Pyx_PyLong_Digits(x);
+        if (size == 2 && (8 * sizeof(long) > 1 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 2 * PyLong_SHIFT)) {
+                long ival = - (long) (((((unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0]));
+                __PYX_VERIFY_RETURN_INT(long, long, ival)
+            } else if ((8 * sizeof(long) - 1 > 2 * PyLong_SHIFT)) {
+                return (long) (((long) -1) * (((((long)digits[1]) << PyLong_SHIFT) | (long)digits[0])));
+            }
+        } else
+        if (size == 3 && (8 * sizeof(long) > 2 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 3 * PyLong_SHIFT)) {
+                long ival = - (long) (((((((unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0]));
+                __PYX_VERIFY_RETURN_INT(long, long, ival)
+            } else if ((8 * sizeof(long) - 1 > 3 * PyLong_SHIFT)) {
+                return (long) (((long) -1) * (((((((long)digits[2]) << PyLong_SHIFT) | (long)digits[1]) << PyLong_SHIFT) | (long)digits[0])));
+            }
+        } else
+        if (size == 4 && (8 * sizeof(long) > 3 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 4 * PyLong_SHIFT)) {
+                long ival = - (long) (((((((((unsigned long)digits[3]) << PyLong_SHIFT) | (unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0]));
+                __PYX_VERIFY_RETURN_INT(long, long, ival)
+            } else if ((8 * sizeof(long) - 1 > 4 * PyLong_SHIFT)) {
+                return (long) (((long) -1) * (((((((((long)digits[3]) << PyLong_SHIFT) | (long)digits[2]) << PyLong_SHIFT) | (long)digits[1]) << PyLong_SHIFT) | (long)digits[0])));
+            }
+        } else
+        {}
+    } else {
+        const Py_ssize_t size = __Pyx_PyLong_DigitCount(x);
+        const digit* digits = __Pyx_PyLong_Digits(x);
+        if (size == 2 && (8 * sizeof(long) > 1 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 2 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(long, unsigned long, (((((unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(long) - 1 > 2 * PyLong_SHIFT)) {
+                return (long) (((((long)digits[1]) << PyLong_SHIFT) | (long)digits[0]));
+            }
+        } else
+        if (size == 3 && (8 * sizeof(long) > 2 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 3 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(long, unsigned long, (((((((unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(long) - 1 > 3 * PyLong_SHIFT)) {
+                return (long) (((((((long)digits[2]) << PyLong_SHIFT) | (long)digits[1]) << PyLong_SHIFT) | (long)digits[0]));
+            }
+        } else
+        if (size == 4 && (8 * sizeof(long) > 3 * PyLong_SHIFT)) {
+            if ((8 * sizeof(long) > 4 * PyLong_SHIFT)) {
+                __PYX_VERIFY_RETURN_INT(long, unsigned long, (((((((((unsigned long)digits[3]) << PyLong_SHIFT) | (unsigned long)digits[2]) << PyLong_SHIFT) | (unsigned long)digits[1]) << PyLong_SHIFT) | (unsigned long)digits[0])))
+            } else if ((8 * sizeof(long) - 1 > 4 * PyLong_SHIFT)) {
+                return (long) (((((((((long)digits[3]) << PyLong_SHIFT) | (long)digits[2]) << PyLong_SHIFT) | (long)digits[1]) << PyLong_SHIFT) | (long)digits[0]));
+            }
+        } else
+        {}
+    }
+#endif
+    #if __PYX_LIMITED_VERSION_HEX >= 0x030d0000
+    if ((sizeof(long) <= sizeof(int)) && (sizeof(int) < sizeof(long))) {
+        __PYX_VERIFY_RETURN_INT_EXC(long, int, PyLong_AsInt(x))
+    } else
+    #endif
+    if ((sizeof(long) <= sizeof(long))) {
+        __PYX_VERIFY_RETURN_INT_EXC(long, long, PyLong_AsLong(x))
+    } else if ((sizeof(long) <= sizeof(PY_LONG_LONG))) {
+        __PYX_VERIFY_RETURN_INT_EXC(long, PY_LONG_LONG, PyLong_AsLongLong(x))
+    }
+    return __Pyx_LargePyLong___Pyx_PyLong_As_long(x);
+raise_neg_overflow:
+    return __Pyx_raise_neg_overflow___Pyx_PyLong_As_long();
+raise_overflow:
+    return __Pyx_raise_overflow___Pyx_PyLong_As_long();
+}
+static long __Pyx_LargePyLong___Pyx_PyLong_As_long(PyObject *x) {
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Wconversion"
+#endif
+    const long neg_one = (long) -1, const_zero = (long) 0;
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic pop
+#endif
+    const int is_unsigned = neg_one > const_zero;
+    long val;
+    int ret = -1;
+#if PY_VERSION_HEX >= 0x030d00A6 && !CYTHON_COMPILING_IN_LIMITED_API
+    Py_ssize_t bytes_copied = PyLong_AsNativeBytes(
+        x, &val, sizeof(val), Py_ASNATIVEBYTES_NATIVE_ENDIAN | (is_unsigned ? Py_ASNATIVEBYTES_UNSIGNED_BUFFER | Py_ASNATIVEBYTES_REJECT_NEGATIVE : 0));
+    if (unlikely(bytes_copied == -1)) {
+    } else if (unlikely(bytes_copied > (Py_ssize_t) sizeof(val))) {
+        goto raise_overflow;
+    } else {
+        ret = 0;
+    }
+#elif PY_VERSION_HEX < 0x030d0000 && !(CYTHON_COMPILING_IN_PYPY || CYTHON_COMPILING_IN_LIMITED_API) || defined(_PyLong_AsByteArray)
+    int one = 1; int is_little = (int)*(unsigned char *)&one;
+    unsigned char *bytes = (unsigned char *)&val;
+    ret = _PyLong_AsByteArray((PyLongObject *)x,
+                                bytes, sizeof(val),
+                                is_little, !is_unsigned);
+    if ((0)) goto raise_overflow;
+#else
+    PyObject *v;
+    PyObject *stepval = NULL, *mask = NULL, *shift = NULL;
+    int bits, remaining_bits, is_negative = 0;
+    int chunk_size = (sizeof(long) < 8) ? 30 : 62;
+    if (likely(PyLong_CheckExact(x))) {
+        v = __Pyx_NewRef(x);
+    } else {
+        v = PyNumber_Long(x);
+        if (unlikely(!v)) return (long) -1;
+        assert(PyLong_CheckExact(v));
+    }
+    {
+        int result = PyObject_RichCompareBool(v, Py_False, Py_LT);
+        if (unlikely(result < 0)) {
+            Py_DECREF(v);
+            return (long) -1;
+        }
+        is_negative = result == 1;
+    }
+    if (is_unsigned && unlikely(is_negative)) {
+        Py_DECREF(v);
+        PyErr_SetString(PyExc_OverflowError,
+            "can't convert negative value to long");
+        return (long) -1;
+    } else if (is_negative) {
+        stepval = PyNumber_Invert(v);
+        Py_DECREF(v);
+        if (unlikely(!stepval))
+            return (long) -1;
+    } else {
+        stepval = v;
+    }
+    v = NULL;
+    val = (long) 0;
+    mask = PyLong_FromLong((1L << chunk_size) - 1); if (unlikely(!mask)) goto done;
+    shift = PyLong_FromLong(chunk_size); if (unlikely(!shift)) goto done;
+    for (bits = 0; bits < (int) sizeof(long) * 8 - chunk_size; bits += chunk_size) {
+        PyObject *tmp, *digit;
+        long idigit;
+        digit = PyNumber_And(stepval, mask);
+        if (unlikely(!digit)) goto done;
+        idigit = PyLong_AsLong(digit);
+        Py_DECREF(digit);
+        if (unlikely(idigit < 0)) goto done;
+        val |= ((long) idigit) << bits;
+        tmp = PyNumber_Rshift(stepval, shift);
+        if (unlikely(!tmp)) goto done;
+        Py_DECREF(stepval); stepval = tmp;
+    }
+    Py_DECREF(shift); shift = NULL;
+    Py_DECREF(mask); mask = NULL;
+    {
+        long idigit = PyLong_AsLong(stepval);
+        if (unlikely(idigit < 0)) goto done;
+        remaining_bits = ((int) sizeof(long) * 8) - bits - (is_unsigned ? 0 : 1);
+        if (unlikely(idigit >= (1L << remaining_bits)))
+            goto raise_overflow;
+        val |= ((long) idigit) << bits;
+    }
+    if (!is_unsigned) {
+        if (unlikely(val & (((long) 1) << (sizeof(long) * 8 - 1))))
+            goto raise_overflow;
+        if (is_negative)
+            val = ~val;
+    }
+    ret = 0;
+done:
+    Py_XDECREF(shift);
+    Py_XDECREF(mask);
+    Py_XDECREF(stepval);
+#endif
+    if (unlikely(ret))
+        return (long) -1;
+    return val;
+raise_overflow:
+    return __Pyx_raise_overflow___Pyx_PyLong_As_long();
+}
+static CYTHON_INLINE long __Pyx_PyLong___Pyx_PyLong_As_long(PyObject *x) {
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Wconversion"
+#endif
+    const long neg_one = (long) -1, const_zero = (long) 0;
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic pop
+#endif
+    const int is_unsigned = neg_one > const_zero;
+    if (is_unsigned) {
+        #if CYTHON_USE_PYLONG_INTERNALS
+        if (unlikely(__Pyx_PyLong_IsNeg(x))) {
+            goto raise_neg_overflow;
+        } else if (__Pyx_PyLong_IsCompact(x)) {
+            __PYX_VERIFY_RETURN_INT(long, __Pyx_compact_upylong, __Pyx_PyLong_CompactValueUnsigned(x))
+        } else
+        #endif
+        {
+            return __Pyx_PyULong___Pyx_PyLong_As_long(x);
+        }
+    } else {
+        #if CYTHON_USE_PYLONG_INTERNALS
+        if (__Pyx_PyLong_IsCompact(x)) {
+            __PYX_VERIFY_RETURN_INT(long, __Pyx_compact_pylong, __Pyx_PyLong_CompactValue(x))
+        } else
+        #endif
+        {
+            return __Pyx_PySLong___Pyx_PyLong_As_long(x);
+        }
+    }
+#if CYTHON_USE_PYLONG_INTERNALS
+raise_neg_overflow:
+    return __Pyx_raise_neg_overflow___Pyx_PyLong_As_long();
+raise_overflow:
+    return __Pyx_raise_overflow___Pyx_PyLong_As_long();
+#endif
+}
+static long __Pyx_NonPyLong___Pyx_PyLong_As_long(PyObject *x) {
+    long val;
+    PyObject *tmp = __Pyx_PyNumber_Long(x);
+    if (!tmp) return (long) -1;
+    val = __Pyx_PyLong_As_long(tmp);
+    Py_DECREF(tmp);
+    return val;
+}
+static CYTHON_INLINE long __Pyx_PyLong_As_long(PyObject *x) {
+    if (likely(PyLong_Check(x))) {
+        return __Pyx_PyLong___Pyx_PyLong_As_long(x);
+    } else {
+        return __Pyx_NonPyLong___Pyx_PyLong_As_long(x);
+    }
+}
+
+/* CIntToPy */
+static CYTHON_INLINE PyObject* __Pyx_PyLong_From_long(long value) {
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic push
+#pragma GCC diagnostic ignored "-Wconversion"
+#endif
+    const long neg_one = (long) -1, const_zero = (long) 0;
+#ifdef __Pyx_HAS_GCC_DIAGNOSTIC
+#pragma GCC diagnostic pop
+#endif
+    const int is_unsigned = neg_one > const_zero;
+    if (is_unsigned) {
+        if (sizeof(long) < sizeof(long)) {
+            return PyLong_FromLong((long) value);
+        } else if (sizeof(long) <= sizeof(unsigned long)) {
+            return PyLong_FromUnsignedLong((unsigned long) value);
+#if !CYTHON_COMPILING_IN_PYPY
+        } else if (sizeof(long) <= sizeof(unsigned PY_LONG_LONG)) {
+            return PyLong_FromUnsignedLongLong((unsigned PY_LONG_LONG) value);
+#endif
+        }
+    } else {
+        if (sizeof(long) <= sizeof(long)) {
+            return PyLong_FromLong((long) value);
+        } else if (sizeof(long) <= sizeof(PY_LONG_LONG)) {
+            return PyLong_FromLongLong((PY_LONG_LONG) value);
+        }
+    }
+    {
+        unsigned char *bytes = (unsigned char *)&value;
+#if !CYTHON_COMPILING_IN_LIMITED_API && PY_VERSION_HEX >= 0x030d00A4
+        if (is_unsigned) {
+            return PyLong_FromUnsignedNativeBytes(bytes, sizeof(value), -1);
+        } else {
+            return PyLong_FromNativeBytes(bytes, sizeof(value), -1);
+        }
+#elif !CYTHON_COMPILING_IN_LIMITED_API && PY_VERSION_HEX < 0x030d0000
+        int one = 1; int little = (int)*(unsigned char *)&one;
+        return _PyLong_FromByteArray(bytes, sizeof(long),
+                                     little, !is_unsigned);
+#else
+        int one = 1; int little = (int)*(unsigned char *)&one;
+        PyObject *result = NULL, *kwds = NULL;
+        PyObject *py_bytes = NULL, *order_str = NULL, *from_bytes_str = NULL;;
+        py_bytes = PyBytes_FromStringAndSize((char*)bytes, sizeof(long));
+        if (!py_bytes) goto limited_bad;
+        from_bytes_str = PyUnicode_FromStringAndSize("from_bytes", 10);
+        if (!from_bytes_str) goto limited_bad;
+        order_str = PyUnicode_FromString(little ? "little" : "big");
+        if (!order_str) goto limited_bad;
+        {
+            PyObject *args[] = { (PyObject*)&PyLong_Type, py_bytes, order_str, Py_True };
+            if (!is_unsigned) {
+                PyObject *signed_str = PyUnicode_FromStringAndSize("signed", 6);
+                if (!signed_str) goto limited_bad;
+#if CYTHON_VECTORCALL
+                kwds = PyTuple_Pack(1, signed_str);
+#else
+                {
+                    PyObject *keys[] = {signed_str};
+                    PyObject *values[] = {Py_True};
+                    kwds = __Pyx_MakeKwargDict(keys, values, 1);
+                }
+#endif
+                Py_DECREF(signed_str);
+                if (unlikely(!kwds)) goto limited_bad;
+            }
+            result = __Pyx_Object_VectorcallMethodKwds(from_bytes_str, args, 3 | __Pyx_PY_VECTORCALL_ARGUMENTS_OFFSET, kwds);
+        }
+        limited_bad:
+        Py_XDECREF(kwds);
+        Py_XDECREF(order_str);
+        Py_XDECREF(py_bytes);
+        Py_XDECREF(from_bytes_str);
+        return result;
+#endif
+    }
+}
+
+/* UpdateUnpickledDict */
+static int __Pyx__UpdateUnpickledDict(PyObject *obj, PyObject *state, Py_ssize_t index) {
+    PyObject *state_dict = __Pyx_PySequence_ITEM(state, index);
+    if (unlikely(!state_dict)) {
+        return -1;
+    }
+    int non_empty = PyObject_IsTrue(state_dict);
+    if (non_empty == 0) {
+        Py_DECREF(state_dict);
+        return 0;
+    } else if (unlikely(non_empty == -1)) {
+        return -1;
+    }
+    PyObject *dict;
+    #if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030A0000
+    dict = PyObject_GetAttrString(obj, "__dict__");
+    #else
+    dict = PyObject_GenericGetDict(obj, NULL);
+    #endif
+    if (unlikely(!dict)) {
+        Py_DECREF(state_dict);
+        return -1;
+    }
+    int result;
+    if (likely(PyDict_CheckExact(dict))) {
+        result = PyDict_Update(dict, state_dict);
+    } else {
+        PyObject *obj_result = __Pyx_PyObject_CallMethod1(dict, __pyx_mstate_global->__pyx_n_u_update, state_dict);
+        if (likely(obj_result)) {
+            Py_DECREF(obj_result);
+            result = 0;
+        } else {
+            result = -1;
+        }
+    }
+    Py_DECREF(state_dict);
+    Py_DECREF(dict);
+    return result;
+}
+static int __Pyx_UpdateUnpickledDict(PyObject *obj, PyObject *state, Py_ssize_t index) {
+    Py_ssize_t state_size = __Pyx_PyTuple_GET_SIZE(state);
+    #if !CYTHON_ASSUME_SAFE_SIZE
+    if (unlikely(state_size == -1)) return -1;
+    #endif
+    if (state_size <= index) {
+        return 0;
+    }
+    return __Pyx__UpdateUnpickledDict(obj, state, index);
+}
+
+/* CheckUnpickleChecksum */
+static int __Pyx_CheckUnpickleChecksum(long checksum, long checksum1, long checksum2, long checksum3, const char *members) {
+    int found = 0;
+    found |= checksum1 == checksum;
+    found |= checksum2 == checksum;
+    found |= checksum3 == checksum;
+    if (likely(found))
+        return 0;
+    __Pyx_RaiseUnpickleChecksumError(checksum, checksum1, checksum2, checksum3, members);
+    return -1;
+}
+
+/* GetRuntimeVersion */
+#if __PYX_LIMITED_VERSION_HEX < 0x030b0000
+void __Pyx_init_runtime_version(void) {
+    if (__Pyx_cached_runtime_version == 0) {
+        const char* rt_version = Py_GetVersion();
+        unsigned long version = 0;
+        unsigned long factor = 0x01000000UL;
+        unsigned int digit = 0;
+        int i = 0;
+        while (factor) {
+            while ('0' <= rt_version[i] && rt_version[i] <= '9') {
+                digit = digit * 10 + (unsigned int) (rt_version[i] - '0');
+                ++i;
+            }
+            version += factor * digit;
+            if (rt_version[i] != '.')
+                break;
+            digit = 0;
+            factor >>= 8;
+            ++i;
+        }
+        __Pyx_cached_runtime_version = version;
+    }
+}
+#endif
+static unsigned long __Pyx_get_runtime_version(void) {
+#if __PYX_LIMITED_VERSION_HEX >= 0x030b0000
+    return Py_Version & ~0xFFUL;
+#else
+    return __Pyx_cached_runtime_version;
+#endif
+}
+
+/* CheckBinaryVersion */
+static int __Pyx_check_binary_version(unsigned long ct_version, unsigned long rt_version, int allow_newer) {
+    const unsigned long MAJOR_MINOR = 0xFFFF0000UL;
+    if ((rt_version & MAJOR_MINOR) == (ct_version & MAJOR_MINOR))
+        return 0;
+    if (likely(allow_newer && (rt_version & MAJOR_MINOR) > (ct_version & MAJOR_MINOR)))
+        return 1;
+    {
+        char message[200];
+        PyOS_snprintf(message, sizeof(message),
+                      "compile time Python version %d.%d "
+                      "of module '%.100s' "
+                      "%s "
+                      "runtime version %d.%d",
+                       (int) (ct_version >> 24), (int) ((ct_version >> 16) & 0xFF),
+                       __Pyx_MODULE_NAME,
+                       (allow_newer) ? "was newer than" : "does not match",
+                       (int) (rt_version >> 24), (int) ((rt_version >> 16) & 0xFF)
+       );
+        return PyErr_WarnEx(NULL, message, 1);
+    }
+}
+
+/* NewCodeObj */
+#if CYTHON_COMPILING_IN_LIMITED_API
+    static PyObject* __Pyx__PyCode_New(int a, int p, int k, int l, int s, int f,
+                                       PyObject *code, PyObject *c, PyObject* n, PyObject *v,
+                                       PyObject *fv, PyObject *cell, PyObject* fn,
+                                       PyObject *name, int fline, PyObject *lnos) {
+        PyObject *exception_table = NULL;
+        PyObject *types_module=NULL, *code_type=NULL, *result=NULL;
+        #if __PYX_LIMITED_VERSION_HEX < 0x030b0000
+        PyObject *version_info;
+        PyObject *py_minor_version = NULL;
+        #endif
+        long minor_version = 0;
+        #if __PYX_LIMITED_VERSION_HEX >= 0x030b0000
+        minor_version = 11;
+        #else
+        if (!(version_info = PySys_GetObject("version_info"))) goto end;
+        if (!(py_minor_version = PySequence_GetItem(version_info, 1))) goto end;
+        minor_version = PyLong_AsLong(py_minor_version);
+        Py_DECREF(py_minor_version);
+        if (minor_version == -1 && PyErr_Occurred()) goto end;
+        #endif
+        if (!(types_module = PyImport_ImportModule("types"))) goto end;
+        if (!(code_type = PyObject_GetAttrString(types_module, "CodeType"))) goto end;
+        if (minor_version <= 10) {
+            result = PyObject_CallFunction(code_type, "iiiiiiOOOOOOiOOO", a,p, k, l, s, f, code,
+                          c, n, v, fn, name, fline, lnos, fv, cell);
+        } else {
+            if (!(exception_table = PyBytes_FromStringAndSize(NULL, 0))) goto end;
+            result = PyObject_CallFunction(code_type, "iiiiiiOOOOOOOiOOOO", a,p, k, l, s, f, code,
+                          c, n, v, fn, name, name, fline, lnos, exception_table, fv, cell);
+        }
+    end:
+        Py_XDECREF(code_type);
+        Py_XDECREF(exception_table);
+        Py_XDECREF(types_module);
+        if (!result) {
+            PyObject *exc_type, *exc_value, *exc_tb;
+            PyErr_Fetch(&exc_type, &exc_value, &exc_tb);
+            if (PyErr_WarnFormat(
+                    PyExc_RuntimeWarning, 1,
+                    "Code object creation failed in Cython module: %S\nTry recompiling with a more recent version of Cython.",
+                    exc_value ? exc_value : exc_type) == 0) {
+                result = Py_None;
+                Py_INCREF(result);
+            }
+            Py_DECREF(exc_type);
+            Py_XDECREF(exc_value);
+            Py_XDECREF(exc_tb);
+        }
+        return result;
+    }
+#elif PY_VERSION_HEX >= 0x030B0000
+  static PyCodeObject* __Pyx__PyCode_New(int a, int p, int k, int l, int s, int f,
+                                         PyObject *code, PyObject *c, PyObject* n, PyObject *v,
+                                         PyObject *fv, PyObject *cell, PyObject* fn,
+                                         PyObject *name, int fline, PyObject *lnos) {
+    PyCodeObject *result;
+    result =
+      #if PY_VERSION_HEX >= 0x030C0000
+        PyUnstable_Code_NewWithPosOnlyArgs
+      #else
+        PyCode_NewWithPosOnlyArgs
+      #endif
+        (a, p, k, l, s, f, code, c, n, v, fv, cell, fn, name, name, fline, lnos, __pyx_mstate_global->__pyx_empty_bytes);
+    #if CYTHON_COMPILING_IN_CPYTHON && PY_VERSION_HEX >= 0x030c00A1
+    if (likely(result))
+        result->_co_firsttraceable = 0;
+    #endif
+    return result;
+  }
+#elif !CYTHON_COMPILING_IN_PYPY
+  #define __Pyx__PyCode_New(a, p, k, l, s, f, code, c, n, v, fv, cell, fn, name, fline, lnos)\
+          PyCode_NewWithPosOnlyArgs(a, p, k, l, s, f, code, c, n, v, fv, cell, fn, name, fline, lnos)
+#else
+  #define __Pyx__PyCode_New(a, p, k, l, s, f, code, c, n, v, fv, cell, fn, name, fline, lnos)\
+          PyCode_New(a, k, l, s, f, code, c, n, v, fv, cell, fn, name, fline, lnos)
+#endif
+static PyObject* __Pyx_PyCode_New(
+        const __Pyx_PyCode_New_function_description descr,
+        PyObject * const *varnames,
+        PyObject *filename,
+        PyObject *funcname,
+        PyObject *line_table,
+        PyObject *tuple_dedup_map
+) {
+    PyObject *code_obj = NULL, *varnames_tuple_dedup = NULL, *code_bytes = NULL;
+    Py_ssize_t var_count = (Py_ssize_t) descr.nlocals;
+    PyObject *varnames_tuple = PyTuple_New(var_count);
+    if (unlikely(!varnames_tuple)) return NULL;
+    for (Py_ssize_t i=0; i < var_count; i++) {
+        Py_INCREF(varnames[i]);
+        if (__Pyx_PyTuple_SET_ITEM(varnames_tuple, i, varnames[i]) != (0)) goto done;
+    }
+    #if CYTHON_COMPILING_IN_LIMITED_API
+    varnames_tuple_dedup = PyDict_GetItem(tuple_dedup_map, varnames_tuple);
+    if (!varnames_tuple_dedup) {
+        if (unlikely(PyDict_SetItem(tuple_dedup_map, varnames_tuple, varnames_tuple) < 0)) goto done;
+        varnames_tuple_dedup = varnames_tuple;
+    }
+    #else
+    varnames_tuple_dedup = PyDict_SetDefault(tuple_dedup_map, varnames_tuple, varnames_tuple);
+    if (unlikely(!varnames_tuple_dedup)) goto done;
+    #endif
+    #if CYTHON_AVOID_BORROWED_REFS
+    Py_INCREF(varnames_tuple_dedup);
+    #endif
+    if (__PYX_LIMITED_VERSION_HEX >= (0x030b0000) && line_table != NULL && !CYTHON_COMPILING_IN_GRAAL) {
+        Py_ssize_t line_table_length = __Pyx_PyBytes_GET_SIZE(line_table);
+        #if !CYTHON_ASSUME_SAFE_SIZE
+        if (unlikely(line_table_length == -1)) goto done;
+        #endif
+        Py_ssize_t code_len = (line_table_length * 2 + 4) & ~3LL;
+        code_bytes = PyBytes_FromStringAndSize(NULL, code_len);
+        if (unlikely(!code_bytes)) goto done;
+        char* c_code_bytes = PyBytes_AsString(code_bytes);
+        if (unlikely(!c_code_bytes)) goto done;
+        memset(c_code_bytes, 0, (size_t) code_len);
+    }
+    code_obj = (PyObject*) __Pyx__PyCode_New(
+        (int) descr.argcount,
+        (int) descr.num_posonly_args,
+        (int) descr.num_kwonly_args,
+        (int) descr.nlocals,
+        0,
+        (int) descr.flags,
+        code_bytes ? code_bytes : __pyx_mstate_global->__pyx_empty_bytes,
+        __pyx_mstate_global->__pyx_empty_tuple,
+        __pyx_mstate_global->__pyx_empty_tuple,
+        varnames_tuple_dedup,
+        __pyx_mstate_global->__pyx_empty_tuple,
+        __pyx_mstate_global->__pyx_empty_tuple,
+        filename,
+        funcname,
+        (int) descr.first_line,
+        (__PYX_LIMITED_VERSION_HEX >= (0x030b0000) && line_table) ? line_table : __pyx_mstate_global->__pyx_empty_bytes
+    );
+done:
+    Py_XDECREF(code_bytes);
+    #if CYTHON_AVOID_BORROWED_REFS
+    Py_XDECREF(varnames_tuple_dedup);
+    #endif
+    Py_DECREF(varnames_tuple);
+    return code_obj;
+}
+
+/* DecompressString */
+CYTHON_UNUSED
+static CYTHON_SMALL_CODE PyObject *__Pyx_DecompressString(const char *s, Py_ssize_t length, int algo) {
+#ifdef __Pyx_DecompressString_UNUSED
+    CYTHON_UNUSED_VAR(s);
+    CYTHON_UNUSED_VAR(length);
+    CYTHON_UNUSED_VAR(algo);
+    return NULL;
+#else
+    PyObject *module = NULL, *decompress, *compressed_bytes, *decompressed;
+    const char* module_name = algo == 3 ? "compression.zstd" : algo == 2 ? "bz2" : "zlib";
+    PyObject *methodname = PyUnicode_FromString("decompress");
+    if (unlikely(!methodname)) return NULL;
+    #if __PYX_LIMITED_VERSION_HEX >= 0x030e0000
+    if (algo == 3) {
+        PyObject *fromlist = Py_BuildValue("[O]", methodname);
+        if (unlikely(!fromlist)) goto bad;
+        module = PyImport_ImportModuleLevel("compression.zstd", NULL, NULL, fromlist, 0);
+        Py_DECREF(fromlist);
+    } else
+    #endif
+        module = PyImport_ImportModule(module_name);
+    if (unlikely(!module)) goto import_failed;
+    decompress = PyObject_GetAttr(module, methodname);
+    if (unlikely(!decompress)) goto import_failed;
+    {
+        #ifdef __cplusplus
+            char *memview_bytes = const_cast<char*>(s);
+        #else
+            #if defined(__clang__)
+              #pragma clang diagnostic push
+              #pragma clang diagnostic ignored "-Wcast-qual"
+            #elif !defined(__INTEL_COMPILER) && defined(__GNUC__)
+              #pragma GCC diagnostic push
+              #pragma GCC diagnostic ignored "-Wcast-qual"
+            #endif
+            char *memview_bytes = (char*) s;
+            #if defined(__clang__)
+              #pragma clang diagnostic pop
+            #elif !defined(__INTEL_COMPILER) && defined(__GNUC__)
+              #pragma GCC diagnostic pop
+            #endif
+        #endif
+        #if CYTHON_COMPILING_IN_LIMITED_API && !defined(PyBUF_READ)
+        int memview_flags = 0x100;
+        #else
+        int memview_flags = PyBUF_READ;
+        #endif
+        compressed_bytes = PyMemoryView_FromMemory(memview_bytes, length, memview_flags);
+    }
+    if (unlikely(!compressed_bytes)) {
+        Py_DECREF(decompress);
+        goto bad;
+    }
+    decompressed = PyObject_CallFunctionObjArgs(decompress, compressed_bytes, NULL);
+    Py_DECREF(compressed_bytes);
+    Py_DECREF(decompress);
+    Py_DECREF(module);
+    Py_DECREF(methodname);
+    return decompressed;
+import_failed:
+    PyErr_Format(PyExc_ImportError,
+        "Failed to import '%.20s.decompress' - cannot initialise module strings. "
+        "String compression was configured with the C macro 'CYTHON_COMPRESS_STRINGS=%d'.",
+        module_name, algo);
+bad:
+    Py_XDECREF(module);
+    Py_DECREF(methodname);
+    return NULL;
+#endif
+}
+
+#include <string.h>
+static CYTHON_INLINE Py_ssize_t __Pyx_ssize_strlen(const char *s) {
+    size_t len = strlen(s);
+    if (unlikely(len > (size_t) PY_SSIZE_T_MAX)) {
+        PyErr_SetString(PyExc_OverflowError, "byte string is too long");
+        return -1;
+    }
+    return (Py_ssize_t) len;
+}
+static CYTHON_INLINE PyObject* __Pyx_PyUnicode_FromString(const char* c_str) {
+    Py_ssize_t len = __Pyx_ssize_strlen(c_str);
+    if (unlikely(len < 0)) return NULL;
+    return __Pyx_PyUnicode_FromStringAndSize(c_str, len);
+}
+static CYTHON_INLINE PyObject* __Pyx_PyByteArray_FromString(const char* c_str) {
+    Py_ssize_t len = __Pyx_ssize_strlen(c_str);
+    if (unlikely(len < 0)) return NULL;
+    return PyByteArray_FromStringAndSize(c_str, len);
+}
+static CYTHON_INLINE const char* __Pyx_PyObject_AsString(PyObject* o) {
+    Py_ssize_t ignore;
+    return __Pyx_PyObject_AsStringAndSize(o, &ignore);
+}
+#if __PYX_DEFAULT_STRING_ENCODING_IS_ASCII || __PYX_DEFAULT_STRING_ENCODING_IS_UTF8
+static CYTHON_INLINE const char* __Pyx_PyUnicode_AsStringAndSize(PyObject* o, Py_ssize_t *length) {
+    if (unlikely(__Pyx_PyUnicode_READY(o) == -1)) return NULL;
+#if CYTHON_COMPILING_IN_LIMITED_API
+    {
+        const char* result;
+        Py_ssize_t unicode_length;
+        CYTHON_MAYBE_UNUSED_VAR(unicode_length); // only for __PYX_DEFAULT_STRING_ENCODING_IS_ASCII
+        #if __PYX_LIMITED_VERSION_HEX < 0x030A0000
+        if (unlikely(PyArg_Parse(o, "s#", &result, length) < 0)) return NULL;
+        #else
+        result = PyUnicode_AsUTF8AndSize(o, length);
+        #endif
+        #if __PYX_DEFAULT_STRING_ENCODING_IS_ASCII
+        unicode_length = PyUnicode_GetLength(o);
+        if (unlikely(unicode_length < 0)) return NULL;
+        if (unlikely(unicode_length != *length)) {
+            PyUnicode_AsASCIIString(o);
+            return NULL;
+        }
+        #endif
+        return result;
+    }
+#else
+#if __PYX_DEFAULT_STRING_ENCODING_IS_ASCII
+    if (likely(PyUnicode_IS_ASCII(o))) {
+        *length = PyUnicode_GET_LENGTH(o);
+        return PyUnicode_AsUTF8(o);
+    } else {
+        PyUnicode_AsASCIIString(o);
+        return NULL;
+    }
+#else
+    return PyUnicode_AsUTF8AndSize(o, length);
+#endif
+#endif
+}
+#endif
+static CYTHON_INLINE const char* __Pyx_PyObject_AsStringAndSize(PyObject* o, Py_ssize_t *length) {
+#if __PYX_DEFAULT_STRING_ENCODING_IS_ASCII || __PYX_DEFAULT_STRING_ENCODING_IS_UTF8
+    if (PyUnicode_Check(o)) {
+        return __Pyx_PyUnicode_AsStringAndSize(o, length);
+    } else
+#endif
+    if (PyByteArray_Check(o)) {
+#if (CYTHON_ASSUME_SAFE_SIZE && CYTHON_ASSUME_SAFE_MACROS) || (CYTHON_COMPILING_IN_PYPY && (defined(PyByteArray_AS_STRING) && defined(PyByteArray_GET_SIZE)))
+        *length = PyByteArray_GET_SIZE(o);
+        return PyByteArray_AS_STRING(o);
+#else
+        *length = PyByteArray_Size(o);
+        if (*length == -1) return NULL;
+        return PyByteArray_AsString(o);
+#endif
+    } else
+    {
+        char* result;
+        int r = PyBytes_AsStringAndSize(o, &result, length);
+        if (unlikely(r < 0)) {
+            return NULL;
+        } else {
+            return result;
+        }
+    }
+}
+static CYTHON_INLINE int __Pyx_PyObject_IsTrue(PyObject* x) {
+   int is_true = x == Py_True;
+   if (is_true | (x == Py_False) | (x == Py_None)) return is_true;
+   else return PyObject_IsTrue(x);
+}
+static CYTHON_INLINE int __Pyx_PyObject_IsTrueAndDecref(PyObject* x) {
+    int retval;
+    if (unlikely(!x)) return -1;
+    retval = __Pyx_PyObject_IsTrue(x);
+    Py_DECREF(x);
+    return retval;
+}
+static PyObject* __Pyx_PyNumber_LongWrongResultType(PyObject* result) {
+    __Pyx_TypeName result_type_name = __Pyx_PyType_GetFullyQualifiedName(Py_TYPE(result));
+    #if CYTHON_COMPILING_IN_LIMITED_API && __PYX_LIMITED_VERSION_HEX < 0x030d0000
+    if (unlikely(!result_type_name)) goto bad;
+    #endif
+    if (PyLong_Check(result)) {
+        if (PyErr_WarnFormat(PyExc_DeprecationWarning, 1,
+                "__int__ returned non-int (type " __Pyx_FMT_TYPENAME ").  "
+                "The ability to return an instance of a strict subclass of int is deprecated, "
+                "and may be removed in a future version of Python.",
+                result_type_name)) {
+            __Pyx_DECREF_TypeName(result_type_name);
+            goto bad;
+        }
+        __Pyx_DECREF_TypeName(result_type_name);
+        return result;
+    }
+    PyErr_Format(PyExc_TypeError,
+                 "__int__ returned non-int (type " __Pyx_FMT_TYPENAME ")",
+                 result_type_name);
+    __Pyx_DECREF_TypeName(result_type_name);
+bad:
+    Py_DECREF(result);
+    return NULL;
+}
+static CYTHON_INLINE PyObject* __Pyx_PyNumber_Long(PyObject* x) {
+#if CYTHON_USE_TYPE_SLOTS
+  PyNumberMethods *m;
+#endif
+  PyObject *res = NULL;
+  if (likely(PyLong_Check(x)))
+      return __Pyx_NewRef(x);
+#if CYTHON_USE_TYPE_SLOTS
+  m = Py_TYPE(x)->tp_as_number;
+  if (likely(m && m->nb_int)) {
+      res = m->nb_int(x);
+  }
+#else
+  if (!PyBytes_CheckExact(x) && !PyUnicode_CheckExact(x)) {
+      res = PyNumber_Long(x);
+  }
+#endif
+  if (likely(res)) {
+      if (unlikely(!PyLong_CheckExact(res))) {
+          return __Pyx_PyNumber_LongWrongResultType(res);
+      }
+  }
+  else if (!PyErr_Occurred()) {
+      PyErr_SetString(PyExc_TypeError,
+                      "an integer is required");
+  }
+  return res;
+}
+static CYTHON_INLINE Py_ssize_t __Pyx_PyLong_AsSsize_t(PyObject* b) {
+    #if CYTHON_USE_PYLONG_INTERNALS
+    Py_ssize_t ival;
+    const Py_ssize_t size = __Pyx_PyLong_DigitCount(b);
+    const int is_neg = __Pyx_PyLong_IsNeg(b);
+    const digit* digits = __Pyx_PyLong_Digits(b);
+    if (size == 0) return 0;
+    #if SIZEOF_SIZE_T * 8 > 1 * PyLong_SHIFT
+    if (size == 1) {
+        ival = (Py_ssize_t) (((size_t)digits[0]));
+    } else
+    #endif
+    #if SIZEOF_SIZE_T * 8 > 2 * PyLong_SHIFT
+    if (size == 2) {
+        ival = (Py_ssize_t) (((((size_t)digits[1]) << PyLong_SHIFT) | (size_t)digits[0]));
+    } else
+    #endif
+    #if SIZEOF_SIZE_T * 8 > 3 * PyLong_SHIFT
+    if (size == 3) {
+        ival = (Py_ssize_t) (((((((size_t)digits[2]) << PyLong_SHIFT) | (size_t)digits[1]) << PyLong_SHIFT) | (size_t)digits[0]));
+    } else
+    #endif
+    #if SIZEOF_SIZE_T * 8 > 4 * PyLong_SHIFT
+    if (size == 4) {
+        ival = (Py_ssize_t) (((((((((size_t)digits[3]) << PyLong_SHIFT) | (size_t)digits[2]) << PyLong_SHIFT) | (size_t)digits[1]) << PyLong_SHIFT) | (size_t)digits[0]));
+    } else
+    #endif
+        return PyLong_AsSsize_t(b);
+    return is_neg ? -ival : ival;
+    #else
+    return PyLong_AsSsize_t(b);
+    #endif
+}
+static CYTHON_INLINE Py_ssize_t __Pyx_PyIndex_AsSsize_t(PyObject* b) {
+    if (likely(PyLong_Check(b))) {
+        return __Pyx_PyLong_AsSsize_t(b);
+    } else {
+        Py_ssize_t ival;
+        PyObject *x = PyNumber_Index(b);
+        if (unlikely(!x)) return -1;
+        ival = __Pyx_PyLong_AsSsize_t(x);
+        Py_DECREF(x);
+        return ival;
+    }
+}
+static CYTHON_INLINE Py_hash_t __Pyx_PyIndex_AsHash_t(PyObject* o) {
+  if (sizeof(Py_hash_t) == sizeof(Py_ssize_t)) {
+    return (Py_hash_t) __Pyx_PyIndex_AsSsize_t(o);
+  } else {
+    Py_ssize_t ival;
+    PyObject *x;
+    x = PyNumber_Index(o);
+    if (!x) return -1;
+    ival = PyLong_AsLong(x);
+    Py_DECREF(x);
+    return ival;
+  }
+}
+static CYTHON_INLINE PyObject *__Pyx_Owned_Py_None(int b) {
+    CYTHON_UNUSED_VAR(b);
+    return __Pyx_NewRef(Py_None);
+}
+static CYTHON_INLINE PyObject * __Pyx_PyBool_FromLong(long b) {
+  return __Pyx_NewRef(b ? Py_True: Py_False);
+}
+static CYTHON_INLINE PyObject * __Pyx_PyLong_FromSize_t(size_t ival) {
+    return PyLong_FromSize_t(ival);
+}
+
+
+/* MultiPhaseInitModuleState */
+#if CYTHON_PEP489_MULTI_PHASE_INIT && CYTHON_USE_MODULE_STATE
+#ifndef CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE
+#if (CYTHON_COMPILING_IN_LIMITED_API || PY_VERSION_HEX >= 0x030C0000)
+  #define CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE 1
+#else
+  #define CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE 0
+#endif
+#endif
+#if CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE && !CYTHON_ATOMICS
+#error "Module state with PEP489 requires atomics. Currently that's one of\
+ C11, C++11, gcc atomic intrinsics or MSVC atomic intrinsics"
+#endif
+#if !CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE
+#define __Pyx_ModuleStateLookup_Lock()
+#define __Pyx_ModuleStateLookup_Unlock()
+#elif !CYTHON_COMPILING_IN_LIMITED_API && PY_VERSION_HEX >= 0x030d0000
+static PyMutex __Pyx_ModuleStateLookup_mutex = {0};
+#define __Pyx_ModuleStateLookup_Lock() PyMutex_Lock(&__Pyx_ModuleStateLookup_mutex)
+#define __Pyx_ModuleStateLookup_Unlock() PyMutex_Unlock(&__Pyx_ModuleStateLookup_mutex)
+#elif defined(__cplusplus) && __cplusplus >= 201103L
+#include <mutex>
+static std::mutex __Pyx_ModuleStateLookup_mutex;
+#define __Pyx_ModuleStateLookup_Lock() __Pyx_ModuleStateLookup_mutex.lock()
+#define __Pyx_ModuleStateLookup_Unlock() __Pyx_ModuleStateLookup_mutex.unlock()
+#elif defined(__STDC_VERSION__) && (__STDC_VERSION__ > 201112L) && !defined(__STDC_NO_THREADS__)
+#include <threads.h>
+static mtx_t __Pyx_ModuleStateLookup_mutex;
+static once_flag __Pyx_ModuleStateLookup_mutex_once_flag = ONCE_FLAG_INIT;
+static void __Pyx_ModuleStateLookup_initialize_mutex(void) {
+    mtx_init(&__Pyx_ModuleStateLookup_mutex, mtx_plain);
+}
+#define __Pyx_ModuleStateLookup_Lock()\
+  call_once(&__Pyx_ModuleStateLookup_mutex_once_flag, __Pyx_ModuleStateLookup_initialize_mutex);\
+  mtx_lock(&__Pyx_ModuleStateLookup_mutex)
+#define __Pyx_ModuleStateLookup_Unlock() mtx_unlock(&__Pyx_ModuleStateLookup_mutex)
+#elif defined(HAVE_PTHREAD_H)
+#include <pthread.h>
+static pthread_mutex_t __Pyx_ModuleStateLookup_mutex = PTHREAD_MUTEX_INITIALIZER;
+#define __Pyx_ModuleStateLookup_Lock() pthread_mutex_lock(&__Pyx_ModuleStateLookup_mutex)
+#define __Pyx_ModuleStateLookup_Unlock() pthread_mutex_unlock(&__Pyx_ModuleStateLookup_mutex)
+#elif defined(_WIN32)
+#include <Windows.h>  // synchapi.h on its own doesn't work
+static SRWLOCK __Pyx_ModuleStateLookup_mutex = SRWLOCK_INIT;
+#define __Pyx_ModuleStateLookup_Lock() AcquireSRWLockExclusive(&__Pyx_ModuleStateLookup_mutex)
+#define __Pyx_ModuleStateLookup_Unlock() ReleaseSRWLockExclusive(&__Pyx_ModuleStateLookup_mutex)
+#else
+#error "No suitable lock available for CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE.\
+ Requires C standard >= C11, or C++ standard >= C++11,\
+ or pthreads, or the Windows 32 API, or Python >= 3.13."
+#endif
+typedef struct {
+    int64_t id;
+    PyObject *module;
+} __Pyx_InterpreterIdAndModule;
+typedef struct {
+    char interpreter_id_as_index;
+    Py_ssize_t count;
+    Py_ssize_t allocated;
+    __Pyx_InterpreterIdAndModule table[1];
+} __Pyx_ModuleStateLookupData;
+#define __PYX_MODULE_STATE_LOOKUP_SMALL_SIZE 32
+#if CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE
+static __pyx_atomic_int_type __Pyx_ModuleStateLookup_read_counter = 0;
+#endif
+#if CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE
+static __pyx_atomic_ptr_type __Pyx_ModuleStateLookup_data = 0;
+#else
+static __Pyx_ModuleStateLookupData* __Pyx_ModuleStateLookup_data = NULL;
+#endif
+static __Pyx_InterpreterIdAndModule* __Pyx_State_FindModuleStateLookupTableLowerBound(
+        __Pyx_InterpreterIdAndModule* table,
+        Py_ssize_t count,
+        int64_t interpreterId) {
+    __Pyx_InterpreterIdAndModule* begin = table;
+    __Pyx_InterpreterIdAndModule* end = begin + count;
+    if (begin->id == interpreterId) {
+        return begin;
+    }
+    while ((end - begin) > __PYX_MODULE_STATE_LOOKUP_SMALL_SIZE) {
+        __Pyx_InterpreterIdAndModule* halfway = begin + (end - begin)/2;
+        if (halfway->id == interpreterId) {
+            return halfway;
+        }
+        if (halfway->id < interpreterId) {
+            begin = halfway;
+        } else {
+            end = halfway;
+        }
+    }
+    for (; begin < end; ++begin) {
+        if (begin->id >= interpreterId) return begin;
+    }
+    return begin;
+}
+static PyObject *__Pyx_State_FindModule(CYTHON_UNUSED void* dummy) {
+    int64_t interpreter_id = PyInterpreterState_GetID(PyInterpreterState_Get());
+    if (interpreter_id == -1) return NULL;
+#if CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE
+    __Pyx_ModuleStateLookupData* data = (__Pyx_ModuleStateLookupData*)__pyx_atomic_pointer_load_relaxed(&__Pyx_ModuleStateLookup_data);
+    {
+        __pyx_atomic_incr_acq_rel(&__Pyx_ModuleStateLookup_read_counter);
+        if (likely(data)) {
+            __Pyx_ModuleStateLookupData* new_data = (__Pyx_ModuleStateLookupData*)__pyx_atomic_pointer_load_acquire(&__Pyx_ModuleStateLookup_data);
+            if (likely(data == new_data)) {
+                goto read_finished;
+            }
+        }
+        __pyx_atomic_decr_acq_rel(&__Pyx_ModuleStateLookup_read_counter);
+        __Pyx_ModuleStateLookup_Lock();
+        __pyx_atomic_incr_relaxed(&__Pyx_ModuleStateLookup_read_counter);
+        data = (__Pyx_ModuleStateLookupData*)__pyx_atomic_pointer_load_relaxed(&__Pyx_ModuleStateLookup_data);
+        __Pyx_ModuleStateLookup_Unlock();
+    }
+  read_finished:;
+#else
+    __Pyx_ModuleStateLookupData* data = __Pyx_ModuleStateLookup_data;
+#endif
+    __Pyx_InterpreterIdAndModule* found = NULL;
+    if (unlikely(!data)) goto end;
+    if (data->interpreter_id_as_index) {
+        if (interpreter_id < data->count) {
+            found = data->table+interpreter_id;
+        }
+    } else {
+        found = __Pyx_State_FindModuleStateLookupTableLowerBound(
+            data->table, data->count, interpreter_id);
+    }
+  end:
+    {
+        PyObject *result=NULL;
+        if (found && found->id == interpreter_id) {
+            result = found->module;
+        }
+#if CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE
+        __pyx_atomic_decr_acq_rel(&__Pyx_ModuleStateLookup_read_counter);
+#endif
+        return result;
+    }
+}
+#if CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE
+static void __Pyx_ModuleStateLookup_wait_until_no_readers(void) {
+    while (__pyx_atomic_load(&__Pyx_ModuleStateLookup_read_counter) != 0);
+}
+#else
+#define __Pyx_ModuleStateLookup_wait_until_no_readers()
+#endif
+static int __Pyx_State_AddModuleInterpIdAsIndex(__Pyx_ModuleStateLookupData **old_data, PyObject* module, int64_t interpreter_id) {
+    Py_ssize_t to_allocate = (*old_data)->allocated;
+    while (to_allocate <= interpreter_id) {
+        if (to_allocate == 0) to_allocate = 1;
+        else to_allocate *= 2;
+    }
+    __Pyx_ModuleStateLookupData *new_data = *old_data;
+    if (to_allocate != (*old_data)->allocated) {
+         new_data = (__Pyx_ModuleStateLookupData *)realloc(
+            *old_data,
+            sizeof(__Pyx_ModuleStateLookupData)+(to_allocate-1)*sizeof(__Pyx_InterpreterIdAndModule));
+        if (!new_data) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        for (Py_ssize_t i = new_data->allocated; i < to_allocate; ++i) {
+            new_data->table[i].id = i;
+            new_data->table[i].module = NULL;
+        }
+        new_data->allocated = to_allocate;
+    }
+    new_data->table[interpreter_id].module = module;
+    if (new_data->count < interpreter_id+1) {
+        new_data->count = interpreter_id+1;
+    }
+    *old_data = new_data;
+    return 0;
+}
+static void __Pyx_State_ConvertFromInterpIdAsIndex(__Pyx_ModuleStateLookupData *data) {
+    __Pyx_InterpreterIdAndModule *read = data->table;
+    __Pyx_InterpreterIdAndModule *write = data->table;
+    __Pyx_InterpreterIdAndModule *end = read + data->count;
+    for (; read<end; ++read) {
+        if (read->module) {
+            write->id = read->id;
+            write->module = read->module;
+            ++write;
+        }
+    }
+    data->count = write - data->table;
+    for (; write<end; ++write) {
+        write->id = 0;
+        write->module = NULL;
+    }
+    data->interpreter_id_as_index = 0;
+}
+static int __Pyx_State_AddModule(PyObject* module, CYTHON_UNUSED void* dummy) {
+    int64_t interpreter_id = PyInterpreterState_GetID(PyInterpreterState_Get());
+    if (interpreter_id == -1) return -1;
+    int result = 0;
+    __Pyx_ModuleStateLookup_Lock();
+#if CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE
+    __Pyx_ModuleStateLookupData *old_data = (__Pyx_ModuleStateLookupData *)
+            __pyx_atomic_pointer_exchange(&__Pyx_ModuleStateLookup_data, 0);
+#else
+    __Pyx_ModuleStateLookupData *old_data = __Pyx_ModuleStateLookup_data;
+#endif
+    __Pyx_ModuleStateLookupData *new_data = old_data;
+    if (!new_data) {
+        new_data = (__Pyx_ModuleStateLookupData *)calloc(1, sizeof(__Pyx_ModuleStateLookupData));
+        if (!new_data) {
+            result = -1;
+            PyErr_NoMemory();
+            goto end;
+        }
+        new_data->allocated = 1;
+        new_data->interpreter_id_as_index = 1;
+    }
+    __Pyx_ModuleStateLookup_wait_until_no_readers();
+    if (new_data->interpreter_id_as_index) {
+        if (interpreter_id < __PYX_MODULE_STATE_LOOKUP_SMALL_SIZE) {
+            result = __Pyx_State_AddModuleInterpIdAsIndex(&new_data, module, interpreter_id);
+            goto end;
+        }
+        __Pyx_State_ConvertFromInterpIdAsIndex(new_data);
+    }
+    {
+        Py_ssize_t insert_at = 0;
+        {
+            __Pyx_InterpreterIdAndModule* lower_bound = __Pyx_State_FindModuleStateLookupTableLowerBound(
+                new_data->table, new_data->count, interpreter_id);
+            assert(lower_bound);
+            insert_at = lower_bound - new_data->table;
+            if (unlikely(insert_at < new_data->count && lower_bound->id == interpreter_id)) {
+                lower_bound->module = module;
+                goto end;  // already in table, nothing more to do
+            }
+        }
+        if (new_data->count+1 >= new_data->allocated) {
+            Py_ssize_t to_allocate = (new_data->count+1)*2;
+            new_data =
+                (__Pyx_ModuleStateLookupData*)realloc(
+                    new_data,
+                    sizeof(__Pyx_ModuleStateLookupData) +
+                    (to_allocate-1)*sizeof(__Pyx_InterpreterIdAndModule));
+            if (!new_data) {
+                result = -1;
+                new_data = old_data;
+                PyErr_NoMemory();
+                goto end;
+            }
+            new_data->allocated = to_allocate;
+        }
+        ++new_data->count;
+        int64_t last_id = interpreter_id;
+        PyObject *last_module = module;
+        for (Py_ssize_t i=insert_at; i<new_data->count; ++i) {
+            int64_t current_id = new_data->table[i].id;
+            new_data->table[i].id = last_id;
+            last_id = current_id;
+            PyObject *current_module = new_data->table[i].module;
+            new_data->table[i].module = last_module;
+            last_module = current_module;
+        }
+    }
+  end:
+#if CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE
+    __pyx_atomic_pointer_exchange(&__Pyx_ModuleStateLookup_data, new_data);
+#else
+    __Pyx_ModuleStateLookup_data = new_data;
+#endif
+    __Pyx_ModuleStateLookup_Unlock();
+    return result;
+}
+static int __Pyx_State_RemoveModule(CYTHON_UNUSED void* dummy) {
+    int64_t interpreter_id = PyInterpreterState_GetID(PyInterpreterState_Get());
+    if (interpreter_id == -1) return -1;
+    __Pyx_ModuleStateLookup_Lock();
+#if CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE
+    __Pyx_ModuleStateLookupData *data = (__Pyx_ModuleStateLookupData *)
+            __pyx_atomic_pointer_exchange(&__Pyx_ModuleStateLookup_data, 0);
+#else
+    __Pyx_ModuleStateLookupData *data = __Pyx_ModuleStateLookup_data;
+#endif
+    if (data->interpreter_id_as_index) {
+        if (interpreter_id < data->count) {
+            data->table[interpreter_id].module = NULL;
+        }
+        goto done;
+    }
+    {
+        __Pyx_ModuleStateLookup_wait_until_no_readers();
+        __Pyx_InterpreterIdAndModule* lower_bound = __Pyx_State_FindModuleStateLookupTableLowerBound(
+            data->table, data->count, interpreter_id);
+        if (!lower_bound) goto done;
+        if (lower_bound->id != interpreter_id) goto done;
+        __Pyx_InterpreterIdAndModule *end = data->table+data->count;
+        for (;lower_bound<end-1; ++lower_bound) {
+            lower_bound->id = (lower_bound+1)->id;
+            lower_bound->module = (lower_bound+1)->module;
+        }
+    }
+    --data->count;
+    if (data->count == 0) {
+        free(data);
+        data = NULL;
+    }
+  done:
+#if CYTHON_MODULE_STATE_LOOKUP_THREAD_SAFE
+    __pyx_atomic_pointer_exchange(&__Pyx_ModuleStateLookup_data, data);
+#else
+    __Pyx_ModuleStateLookup_data = data;
+#endif
+    __Pyx_ModuleStateLookup_Unlock();
+    return 0;
+}
+#endif
+
+/* #### Code section: utility_code_pragmas_end ### */
+#ifdef _MSC_VER
+#pragma warning( pop )
+#endif
+
+
+
+/* #### Code section: end ### */
+#endif /* Py_PYTHON_H */
@@ -1,5 +1,89 @@
+from libc.stdint cimport uint8_t
+
+
+cdef enum AddressingMode:
+    IMP
+    IMM
+    ZP0
+    ZPX
+    ZPY
+    REL
+    ABS
+    ABX
+    ABY
+    IND
+    IZX
+    IZY
+
+cdef enum Instruction:
+    ADC
+    SBC
+    AND
+    ASL
+    BCC
+    BCS
+    BEQ
+    BIT
+    BMI
+    BNE
+    BPL
+    BRK
+    BVC
+    BVS
+    CLC
+    CLD
+    CLI
+    CLV
+    CMP
+    CPX
+    CPY
+    DEC
+    DEX
+    DEY
+    EOR
+    INC
+    INX
+    INY
+    JMP
+    JSR
+    LDA
+    LDX
+    LDY
+    LSR
+    NOP
+    ORA
+    PHA
+    PHP
+    PLA
+    PLP
+    ROL
+    ROR
+    RTI
+    RTS
+    SEC
+    SED
+    SEI
+    STA
+    STX
+    STY
+    TAX
+    TAY
+    TSX
+    TXA
+    TXS
+    TYA
+    XXX
+
+cdef uint8_t[256] OP_CYCLES
+cdef uint8_t[256] OP_ADDRMODE
+cdef uint8_t[256] OP_INSTRUCTION
+# bytes of an instruction by addressing mode, opcode included
+cdef uint8_t[12] ADDRMODE_LENGTH
+
+cdef list LOOKUP
+
 cdef class Op:
     cdef public str name
-    cdef public object operate
-    cdef public object addrmode
+    cdef public str operate
+    cdef public str addrmode
     cdef public int cycles
@@ -1,6 +1,47 @@
 cdef class Op:
-    def __init__(self, str name, object operate, object addrmode, int cycles):
+    '''
+    Opcode metadata, only used for disassembling: the CPU dispatches on the typed tables below
+    '''
+    def __init__(self, str name, str operate, str addrmode, int cycles):
         self.name = name
         self.operate = operate
         self.addrmode = addrmode
         self.cycles = cycles
+
+# names in the same order as the AddressingMode / Instruction enums
+ADDRMODES = [ "IMP", "IMM", "ZP0", "ZPX", "ZPY", "REL", "ABS", "ABX", "ABY", "IND", "IZX", "IZY" ]
+INSTRUCTIONS = [
+    "ADC", "SBC", "AND", "ASL", "BCC", "BCS", "BEQ", "BIT", "BMI", "BNE", "BPL", "BRK", "BVC", "BVS", "CLC", "CLD",
+    "CLI", "CLV", "CMP", "CPX", "CPY", "DEC", "DEX", "DEY", "EOR", "INC", "INX", "INY", "JMP", "JSR", "LDA", "LDX",
+    "LDY", "LSR", "NOP", "ORA", "PHA", "PHP", "PLA", "PLP", "ROL", "ROR", "RTI", "RTS", "SEC", "SED", "SEI", "STA",
+    "STX", "STY", "TAX", "TAY", "TSX", "TXA", "TXS", "TYA", "XXX",
+]
+
+LOOKUP = [
+    Op( "BRK", "BRK", "IMM", 7 ),Op( "ORA", "ORA", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ORA", "ORA", "ZP0", 3 ),Op( "ASL", "ASL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHP", "PHP", "IMP", 3 ),Op( "ORA", "ORA", "IMM", 2 ),Op( "ASL", "ASL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABS", 4 ),Op( "ASL", "ASL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+    Op( "BPL", "BPL", "REL", 2 ),Op( "ORA", "ORA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ZPX", 4 ),Op( "ASL", "ASL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLC", "CLC", "IMP", 2 ),Op( "ORA", "ORA", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ORA", "ORA", "ABX", 4 ),Op( "ASL", "ASL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+    Op( "JSR", "JSR", "ABS", 6 ),Op( "AND", "AND", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "BIT", "BIT", "ZP0", 3 ),Op( "AND", "AND", "ZP0", 3 ),Op( "ROL", "ROL", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLP", "PLP", "IMP", 4 ),Op( "AND", "AND", "IMM", 2 ),Op( "ROL", "ROL", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "BIT", "BIT", "ABS", 4 ),Op( "AND", "AND", "ABS", 4 ),Op( "ROL", "ROL", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+    Op( "BMI", "BMI", "REL", 2 ),Op( "AND", "AND", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ZPX", 4 ),Op( "ROL", "ROL", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEC", "SEC", "IMP", 2 ),Op( "AND", "AND", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "AND", "AND", "ABX", 4 ),Op( "ROL", "ROL", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+    Op( "RTI", "RTI", "IMP", 6 ),Op( "EOR", "EOR", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "EOR", "EOR", "ZP0", 3 ),Op( "LSR", "LSR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PHA", "PHA", "IMP", 3 ),Op( "EOR", "EOR", "IMM", 2 ),Op( "LSR", "LSR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "ABS", 3 ),Op( "EOR", "EOR", "ABS", 4 ),Op( "LSR", "LSR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+    Op( "BVC", "BVC", "REL", 2 ),Op( "EOR", "EOR", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ZPX", 4 ),Op( "LSR", "LSR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLI", "CLI", "IMP", 2 ),Op( "EOR", "EOR", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "EOR", "EOR", "ABX", 4 ),Op( "LSR", "LSR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+    Op( "RTS", "RTS", "IMP", 6 ),Op( "ADC", "ADC", "IZX", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 3 ),Op( "ADC", "ADC", "ZP0", 3 ),Op( "ROR", "ROR", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "PLA", "PLA", "IMP", 4 ),Op( "ADC", "ADC", "IMM", 2 ),Op( "ROR", "ROR", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "JMP", "JMP", "IND", 5 ),Op( "ADC", "ADC", "ABS", 4 ),Op( "ROR", "ROR", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+    Op( "BVS", "BVS", "REL", 2 ),Op( "ADC", "ADC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ZPX", 4 ),Op( "ROR", "ROR", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SEI", "SEI", "IMP", 2 ),Op( "ADC", "ADC", "ABY", 4 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "ADC", "ADC", "ABX", 4 ),Op( "ROR", "ROR", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+    Op( "???", "NOP", "IMP", 2 ),Op( "STA", "STA", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZP0", 3 ),Op( "STA", "STA", "ZP0", 3 ),Op( "STX", "STX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "DEY", "DEY", "IMP", 2 ),Op( "???", "NOP", "IMP", 2 ),Op( "TXA", "TXA", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "STY", "STY", "ABS", 4 ),Op( "STA", "STA", "ABS", 4 ),Op( "STX", "STX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+    Op( "BCC", "BCC", "REL", 2 ),Op( "STA", "STA", "IZY", 6 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "STY", "STY", "ZPX", 4 ),Op( "STA", "STA", "ZPX", 4 ),Op( "STX", "STX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "TYA", "TYA", "IMP", 2 ),Op( "STA", "STA", "ABY", 5 ),Op( "TXS", "TXS", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "NOP", "IMP", 5 ),Op( "STA", "STA", "ABX", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "???", "XXX", "IMP", 5 ),
+    Op( "LDY", "LDY", "IMM", 2 ),Op( "LDA", "LDA", "IZX", 6 ),Op( "LDX", "LDX", "IMM", 2 ),Op( "???", "XXX", "IMP", 6 ),Op( "LDY", "LDY", "ZP0", 3 ),Op( "LDA", "LDA", "ZP0", 3 ),Op( "LDX", "LDX", "ZP0", 3 ),Op( "???", "XXX", "IMP", 3 ),Op( "TAY", "TAY", "IMP", 2 ),Op( "LDA", "LDA", "IMM", 2 ),Op( "TAX", "TAX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "LDY", "LDY", "ABS", 4 ),Op( "LDA", "LDA", "ABS", 4 ),Op( "LDX", "LDX", "ABS", 4 ),Op( "???", "XXX", "IMP", 4 ),
+    Op( "BCS", "BCS", "REL", 2 ),Op( "LDA", "LDA", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 5 ),Op( "LDY", "LDY", "ZPX", 4 ),Op( "LDA", "LDA", "ZPX", 4 ),Op( "LDX", "LDX", "ZPY", 4 ),Op( "???", "XXX", "IMP", 4 ),Op( "CLV", "CLV", "IMP", 2 ),Op( "LDA", "LDA", "ABY", 4 ),Op( "TSX", "TSX", "IMP", 2 ),Op( "???", "XXX", "IMP", 4 ),Op( "LDY", "LDY", "ABX", 4 ),Op( "LDA", "LDA", "ABX", 4 ),Op( "LDX", "LDX", "ABY", 4 ),Op( "???", "XXX", "IMP", 4 ),
+    Op( "CPY", "CPY", "IMM", 2 ),Op( "CMP", "CMP", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPY", "CPY", "ZP0", 3 ),Op( "CMP", "CMP", "ZP0", 3 ),Op( "DEC", "DEC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INY", "INY", "IMP", 2 ),Op( "CMP", "CMP", "IMM", 2 ),Op( "DEX", "DEX", "IMP", 2 ),Op( "???", "XXX", "IMP", 2 ),Op( "CPY", "CPY", "ABS", 4 ),Op( "CMP", "CMP", "ABS", 4 ),Op( "DEC", "DEC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+    Op( "BNE", "BNE", "REL", 2 ),Op( "CMP", "CMP", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ZPX", 4 ),Op( "DEC", "DEC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "CLD", "CLD", "IMP", 2 ),Op( "CMP", "CMP", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "CMP", "CMP", "ABX", 4 ),Op( "DEC", "DEC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+    Op( "CPX", "CPX", "IMM", 2 ),Op( "SBC", "SBC", "IZX", 6 ),Op( "???", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "CPX", "CPX", "ZP0", 3 ),Op( "SBC", "SBC", "ZP0", 3 ),Op( "INC", "INC", "ZP0", 5 ),Op( "???", "XXX", "IMP", 5 ),Op( "INX", "INX", "IMP", 2 ),Op( "SBC", "SBC", "IMM", 2 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "SBC", "IMP", 2 ),Op( "CPX", "CPX", "ABS", 4 ),Op( "SBC", "SBC", "ABS", 4 ),Op( "INC", "INC", "ABS", 6 ),Op( "???", "XXX", "IMP", 6 ),
+    Op( "BEQ", "BEQ", "REL", 2 ),Op( "SBC", "SBC", "IZY", 5 ),Op( "???", "XXX", "IMP", 2 ),Op( "???", "XXX", "IMP", 8 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ZPX", 4 ),Op( "INC", "INC", "ZPX", 6 ),Op( "???", "XXX", "IMP", 6 ),Op( "SED", "SED", "IMP", 2 ),Op( "SBC", "SBC", "ABY", 4 ),Op( "NOP", "NOP", "IMP", 2 ),Op( "???", "XXX", "IMP", 7 ),Op( "???", "NOP", "IMP", 4 ),Op( "SBC", "SBC", "ABX", 4 ),Op( "INC", "INC", "ABX", 7 ),Op( "???", "XXX", "IMP", 7 ),
+]
+
+LENGTHS = [ 1, 2, 2, 2, 2, 2, 3, 3, 3, 3, 2, 2 ]
+
+for addrmode, length in enumerate(LENGTHS):
+    ADDRMODE_LENGTH[addrmode] = length
+
+for opcode, op in enumerate(LOOKUP):
+    OP_CYCLES[opcode] = op.cycles
+    OP_ADDRMODE[opcode] = ADDRMODES.index(op.addrmode)
+    OP_INSTRUCTION[opcode] = INSTRUCTIONS.index(op.operate)
@@ -1,24 +1,32 @@
+import struct
+
 import numpy as np
 cimport numpy as np
 
 
+# PC, SP, A, X, Y, P, fetched, addr_abs, addr_rel, opcode, temp, remaining cycles, clock count
+REGISTERS = struct.Struct("<H4BIBHHBHBi")
+
 cdef class CPUState:
-    def __init__(self, CPU6502 cpu) -> None:
-        self.registers = cpu.registers
-        self.ram = np.array(cpu.ram, dtype=np.uint8)
-        self.fetched = cpu.fetched
-        self.addr_abs = cpu.addr_abs
-        self.addr_rel = cpu.addr_rel
-        self.opcode = cpu.opcode
-        self.temp = cpu.temp
-        self.remaining_cycles = cpu.remaining_cycles
+    def __init__(self, CPU6502 cpu = None) -> None:
+        if cpu is None:
+            return
+        self.registers = REGISTERS.pack(
+            cpu.registers.PC, cpu.registers.SP, cpu.registers.A, cpu.registers.X, cpu.registers.Y, cpu.registers.status.value,
+            cpu.fetched, cpu.addr_abs, cpu.addr_rel, cpu.opcode, cpu.temp, cpu.remaining_cycles, cpu.clock_count
+        )
+        self.ram = np.asarray(cpu.ram).tobytes()
+
+    cdef void write_blocks(self, list blocks):
+        blocks.append((b"CPU ", self.registers))
+        blocks.append((b"RAM ", self.ram))
+
+    cdef void read_blocks(self, dict blocks) except *:
+        self.registers = blocks[b"CPU "]
+        self.ram = blocks[b"RAM "]
 
     cdef void load_to(self, CPU6502 cpu):
-        cpu.registers = self.registers
-        cpu.ram = self.ram
-        cpu.fetched = self.fetched
-        cpu.addr_abs = self.addr_abs
-        cpu.addr_rel = self.addr_rel
-        cpu.opcode = self.opcode
-        cpu.temp = self.temp
-        cpu.remaining_cycles = self.remaining_cycles
+        PC, SP, A, X, Y, P, cpu.fetched, cpu.addr_abs, cpu.addr_rel, cpu.opcode, cpu.temp, cpu.remaining_cycles, cpu.clock_count = REGISTERS.unpack(self.registers)
+        cpu.registers.PC, cpu.registers.SP, cpu.registers.A, cpu.registers.X, cpu.registers.Y = PC, SP, A, X, Y
+        cpu.registers.status.value = P
+        np.asarray(cpu.ram)[:] = np.frombuffer(self.ram, dtype = np.uint8)
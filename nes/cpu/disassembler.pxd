@@ -0,0 +1,33 @@
+from libc.stdint cimport uint8_t, uint16_t, int32_t
+
+from nes.bus.bus cimport CPUBus
+
+
+cdef struct AsmRecord:
+    uint8_t opcode
+    uint8_t[2] operands
+    uint8_t length
+    # address a branch / JMP / JSR goes to, -1 for other instructions and indirect jumps
+    int32_t target
+
+cdef class DisassembledPage:
+    # 256 bytes the records were decoded from
+    cdef uint8_t[256] content
+    # instruction starting at every offset of the page
+    cdef AsmRecord[256] records
+    # formatted lines, None until asked for
+    cdef list lines
+
+cdef class Disassembler:
+    cdef CPUBus bus
+    # (page pointer, CPU page) -> DisassembledPage
+    cdef dict pages
+
+    cpdef void clear(self)
+    cdef DisassembledPage page(self, uint8_t)
+    cdef AsmRecord decode(self, uint16_t, uint8_t, uint8_t, uint8_t)
+    cdef AsmRecord record(self, uint16_t)
+    cdef str line(self, uint16_t, AsmRecord*)
+
+    cpdef dict instruction(self, uint16_t)
+    cpdef dict to_asm(self, uint16_t, uint16_t)
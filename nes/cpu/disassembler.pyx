@@ -0,0 +1,148 @@
+from libc.stdint cimport uintptr_t, int8_t, uint32_t
+from libc.string cimport memcmp, memcpy
+
+from nes.cpu.cpu_op cimport AddressingMode, Instruction, OP_ADDRMODE, OP_INSTRUCTION, ADDRMODE_LENGTH, LOOKUP
+
+
+cdef class DisassembledPage:
+    pass
+
+cdef class Disassembler:
+    '''
+    Instructions decoded once per 256 byte page of whatever the mapper has switched in, cached per
+    bank and decoded again only once the bytes of the page changed (code written to RAM).
+    Pages without direct access (registers, mappers without page table support) are read through the bus every time.
+    '''
+    def __init__(self, CPUBus bus) -> None:
+        self.bus = bus
+        self.clear()
+
+    cpdef void clear(self):
+        self.pages = {}
+
+    cdef DisassembledPage page(self, uint8_t page):
+        '''
+        Records of CPU page page, None if it is not directly readable
+        '''
+        cdef uint8_t* source = self.bus.read_pages[page]
+        cdef DisassembledPage disassembled
+        cdef int offset
+
+        if source == NULL:
+            return None
+        key = (<uintptr_t> source, page)
+        disassembled = self.pages.get(key)
+        if disassembled is not None and memcmp(disassembled.content, source, 256) == 0:
+            return disassembled
+
+        disassembled = DisassembledPage()
+        memcpy(disassembled.content, source, 256)
+        for offset in range(256):
+            # operands beyond the page are filled in on lookup, the next page may belong to another bank
+            disassembled.records[offset] = self.decode((page << 8) | offset, source[offset],
+                source[offset + 1] if offset < 255 else 0, source[offset + 2] if offset < 254 else 0)
+        disassembled.lines = [None] * 256
+        self.pages[key] = disassembled
+        return disassembled
+
+    cdef AsmRecord decode(self, uint16_t addr, uint8_t opcode, uint8_t lo, uint8_t hi):
+        cdef AsmRecord record
+        cdef uint8_t addrmode = OP_ADDRMODE[opcode]
+        cdef uint8_t instruction = OP_INSTRUCTION[opcode]
+
+        record.opcode = opcode
+        record.operands[0] = lo
+        record.operands[1] = hi
+        record.length = ADDRMODE_LENGTH[addrmode]
+        record.target = -1
+        if addrmode == AddressingMode.REL:
+            record.target = <uint16_t> (addr + 2 + <int8_t> lo)
+        elif addrmode == AddressingMode.ABS and (instruction == Instruction.JMP or instruction == Instruction.JSR):
+            record.target = (hi << 8) | lo
+        return record
+
+    cdef AsmRecord record(self, uint16_t addr):
+        cdef DisassembledPage page = self.page(addr >> 8)
+        cdef uint8_t offset = addr & 0xFF
+
+        if page is None:
+            return self.decode(addr, self.bus.read(addr, True), self.bus.read(addr + 1, True), self.bus.read(addr + 2, True))
+        if offset + page.records[offset].length > 256:
+            return self.decode(addr, page.content[offset], self.bus.read(addr + 1, True), self.bus.read(addr + 2, True))
+        return page.records[offset]
+
+    cdef str line(self, uint16_t addr, AsmRecord* record):
+        cdef uint8_t addrmode = OP_ADDRMODE[record.opcode]
+        cdef uint16_t operand = (record.operands[1] << 8) | record.operands[0]
+        op = LOOKUP[record.opcode]
+
+        if addrmode == AddressingMode.IMP:
+            value = "    "
+        elif addrmode == AddressingMode.IMM:
+            value = "#${value:02X}".format(value = record.operands[0])
+        elif addrmode == AddressingMode.ZP0:
+            value = "${value:02X}".format(value = record.operands[0])
+        elif addrmode == AddressingMode.ZPX:
+            value = "${value:02X},X".format(value = record.operands[0])
+        elif addrmode == AddressingMode.ZPY:
+            value = "${value:02X},Y".format(value = record.operands[0])
+        elif addrmode == AddressingMode.IZX:
+            value = "(${value:02X},X)".format(value = record.operands[0])
+        elif addrmode == AddressingMode.IZY:
+            value = "(${value:02X},Y)".format(value = record.operands[0])
+        elif addrmode == AddressingMode.ABS:
+            value = "${value:02X}".format(value = operand)
+        elif addrmode == AddressingMode.ABX:
+            value = "${value:02X},X".format(value = operand)
+        elif addrmode == AddressingMode.ABY:
+            value = "${value:02X},Y".format(value = operand)
+        elif addrmode == AddressingMode.IND:
+            value = "(${value:02X})".format(value = operand)
+        else:
+            value = "${value:02X} [${offset:04X}]".format(value = record.operands[0], offset = record.target)
+        return "${addr:04X}: {name} {value:11s} ({addrmode})".format(addr = addr, name = op.name, value = value, addrmode = op.addrmode)
+
+    cpdef dict instruction(self, uint16_t addr):
+        '''
+        Decoded instruction starting at addr
+        '''
+        cdef AsmRecord record = self.record(addr)
+        op = LOOKUP[record.opcode]
+
+        return {
+            "addr": addr,
+            "opcode": record.opcode,
+            "name": op.name,
+            "addrmode": op.addrmode,
+            "operands": list(record.operands[:record.length - 1]),
+            "length": record.length,
+            "target": record.target if record.target >= 0 else None,
+        }
+
+    cpdef dict to_asm(self, uint16_t start_addr, uint16_t end_addr):
+        '''
+        Lines of the instructions from start_addr up to end_addr, by address
+        '''
+        cdef dict asm = {}
+        cdef uint32_t addr = start_addr
+        cdef AsmRecord record
+        cdef DisassembledPage page = None
+        cdef int page_number = -1
+        cdef uint8_t offset
+
+        while addr < end_addr:
+            if addr >> 8 != page_number:
+                page_number = addr >> 8
+                page = self.page(page_number)
+            offset = addr & 0xFF
+            if page is not None and offset + page.records[offset].length <= 256:
+                line = page.lines[offset]
+                if line is None:
+                    line = page.lines[offset] = self.line(addr, &page.records[offset])
+                asm[addr] = line
+                addr += page.records[offset].length
+            else:
+                record = self.record(addr)
+                asm[addr] = self.line(addr, &record)
+                addr += record.length
+        return asm
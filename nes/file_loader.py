@@ -1,15 +1,28 @@
 from nes.cart.cart import Cartridge
 from nes.cart.impl.cart_ines import INesCart
 from nes.cart.impl.cart_nes2 import Nes2Cart
+from nes.cart.rom_image import ROMImage
 
 
 class FileLoader:
     @staticmethod
-    def load(filename: str) -> Cartridge:
-        with open(filename, 'rb') as nes_file:
-            nes_version = Cartridge.nes_version(nes_file.read(16))
+    def load(filename: str, nes_version: int = None, ROM_hash: bytes = None) -> Cartridge:
+        '''
+        nes_version: 1 for iNES, 2 for NES 2.0 when already known (e.g. from a RomLibrary index), sniffed from the header otherwise
+        ROM_hash: SHA-1 of the ROM data when already known, computed otherwise
+        '''
+        image = ROMImage(filename)
+        if nes_version is None:
+            nes_version = Cartridge.nes_version(image.header())
+        cartridge_type = FileLoader.cartridge_type(nes_version)
+        if cartridge_type is None:
+            return None
+        return cartridge_type(image, ROM_hash)
+
+    @staticmethod
+    def cartridge_type(nes_version: int) -> type:
         if nes_version == 2:
-            return Nes2Cart(filename)
+            return Nes2Cart
         if nes_version == 1:
-            return INesCart(filename)
+            return INesCart
         return None
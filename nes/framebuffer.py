@@ -0,0 +1,113 @@
+import time
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python 3.7
+    shared_memory = None
+
+
+SCREEN_HEIGHT, SCREEN_WIDTH = 240, 256
+# uint32 frame sequence (twice the frame number, odd while a frame is being written), padding
+HEADER_SIZE = 8
+FRAME_SIZE = SCREEN_HEIGHT * SCREEN_WIDTH * 3
+INDEX_SIZE = SCREEN_HEIGHT * SCREEN_WIDTH
+BLOCK_SIZE = HEADER_SIZE + FRAME_SIZE + INDEX_SIZE
+
+
+def frame_views(buffer) -> tuple:
+    '''
+    (sequence, frame, frame_index) numpy views of a block laid out as:
+    header, RGB frame (240, 256, 3), NES color index frame (240, 256)
+    '''
+    sequence = np.ndarray((1,), dtype = np.uint32, buffer = buffer, offset = 0)
+    frame = np.ndarray((SCREEN_HEIGHT, SCREEN_WIDTH, 3), dtype = np.uint8, buffer = buffer, offset = HEADER_SIZE)
+    frame_index = np.ndarray((SCREEN_HEIGHT, SCREEN_WIDTH), dtype = np.uint8, buffer = buffer, offset = HEADER_SIZE + FRAME_SIZE)
+    return sequence, frame, frame_index
+
+
+def _shared_memory(name: str, create: bool):
+    if shared_memory is None:
+        raise RuntimeError("shared memory frames need multiprocessing.shared_memory (Python 3.8+)")
+    return shared_memory.SharedMemory(name = name, create = create, size = BLOCK_SIZE if create else 0)
+
+
+class SharedFrameBuffer:
+    '''
+    Makes the PPU of console publish every complete frame straight into a shared memory block,
+    other processes attach to it by name with SharedFrameReader, no copy or pickling per frame.
+    '''
+    def __init__(self, console, name: str = None) -> None:
+        self.console = console
+        self.memory = _shared_memory(name, True)
+        self.sequence, self.frame, self.frame_index = frame_views(self.memory.buf)
+        console.bus.ppu.set_frame_buffers(self.frame, self.frame_index, self.sequence)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def close(self) -> None:
+        '''
+        Moves the PPU back to frame buffers of its own, then frees the block
+        '''
+        if self.memory is None:
+            return
+        self.console.bus.ppu.set_frame_buffers(None, None, None)
+        self.sequence = self.frame = self.frame_index = None
+        self.memory.close()
+        self.memory.unlink()
+        self.memory = None
+
+    def __enter__(self) -> "SharedFrameBuffer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class SharedFrameReader:
+    '''
+    Reading side of a SharedFrameBuffer. frame / frame_index are live views and may change while
+    they are read, read() returns a consistent copy.
+    '''
+    def __init__(self, name: str) -> None:
+        self.memory = _shared_memory(name, False)
+        self.sequence, self.frame, self.frame_index = frame_views(self.memory.buf)
+
+    def frame_number(self) -> int:
+        return int(self.sequence[0]) >> 1
+
+    def read(self, out: np.ndarray = None, index: bool = False, timeout: float = 1.0) -> tuple:
+        '''
+        (frame number, copy of the last complete frame), retried while the writer is in the middle of a frame.
+        out:    array to copy into, a new one if None
+        index:  the NES color index frame instead of the RGB one
+        '''
+        source = self.frame_index if index else self.frame
+        if out is None:
+            out = np.empty_like(source)
+        deadline = time.perf_counter() + timeout
+        while True:
+            before = int(self.sequence[0])
+            if before & 1 == 0:
+                np.copyto(out, source)
+                if int(self.sequence[0]) == before:
+                    return before >> 1, out
+            if time.perf_counter() > deadline:
+                raise TimeoutError("no consistent frame within {}s".format(timeout))
+
+    def close(self) -> None:
+        if self.memory is None:
+            return
+        self.sequence = self.frame = self.frame_index = None
+        self.memory.close()
+        self.memory = None
+
+    def __enter__(self) -> "SharedFrameReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,270 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import wave
+
+from nes.console import Console
+from nes.movie import Movie, MovieRecorder, frame_hash
+
+
+class InputScript:
+    '''
+    Scripted controller input, one entry per line:
+
+        <frame> [BUTTON ...]
+
+    The listed buttons are held from <frame> on until the next entry,
+    an entry without buttons releases everything. '#' starts a comment.
+    '''
+    BUTTONS = ["A", "B", "SELECT", "START", "UP", "DOWN", "LEFT", "RIGHT"]
+
+    def __init__(self, entries: dict = None) -> None:
+        self.entries = dict(entries) if entries is not None else {}
+
+    @classmethod
+    def load(cls, path: str) -> "InputScript":
+        with open(path) as script_file:
+            return cls.parse(script_file.read())
+
+    @classmethod
+    def parse(cls, text: str) -> "InputScript":
+        entries = {}
+        for line_no, line in enumerate(text.splitlines(), 1):
+            tokens = line.split("#", 1)[0].split()
+            if not tokens:
+                continue
+            try:
+                frame = int(tokens[0])
+            except ValueError:
+                raise ValueError("line {}: invalid frame number '{}'".format(line_no, tokens[0]))
+            pressed = [0] * len(cls.BUTTONS)
+            for button in tokens[1:]:
+                button = button.upper()
+                if button not in cls.BUTTONS:
+                    raise ValueError("line {}: unknown button '{}'".format(line_no, button))
+                pressed[cls.BUTTONS.index(button)] = 1
+            entries[frame] = pressed
+        return cls(entries)
+
+    def pressed(self, frame: int) -> list:
+        return self.entries.get(frame)
+
+
+class HeadlessRunner:
+    '''
+    Drives a Console without any GUI, as fast as the core allows.
+    '''
+    def __init__(self, rom, script: InputScript = None, per_clock: bool = False, idle_skip: bool = True, blocks: bool = True) -> None:
+        self.rom = rom
+        self.script = script if script is not None else InputScript()
+        self.console = Console(rom)
+        self.console.bus.per_clock = per_clock
+        self.console.bus.idle_loop.enabled = idle_skip
+        self.console.bus.blocks.enabled = blocks
+        self.console.power_up()
+        self.frame_count = 0
+        self.recorder = None
+
+    def step(self, render: bool = True) -> None:
+        '''
+        render: draw the frame, see Console.frame
+        A breakpoint hit can stop the frame early (see stopped), the next step goes on with it.
+        '''
+        frame_count = self.console.frame_count
+        pressed = self.script.pressed(self.frame_count)
+        if pressed is not None:
+            self.console.control(pressed)
+        if self.recorder is not None:
+            self.recorder.frame(render)
+        else:
+            self.console.frame(render)
+        if self.console.frame_count != frame_count:
+            self.frame_count += 1
+
+    def stopped(self) -> dict:
+        '''
+        What the breakpoints stopped the last step at, None if nothing did
+        '''
+        breakpoints = self.console.bus.breakpoints
+        return breakpoints.hit if breakpoints.active else None
+
+    def record(self, from_state: bool = False, hashes: bool = False) -> Movie:
+        '''
+        Logs the input of every following step into the returned Movie
+        '''
+        self.recorder = MovieRecorder(self.console, from_state, hashes)
+        return self.recorder.movie
+
+    def play(self, movie: Movie, verify: bool = True) -> dict:
+        '''
+        Replays movie from its start, optionally checking the screen / RAM hash of every frame.
+        Stops at the first frame whose hash differs from the recorded one.
+        '''
+        if movie.ROM_hash != self.console.bus.cartridge.ROM_hash:
+            raise ValueError("movie was recorded with another ROM ({})".format(movie.ROM_hash.hex()))
+        if movie.state is not None:
+            self.console.restore_state(movie.state)
+        elif self.console.started:
+            raise ValueError("console has already run, power-on movies are played on a new HeadlessRunner")
+        else:
+            self.console.power_up()
+        self.frame_count = 0
+
+        verify = verify and movie.hashes is not None
+        self.console.bus.apu.output_enabled = False
+        divergent_frame, divergence = None, None
+        start = time.perf_counter()
+        for frame in range(movie.frames):
+            self.console.set_controllers(*movie.controllers(frame))
+            # without hashes to check only the frame played to is drawn
+            self.console.frame(verify or frame == movie.frames - 1)
+            self.frame_count += 1
+            if verify:
+                expected, actual = movie.frame_hash(frame), frame_hash(self.console)
+                if actual != expected:
+                    divergent_frame = frame
+                    divergence = [name for name, offset in (("screen", 0), ("ram", 8)) if actual[offset:offset + 8] != expected[offset:offset + 8]]
+                    break
+        elapsed = time.perf_counter() - start
+
+        return {
+            "rom": self.rom if isinstance(self.rom, str) else None,
+            "frames": self.frame_count,
+            "elapsed": elapsed,
+            "fps": self.frame_count / elapsed if elapsed > 0 else 0.0,
+            "verified": verify,
+            "first_divergent_frame": divergent_frame,
+            "divergence": divergence,
+            "screen_sha1": self.screen_hash(),
+        }
+
+    def screen_hash(self) -> str:
+        return hashlib.sha1(memoryview(self.console.bus.ppu.screen()).cast("B")).hexdigest()
+
+    def ram(self) -> bytes:
+        return self.console.bus.dump_ram()
+
+    def dump_frame(self, path: str) -> None:
+        # binary PPM, readable by most image tools without extra dependencies
+        with open(path, "wb") as frame_file:
+            frame_file.write(b"P6\n256 240\n255\n")
+            frame_file.write(memoryview(self.console.bus.ppu.screen()).cast("B"))
+
+    def run(self, frames: int, dump_dir: str = None, dump_every: int = 0, state_path: str = None, wav_path: str = None, render: bool = True) -> dict:
+        '''
+        render: False draws only the frames that are dumped and the last one
+        '''
+        if dump_dir is not None and not os.path.exists(dump_dir):
+            os.makedirs(dump_dir)
+
+        apu = self.console.bus.apu
+        wav_file = None
+        if wav_path is not None:
+            # 16 bit mono, drained from the APU ring buffer after every frame
+            wav_file = wave.open(wav_path, "wb")
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(apu.sample_rate)
+            apu.read_samples()
+        apu.output_enabled = wav_file is not None
+
+        start = time.perf_counter()
+        first_frame = self.frame_count
+        try:
+            for frame in range(frames):
+                dumped = dump_dir is not None and dump_every > 0 and (self.frame_count + 1) % dump_every == 0
+                self.step(render or dumped or frame == frames - 1)
+                if self.stopped() is not None:
+                    break
+                if wav_file is not None:
+                    wav_file.writeframes(apu.read_samples().astype("<i2").tobytes())
+                if dump_dir is not None and dump_every > 0 and self.frame_count % dump_every == 0:
+                    self.dump_frame(os.path.join(dump_dir, "{:06d}.ppm".format(self.frame_count)))
+        finally:
+            if wav_file is not None:
+                wav_file.close()
+        elapsed = time.perf_counter() - start
+
+        if dump_dir is not None:
+            self.dump_frame(os.path.join(dump_dir, "final.ppm"))
+        if state_path is not None:
+            self.console.save_state(state_path)
+
+        return {
+            "rom": self.rom if isinstance(self.rom, str) else None,
+            "frames": self.frame_count,
+            "elapsed": elapsed,
+            "fps": (self.frame_count - first_frame) / elapsed if elapsed > 0 else 0.0,
+            "screen_sha1": self.screen_hash(),
+            "registers": self.console.cpu_debugger.registers(),
+            "break": self.stopped(),
+            "idle_skipped_cycles": self.console.bus.idle_loop.skipped_cycles,
+            "block_instructions": self.console.bus.blocks.instructions,
+        }
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description = "Run a NES ROM without GUI")
+    parser.add_argument("rom", help = ".nes file to run")
+    parser.add_argument("-n", "--frames", type = int, default = 600, help = "number of frames to run")
+    parser.add_argument("-i", "--input", help = "scripted input file")
+    parser.add_argument("-d", "--dump-dir", help = "directory to write frames (PPM) to")
+    parser.add_argument("-e", "--dump-every", type = int, default = 0, help = "write every N-th frame, 0 for final frame only")
+    parser.add_argument("-s", "--save-state", help = "write the final state to this archive")
+    parser.add_argument("-w", "--wav", help = "write the audio output to this WAV file")
+    parser.add_argument("-l", "--load-state", help = "start from this save state instead of power-on")
+    parser.add_argument("-r", "--record", help = "write the controller input of the run to this movie file")
+    parser.add_argument("--record-hashes", action = "store_true", help = "store a screen / RAM hash per frame in the movie")
+    parser.add_argument("-p", "--play", help = "replay this movie file instead of running --frames")
+    parser.add_argument("--no-verify", action = "store_true", help = "do not check the per frame hashes of the replayed movie")
+    parser.add_argument("--profile", help = "write per opcode / PC / subsystem counters of the run to this JSON file")
+    parser.add_argument("--flamegraph", help = "write the profile of the run as folded stacks (flamegraph.pl, speedscope) to this file")
+    parser.add_argument("--per-clock", action = "store_true", help = "step the bus one master clock at a time (slow, for accuracy debugging)")
+    parser.add_argument("--no-idle-skip", action = "store_true", help = "execute idle loops instead of only clocking the PPU through them")
+    parser.add_argument("--no-render", action = "store_true", help = "draw only the frames that are dumped and the last one, the state is the same")
+    parser.add_argument("--no-blocks", action = "store_true", help = "sync the PPU after every instruction instead of after runs of pre-decoded ones")
+    parser.add_argument("--break-at", action = "append", default = [], metavar = "ADDR", help = "stop the run before the instruction at this hex address")
+    parser.add_argument("--watch-read", action = "append", default = [], metavar = "ADDR", help = "stop the run after a read of this hex CPU address, ppu:ADDR for PPU memory read through $2007")
+    parser.add_argument("--watch-write", action = "append", default = [], metavar = "ADDR", help = "stop the run after a write to this hex CPU address, ppu:ADDR for PPU memory written through $2007")
+    parser.add_argument("--break-if", action = "append", default = [], metavar = "REG=VALUE", help = "stop the run before an instruction while register A, X, Y, SP or P holds this hex value")
+    args = parser.parse_args(argv)
+
+    script = InputScript.load(args.input) if args.input else None
+    runner = HeadlessRunner(args.rom, script, args.per_clock, not args.no_idle_skip, not args.no_blocks)
+    if args.play:
+        summary = runner.play(Movie.load(args.play), not args.no_verify)
+        print(json.dumps(summary, indent = 2))
+        return 1 if summary["first_divergent_frame"] is not None else 0
+
+    if args.load_state:
+        runner.console.load_state(args.load_state)
+    breakpoints = runner.console.bus.breakpoints
+    for addr in args.break_at:
+        breakpoints.add_breakpoint(int(addr, 16))
+    for mode, addrs in (("r", args.watch_read), ("w", args.watch_write)):
+        for addr in addrs:
+            PPU = addr.lower().startswith("ppu:")
+            breakpoints.add_watchpoint(int(addr[4:] if PPU else addr, 16), mode, PPU)
+    for condition in args.break_if:
+        register, _, value = condition.partition("=")
+        breakpoints.add_condition(register, int(value, 16))
+    movie = runner.record(args.load_state is not None, args.record_hashes) if args.record else None
+    profiler = runner.console.enable_profiler() if args.profile or args.flamegraph else None
+    summary = runner.run(args.frames, args.dump_dir, args.dump_every, args.save_state, args.wav, not args.no_render)
+    if movie is not None:
+        movie.save(args.record)
+    if profiler is not None and args.profile:
+        with open(args.profile, "w") as profile_file:
+            json.dump(profiler.report(), profile_file, indent = 2)
+    if profiler is not None and args.flamegraph:
+        with open(args.flamegraph, "w") as flamegraph_file:
+            flamegraph_file.write("\n".join(profiler.flamegraph()) + "\n")
+    print(json.dumps(summary, indent = 2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
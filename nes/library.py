@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import sys
+
+from nes.cart.cart import Cartridge
+from nes.cart.rom_image import ROMImage
+from nes.file_loader import FileLoader
+from nes.mapper.mapper_factory import MapperFactory
+
+
+INDEX_VERSION = 1
+# default index file, kept in the indexed directory
+INDEX_NAME = ".nes_index.json"
+ROM_EXTENSIONS = (".nes",)
+FORMATS = {1: "iNES", 2: "NES 2.0"}
+
+
+def describe(path: str) -> dict:
+    '''
+    Index entry of one file: format, header metadata and ROM hash (same as Cartridge.ROM_hash),
+    format None for files that are no iNES / NES 2.0 ROM
+    '''
+    entry = {"format": None, "nes_version": 0, "supported": False}
+    try:
+        image = ROMImage(path)
+        nes_version = Cartridge.nes_version(image.header())
+        cartridge_type = FileLoader.cartridge_type(nes_version)
+        if cartridge_type is not None:
+            entry.update(cartridge_type.describe(image))
+            entry["format"] = FORMATS[nes_version]
+            entry["nes_version"] = nes_version
+            entry["supported"] = MapperFactory.supports(entry["mapper"])
+    except (OSError, ValueError, IndexError) as error:
+        entry["error"] = str(error)
+    return entry
+
+
+class RomLibrary:
+    '''
+    Persistent index of the ROMs below a directory. Files are parsed once, later scans only
+    stat them and reuse the entry while size and modification time are unchanged.
+    '''
+    def __init__(self, directory: str, index_path: str = None) -> None:
+        self.directory = os.path.abspath(directory)
+        self.index_path = index_path if index_path is not None else os.path.join(self.directory, INDEX_NAME)
+        # path relative to directory -> entry
+        self.entries = {}
+        self.load_index()
+
+    def load_index(self) -> None:
+        self.entries = {}
+        try:
+            with open(self.index_path, "r") as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return
+        if index.get("version") != INDEX_VERSION:
+            return
+        for entry in index["roms"]:
+            # mappers may have been added since the entry was written
+            if entry["format"] is not None:
+                entry["supported"] = MapperFactory.supports(entry["mapper"])
+            self.entries[entry["path"]] = entry
+
+    def save(self) -> None:
+        index = {
+            "version": INDEX_VERSION,
+            "roms": sorted(self.entries.values(), key = lambda entry: entry["path"]),
+        }
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w") as index_file:
+            json.dump(index, index_file, indent = 1)
+        os.replace(temp_path, self.index_path)
+
+    def scan(self) -> dict:
+        '''
+        Brings the index up to date with the directory and saves it if anything changed
+        '''
+        found, parsed = set(), 0
+        for root, dirs, files in os.walk(self.directory):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.lower().endswith(ROM_EXTENSIONS):
+                    continue
+                full_path = os.path.join(root, name)
+                path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+                stat = os.stat(full_path)
+                found.add(path)
+                entry = self.entries.get(path)
+                if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                    continue
+                entry = {"path": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                entry.update(describe(full_path))
+                self.entries[path] = entry
+                parsed += 1
+        removed = [path for path in self.entries if path not in found]
+        for path in removed:
+            del self.entries[path]
+        if parsed > 0 or removed:
+            self.save()
+        return {"roms": len(self.entries), "parsed": parsed, "removed": len(removed)}
+
+    def path(self, entry: dict) -> str:
+        return os.path.join(self.directory, entry["path"])
+
+    def roms(self, supported: bool = None, mapper: int = None) -> list:
+        '''
+        Entries of ROMs, only those with mappers the emulator has (or has not) if supported is given
+        '''
+        return [entry for path, entry in sorted(self.entries.items())
+                if entry["format"] is not None
+                and (supported is None or entry["supported"] == supported)
+                and (mapper is None or entry["mapper"] == mapper)]
+
+    def load(self, entry: dict) -> Cartridge:
+        '''
+        Cartridge of an indexed ROM, format and ROM hash are taken from the index instead of sniffed and
+        computed again while the file is unchanged since it was indexed
+        '''
+        path = self.path(entry)
+        stat = os.stat(path)
+        if entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            return FileLoader.load(path)
+        return FileLoader.load(path, entry["nes_version"], bytes.fromhex(entry["sha1"]))
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description = "Index the NES ROMs below a directory")
+    parser.add_argument("directory", help = "directory to scan")
+    parser.add_argument("-x", "--index", help = "index file, <directory>/{} by default".format(INDEX_NAME))
+    parser.add_argument("--supported", action = "store_true", help = "list only ROMs whose mapper is supported")
+    parser.add_argument("--unsupported", action = "store_true", help = "list only ROMs whose mapper is not supported")
+    parser.add_argument("-m", "--mapper", type = int, help = "list only ROMs with this mapper number")
+    args = parser.parse_args(argv)
+
+    library = RomLibrary(args.directory, args.index)
+    summary = library.scan()
+    supported = True if args.supported else False if args.unsupported else None
+    for entry in library.roms(supported, args.mapper):
+        print(json.dumps(entry), flush = True)
+    print(json.dumps(summary), file = sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
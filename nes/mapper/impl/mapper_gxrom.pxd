@@ -6,3 +6,6 @@ from nes.mapper.mapper cimport Mapper
 cdef class MapperGxROM(Mapper):
     cdef uint8_t CHR_bank_select
     cdef uint8_t PRG_bank_select
+
+    cdef bytes save_registers(self)
+    cdef void load_registers(self, bytes)
@@ -7,6 +7,7 @@ cdef class MapperGxROM(Mapper):
     def __init__(self, uint8_t PRG_banks, uint8_t CHR_banks):
         super().__init__(PRG_banks, CHR_banks)
         self.mapper_no = "066"
+        self.CHR_switchable = True
 
         self.CHR_bank_select = 0x00
         self.PRG_bank_select = 0x00    
@@ -23,6 +24,8 @@ cdef class MapperGxROM(Mapper):
         if addr >= 0x8000 and addr <= 0xFFFF:
             self.CHR_bank_select = data & 0x03
             self.PRG_bank_select = (data & 0x30) >> 4
+            self.PRG_switched = True
+            self.CHR_switched = True
 
         cdef CPUWriteMapping mapping = CPUWriteMapping()
         return mapping
@@ -40,5 +43,13 @@ cdef class MapperGxROM(Mapper):
         cdef PPUWriteMapping mapping = PPUWriteMapping()
         return mapping
 
+    cdef bytes save_registers(self):
+        return bytes((self.CHR_bank_select, self.PRG_bank_select))
+
+    cdef void load_registers(self, bytes registers):
+        self.CHR_bank_select, self.PRG_bank_select = registers[0], registers[1]
+        self.PRG_switched = True
+        self.CHR_switched = True
+
     cdef void reset(self):
         self.CHR_bank_select, self.PRG_bank_select = 0, 0
@@ -5,3 +5,6 @@ from nes.mapper.mapper cimport Mapper
 
 cdef class MapperINES003(Mapper):
     cdef uint8_t CHR_bank_select
+
+    cdef bytes save_registers(self)
+    cdef void load_registers(self, bytes)
@@ -7,6 +7,7 @@ cdef class MapperINES003(Mapper):
     def __init__(self, uint8_t PRG_banks, uint8_t CHR_banks):
         super().__init__(PRG_banks, CHR_banks)
         self.mapper_no = "003"
+        self.CHR_switchable = True
         
         self.CHR_bank_select = 0x00    
 
@@ -26,6 +27,7 @@ cdef class MapperINES003(Mapper):
 
         if 0x8000 <= addr <= 0xFFFF:
             self.CHR_bank_select = data & 0x03
+            self.CHR_switched = True
             mapping.addr = addr
         return mapping
 
@@ -41,5 +43,12 @@ cdef class MapperINES003(Mapper):
         cdef PPUWriteMapping mapping = PPUWriteMapping()
         return mapping
 
+    cdef bytes save_registers(self):
+        return bytes((self.CHR_bank_select,))
+
+    cdef void load_registers(self, bytes registers):
+        self.CHR_bank_select = registers[0]
+        self.CHR_switched = True
+
     cdef void reset(self):
         self.CHR_bank_select = 0
@@ -1,4 +1,4 @@
-from libc.stdint cimport uint8_t
+from libc.stdint cimport uint8_t, uint16_t
 
 from nes.mapper.mapper cimport Mapper
 
@@ -19,3 +19,8 @@ cdef class MapperMMC1(Mapper):
     cdef uint8_t mirrormode
 
     cdef uint8_t[:] RAM_static
+
+    cdef uint8_t* RAM_page(self, uint16_t)
+
+    cdef bytes save_registers(self)
+    cdef void load_registers(self, bytes)
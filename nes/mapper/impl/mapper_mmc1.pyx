@@ -10,6 +10,7 @@ cdef class MapperMMC1(Mapper):
     def __init__(self, uint8_t PRG_banks, uint8_t CHR_banks):
         super().__init__(PRG_banks, CHR_banks)
         self.mapper_no = "001"
+        self.CHR_switchable = CHR_banks > 0
 
         self.RAM_static = np.zeros(32768).astype(np.uint8)
         self.CHR_bank_select_4_lo, self.CHR_bank_select_4_hi, self.CHR_bank_select_8 = 0x00, 0x00, 0x00
@@ -49,6 +50,7 @@ cdef class MapperMMC1(Mapper):
                 self.load_register = 0x00
                 self.load_register_count = 0
                 self.control_register = self.control_register | 0x0C
+                self.PRG_switched = True
             else:
                 self.load_register >>= 1
                 self.load_register |= (data & 0x01) << 4
@@ -57,6 +59,9 @@ cdef class MapperMMC1(Mapper):
                     target_register = (addr >> 13) & 0x03
                     if target_register == 0:
                         self.control_register = self.load_register & 0x1F
+                        self.PRG_switched = True
+                        self.CHR_switched = True
+                        self.mirror_switched = True
                         switch = self.control_register & 0x03
                         if switch == 0:
                             self.mirrormode = ONESCREEN_LO
@@ -71,9 +76,11 @@ cdef class MapperMMC1(Mapper):
                             self.CHR_bank_select_4_lo = self.load_register & 0x1F
                         else:
                             self.CHR_bank_select_8 = self.load_register & 0x1E
+                        self.CHR_switched = True
                     elif target_register == 2:
                         if self.control_register & 0b10000 != 0:
                             self.CHR_bank_select_4_hi = self.load_register & 0x1F
+                            self.CHR_switched = True
                     elif target_register == 3:
                         PRG_mode = (self.control_register >> 2) & 0x03
                         if PRG_mode == 0 or PRG_mode == 1:
@@ -84,10 +91,16 @@ cdef class MapperMMC1(Mapper):
                         elif PRG_mode == 3:
                             self.PRG_bank_select_16_lo = self.load_register & 0x0F
                             self.PRG_bank_select_16_hi = self.PRG_banks - 1
+                        self.PRG_switched = True
                     self.load_register = 0x00
                     self.load_register_count = 0
         return mapping                     
 
+    cdef uint8_t* RAM_page(self, uint16_t addr):
+        if 0x6000 <= addr <= 0x7FFF:
+            return &self.RAM_static[addr & 0x1FFF]
+        return NULL
+
     cdef PPUReadMapping mapReadByPPU(self, uint16_t addr):
         cdef PPUReadMapping mapping = PPUReadMapping()
 
@@ -117,6 +130,23 @@ cdef class MapperMMC1(Mapper):
                 mapping.addr = addr
         return mapping
         
+    cdef bytes save_registers(self):
+        return bytes((
+            self.CHR_bank_select_4_lo, self.CHR_bank_select_4_hi, self.CHR_bank_select_8,
+            self.PRG_bank_select_16_lo, self.PRG_bank_select_16_hi, self.PRG_bank_select_32,
+            self.load_register, self.load_register_count, self.control_register,
+            self.mirrormode
+        ))
+
+    cdef void load_registers(self, bytes registers):
+        self.CHR_bank_select_4_lo, self.CHR_bank_select_4_hi, self.CHR_bank_select_8 = registers[0:3]
+        self.PRG_bank_select_16_lo, self.PRG_bank_select_16_hi, self.PRG_bank_select_32 = registers[3:6]
+        self.load_register, self.load_register_count, self.control_register = registers[6:9]
+        self.mirrormode = registers[9]
+        self.PRG_switched = True
+        self.CHR_switched = True
+        self.mirror_switched = True
+
     cdef void reset(self):
         self.control_register, self.load_register, self.load_register_count = 0x1C, 0x00, 0x00 
         self.CHR_bank_select_4_lo, self.CHR_bank_select_4_hi, self.CHR_bank_select_8, = 0x00, 0x00, 0x00
@@ -20,3 +20,8 @@ cdef class MapperMMC3(Mapper):
     cdef uint16_t IRQ_reload
 
     cdef uint8_t[:] RAM_static
+
+    cdef uint8_t* RAM_page(self, uint16_t)
+
+    cdef bytes save_registers(self)
+    cdef void load_registers(self, bytes)
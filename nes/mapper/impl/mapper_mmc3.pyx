@@ -1,3 +1,5 @@
+import struct
+
 import numpy as np
 cimport numpy as np
 
@@ -5,11 +7,16 @@ from nes.mapper.mapping cimport CPUReadMapping, CPUWriteMapping, PPUReadMapping,
 from nes.mapper.mirror cimport HORIZONTAL, VERTICAL
 
 
+# target register, PRG bank mode, CHR inversion, mirroring, R0-R7, CHR banks, PRG banks,
+# IRQ active / enable / update, IRQ counter, IRQ reload
+REGISTERS = struct.Struct("<4B8I8I4I3B2H")
+
 # TODO
 cdef class MapperMMC3(Mapper):
     def __init__(self, uint8_t PRG_banks, uint8_t CHR_banks):
         super().__init__(PRG_banks, CHR_banks)
         self.mapper_no = "004"
+        self.CHR_switchable = True
         
         self.target_register = 0x00  
         self.PRG_bank_mode = False
@@ -81,6 +88,7 @@ cdef class MapperMMC3(Mapper):
                     self.CHR_bank[5] = self.register[3] * 0x0400
                     self.CHR_bank[6] = self.register[4] * 0x0400
                     self.CHR_bank[7] = self.register[5] * 0x0400
+                self.CHR_switched = True
         
                 if self.PRG_bank_mode > 0:
                     self.PRG_bank[2] = (self.register[6] & 0x3F) * 0x2000
@@ -90,12 +98,14 @@ cdef class MapperMMC3(Mapper):
                     self.PRG_bank[2] = (self.PRG_banks * 2 - 2) * 0x2000  
                 self.PRG_bank[1] = (self.register[7] & 0x3F) * 0x2000
                 self.PRG_bank[3] = (self.PRG_banks * 2 - 1) * 0x2000
+                self.PRG_switched = True
         if 0xA000 <= addr <= 0xBFFF:
             if addr & 0x0001 == 0:
                 if data & 0x01 > 0:
                     self.mirrormode = HORIZONTAL
                 else:
                     self.mirrormode = VERTICAL
+                self.mirror_switched = True
         if 0xC000 <= addr <= 0xDFFF:
             if addr & 0x0001 == 0:
                 self.IRQ_reload = data
@@ -110,6 +120,11 @@ cdef class MapperMMC3(Mapper):
 
         return mapping
 
+    cdef uint8_t* RAM_page(self, uint16_t addr):
+        if 0x6000 <= addr <= 0x7FFF:
+            return &self.RAM_static[addr & 0x1FFF]
+        return NULL
+
     cdef PPUReadMapping mapReadByPPU(self, uint16_t addr):
         cdef PPUReadMapping mapping = PPUReadMapping()
 
@@ -144,6 +159,24 @@ cdef class MapperMMC3(Mapper):
         cdef PPUWriteMapping mapping = PPUWriteMapping()
         return mapping
 
+    cdef bytes save_registers(self):
+        return REGISTERS.pack(
+            self.target_register, self.PRG_bank_mode, self.CHR_inversion, self.mirrormode,
+            *self.register, *self.CHR_bank, *self.PRG_bank,
+            self.IRQ_active, self.IRQ_enable, self.IRQ_update, self.IRQ_counter, self.IRQ_reload
+        )
+
+    cdef void load_registers(self, bytes registers):
+        values = REGISTERS.unpack(registers)
+        self.target_register, self.PRG_bank_mode, self.CHR_inversion, self.mirrormode = values[0:4]
+        self.register = values[4:12]
+        self.CHR_bank = values[12:20]
+        self.PRG_bank = values[20:24]
+        self.IRQ_active, self.IRQ_enable, self.IRQ_update, self.IRQ_counter, self.IRQ_reload = values[24:29]
+        self.PRG_switched = True
+        self.CHR_switched = True
+        self.mirror_switched = True
+
     cdef void reset(self):
         self.target_register = 0x00
         self.PRG_bank_mode = False
@@ -6,3 +6,6 @@ from nes.mapper.mapper cimport Mapper
 cdef class MapperUxROM(Mapper):
     cdef uint8_t PRG_bank_select_lo
     cdef uint8_t PRG_bank_select_hi
+
+    cdef bytes save_registers(self)
+    cdef void load_registers(self, bytes)
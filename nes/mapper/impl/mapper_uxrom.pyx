@@ -26,6 +26,7 @@ cdef class MapperUxROM(Mapper):
 
         if 0x8000 <= addr <= 0xFFFF:
             self.PRG_bank_select_lo = data & 0x0F
+            self.PRG_switched = True
         return mapping
 
     cdef PPUReadMapping mapReadByPPU(self, uint16_t addr):
@@ -42,5 +43,12 @@ cdef class MapperUxROM(Mapper):
         mapping.addr = addr
         return mapping
 
+    cdef bytes save_registers(self):
+        return bytes((self.PRG_bank_select_lo, self.PRG_bank_select_hi))
+
+    cdef void load_registers(self, bytes registers):
+        self.PRG_bank_select_lo, self.PRG_bank_select_hi = registers[0], registers[1]
+        self.PRG_switched = True
+
     cdef void reset(self):
         self.PRG_bank_select_lo, self.PRG_bank_select_hi = 0, self.PRG_banks - 1
@@ -9,11 +9,23 @@ cdef class Mapper:
     cdef uint8_t PRG_banks
     cdef uint8_t CHR_banks
 
+    cdef bint PRG_switched
+    # CHR banks can be switched by register writes / have been switched since the PPU last looked
+    cdef bint CHR_switchable
+    cdef bint CHR_switched
+    # nametable mirroring has been switched since the PPU last looked
+    cdef bint mirror_switched
+
     cdef CPUReadMapping mapReadByCPU(self, uint16_t addr)
     cdef CPUWriteMapping mapWriteByCPU(self, uint16_t, uint8_t)
     cdef PPUReadMapping mapReadByPPU(self, uint16_t)
     cdef PPUWriteMapping mapWriteByPPU(self, uint16_t)
 
+    cdef uint8_t* RAM_page(self, uint16_t)
+
+    cdef bytes save_registers(self)
+    cdef void load_registers(self, bytes)
+
     cdef void reset(self)
 
     cdef uint8_t mirror(self)
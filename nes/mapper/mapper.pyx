@@ -7,6 +7,10 @@ cdef class Mapper:
     def __init__(self, uint8_t PRG_banks, uint8_t CHR_banks):
         self.PRG_banks = PRG_banks
         self.CHR_banks = CHR_banks
+        self.PRG_switched = True
+        self.CHR_switchable = False
+        self.CHR_switched = True
+        self.mirror_switched = True
 
         self.reset()
 
@@ -26,6 +30,22 @@ cdef class Mapper:
     cdef PPUWriteMapping mapWriteByPPU(self, uint16_t addr):
         pass
 
+    cdef uint8_t* RAM_page(self, uint16_t addr):
+        '''
+        Page of the mapper's own RAM at $6000-$7FFF that CPU reads and writes may access
+        directly, NULL if the address is not backed by such RAM
+        '''
+        return NULL
+
+    cdef bytes save_registers(self):
+        '''
+        Bank / IRQ registers packed for save states, RAM is saved separately through RAM_page
+        '''
+        return b""
+
+    cdef void load_registers(self, bytes registers):
+        pass
+
     cdef void reset(self):
         pass
 
@@ -20,3 +20,7 @@ cdef class MapperFactory:
     cdef Mapper of(int mapper_no):
         mapper_name = "{:03d}".format(mapper_no)
         return <Mapper> mappers[mapper_name]
+
+    @staticmethod
+    def supports(int mapper_no) -> bool:
+        return "{:03d}".format(mapper_no) in mappers
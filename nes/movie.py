@@ -0,0 +1,124 @@
+import hashlib
+import struct
+
+
+# magic, version, flags, ROM hash, frame count, size of the start state
+HEADER = struct.Struct("<4sHH20sII")
+
+MOVIE_MAGIC = b"NESM"
+MOVIE_VERSION = 1
+
+# the movie starts from a save state instead of power-on
+FLAG_STATE = 0x0001
+# every frame carries a screen / RAM hash for verification
+FLAG_HASHES = 0x0002
+
+# bytes of one frame hash: 8 for the screen, 8 for the internal RAM
+HASH_SIZE = 16
+
+
+def frame_hash(console) -> bytes:
+    screen_hash = hashlib.blake2b(memoryview(console.bus.ppu.screen()).cast("B"), digest_size = 8).digest()
+    ram_hash = hashlib.blake2b(console.bus.dump_ram(), digest_size = 8).digest()
+    return screen_hash + ram_hash
+
+
+class Movie:
+    '''
+    Controller bytes of both ports for every frame of a run, starting from power-on or a save state.
+
+    Layout: HEADER, start state (if FLAG_STATE), 2 controller bytes per frame, HASH_SIZE bytes per frame (if FLAG_HASHES)
+    '''
+    def __init__(self, ROM_hash: bytes, state: bytes = None, inputs: bytes = b"", hashes: bytes = None) -> None:
+        self.ROM_hash = ROM_hash if ROM_hash is not None else bytes(20)
+        self.state = state
+        self.inputs = bytearray(inputs)
+        self.hashes = bytearray(hashes) if hashes is not None else None
+
+    @property
+    def frames(self) -> int:
+        return len(self.inputs) // 2
+
+    def controllers(self, frame: int) -> tuple:
+        return self.inputs[2 * frame], self.inputs[2 * frame + 1]
+
+    def frame_hash(self, frame: int) -> bytes:
+        if self.hashes is None:
+            return None
+        return bytes(self.hashes[HASH_SIZE * frame:HASH_SIZE * (frame + 1)])
+
+    def append(self, controller_1: int, controller_2: int, digest: bytes = None) -> None:
+        self.inputs.append(controller_1)
+        self.inputs.append(controller_2)
+        if self.hashes is not None:
+            self.hashes += digest
+
+    def to_bytes(self) -> bytes:
+        flags = 0
+        if self.state is not None:
+            flags |= FLAG_STATE
+        if self.hashes is not None:
+            flags |= FLAG_HASHES
+        state = self.state if self.state is not None else b""
+        data = [HEADER.pack(MOVIE_MAGIC, MOVIE_VERSION, flags, self.ROM_hash, self.frames, len(state)), state, bytes(self.inputs)]
+        if self.hashes is not None:
+            data.append(bytes(self.hashes))
+        return b"".join(data)
+
+    @classmethod
+    def from_bytes(cls, data) -> "Movie":
+        data = memoryview(data)
+        if len(data) < HEADER.size:
+            raise ValueError("movie is truncated")
+        magic, version, flags, ROM_hash, frames, state_size = HEADER.unpack_from(data)
+        if magic != MOVIE_MAGIC:
+            raise ValueError("not a movie file")
+        if version > MOVIE_VERSION:
+            raise ValueError("movie version {} is newer than supported version {}".format(version, MOVIE_VERSION))
+
+        offset = HEADER.size
+        hashes_size = HASH_SIZE * frames if flags & FLAG_HASHES else 0
+        if len(data) < offset + state_size + 2 * frames + hashes_size:
+            raise ValueError("movie is truncated")
+        state = bytes(data[offset:offset + state_size]) if flags & FLAG_STATE else None
+        offset += state_size
+        inputs = bytes(data[offset:offset + 2 * frames])
+        offset += 2 * frames
+        hashes = bytes(data[offset:offset + hashes_size]) if flags & FLAG_HASHES else None
+        return cls(ROM_hash, state, inputs, hashes)
+
+    @classmethod
+    def load(cls, path: str) -> "Movie":
+        with open(path, "rb") as movie_file:
+            return cls.from_bytes(movie_file.read())
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as movie_file:
+            movie_file.write(self.to_bytes())
+
+
+class MovieRecorder:
+    '''
+    Runs a Console frame by frame and logs the controller bytes it was given.
+    '''
+    def __init__(self, console, from_state: bool = False, hashes: bool = False) -> None:
+        '''
+        from_state: start from the current state of console instead of powering it up, needed once
+                    console has run or loaded a state (power_up leaves RAM and mapper state as they are)
+        hashes:     store a screen / RAM hash after every frame
+        '''
+        self.console = console
+        if not from_state:
+            if console.started:
+                raise ValueError("console has already run, record with from_state = True or from a new Console")
+            self.console.power_up()
+        state = self.console.dump_state() if from_state else None
+        self.movie = Movie(self.console.bus.cartridge.ROM_hash, state, hashes = b"" if hashes else None)
+
+    def frame(self, render: bool = True) -> None:
+        '''
+        render: draw the frame, always done when hashes are stored
+        '''
+        controller_1, controller_2 = self.console.controllers()
+        self.console.frame(render or self.movie.hashes is not None)
+        self.movie.append(controller_1, controller_2, frame_hash(self.console) if self.movie.hashes is not None else None)
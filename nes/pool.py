@@ -0,0 +1,109 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from collections import namedtuple
+
+from nes.file_loader import FileLoader
+from nes.headless import HeadlessRunner, InputScript
+from nes.library import RomLibrary
+
+
+# tag:        anything picklable, handed back with the result
+# rom:        path of the .nes file
+# frames:     number of frames to run
+# script:     InputScript or None
+# hash_every: hash the screen every N frames, 0 for the final frame only
+Job = namedtuple("Job", ["tag", "rom", "frames", "script", "hash_every"], defaults = (None, 0))
+
+# ROMs parsed by the current worker process, keyed by path
+_cartridges = {}
+
+def _cartridge(rom: str):
+    if rom not in _cartridges:
+        _cartridges[rom] = FileLoader.load(rom)
+    return _cartridges[rom]
+
+def _run(job: Job) -> dict:
+    start = time.perf_counter()
+    runner = HeadlessRunner(_cartridge(job.rom).clone(), job.script)
+    frame_hashes = []
+    for _ in range(job.frames):
+        runner.step()
+        if job.hash_every > 0 and runner.frame_count % job.hash_every == 0:
+            frame_hashes.append(runner.screen_hash())
+    if job.hash_every <= 0 or runner.frame_count % job.hash_every != 0:
+        frame_hashes.append(runner.screen_hash())
+    return {
+        "tag": job.tag,
+        "rom": job.rom,
+        "frames": runner.frame_count,
+        "frame_hashes": frame_hashes,
+        "ram": runner.ram(),
+        "registers": runner.console.cpu_debugger.registers(),
+        "elapsed": time.perf_counter() - start,
+        "pid": os.getpid(),
+    }
+
+
+class ConsolePool:
+    '''
+    Runs jobs on a pool of worker processes, one Console at a time per worker.
+    '''
+    def __init__(self, processes: int = None) -> None:
+        self.processes = processes if processes is not None else os.cpu_count()
+        self.__pool = multiprocessing.Pool(self.processes)
+
+    def __enter__(self) -> "ConsolePool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def imap(self, jobs):
+        '''
+        Yields results in completion order
+        '''
+        return self.__pool.imap_unordered(_run, jobs)
+
+    def map(self, jobs) -> list:
+        return self.__pool.map(_run, jobs)
+
+    def close(self) -> None:
+        self.__pool.close()
+        self.__pool.join()
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description = "Run NES ROMs on a pool of worker processes")
+    parser.add_argument("roms", nargs = "*", help = ".nes files to run")
+    parser.add_argument("-L", "--library", nargs = "*", default = [], help = "directories whose indexed ROMs with a supported mapper are run too")
+    parser.add_argument("-n", "--frames", type = int, default = 600, help = "number of frames per job")
+    parser.add_argument("-i", "--input", nargs = "*", default = [], help = "scripted input files, every ROM runs with every script")
+    parser.add_argument("-e", "--hash-every", type = int, default = 0, help = "hash the screen every N frames")
+    parser.add_argument("-p", "--processes", type = int, help = "number of worker processes")
+    args = parser.parse_args(argv)
+
+    roms = list(args.roms)
+    for directory in args.library:
+        library = RomLibrary(directory)
+        library.scan()
+        roms += [library.path(entry) for entry in library.roms(supported = True)]
+    if not roms:
+        parser.error("no ROMs to run")
+
+    scripts = [(path, InputScript.load(path)) for path in args.input] or [(None, None)]
+    jobs = [Job((rom, path), rom, args.frames, script, args.hash_every) for rom in roms for path, script in scripts]
+
+    with ConsolePool(args.processes) as pool:
+        for result in pool.imap(jobs):
+            result["ram"] = result["ram"].hex()
+            print(json.dumps(result), flush = True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
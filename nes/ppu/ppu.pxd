@@ -1,4 +1,4 @@
-from libc.stdint cimport uint8_t, uint16_t, int16_t
+from libc.stdint cimport uint8_t, uint16_t, uint32_t, int16_t, int32_t
 
 from nes.bus.bus cimport CPUBus
 from nes.cart.cart cimport Cartridge
@@ -6,14 +6,50 @@ from nes.ppu.registers cimport Controller, Mask, Status, LoopRegister, Backgroun
 
 
 cdef int LOW_NIBBLE, HIGH_NIBBLE
+# dots from the start of the pre-render scanline to the one raising NMI and the last one of a frame
+cdef int VBLANK_POSITION, FRAME_END_POSITION
 
 cdef class PPU2C02:
     cdef uint8_t[:,:] _pattern_table
     cdef uint8_t[:,:] _nametable
     cdef uint8_t[:] _palette_table
 
+    # 1KB pages of $0000-$3EFF PPU reads / writes go to: 8 CHR pages, then the 4 nametables
+    # and their mirror at $3000, rebuilt by map_pages when the mapper switches CHR banks or mirroring
+    cdef uint8_t* read_pages[16]
+    cdef uint8_t* write_pages[16]
+    # WatchFlags of $0000-$3FFF while a PPU address is watched, else NULL, see Breakpoints
+    cdef uint8_t* watch
+
     cdef list palette_panel
+    cdef uint8_t[64][3] palette_panel_RGB
+    # palette RAM ($3F00-$3F1F) resolved to colors, refreshed when it or greyscale changes
+    cdef uint8_t[32] palette_color
+    cdef uint8_t[32][3] palette_RGB
+
     cdef uint8_t[240][256][3] _screen
+    cdef uint8_t[240][256] _screen_index
+    cdef public bint index_output
+    # draw pixels into the screen buffer and publish complete frames; off, only what the emulation
+    # depends on is computed (sprite 0 hit, overflow, VRAM address, mapper scanlines)
+    cdef public bint render
+
+    # completed frame, copied from the buffers above when the frame ends; the memory stays put,
+    # so views of screen() / screen_index() can be held and always show the last complete frame
+    cdef uint8_t[:,:,::1] _frame
+    cdef uint8_t[:,::1] _frame_index
+    # twice the number of completed frames, odd while one is being copied
+    cdef uint32_t[::1] _frame_sequence
+
+    # dots 1-256 of a visible scanline are put off and drawn at once at dot 257,
+    # register accesses in between draw them dot by dot instead
+    cdef public bint scanline_renderer
+    cdef bint line_deferred
+
+    # decoded 8x8 CHR tiles by pattern table and tile id: bit planes and 2 bit pixels
+    cdef uint8_t[2][256] tile_cached
+    cdef uint8_t[2][256][16] tile_planes
+    cdef uint8_t[2][256][64] tile_pixels
 
     cdef Status PPUSTATUS
     cdef Mask PPUMASK
@@ -43,6 +79,13 @@ cdef class PPU2C02:
     cdef uint8_t[8][4] secondary_OAM
     cdef uint8_t sprite_count
 
+    # OAM indices of the first 8 sprites on every visible scanline in OAM order, and how many sprites
+    # are on it (up to 9, for overflow), built again once OAM or the sprite height changed
+    cdef uint8_t[240][8] sprite_bins
+    cdef uint8_t[240] sprite_bin_count
+    cdef bint sprite_bins_valid
+    cdef uint8_t sprite_bins_height
+
     cdef bint eval_sprite0
     cdef bint render_sprite0
     cdef bint foreground_priority
@@ -58,7 +101,13 @@ cdef class PPU2C02:
     cdef int screen_width, screen_height
 
     cdef void connectCartridge(self, Cartridge)
+    cdef void map_pages(self)
+    cdef uint8_t* CHR_page(self, uint32_t, bint)
     cpdef uint8_t[:,:,:] screen(self)
+    cpdef uint8_t[:,:] screen_index(self)
+    cpdef uint32_t frame_number(self)
+    cpdef void set_frame_buffers(self, frame, frame_index, sequence) except *
+    cdef void _present(self)
 
     cdef uint8_t readByCPU(self, uint16_t, bint)
     cdef void writeByCPU(self, uint16_t, uint8_t)
@@ -66,6 +115,7 @@ cdef class PPU2C02:
     cdef void writeByPPU(self, uint16_t, uint8_t)
 
     cdef void _set_palette_panel(self)
+    cdef void _update_palette_colors(self)
     cdef tuple fetch_color(self, uint8_t, uint8_t)
     cdef void reset(self)
 
@@ -79,16 +129,25 @@ cdef class PPU2C02:
     cdef void _update_background_shifters(self)
     cdef void _update_sprite_shifters(self)
     cdef void clock(self) except *
+    cdef void _clock_dot(self) except *
+    cdef void flush(self) except *
+    cdef uint32_t skip(self, uint32_t)
+    cdef uint32_t quiet_dots(self)
+    cdef void _render_scanline(self) except *
+
+    cdef void _clear_tile_cache(self)
+    cdef void _cache_tile(self, uint8_t, uint8_t)
 
     cdef void _eval_background(self)
     cdef uint8_t _fetch_background_tile_nibble(self, int)
     cdef uint8_t _fetch_background_tile_id(self)
     cdef uint8_t _fetch_background_attribute(self)
 
+    cdef void _bin_sprites(self, uint8_t)
     cdef void _eval_sprites(self)
     cdef void _fetch_sprites(self)
     cdef void _fetch_sprite(self, int)
     
-    cdef tuple _draw_background(self)
-    cdef tuple _draw_sprites(self)
-    cdef tuple _draw_by_rule(self, uint8_t, uint8_t, uint8_t, uint8_t)
+    cdef (uint8_t, uint8_t) _draw_background(self)
+    cdef (uint8_t, uint8_t) _draw_sprites(self)
+    cdef (uint8_t, uint8_t) _draw_by_rule(self, uint8_t, uint8_t, uint8_t, uint8_t)
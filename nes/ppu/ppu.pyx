@@ -1,13 +1,17 @@
-from libc.string cimport memset
+from libc.string cimport memset, memcpy
 import numpy as np
 cimport numpy as np
 
 from nes.mapper.mirror cimport *
+from nes.mapper.mapping cimport PPUReadMapping, PPUWriteMapping
 from nes.ppu.ppu_sprite cimport *
+from nes.bus.breakpoints cimport WATCH_READ, WATCH_WRITE
 
 
 LOW_NIBBLE = 0
 HIGH_NIBBLE = 1
+VBLANK_POSITION = (241 + 1) * 341 + 1
+FRAME_END_POSITION = (260 + 1) * 341 + 340
 
 cdef class PPU2C02:
     def __init__(self, bus: CPUBus) -> None:
@@ -23,6 +27,16 @@ cdef class PPU2C02:
         self.palette_panel = [None] * 4 * 16
         self.screen_width, self.screen_height = 256, 240
         self._screen = np.zeros((self.screen_height,self.screen_width,3)).astype(np.uint8)
+        memset(self._screen_index, 0, 240*256*sizeof(uint8_t))
+        self.index_output = False
+        self.render = True
+        self.watch = NULL
+        self._frame = np.zeros((self.screen_height, self.screen_width, 3), dtype = np.uint8)
+        self._frame_index = np.zeros((self.screen_height, self.screen_width), dtype = np.uint8)
+        self._frame_sequence = np.zeros(1, dtype = np.uint32)
+        self.scanline_renderer = True
+        self.line_deferred = False
+        self._clear_tile_cache()
 
         self.PPUSTATUS = Status()
         self.PPUMASK = Mask()
@@ -47,6 +61,7 @@ cdef class PPU2C02:
         memset(self.OAM, 0, 64*4*sizeof(uint8_t))
         self.OAMADDR = 0x00
         memset(self.secondary_OAM, 0, 8*4*sizeof(uint8_t))
+        self.sprite_bins_valid = False
 
         memset(self.sprite_pattern_shift_registers, 0, 8 * 2 * sizeof(uint8_t))
         self.eval_sprite0 = False
@@ -56,16 +71,118 @@ cdef class PPU2C02:
 
         self.bus = bus
         self._set_palette_panel()
+        self._update_palette_colors()
 
     cdef void connectCartridge(self, Cartridge cartridge):
         self.cartridge = cartridge   
 
+    cdef void map_pages(self):
+        cdef int page
+        cdef PPUReadMapping read_mapping
+        cdef PPUWriteMapping write_mapping
+        cdef uint8_t mirror = self.cartridge.mapper.mirror()
+        # nametable behind each of $2000, $2400, $2800, $2C00
+        cdef uint8_t[4] nametables
+
+        if mirror == HARDWARE:
+            # fixed by the cartridge's wiring, as given in the header
+            mirror = self.cartridge.mirror_mode
+        if self.cartridge.mapper.CHR_switched:
+            self._clear_tile_cache()
+        # $0000–$1FFF: CHR banks of the mapper, our own pattern tables where it maps nothing. Writes first:
+        # writes to CHR ROM make the cartridge copy it, which reads have to see
+        for page in range(8):
+            write_mapping = self.cartridge.mapper.mapWriteByPPU(page << 10)
+            self.write_pages[page] = self.CHR_page(write_mapping.addr, True) if write_mapping.success \
+                else &self._pattern_table[page >> 2][(page & 0x03) << 10]
+        for page in range(8):
+            read_mapping = self.cartridge.mapper.mapReadByPPU(page << 10)
+            self.read_pages[page] = self.CHR_page(read_mapping.addr, False) if read_mapping.success \
+                else &self._pattern_table[page >> 2][(page & 0x03) << 10]
+
+        # $2000–$2FFF: 2KB of nametable RAM, mirrored to 4KB, $3000–$3EFF mirrors $2000–$2EFF
+        if mirror == VERTICAL:
+            nametables = [0, 1, 0, 1]
+        elif mirror == HORIZONTAL:
+            nametables = [0, 0, 1, 1]
+        elif mirror == ONESCREEN_LO:
+            nametables = [0, 0, 0, 0]
+        elif mirror == ONESCREEN_HI:
+            nametables = [1, 1, 1, 1]
+        else:
+            # not backed by anything we emulate: reads give 0, writes are dropped
+            nametables = [2, 2, 2, 2]
+        for page in range(8, 16):
+            self.read_pages[page] = &self._nametable[nametables[page & 0x03]][0] if nametables[page & 0x03] < 2 else NULL
+            self.write_pages[page] = self.read_pages[page]
+
+        self.cartridge.mapper.CHR_switched = False
+        self.cartridge.mapper.mirror_switched = False
+
+    cdef uint8_t* CHR_page(self, uint32_t addr, bint write):
+        '''
+        1KB of CHR RAM, or CHR ROM if the cartridge has no RAM, at addr as mapped by the mapper
+        '''
+        if self.cartridge.CHR_RAM_bytes > 0:
+            return &self.cartridge.CHR_RAM_data[addr] if addr + 0x03FF < self.cartridge.CHR_RAM_bytes else NULL
+        if addr + 0x03FF >= self.cartridge.CHR_ROM_bytes:
+            return NULL
+        if write:
+            return &self.cartridge.CHR_ROM_writable()[addr]
+        return <uint8_t*> &self.cartridge.CHR_ROM_data[addr]
+
     cpdef uint8_t[:,:,:] screen(self):
-        return self._screen               
+        '''
+        RGB pixels of the last complete frame
+        '''
+        return self._frame
+
+    cpdef uint8_t[:,:] screen_index(self):
+        '''
+        NES color index (0x00-0x3F) per pixel of the last complete frame, only drawn while index_output is set
+        '''
+        return self._frame_index
+
+    cpdef uint32_t frame_number(self):
+        return self._frame_sequence[0] >> 1
+
+    cpdef void set_frame_buffers(self, frame, frame_index, sequence) except *:
+        '''
+        Publishes the complete frames into the given buffers instead of our own, e.g. a shared memory block.
+        frame:          uint8 (240, 256, 3), C contiguous
+        frame_index:    uint8 (240, 256), C contiguous
+        sequence:       uint32 (1,) or longer
+        None for all of them goes back to buffers of our own. The last complete frame is carried over.
+        '''
+        cdef uint8_t[:,:,::1] new_frame = np.zeros((self.screen_height, self.screen_width, 3), dtype = np.uint8) if frame is None else frame
+        cdef uint8_t[:,::1] new_frame_index = np.zeros((self.screen_height, self.screen_width), dtype = np.uint8) if frame_index is None else frame_index
+        cdef uint32_t[::1] new_sequence = np.zeros(1, dtype = np.uint32) if sequence is None else sequence
+
+        if new_frame.shape[0] != 240 or new_frame.shape[1] != 256 or new_frame.shape[2] != 3:
+            raise ValueError("frame buffer must have the shape (240, 256, 3)")
+        if new_frame_index.shape[0] != 240 or new_frame_index.shape[1] != 256:
+            raise ValueError("frame index buffer must have the shape (240, 256)")
+        new_frame[:] = self._frame
+        new_frame_index[:] = self._frame_index
+        new_sequence[0] = self._frame_sequence[0]
+        self._frame, self._frame_index, self._frame_sequence = new_frame, new_frame_index, new_sequence
+
+    cdef void _present(self):
+        # a frame drawn without render holds nothing worth publishing
+        if not self.render:
+            return
+        self._frame_sequence[0] += 1
+        if self.index_output:
+            memcpy(&self._frame_index[0, 0], self._screen_index, 240 * 256)
+        else:
+            memcpy(&self._frame[0, 0, 0], self._screen, 240 * 256 * 3)
+        self._frame_sequence[0] += 1
 
     cdef uint8_t readByCPU(self, uint16_t addr , bint readonly):
         data = 0x00
 
+        self.flush()
+
         if readonly:
             if addr == 0x0000:
                 # Control
@@ -117,6 +234,8 @@ cdef class PPU2C02:
                 pass
             elif addr == 0x0007:
                 # PPU Data
+                if self.watch != NULL and self.watch[self.VRAM_addr.value & 0x3FFF] & WATCH_READ:
+                    self.bus.breakpoints.watch_hit(WATCH_READ, True, self.VRAM_addr.value & 0x3FFF, self.readByPPU(self.VRAM_addr.value & 0x3FFF))
                 if self.VRAM_addr.value >= 0x3F00:
                     self.ppu_data_buffer = self.readByPPU((self.VRAM_addr.value & 0x3FFF) - 0x1000)
                     data = self.readByPPU(self.VRAM_addr.value)
@@ -131,6 +250,8 @@ cdef class PPU2C02:
         return data
 
     cdef void writeByCPU(self, uint16_t addr, uint8_t data):
+        self.flush()
+
         if addr == 0x0000:
             # Control
             self.PPUCTRL.value = data
@@ -139,6 +260,7 @@ cdef class PPU2C02:
         elif addr == 0x0001:
             # Mask
             self.PPUMASK.value = data
+            self._update_palette_colors()
         elif addr == 0x0002:
             # Status
             pass
@@ -149,6 +271,7 @@ cdef class PPU2C02:
             # OAM Data
             self.OAM[self.OAMADDR // 4][self.OAMADDR % 4] = data
             self.OAMADDR += 1
+            self.sprite_bins_valid = False
         elif addr == 0x0005:
             # Scroll
             if self.address_latch == 0:
@@ -170,89 +293,45 @@ cdef class PPU2C02:
                 self.address_latch = 0
         elif addr == 0x0007:
             # PPU Data
+            if self.watch != NULL and self.watch[self.VRAM_addr.value & 0x3FFF] & WATCH_WRITE:
+                self.bus.breakpoints.watch_hit(WATCH_WRITE, True, self.VRAM_addr.value & 0x3FFF, data)
             self.writeByPPU(self.VRAM_addr.value, data)
             self.VRAM_addr.value += 32 if self.PPUCTRL.increment_mode == 1 else 1
 
     cdef uint8_t readByPPU(self, uint16_t addr):
-        addr &= 0x3FFF
+        cdef uint8_t* page
 
-        success, data = self.cartridge.readByPPU(addr)
-        if success:
-            pass
-        elif 0x0000 <= addr <= 0x1FFF:
-            data = self._pattern_table[(addr & 0x1000) >> 12][addr & 0x0FFF]
-        elif 0x2000 <= addr <= 0x3EFF:
-            addr &= 0x0FFF
-            if self.cartridge.mirror_mode == VERTICAL:
-                if 0x0000 <= addr <= 0x03FF:
-                    data = self._nametable[0][addr & 0x03FF]
-                elif 0x0400 <= addr <= 0x07FF:
-                    data = self._nametable[1][addr & 0x03FF]
-                elif 0x0800 <= addr <= 0x0BFF:
-                    data = self._nametable[0][addr & 0x03FF]
-                elif 0x0C00 <= addr <= 0x0FFF:
-                    data = self._nametable[1][addr & 0x03FF]                                 
-            elif self.cartridge.mirror_mode == HORIZONTAL:
-                if 0x0000 <= addr <= 0x03FF:
-                    data = self._nametable[0][addr & 0x03FF]
-                elif 0x0400 <= addr <= 0x07FF:
-                    data = self._nametable[0][addr & 0x03FF]
-                elif 0x0800 <= addr <= 0x0BFF:
-                    data = self._nametable[1][addr & 0x03FF]
-                elif 0x0C00 <= addr <= 0x0FFF:
-                    data = self._nametable[1][addr & 0x03FF]
-        elif 0x3F00 <= addr <= 0x3FFF:
-            addr &= 0x001F
-            if addr == 0x0010:
-                addr = 0x0000
-            if addr == 0x0014:
-                addr = 0x0004
-            if addr == 0x0018:
-                addr = 0x0008
-            if addr == 0x001C:
-                addr = 0x000C
-            data = self._palette_table[addr] & (0x30 if self.PPUMASK.greyscale == 1 else 0x3F)
-        return data
+        addr &= 0x3FFF
+        if addr < 0x3F00:
+            page = self.read_pages[addr >> 10]
+            return page[addr & 0x03FF] if page != NULL else 0x00
+        addr &= 0x001F
+        if addr & 0x0013 == 0x0010:
+            # $3F10, $3F14, $3F18, $3F1C mirror $3F00, $3F04, $3F08, $3F0C
+            addr &= 0x000F
+        return self._palette_table[addr] & (0x30 if self.PPUMASK.greyscale == 1 else 0x3F)
 
     cdef void writeByPPU(self, uint16_t addr, uint8_t data):
-        addr &= 0x3FFF     
+        cdef uint8_t* page
 
-        success = self.cartridge.writeByPPU(addr, data)
-        if success:
-            pass
-        elif 0x0000 <= addr <= 0x1FFF:
-            self._pattern_table[(addr & 0x1000) >> 12][addr & 0x0FFF] = data
-        elif 0x2000 <= addr <= 0x3EFF:
-            addr &= 0x0FFF
-            if self.cartridge.mirror_mode == VERTICAL:
-                if 0x0000 <= addr <= 0x03FF:
-                    self._nametable[0][addr & 0x03FF] = data
-                if 0x0400 <= addr <= 0x07FF:
-                    self._nametable[1][addr & 0x03FF] = data
-                if 0x0800 <= addr <= 0x0BFF:
-                    self._nametable[0][addr & 0x03FF] = data
-                if 0x0C00 <= addr <= 0x0FFF:
-                    self._nametable[1][addr & 0x03FF] = data
-            elif self.cartridge.mirror_mode == HORIZONTAL:
-                if 0x0000 <= addr <= 0x03FF:
-                    self._nametable[0][addr & 0x03FF] = data
-                if 0x0400 <= addr <= 0x07FF:
-                    self._nametable[0][addr & 0x03FF] = data
-                if 0x0800 <= addr <= 0x0BFF:
-                    self._nametable[1][addr & 0x03FF] = data
-                if 0x0C00 <= addr <= 0x0FFF:
-                    self._nametable[1][addr & 0x03FF] = data
-        elif 0x3F00 <= addr <= 0x3FFF:
-            addr &= 0x001F
-            if addr == 0x0010:
-                addr = 0x0000
-            if addr == 0x0014:
-                addr = 0x0004
-            if addr == 0x0018:
-                addr = 0x0008
-            if addr == 0x001C:
-                addr = 0x000C
-            self._palette_table[addr] = data            
+        addr &= 0x3FFF
+        if addr <= 0x1FFF:
+            if self.cartridge.mapper.CHR_switchable:
+                # the same CHR data may be cached under other tiles
+                self._clear_tile_cache()
+            else:
+                self.tile_cached[addr >> 12][(addr >> 4) & 0xFF] = False
+
+        if addr < 0x3F00:
+            page = self.write_pages[addr >> 10]
+            if page != NULL:
+                page[addr & 0x03FF] = data
+            return
+        addr &= 0x001F
+        if addr & 0x0013 == 0x0010:
+            addr &= 0x000F
+        self._palette_table[addr] = data
+        self._update_palette_colors()
 
     cdef void _set_palette_panel(self):    
         self.palette_panel[0x00],self.palette_panel[0x01],self.palette_panel[0x02],self.palette_panel[0x03],self.palette_panel[0x04],self.palette_panel[0x05],self.palette_panel[0x06],self.palette_panel[0x07],self.palette_panel[0x08],self.palette_panel[0x09],self.palette_panel[0x0a],self.palette_panel[0x0b],self.palette_panel[0x0c],self.palette_panel[0x0d],self.palette_panel[0x0e],self.palette_panel[0x0f] = ( 84,  84,  84), (  0,  30, 116), (  8,  16, 144), ( 48,   0, 136), ( 68,   0, 100), ( 92,   0,  48), ( 84,   4,   0), ( 60,  24,   0), ( 32,  42,   0), (  8,  58,   0), (  0,  64,   0), (  0,  60,   0), (  0,  50,  60), (  0,   0,   0), (  0,   0,   0), (  0,   0,   0)
@@ -260,6 +339,20 @@ cdef class PPU2C02:
         self.palette_panel[0x20],self.palette_panel[0x21],self.palette_panel[0x22],self.palette_panel[0x23],self.palette_panel[0x24],self.palette_panel[0x25],self.palette_panel[0x26],self.palette_panel[0x27],self.palette_panel[0x28],self.palette_panel[0x29],self.palette_panel[0x2a],self.palette_panel[0x2b],self.palette_panel[0x2c],self.palette_panel[0x2d],self.palette_panel[0x2e],self.palette_panel[0x2f] = (236, 238, 236), ( 76, 154, 236), (120, 124, 236), (176,  98, 236), (228,  84, 236), (236,  88, 180), (236, 106, 100), (212, 136,  32), (160, 170,   0), (116, 196,   0), ( 76, 208,  32), ( 56, 204, 108), ( 56, 180, 204), ( 60,  60,  60), (  0,   0,   0), (  0,   0,   0)
         self.palette_panel[0x30],self.palette_panel[0x31],self.palette_panel[0x32],self.palette_panel[0x33],self.palette_panel[0x34],self.palette_panel[0x35],self.palette_panel[0x36],self.palette_panel[0x37],self.palette_panel[0x38],self.palette_panel[0x39],self.palette_panel[0x3a],self.palette_panel[0x3b],self.palette_panel[0x3c],self.palette_panel[0x3d],self.palette_panel[0x3e],self.palette_panel[0x3f] = (236, 238, 236), (168, 204, 236), (188, 188, 236), (212, 178, 236), (236, 174, 236), (236, 174, 212), (236, 180, 176), (228, 196, 144), (204, 210, 120), (180, 222, 120), (168, 226, 144), (152, 226, 180), (160, 214, 228), (160, 162, 160), (  0,   0,   0), (  0,   0,   0)
 
+        for i in range(64):
+            self.palette_panel_RGB[i][0], self.palette_panel_RGB[i][1], self.palette_panel_RGB[i][2] = self.palette_panel[i]
+
+    cdef void _update_palette_colors(self):
+        cdef uint8_t i, addr, color
+        cdef uint8_t mask = 0x30 if self.PPUMASK.greyscale == 1 else 0x3F
+
+        for i in range(32):
+            # $3F10/$3F14/$3F18/$3F1C are mirrors of $3F00/$3F04/$3F08/$3F0C
+            addr = i & 0x0F if i & 0x13 == 0x10 else i
+            color = self._palette_table[addr] & mask & 0x3F
+            self.palette_color[i] = color
+            memcpy(self.palette_RGB[i], self.palette_panel_RGB[color], 3)
+
     cdef tuple fetch_color(self, uint8_t palette, uint8_t pixel):
         color = self.readByPPU(0x3F00 + (palette << 2) + pixel) & 0x3F
         return self.palette_panel[color]
@@ -280,6 +373,10 @@ cdef class PPU2C02:
         self.PPUCTRL.reset()
         self.VRAM_addr.reset()
         self.temp_VRAM_addr.reset()
+        self._update_palette_colors()
+        self.line_deferred = False
+        self._clear_tile_cache()
+        self.sprite_bins_valid = False
 
     cdef void _incr_coarseX(self):
         if self.VRAM_addr.coarse_x == 31:
@@ -378,7 +475,10 @@ cdef class PPU2C02:
         return self.readByPPU(background_tile_addr)
 
     cdef uint8_t _fetch_background_tile_id(self):
-        return self.readByPPU(0x2000 | (self.VRAM_addr.value & 0x0FFF))
+        return self.readByPPU(0x2000 | (((self.VRAM_addr.nametable_y << 11) \
+            | (self.VRAM_addr.nametable_x << 10) \
+            | (self.VRAM_addr.coarse_y << 5) \
+            | self.VRAM_addr.coarse_x) & 0x0FFF))
     
     cdef uint8_t _fetch_background_attribute(self):
         cdef uint8_t attribute = self.readByPPU(0x23C0 \
@@ -394,28 +494,44 @@ cdef class PPU2C02:
         attribute &= 0x03
         return attribute
 
+    cdef void _bin_sprites(self, uint8_t sprite_height):
+        '''
+        Sorts the sprites into the scanlines they cover, in OAM order
+        '''
+        cdef int entry, line, last_line
+        cdef uint8_t count
+
+        memset(self.sprite_bin_count, 0, sizeof(self.sprite_bin_count))
+        for entry in range(64):
+            last_line = min(self.OAM[entry][Y] + sprite_height, 240)
+            for line in range(self.OAM[entry][Y], last_line):
+                count = self.sprite_bin_count[line]
+                if count < 8:
+                    self.sprite_bins[line][count] = entry
+                if count < 9:
+                    self.sprite_bin_count[line] = count + 1
+        self.sprite_bins_height = sprite_height
+        self.sprite_bins_valid = True
+
     cdef void _eval_sprites(self):
-        cdef int16_t y_offset, sprite_height = 16 if self.PPUCTRL.sprite_size == 1 else 8
+        cdef uint8_t sprite_height = 16 if self.PPUCTRL.sprite_size == 1 else 8
+        cdef uint8_t i, entry, count
         self.sprite_count = 0
         self.eval_sprite0 = False
         memset(self.secondary_OAM, 0xFF, 8*4*sizeof(uint8_t))
         self._reset_sprite_shift_registers()
-            
-        cdef uint8_t nOAMEntry = 0
-        for nOAMEntry in range(64):
-            y_offset = self.scanline - <int16_t> (self.OAM[nOAMEntry][Y])
-            if not (0 <= y_offset < sprite_height):
-                continue
-            if nOAMEntry == 0:
-                self.eval_sprite0 = True
-            if self.sprite_count >= 8:
-                self.PPUSTATUS.sprite_overflow = 1
-                break
-            self.secondary_OAM[self.sprite_count][Y] = self.OAM[nOAMEntry][Y]
-            self.secondary_OAM[self.sprite_count][ID] = self.OAM[nOAMEntry][ID]
-            self.secondary_OAM[self.sprite_count][ATTRIBUTES] = self.OAM[nOAMEntry][ATTRIBUTES]
-            self.secondary_OAM[self.sprite_count][X] = self.OAM[nOAMEntry][X]
-            self.sprite_count += 1
+
+        if not self.sprite_bins_valid or self.sprite_bins_height != sprite_height:
+            self._bin_sprites(sprite_height)
+        count = self.sprite_bin_count[self.scanline]
+        if count > 8:
+            self.PPUSTATUS.sprite_overflow = 1
+            count = 8
+        for i in range(count):
+            entry = self.sprite_bins[self.scanline][i]
+            memcpy(self.secondary_OAM[i], self.OAM[entry], 4)
+        self.sprite_count = count
+        self.eval_sprite0 = count > 0 and self.sprite_bins[self.scanline][0] == 0
 
     cdef void _fetch_sprites(self):
         for i in range(0, self.sprite_count):
@@ -452,7 +568,7 @@ cdef class PPU2C02:
         self.sprite_pattern_shift_registers[i][LOW_NIBBLE] = sprite_pattern_low_bits
         self.sprite_pattern_shift_registers[i][HIGH_NIBBLE] = sprite_pattern_high_bits 
 
-    cdef tuple _draw_background(self):
+    cdef (uint8_t, uint8_t) _draw_background(self):
         cdef int16_t start_render_position = 8 if self.PPUMASK.render_background_left == 0 else 0
         if (self.cycle - 1) < start_render_position:
             return (0x00, 0x00)
@@ -475,7 +591,7 @@ cdef class PPU2C02:
 
         return (background_palette, background_pixel)
 
-    cdef tuple _draw_sprites(self):
+    cdef (uint8_t, uint8_t) _draw_sprites(self):
         cdef uint8_t foreground_pixel = 0x00, foreground_pixel_low_bit = 0x00, foreground_pixel_high_bit = 0x00
         cdef uint8_t foreground_palette
 
@@ -498,7 +614,7 @@ cdef class PPU2C02:
             return (0x00, 0x00)
         return (foreground_palette, foreground_pixel)
 
-    cdef tuple _draw_by_rule(self, uint8_t background_palette, uint8_t background_pixel, uint8_t foreground_palette, uint8_t foreground_pixel):
+    cdef (uint8_t, uint8_t) _draw_by_rule(self, uint8_t background_palette, uint8_t background_pixel, uint8_t foreground_palette, uint8_t foreground_pixel):
         cdef uint8_t palette = 0x00, pixel = 0x00
         
         if background_pixel == 0 and foreground_pixel > 0:
@@ -523,6 +639,239 @@ cdef class PPU2C02:
         return (palette, pixel)
 
     cdef void clock(self) except *:
+        if self.line_deferred:
+            if self.cycle <= 256:
+                self.cycle += 1
+                return
+            self.line_deferred = False
+            self._render_scanline()
+        elif self.scanline_renderer and 0 <= self.scanline <= 239 and (self.cycle == 1 or (self.scanline == 0 and self.cycle == 0)):
+            self.line_deferred = True
+            self.cycle = 2
+            return
+        self._clock_dot()
+
+    cdef uint32_t skip(self, uint32_t dots):
+        '''
+        Runs up to dots clock() calls at once while they only put off dots of a deferred scanline,
+        returns how many were run
+        '''
+        if not self.line_deferred or self.cycle > 256:
+            return 0
+        if dots > <uint32_t> (257 - self.cycle):
+            dots = 257 - self.cycle
+        self.cycle += dots
+        return dots
+
+    cdef uint32_t quiet_dots(self):
+        '''
+        How many of the next clock() calls neither raise NMI, reach cycle 260 (mappers count scanlines
+        there) nor complete the frame
+        '''
+        cdef int32_t position = (self.scanline + 1) * 341 + self.cycle
+        cdef int32_t dots = 259 - self.cycle if self.cycle <= 259 else 600 - self.cycle
+
+        if position <= VBLANK_POSITION:
+            dots = min(dots, VBLANK_POSITION - position)
+        return min(dots, FRAME_END_POSITION - position)
+
+    cdef void flush(self) except *:
+        '''
+        Draws the dots the scanline renderer has put off so far, the rest of the line goes dot by dot
+        '''
+        cdef int16_t cycle = self.cycle
+
+        if not self.line_deferred:
+            return
+        self.line_deferred = False
+        self.cycle = 1
+        while self.cycle < cycle:
+            self._clock_dot()
+
+    cdef void _render_scanline(self) except *:
+        '''
+        Draws dots 1-256 of a visible scanline at once and leaves the PPU
+        in the state drawing them dot by dot would have left it in
+        '''
+        cdef int g, x, i, position, shift
+        cdef uint8_t tile, row, pixel, palette
+        cdef uint8_t background_pixel, background_palette, foreground_pixel, foreground_palette
+        cdef uint8_t table = self.PPUCTRL.pattern_background
+        cdef bint render_background = self.PPUMASK.render_background == 1
+        cdef bint render_sprites = self.PPUMASK.render_sprites == 1
+        cdef bint line_sprites = render_sprites and self.sprite_count > 0
+        cdef int background_start = 8 if self.PPUMASK.render_background_left == 0 else 0
+        cdef int sprite_start = 8 if self.PPUMASK.render_sprites_left == 0 else 0
+        cdef int sprite_index
+        cdef bint foreground_priority = False
+        # opaque sprite pixels of the line and which sprite (0-7, 8 for none) they belong to
+        cdef uint8_t[256] sprite_pixel, sprite_owner
+
+        # background pixels as a stream of bytes: what is left in the shifters at dot 1,
+        # then one tile per 8 dots, from the shifter loads at dots 1, 9, ..., 249
+        cdef uint8_t[34] tile_lsb, tile_msb, tile_attribute
+        cdef uint8_t* tile_row[34]
+        cdef uint8_t attribute_lsb, attribute_msb
+        cdef uint8_t[256] line
+
+        if not render_background and not render_sprites:
+            self.foreground_priority = False
+            memset(line, 0, 256)
+        else:
+            if render_background:
+                tile_lsb[0] = ((self.background_pattern_shift_register.low_bits << 1) >> 8) & 0xFF
+                tile_msb[0] = ((self.background_pattern_shift_register.high_bits << 1) >> 8) & 0xFF
+                attribute_lsb = ((self.background_attribute_shift_register.low_bits << 1) >> 8) & 0xFF
+                attribute_msb = ((self.background_attribute_shift_register.high_bits << 1) >> 8) & 0xFF
+            for g in range(32):
+                tile_lsb[g + 1] = self.background_next_tile_lsb
+                tile_msb[g + 1] = self.background_next_tile_msb
+                tile_attribute[g + 1] = self.background_next_tile_attribute
+                self.background_next_tile_id = self._fetch_background_tile_id()
+                self.background_next_tile_attribute = self._fetch_background_attribute()
+                tile, row = self.background_next_tile_id, self.VRAM_addr.fine_y
+                self._cache_tile(table, tile)
+                self.background_next_tile_lsb = self.tile_planes[table][tile][row]
+                self.background_next_tile_msb = self.tile_planes[table][tile][row + 8]
+                tile_row[g + 2] = &self.tile_pixels[table][tile][row << 3]
+                if g != 31:
+                    self._incr_coarseX()
+                else:
+                    self._incr_Y()
+
+            if line_sprites:
+                # drawn back to front, the lowest sprite index wins
+                memset(sprite_pixel, 0, 256)
+                memset(sprite_owner, 8, 256)
+                for i in range(self.sprite_count - 1, -1, -1):
+                    for shift in range(min(8, 256 - self.secondary_OAM[i][X])):
+                        pixel = (((self.sprite_pattern_shift_registers[i][HIGH_NIBBLE] << shift) & 0x80) >> 6) \
+                            | (((self.sprite_pattern_shift_registers[i][LOW_NIBBLE] << shift) & 0x80) >> 7)
+                        if pixel != 0:
+                            x = self.secondary_OAM[i][X] + shift
+                            sprite_pixel[x] = pixel
+                            sprite_owner[x] = i
+            elif render_sprites:
+                self.render_sprite0 = False
+
+            if self.render:
+                for x in range(256):
+                    background_pixel, background_palette = 0x00, 0x00
+                    if render_background and x >= background_start:
+                        position = x + self.fine_x
+                        g, shift = position >> 3, position & 0x07
+                        if g >= 2:
+                            background_pixel = tile_row[g][shift]
+                        else:
+                            background_pixel = (((tile_msb[g] << shift) & 0x80) >> 6) | (((tile_lsb[g] << shift) & 0x80) >> 7)
+                        if g >= 1:
+                            background_palette = tile_attribute[g] & 0x03
+                        else:
+                            background_palette = (((attribute_msb << shift) & 0x80) >> 6) | (((attribute_lsb << shift) & 0x80) >> 7)
+
+                    foreground_pixel, foreground_palette = 0x00, 0x00
+                    foreground_priority = False
+                    if line_sprites:
+                        # sprite i is shifted out from dot X + 1 on
+                        sprite_index = sprite_owner[x]
+                        if sprite_index != 8:
+                            foreground_pixel = sprite_pixel[x]
+                            foreground_palette = attribute(self.secondary_OAM[sprite_index][ATTRIBUTES], BIT_PALETTE) + 0x04
+                            foreground_priority = attribute(self.secondary_OAM[sprite_index][ATTRIBUTES], BIT_PRIORITY) == 0
+                        self.render_sprite0 = sprite_index == 0
+                        if x < sprite_start:
+                            foreground_pixel, foreground_palette = 0x00, 0x00
+
+                    pixel, palette = 0x00, 0x00
+                    if background_pixel == 0 and foreground_pixel > 0:
+                        pixel, palette = foreground_pixel, foreground_palette
+                    elif background_pixel > 0 and foreground_pixel == 0:
+                        pixel, palette = background_pixel, background_palette
+                    elif background_pixel > 0 and foreground_pixel > 0:
+                        if foreground_priority:
+                            pixel, palette = foreground_pixel, foreground_palette
+                        else:
+                            pixel, palette = background_pixel, background_palette
+                        if self.eval_sprite0 and self.render_sprite0 and x < 255:
+                            self.PPUSTATUS.sprite_zero_hit = 1
+                    line[x] = (palette << 2) + pixel
+                self.foreground_priority = foreground_priority
+            elif line_sprites:
+                # nothing is drawn: only sprite 0 hit and the sprite flags the last dot leaves behind
+                if self.eval_sprite0 and render_background:
+                    for i in range(min(8, 256 - self.secondary_OAM[0][X])):
+                        x = self.secondary_OAM[0][X] + i
+                        if sprite_owner[x] != 0 or x < sprite_start or x < background_start or x >= 255:
+                            continue
+                        position = x + self.fine_x
+                        g, shift = position >> 3, position & 0x07
+                        if g >= 2:
+                            background_pixel = tile_row[g][shift]
+                        else:
+                            background_pixel = (((tile_msb[g] << shift) & 0x80) >> 6) | (((tile_lsb[g] << shift) & 0x80) >> 7)
+                        if background_pixel != 0:
+                            self.PPUSTATUS.sprite_zero_hit = 1
+                            break
+                sprite_index = sprite_owner[255]
+                self.render_sprite0 = sprite_index == 0
+                self.foreground_priority = sprite_index != 8 and attribute(self.secondary_OAM[sprite_index][ATTRIBUTES], BIT_PRIORITY) == 0
+            else:
+                self.foreground_priority = False
+
+            # shifter contents after dot 256
+            if render_background:
+                self.background_pattern_shift_register.low_bits = ((tile_lsb[31] << 8) | tile_lsb[32]) << 7
+                self.background_pattern_shift_register.high_bits = ((tile_msb[31] << 8) | tile_msb[32]) << 7
+                self.background_attribute_shift_register.low_bits = (((0xFF if tile_attribute[31] & 0b01 else 0) << 8) | (0xFF if tile_attribute[32] & 0b01 else 0)) << 7
+                self.background_attribute_shift_register.high_bits = (((0xFF if tile_attribute[31] & 0b10 else 0) << 8) | (0xFF if tile_attribute[32] & 0b10 else 0)) << 7
+            else:
+                self.background_pattern_shift_register.low_bits = (self.background_pattern_shift_register.low_bits & 0xFF00) | tile_lsb[32]
+                self.background_pattern_shift_register.high_bits = (self.background_pattern_shift_register.high_bits & 0xFF00) | tile_msb[32]
+                self.background_attribute_shift_register.low_bits = (self.background_attribute_shift_register.low_bits & 0xFF00) | (0xFF if tile_attribute[32] & 0b01 else 0)
+                self.background_attribute_shift_register.high_bits = (self.background_attribute_shift_register.high_bits & 0xFF00) | (0xFF if tile_attribute[32] & 0b10 else 0)
+            if render_sprites:
+                # shifters of dots 2-256
+                for i in range(self.sprite_count):
+                    if self.secondary_OAM[i][X] >= 255:
+                        self.secondary_OAM[i][X] -= 255
+                    else:
+                        shift = 255 - self.secondary_OAM[i][X]
+                        self.secondary_OAM[i][X] = 0
+                        if shift >= 8:
+                            self.sprite_pattern_shift_registers[i][LOW_NIBBLE] = 0x00
+                            self.sprite_pattern_shift_registers[i][HIGH_NIBBLE] = 0x00
+                        else:
+                            self.sprite_pattern_shift_registers[i][LOW_NIBBLE] <<= shift
+                            self.sprite_pattern_shift_registers[i][HIGH_NIBBLE] <<= shift
+
+        if not self.render:
+            return
+        if self.index_output:
+            for x in range(256):
+                self._screen_index[self.scanline][x] = self.palette_color[line[x]]
+        else:
+            for x in range(256):
+                memcpy(self._screen[self.scanline][x], self.palette_RGB[line[x]], 3)
+
+    cdef void _clear_tile_cache(self):
+        memset(self.tile_cached, 0, 2 * 256 * sizeof(uint8_t))
+
+    cdef void _cache_tile(self, uint8_t table, uint8_t tile):
+        cdef uint16_t tile_addr = (table << 12) | (tile << 4)
+        cdef uint8_t i, j, low_bits, high_bits
+
+        if self.tile_cached[table][tile]:
+            return
+        for i in range(16):
+            self.tile_planes[table][tile][i] = self.readByPPU(tile_addr + i)
+        for i in range(8):
+            low_bits = self.tile_planes[table][tile][i]
+            high_bits = self.tile_planes[table][tile][i + 8]
+            for j in range(8):
+                self.tile_pixels[table][tile][(i << 3) + j] = (((high_bits << j) & 0x80) >> 6) | (((low_bits << j) & 0x80) >> 7)
+        self.tile_cached[table][tile] = True
+
+    cdef void _clock_dot(self) except *:
         cdef bint pre_render_scanline = self.scanline == -1 or self.scanline == 261
         cdef bint visible_scanlines = 0 <= self.scanline <= 239
         cdef bint post_render_scanline = self.scanline == 240
@@ -603,8 +952,11 @@ cdef class PPU2C02:
         cdef uint8_t pixel = 0x00, palette = 0x00
         palette, pixel = self._draw_by_rule(background_palette, background_pixel, foreground_palette, foreground_pixel)
 
-        if 0 <= self.cycle - 1 < self.screen_width and 0 <= self.scanline < self.screen_height: 
-            self._screen[self.scanline][<int>(self.cycle - 1)] = self.fetch_color(palette, pixel)
+        if self.render and 0 <= self.cycle - 1 < self.screen_width and 0 <= self.scanline < self.screen_height: 
+            if self.index_output:
+                self._screen_index[self.scanline][self.cycle - 1] = self.palette_color[(palette << 2) + pixel]
+            else:
+                memcpy(self._screen[self.scanline][self.cycle - 1], self.palette_RGB[(palette << 2) + pixel], 3)
 
         self.cycle += 1
 
@@ -618,4 +970,5 @@ cdef class PPU2C02:
             if self.scanline >= 261:
                 self.scanline = -1
                 self.frame_complete = True
+                self._present()
                     
\ No newline at end of file
@@ -1,13 +1,40 @@
 from libc.stdint cimport uint8_t, uint16_t
+from libc.string cimport memcmp, memcpy, memset
 import numpy as np
 cimport numpy as np
 
 from nes.ppu.ppu cimport PPU2C02
 
 
+cdef enum DebugSource:
+    CHR_CHANGED = 1
+    VRAM_CHANGED = 2
+    PALETTE_CHANGED = 4
+    OAM_CHANGED = 8
+    # pattern table / sprite size selected in PPUCTRL
+    CONTROL_CHANGED = 16
+
 cdef class PPUDebugger:
     cdef PPU2C02 ppu
-    cdef list _pattern_table
-    
+
+    # what the views were last built from: $0000-$1FFF as mapped, the nametables behind $2000-$2FFF,
+    # resolved palette, OAM and the PPUCTRL bits the views depend on
+    cdef uint8_t[8192] CHR
+    cdef uint8_t[4096] VRAM
+    cdef uint8_t[32][3] palette_RGB
+    cdef uint8_t[64][4] OAM
+    cdef uint8_t[3] control
+    cdef bint synced
+
+    # pixel values (0-3) of the 512 tiles of $0000-$1FFF, (512, 8, 8)
+    cdef object tiles
+    # view name -> (DebugSource the view depends on, array), dropped once one of its sources changed
+    cdef dict views
+
+    cdef uint8_t sync(self)
+    cdef object colors(self, object)
+
     cpdef uint8_t[:,:,:] palette(self)
     cpdef uint8_t[:,:,:] pattern_table(self, uint8_t, uint8_t)
+    cpdef uint8_t[:,:,:] nametables(self)
+    cpdef uint8_t[:,:,:] sprite_sheet(self)
@@ -4,34 +4,147 @@ cimport numpy as np
 
 
 cdef class PPUDebugger:
+    '''
+    Views of the PPU memory as RGB images, decoded with numpy from copies of the CHR pages, nametables,
+    palette and OAM. Views are kept until what they were built from changed.
+    '''
     def __init__(self, PPU2C02 ppu):
         self.ppu = ppu
-        self._pattern_table = [np.zeros((128,128,3)).astype(np.uint8),np.zeros((128,128,3)).astype(np.uint8)]
+        self.synced = False
+        self.tiles = None
+        self.views = {}
+
+    cdef uint8_t sync(self):
+        '''
+        Copies what the views are built from out of the PPU, drops the views depending on whatever changed
+        since the last time and returns DebugSource bits of it
+        '''
+        cdef uint8_t[8192] CHR
+        cdef uint8_t[4096] VRAM
+        cdef uint8_t[3] control = [self.ppu.PPUCTRL.pattern_background, self.ppu.PPUCTRL.pattern_sprite, self.ppu.PPUCTRL.sprite_size]
+        cdef uint8_t changed = 0
+        cdef uint8_t* page
+        cdef int i
+
+        for i in range(8):
+            page = self.ppu.read_pages[i]
+            if page != NULL:
+                memcpy(&CHR[i << 10], page, 1024)
+            else:
+                memset(&CHR[i << 10], 0, 1024)
+        for i in range(4):
+            # $2000, $2400, $2800, $2C00 with the mirroring of the cartridge
+            page = self.ppu.read_pages[8 + i]
+            if page != NULL:
+                memcpy(&VRAM[i << 10], page, 1024)
+            else:
+                memset(&VRAM[i << 10], 0, 1024)
+
+        if not self.synced or memcmp(CHR, self.CHR, 8192) != 0:
+            changed |= CHR_CHANGED
+            memcpy(self.CHR, CHR, 8192)
+        if not self.synced or memcmp(VRAM, self.VRAM, 4096) != 0:
+            changed |= VRAM_CHANGED
+            memcpy(self.VRAM, VRAM, 4096)
+        if not self.synced or memcmp(self.ppu.palette_RGB, self.palette_RGB, 32 * 3) != 0:
+            changed |= PALETTE_CHANGED
+            memcpy(self.palette_RGB, self.ppu.palette_RGB, 32 * 3)
+        if not self.synced or memcmp(self.ppu.OAM, self.OAM, 64 * 4) != 0:
+            changed |= OAM_CHANGED
+            memcpy(self.OAM, self.ppu.OAM, 64 * 4)
+        if not self.synced or memcmp(control, self.control, 3) != 0:
+            changed |= CONTROL_CHANGED
+            memcpy(self.control, control, 3)
+        self.synced = True
+
+        if changed & CHR_CHANGED:
+            # 16 bytes per tile: 8 rows of the low bit plane, then 8 rows of the high one, leftmost pixel in bit 7
+            planes = np.frombuffer((<char*> self.CHR)[:8192], dtype = np.uint8).reshape((512, 2, 8))
+            self.tiles = (np.unpackbits(planes[:, 0], axis = 1) | (np.unpackbits(planes[:, 1], axis = 1) << 1)).reshape((512, 8, 8))
+        if changed:
+            self.views = {key: view for key, view in self.views.items() if not view[0] & changed}
+        return changed
+
+    cdef object colors(self, object indices):
+        '''
+        RGB of palette RAM indices (0x00-0x1F), one more axis of 3 than indices
+        '''
+        return np.frombuffer((<char*> self.palette_RGB)[:32 * 3], dtype = np.uint8).reshape((32, 3))[indices]
 
     cpdef uint8_t[:,:,:] palette(self):
-        _palette = np.zeros((4, 16, 3)).astype(np.uint8)
-        for x in range(4):
-            for y in range(16):
-                _palette[x][y][:] = self.ppu.palette_panel[x * 16 + y]
-        return _palette
+        '''
+        The 64 colors of the system palette, 4 rows of 16
+        '''
+        view = self.views.get("palette")
+        if view is None:
+            view = (0, np.frombuffer((<char*> self.ppu.palette_panel_RGB)[:64 * 3], dtype = np.uint8).reshape((4, 16, 3)).copy())
+            self.views["palette"] = view
+        return view[1]
 
     cpdef uint8_t[:,:,:] pattern_table(self, uint8_t i, uint8_t palette):
-        cdef uint8_t tileY, tileX
-        cdef uint8_t tile_lsb, tile_msb
-        cdef uint8_t row, col
-        cdef uint8_t pixel
-        cdef uint16_t x, y, offset
-
-        for tileY in range(0,16):
-            for tileX in range(0,16):
-                offset = tileY * 256 + tileX * 16
-                for row in range(0,8):
-                    tile_lsb = self.ppu.readByPPU(i * 0x1000 + offset + row + 0x0000)
-                    tile_msb = self.ppu.readByPPU(i * 0x1000 + offset + row + 0x0008)
-                    for col in range(0,8):
-                        pixel = (tile_msb & 0x01) << 1 | (tile_lsb & 0x01)
-                        tile_lsb, tile_msb = tile_lsb >> 1, tile_msb >> 1
-                        y, x = tileY * 8 + row, tileX * 8 + (7 - col)
-                        self._pattern_table[i][y, x] = self.ppu.fetch_color(palette, pixel)
-        
-        return self._pattern_table[i]
\ No newline at end of file
+        '''
+        128x128 image of the 256 tiles at $0000 (i = 0) / $1000 (i = 1) in the colors of palette (0-7)
+        '''
+        key = ("pattern_table", i & 0x01, palette & 0x07)
+        self.sync()
+        view = self.views.get(key)
+        if view is None:
+            tiles = self.tiles[(i & 0x01) << 8:((i & 0x01) + 1) << 8]
+            # (tile row, tile column, row, column) -> (tile row, row, tile column, column)
+            pixels = tiles.reshape((16, 16, 8, 8)).swapaxes(1, 2).reshape((128, 128))
+            view = (CHR_CHANGED | PALETTE_CHANGED, self.colors(((palette & 0x07) << 2) | pixels))
+            self.views[key] = view
+        return view[1]
+
+    cpdef uint8_t[:,:,:] nametables(self):
+        '''
+        512x480 image of the 4 nametables at $2000 (top left), $2400, $2800, $2C00 as mirrored by the cartridge,
+        tiles from the background pattern table in their attribute palettes
+        '''
+        self.sync()
+        view = self.views.get("nametables")
+        if view is None:
+            VRAM = np.frombuffer((<char*> self.VRAM)[:4096], dtype = np.uint8).reshape((4, 1024))
+            tile_ids = VRAM[:, :960].reshape((4, 30, 32)).astype(np.uint16) | (self.control[0] << 8)
+            attributes = VRAM[:, 960:].reshape((4, 8, 8))
+            rows, columns = np.arange(30)[:, None], np.arange(32)[None, :]
+            # every attribute byte holds the palettes of 4x4 tiles, 2 bits per 2x2 of them
+            palettes = (attributes[:, rows >> 2, columns >> 2] >> (((rows & 0x02) << 1) | (columns & 0x02))) & 0x03
+            pixels = self.tiles[tile_ids]
+            # pixel value 0 is the backdrop color in every palette
+            image = self.colors(np.where(pixels == 0, 0, (palettes[..., None, None] << 2) | pixels))
+            # (nametable, tile row, tile column, row, column, RGB) -> (nametable row, y, nametable column, x, RGB)
+            image = image.transpose((0, 1, 3, 2, 4, 5)).reshape((2, 2, 240, 256, 3)).transpose((0, 2, 1, 3, 4))
+            view = (CHR_CHANGED | VRAM_CHANGED | PALETTE_CHANGED | CONTROL_CHANGED, np.ascontiguousarray(image.reshape((480, 512, 3))))
+            self.views["nametables"] = view
+        return view[1]
+
+    cpdef uint8_t[:,:,:] sprite_sheet(self):
+        '''
+        The 64 sprites of OAM in 8 rows of 8, flipped and in their palettes, backdrop color where transparent:
+        64x64 with 8x8 sprites, 64x128 with 8x16 sprites
+        '''
+        cdef int height
+
+        self.sync()
+        height = 16 if self.control[2] else 8
+        view = self.views.get("sprite_sheet")
+        if view is None:
+            OAM = np.frombuffer((<char*> self.OAM)[:64 * 4], dtype = np.uint8).reshape((64, 4))
+            tile_ids = OAM[:, 1].astype(np.uint16)
+            attributes = OAM[:, 2]
+            if height == 16:
+                # bit 0 selects the pattern table, the bottom half is the next tile
+                top = ((tile_ids & 0x01) << 8) | (tile_ids & 0xFE)
+                pixels = self.tiles[np.stack((top, top + 1), axis = 1)].reshape((64, 16, 8))
+            else:
+                pixels = self.tiles[(self.control[1] << 8) | tile_ids]
+            flipped = attributes & 0x40 != 0
+            pixels[flipped] = pixels[flipped, :, ::-1]
+            flipped = attributes & 0x80 != 0
+            pixels[flipped] = pixels[flipped, ::-1, :]
+            image = self.colors(np.where(pixels == 0, 0, 0x10 | ((attributes & 0x03)[:, None, None] << 2) | pixels))
+            image = image.reshape((8, 8, height, 8, 3)).transpose((0, 2, 1, 3, 4))
+            view = (CHR_CHANGED | PALETTE_CHANGED | OAM_CHANGED | CONTROL_CHANGED, np.ascontiguousarray(image.reshape((8 * height, 64, 3))))
+            self.views["sprite_sheet"] = view
+        return view[1]
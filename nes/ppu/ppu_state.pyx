@@ -1,88 +1,79 @@
 import cython
+import struct
+
+from libc.string cimport memcpy
 
 import numpy as np
 cimport numpy as np
 
 
+# PPUCTRL, PPUMASK, PPUSTATUS, OAMADDR,
+# VRAM address and temp VRAM address (coarse X, coarse Y, nametable X, nametable Y, fine Y, unused),
+# fine X, address latch, data buffer, scanline, cycle, next background tile id / attribute / lsb / msb,
+# background pattern / attribute shifters, sprite count, sprite 0 flags, foreground priority, NMI, frame complete,
+# secondary OAM, sprite pattern shifters
+REGISTERS = struct.Struct("<4B6H6H3B2h4B4H6B32s16s")
+
 @cython.auto_pickle(True)
 cdef class PPUState:
-    def __init__(self, PPU2C02 ppu):
-        self._pattern_table = np.array(ppu._pattern_table, dtype = np.uint8).reshape((2, 64 * 64))
-        self._nametable = np.array(ppu._nametable, dtype = np.uint8)
-        self._palette_table = np.array(ppu._palette_table, dtype = np.uint8)
-        self._screen = [
-            [
-                [ppu._screen[i][j][k] for k in range(3)]
-                for j in range(256)
-            ]
-            for i in range(240)
-        ]
-        self.PPUSTATUS = ppu.PPUSTATUS
-        self.PPUMASK = ppu.PPUMASK
-        self.PPUCTRL = ppu.PPUCTRL
-        self.VRAM_addr = ppu.VRAM_addr
-        self.temp_VRAM_addr = ppu.temp_VRAM_addr
-        self.fine_x = ppu.fine_x
-        self.address_latch = ppu.address_latch
-        self.ppu_data_buffer = ppu.ppu_data_buffer
-        self.scanline = ppu.scanline
-        self.cycle = ppu.cycle
-        self.background_next_tile_id = ppu.background_next_tile_id
-        self.background_next_tile_attribute = ppu.background_next_tile_attribute
-        self.background_next_tile_lsb = ppu.background_next_tile_lsb
-        self.background_next_tile_msb = ppu.background_next_tile_msb
-        self.background_pattern_shift_register = ppu.background_pattern_shift_register
-        self.background_attribute_shift_register = ppu.background_attribute_shift_register
-        self.sprite_pattern_shift_registers = [
-            [ppu.sprite_pattern_shift_registers[i][j] for j in range(2)]
-            for i in range(8)
-        ]
-        self.OAM = [
-            [ppu.OAM[i][j] for j in range(4)]
-            for i in range(64)
-        ]
-        self.OAMADDR = ppu.OAMADDR
-        self.secondary_OAM = [
-            [ppu.secondary_OAM[i][j] for j in range(4)]
-            for i in range(8)
-        ] 
-        self.sprite_count = ppu.sprite_count
-        self.eval_sprite0 = ppu.eval_sprite0
-        self.render_sprite0 = ppu.render_sprite0
-        self.foreground_priority = ppu.foreground_priority
-        self.nmi = ppu.nmi
-        self.frame_complete = ppu.frame_complete
+    def __init__(self, PPU2C02 ppu = None):
+        if ppu is None:
+            return
+        ppu.flush()
+        self.registers = REGISTERS.pack(
+            ppu.PPUCTRL.value, ppu.PPUMASK.value, ppu.PPUSTATUS.value, ppu.OAMADDR,
+            ppu.VRAM_addr.coarse_x, ppu.VRAM_addr.coarse_y, ppu.VRAM_addr.nametable_x, ppu.VRAM_addr.nametable_y, ppu.VRAM_addr.fine_y, ppu.VRAM_addr.unused,
+            ppu.temp_VRAM_addr.coarse_x, ppu.temp_VRAM_addr.coarse_y, ppu.temp_VRAM_addr.nametable_x, ppu.temp_VRAM_addr.nametable_y, ppu.temp_VRAM_addr.fine_y, ppu.temp_VRAM_addr.unused,
+            ppu.fine_x, ppu.address_latch, ppu.ppu_data_buffer, ppu.scanline, ppu.cycle,
+            ppu.background_next_tile_id, ppu.background_next_tile_attribute, ppu.background_next_tile_lsb, ppu.background_next_tile_msb,
+            ppu.background_pattern_shift_register.low_bits, ppu.background_pattern_shift_register.high_bits,
+            ppu.background_attribute_shift_register.low_bits, ppu.background_attribute_shift_register.high_bits,
+            ppu.sprite_count, ppu.eval_sprite0, ppu.render_sprite0, ppu.foreground_priority, ppu.nmi, ppu.frame_complete,
+            (<char*> ppu.secondary_OAM)[:8 * 4], (<char*> ppu.sprite_pattern_shift_registers)[:8 * 2]
+        )
+        self._nametable = np.asarray(ppu._nametable).tobytes()
+        self._pattern_table = np.asarray(ppu._pattern_table).tobytes()
+        self._palette_table = np.asarray(ppu._palette_table).tobytes()
+        self.OAM = (<char*> ppu.OAM)[:64 * 4]
+
+    cdef void write_blocks(self, list blocks):
+        blocks.append((b"PPU ", self.registers))
+        blocks.append((b"VRAM", self._nametable))
+        blocks.append((b"PATT", self._pattern_table))
+        blocks.append((b"PAL ", self._palette_table))
+        blocks.append((b"OAM ", self.OAM))
+
+    cdef void read_blocks(self, dict blocks) except *:
+        self.registers = blocks[b"PPU "]
+        self._nametable = blocks[b"VRAM"]
+        self._pattern_table = blocks[b"PATT"]
+        self._palette_table = blocks[b"PAL "]
+        self.OAM = blocks[b"OAM "]
+        if len(self.OAM) != 64 * 4:
+            raise ValueError("OAM block has {} bytes instead of {}".format(len(self.OAM), 64 * 4))
 
     cdef void load_to(self, PPU2C02 ppu):
-        ppu.PPUCTRL.value = self.PPUCTRL.value & 0xFF
-        ppu.PPUMASK.value = self.PPUMASK.value & 0xFF
-        ppu.PPUSTATUS.value = self.PPUSTATUS.value & 0xFF
-        ppu.OAMADDR = self.OAMADDR & 0xFF
-        ppu.VRAM_addr.value = self.VRAM_addr.value & 0xFFFF
-        ppu.temp_VRAM_addr.value = self.temp_VRAM_addr.value & 0xFFFF
-        ppu.fine_x = self.fine_x & 0xFF
-        ppu.address_latch = self.address_latch & 0xFF
-        ppu.ppu_data_buffer = self.ppu_data_buffer & 0xFF
-        ppu.scanline = self.scanline
-        ppu.cycle = self.cycle
-        ppu.background_next_tile_id = self.background_next_tile_id & 0xFF
-        ppu.background_next_tile_attribute = self.background_next_tile_attribute & 0xFF
-        ppu.background_next_tile_lsb = self.background_next_tile_lsb & 0xFF
-        ppu.background_next_tile_msb = self.background_next_tile_msb & 0xFF
-        ppu.background_pattern_shift_register.low_bits = self.background_pattern_shift_register.low_bits & 0xFFFF
-        ppu.background_pattern_shift_register.high_bits = self.background_pattern_shift_register.high_bits & 0xFFFF
-        ppu.background_attribute_shift_register.low_bits = self.background_attribute_shift_register.low_bits & 0xFFFF
-        ppu.background_attribute_shift_register.high_bits = self.background_attribute_shift_register.high_bits & 0xFFFF
-        ppu.sprite_pattern_shift_registers = self.sprite_pattern_shift_registers
-        ppu.OAM = self.OAM
-        ppu.secondary_OAM = self.secondary_OAM
-        ppu.sprite_count = self.sprite_count
-        ppu.eval_sprite0 = self.eval_sprite0
-        ppu.render_sprite0 = self.render_sprite0
-        ppu.foreground_priority = self.foreground_priority
-        ppu.nmi = self.nmi
-        ppu.frame_complete = self.frame_complete
-        ppu._pattern_table = self._pattern_table
-        ppu._nametable = self._nametable
-        ppu._palette_table = self._palette_table
-        ppu._screen = self._screen
\ No newline at end of file
+        cdef bytes secondary_OAM, sprite_pattern_shift_registers
+
+        registers = REGISTERS.unpack(self.registers)
+        ppu.PPUCTRL.value, ppu.PPUMASK.value, ppu.PPUSTATUS.value, ppu.OAMADDR = registers[0:4]
+        ppu.VRAM_addr.coarse_x, ppu.VRAM_addr.coarse_y, ppu.VRAM_addr.nametable_x, ppu.VRAM_addr.nametable_y, ppu.VRAM_addr.fine_y, ppu.VRAM_addr.unused = registers[4:10]
+        ppu.temp_VRAM_addr.coarse_x, ppu.temp_VRAM_addr.coarse_y, ppu.temp_VRAM_addr.nametable_x, ppu.temp_VRAM_addr.nametable_y, ppu.temp_VRAM_addr.fine_y, ppu.temp_VRAM_addr.unused = registers[10:16]
+        ppu.fine_x, ppu.address_latch, ppu.ppu_data_buffer, ppu.scanline, ppu.cycle = registers[16:21]
+        ppu.background_next_tile_id, ppu.background_next_tile_attribute, ppu.background_next_tile_lsb, ppu.background_next_tile_msb = registers[21:25]
+        ppu.background_pattern_shift_register.low_bits, ppu.background_pattern_shift_register.high_bits = registers[25:27]
+        ppu.background_attribute_shift_register.low_bits, ppu.background_attribute_shift_register.high_bits = registers[27:29]
+        ppu.sprite_count, ppu.eval_sprite0, ppu.render_sprite0, ppu.foreground_priority, ppu.nmi, ppu.frame_complete = registers[29:35]
+        secondary_OAM, sprite_pattern_shift_registers = registers[35:37]
+        memcpy(ppu.secondary_OAM, <char*> secondary_OAM, 8 * 4)
+        memcpy(ppu.sprite_pattern_shift_registers, <char*> sprite_pattern_shift_registers, 8 * 2)
+
+        np.asarray(ppu._nametable)[:] = np.frombuffer(self._nametable, dtype = np.uint8).reshape((2, 32 * 32))
+        np.asarray(ppu._pattern_table)[:] = np.frombuffer(self._pattern_table, dtype = np.uint8).reshape((2, 64 * 64))
+        np.asarray(ppu._palette_table)[:] = np.frombuffer(self._palette_table, dtype = np.uint8)
+        memcpy(ppu.OAM, <char*> self.OAM, 64 * 4)
+        ppu.sprite_bins_valid = False
+
+        ppu._update_palette_colors()
+        ppu.line_deferred = False
+        ppu._clear_tile_cache()
@@ -0,0 +1,42 @@
+from libc.stdint cimport uint8_t, uint16_t, uint32_t, uint64_t
+
+from nes.bus.bus cimport CPUBus
+
+
+cdef enum Subsystem:
+    CPU_TIME
+    PPU_TIME
+    DMA_TIME
+    MAPPER_TIME
+
+cdef class Profiler:
+    cdef CPUBus bus
+    cdef public uint32_t frames
+
+    cdef uint64_t[256] opcode_count
+    cdef uint64_t[256] opcode_cycles
+
+    # instructions / cycles per PRG ROM byte, and per CPU address for code running outside PRG ROM
+    cdef uint32_t[:] PRG_count
+    cdef uint32_t[:] PRG_cycles
+    cdef uint32_t[:] RAM_count
+    cdef uint32_t[:] RAM_cycles
+
+    # reads, writes of $2000–$2007 by instructions, OAM DMA started through $4014
+    cdef uint64_t[8][2] PPU_register_count
+    cdef uint64_t OAM_DMA_count
+
+    cdef double[4] frame_time
+    # CPU, PPU, DMA, mapper seconds of every frame
+    cdef public object frame_times
+
+    cdef double now
+    cdef void account(self, Subsystem)
+
+    cdef void run_frame(self) except *
+    cdef void step(self) except *
+    cdef void instruction(self) except *
+
+    cpdef void clear(self)
+    cpdef dict report(self, int top = *)
+    cpdef list flamegraph(self)
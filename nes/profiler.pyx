@@ -0,0 +1,222 @@
+from array import array
+from time import perf_counter
+
+from libc.string cimport memset
+import numpy as np
+
+from nes.cpu.cpu cimport CPU6502
+from nes.cpu.cpu_op cimport AddressingMode, Instruction, OP_ADDRMODE, OP_INSTRUCTION, LOOKUP
+
+
+SUBSYSTEMS = ["cpu", "ppu", "dma", "mapper"]
+PPU_REGISTERS = ["PPUCTRL", "PPUMASK", "PPUSTATUS", "OAMADDR", "OAMDATA", "PPUSCROLL", "PPUADDR", "PPUDATA"]
+# hot PCs are grouped by 8KB of PRG ROM, the smallest bank size of the supported mappers
+PRG_BANK_SIZE = 0x2000
+
+
+def by_cycles(entry: dict) -> int:
+    return entry["cycles"]
+
+cdef class Profiler:
+    '''
+    Instrumented replacement for the stepping loop of Console.frame, used while profiling
+    is enabled so the regular loop stays free of counters. Emulation results are the same.
+    '''
+    def __init__(self, CPUBus bus) -> None:
+        self.bus = bus
+        self.PRG_count = np.zeros(max(bus.cartridge.PRG_ROM_bytes, 1), dtype = np.uint32)
+        self.PRG_cycles = np.zeros(max(bus.cartridge.PRG_ROM_bytes, 1), dtype = np.uint32)
+        self.RAM_count = np.zeros(0x10000, dtype = np.uint32)
+        self.RAM_cycles = np.zeros(0x10000, dtype = np.uint32)
+        self.clear()
+
+    cpdef void clear(self):
+        self.frames = 0
+        memset(self.opcode_count, 0, sizeof(self.opcode_count))
+        memset(self.opcode_cycles, 0, sizeof(self.opcode_cycles))
+        memset(self.PPU_register_count, 0, sizeof(self.PPU_register_count))
+        self.OAM_DMA_count = 0
+        self.PRG_count[:] = 0
+        self.PRG_cycles[:] = 0
+        self.RAM_count[:] = 0
+        self.RAM_cycles[:] = 0
+        self.frame_times = array("d")
+
+    cdef void account(self, Subsystem subsystem):
+        cdef double now = perf_counter()
+        self.frame_time[<int> subsystem] += now - self.now
+        self.now = now
+
+    cdef void run_frame(self) except *:
+        '''
+        Same as the loops of Console.frame
+        '''
+        cdef CPUBus bus = self.bus
+
+        memset(self.frame_time, 0, sizeof(self.frame_time))
+        self.now = perf_counter()
+        while True:
+            self.step()
+            if bus.ppu.frame_complete:
+                break
+        while True:
+            bus.clock()
+            if bus.cpu.complete():
+                break
+        self.account(Subsystem.CPU_TIME)
+        self.frame_times.extend(self.frame_time)
+        self.frames += 1
+
+    cdef void step(self) except *:
+        '''
+        Same as CPUBus.step
+        '''
+        cdef CPUBus bus = self.bus
+        cdef uint32_t ticks
+        cdef bint dma
+
+        if bus.per_clock or bus.dma_transfer:
+            dma = bus.dma_transfer
+            bus.clock()
+            self.account(Subsystem.DMA_TIME if dma else Subsystem.CPU_TIME)
+            return
+        ticks = (3 - bus.nSystemClockCounter % 3) % 3 + 3 * bus.cpu.remaining_cycles
+        if ticks == 0:
+            self.instruction()
+        else:
+            bus.catch_up(ticks)
+            self.account(Subsystem.PPU_TIME)
+
+    cdef void instruction(self) except *:
+        cdef CPUBus bus = self.bus
+        cdef CPU6502 cpu = bus.cpu
+        cdef uint16_t PC = cpu.registers.PC
+        cdef uint8_t opcode = bus.read(PC, True)
+        cdef uint8_t* page = bus.read_pages[PC >> 8]
+        cdef const uint8_t* PRG_ROM = &bus.cartridge.PRG_ROM_data[0] if bus.cartridge.PRG_ROM_bytes > 0 else NULL
+        cdef uint8_t cycles
+        cdef uint8_t addrmode, instruction
+        cdef uint16_t addr
+        cdef bint write, modify
+        cdef bint mapper = False
+        cdef long offset = -1
+
+        bus.clock()
+        cycles = cpu.remaining_cycles + 1
+        self.opcode_count[opcode] += 1
+        self.opcode_cycles[opcode] += cycles
+
+        if page != NULL and PRG_ROM != NULL:
+            offset = (page - PRG_ROM) + (PC & 0xFF)
+        if 0 <= offset < bus.cartridge.PRG_ROM_bytes:
+            self.PRG_count[offset] += 1
+            self.PRG_cycles[offset] += cycles
+        else:
+            self.RAM_count[PC] += 1
+            self.RAM_cycles[PC] += cycles
+
+        addrmode = OP_ADDRMODE[opcode]
+        instruction = OP_INSTRUCTION[opcode]
+        if addrmode != AddressingMode.IMP and addrmode != AddressingMode.IMM and addrmode != AddressingMode.REL \
+            and instruction != Instruction.JMP and instruction != Instruction.JSR:
+            addr = cpu.addr_abs
+            write = instruction == Instruction.STA or instruction == Instruction.STX or instruction == Instruction.STY
+            modify = instruction == Instruction.ASL or instruction == Instruction.LSR or instruction == Instruction.ROL \
+                or instruction == Instruction.ROR or instruction == Instruction.INC or instruction == Instruction.DEC
+            if 0x2000 <= addr <= 0x3FFF:
+                if not write:
+                    self.PPU_register_count[addr & 0x0007][0] += 1
+                if write or modify:
+                    self.PPU_register_count[addr & 0x0007][1] += 1
+            elif addr == 0x4014 and (write or modify):
+                self.OAM_DMA_count += 1
+            elif addr >= 0x4020 and (write or modify) and bus.write_pages[addr >> 8] == NULL:
+                mapper = True
+        self.account(Subsystem.MAPPER_TIME if mapper else Subsystem.CPU_TIME)
+
+    cpdef dict report(self, int top = 20):
+        '''
+        Counters collected since the last clear, the top hottest PCs per PRG bank
+        '''
+        cdef int opcode, reg
+
+        times = np.frombuffer(self.frame_times, dtype = np.float64).reshape(-1, len(SUBSYSTEMS))
+        opcodes = []
+        for opcode in range(256):
+            if self.opcode_count[opcode] > 0:
+                op = LOOKUP[opcode]
+                opcodes.append({
+                    "opcode": "${:02X}".format(opcode),
+                    "name": op.name,
+                    "addrmode": op.addrmode,
+                    "count": self.opcode_count[opcode],
+                    "cycles": self.opcode_cycles[opcode],
+                })
+        opcodes.sort(key = by_cycles, reverse = True)
+
+        hot_PCs = {}
+        PRG_count, PRG_cycles = np.asarray(self.PRG_count), np.asarray(self.PRG_cycles)
+        for bank_start in range(0, len(PRG_cycles), PRG_BANK_SIZE):
+            bank_cycles = PRG_cycles[bank_start:bank_start + PRG_BANK_SIZE]
+            hot = [offset for offset in np.argsort(bank_cycles)[::-1][:top] if bank_cycles[offset] > 0]
+            if hot:
+                hot_PCs["PRG bank ${:02X}".format(bank_start // PRG_BANK_SIZE)] = [{
+                    "offset": "${:04X}".format(offset),
+                    "count": int(PRG_count[bank_start + offset]),
+                    "cycles": int(bank_cycles[offset]),
+                } for offset in hot]
+        RAM_count, RAM_cycles = np.asarray(self.RAM_count), np.asarray(self.RAM_cycles)
+        hot = [addr for addr in np.argsort(RAM_cycles)[::-1][:top] if RAM_cycles[addr] > 0]
+        if hot:
+            hot_PCs["RAM"] = [{
+                "addr": "${:04X}".format(addr),
+                "count": int(RAM_count[addr]),
+                "cycles": int(RAM_cycles[addr]),
+            } for addr in hot]
+
+        PPU_registers = {}
+        for reg in range(8):
+            PPU_registers[PPU_REGISTERS[reg]] = {
+                "reads": self.PPU_register_count[reg][0],
+                "writes": self.PPU_register_count[reg][1],
+            }
+        PPU_registers["OAMDMA"] = self.OAM_DMA_count
+
+        return {
+            "frames": self.frames,
+            "time": dict(zip(SUBSYSTEMS, times.sum(axis = 0).tolist() if len(times) > 0 else [0.0] * len(SUBSYSTEMS))),
+            "frame_times": [dict(zip(SUBSYSTEMS, frame)) for frame in times.tolist()],
+            "opcodes": opcodes,
+            "hot_pcs": hot_PCs,
+            "ppu_registers": PPU_registers,
+        }
+
+    cpdef list flamegraph(self):
+        '''
+        Folded stacks ("frame;frame;... weight" per line) weighted in microseconds,
+        readable by flamegraph.pl / speedscope. CPU time is spread over the PCs by their cycles.
+        '''
+        times = np.frombuffer(self.frame_times, dtype = np.float64).reshape(-1, len(SUBSYSTEMS)).sum(axis = 0) * 1e6
+        if len(times) == 0:
+            return []
+        PRG_cycles, RAM_cycles = np.asarray(self.PRG_cycles), np.asarray(self.RAM_cycles)
+        total_cycles = int(PRG_cycles.sum()) + int(RAM_cycles.sum())
+
+        lines = []
+        if total_cycles > 0:
+            scale = times[0] / total_cycles
+            for offset in np.flatnonzero(PRG_cycles):
+                weight = int(round(PRG_cycles[offset] * scale))
+                if weight > 0:
+                    lines.append("cpu;PRG bank ${:02X};+${:04X} {} {}".format(
+                        offset // PRG_BANK_SIZE, offset % PRG_BANK_SIZE,
+                        LOOKUP[self.bus.cartridge.PRG_ROM_data[offset]].name, weight))
+            for addr in np.flatnonzero(RAM_cycles):
+                weight = int(round(RAM_cycles[addr] * scale))
+                if weight > 0:
+                    lines.append("cpu;RAM;${:04X} {} {}".format(addr, LOOKUP[self.bus.read(addr, True)].name, weight))
+        for index in range(1, len(SUBSYSTEMS)):
+            weight = int(round(times[index]))
+            if weight > 0:
+                lines.append("{} {}".format(SUBSYSTEMS[index], weight))
+        return lines